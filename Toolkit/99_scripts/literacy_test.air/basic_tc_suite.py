@@ -10,6 +10,7 @@
 #   - 한 눈에 보는 문해 탐험 코스 개선: subflow 기능 적용
 #   - 공통 유틸 변수 생성, Flow 정의 추가
 #   - 메뉴 오픈 시 대기 시간 추가
+#   - 고정 대기(time.sleep) → 이벤트 대기(wait_until_any/wait_screen_settled) 전환
 # =================================================
 #   - 퍼펙트 문해 베이직 Test(BAT)용 자동화 스크립트
 #   - 목표 주차 및 E-Book 기능 사용 여부 설정
@@ -312,9 +313,9 @@ def flow_study_report():
     # --------- 학습 리포트
     if must_check(poco("com.kyowon.literacy:id/left_bottom_layout"), "📋 [Basic Test / 노출] 나의 학습 정보 > 학습리포트"):
         must_click(poco("com.kyowon.literacy:id/txt_report_name"), "학습리포트 클릭")
-        time.sleep(3.0)
+        wait_until_any({"학습 리포트": poco(text="학습 리포트")}, timeout=3.0)
         try_check(poco(text="학습 리포트"), "📋 [Basic Test / 기능] 나의 학습 정보 > 학습리포트")
-        time.sleep(3.0)
+        wait_until_any({"월별 탭": poco("com.kyowon.literacy:id/ctv_month")}, timeout=3.0, settle=0.5)
         # 월별 리포트
         must_click(poco("com.kyowon.literacy:id/ctv_month"), "월별 리포트 클릭")
         try_check(poco(text="출석 일수"), "📋 [Basic Test / 노출] 나의 학습 정보 > 학습리포트 > 월별 리포트")
@@ -342,7 +343,7 @@ def flow_voca_game():
     # ----- step_block: 어휘 게임 기능
     def voca_game_func():
         must_click(poco("com.kyowon.literacy:id/btn_start"), "게임 시작")
-        time.sleep(3.0)
+        wait_until_any({"나가기": poco("com.kyowon.literacy:id/ui_exit")}, timeout=3.0, settle=0.5)
         must_click(poco("com.kyowon.literacy:id/ui_exit"), "나가기")
         must_click(poco("com.kyowon.literacy:id/btn_alert_positive"), "나가기 확인")
         must_click(poco("com.kyowon.literacy:id/btn_alert_exit"), "그만하기")
@@ -364,10 +365,14 @@ def flow_today_voca():
 # ========== 훈련 서브 함수 ==========
 # ----- def: 훈련 메뉴 오픈 
 def training_menu_open():
-    time.sleep(2.5)
-    if poco("com.kyowon.literacy:id/btn_alert_positive").exists():
+    # 알림/메뉴 버튼 중 먼저 뜨는 쪽 대기 (늦게 뜨는 알림을 놓치지 않도록 화면 안정화까지 확인)
+    hit = wait_until_any({
+        "알림": poco("com.kyowon.literacy:id/btn_alert_positive"),
+        "메뉴": poco("com.kyowon.literacy:id/btnOpen"),
+    }, timeout=2.5, settle=0.8)
+    if hit == "알림" or poco("com.kyowon.literacy:id/btn_alert_positive").exists():
         must_click(poco("com.kyowon.literacy:id/btn_alert_positive"), "어휘놀이 알림 닫기")
-        time.sleep(5.0)
+        wait_until_any({"메뉴": poco("com.kyowon.literacy:id/btnOpen")}, timeout=5.0, settle=0.5)
     must_click(poco("com.kyowon.literacy:id/btnOpen"), "메뉴 오픈")
     time.sleep(1.0)
 
@@ -494,7 +499,7 @@ def flow_main_first():
         time.sleep(2.0)
         if poco("com.kyowon.literacy:id/btn_alert_positive").exists():
             must_click(poco("com.kyowon.literacy:id/btn_alert_positive"), "알림 닫기")
-            time.sleep(5.0)
+            wait_until_any({"진행바": poco("com.kyowon.literacy:id/vocaplay_progress_bar")}, timeout=5.0, settle=0.5)
         try_check(poco("com.kyowon.literacy:id/vocaplay_progress_bar"), "📋 [Basic Test / 노출] 술술 읽기 훈련 > 어휘 놀이")
         step_block(voca_play_func, "📋 [Basic Test / 기능] 술술 읽기 훈련 > 어휘 놀이")
 
@@ -584,7 +589,7 @@ def flow_main_second():
         time.sleep(2.0)
         if poco("com.kyowon.literacy:id/btn_alert_positive").exists():
             must_click(poco("com.kyowon.literacy:id/btn_alert_positive"), "알림 닫기")
-            time.sleep(5.0)
+            wait_until_any({"진행바": poco("com.kyowon.literacy:id/vocaplay_progress_bar")}, timeout=5.0, settle=0.5)
         if must_check(poco("com.kyowon.literacy:id/vocaplay_progress_bar"), "📋 [Basic Test / 노출] 탄탄 독해 훈련 > 어휘 놀이"):
             step_block(voca_play_func, "📋 [Basic Test / 기능] 탄탄 독해 훈련 > 어휘 놀이")
 
@@ -739,14 +744,14 @@ def flow_literacy_library():
 def flow_all_contents():
     must_click(poco("com.kyowon.literacy:id/top_right_menu").child("android.widget.ImageButton")[1], "문해 탐험 모아보기 진입")
     must_check(poco("com.kyowon.literacy:id/titleText", text="문해 탐험 모아 보기"), "📋 [Basic Test / 노출] 문해 탐험 모아보기")
-    time.sleep(3.0)
+    wait_screen_settled(quiet=0.5, timeout=3.0)
     
     # ----- def: 문해 탐험 모아보기 재진입
     def restart_all_contents():
         restart_app()
         app_ready()
         must_click(poco("com.kyowon.literacy:id/top_right_menu").child("android.widget.ImageButton")[1], "문해 탐험 모아보기 재진입")
-        time.sleep(3.0)
+        wait_screen_settled(quiet=0.5, timeout=3.0)
 
     # ----- step_block: 문해 탐험 모아보기 공통 기능
     def flow_all_contents_func():
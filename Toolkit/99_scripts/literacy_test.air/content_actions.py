@@ -12,6 +12,9 @@
 #   - 공통 유틸 변수 생성
 #   - 유형 미탐지 시 예외처리 진행 후 1회 재탐지 기능 추가
 #   - 07_꼼꼼하게 읽기_문장 읽기 로직 개선
+#   - 고정 대기(time.sleep) → 이벤트 대기(wait_until_any) 전환: 정답 팝업/화면 로딩/진행률 변화 즉시 진행
+#   - 보기 결과 대기 보완: 정답 팝업/다음 버튼/오답 피드백(화면 반응 후 정지) 중 먼저 관측된 결과로 즉시 판정
+#     (화면 정지로 오답이 먼저 잡히면 WRONG_FEEDBACK_GRACE초 동안 정답 팝업/다음 버튼 재확인 후 확정)
 # =================================================
 # -*- encoding=utf8 -*-
 __author__ = "Eden Kim"
@@ -38,6 +41,47 @@ NEED_RESOURCE_MONITOR = False      # 리소스 모니터링 필요 여부(logcat
 NEED_ON_CLOSE = False              # 종료 시 처리 필요 여부
 STOP_ON_FAIL = False               # 실패 시 중단 여부
 
+# ========== 이벤트 대기 헬퍼 ==========
+# ----- def: 보기 선택 결과 대기 → "정답"(정답 및 풀이 팝업) | "다음"(다음 버튼 새로 노출) | "오답"(화면 반응 후 정지) | None(timeout)
+ANSWER_OK = ("정답", "다음")
+WRONG_FEEDBACK_QUIET = 1.5         # 오답 판정: 보기 원위치/흔들림 등 화면 반응 후 정지 유지 시간(초)
+WRONG_FEEDBACK_GRACE = 2.0         # 오답 확정 전 유예: 화면 정지 후에도 이 시간(초) 동안 정답 팝업/다음 버튼이 없어야 오답
+
+def wait_answer_popup(timeout: float = 5.0):
+    next_btn = poco("com.kyowon.literacy:id/nextButton")
+    had_next = next_btn.exists()   # 이미 떠 있던 다음 버튼은 결과 신호로 보지 않음
+    ok_conds = {
+        "정답": poco(text="정답 및 풀이"),
+        "다음": lambda: (not had_next) and next_btn.exists(),
+    }
+    res = wait_until_any({**ok_conds, "오답": settled_after_change(quiet=WRONG_FEEDBACK_QUIET)},
+                         timeout=timeout, settle=0.3)
+    if res == "오답":
+        # 화면 정지는 오답의 직접 신호가 아님 → 느리게 뜨는 정답 팝업(긴 애니메이션, 리소스 급증 직후 지연) 유예 후 재확인
+        res = wait_until_any(ok_conds, timeout=WRONG_FEEDBACK_GRACE, settle=0.3) or "오답"
+    return res
+
+# ----- def: 정답 처리 후 정리 (정답 및 풀이 팝업 닫기 → 다음 버튼 있으면 클릭)
+def close_answer_popup():
+    if poco("com.kyowon.literacy:id/exitButton").exists():
+        must_click(poco("com.kyowon.literacy:id/exitButton"), "정답 및 풀이 팝업 닫기")
+    if poco("com.kyowon.literacy:id/nextButton").exists():
+        must_click(poco("com.kyowon.literacy:id/nextButton"), "다음 버튼 클릭")
+
+# ----- def: 독서/독해 활동 화면 로딩 대기 (유형 판별 앵커 중 하나가 보이고 화면이 멈추면 진행)
+def wait_reading_screen(timeout: float = 3.0):
+    return wait_until_any({
+        "다시 하기": poco("com.kyowon.literacy:id/btnRetry"),
+        "드래그": poco("com.kyowon.literacy:id/dropTarget"),
+        "O/X": poco("com.kyowon.literacy:id/oButton"),
+        "순서 맞추기": poco("com.kyowon.literacy.store:id/cloudlottie01"),
+        "보기 선택": poco("com.kyowon.literacy:id/answerArea"),
+        "보기 그룹": poco("com.kyowon.literacy:id/selectionGroup"),
+        "선긋기": poco("com.kyowon.literacy:id/lineDrawView"),
+        "문제형": poco("com.kyowon.literacy:id/questionText"),
+        "문제형2": poco("com.kyowon.literacy:id/question_txt"),
+    }, timeout=timeout, settle=0.5)
+
 # ----- step_block: 술술 읽기 훈련 공통 함수(일반 호출로도 사용 가능)
 def first_training_func(_retry=0):
     handle_exceptions()
@@ -286,7 +330,7 @@ def reading_act_func():
     handle_exceptions()
     first_cycle = True
     while(True):
-        time.sleep(3.0)
+        wait_reading_screen(timeout=3.0)
 
         # 진행률 체크
         done, num, den, raw = parse_progress(poco("com.kyowon.literacy:id/progressText"))
@@ -299,7 +343,7 @@ def reading_act_func():
                 step("마지막 문제 다시 하기 감지 → 활동 재시작")
                 must_click(poco("com.kyowon.literacy:id/btnRetry"), "다시 하기 버튼 클릭")
                 first_cycle = False
-                time.sleep(3.0)
+                wait_reading_screen(timeout=3.0)
             else:
                 step(f"진행률 도달: {raw or f'{num}/{den}'}")
                 break
@@ -308,7 +352,7 @@ def reading_act_func():
         if poco("com.kyowon.literacy:id/btnRetry").exists():
             step("다시 하기 버튼 감지 → 활동 재시작")
             must_click(poco("com.kyowon.literacy:id/btnRetry"), "다시 하기 버튼 클릭")
-            time.sleep(3.0)
+            wait_reading_screen(timeout=3.0)
         
         # 활동형_드래그 판별
         if poco("com.kyowon.literacy:id/dropTarget").exists():
@@ -320,12 +364,9 @@ def reading_act_func():
                 for answer in answers:
                     label = get_label(answer.offspring('com.kyowon.literacy:id/selectionText'))
                     must_drag(answer, target, f"보기 선택({label})")
-                    time.sleep(5.0)
-                    if poco(text="정답 및 풀이").exists():
+                    if wait_answer_popup() in ANSWER_OK:
                         step(f"{label}: 정답 ✅")
-                        must_click(poco("com.kyowon.literacy:id/exitButton"), "정답 및 풀이 팝업 닫기")
-                        if poco("com.kyowon.literacy:id/nextButton").exists():
-                            must_click(poco("com.kyowon.literacy:id/nextButton"), "다음 버튼 클릭")
+                        close_answer_popup()
                         break
                     else:
                         step(f"{label}: 오답 ⚠️")
@@ -351,12 +392,9 @@ def reading_act_func():
                         f"보기 선택({label})",
                         src_offset=(400, 0)
                     )
-                    time.sleep(5.0)
-                    if poco(text="정답 및 풀이").exists():
+                    if wait_answer_popup() in ANSWER_OK:
                         step(f"{label}: 정답 ✅")
-                        must_click(poco("com.kyowon.literacy:id/exitButton"), "정답 및 풀이 팝업 닫기")
-                        if poco("com.kyowon.literacy:id/nextButton").exists():
-                            must_click(poco("com.kyowon.literacy:id/nextButton"), "다음 버튼 클릭")
+                        close_answer_popup()
                         break
                     else:
                         step(f"{label}: 오답 ⚠️")
@@ -382,12 +420,9 @@ def reading_act_func():
                         f"보기 선택({label})",
                         src_offset=(400, 0)
                     )
-                    time.sleep(5.0)
-                    if poco(text="정답 및 풀이").exists():
+                    if wait_answer_popup() in ANSWER_OK:
                         step(f"{label}: 정답 ✅")
-                        must_click(poco("com.kyowon.literacy:id/exitButton"), "정답 및 풀이 팝업 닫기")
-                        if poco("com.kyowon.literacy:id/nextButton").exists():
-                            must_click(poco("com.kyowon.literacy:id/nextButton"), "다음 버튼 클릭")
+                        close_answer_popup()
                         break
                     else:
                         step(f"{label}: 오답 ⚠️")
@@ -404,12 +439,9 @@ def reading_act_func():
                 for answer in answers:
                     label = get_label(answer.offspring("com.kyowon.literacy:id/selectionText"))
                     must_drag(answer, target, f"보기 선택({label})")
-                    time.sleep(5.0)
-                    if poco(text="정답 및 풀이").exists():
+                    if wait_answer_popup() in ANSWER_OK:
                         step(f"{label}: 정답 ✅")
-                        must_click(poco("com.kyowon.literacy:id/exitButton"), "정답 및 풀이 팝업 닫기")
-                        if poco("com.kyowon.literacy:id/nextButton").exists():
-                            must_click(poco("com.kyowon.literacy:id/nextButton"), "다음 버튼 클릭")
+                        close_answer_popup()
                         break
                     else:
                         step(f"{label}: 오답 ⚠️")
@@ -435,13 +467,9 @@ def reading_act_func():
                 ("com.kyowon.literacy:id/xButton", "보기 X"),
             ]:
                 must_click(poco(btn_id), f"{label} 클릭")
-                time.sleep(5.0)
-
-                if poco(text="정답 및 풀이").exists():
+                if wait_answer_popup() in ANSWER_OK:
                     step(f"{label}: 정답 ✅")
-                    must_click(poco("com.kyowon.literacy:id/exitButton"), "정답 및 풀이 팝업 닫기")
-                    if poco("com.kyowon.literacy:id/nextButton").exists():
-                        must_click(poco("com.kyowon.literacy:id/nextButton"), "다음 버튼 클릭")
+                    close_answer_popup()
                     break
                 else:
                     step(f"{label}: 오답 ⚠️")
@@ -498,18 +526,15 @@ def reading_act_func():
                 # ✅ 클릭 후 정답 판정: completeFrame이 생기면 그 순서 정답 처리로 간주
                 if picked.offspring("com.kyowon.literacy.store:id/completeFrame").exists():
                     step(f"{picked_label}: 순서 정답 ✅ (다음 보기 선택 진행)")
-                    time.sleep(5.0)
                 else:
                     step(f"{picked_label}: 오답 ⚠️ (다른 보기로 재시도)")
                     time.sleep(0.3)
                     continue
 
                 # 정답/풀이 팝업이 뜨면 전체 정답으로 판단
-                if poco(text="정답 및 풀이").exists():
+                if wait_answer_popup() in ANSWER_OK:
                     step("전체 순서: 정답 ✅")
-                    must_click(poco("com.kyowon.literacy:id/exitButton"), "정답 및 풀이 팝업 닫기")
-                    if poco("com.kyowon.literacy:id/nextButton").exists():
-                        must_click(poco("com.kyowon.literacy:id/nextButton"), "다음 버튼 클릭")
+                    close_answer_popup()
                     success = True   # ✅ 추가
                     break
 
@@ -537,12 +562,9 @@ def reading_act_func():
                 else:
                     label = get_label(answer)
                 must_click(answer, f"보기 선택({label})")
-                time.sleep(5.0)
-                if poco(text="정답 및 풀이").exists():
+                if wait_answer_popup() in ANSWER_OK:
                     step(f"{label}: 정답 ✅")
-                    must_click(poco("com.kyowon.literacy:id/exitButton"), "정답 및 풀이 팝업 닫기")
-                    if poco("com.kyowon.literacy:id/nextButton").exists():
-                        must_click(poco("com.kyowon.literacy:id/nextButton"), "다음 버튼 클릭")
+                    close_answer_popup()
                     break
                 else:
                     step(f"{label}: 오답 ⚠️")
@@ -558,12 +580,9 @@ def reading_act_func():
             for answer in answers:
                 label = get_label(answer.offspring("com.kyowon.literacy:id/selectionText"))
                 must_click(answer, f"보기 선택({label})")
-                time.sleep(5.0)
-                if poco(text="정답 및 풀이").exists():
+                if wait_answer_popup() in ANSWER_OK:
                     step(f"{label}: 정답 ✅")
-                    must_click(poco("com.kyowon.literacy:id/exitButton"), "정답 및 풀이 팝업 닫기")
-                    if poco("com.kyowon.literacy:id/nextButton").exists():
-                        must_click(poco("com.kyowon.literacy:id/nextButton"), "다음 버튼 클릭")
+                    close_answer_popup()
                     break
                 else:
                     step(f"{label}: 오답 ⚠️")
@@ -579,12 +598,9 @@ def reading_act_func():
             for answer in answers:
                 label = get_label(answer.offspring("com.kyowon.literacy:id/text"))
                 must_click(answer, f"보기 선택({label})")
-                time.sleep(5.0)
-                if poco(text="정답 및 풀이").exists():
+                if wait_answer_popup() in ANSWER_OK:
                     step(f"{label}: 정답 ✅")
-                    must_click(poco("com.kyowon.literacy:id/exitButton"), "정답 및 풀이 팝업 닫기")
-                    if poco("com.kyowon.literacy:id/nextButton").exists():
-                        must_click(poco("com.kyowon.literacy:id/nextButton"), "다음 버튼 클릭")
+                    close_answer_popup()
                     break
                 else:
                     step(f"{label}: 오답 ⚠️")
@@ -600,12 +616,9 @@ def reading_act_func():
             for answer in answers:
                 label = get_label(answer)
                 must_click(answer, f"보기 선택({label})")
-                time.sleep(5.0)
-                if poco(text="정답 및 풀이").exists():
+                if wait_answer_popup() in ANSWER_OK:
                     step(f"{label}: 정답 ✅")
-                    must_click(poco("com.kyowon.literacy:id/exitButton"), "정답 및 풀이 팝업 닫기")
-                    if poco("com.kyowon.literacy:id/nextButton").exists():
-                        must_click(poco("com.kyowon.literacy:id/nextButton"), "다음 버튼 클릭")
+                    close_answer_popup()
                     break
                 else:
                     step(f"{label}: 오답 ⚠️")
@@ -1023,7 +1036,7 @@ def voca_adv_func(_retry=0):
 def voca_play_func():
     if poco("com.kyowon.literacy:id/btn_alert_positive").exists():
         must_click(poco("com.kyowon.literacy:id/btn_alert_positive"), "알림 닫기")
-        time.sleep(5.0)
+        wait_until_any({"진행률": poco("com.kyowon.literacy:id/progress_step_text")}, timeout=5.0, settle=0.5)
     handle_exceptions()
     first_cycle = True
     while(True):
@@ -1033,7 +1046,7 @@ def voca_play_func():
             must_click(poco("com.kyowon.literacy:id/btnRetry"), "다시 하기 버튼 클릭")
             time.sleep(1.0)
             must_click(poco("com.kyowon.literacy:id/btn_alert_positive"), "알림 닫기")
-            time.sleep(5.0)
+            wait_until_any({"진행률": poco("com.kyowon.literacy:id/progress_step_text")}, timeout=5.0, settle=0.5)
         
         progress = get_label(poco("com.kyowon.literacy:id/progress_step_text"))
         m = re.search(r"\d+\s*/\s*(\d+)", progress)
@@ -1064,7 +1077,8 @@ def voca_play_func():
             answers = poco("com.kyowon.literacy:id/choice_container").children().child("android.widget.TextView")
             for answer in answers:
                 must_click(answer, f"보기 클릭({get_label(answer)})")
-                time.sleep(3.0)
+                # 진행률 텍스트가 바뀌면(정답) 즉시 진행, 3초 내 변화 없으면 오답
+                wait_until_any({"정답": lambda: progress != get_label(poco("com.kyowon.literacy:id/progress_step_text"))}, timeout=3.0)
                 if progress != get_label(poco("com.kyowon.literacy:id/progress_step_text")):
                     step(f"{get_label(answer)}: 정답 ✅ ({progress}) → ({get_label(poco('com.kyowon.literacy:id/progress_step_text'))})")
                     break
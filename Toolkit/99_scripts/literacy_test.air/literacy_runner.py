@@ -6,6 +6,7 @@
 #   - 러너 명칭 변경: literacy_test → literacy_runner
 #   - 템플릿 선택 로직 개선: pick_best_template() 적용
 #   - 글로벌 변수 정리, Google Drive 관련 설정 변수 생성
+#   - 예외상황 규칙 1회 구성(EXC_RULES: ExceptionRuleSet) → 호출마다 규칙/poco 재생성 제거
 # =================================================
 #   - Airtest + Poco 기반 안드로이드 앱 자동화 스크립트
 #   - 공통 함수 및 플로우 관리
@@ -345,11 +346,10 @@ def main_refresh():
     must_click(poco("TopContaner").offspring(text="열려라!\n지식문"))
     must_click(poco("Btn_Logo").child("touchArea"))
 
-# 예외상황 처리기
-def handle_exceptions(debug=False):
-    
-    # 1) 규칙 구성 (필요한 만큼 자유롭게 추가/수정)
-    rules = [
+# 예외상황 규칙 구성 (필요한 만큼 자유롭게 추가/수정)
+#  - EXC_RULES 생성 시 1회만 호출(앱 재시작으로 poco가 바뀔 때만 재구성)
+def _build_exception_rules():
+    return [
         {
             "name": "자세 확인 닫기(다시 보지 않기)",
             "condition": cond_exists(poco("com.kyowon.literacy:id/txt_check_fluency")),
@@ -415,10 +415,14 @@ def handle_exceptions(debug=False):
             "action": act_click(poco(text="나중에 하기")),
         },
     ]
-    
-    # 2) 실행 (첫 매칭만 처리: handle_all=False / 여러 개 처리하려면 True)
+
+EXC_RULES = ExceptionRuleSet(_build_exception_rules, name="literacy")
+
+# 예외상황 처리기
+def handle_exceptions(debug=False):
+    # 실행 (첫 매칭만 처리: handle_all=False / 여러 개 처리하려면 True)
     handled = handle_expected_exceptions(
-        rules=rules,
+        rules=EXC_RULES,
         handle_all=True,   # 여러 개 한 번에 처리하려면 True
         stop_after=2,        # 무한루프 방지 상한
     )
@@ -3,17 +3,28 @@
 # 👤 Author: Eden Kim
 # 📅 Date: 2026-02-09 - v1.0.6
 #   - 리포트 생성 후 자동 오픈되지 않도록 수정
+#   - 코어/MemTotal 조회를 단말 프로파일 캐시(qa_common/common/devprofile.py) 우선으로 변경 (재실행 시 getprop 1회)
+#     · 캐시 실패 시 폴백도 devprofile.probe_device()/ram_class_kb() → 코어/RAM 클래스 규칙은 devprofile 한 곳
+#   - 긴 시계열 LTTB 다운샘플링(QA_REPORT_MAX_POINTS, 기본 2000) 후 플로팅, 폰트 설정 1회 캐시, 페이지 Figure 템플릿 재사용
+#   - 경량 HTML/SVG 리포트(resource_report_*.html) 동시 생성 (matplotlib 없이 바로 열람)
+#   - --serve: 상주 워커 모드(stdin JSON 작업 → stdout 결과) → 모니터 GUI가 워커 프로세스에 렌더링 위임
+#     · 작업마다 serial/package 전달(--serial/--package) → 모니터에서 단말을 바꿔도 시작 시점 단말로 고정되지 않음
+#   - 스레드/프로세스 상세(breakdown_*.jsonl, qa_common/common/breakdown.py)가 같은 폴더에 있으면
+#     스레드 CPU 누적 영역 그래프 + top-N 스레드/프로세스 PSS 표 페이지 추가 (PDF/HTML, JSON "threads")
+#   - 프레임 jank(gfx_*.csv, qa_common/common/framestats.py)가 있으면 jank %/P50·P90·P99/느린 구간 + [STEP] 구간별
+#     프레임 통계 페이지 추가 (PDF/HTML, JSON "frames", KPI 페이지 FRAME 줄)
+#   - PDF는 .part에 렌더링 후 교체(감시 측이 작성 중인 PDF를 집어가지 않게)
 # ==========================================================
 # • 목적: 리소스 로그(txt) → PDF/CSV/JSON 보고서 + 이벤트 마커/요약
 # • 동적 임계: ADB 조회(코어/램 클래스) 기반 CPU 60%·80%, MEM 23%·28% 스케일링(실패 시 기본값)
 # • 그래프: CPU(좌)/PSS(우) + WARN/CRIT/P95 라인·음영, 시간눈금 자동, 한글/이모지 폰트 대비
 # • KPI: max/avg/P95, 경고/임계 연속구간, 메모리 누수 기울기(KB/분) → PASS/FAIL
-# • 이벤트: events.csv(리포트 범위 ±10분) → 1p 마커(💥⛔⚙🔖), 3p 텍스트 요약, *_events.csv 별도 저장
-# • 산출물: resource_report_YYMMDD_HHMM.(pdf/csv/json) + resource_report_*_events.csv
+# • 이벤트: events.csv(리포트 범위 ±10분) → 1p 마커(💥⛔⚙🔖💧), 3p 텍스트 요약, *_events.csv 별도 저장
+# • 산출물: resource_report_YYMMDD_HHMM.(pdf/csv/json/html) + resource_report_*_events.csv
 # • 주의: 입력 포맷(top 9번째=%CPU / "TOTAL <PSSKB>") 불일치 시 파싱 실패
 # ==========================================================
 # -*- coding: utf-8 -*-
-import os, re, math, json, csv, argparse, subprocess, platform
+import os, re, sys, math, json, csv, argparse, platform, html, time
 os.environ.setdefault("MPLBACKEND", "Agg")  # ① 환경변수 경로보다 우선 적용
 import csv, datetime as dt, os
 import tkinter as tk
@@ -21,7 +32,7 @@ from tkinter import filedialog, messagebox
 from datetime import datetime
 import matplotlib
 matplotlib.use("Agg", force=True)           # ② 코드 레벨 강제
-from matplotlib import pyplot as plt        # ③ 이후 pyplot import
+# ③ pyplot 미사용 — 페이지는 matplotlib.figure.Figure 직접 생성(_page_figure)
 from matplotlib.backends.backend_pdf import PdfPages
 from matplotlib.dates import DateFormatter, MinuteLocator, SecondLocator
 from matplotlib import font_manager as fm
@@ -55,15 +66,22 @@ RAM_TOTAL_KB_REAL = None   # /proc/meminfo 실측값
 RAM_CLASS_NAME = None      # 예: "4GB"
 RAM_CLASS_KB = None        # 예: 3_900_000
 
+# 플로팅 최대 점 수(시리즈별) — KPI/CSV/JSON은 항상 전체 샘플 기준
+PLOT_MAX_POINTS = int(os.getenv("QA_REPORT_MAX_POINTS", "2000") or 2000)
+SPAN_LIST_MAX = 6          # KPI 페이지/HTML에 나열할 경고·임계 구간 수 (긴 런에서 텍스트 폭증 방지)
+THREAD_TOP_N = 8           # 스레드 페이지: 누적 영역 그래프/표에 개별 표시할 스레드 수 (나머지는 "기타")
+THREAD_PLOT_POINTS = 400   # 스레드 누적 영역 그래프 구간 평균 점 수
+FRAME_STEP_TOP = 12        # 프레임 페이지: jank % 상위로 나열할 [STEP] 구간 수 (HTML은 ×2)
+
 # =========================
 # 유틸리티
 # =========================
 # === 메타 추출: 패키지/ PID/ 시리얼 ==========================================
-def _extract_meta_from_log(file_path: str):
+def _extract_meta_from_log(file_path: str, serial: str = None, package: str = None):
     """
     우선순위:
-      1) 리소스 로그 내부의 "[Package] <pkg> (PID: <pid>)" 라인
-      2) 환경변수 ANDROID_SERIAL / ADB_SERIAL
+      1) 리소스 로그 내부의 "[Package] <pkg> (PID: <pid>)" 라인 (없으면 인자 package)
+      2) 인자 serial(--serve 작업/--serial) > 환경변수 ANDROID_SERIAL / ADB_SERIAL
       3) 파일 경로의 result/<serial>/ 폴더명 추론
     """
     pkg = None
@@ -72,7 +90,9 @@ def _extract_meta_from_log(file_path: str):
     # 1) 로그 내부 파싱 (resource_monitor_gui 가 기록)
     try:
         with open(file_path, encoding="utf-8", errors="ignore") as f:
-            for raw in f:
+            for n_line, raw in enumerate(f):
+                if n_line >= 500:   # GUI 로그는 샘플마다 기록 → 앞부분만 확인(긴 로그 전체 스캔 방지)
+                    break
                 m = re.search(r'^\[Package\]\s+([A-Za-z0-9_.]+)\s+\(PID:\s*([0-9]+|None)\)', raw.strip())
                 if m:
                     pkg = m.group(1)
@@ -81,8 +101,10 @@ def _extract_meta_from_log(file_path: str):
     except Exception:
         pass
 
-    # 2) 시리얼: ENV 우선
-    serial = os.getenv("ANDROID_SERIAL") or os.getenv("ADB_SERIAL")
+    pkg = pkg or package
+
+    # 2) 시리얼: 작업 인자 > ENV
+    serial = serial or os.getenv("ANDROID_SERIAL") or os.getenv("ADB_SERIAL")
 
     # 3) 경로 추론: .../result/<serial>/resource_YYMMDD_HHMM.txt
     if not serial:
@@ -130,7 +152,14 @@ def _setup_emoji_font():
     matplotlib.rcParams["ps.fonttype"]  = 42
     matplotlib.rcParams["text.usetex"] = False
 
-_setup_emoji_font()
+_FONT_READY = False
+
+def _ensure_fonts():
+    """이모지 폰트 등록은 프로세스당 1회 (addfont가 폰트 파일 전체를 파싱 → 상주 워커에서 재사용)"""
+    global _FONT_READY
+    if not _FONT_READY:
+        _setup_emoji_font()
+        _FONT_READY = True
 
 def render_summary(ax, lines, fontsize=12, spacing=1.12, top=0.02, bottom=0.06):
     """
@@ -218,6 +247,74 @@ def _contiguous_spans_over(series, times, threshold):
     return spans
 
 
+def _lttb(xs, ys, n_out):
+    """
+    LTTB(Largest-Triangle-Three-Buckets) 다운샘플링 → 유지할 인덱스 목록.
+    - 첫/마지막 점 고정, 각 버킷에서 (이전 선택점, 다음 버킷 평균)과 삼각형 면적이 최대인 점 선택
+    - 피크/골이 살아남아 그래프 모양이 유지됨 (O(n))
+    """
+    n = len(xs)
+    if n_out >= n or n_out < 3:
+        return list(range(n))
+    every = (n - 2) / (n_out - 2)
+    idx = [0]
+    a = 0
+    for i in range(n_out - 2):
+        s = int((i + 1) * every) + 1
+        e = min(int((i + 2) * every) + 1, n)
+        cnt = max(e - s, 1)
+        avg_x = sum(xs[s:e]) / cnt
+        avg_y = sum(ys[s:e]) / cnt
+
+        ax_, ay_ = xs[a], ys[a]
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax_ - avg_x) * (ys[j] - ay_) - (ax_ - xs[j]) * (avg_y - ay_))
+            if area > best_area:
+                best_area, best = area, j
+        if best >= 0:
+            idx.append(best)
+            a = best
+    idx.append(n - 1)
+    return idx
+
+
+def _merge_spans_for_plot(spans, times, min_gap_sec):
+    """음영용: 화면 해상도보다 좁은 간격의 구간은 합쳐서 패치 수를 줄임 (KPI용 spans는 그대로)"""
+    out = []
+    for s, e, d in spans:
+        if out and (times[s] - times[out[-1][1]]).total_seconds() <= min_gap_sec:
+            out[-1] = (out[-1][0], e, 0)
+        else:
+            out.append((s, e, d))
+    return out
+
+
+def _fmt_spans_text(spans, times, limit=None):
+    """구간 목록 문자열 — 표시 개수 제한(SPAN_LIST_MAX, 나머지는 건수/최장 시간 요약). JSON에는 전체 기록"""
+    if not spans:
+        return "없음"
+    limit = SPAN_LIST_MAX if limit is None else limit
+    txt = "; ".join(f"{times[s].strftime('%H:%M:%S')}~{times[e].strftime('%H:%M:%S')}({int(d)}s)"
+                    for s, e, d in spans[:limit])
+    if len(spans) > limit:
+        txt += f" … 외 {len(spans) - limit}건(최장 {int(max(d for _, _, d in spans))}s)"
+    return txt
+
+
+# 페이지 Figure 템플릿 (상주 워커에서 재사용 — pyplot 전역 관리자 미사용)
+_FIG_CACHE = {}
+
+def _page_figure(key, figsize):
+    from matplotlib.figure import Figure
+    fig = _FIG_CACHE.get(key)
+    if fig is None:
+        fig = _FIG_CACHE[key] = Figure(figsize=figsize)
+    else:
+        fig.clear()
+    return fig
+
+
 def _linear_slope_kb_per_min(times, mem_kb):
     """메모리 PSS의 1차 회귀 기울기(KB/분) — 최소자승(수식)로 계산"""
     n = len(times)
@@ -239,110 +336,99 @@ def _linear_slope_kb_per_min(times, mem_kb):
 
 # =========================
 # 동적 임계치(코어/총RAM 기반)
-#  - adb로 장치 스펙 조회 → WARN/CRIT 자동 스케일링
+#  - 장치 스펙(코어/MemTotal/RAM 클래스)은 common.devprofile로 조회 → WARN/CRIT 자동 스케일링
 #  - 실패 시 기본 상수 유지
 # =========================
 SER = os.getenv("ANDROID_SERIAL") or os.getenv("ADB_SERIAL")
-def _adb_out(args):
-    base = ["adb"]
-    if SER: base += ["-s", SER]
-    """['cat','/proc/meminfo'] 처럼 list 인자를 받아 UTF-8 문자열 반환"""
-    return subprocess.check_output(base + ["shell"] + args, encoding="utf-8", errors="ignore")
-
-
-def _get_device_cores(default=8):
-    """
-    안드로이드 단말에서 코어 수를 안전하게 추출(Windows 호스트 호환).
-    우선순위:
-      1) /sys/devices/system/cpu/possible (예: "0-7" → 8개)
-      2) /sys/devices/system/cpu/present  (예: "0-3,4-7")
-      3) /proc/cpuinfo의 'processor :' 라인 개수
-    실패 시 default 반환
-    """
-    def _count_ranges(expr: str) -> int:
-        # "0-3,4-7" 또는 "0-7" 같은 표현을 정수 개수로 변환
-        expr = expr.strip()
-        if not expr:
-            return 0
-        total = 0
-        for part in expr.split(","):
-            part = part.strip()
-            m = re.match(r"^\s*(\d+)\s*-\s*(\d+)\s*$", part)
-            if m:
-                a, b = int(m.group(1)), int(m.group(2))
-                if b >= a:
-                    total += (b - a + 1)
-            else:
-                if part.isdigit():
-                    total += 1
-        return total
 
-    try:
-        out = _adb_out(["cat", "/sys/devices/system/cpu/possible"])
-        n = _count_ranges(out)
-        if n > 0:
-            return n
-    except Exception:
-        pass
 
+def _qa_common_import(name: str):
+    """qa_common/common/<name> 모듈 로드 (QA_TOOLKIT 또는 ./qa_common 경로, 실패 시 None)"""
+    qa_common = os.environ.get("QA_TOOLKIT") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "qa_common")
     try:
-        out = _adb_out(["cat", "/sys/devices/system/cpu/present"])
-        n = _count_ranges(out)
-        if n > 0:
-            return n
+        if qa_common not in sys.path:
+            sys.path.insert(0, qa_common)
+        import importlib
+        return importlib.import_module(f"common.{name}")
     except Exception:
-        pass
+        return None
 
+def _device_profile(serial: str = None) -> dict:
+    """
+    단말 프로파일 캐시(common.devprofile) 조회 — 모니터/공통 모듈과 같은 캐시 파일 공유. serial 없으면 SER(ENV).
+    qa_common 경로가 없거나 조회 실패 시 빈 dict → devprofile.probe_device() 1회 조회 또는 기본값(8코어/4GB급).
+    """
+    dp = _qa_common_import("devprofile")
     try:
-        txt = _adb_out(["cat", "/proc/cpuinfo"])
-        n = len(re.findall(r"(?m)^\s*processor\s*:\s*\d+\s*$", txt))
-        if n > 0:
-            return n
+        return dp.get_device_profile(serial or SER) if dp is not None else {}
     except Exception:
-        pass
-
-    return default
+        return {}
 
-
-def _get_memtotal_kb(default=3_900_000):
-    """총 메모리(KB) 탐지. 실패 시 default(≈4GB급)"""
+def _load_thread_breakdown(file_path, timestamps):
+    """
+    리소스 로그와 같은 폴더의 breakdown_*.jsonl 중 리포트 범위 구간 로드.
+    반환: (breakdown 모듈, 열 데이터, 요약) 또는 None(파일 없음/모듈 없음)
+    """
+    bd = _qa_common_import("breakdown")
+    if bd is None:
+        return None
     try:
-        out = _adb_out(["cat", "/proc/meminfo"])
-        m = re.search(r"MemTotal:\s+(\d+)\s*kB", out)
-        if m:
-            return int(m.group(1))
-    except Exception:
-        pass
-    return default
+        data = bd.load_breakdown_range(os.path.dirname(os.path.abspath(file_path)),
+                                       timestamps[0].timestamp(), timestamps[-1].timestamp() + 1.0)
+    except Exception as e:
+        print(f"[WARN] 스레드 상세 로드 실패: {e}")
+        return None
+    if not data:
+        return None
+    return bd, data, bd.summarize(data, top=THREAD_TOP_N)
 
-def _nearest_ram_class_kb(memtotal_kb: int):
+def _load_frames(file_path, timestamps, events_in):
     """
-    MemTotal(KB)을 가장 가까운 'RAM 클래스' 표준값으로 스냅.
-    표준값은 현장 체감치(커널/예약 메모리 차감 후 대략치)로 잡았습니다.
+    리소스 로그와 같은 폴더의 gfx_*.csv 중 리포트 범위 프레임 로드 + [STEP] 구간별 통계.
+    반환: (framestats 모듈, (t, dur_ms, deadline_ms), 요약 dict(JSON용)) 또는 None
     """
-    classes = {
-        "2GB":  1_950_000,
-        "3GB":  2_950_000,
-        "4GB":  3_900_000,  # ← 4GB급은 보통 3.8~3.95M 사이로 관측
-        "6GB":  5_800_000,
-        "8GB":  7_800_000,
-        "12GB": 11_700_000,
-    }
-    # 가장 가까운 클래스 선택
-    name, base_kb = min(classes.items(), key=lambda kv: abs(memtotal_kb - kv[1]))
-    return name, base_kb
-
-def _compute_dynamic_thresholds():
+    fs = _qa_common_import("framestats")
+    if fs is None:
+        return None
+    try:
+        fr = fs.load_frames_range(os.path.dirname(os.path.abspath(file_path)),
+                                  timestamps[0].timestamp(), timestamps[-1].timestamp() + 1.0)
+    except Exception as e:
+        print(f"[WARN] 프레임 통계 로드 실패: {e}")
+        return None
+    if fr is None:
+        return None
+    t, dur, dl = fr
+
+    def _ts(x):
+        return str(datetime.fromtimestamp(x).replace(microsecond=0))
+
+    steps = [(te.timestamp(), detail) for te, typ, detail, _ in events_in if typ == "STEP"]
+    summary = fs.frame_stats(dur, dl)
+    summary["slow_spans"] = [dict(sp, start=_ts(sp["start"]), end=_ts(sp["end"])) for sp in fs.slow_spans(t, dur, dl)]
+    summary["steps"] = [dict(r, start=_ts(r["start"]), end=_ts(r["end"])) for r in fs.by_step(t, dur, dl, steps)]
+    return fs, fr, summary
+
+def _worst_steps(frames_summary, n):
+    """jank % 상위 [STEP] 구간(프레임 10개 이상)"""
+    rows = [r for r in frames_summary["steps"] if r["frames"] >= 10]
+    return sorted(rows, key=lambda r: (-r["jank_pct"], -r["p90"]))[:n]
+
+def _compute_dynamic_thresholds(serial: str = None):
     """
     동적 기준(버킷팅 버전):
       - CPU: WARN=0.60×100×코어수, CRIT=0.80×100×코어수
       - MEM: MemTotal을 가장 가까운 RAM 클래스 표준값으로 스냅 → WARN/CRIT = MEM_WARN_PCT/MEM_CRIT_PCT 적용
     """
-    cores = _get_device_cores()
-    memkb_real = _get_memtotal_kb()
-
-    # 램 클래스 스냅 + 보수적 비율 적용
-    ram_class_name, ram_class_kb = _nearest_ram_class_kb(memkb_real)
+    dp = _qa_common_import("devprofile")
+    prof = _device_profile(serial)
+    if dp is not None and not (prof.get("cores") and prof.get("mem_total_kb")):
+        prof = {**dp.probe_device(serial or SER), **{k: v for k, v in prof.items() if v}}   # 캐시 실패 → 캐시 없이 1회 조회
+    cores = prof.get("cores") or 8
+    memkb_real = prof.get("mem_total_kb") or 3_900_000
+
+    # 램 클래스 스냅(devprofile.RAM_CLASSES) + 보수적 비율 적용
+    ram_class_name, ram_class_kb = dp.ram_class_kb(memkb_real) if dp is not None else ("4GB", 3_900_000)
     mem_warn = int(MEM_WARN_PCT * ram_class_kb)
     mem_crit = int(MEM_CRIT_PCT * ram_class_kb)
 
@@ -358,13 +444,13 @@ def _compute_dynamic_thresholds():
     return cores, memkb_real, ram_class_name, ram_class_kb, cpu_warn, cpu_crit, mem_warn, mem_crit
 
 
-def apply_dynamic_thresholds():
-    """전역 임계치 덮어쓰고, 메타값도 전역에 저장(보고서에서 사용)"""
+def apply_dynamic_thresholds(serial: str = None):
+    """전역 임계치 덮어쓰고, 메타값도 전역에 저장(보고서에서 사용) — serial: 작업 단위 단말(없으면 ENV)"""
     global CPU_WARN, CPU_CRIT, MEM_WARN_KB, MEM_CRIT_KB
     global CORE_COUNT, RAM_TOTAL_KB_REAL, RAM_CLASS_NAME, RAM_CLASS_KB
 
     (cores, memkb_real, ram_name, ram_kb,
-     cw, cc, mw, mc) = _compute_dynamic_thresholds()
+     cw, cc, mw, mc) = _compute_dynamic_thresholds(serial)
 
     CPU_WARN, CPU_CRIT, MEM_WARN_KB, MEM_CRIT_KB = cw, cc, mw, mc
     CORE_COUNT, RAM_TOTAL_KB_REAL, RAM_CLASS_NAME, RAM_CLASS_KB = cores, memkb_real, ram_name, ram_kb
@@ -379,24 +465,39 @@ def apply_dynamic_thresholds():
 #  - Memory: 'TOTAL <숫자>'를 PSS(KB)로 사용
 #  - BOM 보정 추가
 # =========================
+_RE_TS = re.compile(r"\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]")
+_RE_CPU_ROW = re.compile(r"^\d+\s+\S+")
+_RE_MEM_NEW1 = re.compile(r'^TOTAL\s+PssTotal\s+([\d,]+)\s*kB', re.I)
+_RE_MEM_NEW2 = re.compile(r'^TOTAL\s+([\d,]+)\s*kB', re.I)
+_RE_MEM_OLD = re.compile(r'^TOTAL\s+(\d+)\b')
+_RE_MEM_NA = re.compile(r'^TOTAL\s+N/?A\b', re.I)
+
 def parse_resource_log(file_path):
     timestamps, cpu_values, mem_pss = [], [], []
     current_timestamp = None
     current_cpu = None
     current_mem = None
+    ts_memo = {}   # 같은 초 문자열 재파싱 방지
 
     with open(file_path, encoding="utf-8", errors="ignore") as f:
         for raw in f:
             line = _strip_bom(raw.strip())
+            if not line:
+                continue
+            c0 = line[0]
 
             # [타임스탬프]
-            m_ts = re.match(r"\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]", line)
-            if m_ts:
-                current_timestamp = datetime.strptime(m_ts.group(1), "%Y-%m-%d %H:%M:%S")
-                continue
+            if c0 == "[":
+                m_ts = _RE_TS.match(line)
+                if m_ts:
+                    key = m_ts.group(1)
+                    current_timestamp = ts_memo.get(key)
+                    if current_timestamp is None:
+                        current_timestamp = ts_memo[key] = datetime.strptime(key, "%Y-%m-%d %H:%M:%S")
+                    continue
 
             # CPU 라인(헤더 제외)
-            if re.match(r"^\d+\s+\S+", line) and "%CPU" not in line:
+            if c0.isdigit() and _RE_CPU_ROW.match(line) and "%CPU" not in line:
                 parts = line.split()
                 if len(parts) > 8:
                     try:
@@ -410,10 +511,12 @@ def parse_resource_log(file_path):
             #   TOTAL PssTotal 255,064 kB    VmRSS 255,064 kB    Threads 76
             #   TOTAL     255,064 kB    255,064 kB      76
             #   TOTAL 255064
-            m_new1 = re.search(r'^TOTAL\s+PssTotal\s+([\d,]+)\s*kB', line, re.I)
-            m_new2 = re.search(r'^TOTAL\s+([\d,]+)\s*kB', line, re.I)
-            m_old  = None if (m_new1 or m_new2) else re.search(r'^TOTAL\s+(\d+)\b', line)
-            m_na   = re.search(r'^TOTAL\s+N/?A\b', line, re.I)
+            if c0 not in "Tt" or line[:5].upper() != "TOTAL":
+                continue
+            m_new1 = _RE_MEM_NEW1.search(line)
+            m_new2 = _RE_MEM_NEW2.search(line)
+            m_old  = None if (m_new1 or m_new2) else _RE_MEM_OLD.search(line)
+            m_na   = _RE_MEM_NA.search(line)
 
             if m_na:
                 current_mem = None  # N/A는 샘플 생략
@@ -431,6 +534,224 @@ def parse_resource_log(file_path):
     return timestamps, cpu_values, mem_pss
 
 
+# =========================
+# 경량 HTML/SVG 리포트
+#  - matplotlib 없이 문자열로 SVG 생성 (다운샘플링된 점만 사용 → 샘플 수와 무관한 크기/속도)
+#  - 브라우저로 바로 열람: 시계열(CPU 좌/PSS 우) + 기준선/구간 음영/이벤트 + KPI/이벤트 표
+# =========================
+def _svg_timeseries(timestamps, cpu_values, mem_pss, cpu_idx, mem_idx, plot_spans, events_in,
+                    w=1100, h=380, pad_l=70, pad_r=90, pad_t=20, pad_b=40):
+    x0, x1 = timestamps[0].timestamp(), timestamps[-1].timestamp()
+    xspan = max(x1 - x0, 1.0)
+    pw, ph = w - pad_l - pad_r, h - pad_t - pad_b
+
+    def _yrange(vals, guides, min_margin):
+        lo, hi = min(list(vals) + guides), max(list(vals) + guides)
+        m = max(min_margin, (hi - lo) * 0.10)
+        return lo - m, hi + m
+
+    c_lo, c_hi = _yrange((cpu_values[i] for i in cpu_idx), [CPU_WARN, CPU_CRIT], 5.0)
+    m_lo, m_hi = _yrange((mem_pss[i] for i in mem_idx), [MEM_WARN_KB, MEM_CRIT_KB], 20480.0)
+
+    def X(t):
+        return pad_l + (t.timestamp() - x0) / xspan * pw
+
+    def Y(v, lo, hi):
+        return pad_t + (1.0 - (v - lo) / max(hi - lo, 1e-9)) * ph
+
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {w} {h}" width="100%" '
+           f'style="font:11px sans-serif;background:#fff">']
+    out.append(f'<rect x="{pad_l}" y="{pad_t}" width="{pw}" height="{ph}" fill="none" stroke="#ccc"/>')
+    for k in range(6):
+        gy = pad_t + ph * k / 5
+        cv = c_hi - (c_hi - c_lo) * k / 5
+        mv = m_hi - (m_hi - m_lo) * k / 5
+        out.append(f'<line x1="{pad_l}" x2="{pad_l + pw}" y1="{gy:.1f}" y2="{gy:.1f}" stroke="#eee"/>')
+        out.append(f'<text x="{pad_l - 6}" y="{gy + 4:.1f}" text-anchor="end" fill="#1f77b4">{cv:.0f}%</text>')
+        out.append(f'<text x="{pad_l + pw + 6}" y="{gy + 4:.1f}" fill="#ff7f0e">{int(mv):,}</text>')
+    for k in range(6):
+        t = timestamps[0] + (timestamps[-1] - timestamps[0]) * k / 5
+        out.append(f'<text x="{X(t):.1f}" y="{h - pad_b + 16}" text-anchor="middle">{t.strftime("%H:%M:%S")}</text>')
+
+    for key, color, alpha in (("cpu_crit", "#1f77b4", 0.12), ("cpu_warn", "#1f77b4", 0.06),
+                              ("mem_crit", "#ff7f0e", 0.12), ("mem_warn", "#ff7f0e", 0.06)):
+        for s_, e_, _ in plot_spans[key]:
+            xa, xb = X(timestamps[s_]), X(timestamps[e_])
+            out.append(f'<rect x="{xa:.1f}" y="{pad_t}" width="{max(xb - xa, 1):.1f}" height="{ph}" '
+                       f'fill="{color}" fill-opacity="{alpha}"/>')
+
+    for v, lo, hi, color, dash, label in (
+            (CPU_WARN, c_lo, c_hi, "#1f77b4", "2,3", "CPU WARN"), (CPU_CRIT, c_lo, c_hi, "#1f77b4", "6,3", "CPU CRIT"),
+            (MEM_WARN_KB, m_lo, m_hi, "#ff7f0e", "2,3", "MEM WARN"), (MEM_CRIT_KB, m_lo, m_hi, "#ff7f0e", "6,3", "MEM CRIT")):
+        yy = Y(v, lo, hi)
+        out.append(f'<line x1="{pad_l}" x2="{pad_l + pw}" y1="{yy:.1f}" y2="{yy:.1f}" stroke="{color}" '
+                   f'stroke-dasharray="{dash}"><title>{label} {v:,.0f}</title></line>')
+
+    cpu_pts = " ".join(f"{X(timestamps[i]):.1f},{Y(cpu_values[i], c_lo, c_hi):.1f}" for i in cpu_idx)
+    mem_pts = " ".join(f"{X(timestamps[i]):.1f},{Y(mem_pss[i], m_lo, m_hi):.1f}" for i in mem_idx)
+    out.append(f'<polyline points="{cpu_pts}" fill="none" stroke="#1f77b4" stroke-width="1.5"/>')
+    out.append(f'<polyline points="{mem_pts}" fill="none" stroke="#ff7f0e" stroke-width="1.5"/>')
+
+    ev_colors = {"CRASH": "crimson", "ANR": "purple", "GC": "gray", "STEP": "teal", "LEAK": "red"}
+    for t, typ, detail, lvl in events_in:
+        ex = X(t)
+        out.append(f'<line x1="{ex:.1f}" x2="{ex:.1f}" y1="{pad_t}" y2="{pad_t + ph}" '
+                   f'stroke="{ev_colors.get(typ, "gray")}" stroke-opacity="0.6" stroke-dasharray="1,2">'
+                   f'<title>{t.strftime("%H:%M:%S")} {html.escape(typ)} [{html.escape(lvl)}] '
+                   f'{html.escape(_truncate(detail, 200))}</title></line>')
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+_STACK_COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+                 "#8c564b", "#e377c2", "#17becf", "#bcbd22", "#7f7f7f"]
+
+def _svg_stacked(ts, series, w=1100, h=300, pad_l=70, pad_r=220, pad_t=20, pad_b=40):
+    """스레드 CPU 누적 영역(top-N + 기타) — ts: epoch 리스트, series: {라벨: 값 리스트}"""
+    x0, x1 = ts[0], ts[-1]
+    xspan = max(x1 - x0, 1.0)
+    pw, ph = w - pad_l - pad_r, h - pad_t - pad_b
+    tops = [sum(v[i] for v in series.values()) for i in range(len(ts))]
+    y_hi = max(max(tops) * 1.1, 1.0)
+
+    def X(t):
+        return pad_l + (t - x0) / xspan * pw
+
+    def Y(v):
+        return pad_t + (1.0 - v / y_hi) * ph
+
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {w} {h}" width="100%" '
+           f'style="font:11px sans-serif;background:#fff">']
+    out.append(f'<rect x="{pad_l}" y="{pad_t}" width="{pw}" height="{ph}" fill="none" stroke="#ccc"/>')
+    for k in range(6):
+        gy = pad_t + ph * k / 5
+        out.append(f'<line x1="{pad_l}" x2="{pad_l + pw}" y1="{gy:.1f}" y2="{gy:.1f}" stroke="#eee"/>')
+        out.append(f'<text x="{pad_l - 6}" y="{gy + 4:.1f}" text-anchor="end">{y_hi * (1 - k / 5):.0f}%</text>')
+    for k in range(6):
+        t = x0 + xspan * k / 5
+        out.append(f'<text x="{X(t):.1f}" y="{h - pad_b + 16}" text-anchor="middle">'
+                   f'{datetime.fromtimestamp(t).strftime("%H:%M:%S")}</text>')
+    base = [0.0] * len(ts)
+    for n, (label, vals) in enumerate(series.items()):
+        top = [b + v for b, v in zip(base, vals)]
+        pts = [f"{X(t):.1f},{Y(v):.1f}" for t, v in zip(ts, top)]
+        pts += [f"{X(t):.1f},{Y(v):.1f}" for t, v in zip(reversed(ts), reversed(base))]
+        color = _STACK_COLORS[n % len(_STACK_COLORS)]
+        out.append(f'<polygon points="{" ".join(pts)}" fill="{color}" fill-opacity="0.8" stroke="none">'
+                   f'<title>{html.escape(label)}</title></polygon>')
+        ly = pad_t + 14 * n
+        out.append(f'<rect x="{pad_l + pw + 10}" y="{ly}" width="10" height="10" fill="{color}"/>')
+        out.append(f'<text x="{pad_l + pw + 24}" y="{ly + 9}">{html.escape(_truncate(label, 30))}</text>')
+        base = top
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+def _svg_jank(bt, bp, spans, w=1100, h=220, pad_l=70, pad_r=90, pad_t=20, pad_b=40):
+    """초 단위 jank % 영역 + 느린 구간 음영 — bt: epoch 배열, bp: jank % 배열, spans: slow_spans() 결과"""
+    x0, x1 = float(bt[0]), float(bt[-1]) + 1.0
+    xspan = max(x1 - x0, 1.0)
+    pw, ph = w - pad_l - pad_r, h - pad_t - pad_b
+
+    def X(t):
+        return pad_l + (t - x0) / xspan * pw
+
+    def Y(v):
+        return pad_t + (1.0 - v / 100.0) * ph
+
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {w} {h}" width="100%" '
+           f'style="font:11px sans-serif;background:#fff">']
+    out.append(f'<rect x="{pad_l}" y="{pad_t}" width="{pw}" height="{ph}" fill="none" stroke="#ccc"/>')
+    for k in range(5):
+        gy = pad_t + ph * k / 4
+        out.append(f'<line x1="{pad_l}" x2="{pad_l + pw}" y1="{gy:.1f}" y2="{gy:.1f}" stroke="#eee"/>')
+        out.append(f'<text x="{pad_l - 6}" y="{gy + 4:.1f}" text-anchor="end" fill="#9467bd">{100 - 25 * k}%</text>')
+    for k in range(6):
+        t = x0 + xspan * k / 5
+        out.append(f'<text x="{X(t):.1f}" y="{h - pad_b + 16}" text-anchor="middle">'
+                   f'{datetime.fromtimestamp(t).strftime("%H:%M:%S")}</text>')
+    for sp in spans:
+        xa, xb = X(sp["t0"]), X(sp["t1"])
+        out.append(f'<rect x="{xa:.1f}" y="{pad_t}" width="{max(xb - xa, 1):.1f}" height="{ph}" fill="#9467bd" '
+                   f'fill-opacity="0.12"><title>jank {sp["jank_pct"]:.0f}% · P90 {sp["p90"]:.1f}ms</title></rect>')
+    pts = " ".join(f"{X(float(t)):.1f},{Y(float(v)):.1f} {X(float(t) + 1.0):.1f},{Y(float(v)):.1f}" for t, v in zip(bt, bp))
+    out.append(f'<polygon points="{X(x0):.1f},{Y(0):.1f} {pts} {X(x1):.1f},{Y(0):.1f}" fill="#9467bd" '
+               f'fill-opacity="0.7" stroke="none"/>')
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+def _write_html_report(html_path, summary_obj, timestamps, cpu_values, mem_pss,
+                       cpu_idx, mem_idx, plot_spans, events_in, threads=None, frames=None):
+    def _spans_txt(spans):
+        return _fmt_spans_text(spans, timestamps)
+
+    cpu, mem, meta = summary_obj["cpu"], summary_obj["mem"], summary_obj["meta"]
+    verdict = summary_obj["verdict"]
+    rows = [
+        ("파일", summary_obj["file"]),
+        ("범위", f'{summary_obj["range"]["start"]} ~ {summary_obj["range"]["end"]} ({summary_obj["samples"]:,} 샘플)'),
+        ("대상", f'{meta["package"] or "-"} | PID {meta["pid"]} | {meta["serial"] or "-"}'),
+        ("기준값", f"CPU {int(CPU_WARN)}% / {int(CPU_CRIT)}% · MEM {int(MEM_WARN_KB):,} / {int(MEM_CRIT_KB):,} KB"),
+        ("CPU", f'max {cpu["max"]:.1f}% · avg {cpu["avg"]:.1f}% · p95 {cpu["p95"]:.1f}%'),
+        ("MEM", f'max {int(mem["max"]):,}KB · avg {int(mem["avg"]):,}KB · p95 {int(mem["p95"]):,}KB'),
+        ("LEAK", f'{int(mem["slope_kb_per_min"]):,} KB/분 (기준 {LEAK_SUSPECT_KB_PER_MIN:,})'),
+        ("CPU 경고/임계", f'{_spans_txt(cpu["warn_spans"])} / {_spans_txt(cpu["crit_spans"])}'),
+        ("MEM 경고/임계", f'{_spans_txt(mem["warn_spans"])} / {_spans_txt(mem["crit_spans"])}'),
+        ("판정", f'{verdict["overall"]} — {", ".join(verdict["notes"])}'),
+    ]
+    ev_rows = "".join(
+        f"<tr><td>{t.strftime('%H:%M:%S')}</td><td>{html.escape(typ)}</td><td>{html.escape(lvl)}</td>"
+        f"<td>{html.escape(_truncate(detail, 160))}</td></tr>"
+        for t, typ, detail, lvl in sorted(events_in, key=lambda x: x[0])[-30:])
+    thr_html = ""
+    if threads:
+        bd, data, tsum = threads
+        ts, series = bd.downsample(data, [r["label"] for r in tsum["top"]], THREAD_PLOT_POINTS)
+        thr_rows = "".join(
+            f'<tr><td>{html.escape(r["label"])}</td><td>{r["avg"]:.1f}</td><td>{r["p95"]:.1f}</td><td>{r["max"]:.1f}</td></tr>'
+            for r in tsum["top"])
+        proc_rows = "".join(
+            f'<tr><td>{html.escape(r["label"])}</td><td>{r["cpu_avg"]:.1f}</td><td>{r["pss_avg"]:,}</td><td>{r["pss_max"]:,}</td></tr>'
+            for r in tsum["procs"])
+        thr_html = (f'<h3>스레드/프로세스 상세 ({tsum["samples"]:,} 샘플, 스레드 {tsum["threads"]}개)</h3>\n'
+                    f'{_svg_stacked(ts, series)}\n'
+                    f'<table><tr><th>스레드</th><th>평균 %</th><th>P95 %</th><th>최대 %</th></tr>{thr_rows}</table>\n'
+                    f'<table><tr><th>프로세스</th><th>CPU 평균 %</th><th>PSS 평균 (KB)</th><th>PSS 최대 (KB)</th></tr>{proc_rows}</table>')
+    frm_html = ""
+    if frames:
+        fs, (t, dur, dl), fsum = frames
+        rows.insert(7, ("FRAME", f'jank {fsum["jank_pct"]:.1f}% ({fsum["jank"]:,}/{fsum["frames"]:,}) · '
+                                 f'P50/P90/P99 {fsum["p50"]:.1f}/{fsum["p90"]:.1f}/{fsum["p99"]:.1f}ms · frozen {fsum["frozen"]}'))
+        bt, _, bp = fs.jank_series(t, dur, dl)
+        spans = [dict(sp, t0=sp["start"], t1=sp["end"]) for sp in fs.slow_spans(t, dur, dl)]
+        step_rows = "".join(
+            f'<tr><td>{r["start"][11:]}</td><td>{html.escape(_truncate(r["label"], 60))}</td><td>{r["frames"]:,}</td>'
+            f'<td>{r["jank_pct"]:.1f}</td><td>{r["p50"]:.1f}</td><td>{r["p90"]:.1f}</td><td>{r["p99"]:.1f}</td></tr>'
+            for r in _worst_steps(fsum, FRAME_STEP_TOP * 2))
+        span_txt = ", ".join(f'{sp["start"][11:]}~{sp["end"][11:]} ({sp["jank_pct"]:.0f}%)'
+                             for sp in fsum["slow_spans"][:SPAN_LIST_MAX]) or "없음"
+        frm_html = (f'<h3>프레임 jank (느린 구간: {html.escape(span_txt)})</h3>\n{_svg_jank(bt, bp, spans)}\n'
+                    f'<table><tr><th>STEP 시작</th><th>STEP</th><th>프레임</th><th>jank %</th><th>P50 ms</th>'
+                    f'<th>P90 ms</th><th>P99 ms</th></tr>{step_rows or "<tr><td colspan=7>STEP 없음</td></tr>"}</table>')
+    color = "#c62828" if verdict["overall"] == "FAIL" else "#2e7d32"
+    doc = f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8"><title>Resource Report - {html.escape(summary_obj["file"])}</title>
+<style>body{{font-family:"Malgun Gothic",sans-serif;margin:16px;color:#222}}
+table{{border-collapse:collapse;margin-top:12px}}td,th{{border:1px solid #ddd;padding:4px 8px;text-align:left;font-size:13px}}
+th{{background:#f5f5f5}}.v{{color:{color};font-weight:bold}}</style></head><body>
+<h2>Resource Report - {html.escape(summary_obj["file"])} <span class="v">{verdict["overall"]}</span></h2>
+{_svg_timeseries(timestamps, cpu_values, mem_pss, cpu_idx, mem_idx, plot_spans, events_in)}
+<table>{"".join(f"<tr><th>{html.escape(k)}</th><td>{html.escape(v)}</td></tr>" for k, v in rows)}</table>
+<table><tr><th>시각</th><th>유형</th><th>레벨</th><th>내용</th></tr>{ev_rows or '<tr><td colspan="4">이벤트 없음</td></tr>'}</table>
+{frm_html}
+{thr_html}
+</body></html>
+"""
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(doc)
+
+
 # =========================
 # KPI 계산 및 리포트 생성
 #  - CSV/JSON 동시 생성
@@ -438,13 +759,13 @@ def parse_resource_log(file_path):
 #  - P95/최대·최소 주석, 범례 라벨
 #  - y축: 데이터+가이드라인 기준으로 산정(임계선 항상 보이기)
 # =========================
-def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
+def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path, serial=None, package=None):
     if not timestamps:
         messagebox.showerror("오류", "파싱된 데이터가 없습니다. 로그 포맷을 확인하세요.")
         return
     
     # ▶▶ 추가: 메타 추출
-    meta_pkg, meta_pid, meta_serial = _extract_meta_from_log(file_path)
+    meta_pkg, meta_pid, meta_serial = _extract_meta_from_log(file_path, serial, package)
 
     # 출력 경로들
     base = os.path.splitext(output_path)[0]
@@ -492,7 +813,7 @@ def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
             w = csv.writer(f)
             w.writerow(["timestamp", "cpu_percent", "mem_pss_kb"])
             for t, c, m in zip(timestamps, cpu_values, mem_pss):
-                w.writerow([t.strftime("%Y-%m-%d %H:%M:%S"), f"{c:.2f}", f"{int(m)}"])
+                w.writerow([str(t), f"{c:.2f}", f"{int(m)}"])   # str(datetime) == "%Y-%m-%d %H:%M:%S" (초 단위)
     except Exception as e:
         print(f"[WARN] CSV 저장 실패: {e}")
 
@@ -533,6 +854,10 @@ def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
     except Exception as e:
         print(f"[WARN] 이벤트 CSV 저장 실패: {e}")
 
+    # 스레드/프로세스 상세, 프레임 jank(있을 때만)
+    threads = _load_thread_breakdown(file_path, timestamps)
+    frames = _load_frames(file_path, timestamps, events_in)
+
     # JSON 저장(KPI + 이벤트 요약)
     try:
         summary_obj = {
@@ -567,15 +892,38 @@ def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
                 "by_type": {k: int(v) for k, v in ev_counts.items()}
             },
         }
+        if threads:
+            summary_obj["threads"] = dict(threads[2], files=threads[1]["files"])
+        if frames:
+            summary_obj["frames"] = frames[2]
         with open(json_path, "w", encoding="utf-8") as f:
             json.dump(summary_obj, f, ensure_ascii=False, indent=2)
     except Exception as e:
         print(f"[WARN] JSON 저장 실패: {e}")
 
+    # 플로팅용 다운샘플링(LTTB) — 샘플 수와 무관하게 렌더링 비용 일정
+    xs = [t.timestamp() for t in timestamps]
+    cpu_idx = _lttb(xs, cpu_values, PLOT_MAX_POINTS)
+    mem_idx = _lttb(xs, mem_pss, PLOT_MAX_POINTS)
+    plot_gap = (timestamps[-1] - timestamps[0]).total_seconds() / max(PLOT_MAX_POINTS, 1)
+    plot_spans = {k: _merge_spans_for_plot(v, timestamps, plot_gap) for k, v in (
+        ("cpu_warn", cpu_warn_spans), ("cpu_crit", cpu_crit_spans),
+        ("mem_warn", mem_warn_spans), ("mem_crit", mem_crit_spans))}
+
+    # 경량 HTML/SVG 리포트 (PDF보다 먼저 → 바로 열람 가능)
+    try:
+        _write_html_report(base + ".html", summary_obj, timestamps, cpu_values, mem_pss,
+                           cpu_idx, mem_idx, plot_spans, events_in, threads, frames)
+    except Exception as e:
+        print(f"[WARN] HTML 저장 실패: {e}")
+
     # PDF 생성
-    with PdfPages(pdf_path) as pdf:
+    _ensure_fonts()
+    # .part에 렌더링 후 교체 → 감시 측(gen_report)은 완성된 PDF만 봄
+    with PdfPages(pdf_path + ".part") as pdf:
         # --- 1) 시계열 그래프 ---
-        fig, ax1 = plt.subplots(figsize=(12, 5))
+        fig = _page_figure("timeseries", (12, 5))
+        ax1 = fig.subplots()
         ax1.grid(True, alpha=0.25)
         _set_time_ticks(ax1, timestamps)
         ax1.set_xlim(timestamps[0], timestamps[-1])
@@ -583,13 +931,15 @@ def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
         # CPU (좌축)
         ax1.set_xlabel("Timestamp")
         ax1.set_ylabel("CPU Usage (%)", color="tab:blue")
-        line_cpu, = ax1.plot(timestamps, cpu_values, label="CPU (%)", color="tab:blue", linewidth=2)
+        line_cpu, = ax1.plot([timestamps[i] for i in cpu_idx], [cpu_values[i] for i in cpu_idx],
+                             label="CPU (%)", color="tab:blue", linewidth=2)
         ax1.tick_params(axis='y', labelcolor="tab:blue")
 
         # MEM (우축)
         ax2 = ax1.twinx()
         ax2.set_ylabel("Memory PSS (KB)", color="tab:orange")
-        line_mem, = ax2.plot(timestamps, mem_pss, label="Memory PSS", color="tab:orange", linewidth=2)
+        line_mem, = ax2.plot([timestamps[i] for i in mem_idx], [mem_pss[i] for i in mem_idx],
+                             label="Memory PSS", color="tab:orange", linewidth=2)
         ax2.tick_params(axis='y', labelcolor="tab:orange")
 
         # ── 가이드라인(경고/임계/P95) + 범례 라벨 ──
@@ -606,14 +956,14 @@ def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
             mem_p95_line = ax2.axhline(mem_p95, color="tab:orange", linestyle="-.", linewidth=1, label="MEM P95")
 
         # ── 임계/경고 구간 음영(axvspan) ──
-        for s, e, _ in cpu_crit_spans:
+        for s, e, _ in plot_spans["cpu_crit"]:
             ax1.axvspan(timestamps[s], timestamps[e], color="tab:blue", alpha=0.12)
-        for s, e, _ in cpu_warn_spans:
+        for s, e, _ in plot_spans["cpu_warn"]:
             ax1.axvspan(timestamps[s], timestamps[e], color="tab:blue", alpha=0.06)
 
-        for s, e, _ in mem_crit_spans:
+        for s, e, _ in plot_spans["mem_crit"]:
             ax2.axvspan(timestamps[s], timestamps[e], color="tab:orange", alpha=0.12)
-        for s, e, _ in mem_warn_spans:
+        for s, e, _ in plot_spans["mem_warn"]:
             ax2.axvspan(timestamps[s], timestamps[e], color="tab:orange", alpha=0.06)
 
         # ── y축: 데이터 + 가이드라인을 모두 포함하도록 산정(임계선이 항상 보이게) ──
@@ -672,6 +1022,7 @@ def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
             elif typ == "ANR":   color, style, mark = ("purple","-.", "⛔")
             elif typ == "GC":    color, style, mark = ("gray", ":", "⚙")
             elif typ == "STEP":  color, style, mark = ("teal", ":", "🔖")
+            elif typ == "LEAK":  color, style, mark = ("red", "--", "💧")
             ax1.axvline(t, color=color, linestyle=style, alpha=0.5)
             ax1.text(t, ax1.get_ylim()[1], mark, ha="center", va="bottom", fontsize=10)
 
@@ -703,20 +1054,18 @@ def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
         # fig.tight_layout(rect=[0, 0.0, 1, 0.92])
 
         # 방법 B) 여백만 직접 늘리기(이미 tight_layout을 쓰는 경우 권장)
-        plt.subplots_adjust(top=0.88)
+        fig.subplots_adjust(top=0.88)
         # ========================================================================
 
         fig.tight_layout()
-        pdf.savefig()
-        plt.close(fig)
+        pdf.savefig(fig)
 
         # --- 2) KPI & 판정 페이지 ---
         def _fmt_spans(spans):
-            return "없음" if not spans else "; ".join(
-                [f"{timestamps[s].strftime('%H:%M:%S')}~{timestamps[e].strftime('%H:%M:%S')}({int(dt)}s)" for s, e, dt in spans]
-            )
+            return _fmt_spans_text(spans, timestamps)
 
-        fig, ax = plt.subplots(figsize=(12, 5))
+        fig = _page_figure("kpi", (12, 5))
+        ax = fig.subplots()
         fig.subplots_adjust(left=0.05, right=0.98, top=0.95, bottom=0.08)
         lines = []
         lines.append(f"📄 파일: {os.path.basename(file_path)}")
@@ -733,6 +1082,10 @@ def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
         lines.append(f"CPU  | max {cpu_max:.1f}%  avg {cpu_avg:.1f}%  p95 {cpu_p95:.1f}%")
         lines.append(f"MEM  | max {mem_max:,}KB  avg {int(mem_avg):,}KB  p95 {int(mem_p95):,}KB")
         lines.append(f"LEAK | 추세 기울기: {int(mem_slope):,} KB/분 (기준 {LEAK_SUSPECT_KB_PER_MIN:,} KB/분)")
+        if frames:
+            fsum = frames[2]
+            lines.append(f"FRAME | jank {fsum['jank_pct']:.1f}% ({fsum['jank']:,}/{fsum['frames']:,})  "
+                         f"P50/P90/P99 {fsum['p50']:.1f}/{fsum['p90']:.1f}/{fsum['p99']:.1f}ms  frozen {fsum['frozen']}")
         lines.append("")
         lines.append(f"⚠ CPU 경고 구간: {_fmt_spans(cpu_warn_spans)}")
         lines.append(f"🚨 CPU 임계 구간: {_fmt_spans(cpu_crit_spans)}")
@@ -744,26 +1097,26 @@ def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
             lines.append(f" - {note}")
 
         render_summary(ax, lines, fontsize=12, spacing=1.10, top=0.02, bottom=0.08)   # ← 한 줄씩 안전 배치
-        pdf.savefig()
-        plt.close(fig)
+        pdf.savefig(fig)
 
         # --- 3) 이벤트 타임라인 요약(최근 30건, 시간순) ---
         if events_in:
             # 높이를 키워 글자 겹침 방지
-            fig, ax = plt.subplots(figsize=(12, 6.2))
+            fig = _page_figure("events", (12, 6.2))
+            ax = fig.subplots()
 
             lines = []
             lines.append(
                 f"🧷 이벤트 요약: 총 {len(events_in)}건"
                 f" (ANR {ev_counts.get('ANR',0)}, CRASH {ev_counts.get('CRASH',0)}, "
-                f"GC {ev_counts.get('GC',0)}, STEP {ev_counts.get('STEP',0)})"
+                f"GC {ev_counts.get('GC',0)}, STEP {ev_counts.get('STEP',0)}, LEAK {ev_counts.get('LEAK',0)})"
             )
             lines.append("※ 아래 목록은 최근 30건(시간순) 기준입니다.")
             lines.append("")
 
             # 🔽 여기서 최신순으로 정렬
             for t, typ, detail, lvl in sorted(events_in, key=lambda x: x[0])[-30:]:
-                mark = {"CRASH":"💥","ANR":"⛔","GC":"⚙","STEP":"🔖"}.get(typ, "•")
+                mark = {"CRASH":"💥","ANR":"⛔","GC":"⚙","STEP":"🔖","LEAK":"💧"}.get(typ, "•")
                 lines.append(
                     f"{t.strftime('%H:%M:%S')} {mark} {typ} [{lvl}]  {_truncate(detail, 100)}"
                 )
@@ -774,8 +1127,67 @@ def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
             if len(lines) > 36: fs = 9
             render_summary(ax, lines, fontsize=fs, spacing=1.20)
 
-            pdf.savefig()
-            plt.close(fig)
+            pdf.savefig(fig)
+
+        # --- 4) 프레임 jank(gfx_*.csv 있을 때만) ---
+        if frames:
+            fs, (t, dur, dl), fsum = frames
+            fig = _page_figure("frames", (12, 7.5))
+            ax, ax_t = fig.subplots(2, 1, gridspec_kw={"height_ratios": [2, 3]})
+            bt, _, bp = fs.jank_series(t, dur, dl)
+            ax.fill_between([datetime.fromtimestamp(x) for x in bt], bp, step="post",
+                            color="tab:purple", alpha=0.7, linewidth=0)
+            for sp in fs.slow_spans(t, dur, dl):
+                ax.axvspan(datetime.fromtimestamp(sp["start"]), datetime.fromtimestamp(sp["end"]),
+                           color="tab:purple", alpha=0.12)
+            for te, typ, _, _ in events_in:
+                if typ == "STEP":
+                    ax.axvline(te, color="teal", linestyle=":", linewidth=0.8, alpha=0.6)
+            ax.set_ylim(0, 100)
+            ax.set_ylabel("Jank (%)")
+            ax.grid(True, alpha=0.25)
+            ax.set_title(f"🎞 프레임 jank (초 단위, {fsum['frames']:,} 프레임)")
+            ax.xaxis.set_major_formatter(DateFormatter("%H:%M:%S"))
+            lines = [f"전체 | jank {fsum['jank_pct']:.1f}%  P50/P90/P99 {fsum['p50']:.1f}/{fsum['p90']:.1f}/"
+                     f"{fsum['p99']:.1f}ms  최대 {fsum['max']:.0f}ms  frozen(>700ms) {fsum['frozen']}"]
+            span_txt = ", ".join(f"{sp['start'][11:]}~{sp['end'][11:]} ({sp['jank_pct']:.0f}%)"
+                                 for sp in fsum["slow_spans"][:SPAN_LIST_MAX])
+            if len(fsum["slow_spans"]) > SPAN_LIST_MAX:
+                span_txt += f" 외 {len(fsum['slow_spans']) - SPAN_LIST_MAX}건"
+            lines.append(f"느린 구간 | {span_txt or '없음'}")
+            lines.append("")
+            lines.append(f"STEP 구간별 (jank % 상위 {FRAME_STEP_TOP}) — 시작 · STEP · 프레임 · jank % · P90/P99 ms")
+            for r in _worst_steps(fsum, FRAME_STEP_TOP):
+                lines.append(f" - {r['start'][11:]}  {_truncate(r['label'], 50)}  {r['frames']:,}  "
+                             f"{r['jank_pct']:.1f}%  {r['p90']:.1f}/{r['p99']:.1f}")
+            render_summary(ax_t, lines, fontsize=9 if len(lines) > 14 else 10, spacing=1.10)
+            fig.subplots_adjust(left=0.07, right=0.97, top=0.94, bottom=0.02, hspace=0.18)
+            pdf.savefig(fig)
+
+        # --- 5) 스레드/프로세스 상세(breakdown_*.jsonl 있을 때만) ---
+        if threads:
+            bd, data, tsum = threads
+            fig = _page_figure("threads", (12, 7.5))
+            ax, ax_t = fig.subplots(2, 1, gridspec_kw={"height_ratios": [3, 2]})
+            ts, series = bd.downsample(data, [r["label"] for r in tsum["top"]], THREAD_PLOT_POINTS)
+            ax.stackplot([datetime.fromtimestamp(t) for t in ts], *series.values(),
+                         labels=list(series.keys()), alpha=0.85)
+            ax.grid(True, alpha=0.25)
+            ax.set_ylabel("CPU (%)")
+            ax.set_title(f"🧵 스레드별 CPU 누적 (top {THREAD_TOP_N} + 기타, {tsum['samples']:,} 샘플)")
+            ax.legend(loc="upper left", bbox_to_anchor=(1.01, 1.0), fontsize=8, framealpha=0.9)
+            ax.xaxis.set_major_formatter(DateFormatter("%H:%M:%S"))
+            lines = ["스레드 (평균 / P95 / 최대 %)"]
+            for r in tsum["top"]:
+                lines.append(f" - {_truncate(r['label'], 48)}: {r['avg']:.1f} / {r['p95']:.1f} / {r['max']:.1f}")
+            lines.append("")
+            lines.append("프로세스 (CPU 평균 % · PSS 평균 / 최대 KB)")
+            for r in tsum["procs"]:
+                lines.append(f" - {r['label']}: {r['cpu_avg']:.1f}% · {r['pss_avg']:,} / {r['pss_max']:,}")
+            render_summary(ax_t, lines, fontsize=9 if len(lines) > 14 else 10, spacing=1.10)
+            fig.subplots_adjust(left=0.07, right=0.78, top=0.94, bottom=0.02, hspace=0.18)
+            pdf.savefig(fig)
+    os.replace(pdf_path + ".part", pdf_path)
 
     # 자동 열기(Windows 등)
     # try:
@@ -794,13 +1206,81 @@ def generate_report(file_path, timestamps, cpu_values, mem_pss, output_path):
     # print(f"[OK] JSON: {json_path}")
 
 
+# --- 파싱 캐시(상주 워커용): 같은 파일(경로/크기/수정시각)은 재파싱 생략 ---
+_PARSE_CACHE = {}
+
+def _parse_cached(log_path):
+    st = os.stat(log_path)
+    key = (os.path.abspath(log_path), st.st_size, st.st_mtime)
+    hit = _PARSE_CACHE.get(key)
+    if hit is None:
+        _PARSE_CACHE.clear()
+        hit = _PARSE_CACHE[key] = parse_resource_log(log_path)
+    return hit
+
+
+def run_report(log_path, output_file=None, serial=None, package=None):
+    """
+    파싱 → 동적 임계치 → 리포트 생성 1회분. 반환: {"ok", "pdf", "html", "samples", "sec"}
+    serial/package: 작업 단위 단말/패키지 (상주 워커가 시작 시점 ENV의 단말로 고정되지 않도록)
+    """
+    t0 = time.time()
+    timestamps, cpu_values, mem_pss = _parse_cached(log_path)
+    if not timestamps:
+        return {"ok": False, "error": "파싱된 데이터가 없습니다. 로그 포맷을 확인하세요."}
+
+    # 🔄 동적 임계치 적용(ADB 연결 실패 시 기본값 유지)
+    if DYNAMIC_THRESHOLDS:
+        try:
+            apply_dynamic_thresholds(serial)
+        except Exception as e:
+            print(f"[WARN] 동적 임계치 설정 실패: {e}")
+
+    if not output_file:
+        ts_now = datetime.now().strftime("%y%m%d_%H%M")
+        output_file = os.path.join(os.path.dirname(log_path), f"resource_report_{ts_now}.pdf")
+
+    generate_report(log_path, timestamps, cpu_values, mem_pss, output_file, serial=serial, package=package)
+    base = os.path.splitext(output_file)[0]
+    return {"ok": True, "pdf": base + ".pdf", "html": base + ".html",
+            "samples": len(timestamps), "sec": round(time.time() - t0, 3)}
+
+
+def serve():
+    """
+    상주 워커 모드(--serve): stdin 한 줄 = JSON 작업 {"in": 로그경로, "out": 출력 prefix(선택), "serial", "package"(선택)}
+    → stdout 한 줄 = JSON 결과. matplotlib/폰트/Figure 템플릿/파싱 캐시를 작업 간 재사용.
+    """
+    out = sys.stdout
+    sys.stdout = sys.stderr      # 작업 중 print([QAGrad]/[WARN])가 결과 채널을 오염시키지 않도록
+    _ensure_fonts()
+    out.write(json.dumps({"ready": True}) + "\n"); out.flush()
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+            res = run_report(job["in"], job.get("out"), serial=job.get("serial"), package=job.get("package"))
+        except Exception as e:
+            res = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        out.write(json.dumps(res, ensure_ascii=False) + "\n"); out.flush()
+
+
 # --- [추가] 인자 파서 + 비대화형 경로 ---
 def main():
     ap = argparse.ArgumentParser(description="Resource Report Generator")
     ap.add_argument("-i", "--in", dest="in_path", help="입력 로그(resource_*.txt)")
     ap.add_argument("-o", "--out", dest="out_path", help="출력 파일 경로(prefix). 예: C:\\...\\resource_report_250904_1015.pdf")
+    ap.add_argument("--serial", default=None, help="대상 단말 시리얼(기본: ANDROID_SERIAL/ADB_SERIAL)")
+    ap.add_argument("--package", default=None, help="대상 패키지(로그에 [Package] 줄이 없을 때 표기용)")
+    ap.add_argument("--serve", action="store_true", help="상주 워커 모드(stdin JSON 작업 → stdout JSON 결과)")
     args = ap.parse_args()
 
+    if args.serve:
+        serve()
+        return
+
     if args.in_path:
         log_path = args.in_path
     else:
@@ -814,26 +1294,10 @@ def main():
             print("[Err] 로그 파일이 선택되지 않았습니다.")
             return
 
-    # 로그 파싱
-    timestamps, cpu_values, mem_pss = parse_resource_log(log_path)
-    if not timestamps:
-        print("[Err] 파싱된 데이터가 없습니다. 로그 포맷을 확인하세요.")
-        return
-
-    # 🔄 동적 임계치 적용(ADB 연결 실패 시 기본값 유지)
-    if DYNAMIC_THRESHOLDS:
-        try:
-            apply_dynamic_thresholds()
-        except Exception as e:
-            print(f"[WARN] 동적 임계치 설정 실패: {e}")
-
-    if args.out_path:
-        output_file = args.out_path  # 확장자는 내부 generate_report가 자동 부여
-    else:
-        ts_now = datetime.now().strftime("%y%m%d_%H%M")
-        output_file = os.path.join(os.path.dirname(log_path), f"resource_report_{ts_now}.pdf")
-
-    generate_report(log_path, timestamps, cpu_values, mem_pss, output_file)
+    # 파싱 → 임계치 → 리포트 (확장자는 내부 generate_report가 자동 부여)
+    res = run_report(log_path, args.out_path, serial=args.serial, package=args.package)
+    if not res["ok"]:
+        print(f"[Err] {res['error']}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,275 @@
+# ==========================================================
+# QA 자동화 공통 모듈
+# 👤 Author: Eden Kim
+# 📅 Date: 2026-02-11 - v1.0.6
+#   - 진행률 헬퍼 추가: parse_progress()
+#   - get_label() 함수 수정: index가 있을 경우 index 포함하여 출력
+#   - tap_color_words() 함수에 오류 발생 시 예외처리 진행 추가
+#   - 템플릿 매칭 개선 함수 추가: exists_strict_template(), pick_best_template()
+#   - Airtest 포터블 리포트 생성 추가: Airtest 없는 PC에서도 단독 실행
+#   - 리포트 첨부 파일 지원: Airtest 리포트 zip 압축 후 Google Drive 업로드 및 메일 전송 기능 추가
+#   - 템플릿 매칭 함수 수정: 컬러값 배제 후 매칭하는 옵션 추가하여 범용성 개선
+#   - Google Drive 관련 설정 QAEnv로 이관
+#   - use_env() 인자 없이도 가용하게끔 수정
+#   - tap_images() 중복처리 반경 수정
+#   - scrcpy 스트리밍 캡처 백엔드 추가: grab_frame() (화면 변화 판정용, snapshot 폴백)
+#   - 화면 변화/이동 감지기 FrameDiff 추가: tap_images/scroll_until_visible 이동 0 즉시 중단, _roi_changed 경량화
+#   - 이벤트 대기 추가: wait_until_any(), wait_screen_settled(), settled_after_change() (고정 sleep 대체)
+#   - UI 계층 스냅샷 캐시 추가: hierarchy_snapshot() (예외 규칙/대기 조건을 dump 1회로 일괄 평가)
+#   - 예외 규칙 세트 추가: ExceptionRuleSet (1회 구성/선택자 컴파일/규칙별 hit·비용 통계 → exception_stats.json)
+#   - 패키지 분리(core/adb/capture/ui/rules/scroll/vision/monitor/maildrive/reporting/accounts/flows) + 지연 로딩
+#     · Google Drive 클라이언트/SMTP/msvcrt/리포트 템플릿/Poco 드라이버는 사용 시점 import → 기동 시간 단축 (bench_import)
+#     · __all__은 스크립트용 핵심 API로 한정 → `from common import *`도 인프라/분석 모듈(trend/framestats 등)은 import 안 함
+#   - 구조화 이벤트 송신 추가: emit_event() (step/soft_fail/note/run_end → qa_orchestrator 실시간 집계)
+#   - 플로우 샤딩 추가: run_flows(QA_SHARD=1) 작업 요청 루프, shard.ShardQueue(work stealing)/merge_run_summaries()
+#   - 소요시간 이력 DB 추가: history.FlowHistory(SQLite) + 스케줄러(order_longest_first/estimate_eta/balance_shards)
+#   - 실패 증거 비동기화: evidence.capture_failure_evidence() (slice/report/메일 백그라운드 → 즉시 재시작, finalize_run에서 대기)
+#   - 실패 메일 다이제스트: digest.MailDigest (시그니처별 묶음/첨부 해시 중복 제거/SmtpSession 연결 재사용, --selftest)
+#   - 포터블 리포트 증분/병렬화: 정적 리소스 공유 캐시+hardlink, 스크린샷 병렬 복사/이동(move_logs), 경로 치환 단일 패스
+#   - 스크린샷 후처리 추가: shots.compact_airtest_log() (pHash 중복 제거/WebP·JPEG 재인코딩/썸네일/log.txt 참조 갱신)
+#   - 스트리밍 ZIP 추가: archive.zip_stream()/ZipPipe (확장자별 stored/deflate, 텍스트 병렬 압축, 업로드와 병행) → _zip_any 교체
+#   - Drive 업로드 매니저 추가: upload.UploadManager (자격 증명 캐시/청크 재개 업로드/지수 백오프/병렬/세션 저장, --selftest)
+#   - 계정 풀 백엔드 선택: QA_ACC_POOL_BACKEND=json|sqlite (SQLite WAL 행 단위 lease/TTL·renew_account/POSIX PID 확인, --bench)
+#   - 계정 lease heartbeat(기본 TTL 120초, 자동 연장) + acquire_account(timeout=...) FIFO 대기, 대기시간 기록(account_pool_stats)
+#     · 연장 실패 시 LeaseLostError(renew_account/check_account_lease), run_flows가 플로우마다 확인 후 중단
+#   - 단말 프로파일 캐시 추가: devprofile.get_device_profile() (시리얼+fingerprint 키, 디스크 저장 → QAEnv/리포트/모니터는 프로세스당 fingerprint 확인 1회)
+#     · 앱 버전은 QAEnv마다 dumpsys 1회 재조회, adb.install_apk()가 설치 직후 캐시 무효화
+#   - PID/포그라운드 감시 스트림 추가: procwatch.get_proc_watcher() (단말당 adb shell 1개, get_app_pid/is_app_in_foreground 등은 캐시 상태 우선)
+#     · 포그라운드(dumpsys) 조회는 get_foreground_package 등 요청이 있을 때만, 신선한 샘플 대기는 최대 1초
+#   - adb 스트림/1회성 실행 공용 헬퍼: adbstream.AdbShellStream (procwatch/breakdown/framestats), adb_run/adb_shell (leakwatch/devprofile)
+#   - 리소스 리포트 추세/회귀 탐지 추가: trend.run_trend() (result 이하 리포트·meta 열 지향 인덱스 → 앱 버전별 기준선 + HTML 대시보드)
+#   - 실시간 누수 감지/힙 덤프 추가: leakwatch.LeakDetector, leakwatch.dump_heap() (슬라이딩 윈도우 회귀 + CUSUM, hprof-conv 변환)
+#   - 스레드/프로세스 상세 샘플러 추가: breakdown.BreakdownSampler, load_breakdown() (/proc task 틱 차분 + 프로세스별 PSS)
+#   - 프레임 jank 샘플러 추가: framestats.FrameStatsSampler, frame_stats(), load_frames() (dumpsys gfxinfo framestats, NumPy 분석)
+#   - 스텝/헬퍼 프로파일러 추가: profiler.profiled, profile_span(), get_profiler(), helper_stats() (profile_trace.json, summary.html 지연 히스토그램)
+# ==========================================================
+#   - Airtest + Poco 기반 안드로이드 앱 자동화 공통 함수
+#   - 리소스 모니터링, 메일 발송, 안전 클릭/입력, 스크롤 등
+#   - Windows 전용 기능 포함 (파일 잠금 대기 등)
+#   - Python 3.7 이상 필요 (모듈 __getattr__ 지연 로딩)
+#   - Airtest 1.2.5 이상, Poco 1.0.86 이상 필요
+# ==========================================================
+#   - 사용법(기존과 동일): qa_common 폴더를 sys.path에 올린 뒤 `from common import *`
+#     (또는 Toolkit 기준 `from qa_common.common import *`)
+#   - 이름 접근 시 해당 서브모듈만 import (PEP 562 module __getattr__)
+# ==========================================================
+import importlib
+
+_SUBMODULES = ('core', 'adb', 'capture', 'ui', 'rules', 'scroll', 'vision', 'monitor', 'maildrive', 'reporting', 'digest', 'evidence', 'shots', 'archive', 'upload', 'accounts', 'flows',
+               'shard', 'history', 'devprofile', 'adbstream', 'procwatch', 'trend', 'leakwatch', 'breakdown', 'framestats', 'profiler')
+
+# 이름 → 정의(또는 재노출) 서브모듈
+_EXPORTS = {
+    # core
+    "Any": "core", "Callable": "core", "Dict": "core", "List": "core", "Optional": "core", "QAEnv": "core",
+    "ST": "core", "_CURRENT_ENV": "core", "_TOKEN_PATTERNS": "core", "_adb_exec": "core",
+    "_append_line": "core", "_collect_device_app_info": "core", "_env_bool": "core", "_env_int": "core",
+    "_exc_text": "core", "_guess_tools_dir_from_script_dir": "core", "_kst_now_iso": "core",
+    "_make_run_id": "core", "_normalize_status_from_msg": "core", "_result_root_dir": "core",
+    "_run_id_timestamp": "core", "_safe_mkdir": "core", "_sanitize_for_shell_log": "core",
+    "_write_json": "core", "adb_env": "core", "assert_equal": "core", "datetime": "core", "emit_event": "core", "event_request": "core",
+    "get_current_env": "core", "json": "core", "log": "core", "note": "core", "os": "core", "pathlib": "core",
+    "re": "core", "resolve_serial": "core", "set_current_env": "core", "snapshot": "core",
+    "soft_fail": "core", "step": "core", "subprocess": "core", "time": "core", "use_env": "core",
+    # adb
+    "Tuple": "adb", "_RES_CACHE": "adb", "_RES_CACHE_T": "adb", "_RES_TTL": "adb", "_RE_PAM_BEGIN": "adb",
+    "_RE_PAM_END": "adb", "_RE_PAM_PLAYERS": "adb", "_RE_PAM_PLAYER_CORE": "adb", "_TOP_PATTERNS": "adb",
+    "_UID_CACHE": "adb", "_connect_with_fallback": "adb", "_dumpsys_audio": "adb",
+    "_find_yosemite_ime_id": "adb", "_get_default_ime": "adb", "_get_package_uid_from_dumpsys": "adb",
+    "_get_resolution": "adb", "_list_ime_ids": "adb", "_parse_pam_players_current": "adb", "_pidof": "adb",
+    "connect_device": "adb", "current_device": "adb", "detect_top_component": "adb", "device": "adb",
+    "ensure_device": "adb", "ensure_yosemite_alive": "adb", "ensure_yosemite_ime": "adb",
+    "get_app_pid": "adb", "get_foreground_package": "adb", "install_apk": "adb", "is_app_in_foreground": "adb",
+    "is_app_running": "adb", "is_bgm_playing": "adb", "set_current": "adb",
+    # capture
+    "FrameDelta": "capture", "FrameDiff": "capture", "G": "capture", "Path": "capture",
+    "ScrcpyCapture": "capture", "_SCRCPY_CAPS": "capture", "_SCRCPY_DISABLED": "capture",
+    "_SCRCPY_LOCK": "capture", "_SCRCPY_REMOTE_PATH": "capture", "_SCRCPY_VERSION": "capture",
+    "_capture_backend": "capture", "_find_scrcpy_server": "capture", "_roi_changed": "capture",
+    "_xy_to_frame": "capture", "cv2": "capture", "frame_roi_score": "capture", "frame_roi_delta": "capture",
+    "get_scrcpy_capture": "capture", "grab_frame": "capture", "math": "capture", "np": "capture",
+    "socket": "capture", "stop_scrcpy_capture": "capture", "threading": "capture", "uuid": "capture",
+    # ui
+    "PocoFatalError": "ui", "PocoTargetTimeout": "ui", "Template": "ui", "_PocoProxy": "ui",
+    "_check_core": "ui", "_clamp_int": "ui", "_click_core": "ui", "_get_region_from_poco": "ui",
+    "_handle_socket_broken": "ui", "_is_poco_uia_fatal": "ui", "_normalize_region": "ui",
+    "_resolve_obj": "ui", "_resolve_position": "ui", "_translate_resource_id_selector": "ui",
+    "_type_core": "ui", "_xy_from_poco_center": "ui", "_xy_from_template_center": "ui",
+    "click_until_disappear": "ui", "drag_any_to_any": "ui", "get_label": "ui", "get_poco": "ui",
+    "install_poco_selector_autopatch": "ui", "keyevent": "ui", "must_check": "ui", "must_click": "ui",
+    "must_drag": "ui", "must_type": "ui", "obj_check": "ui", "poco": "ui", "poco_hard_reset": "ui",
+    "repeat_action_until_exists": "ui", "restart_app": "ui", "safe_click": "ui", "safe_type": "ui",
+    "start_app": "ui", "start_app_generic": "ui", "stop_app": "ui", "swipe": "ui", "text": "ui",
+    "try_check": "ui", "try_click": "ui", "try_drag_with_roi": "ui", "try_type": "ui", "wait": "ui",
+    # rules
+    "ExceptionRuleSet": "rules", "HierarchySnapshot": "rules", "Union": "rules", "_EXC_RULESETS": "rules",
+    "_HIER_MAX_AGE": "rules", "_INDEX_KEYS": "rules", "_QUERY_CACHE": "rules", "_as_condition": "rules",
+    "_batch_snapshot": "rules", "_compile_attr": "rules", "_compile_query": "rules", "_hier_frame": "rules",
+    "_hier_snapshot_fresh": "rules", "_normalize_conditions": "rules", "_sel_exists": "rules",
+    "_tag_cond": "rules", "act_back": "rules", "act_click": "rules", "act_send_text": "rules",
+    "act_sleep": "rules", "act_tap_ratio": "rules", "compile_query": "rules", "cond_exists": "rules",
+    "cond_exists_any": "rules", "cond_visible": "rules", "cond_visible_any": "rules", "contextlib": "rules",
+    "get_hierarchy_snapshot": "rules", "handle_expected_exceptions": "rules", "hierarchy_snapshot": "rules",
+    "invalidate_hierarchy": "rules", "is_enabled": "rules", "is_visible": "rules", "multi_act": "rules",
+    "save_exception_stats": "rules", "shell": "rules", "wait_screen_settled": "rules",
+    "wait_until_any": "rules", "settled_after_change": "rules",
+    # scroll
+    "_ANCHOR_CACHE": "scroll", "_IMAGE_ANCHOR_LAST_HIT": "scroll", "_IMAGE_ANCHOR_LAST_TRY": "scroll",
+    "_IMAGE_ANCHOR_THROTTLE_SEC": "scroll", "_abs_drag_points": "scroll", "_clamp": "scroll",
+    "_rel_drag_points": "scroll", "clear_anchor_cache": "scroll", "click_near_element": "scroll",
+    "drag_by_coords": "scroll", "drag_with_image_anchor": "scroll", "exists": "scroll",
+    "find_and_click": "scroll", "get_anchor_cache": "scroll", "must_find_click": "scroll",
+    "scroll_adb": "scroll", "scroll_global": "scroll", "scroll_once": "scroll",
+    "scroll_poco_container": "scroll", "scroll_until_visible": "scroll", "set_anchor_cache": "scroll",
+    "try_find_click": "scroll",
+    # vision
+    "TapNoEffectError": "vision", "_center_crop_to_aspect": "vision", "_color_gate_pass": "vision",
+    "_color_signature_score": "vision", "_crop_by_center": "vision", "_dedupe_points": "vision",
+    "_dist": "vision", "_find_all_template_safe": "vision", "_find_badge_rect_candidate": "vision",
+    "_find_color_word_in_crop": "vision", "_hamming64": "vision", "_map_xy_to_device_resolution": "vision",
+    "_maybe_wait_settle": "vision", "_ncc_same_size": "vision", "_phash_64": "vision", "_tap_xy": "vision",
+    "_to_gray": "vision", "_to_hsv": "vision", "_to_px_bounds": "vision", "_to_px_point": "vision",
+    "_verify_score": "vision", "drag_right_from_target": "vision", "exists_strict_template": "vision",
+    "find_all_template": "vision", "imread": "vision", "inspect": "vision", "pick_best_template": "vision",
+    "tap_color_words": "vision", "tap_images": "vision", "touch": "vision",
+    # monitor
+    "_find_resource_monitor_gui": "monitor", "_pick_ext_python": "monitor", "_trigger_flag": "monitor", "_wait_artifact": "monitor",
+    "_wait_file_closed_windows": "monitor", "cleanup_rolling_logs": "monitor", "ctypes": "monitor",
+    "gen_report": "monitor", "glob": "monitor", "save_log": "monitor", "shutil": "monitor",
+    "start_resource_monitor": "monitor", "stop_resource_monitor": "monitor", "sys": "monitor",
+    # maildrive
+    "_DRIVE_SCOPES": "maildrive", "_drive_set_permission_anyone": "maildrive",
+    "_get_drive_credentials": "maildrive", "_get_drive_service": "maildrive", "_split_emails": "maildrive", "_zip_any": "maildrive",
+    "drive_upload": "maildrive", "mail_env": "maildrive", "send_mail_smtp": "maildrive", "SmtpSession": "maildrive",
+    # reporting
+    "_overall_decision": "reporting", "_pick_overall_result": "reporting", "_summary_html_text": "reporting",
+    "build_portable_airtest_report": "reporting", "finalize_run": "reporting",
+    "find_latest_logcat_recent": "reporting", "tempfile": "reporting",
+    # digest
+    "LocalSmtpStandIn": "digest", "MailDigest": "digest", "close_mail_digest": "digest",
+    "failure_signature": "digest", "get_mail_digest": "digest",
+    # evidence
+    "EvidencePipeline": "evidence", "capture_failure_evidence": "evidence",
+    "get_evidence_pipeline": "evidence", "wait_evidence": "evidence",
+    # shots
+    "compact_airtest_log": "shots",
+    # archive
+    "ZipPipe": "archive", "pick_method": "archive", "zip_stream": "archive", "zip_to_file": "archive",
+    # upload
+    "LocalDriveStandIn": "upload", "UploadError": "upload", "UploadManager": "upload", "get_upload_manager": "upload",
+    # accounts
+    "_ACCOUNT_POOL_JSON": "accounts", "_ACCOUNT_POOL_LOCK": "accounts", "_ensure_paths": "accounts",
+    "_lease_rec_to_user": "accounts", "_load_pool": "accounts", "_lock_file": "accounts", "_now": "accounts",
+    "_pid_alive": "accounts", "_pid_alive_windows": "accounts", "_qa_common_accounts_root": "accounts", "_save_pool": "accounts",
+    "_sweep_stale_leases": "accounts", "_unlock_file": "accounts", "account_pool_stats": "accounts", "acquire_account": "accounts",
+    "check_account_lease": "accounts", "configure_account_pool": "accounts", "LeaseLostError": "accounts",
+    "release_account": "accounts", "renew_account": "accounts",
+    "set_account_pool": "accounts",
+    # flows
+    "parse_progress": "flows", "run_flow": "flows", "run_flows": "flows", "run_subflow": "flows",
+    "run_subflows": "flows", "step_block": "flows", "webbrowser": "flows",
+    # shard
+    "ShardQueue": "shard", "merge_run_summaries": "shard",
+    # history
+    "FlowHistory": "history", "balance_shards": "history", "estimate_eta": "history",
+    "order_longest_first": "history", "record_env_run": "history",
+    # devprofile
+    "get_device_profile": "devprofile", "invalidate_device_profile": "devprofile",
+    # adbstream
+    "AdbShellStream": "adbstream",
+    # procwatch
+    "ProcWatcher": "procwatch", "get_proc_watcher": "procwatch", "invalidate_proc_state": "procwatch",
+    "stop_proc_watchers": "procwatch",
+    # trend
+    "build_trend_index": "trend", "analyze_trends": "trend", "write_trend_dashboard": "trend",
+    "run_trend": "trend",
+    # leakwatch
+    "LeakDetector": "leakwatch", "dump_heap": "leakwatch",
+    # breakdown
+    "BreakdownSampler": "breakdown", "load_breakdown": "breakdown",
+    # framestats
+    "FrameStatsSampler": "framestats", "frame_stats": "framestats", "load_frames": "framestats",
+    # profiler
+    "profiled": "profiler", "profile_span": "profiler", "get_profiler": "profiler", "helper_stats": "profiler",
+}
+
+# 외부 라이브러리 이름 재노출(하위호환): 명시적으로 접근할 때만 import
+_EXTERNAL = {
+    "sleep": ("airtest.core.api", 'sleep'),
+    "hashlib": ("hashlib", None),
+    "PocoNoSuchNodeException": ("poco.exceptions", 'PocoNoSuchNodeException'),
+    "AndroidUiautomationPoco": ("poco.drivers.android.uiautomation", 'AndroidUiautomationPoco'),
+    "UnityPoco": ("poco.drivers.unity3d", 'UnityPoco'),
+    "simple_report": ("airtest.report.report", 'simple_report'),
+    "EmailMessage": ("email.message", 'EmailMessage'),
+    "smtplib": ("smtplib", None),
+    "mimetypes": ("mimetypes", None),
+    "msvcrt": ("msvcrt", None),
+    "wintypes": ("ctypes.wintypes", None),
+    "build": ("googleapiclient.discovery", 'build'),
+    "MediaFileUpload": ("googleapiclient.http", 'MediaFileUpload'),
+    "Credentials": ("google.oauth2.credentials", 'Credentials'),
+    "InstalledAppFlow": ("google_auth_oauthlib.flow", 'InstalledAppFlow'),
+    "Request": ("google.auth.transport.requests", 'Request'),
+}
+
+# 서브모듈에서 global 로 재바인딩되는 상태값 → 패키지에 캐시하지 않음(항상 원본 조회)
+_UNCACHED = {"_CURRENT_ENV", "_RES_CACHE", "_RES_CACHE_T", "_ACCOUNT_POOL_JSON", "_ACCOUNT_POOL_LOCK"}
+
+# `from common import *` 공개 목록 = 테스트 스크립트용 핵심 API만
+#   (core/adb/capture/ui/rules/scroll/vision/monitor/reporting/accounts/flows + airtest/표준 라이브러리 재노출)
+#   - 인프라 모듈(evidence/digest/shots/archive/upload/shard/history/devprofile/adbstream/procwatch/trend/leakwatch/
+#     breakdown/framestats/profiler)과 cv2/np/sleep 등 무거운·중복 이름은 제외 → `import *`가 해당 서브모듈을 끌어오지 않음
+#   - 제외된 이름도 `common.X` 접근 또는 `from common import X`로는 그대로 사용 가능(지연 로딩)
+__all__ = [
+    "account_pool_stats", "acquire_account", "act_back", "act_click", "act_send_text", "act_sleep", "act_tap_ratio",
+    "adb_env", "Any", "assert_equal", "build_portable_airtest_report", "Callable", "check_account_lease", "cleanup_rolling_logs",
+    "clear_anchor_cache", "click_near_element", "click_until_disappear", "compile_query", "cond_exists",
+    "cond_exists_any", "cond_visible", "cond_visible_any", "configure_account_pool", "connect_device", "contextlib",
+    "current_device", "datetime", "detect_top_component", "device", "Dict", "drag_any_to_any", "drag_by_coords",
+    "drag_right_from_target", "drag_with_image_anchor", "drive_upload", "emit_event", "ensure_device",
+    "ensure_yosemite_alive", "ensure_yosemite_ime", "event_request", "ExceptionRuleSet", "exists",
+    "exists_strict_template", "finalize_run", "find_and_click", "find_latest_logcat_recent", "frame_roi_score",
+    "FrameDelta", "FrameDiff", "G", "gen_report", "get_anchor_cache", "get_app_pid", "get_current_env",
+    "get_foreground_package", "get_hierarchy_snapshot", "get_label", "get_poco", "get_scrcpy_capture", "grab_frame",
+    "handle_expected_exceptions", "hierarchy_snapshot", "HierarchySnapshot", "install_apk", "install_poco_selector_autopatch",
+    "invalidate_hierarchy", "is_app_in_foreground", "is_app_running", "is_bgm_playing", "is_enabled", "is_visible",
+    "json", "keyevent", "LeaseLostError", "List", "log", "mail_env", "math", "multi_act", "must_check", "must_click", "must_drag",
+    "must_find_click", "must_type", "note", "obj_check", "Optional", "os", "parse_progress", "Path", "pathlib",
+    "pick_best_template", "poco", "poco_hard_reset", "PocoFatalError", "PocoNoSuchNodeException", "PocoTargetTimeout",
+    "QAEnv", "re", "release_account", "renew_account", "repeat_action_until_exists", "resolve_serial", "restart_app",
+    "run_flow", "run_flows", "run_subflow", "run_subflows", "safe_click", "safe_type", "save_exception_stats",
+    "save_log", "ScrcpyCapture", "scroll_adb", "scroll_global", "scroll_once", "scroll_poco_container",
+    "scroll_until_visible", "send_mail_smtp", "set_account_pool", "set_anchor_cache", "set_current",
+    "set_current_env", "settled_after_change", "shell", "shutil", "snapshot", "socket", "soft_fail", "ST",
+    "start_app", "start_app_generic", "start_resource_monitor", "step", "step_block", "stop_app",
+    "stop_resource_monitor", "stop_scrcpy_capture", "subprocess", "swipe", "sys", "tap_color_words", "tap_images",
+    "TapNoEffectError", "Template", "text", "threading", "time", "touch", "try_check", "try_click",
+    "try_drag_with_roi", "try_find_click", "try_type", "Tuple", "Union", "use_env", "wait", "wait_screen_settled",
+    "wait_until_any", "webbrowser",
+]
+
+
+def __getattr__(name: str):
+    mod = _EXPORTS.get(name)
+    if mod is not None:
+        value = getattr(importlib.import_module(f"{__name__}.{mod}"), name)
+    elif name in _EXTERNAL:
+        src, attr = _EXTERNAL[name]
+        m = importlib.import_module(src)
+        value = m if attr is None else getattr(m, attr)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in _UNCACHED:
+        globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_EXTERNAL))
+
+
+def load_all():
+    """모든 서브모듈 즉시 import (사전 워밍업/패키징 점검용)"""
+    for m in _SUBMODULES:
+        importlib.import_module(f"{__name__}.{m}")
@@ -0,0 +1,738 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 계정 풀 (백엔드 선택: JSON + file lock / SQLite WAL)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - QA_ACC_POOL_BACKEND=json(기본, 기존 파일 호환) | sqlite
+#     · json: 매 임대마다 전체 JSON 읽기/쓰기 + 파일 락(Windows msvcrt / POSIX fcntl)
+#     · sqlite: <pool>.db (WAL), 임대는 leases 행 1개 INSERT/DELETE → 다수 워커 동시 임대 시 대기열 짧음
+#       (DB가 비어 있고 같은 이름의 JSON 풀이 있으면 계정/비밀번호를 최초 1회 가져옴)
+#   - lease 만료(TTL): QA_ACC_LEASE_TTL초(기본 120), 임대한 프로세스가 TTL/3마다 자동 연장(heartbeat)
+#     → 비정상 종료한 워커의 계정은 TTL 안에 회수 (수동 정리/24h 대기 불필요)
+#     · 연장 실패(이미 만료/회수) → 경고 출력 + renew_account/check_account_lease가 LeaseLostError
+#       (run_flows가 플로우마다 확인 → 다른 워커와 같은 계정으로 로그인한 채 계속 진행하지 않음)
+#   - acquire_account(timeout=...): 빈 계정이 없으면 FIFO 대기열에서 대기, lease마다 대기시간 기록
+#     → account_pool_stats()로 대기 p50/p95 확인 후 풀 크기 산정
+#   - 죽은 프로세스 lease 정리: 같은 호스트의 PID 생존 확인(Windows OpenProcess / POSIX kill 0)
+#   - 경합 벤치마크: python -m common.accounts --bench --workers 16
+# ==========================================================
+import os, sys, time, pathlib, json, uuid, ctypes, socket, sqlite3, argparse, threading
+from typing import Optional, Tuple, List, Dict, Any
+
+
+# ==========================================================
+# 🗄️ Account Pool: JSON + file lock / SQLite WAL
+#  - configure_account_pool(): 전역 파일/락 경로 + 백엔드 설정
+#  - _load_pool() / _save_pool(): JSON 입출력
+#  - _sweep_stale_leases(): 만료/죽은 프로세스 lease 정리
+#  - _JsonPool / _SqlitePool: acquire/renew/release/set_accounts 공통 인터페이스
+# ==========================================================
+# --- [ADD/FIX] Account Pool: JSON + file lock (Py3.7+ 하위호환 타입힌트) ---
+# --- Account Pool (qa_common/_accounts) ------------------------
+
+def _now() -> float:
+    return time.time()
+
+def _pid_alive_windows(pid: int) -> bool:
+    try:
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        k32 = ctypes.windll.kernel32
+        k32.SetLastError(0)
+        h = k32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, int(pid))
+        if not h:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            if not k32.GetExitCodeProcess(h, ctypes.byref(code)):
+                return False
+            return code.value == STILL_ACTIVE
+        finally:
+            k32.CloseHandle(h)
+    except Exception:
+        return False
+
+def _pid_alive(pid: int) -> bool:
+    """같은 호스트 프로세스 생존 여부 (Windows/POSIX 공통)"""
+    if os.name == "nt":
+        return _pid_alive_windows(pid)
+    try:
+        os.kill(int(pid), 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True     # 다른 사용자 프로세스 → 살아 있음
+    except (OSError, ValueError, TypeError):
+        return False
+
+def _lease_rec_to_user(rec) -> str:
+    # leased 레코드가 str(구버전) 또는 dict(신버전) 모두 수용
+    return rec if isinstance(rec, str) else rec.get("user")
+
+def _sweep_stale_leases(pool: dict, max_age_sec: int = 24*3600) -> int:
+    """
+    만료(expires 경과)된 lease, 같은 호스트에서 프로세스가 죽었거나 너무 오래된 lease를 해제.
+    반환: 해제 개수
+    """
+    leased = pool.get("leased", {})
+    if not leased:
+        return 0
+    host = socket.gethostname()
+    to_free = []
+    now = _now()
+    for worker_id, rec in list(leased.items()):
+        if isinstance(rec, str):
+            # 구버전 포맷: 사용자만 문자열로 저장됨 → host/pid 정보 없어 age로만 판단
+            # 너무 오래된 경우만 정리 (보수적으로 24h 초과 시)
+            # → 메타 없음이라 바로 해제하기 부담되면 pass 하세요.
+            continue
+        w_host = rec.get("host")
+        pid = rec.get("pid")
+        ts = rec.get("ts", 0)
+        if rec.get("expires") and now > float(rec["expires"]):
+            to_free.append(worker_id)
+        elif w_host == host:
+            dead = (not isinstance(pid, int)) or (not _pid_alive(pid))
+            too_old = (now - float(ts) > max_age_sec)
+            if dead or too_old:
+                to_free.append(worker_id)
+    for w in to_free:
+        leased.pop(w, None)
+    return len(to_free)
+
+# 현재 프로세스에서 사용할 계정풀 파일/락 경로(전역)
+_ACCOUNT_POOL_JSON: Optional[str] = None
+_ACCOUNT_POOL_LOCK: Optional[str] = None
+_ACCOUNT_POOL_BACKEND: Optional[str] = None
+_POOL_IMPL: Optional[Any] = None
+LEASE_TTL_SEC = 120     # lease 기본 만료(초) — 살아 있는 프로세스는 heartbeat로 TTL/3마다 연장
+
+def _qa_common_accounts_root() -> str:
+    """qa_common/_accounts 폴더 절대 경로 보장"""
+    qa_common_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # qa_common/common/ → qa_common/
+    root = os.path.join(qa_common_dir, "_accounts")
+    pathlib.Path(root).mkdir(parents=True, exist_ok=True)
+    return root
+
+def configure_account_pool(pool_name: Optional[str] = None,
+                           pool_file: Optional[str] = None,
+                           backend: Optional[str] = None) -> Tuple[str, str]:
+    """
+    계정풀 파일 위치를 설정(앱/스크립트별 개별 JSON/DB).
+    모든 상대 경로는 qa_common/_accounts 기준으로 해석.
+    우선순위:
+      1) pool_file (절대/상대)  ← 상대면 qa_common/_accounts/<pool_file>
+      2) 환경변수 QA_ACC_POOL_FILE (절대 경로 권장)
+      3) pool_name (확장자 생략 가능) ← qa_common/_accounts/<pool_name>.json (sqlite면 .db)
+      4) 환경변수 QA_ACC_POOL_NAME
+      5) 기본값: qa_common/_accounts/account_pool.json
+    backend: json | sqlite (기본 QA_ACC_POOL_BACKEND 또는 json, pool_file 확장자가 .db면 sqlite)
+    반환: (풀 파일, 락 파일) — sqlite는 DB 자체가 락을 관리하므로 (db, db)
+    """
+    global _ACCOUNT_POOL_JSON, _ACCOUNT_POOL_LOCK, _ACCOUNT_POOL_BACKEND, _POOL_IMPL
+
+    env_pool_file = os.environ.get("QA_ACC_POOL_FILE")
+    use_file = pool_file or env_pool_file
+    backend = (backend or os.environ.get("QA_ACC_POOL_BACKEND") or "").strip().lower()
+    if not backend:
+        backend = "sqlite" if (use_file or "").lower().endswith((".db", ".sqlite")) else "json"
+    if backend not in ("json", "sqlite"):
+        raise ValueError(f"지원하지 않는 계정 풀 백엔드: {backend} (json | sqlite)")
+    ext = ".db" if backend == "sqlite" else ".json"
+
+    base = _qa_common_accounts_root()
+
+    if use_file:
+        json_path = use_file if os.path.isabs(use_file) else os.path.join(base, use_file)
+        json_path = os.path.abspath(json_path)
+        lock_path = json_path + ".lock"
+    else:
+        env_pool_name = os.environ.get("QA_ACC_POOL_NAME")
+        name = pool_name or env_pool_name or "account_pool"
+        if name.lower().endswith((".json", ".db")):
+            name = os.path.splitext(name)[0]
+        name += ext
+        json_path = os.path.join(base, name)
+        lock_path = os.path.join(base, name + ".lock")
+    if backend == "sqlite":
+        lock_path = json_path
+
+    _ACCOUNT_POOL_JSON = json_path
+    _ACCOUNT_POOL_LOCK = lock_path
+    _ACCOUNT_POOL_BACKEND = backend
+    _POOL_IMPL = None
+    return json_path, lock_path
+
+def _ensure_paths() -> Tuple[str, str]:
+    """설정되지 않았으면 기본값(account_pool.json)을 잡아준다."""
+    global _ACCOUNT_POOL_JSON, _ACCOUNT_POOL_LOCK
+    if not (_ACCOUNT_POOL_JSON and _ACCOUNT_POOL_LOCK):
+        configure_account_pool()  # 기본값으로 세팅
+    return _ACCOUNT_POOL_JSON, _ACCOUNT_POOL_LOCK  # type: ignore
+
+def _lock_file(lock_path: str):
+    fh = open(lock_path, "a+b")
+    if os.name == "nt":
+        import msvcrt  # Windows 전용 → 계정 풀 사용 시점에만 import
+        msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+    return fh
+
+def _unlock_file(fh):
+    try:
+        if os.name == "nt":
+            import msvcrt
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+    finally:
+        fh.close()
+
+def _load_pool(json_path: str) -> dict:
+    if not os.path.exists(json_path):
+        return {"accounts": [], "secrets": {}, "leased": {}}
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            d = json.load(f) or {}
+        d.setdefault("accounts", []); d.setdefault("secrets", {}); d.setdefault("leased", {})
+        return d
+    except Exception:
+        return {"accounts": [], "secrets": {}, "leased": {}}
+
+def _save_pool(json_path: str, data: dict):
+    tmp = json_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, json_path)
+
+def _lease_ttl() -> int:
+    # core(airtest) import 없이 읽음 → 계정 풀만 쓰는 런처/벤치마크도 가볍게 동작
+    try:
+        return max(3, int(os.environ.get("QA_ACC_LEASE_TTL") or LEASE_TTL_SEC))
+    except ValueError:
+        return LEASE_TTL_SEC
+
+
+_WAITER_STALE_SEC = 15.0    # 대기열 갱신이 이 시간 이상 없으면 떠난 것으로 간주
+_LEASE_LOG_MAX = 100        # 대기시간 기록 보관 개수 (JSON은 매 임대마다 전체 재기록 → 작게 유지)
+
+
+class _JsonPool:
+    """기존 JSON + 파일 락 백엔드 (파일 포맷/동작 호환, waiters/lease_log 키 추가)"""
+
+    def __init__(self, json_path: str, lock_path: str):
+        self.json_path, self.lock_path = json_path, lock_path
+
+    def set_accounts(self, accounts: List[Tuple[str, str]]):
+        lk = _lock_file(self.lock_path)
+        try:
+            pool = _load_pool(self.json_path)
+            for uid, pw in accounts:
+                if uid not in pool["accounts"]:
+                    pool["accounts"].append(uid)
+                pool["secrets"][uid] = pw
+            _save_pool(self.json_path, pool)
+        finally:
+            _unlock_file(lk)
+
+    @staticmethod
+    def _sweep_waiters(waiters: dict, now: float) -> None:
+        host = socket.gethostname()
+        for w, rec in list(waiters.items()):
+            if now - float(rec.get("seen", 0)) > _WAITER_STALE_SEC or \
+                    (rec.get("host") == host and not _pid_alive(rec.get("pid"))):
+                waiters.pop(w, None)
+
+    def acquire(self, worker_id: str, ttl: int, *, waiting: bool = False,
+                wait_sec: float = 0.0) -> Optional[Tuple[str, Optional[str]]]:
+        lk = _lock_file(self.lock_path)
+        try:
+            pool = _load_pool(self.json_path)
+            leased = pool.setdefault("leased", {})
+            waiters = pool.setdefault("waiters", {})
+            now = _now()
+
+            # 이미 같은 워커가 있다면 그대로 재사용(만료 연장)
+            if worker_id in leased:
+                rec = leased[worker_id]
+                if isinstance(rec, dict):
+                    rec["expires"] = now + ttl
+                    _save_pool(self.json_path, pool)
+                uid = _lease_rec_to_user(rec)
+                return uid, pool["secrets"].get(uid)
+
+            # ✅ 구버전/이전 실행 잔여 lease + 떠난 대기자 정리
+            _sweep_stale_leases(pool)
+            self._sweep_waiters(waiters, now)
+
+            # FIFO: 내 앞 대기자 수 < 빈 계정 수일 때만 임대 (대기열 밖 요청은 맨 뒤 취급)
+            if waiting:
+                me = waiters.setdefault(worker_id, {"seq": int(pool.get("next_seq", 0)),
+                                                    "host": socket.gethostname(), "pid": os.getpid(), "since": now})
+                pool["next_seq"] = max(int(pool.get("next_seq", 0)), me["seq"] + 1)
+                me["seen"] = now
+                rank = sum(1 for r in waiters.values() if r["seq"] < me["seq"])
+            else:
+                rank = len(waiters)
+            inuse = set(_lease_rec_to_user(v) for v in leased.values())
+            free = [uid for uid in pool.get("accounts", []) if uid not in inuse]
+
+            if rank < len(free):
+                uid = free[0]
+                # ✅ 임대 메타데이터 저장(호스트/프로세스/시각/만료/대기시간)
+                leased[worker_id] = {
+                    "user": uid,
+                    "host": socket.gethostname(),
+                    "pid": os.getpid(),
+                    "ts": now,
+                    "expires": now + ttl,
+                    "wait_sec": round(wait_sec, 3),
+                }
+                waiters.pop(worker_id, None)
+                log = pool.setdefault("lease_log", [])
+                log.append({"user": uid, "worker_id": worker_id, "ts": now, "wait_sec": round(wait_sec, 3)})
+                del log[:-_LEASE_LOG_MAX]
+                _save_pool(self.json_path, pool)
+                return uid, pool["secrets"].get(uid)
+            _save_pool(self.json_path, pool)
+            return None
+        finally:
+            _unlock_file(lk)
+
+    def leave_queue(self, worker_id: str):
+        lk = _lock_file(self.lock_path)
+        try:
+            pool = _load_pool(self.json_path)
+            if pool.get("waiters", {}).pop(worker_id, None) is not None:
+                _save_pool(self.json_path, pool)
+        finally:
+            _unlock_file(lk)
+
+    def renew(self, worker_id: str, ttl: int) -> bool:
+        lk = _lock_file(self.lock_path)
+        try:
+            pool = _load_pool(self.json_path)
+            rec = pool.get("leased", {}).get(worker_id)
+            if not isinstance(rec, dict):
+                return rec is not None
+            rec["expires"] = _now() + ttl
+            _save_pool(self.json_path, pool)
+            return True
+        finally:
+            _unlock_file(lk)
+
+    def release(self, worker_id: str):
+        lk = _lock_file(self.lock_path)
+        try:
+            pool = _load_pool(self.json_path)
+            if worker_id in pool.get("leased", {}):
+                pool["leased"].pop(worker_id, None)
+                _save_pool(self.json_path, pool)
+        finally:
+            _unlock_file(lk)
+
+    def stats(self) -> Dict[str, Any]:
+        lk = _lock_file(self.lock_path)
+        try:
+            pool = _load_pool(self.json_path)
+        finally:
+            _unlock_file(lk)
+        leased = {w: r for w, r in pool.get("leased", {}).items() if isinstance(r, dict)}
+        return {"accounts": len(pool.get("accounts", [])), "leased": len(pool.get("leased", {})),
+                "waiting": len(pool.get("waiters", {})),
+                "leases": [dict(r, worker_id=w) for w, r in leased.items()],
+                "waits": [float(x.get("wait_sec", 0)) for x in pool.get("lease_log", [])]}
+
+
+class _SqlitePool:
+    """
+    SQLite WAL 백엔드.
+    - accounts(user, secret, ord) / leases(user PK, worker_id UNIQUE, host, pid, ts, expires, wait_sec)
+    - waiters(worker_id PK, seq, host, pid, since, seen): 블로킹 임대 FIFO 대기열
+    - lease_log(user, worker_id, ts, wait_sec): 임대별 대기시간 (풀 크기 산정용)
+    - 임대 = 빈 계정 1행 INSERT (user PK가 중복 임대 차단), 반납 = 1행 DELETE
+    - 쓰기 트랜잭션(BEGIN IMMEDIATE)은 행 몇 개만 다루므로 수 ms 이내 → 파일 전체 재기록 없음
+    - 연결은 스레드별 1개 재사용
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS accounts (user TEXT PRIMARY KEY, secret TEXT, ord INTEGER NOT NULL);
+    CREATE TABLE IF NOT EXISTS leases (
+        user TEXT PRIMARY KEY REFERENCES accounts(user) ON DELETE CASCADE,
+        worker_id TEXT NOT NULL UNIQUE, host TEXT, pid INTEGER, ts REAL, expires REAL, wait_sec REAL DEFAULT 0);
+    CREATE INDEX IF NOT EXISTS ix_leases_expires ON leases(expires);
+    CREATE TABLE IF NOT EXISTS waiters (
+        worker_id TEXT PRIMARY KEY, seq INTEGER NOT NULL, host TEXT, pid INTEGER, since REAL, seen REAL);
+    CREATE INDEX IF NOT EXISTS ix_waiters_seq ON waiters(seq);
+    CREATE TABLE IF NOT EXISTS lease_log (user TEXT, worker_id TEXT, ts REAL, wait_sec REAL);
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._host = socket.gethostname()
+        self._import_json_once()
+
+    def _conn(self) -> sqlite3.Connection:
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            c = sqlite3.connect(self.db_path, timeout=60, isolation_level=None, check_same_thread=False)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            c.execute("PRAGMA busy_timeout=60000")
+            c.executescript(self._SCHEMA)
+            cols = [r[1] for r in c.execute("PRAGMA table_info(leases)")]
+            if "wait_sec" not in cols:      # 이전 버전 DB
+                c.execute("ALTER TABLE leases ADD COLUMN wait_sec REAL DEFAULT 0")
+            self._local.conn = c
+        return c
+
+    def _tx(self):
+        c = self._conn()
+        c.execute("BEGIN IMMEDIATE")
+        return c
+
+    def _import_json_once(self):
+        """DB가 비어 있으면 같은 이름의 JSON 풀에서 계정/비밀번호 가져오기 (lease는 가져오지 않음)"""
+        src = os.path.splitext(self.db_path)[0] + ".json"
+        c = self._conn()
+        if not os.path.exists(src) or c.execute("SELECT 1 FROM accounts LIMIT 1").fetchone():
+            return
+        pool = _load_pool(src)
+        if pool.get("accounts"):
+            self.set_accounts([(u, pool["secrets"].get(u)) for u in pool["accounts"]])
+
+    def set_accounts(self, accounts: List[Tuple[str, str]]):
+        c = self._tx()
+        try:
+            base = c.execute("SELECT COALESCE(MAX(ord), -1) + 1 FROM accounts").fetchone()[0]
+            for i, (uid, pw) in enumerate(accounts):
+                c.execute("INSERT INTO accounts(user, secret, ord) VALUES (?, ?, ?) "
+                          "ON CONFLICT(user) DO UPDATE SET secret=excluded.secret", (uid, pw, base + i))
+            c.execute("COMMIT")
+        except BaseException:
+            c.execute("ROLLBACK")
+            raise
+
+    def _sweep(self, c: sqlite3.Connection, now: float) -> int:
+        n = c.execute("DELETE FROM leases WHERE expires < ?", (now,)).rowcount
+        dead = [w for w, pid in c.execute("SELECT worker_id, pid FROM leases WHERE host = ?", (self._host,))
+                if not isinstance(pid, int) or not _pid_alive(pid)]
+        for w in dead:
+            c.execute("DELETE FROM leases WHERE worker_id = ?", (w,))
+        return n + len(dead)
+
+    def _sweep_waiters(self, c: sqlite3.Connection, now: float):
+        c.execute("DELETE FROM waiters WHERE seen < ?", (now - _WAITER_STALE_SEC,))
+        dead = [w for w, pid in c.execute("SELECT worker_id, pid FROM waiters WHERE host = ?", (self._host,))
+                if not _pid_alive(pid)]
+        for w in dead:
+            c.execute("DELETE FROM waiters WHERE worker_id = ?", (w,))
+
+    def _free(self, c: sqlite3.Connection) -> int:
+        return c.execute("SELECT COUNT(*) FROM accounts a "
+                         "WHERE NOT EXISTS (SELECT 1 FROM leases l WHERE l.user = a.user)").fetchone()[0]
+
+    def _grab(self, c: sqlite3.Connection, worker_id: str, ttl: int, now: float, wait_sec: float):
+        c.execute("INSERT INTO leases(user, worker_id, host, pid, ts, expires, wait_sec) "
+                  "SELECT a.user, ?, ?, ?, ?, ?, ? FROM accounts a "
+                  "WHERE NOT EXISTS (SELECT 1 FROM leases l WHERE l.user = a.user) ORDER BY a.ord LIMIT 1",
+                  (worker_id, self._host, os.getpid(), now, now + ttl, round(wait_sec, 3)))
+        row = c.execute("SELECT l.user, a.secret FROM leases l JOIN accounts a ON a.user = l.user "
+                        "WHERE l.worker_id = ?", (worker_id,)).fetchone()
+        if row:
+            c.execute("DELETE FROM waiters WHERE worker_id = ?", (worker_id,))
+            c.execute("INSERT INTO lease_log(user, worker_id, ts, wait_sec) VALUES (?, ?, ?, ?)",
+                      (row[0], worker_id, now, round(wait_sec, 3)))
+        return row
+
+    def acquire(self, worker_id: str, ttl: int, *, waiting: bool = False,
+                wait_sec: float = 0.0) -> Optional[Tuple[str, Optional[str]]]:
+        c = self._tx()
+        try:
+            now = _now()
+            row = c.execute("SELECT l.user, a.secret FROM leases l JOIN accounts a ON a.user = l.user "
+                            "WHERE l.worker_id = ?", (worker_id,)).fetchone()
+            if row:
+                c.execute("UPDATE leases SET expires = ? WHERE worker_id = ?", (now + ttl, worker_id))
+                c.execute("COMMIT")
+                return tuple(row)
+
+            self._sweep_waiters(c, now)
+            if waiting:
+                c.execute("INSERT INTO waiters(worker_id, seq, host, pid, since, seen) "
+                          "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ?, ? FROM waiters WHERE 1 "
+                          "ON CONFLICT(worker_id) DO UPDATE SET seen = excluded.seen",
+                          (worker_id, self._host, os.getpid(), now, now))
+                rank = c.execute("SELECT COUNT(*) FROM waiters WHERE seq < "
+                                 "(SELECT seq FROM waiters WHERE worker_id = ?)", (worker_id,)).fetchone()[0]
+            else:
+                rank = c.execute("SELECT COUNT(*) FROM waiters").fetchone()[0]
+
+            free = self._free(c)
+            if free <= rank and self._sweep(c, now):
+                # 빈 계정이 모자랄 때만 만료/죽은 lease 정리 (PID 확인 비용 절감)
+                free = self._free(c)
+            row = self._grab(c, worker_id, ttl, now, wait_sec) if rank < free else None
+            c.execute("COMMIT")
+            return tuple(row) if row else None
+        except BaseException:
+            c.execute("ROLLBACK")
+            raise
+
+    def leave_queue(self, worker_id: str):
+        self._conn().execute("DELETE FROM waiters WHERE worker_id = ?", (worker_id,))
+
+    def renew(self, worker_id: str, ttl: int) -> bool:
+        c = self._conn()
+        return c.execute("UPDATE leases SET expires = ? WHERE worker_id = ?",
+                         (_now() + ttl, worker_id)).rowcount > 0
+
+    def release(self, worker_id: str):
+        self._conn().execute("DELETE FROM leases WHERE worker_id = ?", (worker_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        c = self._conn()
+        cols = ("user", "worker_id", "host", "pid", "ts", "expires", "wait_sec")
+        return {"accounts": c.execute("SELECT COUNT(*) FROM accounts").fetchone()[0],
+                "leased": c.execute("SELECT COUNT(*) FROM leases").fetchone()[0],
+                "waiting": c.execute("SELECT COUNT(*) FROM waiters").fetchone()[0],
+                "leases": [dict(zip(cols, r)) for r in c.execute(f"SELECT {', '.join(cols)} FROM leases")],
+                "waits": [r[0] for r in c.execute("SELECT wait_sec FROM lease_log ORDER BY ts DESC LIMIT ?",
+                                                  (_LEASE_LOG_MAX,))]}
+
+
+def _pool():
+    """설정된 백엔드 인스턴스 (configure_account_pool 호출 시 재생성)"""
+    global _POOL_IMPL
+    json_path, lock_path = _ensure_paths()
+    if _POOL_IMPL is None:
+        _POOL_IMPL = _SqlitePool(json_path) if _ACCOUNT_POOL_BACKEND == "sqlite" else _JsonPool(json_path, lock_path)
+    return _POOL_IMPL
+
+
+class LeaseLostError(RuntimeError):
+    """임대한 계정의 lease가 만료/회수됨 → 다른 워커가 같은 계정을 받았을 수 있음"""
+
+
+class _Heartbeat:
+    """
+    이 프로세스가 가진 lease를 TTL/3 간격으로 자동 연장 (daemon 스레드 1개).
+    프로세스가 죽으면 연장이 멈춰 TTL 안에 다른 워커가 계정을 가져감.
+    """
+
+    def __init__(self):
+        self.workers: Dict[str, Any] = {}       # worker_id → 백엔드
+        self.lost: List[str] = []               # 연장 실패(이미 만료/회수) worker_id
+        self._cv = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, worker_id: str, backend):
+        with self._cv:
+            self.workers[worker_id] = backend
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="qa-acc-heartbeat", daemon=True)
+                self._thread.start()
+            self._cv.notify_all()
+
+    def remove(self, worker_id: str):
+        with self._cv:
+            self.workers.pop(worker_id, None)
+
+    def _loop(self):
+        while True:
+            ttl = _lease_ttl()
+            with self._cv:
+                self._cv.wait(max(1.0, ttl / 3.0))
+                items = list(self.workers.items())
+            for w, be in items:
+                try:
+                    if not be.renew(w, ttl):
+                        self.mark_lost(w)
+                except Exception:
+                    pass        # 일시 오류 → 다음 주기에 재시도 (TTL/3 간격이라 2번 더 기회 있음)
+
+    def mark_lost(self, worker_id: str):
+        with self._cv:
+            self.workers.pop(worker_id, None)
+            if worker_id in self.lost:
+                return
+            self.lost.append(worker_id)
+        print(f"[WARN] [ACCT] lease 연장 실패(만료/회수됨): worker={worker_id} "
+              f"→ 다른 워커가 같은 계정을 받을 수 있음, 다음 플로우 전에 중단", file=sys.stderr, flush=True)
+
+    def forget(self, worker_id: str):
+        with self._cv:
+            if worker_id in self.lost:
+                self.lost.remove(worker_id)
+
+
+_HEARTBEAT = _Heartbeat()
+
+def set_account_pool(accounts: List[str]) -> Tuple[str, str]:
+    """
+    계정 목록을 등록/갱신. accounts: ["id1:pw1","id2:pw2", ...]
+    반환: (json_path, lock_path) — 디버그/로그용
+    """
+    pairs = [tuple(a.split(":", 1)) for a in accounts if a and ":" in a]
+    _pool().set_accounts(pairs)
+    return _ensure_paths()
+
+def acquire_account(worker_id: Optional[str] = None, timeout: Optional[float] = 0,
+                    heartbeat: bool = True) -> Tuple[str, str, Optional[str]]:
+    """
+    계정 임대. 반환: (worker_id, user, pass)
+    동일 worker_id가 다시 호출되면 같은 계정을 재할당(루프 동안 고정, lease 만료 시각도 연장).
+    - timeout: 0=즉시(빈 계정 없으면 예외, 기존 동작), None=무기한 대기, 초=최대 대기
+      대기 중인 워커는 FIFO 순서로 계정을 받음 (다른 프로세스/PC 포함, 같은 풀 파일 기준)
+    - heartbeat: lease를 백그라운드에서 자동 연장 (QA_ACC_LEASE_TTL/3 간격)
+    - lease에 대기시간(wait_sec)이 기록됨 → account_pool_stats()로 풀 크기 산정
+    """
+    worker_id = worker_id or str(uuid.uuid4())
+    be = _pool()
+    ttl = _lease_ttl()
+    t0 = time.time()
+    got = be.acquire(worker_id, ttl)
+    if got is None and timeout != 0:
+        deadline = None if timeout is None else t0 + float(timeout)
+        delay = 0.05
+        try:
+            while got is None:
+                got = be.acquire(worker_id, ttl, waiting=True, wait_sec=time.time() - t0)
+                if got is not None:
+                    break
+                if deadline is not None and time.time() >= deadline:
+                    break
+                left = None if deadline is None else deadline - time.time()
+                time.sleep(delay if left is None else max(0.0, min(delay, left)))
+                delay = min(0.5, delay * 1.5)
+        finally:
+            if got is None:
+                be.leave_queue(worker_id)
+    if got is None:
+        waited = f" ({time.time() - t0:.1f}s 대기)" if timeout != 0 else ""
+        raise RuntimeError(f"사용 가능한 계정이 없습니다.{waited}")
+    _HEARTBEAT.forget(worker_id)     # 다시 임대 성공 → 이전 유실 기록 해제
+    if heartbeat:
+        _HEARTBEAT.add(worker_id, be)
+    return worker_id, got[0], got[1]
+
+def renew_account(worker_id: str) -> bool:
+    """lease 만료 시각 연장(heartbeat). 이미 해제/만료/회수되어 없으면 LeaseLostError"""
+    if worker_id in _HEARTBEAT.lost or not _pool().renew(worker_id, _lease_ttl()):
+        _HEARTBEAT.mark_lost(worker_id)
+        raise LeaseLostError(f"계정 lease 유실: worker={worker_id} (만료/회수됨 → acquire_account로 재임대 필요)")
+    return True
+
+def check_account_lease(worker_id: Optional[str] = None) -> None:
+    """
+    heartbeat가 연장에 실패한 lease가 있으면 LeaseLostError (worker_id=None: 이 프로세스의 모든 lease).
+    run_flows가 플로우 실행 전에 호출 → 유실된 계정으로 계속 진행하지 않음.
+    """
+    lost = list(_HEARTBEAT.lost)
+    if worker_id is not None:
+        lost = [w for w in lost if w == worker_id]
+    if lost:
+        raise LeaseLostError(f"계정 lease 유실: worker={', '.join(lost)} (만료/회수됨 → 다른 워커와 로그인 공유 가능)")
+
+def release_account(worker_id: str) -> None:
+    """임대한 계정 반납(테스트 종료 시 호출 권장)"""
+    _HEARTBEAT.remove(worker_id)
+    _HEARTBEAT.forget(worker_id)
+    _pool().release(worker_id)
+
+def account_pool_stats() -> Dict[str, Any]:
+    """
+    풀 현황 + 최근 임대 대기시간 분포.
+    반환: {accounts, leased, waiting, leases:[...], wait_p50, wait_p95, wait_max, samples}
+    """
+    st = _pool().stats()
+    waits = sorted(st.pop("waits"))
+    n = len(waits)
+    st.update({"samples": n,
+               "wait_p50": waits[n // 2] if n else 0.0,
+               "wait_p95": waits[min(n - 1, int(n * 0.95))] if n else 0.0,
+               "wait_max": waits[-1] if n else 0.0})
+    return st
+
+
+# ==========================================================
+# 경합 벤치마크: 워커 프로세스 N개가 임대/반납 반복 → 처리량/대기 지연 비교
+# ==========================================================
+def _bench_worker(backend: str, path: str, rounds: int, hold: float, q) -> None:
+    configure_account_pool(pool_file=path, backend=backend)
+    lat: List[float] = []
+    wid = f"bench-{os.getpid()}"
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        acquire_account(wid, timeout=None, heartbeat=False)
+        lat.append(time.perf_counter() - t0)
+        if hold:
+            time.sleep(hold)
+        release_account(wid)
+    q.put(lat)
+
+
+def bench(workers: int = 16, rounds: int = 50, accounts: Optional[int] = None, hold: float = 0.0,
+          backends: Tuple[str, ...] = ("json", "sqlite")) -> Dict[str, Dict[str, Any]]:
+    """
+    backend별 경합 측정 (임시 폴더, 계정 수 기본 = workers).
+    반환: {backend: {ops_per_sec, p50_ms, p95_ms, max_ms, sec}}  (계정 부족 시 FIFO 블로킹 대기 포함)
+    """
+    import multiprocessing as mp, tempfile, shutil
+    accounts = accounts or workers
+    out: Dict[str, Dict[str, Any]] = {}
+    tmp = tempfile.mkdtemp(prefix="qa_acc_bench_")
+    try:
+        for be in backends:
+            path = os.path.join(tmp, f"bench_pool.{'db' if be == 'sqlite' else 'json'}")
+            configure_account_pool(pool_file=path, backend=be)
+            set_account_pool([f"user{i:03d}:pw{i}" for i in range(accounts)])
+            q = mp.Queue()
+            procs = [mp.Process(target=_bench_worker, args=(be, path, rounds, hold, q)) for _ in range(workers)]
+            t0 = time.perf_counter()
+            for p in procs:
+                p.start()
+            res = [q.get() for _ in procs]
+            for p in procs:
+                p.join()
+            sec = time.perf_counter() - t0
+            lat = sorted(x for r in res for x in r)
+            out[be] = {
+                "ops_per_sec": round(len(lat) / sec, 1),
+                "p50_ms": round(lat[len(lat) // 2] * 1000, 2),
+                "p95_ms": round(lat[int(len(lat) * 0.95)] * 1000, 2),
+                "max_ms": round(lat[-1] * 1000, 2),
+                "sec": round(sec, 2),
+            }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return out
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="계정 풀 백엔드 경합 벤치마크")
+    ap.add_argument("--bench", action="store_true")
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--rounds", type=int, default=50)
+    ap.add_argument("--accounts", type=int, default=None, help="계정 수 (기본 = workers)")
+    ap.add_argument("--hold", type=float, default=0.0, help="임대 유지 시간(초)")
+    ap.add_argument("--backend", choices=("json", "sqlite", "both"), default="both")
+    a = ap.parse_args(argv)
+    if not a.bench:
+        ap.print_help()
+        return 0
+    backends = ("json", "sqlite") if a.backend == "both" else (a.backend,)
+    for be, r in bench(a.workers, a.rounds, a.accounts, a.hold, backends).items():
+        print(f"{be:<7} {r['ops_per_sec']:>8} ops/s  p50 {r['p50_ms']}ms  p95 {r['p95_ms']}ms  "
+              f"max {r['max_ms']}ms  ({r['sec']}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
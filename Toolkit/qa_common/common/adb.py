@@ -0,0 +1,675 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - ADB/디바이스 유틸 (연결, Yosemite IME, PID/포그라운드, 해상도, BGM 판정)
+# ==========================================================
+# -*- coding: utf-8 -*-
+import os, time, re
+from typing import Optional, Tuple, Dict, List
+from airtest.core.api import log, connect_device, set_current, device, device as current_device
+from .core import QAEnv, _adb_exec, _collect_device_app_info, step, use_env
+
+
+# --- 안전 연결 유틸: MINICAP→(실패 시) ADBORI 폴백 ---
+def _connect_with_fallback(serial: Optional[str] = None):
+    """
+    1) 기본은 아무 옵션도 붙이지 않고 연결한다. (minicap/javacap 가능하면 그걸 쓰게 둠)
+    2) 정말 안 붙었을 때만 ADBCAP 계열로 한 번 더 시도한다.
+    3) QA_USE_MINICAP=1 이면 1순위로 minicap을 시도하고, 안되면 평범한 기본 연결로 떨어뜨린다.
+    """
+    base = "Android:///"
+    env_serial = os.environ.get("ANDROID_SERIAL") or os.environ.get("ADB_SERIAL")
+    serial = serial or env_serial
+
+    use_minicap = os.environ.get("QA_USE_MINICAP") == "1"
+
+    # 0) URI 조립
+    if serial:
+        plain_uri = f"{base}{serial}"             # ← 이게 기본
+        minicap_uri = f"{base}{serial}?cap_method=MINICAP&ori_method=MINICAP&touch_method=ADB"
+    else:
+        plain_uri = base
+        minicap_uri = f"{base}?cap_method=MINICAP&ori_method=MINICAP&touch_method=ADB"
+
+    # 1) QA_USE_MINICAP=1 이면 먼저 minicap으로 붙어보고
+    if use_minicap:
+        try:
+            dev = connect_device(minicap_uri)
+            time.sleep(0.1)
+            dev.get_current_resolution()
+            print(f"[DEV] connected via MINICAP: {dev.uuid}")
+            return dev
+        except Exception as e:
+            print(f"[DEV] minicap connect failed, fallback to plain: {e}")
+
+    # 2) 가장 중요한 기본 경로: **옵션 없이** 붙인다
+    try:
+        dev = connect_device(plain_uri)
+        time.sleep(0.1)
+        dev.get_current_resolution()
+        print(f"[DEV] connected (plain): {dev.uuid}")
+        return dev
+    except Exception as e:
+        print(f"[DEV] plain connect failed: {e}")
+
+    # 3) 정말 안 될 때만 ADBCAP로 최후 fallback
+    if serial:
+        adb_uri = f"{base}{serial}?cap_method=ADBCAP&ori_method=ADBORI&touch_method=ADB"
+    else:
+        adb_uri = f"{base}?cap_method=ADBCAP&ori_method=ADBORI&touch_method=ADB"
+
+    dev = connect_device(adb_uri)
+    time.sleep(0.1)
+    dev.get_current_resolution()
+    print(f"[DEV] connected (fallback ADB): {dev.uuid}")
+    return dev
+
+
+# 디바이스 보장/전환
+def ensure_device(serial: Optional[str] = None):
+    """
+    IDE 실행: 이미 auto_setup으로 붙어 있으면 그대로 사용.
+    serial 지정 시: 해당 UUID/시리얼로 current 전환(없으면 연결 후 전환).
+    """
+    if serial:
+        try:
+            set_current(serial)
+            return device()
+        except Exception:
+            pass
+        _connect_with_fallback(serial)
+        set_current(serial)
+        return device()
+
+    # 시리얼 미지정
+    try:
+        return device()
+    except Exception:
+        _connect_with_fallback(None)
+        set_current(0)
+        return device()
+
+# ==========================================================
+# Yosemite IME(입력기) 보정 헬퍼
+#  - 프로세스는 살아있는데 default_input_method가 yosemite가 아닌 상태를 방지
+#  - hard reset/force-stop 이후 타이핑 불능을 구조적으로 차단
+# ==========================================================
+# yosemite 프로세스 생존 확인 및 재기동
+def ensure_yosemite_alive(env: Optional[QAEnv] = None, force_restart: bool = False) -> bool:
+    """
+    yosemite(com.netease.nie.yosemite) 프로세스가 살아있는지 확인하고,
+    죽어있으면 재기동을 시도한다.
+
+    Returns:
+        True  - 살아있음(또는 복구 성공)
+        False - 복구 시도했으나 살아있지 않음
+    """
+    env = use_env(env)
+    if env is None:
+        return False
+
+    pkg = "com.netease.nie.yosemite"
+
+    # 기기/버전별 서비스 컴포넌트명 차이를 흡수하기 위한 후보군
+    service_candidates = [
+        f"{pkg}/.Service",                   # dumpsys에서 확인된 현재 단말 서비스
+        f"{pkg}/.service.YosemiteService",   # 과거/다른 환경 대비(기존 하드코딩)
+    ]
+    # 단말 프로파일 캐시에서 확인된 실제 서비스 컴포넌트를 최우선으로
+    comp = _device_profile(env).get("yosemite_service")
+    if comp:
+        service_candidates = [comp] + [c for c in service_candidates if c != comp]
+
+    def _pid() -> str:
+        try:
+            out = _adb_exec(env, "shell", "pidof", pkg) or ""
+            return out.strip()
+        except Exception:
+            return ""
+
+    # 이미 살아있으면(강제 재기동이 아니면) 바로 성공
+    if _pid() and not force_restart:
+        return True
+
+    # 1) startservice 시도
+    for comp in service_candidates:
+        try:
+            _adb_exec(env, "shell", "am", "startservice", comp)
+            time.sleep(0.6)
+            if _pid():
+                return True
+        except Exception:
+            pass
+
+    # 2) start-foreground-service 시도(안드로이드 제약 대응)
+    for comp in service_candidates:
+        try:
+            _adb_exec(env, "shell", "am", "start-foreground-service", comp)
+            time.sleep(0.8)
+            if _pid():
+                return True
+        except Exception:
+            pass
+
+    # 3) 최후: 런처 기동(monkey)
+    try:
+        _adb_exec(env, "shell", "monkey", "-p", pkg, "-c", "android.intent.category.LAUNCHER", "1")
+        time.sleep(0.8)
+        if _pid():
+            return True
+    except Exception:
+        pass
+
+    return bool(_pid())
+
+def _device_profile(env: Optional['QAEnv'] = None) -> dict:
+    """단말 프로파일 캐시(devprofile) — 실패 시 빈 dict (호출부는 기존 adb 조회로 폴백)"""
+    try:
+        from .devprofile import get_device_profile
+        return get_device_profile(getattr(env, "serial", None))
+    except Exception:
+        return {}
+
+
+def _get_default_ime(env: Optional['QAEnv'] = None) -> Optional[str]:
+    env = use_env(env)
+    if env is None:
+        return None
+    try:
+        out = _adb_exec(env, "shell", "settings", "get", "secure", "default_input_method").strip()
+        if not out or out.lower() == "null":
+            return None
+        return out
+    except Exception:
+        return None
+
+
+def _list_ime_ids(env: Optional['QAEnv'] = None) -> List[str]:
+    env = use_env(env)
+    if env is None:
+        return []
+    try:
+        out = _adb_exec(env, "shell", "ime", "list", "-s")
+        ims = [x.strip() for x in (out or "").splitlines() if x.strip()]
+        return ims
+    except Exception:
+        return []
+
+
+def _find_yosemite_ime_id(env: Optional['QAEnv'] = None, ime_ids: Optional[List[str]] = None) -> Optional[str]:
+    env = use_env(env)
+    if env is None:
+        return None
+
+    ime_ids = ime_ids if ime_ids is not None else _list_ime_ids(env)
+    if not ime_ids:
+        return None
+
+    # 1순위: 패키지명 정확히 포함
+    for x in ime_ids:
+        if "com.netease.nie.yosemite" in x:
+            return x
+
+    # 2순위: 'yosemite' 키워드 포함
+    for x in ime_ids:
+        if "yosemite" in x.lower():
+            return x
+
+    return None
+
+
+def ensure_yosemite_ime(
+    env: Optional['QAEnv'] = None,
+    *,
+    force_set: bool = False,
+    ime_id: Optional[str] = None
+) -> bool:
+    """
+    현재 default IME가 yosemite가 아니면 ime enable/set으로 강제 전환한다.
+    - force_set=True: 이미 yosemite여도 다시 set 수행(하드리셋 직후 권장)
+    """
+    env = use_env(env)
+    if env is None:
+        return False
+
+    try:
+        # 캐시된 IME id 우선(ime list -s 왕복 생략), 없으면 실시간 조회
+        target = ime_id or _device_profile(env).get("yosemite_ime")
+        if not target:
+            target = _find_yosemite_ime_id(env, _list_ime_ids(env))
+        if not target:
+            step("[WARN] yosemite IME id를 찾지 못했습니다(ime list -s).", env=env)
+            return False
+
+        cur = _get_default_ime(env)
+        if (cur == target) and (not force_set):
+            return True
+
+        # enable → set 순서가 안정적
+        try:
+            _adb_exec(env, "shell", "ime", "enable", target)
+        except Exception:
+            pass
+
+        _adb_exec(env, "shell", "ime", "set", target)
+        time.sleep(0.25)
+
+        cur2 = _get_default_ime(env)
+        if cur2 == target:
+            step(f"[OK] yosemite IME 설정 완료: {target}", env=env)
+            return True
+
+        step(f"[WARN] yosemite IME 설정 실패(현재:{cur2}, 목표:{target})", env=env)
+        return False
+
+    except Exception as e:
+        step(f"[WARN] ensure_yosemite_ime 예외: {e!r}", env=env)
+        return False
+
+# Yosemite IME(입력기) 보정 헬퍼 END==================================
+
+# 패키지의 PID 조회
+def _pidof(env, package: str) -> Optional[int]:
+    if not package:
+        return None
+
+    # 1) pidof -s (가능한 기기에서 가장 깔끔)
+    try:
+        out = (_adb_exec(env, "shell", "pidof", "-s", package) or "").strip()
+        if out:
+            return int(out.split()[0])
+    except Exception:
+        pass
+
+    # 2) pidof (구형/제한 환경 대비)
+    try:
+        out = (_adb_exec(env, "shell", "pidof", package) or "").strip()
+        if out:
+            return int(out.split()[0])
+    except Exception:
+        pass
+
+    # 3) 최후: ps 파싱(기기별 ps 옵션 차이가 커서 보수적으로)
+    try:
+        out = (_adb_exec(env, "shell", "ps") or "")
+        for line in out.splitlines():
+            if package in line:
+                cols = line.split()
+                # 보통 PID는 2번째 컬럼(헤더 여부/형식 차이 존재)
+                for token in cols:
+                    if token.isdigit():
+                        return int(token)
+    except Exception:
+        pass
+
+    return None
+
+# dumpsys에서 현재 top activity를 뽑는 보조 함수
+_TOP_PATTERNS = [
+    r"Resumed(Activity)?[:\s].*\s(\S+)/(\S+)",
+    r"ACTIVITY\s+(\S+)/(\S+)",
+    r"mCurrentFocus=Window\{[^\s]+\s+(\S+)/(\S+)\}",
+]
+
+def detect_top_component(env, expect_pkg: str = None):
+    """
+    현재 화면에 떠 있는 컴포넌트를 pkg/activity로 반환.
+    expect_pkg가 주어지면 그 패키지만 반환.
+    """
+    for cmd in (
+        ("shell", "cmd", "activity", "top"),
+        ("shell", "dumpsys", "activity", "activities"),
+        ("shell", "dumpsys", "window", "windows"),
+    ):
+        try:
+            out = _adb_exec(env, *cmd)
+        except Exception:
+            continue
+        for line in out.splitlines():
+            line = line.strip()
+            for pat in _TOP_PATTERNS:
+                m = re.search(pat, line)
+                if not m:
+                    continue
+                # 패턴마다 그룹 위치가 살짝 달라서 분기
+                if "Resumed" in pat:
+                    pkg, cls = m.group(2), m.group(3)
+                else:
+                    pkg, cls = m.group(1), m.group(2)
+                if cls.startswith("."):
+                    cls = pkg + cls
+                if (expect_pkg is None) or (pkg == expect_pkg):
+                    return pkg, cls
+    return None, None
+
+# 해상도 캐시 (dumpsys 호출 빈도 절감)
+_RES_CACHE = None
+_RES_CACHE_T = 0.0
+_RES_TTL = 5.0  # 초. 해상도/회전 빈변경 가정 시 5초 단위 갱신
+
+# ---------- 공통 유틸 ----------
+def _get_resolution() -> Tuple[int, int]:
+    global _RES_CACHE, _RES_CACHE_T
+    now = time.time()
+    if _RES_CACHE and (now - _RES_CACHE_T) < _RES_TTL:
+        return _RES_CACHE
+    try:
+        w, h = current_device().get_current_resolution()
+        _RES_CACHE = (int(w), int(h))
+        _RES_CACHE_T = now
+        return _RES_CACHE
+    except Exception:
+        # 디바이스 핸들 없음 → 단말 프로파일 캐시의 물리 해상도(세로 기준), 그것도 없으면 기본값
+        res = _device_profile(use_env(None)).get("resolution") if use_env(None) else None
+        _RES_CACHE = (min(res), max(res)) if res else (1080, 1920)
+        _RES_CACHE_T = now
+        return _RES_CACHE
+
+
+# ==========================================================
+# 🎵 BGM 재생 여부 판정 (UID 기반 / PID 제거 최종본)
+#  - Ground truth: dumpsys audio -> PlaybackActivityMonitor -> players (현재 상태)
+#  - 판정: 우리 package의 userId(UID) 기준
+#         state=started 이면서 type이 SoundPool이 아닌 플레이어가 존재하면 True
+#  - media_session은 ON/OFF에서 비어있을 수 있어(세션 0) 근거로 사용하지 않음
+#  - audio_flinger 기반(standby/last_write/track 잔존)은 오탐/미탐 많아 제거
+# ==========================================================
+# 캐시(UID는 앱 재설치 전까지 안정적이므로 캐시해도 됨)
+_UID_CACHE: Dict[str, int] = {}
+
+# PlaybackActivityMonitor 파싱용 정규식
+_RE_PAM_BEGIN = re.compile(r"^\s*PlaybackActivityMonitor\b", re.I)
+_RE_PAM_PLAYERS = re.compile(r"^\s*players:\s*$", re.I)
+_RE_PAM_END = re.compile(
+    r"^\s*(ducked players|faded out players|muted player|banned uids|Audio event log|SoundPool playback activity)\b",
+    re.I
+)
+
+# AudioPlaybackConfiguration 라인에서 type / u/pid / state 추출 (usage는 옵션)
+# 예:
+# AudioPlaybackConfiguration piid:2343 deviceId:367 type:android.media.MediaPlayer u/pid:10535/7401 state:started ...
+_RE_PAM_PLAYER_CORE = re.compile(
+    r"AudioPlaybackConfiguration\b.*?\btype:(?P<type>\S+)\s+u/pid:(?P<uid>\d+)/(?P<pid>\d+)\s+state:(?P<state>\w+)",
+    re.I
+)
+
+def _get_package_uid_from_dumpsys(env: 'QAEnv', package: str) -> Optional[int]:
+    """
+    패키지 UID(userId/appId)를 최대한 안정적으로 얻는다.
+    폴백 체인:
+      1) cmd package list packages -U <pkg>  -> uid:10535
+      2) dumpsys package <pkg> -> userId=10535 / appId=10535 / uid=10535
+      3) pm list packages -U <pkg> -> uid:10535 (기기별 지원 편차)
+    """
+    if not package:
+        return None
+    if package in _UID_CACHE:
+        return _UID_CACHE[package]
+
+    # 1) cmd package list packages -U <pkg>
+    try:
+        out = _adb_exec(env, "shell", "cmd", "package", "list", "packages", "-U", package) or ""
+        # 예: package:com.kyowon.literacy uid:10535
+        m = re.search(r"\buid:(\d+)\b", out)
+        if m:
+            uid = int(m.group(1))
+            _UID_CACHE[package] = uid
+            return uid
+    except Exception:
+        pass
+
+    # 2) dumpsys package <pkg>
+    try:
+        out = _adb_exec(env, "shell", "dumpsys", "package", package) or ""
+        # userId=10535
+        m = re.search(r"\buserId=(\d+)\b", out)
+        if m:
+            uid = int(m.group(1))
+            _UID_CACHE[package] = uid
+            return uid
+
+        # 일부 단말: appId=10535 / uid=10535 형태
+        m = re.search(r"\b(appId|uid)=(\d+)\b", out)
+        if m:
+            uid = int(m.group(2))
+            _UID_CACHE[package] = uid
+            return uid
+    except Exception:
+        pass
+
+    # 3) pm list packages -U <pkg> (지원 시)
+    try:
+        out = _adb_exec(env, "shell", "pm", "list", "packages", "-U", package) or ""
+        # 예: package:com.kyowon.literacy uid:10535
+        m = re.search(r"\buid:(\d+)\b", out)
+        if m:
+            uid = int(m.group(1))
+            _UID_CACHE[package] = uid
+            return uid
+    except Exception:
+        pass
+
+    return None
+
+def _dumpsys_audio(env: 'QAEnv') -> str:
+    """adb shell dumpsys audio"""
+    try:
+        return _adb_exec(env, "shell", "dumpsys", "audio") or ""
+    except Exception:
+        return ""
+
+def _parse_pam_players_current(dump: str) -> List[Dict]:
+    """
+    dumpsys audio > PlaybackActivityMonitor > players: (현재 상태)만 파싱
+    - 이벤트 로그(Audio event log 등) 구간은 절대 섞이지 않게 END 조건에서 중단
+    """
+    players: List[Dict] = []
+    if not dump:
+        return players
+
+    in_pam = False
+    in_players = False
+
+    for line in dump.splitlines():
+        if not in_pam:
+            if _RE_PAM_BEGIN.search(line):
+                in_pam = True
+            continue
+
+        if in_pam and not in_players:
+            if _RE_PAM_PLAYERS.search(line):
+                in_players = True
+            continue
+
+        if in_players:
+            # players 섹션 종료(여기서 끊는 게 오탐 방지 핵심)
+            if _RE_PAM_END.search(line):
+                break
+
+            s = line.strip()
+            if not s.startswith("AudioPlaybackConfiguration"):
+                continue
+
+            m = _RE_PAM_PLAYER_CORE.search(s)
+            if not m:
+                continue
+
+            ptype = m.group("type") or ""
+            uid = int(m.group("uid"))
+            state = (m.group("state") or "").lower()
+
+            players.append({
+                "uid": uid,
+                "state": state,
+                "type": ptype,
+                # raw는 디버그 때 보고 싶을 수 있으나,
+                # step()가 adb shell log를 호출하는 구조상 "-5.5" 같은 토큰이 옵션으로 오인될 수 있어
+                # 기본 저장은 하되, 출력은 제한한다.
+                "raw": s,
+            })
+
+    return players
+
+def is_bgm_playing(debug: bool = False, env: Optional['QAEnv'] = None) -> bool:
+    """
+    ✅ 최종 BGM 판정(UID 기반, PID 제거)
+    - True 조건:
+        PlaybackActivityMonitor > players 에서
+        * uid == package userId
+        * state == started
+        * type 이 SoundPool 이 아님
+    """
+    env = use_env(env)
+    if env is None:
+        raise RuntimeError(
+            "QAEnv가 설정되지 않았습니다. set_current_env(env)를 먼저 호출하거나, "
+            "is_bgm_playing(env=env)로 전달해 주세요."
+        )
+
+    package = getattr(env, "package", "") or ""
+    uid = _get_package_uid_from_dumpsys(env, package)
+
+    if uid is None:
+        step(f"[BGM] uid not found for package={package} -> PLAYING=False (no-uid)", env=env)
+        return False
+
+    dump = _dumpsys_audio(env)
+    players = _parse_pam_players_current(dump)
+
+    # 판정: started + SoundPool 제외
+    playing_hits = []
+    for p in players:
+        if p.get("uid") != uid:
+            continue
+        if p.get("state") != "started":
+            continue
+        ptype = (p.get("type") or "").lower()
+        if "soundpool" in ptype:
+            continue
+        playing_hits.append(p)
+
+    playing = (len(playing_hits) > 0)
+
+    if debug:
+        # raw 전체를 step으로 찍으면 adb shell log 경고가 날 수 있어 요약만 찍는다.
+        log(f"[BGM][DBG] package={package} uid={uid} players={len(players)} started_hits={len(playing_hits)}")
+        # 상위 3개만 요약
+        for p in playing_hits[:3]:
+            log(f"[BGM][DBG] HIT type={p.get('type')} state={p.get('state')} uid={p.get('uid')}")
+
+    step(f"[BGM] PLAYING = {playing} (pam-uid)", env=env)
+    return playing
+
+
+# ==========================================================
+# 📦 APK 설치
+#  - install_apk(apk_path, env) → adb install 후 단말 프로파일의 앱 버전 캐시 무효화 + env 앱 버전 갱신
+# ==========================================================
+def install_apk(apk_path: str, *, env: Optional['QAEnv'] = None, package: Optional[str] = None,
+                reinstall: bool = True, grant_permissions: bool = True) -> str:
+    """
+    APK 설치/재설치 (adb install [-r] [-g]).
+    - 설치 후 devprofile 앱 버전 캐시 무효화(package 기본 env.package) → 이후 조회는 새 빌드 버전
+    - env.app_version_name/code 즉시 갱신 (meta.json / 버전별 추세 집계 기준)
+    반환: adb 출력 (실패 시 RuntimeError)
+    """
+    env = use_env(env)
+    args = ["install"] + (["-r"] if reinstall else []) + (["-g"] if grant_permissions else []) + [apk_path]
+    step(f"[RUN] APK 설치: {os.path.basename(apk_path)}", env=env)
+    out = _adb_exec(env, *args)
+    if "Success" not in out:
+        raise RuntimeError(f"APK 설치 실패: {out.strip()[-300:]}")
+    try:
+        from .devprofile import invalidate_device_profile
+        invalidate_device_profile(getattr(env, "serial", None), package or getattr(env, "package", None))
+        if env is not None and (package is None or package == getattr(env, "package", None)):
+            _collect_device_app_info(env)
+    except Exception:
+        pass
+    step(f"[OK] APK 설치 완료: {getattr(env, 'package', '')} {getattr(env, 'app_version_name', '')}"
+         f" ({getattr(env, 'app_version_code', '')})", env=env)
+    return out
+
+
+# ==========================================================
+# 📱 앱 프로세스 상태 확인 유틸
+#  - get_app_pid(package, env) -> pid|None
+#  - is_app_running(package, env) -> bool
+#  - get_foreground_package(env) -> package|""
+#  - is_app_in_foreground(package, env) -> bool
+#  - 단말별 감시 스트림(procwatch)의 캐시 상태 우선 → 신선한 샘플이 없을 때만 adb 직접 조회
+# ==========================================================
+def _watch_snapshot(env, package: Optional[str] = None, foreground: bool = False) -> Optional[dict]:
+    """procwatch 스냅샷 (비활성/미지원/오래된 상태면 None) — foreground=True일 때만 단말 루프에 dumpsys 포함"""
+    try:
+        from .procwatch import get_proc_watcher
+        w = get_proc_watcher(getattr(env, "serial", None), package)
+        return w.snapshot(package, foreground=foreground) if w is not None else None
+    except Exception:
+        return None
+
+def get_app_pid(package: Optional[str] = None, env=None, debug: bool = False) -> Optional[int]:
+    """
+    앱 PID 반환. 없으면 None.
+    - procwatch 캐시 우선, 없으면 기존 _pidof(env, package) 재사용
+    - env/package 둘 다 없으면 env.package 사용
+    """
+    env = use_env(env)
+    pkg = package or getattr(env, "package", None)
+    if not pkg:
+        raise ValueError("package is required (arg package or env.package)")
+
+    snap = _watch_snapshot(env, pkg)
+    if snap is not None and pkg in snap["pids"]:
+        pid = snap["pids"][pkg]
+    else:
+        pid = _pidof(env, pkg)  # ✅ 기존 공용 로직 재사용
+    if debug:
+        log(f"[APP] pid={pid} package={pkg}")
+    return pid
+
+def is_app_running(package: Optional[str] = None, env=None, debug: bool = False) -> bool:
+    """
+    앱 프로세스 실행 여부(백그라운드 포함)
+    """
+    env = use_env(env)
+    pkg = package or getattr(env, "package", None)
+    if not pkg:
+        raise ValueError("package is required (arg package or env.package)")
+
+    pid = get_app_pid(pkg, env=env, debug=False)
+    ok = (pid is not None)
+
+    if debug:
+        log(f"[APP] running={ok} package={pkg} pid={pid}")
+    return ok
+
+def get_foreground_package(env=None, debug: bool = False) -> str:
+    """
+    현재 포그라운드 패키지명 반환. 실패 시 "".
+    - procwatch 캐시 우선, 없으면 기존 detect_top_component(env, expect_pkg=None) 재사용
+    """
+    env = use_env(env)
+    snap = _watch_snapshot(env, getattr(env, "package", None), foreground=True)
+    if snap is not None and snap["top"]:
+        pkg = snap["top"][0]
+    else:
+        pkg, _cls = detect_top_component(env, expect_pkg=None)
+    pkg = pkg or ""
+    if debug:
+        log(f"[APP] foreground={pkg}")
+    return pkg
+
+def is_app_in_foreground(package: Optional[str] = None, env=None, debug: bool = False) -> bool:
+    """
+    지정 패키지가 포그라운드인지 여부
+    """
+    env = use_env(env)
+    pkg = package or getattr(env, "package", None)
+    if not pkg:
+        raise ValueError("package is required (arg package or env.package)")
+
+    fg = get_foreground_package(env=env, debug=False)
+    ok = (fg == pkg)
+
+    if debug:
+        log(f"[APP] in_foreground={ok} expected={pkg} actual={fg}")
+    return ok
@@ -0,0 +1,102 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - adb 프로세스 공용 헬퍼 (장기 실행 shell 스트림 틀 + 1회성 실행)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - AdbShellStream: 단말 안 루프 스크립트를 `adb shell` 1개로 띄우고 리더 스레드로 stdout 수신
+#     · 하위 클래스는 _script()(단말 스크립트)와 _reader(proc)(파싱)만 구현
+#     · _spawn()/_kill()/alive()/ensure_alive()(끊기면 RESTART_GAP초 간격 재기동) 공용
+#     · 사용처: procwatch.ProcWatcher, breakdown.BreakdownSampler, framestats.FrameStatsSampler
+#   - adb_run(): 1회성 adb 실행 → (returncode, stdout+stderr) (leakwatch 힙 덤프/pull 등)
+#   - adb_shell(): 1회성 `adb shell <script>` → stdout (devprofile 프로파일 조회 등, 타임아웃은 예외)
+#   - Windows에서는 콘솔 창 없이 실행(CREATE_NO_WINDOW)
+#   - 표준 라이브러리만 사용 (resource_monitor_gui 등 airtest 없는 프로세스에서도 import 가능)
+# ==========================================================
+import os, time, threading, subprocess
+from typing import Optional, Dict, List, Tuple, Iterator
+
+
+def adb_cmd(serial: Optional[str], *args: str) -> List[str]:
+    return ["adb"] + (["-s", serial] if serial else []) + list(args)
+
+
+def _popen_kw() -> Dict[str, int]:
+    if os.name == "nt":
+        return {"creationflags": getattr(subprocess, "CREATE_NO_WINDOW", 0)}
+    return {}
+
+
+def adb_run(serial: Optional[str], args, timeout: float = 30.0) -> Tuple[int, str]:
+    """1회성 adb 실행 → (returncode, stdout+stderr). 실행 실패/타임아웃은 (-1, 사유)"""
+    try:
+        p = subprocess.run(adb_cmd(serial, *args), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                           timeout=timeout, **_popen_kw())
+        return p.returncode, p.stdout.decode("utf-8", "ignore").strip()
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return -1, str(e)
+
+
+def adb_shell(serial: Optional[str], script: str, timeout: float = 20.0) -> str:
+    """1회성 `adb shell <script>` → stdout (개행 정규화). 실행 실패/타임아웃은 예외 그대로"""
+    p = subprocess.run(adb_cmd(serial, "shell", script), capture_output=True, timeout=timeout, **_popen_kw())
+    return (p.stdout or b"").decode("utf-8", "ignore").replace("\r\n", "\n")
+
+
+class AdbShellStream:
+    """
+    장기 실행 `adb shell <script>` 스트림 1개 (단말당 루프 스크립트 + 호스트 리더 스레드).
+    - 하위 클래스: _script() → 단말 스크립트, _reader(proc) → read_lines(proc) 파싱
+      (리더는 `proc is not self._proc`면 중단 → 재기동 후 이전 스트림 출력 무시)
+    - 잠금은 하위 클래스 몫 (_spawn/_kill은 호출부가 자기 락 안에서 호출)
+    """
+
+    RESTART_GAP = 5.0
+    thread_name = "qa-adbstream"
+
+    def _stream_init(self, serial: Optional[str]):
+        self.serial = serial or None
+        self._proc: Optional[subprocess.Popen] = None
+        self._started = 0.0
+        self._stopped = False
+
+    def _script(self) -> str:
+        raise NotImplementedError
+
+    def _reader(self, proc: subprocess.Popen):
+        raise NotImplementedError
+
+    @staticmethod
+    def read_lines(proc: subprocess.Popen) -> Iterator[str]:
+        for raw in iter(proc.stdout.readline, b""):
+            yield raw.decode("utf-8", "ignore").rstrip()
+
+    def _spawn(self) -> bool:
+        """기존 스트림 종료 후 재기동 → 성공 여부 (adb 실행 불가면 False)"""
+        self._kill()
+        self._started = time.time()
+        try:
+            proc = subprocess.Popen(adb_cmd(self.serial, "shell", self._script()), stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL, **_popen_kw())
+        except OSError:
+            self._proc = None
+            return False
+        self._proc = proc
+        threading.Thread(target=self._reader, args=(proc,), daemon=True, name=self.thread_name).start()
+        return True
+
+    def _kill(self):
+        p, self._proc = self._proc, None
+        if p is not None and p.poll() is None:
+            try:
+                p.kill()
+            except Exception:
+                pass
+
+    def alive(self) -> bool:
+        p = self._proc
+        return p is not None and p.poll() is None
+
+    def ensure_alive(self) -> bool:
+        """스트림이 끊겼으면 재기동(최소 RESTART_GAP초 간격) — 호출부 주기 루프에서 호출"""
+        if not self._stopped and not self.alive() and time.time() - self._started >= self.RESTART_GAP:
+            self._spawn()
+        return self.alive()
@@ -0,0 +1,329 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 스트리밍 ZIP 아카이버 (파일 유형별 stored/deflate + 병렬 압축)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - 이미 압축된 파일(png/jpg/webp/mp4/pdf/zip 등)은 ZIP_STORED, 텍스트류는 deflate(기본 레벨 6)
+#   - 압축(및 stored CRC 계산)은 워커 스레드에서 병렬 수행, 기록은 입력 순서대로 1개 스레드가 스트리밍
+#     (zlib/crc32는 GIL을 풀고 동작 → 스레드 병렬 효과 있음)
+#   - sink는 write()만 있으면 됨(파일/소켓/업로드 버퍼) → 전체 zip을 디스크에 만들지 않고 바로 업로드 가능
+#   - ZipPipe: 백그라운드에서 아카이브를 만들며 read()로 꺼내 쓰는 파이프 (업로드와 병행)
+#   - ZIP64 자동 처리(4GB 이상 파일/오프셋), UTF-8 파일명
+#   - 표준 라이브러리만 사용
+# ==========================================================
+import os, time, zlib, queue, struct, tempfile, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple, Callable, Any
+
+STORED, DEFLATED = 0, 8
+
+# 압축해도 거의 줄지 않는 확장자 → STORED
+STORED_EXT = {
+    ".png", ".jpg", ".jpeg", ".webp", ".gif", ".mp4", ".mkv", ".webm", ".mov", ".mp3", ".m4a", ".ogg",
+    ".pdf", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".apk", ".aab", ".jar", ".whl", ".docx", ".xlsx", ".pptx",
+}
+# 잘 줄어드는 텍스트류 → 지정 레벨, 그 외 → 빠른 레벨(1)
+TEXT_EXT = {".txt", ".log", ".json", ".csv", ".html", ".htm", ".xml", ".js", ".css", ".svg", ".md", ".py", ".ini"}
+
+_CHUNK = 1 << 20
+_SPOOL_MAX = 8 << 20        # 압축 결과가 이보다 크면 임시 파일로 (메모리 상한)
+_U32 = 0xFFFFFFFF
+
+
+def pick_method(name: str, level: int = 6) -> Tuple[int, int]:
+    """파일명 → (압축 방식, deflate 레벨)"""
+    ext = os.path.splitext(name)[1].lower()
+    if ext in STORED_EXT:
+        return STORED, 0
+    return DEFLATED, (level if ext in TEXT_EXT else 1)
+
+
+class _Entry:
+    __slots__ = ("arcname", "src", "method", "crc", "csize", "usize", "mtime", "spool", "offset")
+
+    def __init__(self, arcname, src, method, crc, csize, usize, mtime, spool=None):
+        self.arcname, self.src, self.method = arcname, src, method
+        self.crc, self.csize, self.usize, self.mtime = crc, csize, usize, mtime
+        self.spool = spool
+        self.offset = 0
+
+
+def _prepare(src: str, arcname: str, method: int, level: int) -> _Entry:
+    """워커: CRC 계산 + (deflate면) 압축 결과를 spool에 보관. 압축 이득이 없으면 STORED로 전환"""
+    mtime = os.path.getmtime(src)
+    crc, usize = 0, 0
+    if method == STORED:
+        with open(src, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                crc = zlib.crc32(chunk, crc)
+                usize += len(chunk)
+        return _Entry(arcname, src, STORED, crc, usize, usize, mtime)
+
+    co = zlib.compressobj(level, zlib.DEFLATED, -15)
+    spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX)
+    with open(src, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            crc = zlib.crc32(chunk, crc)
+            usize += len(chunk)
+            spool.write(co.compress(chunk))
+    spool.write(co.flush())
+    csize = spool.tell()
+    if csize >= usize:
+        spool.close()
+        return _Entry(arcname, src, STORED, crc, usize, usize, mtime)
+    spool.seek(0)
+    return _Entry(arcname, src, DEFLATED, crc, csize, usize, mtime, spool)
+
+
+def _dos_time(ts: float) -> Tuple[int, int]:
+    t = time.localtime(ts)
+    if t.tm_year < 1980:
+        return 0, (0 << 9) | (1 << 5) | 1
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), \
+           ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+class ZipStreamWriter:
+    """write()만 가능한 sink에 ZIP을 순차 기록 (seek 불필요)"""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.offset = 0
+        self.entries: List[_Entry] = []
+
+    def _w(self, b: bytes):
+        self.sink.write(b)
+        self.offset += len(b)
+
+    def add(self, e: _Entry):
+        e.offset = self.offset
+        name = e.arcname.encode("utf-8")
+        flags = 0x800 if any(c > 0x7F for c in name) else 0
+        zip64 = e.csize >= _U32 or e.usize >= _U32
+        extra = struct.pack("<HHQQ", 0x0001, 16, e.usize, e.csize) if zip64 else b""
+        tm, dt = _dos_time(e.mtime)
+        self._w(struct.pack("<IHHHHHIIIHH", 0x04034B50, 45 if zip64 else 20, flags, e.method, tm, dt, e.crc,
+                            _U32 if zip64 else e.csize, _U32 if zip64 else e.usize, len(name), len(extra)))
+        self._w(name + extra)
+
+        written = 0
+        if e.spool is not None:
+            src = e.spool
+        else:
+            src = open(e.src, "rb")
+        try:
+            for chunk in iter(lambda: src.read(_CHUNK), b""):
+                self._w(chunk)
+                written += len(chunk)
+        finally:
+            src.close()
+        if written != e.csize:
+            raise IOError(f"압축 중 파일이 변경됨: {e.src} ({written} != {e.csize})")
+        e.spool = None
+        self.entries.append(e)
+
+    def close(self):
+        cd_start = self.offset
+        for e in self.entries:
+            name = e.arcname.encode("utf-8")
+            flags = 0x800 if any(c > 0x7F for c in name) else 0
+            z64 = [v for v in (e.usize, e.csize, e.offset) if v >= _U32]
+            usize, csize, off = (e.usize if e.usize < _U32 else _U32, e.csize if e.csize < _U32 else _U32,
+                                 e.offset if e.offset < _U32 else _U32)
+            extra = struct.pack("<HH", 0x0001, 8 * len(z64)) + b"".join(struct.pack("<Q", v) for v in z64) if z64 else b""
+            tm, dt = _dos_time(e.mtime)
+            self._w(struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, (3 << 8) | 45, 45 if z64 else 20, flags,
+                                e.method, tm, dt, e.crc, csize, usize, len(name), len(extra), 0, 0, 0,
+                                (0o100644 << 16), off))
+            self._w(name + extra)
+        cd_size = self.offset - cd_start
+        n = len(self.entries)
+        if n >= 0xFFFF or cd_size >= _U32 or cd_start >= _U32:
+            z64_eocd = self.offset
+            self._w(struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0, n, n, cd_size, cd_start))
+            self._w(struct.pack("<IIQI", 0x07064B50, 0, z64_eocd, 1))
+            self._w(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, min(n, 0xFFFF), min(n, 0xFFFF),
+                                min(cd_size, _U32), min(cd_start, _U32), 0))
+        else:
+            self._w(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, n, n, cd_size, cd_start, 0))
+
+
+def _walk(path: str) -> List[Tuple[str, str]]:
+    """폴더 → (원본 경로, base/상대경로) 목록 (기존 _zip_any와 같은 arcname 규칙)"""
+    path = os.path.abspath(path)
+    if os.path.isfile(path):
+        return [(path, os.path.basename(path))]
+    base = os.path.basename(path.rstrip("\\/"))
+    out = []
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for fn in sorted(files):
+            fp = os.path.join(root, fn)
+            rel = os.path.relpath(fp, path).replace(os.sep, "/")
+            out.append((fp, f"{base}/{rel}"))
+    return out
+
+
+def zip_stream(path: str, sink, *, workers: Optional[int] = None, level: int = 6,
+               progress: Optional[Callable[[int, int, int], None]] = None) -> Dict[str, Any]:
+    """
+    path(파일/폴더) → sink.write()로 ZIP 스트리밍.
+    - workers: 압축 스레드 수 (기본 min(8, CPU))
+    - progress(done_files, total_files, bytes_out)
+    반환: {files, stored, deflated, bytes_in, bytes_out, sec}
+    """
+    t0 = time.time()
+    items = _walk(path)
+    workers = max(1, workers or min(8, os.cpu_count() or 2))
+    writer = ZipStreamWriter(sink)
+    stats = {"files": len(items), "stored": 0, "deflated": 0, "bytes_in": 0, "bytes_out": 0, "sec": 0.0}
+
+    # 입력 순서대로 기록하되, 앞쪽 workers*2개까지만 미리 압축(메모리/임시파일 상한)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        window: "queue.Queue" = queue.Queue()
+        it = iter(items)
+
+        def _submit_next() -> bool:
+            try:
+                src, arc = next(it)
+            except StopIteration:
+                return False
+            m, lv = pick_method(src, level)
+            window.put(ex.submit(_prepare, src, arc, m, lv))
+            return True
+
+        for _ in range(workers * 2):
+            if not _submit_next():
+                break
+        done = 0
+        while not window.empty():
+            e = window.get().result()
+            _submit_next()
+            writer.add(e)
+            done += 1
+            stats["bytes_in"] += e.usize
+            stats["stored" if e.method == STORED else "deflated"] += 1
+            if progress:
+                progress(done, len(items), writer.offset)
+    writer.close()
+    stats["bytes_out"] = writer.offset
+    stats["sec"] = round(time.time() - t0, 2)
+    return stats
+
+
+def zip_to_file(path: str, zip_path: str, **kw) -> Dict[str, Any]:
+    """임시 파일(.part)에 기록 후 교체 → 중간 실패 시 불완전 zip이 남지 않음"""
+    part = zip_path + ".part"
+    try:
+        with open(part, "wb") as f:
+            st = zip_stream(path, f, **kw)
+        os.replace(part, zip_path)
+        return st
+    finally:
+        if os.path.exists(part):
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+
+
+class _QueueSink:
+    def __init__(self, q: "queue.Queue", chunk: int, abort: threading.Event):
+        self.q, self.chunk, self.abort = q, chunk, abort
+        self.buf = bytearray()
+
+    def write(self, b: bytes):
+        self.buf += b
+        while len(self.buf) >= self.chunk:
+            self._put(bytes(self.buf[:self.chunk]))
+            del self.buf[:self.chunk]
+
+    def _put(self, b: bytes):
+        while True:
+            if self.abort.is_set():
+                raise IOError("ZipPipe 중단됨")
+            try:
+                self.q.put(b, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def flush_end(self):
+        if self.buf:
+            self._put(bytes(self.buf))
+            self.buf = bytearray()
+
+
+class ZipPipe:
+    """
+    백그라운드 스레드가 ZIP을 만들고, 소비자는 read(n)으로 받아 감 (업로드와 아카이빙 병행).
+    - buffer_chunks × chunk 바이트까지만 앞서 만듦(역압)
+    - 아카이빙 중 예외는 read()에서 다시 발생 — 이후 read()도 계속 같은 예외(정상 EOF b""와 구분),
+      한 번도 read()로 전달되지 않았으면 close()/__exit__에서 발생 → 실패한 아카이브를 완료로 오인하지 않음
+    - stats: 완료 후 zip_stream 통계
+    """
+
+    def __init__(self, path: str, *, chunk: int = _CHUNK, buffer_chunks: int = 16, **kw):
+        self.name = os.path.basename(os.path.abspath(path).rstrip("\\/")) + ".zip"
+        self.stats: Optional[Dict[str, Any]] = None
+        self._q: "queue.Queue" = queue.Queue(maxsize=max(1, buffer_chunks))
+        self._abort = threading.Event()
+        self._err: Optional[BaseException] = None
+        self._err_seen = False
+        self._buf = b""
+        self._eof = False
+        self._t = threading.Thread(target=self._run, args=(path, chunk, kw), name="qa-zippipe", daemon=True)
+        self._t.start()
+
+    def _run(self, path, chunk, kw):
+        sink = _QueueSink(self._q, chunk, self._abort)
+        try:
+            self.stats = zip_stream(path, sink, **kw)
+            sink.flush_end()
+        except BaseException as e:
+            self._err = e
+        finally:
+            while not self._abort.is_set():
+                try:
+                    self._q.put(None, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def _raise_err(self):
+        self._err_seen = True
+        self._buf = b""
+        raise self._err
+
+    def read(self, n: int = -1) -> bytes:
+        if self._eof and self._err is not None:
+            self._raise_err()
+        while not self._eof and (n < 0 or len(self._buf) < n):
+            b = self._q.get()
+            if b is None:
+                self._eof = True
+                if self._err is not None:
+                    self._raise_err()
+                break
+            self._buf += b
+        if n < 0:
+            out, self._buf = self._buf, b""
+        else:
+            out, self._buf = self._buf[:n], self._buf[n:]
+        return out
+
+    def close(self):
+        """중단 + 아직 전달되지 않은 아카이빙 예외가 있으면 발생 (중단으로 생긴 예외는 제외)"""
+        err = self._err
+        self._abort.set()
+        if err is not None and not self._err_seen:
+            self._err_seen = True
+            raise err
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self._err_seen = True             # 소비자 쪽 예외가 우선
+        self.close()
+        return False
@@ -0,0 +1,128 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - import 기동 시간 벤치마크
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - 사용법 (qa_common 폴더에서):
+#       python -m common.bench_import            # 기본 7회 반복
+#       python -m common.bench_import -n 15 --top 20
+#   - 시나리오별로 새 인터프리터를 띄워 wall time 중앙값 측정
+#   - `-X importtime` 출력 파싱 → self 시간 상위 모듈 표시
+#   - 시나리오별로 로드된 common 서브모듈 목록 표시 (`import *` 공개 범위 점검용)
+# ==========================================================
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+_QA_COMMON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# v1.0.6 단일 모듈이 import 시점에 끌어오던 무거운 의존성
+_EAGER_DEPS = (
+    "smtplib", "mimetypes", "email.message",
+    "googleapiclient.discovery", "googleapiclient.http",
+    "google.oauth2.credentials", "google_auth_oauthlib.flow", "google.auth.transport.requests",
+    "airtest.report.report",
+    "poco.drivers.android.uiautomation", "poco.drivers.unity3d",
+)
+
+SCENARIOS: Dict[str, str] = {
+    "import common": "import common",
+    "from common import *": "from common import *",
+    "eager (v1.0.6 equivalent)": (
+        "import importlib, common\n"
+        "common.load_all()\n"
+        f"for m in {_EAGER_DEPS!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(m)\n"
+        "    except ImportError:\n"
+        "        pass\n"
+    ),
+}
+
+
+_LOADED_PROBE = ("\nimport sys as _s\n"
+                 "print(' '.join(sorted(m[7:] for m in _s.modules if m.startswith('common.'))))")
+
+
+def _loaded_submodules(code: str) -> List[str]:
+    p = subprocess.run([sys.executable, "-c", code + _LOADED_PROBE], cwd=_QA_COMMON_DIR,
+                       capture_output=True, text=True, encoding="utf-8", errors="replace")
+    lines = (p.stdout or "").strip().splitlines()
+    return lines[-1].split() if (p.returncode == 0 and lines) else []
+
+
+def _run_once(code: str, importtime: bool = False) -> Tuple[float, str]:
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", code]
+    t0 = time.perf_counter()
+    p = subprocess.run(cmd, cwd=_QA_COMMON_DIR, capture_output=True, text=True, encoding="utf-8", errors="replace")
+    dt = time.perf_counter() - t0
+    if p.returncode != 0:
+        tail = (p.stderr or "").strip().splitlines()[-1:] or ["(no stderr)"]
+        raise RuntimeError(f"시나리오 실패(rc={p.returncode}): {tail[0]}")
+    return dt, p.stderr
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[int, int, str]]:
+    """`import time: self [us] | cumulative | imported package` 라인 → (self_us, cum_us, name)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            _, rest = line.split(":", 1)
+            self_us, cum_us, name = [x.strip() for x in rest.split("|", 2)]
+            rows.append((int(self_us), int(cum_us), name))
+        except ValueError:
+            continue
+    return rows
+
+
+def bench(runs: int = 7, top: int = 10) -> Dict[str, Dict[str, float]]:
+    # 첫 실행은 .pyc 생성/디스크 캐시 워밍업으로 버림
+    results: Dict[str, Dict[str, float]] = {}
+    for label, code in SCENARIOS.items():
+        try:
+            _run_once(code)
+            times = [_run_once(code)[0] for _ in range(max(1, runs))]
+            _, err = _run_once(code, importtime=True)
+        except RuntimeError as e:
+            print(f"❌ {label}: {e}")
+            continue
+
+        med = statistics.median(times)
+        results[label] = {"median_ms": med * 1000.0, "min_ms": min(times) * 1000.0, "max_ms": max(times) * 1000.0}
+        print(f"\n▶ {label}: median {med * 1000:.1f} ms (min {min(times) * 1000:.1f} / max {max(times) * 1000:.1f}, n={len(times)})")
+
+        loaded = _loaded_submodules(code)
+        results[label]["submodules"] = float(len(loaded))
+        print(f"   common 서브모듈 {len(loaded)}개: {' '.join(loaded) or '-'}")
+
+        rows = sorted(_parse_importtime(err), reverse=True)[:top]
+        for self_us, cum_us, name in rows:
+            print(f"   {self_us / 1000:8.1f} ms self | {cum_us / 1000:8.1f} ms cum | {name.strip()}")
+
+    base = results.get("eager (v1.0.6 equivalent)")
+    if base:
+        print("\n📊 eager 대비")
+        for label, r in results.items():
+            print(f"   {label:28s} {r['median_ms']:8.1f} ms  ({r['median_ms'] / base['median_ms'] * 100:5.1f}%)")
+    return results
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="common 패키지 import 기동 시간 측정")
+    ap.add_argument("-n", "--runs", type=int, default=7, help="시나리오별 반복 횟수 (중앙값 사용)")
+    ap.add_argument("--top", type=int, default=10, help="importtime self 상위 모듈 개수")
+    a = ap.parse_args(argv)
+    bench(runs=a.runs, top=a.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 패키지 스레드/프로세스별 CPU·PSS 상세 샘플러 (스레드 top-N, 누적 영역 그래프용)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - 단말당 `adb shell` 1개를 띄워 두고 주기마다 단말 안 스크립트 1회로 수집 (procwatch와 같은 adbstream.AdbShellStream)
+#     · 대상 프로세스: 패키지 uid의 모든 프로세스 + "<pkg>:*" 이름(격리 서비스) + (옵션) WebView sandboxed_process
+#     · 스레드: /proc/<pid>/task/*/stat 의 utime+stime 틱 차분 → 스레드별 CPU%(코어 1개 = 100%)
+#     · 프로세스: smaps_rollup Pss (권한 없으면 statm RSS 근사)
+#   - 라벨: "<프로세스>/<스레드명>" (프로세스 = main | :remote | webview:sandboxed_process0 ...) — 같은 이름 스레드는 합산
+#   - 저장(JSONL, 사전 인코딩): 헤더 1줄 + 라벨 최초 등장 시 {"d": id, "n": 라벨} + 샘플 {"t", "c": [id, CPU×10, ...], "m": [id, PSS, ...]}
+#     · CPU 0인 스레드는 생략 → 1초 주기 약 1MB/시간
+#   - load_breakdown(_range)()/summarize()/downsample(): 리소스 모니터 스레드 탭과 generate_report 페이지가 공유
+#   - 표준 라이브러리만 사용
+#   - 단독 실행: python -m common.breakdown live <package> [--serial S] [--sec 10] [--out breakdown.jsonl]
+#                python -m common.breakdown show <breakdown_*.jsonl> [--top 8]
+# ==========================================================
+import os, re, sys, json, time, argparse, threading, subprocess
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+
+from .adbstream import AdbShellStream
+
+HZ = 100                 # Android USER_HZ
+TOP_N = 8
+
+
+def _env_flag(name: str, default: str = "0") -> bool:
+    return (os.environ.get(name, default).strip() or default) == "1"
+
+
+def proc_label(name: str, package: str) -> str:
+    if name == package:
+        return "main"
+    if name.startswith(package + ":"):
+        return name[len(package):]
+    m = re.search(r"sandboxed_process\d*", name)
+    if m:
+        return "webview:" + m.group(0)
+    return name.rsplit("/", 1)[-1]
+
+
+class BreakdownSampler(AdbShellStream):
+    """
+    패키지 1개의 스레드/프로세스 상세 샘플러 (스트림 1개).
+    - start()/stop(), history(sec) → [{"t", "cpu": {라벨: %}, "pss": {프로세스: KB}, "pids": {프로세스: pid}}]
+    - out_path 지정 시 JSONL로 누적 저장
+    """
+
+    thread_name = "qa-breakdown"
+
+    def __init__(self, serial: Optional[str], package: str, *, interval: float = 1.0,
+                 out_path: Optional[str] = None, keep: int = 600, webview: Optional[bool] = None):
+        self._stream_init(serial)
+        self.package = package
+        self.interval = max(0.5, float(interval))
+        self.out_path = out_path
+        self.webview = _env_flag("QA_BREAKDOWN_WEBVIEW", "1") if webview is None else webview
+        self._hist: deque = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._prev: Dict[Tuple[str, str], int] = {}
+        self._prev_t: Optional[float] = None
+        self._ids: Dict[str, int] = {}
+        self._fh = None
+        self.samples = 0
+
+    # ---------- 단말 스크립트 ----------
+    def _script(self) -> str:
+        p = self.package
+        pat = f"^ *[0-9]+ +$U |[ ]{re.escape(p)}(:|$)" + ("|sandboxed_process" if self.webview else "")
+        uid = (f"U=$(cmd package list packages -U {p} 2>/dev/null | grep -m1 'package:{p} ' | sed 's/.*uid://;s/[^0-9].*//'); "
+               f"[ -z \"$U\" ] && U=$(dumpsys package {p} 2>/dev/null | grep -m1 'userId=' | sed 's/.*userId=//;s/[^0-9].*//'); "
+               "[ -z \"$U\" ] && U=NOUID; ")
+        body = ("echo @@T; "
+                f"ps -A -o PID=,UID=,NAME= 2>/dev/null | grep -E \"{pat}\" | while read pid uid name; do "
+                "echo \"@@P $pid $name\"; cat /proc/$pid/task/*/stat 2>/dev/null; "
+                "r=$(grep -m1 '^Pss:' /proc/$pid/smaps_rollup 2>/dev/null); "
+                "if [ -n \"$r\" ]; then echo \"@@M $pid P $r\"; else echo \"@@M $pid R $(cat /proc/$pid/statm 2>/dev/null)\"; fi; "
+                f"done; echo @@E; sleep {self.interval:g};")
+        return uid + f"while :; do {body} done"
+
+    def start(self) -> "BreakdownSampler":
+        with self._lock:
+            self._stopped = False
+            self._spawn()
+        return self
+
+    def ensure_alive(self) -> bool:
+        """스트림이 끊겼으면 재기동(최소 RESTART_GAP초 간격) — 호출부 주기 루프에서 호출"""
+        with self._lock:
+            return super().ensure_alive()
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            self._kill()
+            if self._fh is not None:
+                try:
+                    self._fh.close()
+                except Exception:
+                    pass
+                self._fh = None
+
+    # ---------- 파싱 ----------
+    def _reader(self, proc: subprocess.Popen):
+        t, pid, procs, ticks = 0.0, None, {}, {}
+        for line in self.read_lines(proc):
+            if line == "@@T":
+                t, pid, procs, ticks = time.time(), None, {}, {}
+            elif line.startswith("@@P "):
+                parts = line.split(None, 2)
+                pid = parts[1] if len(parts) > 1 else None
+                if pid:
+                    procs[pid] = {"label": proc_label(parts[2] if len(parts) > 2 else pid, self.package), "pss": None}
+            elif line.startswith("@@M "):
+                parts = line.split()
+                if len(parts) >= 4 and parts[1] in procs:
+                    nums = [int(x) for x in parts[3:] if x.isdigit()]
+                    if parts[2] == "P" and nums:
+                        procs[parts[1]]["pss"] = nums[0]
+                    elif len(nums) >= 2:                      # statm: size resident ... (페이지 4KB)
+                        procs[parts[1]]["pss"] = nums[1] * 4
+            elif line == "@@E":
+                if proc is not self._proc:
+                    break
+                self._commit(t, procs, ticks)
+            elif pid is not None and ")" in line:
+                head, _, rest = line.rpartition(")")
+                tid, _, comm = head.partition(" (")
+                f = rest.split()
+                if len(f) > 12 and tid.strip().isdigit():
+                    try:
+                        ticks[(pid, tid.strip())] = (comm, int(f[11]) + int(f[12]))
+                    except ValueError:
+                        pass
+
+    def _commit(self, t: float, procs: Dict[str, Dict[str, Any]], ticks: Dict[Tuple[str, str], Tuple[str, int]]):
+        cpu: Dict[str, float] = {}
+        if self._prev_t is not None and t > self._prev_t:
+            scale = 100.0 / ((t - self._prev_t) * HZ)
+            for key, (comm, tk) in ticks.items():
+                prev = self._prev.get(key)
+                if prev is None or tk < prev:
+                    continue
+                d = (tk - prev) * scale
+                if d > 0 and key[0] in procs:
+                    lab = f"{procs[key[0]]['label']}/{comm}"
+                    cpu[lab] = cpu.get(lab, 0.0) + d
+        first = self._prev_t is None
+        self._prev = {k: v[1] for k, v in ticks.items()}
+        self._prev_t = t
+        if first:
+            return
+        pss: Dict[str, int] = {}
+        pids: Dict[str, str] = {}
+        for p, info in procs.items():
+            pids[info["label"]] = p
+            if info["pss"] is not None:
+                pss[info["label"]] = pss.get(info["label"], 0) + info["pss"]
+        sample = {"t": t, "cpu": cpu, "pss": pss, "pids": pids}
+        with self._lock:
+            self._hist.append(sample)
+            self.samples += 1
+            self._write(sample)
+
+    def _write(self, s: Dict[str, Any]):
+        if not self.out_path:
+            return
+        try:
+            if self._fh is None:
+                new = not os.path.exists(self.out_path)
+                self._fh = open(self.out_path, "a", encoding="utf-8")
+                if new:
+                    self._fh.write(json.dumps({"v": 1, "package": self.package, "serial": self.serial,
+                                               "interval": self.interval, "started": s["t"]}) + "\n")
+            out = []
+
+            def _id(label: str) -> int:
+                i = self._ids.get(label)
+                if i is None:
+                    i = self._ids[label] = len(self._ids)
+                    out.append(json.dumps({"d": i, "n": label}, ensure_ascii=False))
+                return i
+
+            c = [x for lab, v in s["cpu"].items() if round(v * 10) > 0 for x in (_id(lab), int(round(v * 10)))]
+            m = [x for lab, v in s["pss"].items() for x in (_id("@" + lab), int(v))]
+            out.append(json.dumps({"t": round(s["t"], 2), "c": c, "m": m}, separators=(",", ":")))
+            self._fh.write("\n".join(out) + "\n")
+            self._fh.flush()
+        except Exception:
+            pass
+
+    # ---------- 조회 ----------
+    def history(self, sec: Optional[float] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            h = list(self._hist)
+        if sec is not None and h:
+            cut = h[-1]["t"] - sec
+            h = [s for s in h if s["t"] >= cut]
+        return h
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._hist[-1] if self._hist else None
+
+
+# ==========================================================
+# 🔹 저장 파일 로드 / 요약 / 다운샘플 (모니터·리포트 공용)
+# ==========================================================
+def load_breakdown(path: str, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+    """
+    JSONL → {"header", "t": [epoch], "cpu": {라벨: [%]}, "pss": {프로세스: [KB|None]}} (시각 정렬, 빈 값 0/None)
+    """
+    names: Dict[int, str] = {}
+    rows: List[Tuple[float, list, list]] = []
+    header: Dict[str, Any] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                o = json.loads(line)
+            except ValueError:
+                continue                      # 기록 중단된 마지막 줄
+            if "t" in o:
+                if (start is None or o["t"] >= start) and (end is None or o["t"] <= end):
+                    rows.append((o["t"], o.get("c") or [], o.get("m") or []))
+            elif "d" in o:
+                names[o["d"]] = o["n"]
+            elif "v" in o:
+                header = o
+    n = len(rows)
+    cpu: Dict[str, List[float]] = {}
+    pss: Dict[str, List[Optional[int]]] = {}
+    for i, (_, c, m) in enumerate(rows):
+        for k in range(0, len(c) - 1, 2):
+            lab = names.get(c[k])
+            if lab is not None:
+                cpu.setdefault(lab, [0.0] * n)[i] = c[k + 1] / 10.0
+        for k in range(0, len(m) - 1, 2):
+            lab = names.get(m[k])
+            if lab is not None:
+                pss.setdefault(lab[1:], [None] * n)[i] = m[k + 1]
+    return {"header": header, "t": [r[0] for r in rows], "cpu": cpu, "pss": pss}
+
+
+def from_history(hist: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """BreakdownSampler.history() → load_breakdown()과 같은 열 형태"""
+    n = len(hist)
+    cpu: Dict[str, List[float]] = {}
+    pss: Dict[str, List[Optional[int]]] = {}
+    for i, s in enumerate(hist):
+        for lab, v in s["cpu"].items():
+            cpu.setdefault(lab, [0.0] * n)[i] = v
+        for lab, v in s["pss"].items():
+            pss.setdefault(lab, [None] * n)[i] = v
+    return {"header": {}, "t": [s["t"] for s in hist], "cpu": cpu, "pss": pss}
+
+
+def summarize(data: Dict[str, Any], top: int = TOP_N) -> Dict[str, Any]:
+    """스레드 CPU 평균 상위 top개 + 프로세스별 PSS 평균/최대"""
+    n = len(data["t"]) or 1
+    threads = []
+    for lab, vals in data["cpu"].items():
+        s = sorted(vals)
+        threads.append({"label": lab, "avg": round(sum(vals) / n, 2), "max": round(s[-1], 1),
+                        "p95": round(s[min(len(s) - 1, int(0.95 * len(s)))], 1)})
+    threads.sort(key=lambda x: -x["avg"])
+    procs = []
+    for lab, vals in data["pss"].items():
+        v = [x for x in vals if x is not None]
+        if v:
+            procs.append({"label": lab, "pss_avg": int(sum(v) / len(v)), "pss_max": max(v),
+                          "cpu_avg": round(sum(sum(c) for k, c in data["cpu"].items()
+                                               if k.split("/", 1)[0] == lab) / n, 2)})
+    procs.sort(key=lambda x: -x["pss_max"])
+    return {"samples": len(data["t"]), "top": threads[:top], "threads": len(threads), "procs": procs}
+
+
+def downsample(data: Dict[str, Any], labels: List[str], n_out: int) -> Tuple[List[float], Dict[str, List[float]]]:
+    """누적 영역 그래프용 구간 평균 — top 라벨 + '기타'(나머지 합)"""
+    t = data["t"]
+    n = len(t)
+    if not n:
+        return [], {}
+    step = max(1, -(-n // max(1, n_out)))
+    keep = set(labels)
+    series = {lab: data["cpu"].get(lab, [0.0] * n) for lab in labels}
+    other = [0.0] * n
+    for lab, vals in data["cpu"].items():
+        if lab not in keep:
+            for i, v in enumerate(vals):
+                if v:
+                    other[i] += v
+    series["기타"] = other
+    ts = [sum(t[i:i + step]) / len(t[i:i + step]) for i in range(0, n, step)]
+    out = {lab: [sum(v[i:i + step]) / len(v[i:i + step]) for i in range(0, n, step)] for lab, v in series.items()}
+    return ts, out
+
+
+def find_breakdown_files(folder: str, start: float, end: float) -> List[str]:
+    """folder의 breakdown_*.jsonl 중 [start, end]와 겹칠 수 있는 파일 (헤더 시작 ≤ end, mtime ≥ start)"""
+    out = []
+    try:
+        names = sorted(n for n in os.listdir(folder) if n.startswith("breakdown_") and n.endswith(".jsonl"))
+    except OSError:
+        return out
+    for n in names:
+        p = os.path.join(folder, n)
+        try:
+            if os.path.getmtime(p) < start:
+                continue
+            with open(p, "r", encoding="utf-8") as f:
+                h = json.loads(f.readline() or "{}")
+            if float(h.get("started") or 0) <= end:
+                out.append(p)
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def load_breakdown_range(folder: str, start: float, end: float) -> Optional[Dict[str, Any]]:
+    """folder의 겹치는 breakdown 파일들을 [start, end] 구간으로 읽어 시간순 병합 (없으면 None)"""
+    files = find_breakdown_files(folder, start, end)
+    parts = [d for d in (load_breakdown(p, start, end) for p in files) if d["t"]]
+    if not parts:
+        return None
+    parts.sort(key=lambda d: d["t"][0])
+    t: List[float] = []
+    cpu: Dict[str, List[float]] = {}
+    pss: Dict[str, List[Optional[int]]] = {}
+    for d in parts:
+        off, n = len(t), len(d["t"])
+        t.extend(d["t"])
+        for key, src, fill in (("cpu", cpu, 0.0), ("pss", pss, None)):
+            for lab in set(src) | set(d[key]):
+                col = src.setdefault(lab, [fill] * off)
+                col.extend(d[key].get(lab) or [fill] * n)
+    return {"header": parts[0]["header"], "t": t, "cpu": cpu, "pss": pss,
+            "files": [os.path.basename(p) for p in files]}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="스레드/프로세스 상세 샘플러")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    lv = sub.add_parser("live", help="실시간 수집 + top 스레드 출력")
+    lv.add_argument("package")
+    lv.add_argument("--serial", default=None)
+    lv.add_argument("--sec", type=float, default=10.0)
+    lv.add_argument("--interval", type=float, default=1.0)
+    lv.add_argument("--out", default=None)
+    sh = sub.add_parser("show", help="저장 파일 요약")
+    sh.add_argument("path")
+    sh.add_argument("--top", type=int, default=TOP_N)
+    a = ap.parse_args(argv)
+    if a.cmd == "show":
+        print(json.dumps(summarize(load_breakdown(a.path), a.top), ensure_ascii=False, indent=2))
+        return 0
+    s = BreakdownSampler(a.serial, a.package, interval=a.interval, out_path=a.out).start()
+    t_end = time.time() + a.sec
+    try:
+        while time.time() < t_end:
+            time.sleep(a.interval)
+            s.ensure_alive()
+            last = s.latest()
+            if last:
+                top = sorted(last["cpu"].items(), key=lambda kv: -kv[1])[:5]
+                print(time.strftime("%H:%M:%S"), " | ".join(f"{k} {v:.1f}%" for k, v in top),
+                      "| PSS", ", ".join(f"{k}={v:,}" for k, v in last["pss"].items()))
+    finally:
+        s.stop()
+    print(f"samples={s.samples}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
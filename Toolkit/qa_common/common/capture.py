@@ -0,0 +1,482 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 화면 캡처/변화 감지 (scrcpy 스트림 grab_frame, FrameDiff)
+# ==========================================================
+# -*- coding: utf-8 -*-
+import os, time, subprocess, uuid, socket, math, cv2, threading
+import numpy as np
+from pathlib import Path
+from typing import Optional, Tuple, Dict
+from airtest.core.api import G
+from .core import QAEnv, _env_int, step, use_env
+from .profiler import profiled
+
+
+# ==========================================================
+# 📺 scrcpy 스트리밍 캡처 백엔드
+#  - 번들된 Toolkit/scrcpy/scrcpy-server 를 단말당 1회만 기동
+#  - H.264 raw 스트림을 호스트에서 디코딩 → 최신 프레임 1장만 유지(latest-frame buffer)
+#  - grab_frame(env) -> np.ndarray(BGR, 읽기 전용, 복사 없음)
+#  - PyAV(av) 미설치/서버 기동 실패 시 G.DEVICE.snapshot() 폴백
+#  - QA_CAPTURE_BACKEND = auto(기본) | scrcpy | airtest
+# ==========================================================
+_SCRCPY_VERSION = "3.3.4"                          # 번들 scrcpy-server 버전과 반드시 일치
+_SCRCPY_REMOTE_PATH = "/data/local/tmp/qa-scrcpy-server.jar"
+_SCRCPY_CAPS: Dict[str, "ScrcpyCapture"] = {}      # serial -> ScrcpyCapture
+_SCRCPY_DISABLED: Dict[str, str] = {}              # serial -> 실패 사유(재시도 폭주 방지)
+_SCRCPY_LOCK = threading.Lock()
+
+def _find_scrcpy_server(env: Optional['QAEnv'] = None) -> Optional[str]:
+    """scrcpy-server 경로 탐색: QA_SCRCPY_SERVER → env.script_dir/scrcpy → qa_common 기준 상위 폴더(Toolkit)."""
+    p = os.environ.get("QA_SCRCPY_SERVER")
+    if p and os.path.exists(p):
+        return p
+    cands = []
+    sd = getattr(env, "script_dir", None) if env is not None else None
+    if sd:
+        cands.append(os.path.join(str(sd), "scrcpy", "scrcpy-server"))
+    cands.append(os.path.join(str(Path(__file__).resolve().parents[2]), "scrcpy", "scrcpy-server"))
+    for c in cands:
+        if os.path.exists(c):
+            return c
+    return None
+
+def _capture_backend() -> str:
+    return (os.environ.get("QA_CAPTURE_BACKEND") or "auto").strip().lower()
+
+
+class ScrcpyCapture:
+    """
+    단말 1대당 scrcpy-server 1개를 띄우고, 수신 스레드가 H.264 를 계속 디코딩.
+    - 디코딩은 모든 패킷에 대해 수행(참조 프레임 유지 목적)
+    - ndarray 변환은 요청 시점에 최신 프레임 1장만 수행 후 캐시(seq 기준)
+    - 반환 배열은 writeable=False (호출측 변경으로 버퍼가 오염되지 않도록)
+    """
+
+    def __init__(self, serial: Optional[str], server_path: str, *,
+                 max_size: int = 0, max_fps: int = 30, bit_rate: int = 8_000_000,
+                 port: int = 0):
+        self.serial = serial
+        self.server_path = server_path
+        self.max_size = int(max_size)
+        self.max_fps = int(max_fps)
+        self.bit_rate = int(bit_rate)
+        self.port = int(port)
+        self.scid = "%08x" % (uuid.uuid4().int & 0x7FFFFFFF)
+
+        self._proc = None
+        self._sock = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._cond = threading.Condition()
+
+        self._frame = None          # 최신 av.VideoFrame (디코더 소유)
+        self._frame_ts = 0.0        # 최신 프레임 수신 시각(monotonic)
+        self._seq = 0               # 디코딩된 프레임 카운터
+        self._arr = None            # 최신 ndarray 캐시
+        self._arr_seq = -1
+        self.last_error: Optional[str] = None
+
+    # ---------- adb ----------
+    def _adb(self, *args, timeout: float = 15.0) -> str:
+        cmd = ["adb"]
+        if self.serial:
+            cmd += ["-s", self.serial]
+        cmd += list(args)
+        out = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+        txt = (out.stdout or b"").decode("utf-8", "ignore")
+        if out.returncode != 0:
+            raise RuntimeError(f"adb failed rc={out.returncode} cmd={cmd} output={txt.strip()}")
+        return txt
+
+    # ---------- lifecycle ----------
+    @property
+    def alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive() and not self._stop.is_set())
+
+    def start(self, timeout: float = 8.0) -> "ScrcpyCapture":
+        import av  # PyAV (optional) - 없으면 ImportError → 호출측 폴백
+
+        self._codec = av.CodecContext.create("h264", "r")
+        self._adb("push", self.server_path, _SCRCPY_REMOTE_PATH, timeout=30.0)
+
+        socket_name = f"scrcpy_{self.scid}"
+        if not self.port:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                s.bind(("127.0.0.1", 0))
+                self.port = s.getsockname()[1]
+        self._adb("forward", f"tcp:{self.port}", f"localabstract:{socket_name}")
+
+        server_args = [
+            f"scid={self.scid}",
+            "tunnel_forward=true",
+            "audio=false",
+            "control=false",
+            "cleanup=true",
+            "raw_stream=true",          # device/codec/frame meta 없이 H.264 Annex-B만 수신
+            "video_codec=h264",
+            f"max_size={self.max_size}",
+            f"max_fps={self.max_fps}",
+            f"video_bit_rate={self.bit_rate}",
+            "log_level=warn",
+        ]
+        cmd = ["adb"]
+        if self.serial:
+            cmd += ["-s", self.serial]
+        cmd += ["shell", f"CLASSPATH={_SCRCPY_REMOTE_PATH}", "app_process", "/",
+                "com.genymobile.scrcpy.Server", _SCRCPY_VERSION] + server_args
+        self._proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # 서버가 abstract socket을 열 때까지 connect 재시도
+        # (forward 모드에선 서버 listen 전에도 connect 자체는 성공하고 즉시 끊김 → 첫 데이터 수신으로 판정)
+        # ⚠️ 서버는 video 소켓 1개만 accept 하므로, 연결이 살아있으면 끊지 않고 데이터가 올 때까지 대기
+        deadline = time.time() + float(timeout)
+        first = b""
+        while time.time() < deadline and not first:
+            try:
+                sock = socket.create_connection(("127.0.0.1", self.port), timeout=1.0)
+            except OSError:
+                time.sleep(0.1)
+                continue
+            sock.settimeout(0.5)
+            while time.time() < deadline:
+                try:
+                    first = sock.recv(65536)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    first = b""
+                break
+            if first:
+                self._sock = sock
+                break
+            sock.close()
+            if self._proc.poll() is not None:
+                break
+            time.sleep(0.1)
+
+        if not self._sock:
+            self.stop()
+            raise RuntimeError(f"scrcpy-server 연결 실패(serial={self.serial}, port={self.port})")
+
+        self._sock.settimeout(None)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._reader, args=(first,),
+                                        name=f"scrcpy-{self.serial or 'default'}", daemon=True)
+        self._thread.start()
+
+        # 첫 프레임 대기(키프레임 디코딩까지)
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > 0 or self._stop.is_set(),
+                                timeout=max(0.5, deadline - time.time()))
+        if self._seq <= 0:
+            self.stop()
+            raise RuntimeError(f"scrcpy 첫 프레임 수신 실패(serial={self.serial})")
+        return self
+
+    def _reader(self, first: bytes):
+        data = first
+        try:
+            while not self._stop.is_set():
+                if data:
+                    for pkt in self._codec.parse(data):
+                        for fr in self._codec.decode(pkt):
+                            with self._cond:
+                                self._frame = fr
+                                self._frame_ts = time.monotonic()
+                                self._seq += 1
+                                self._cond.notify_all()
+                data = self._sock.recv(1 << 16)
+                if not data:
+                    self.last_error = "stream closed"
+                    break
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+        finally:
+            self._stop.set()
+            with self._cond:
+                self._cond.notify_all()
+
+    def stop(self):
+        self._stop.set()
+        try:
+            if self._sock:
+                self._sock.close()
+        except Exception:
+            pass
+        self._sock = None
+        try:
+            if self._proc and self._proc.poll() is None:
+                self._proc.terminate()
+        except Exception:
+            pass
+        self._proc = None
+        try:
+            if self.port:
+                self._adb("forward", "--remove", f"tcp:{self.port}", timeout=5.0)
+        except Exception:
+            pass
+
+    # ---------- frames ----------
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def wait_next(self, after_seq: int, timeout: float = 0.5) -> bool:
+        """after_seq 이후의 새 프레임이 들어올 때까지 대기. (정지 화면은 새 프레임이 거의 안 옴)"""
+        with self._cond:
+            return bool(self._cond.wait_for(lambda: self._seq > after_seq or self._stop.is_set(),
+                                            timeout=float(timeout))) and self._seq > after_seq
+
+    def latest(self):
+        """최신 프레임을 BGR ndarray로 반환(같은 프레임이면 캐시 재사용, 복사 없음)."""
+        with self._cond:
+            fr, sq = self._frame, self._seq
+        if fr is None:
+            return None
+        if sq != self._arr_seq:
+            arr = fr.to_ndarray(format="bgr24")
+            arr.flags.writeable = False
+            self._arr, self._arr_seq = arr, sq
+        return self._arr
+
+
+def get_scrcpy_capture(env: Optional['QAEnv'] = None, *, start: bool = True) -> Optional[ScrcpyCapture]:
+    """
+    단말별 ScrcpyCapture 싱글톤 반환. 기동 실패 시 None(사유는 _SCRCPY_DISABLED에 기록, 재시도 안 함).
+    """
+    env = use_env(env)
+    serial = getattr(env, "serial", None) or os.environ.get("ANDROID_SERIAL") or ""
+    with _SCRCPY_LOCK:
+        cap = _SCRCPY_CAPS.get(serial)
+        if cap is not None and cap.alive:
+            return cap
+        if not start or serial in _SCRCPY_DISABLED:
+            return None
+
+        server = _find_scrcpy_server(env)
+        if not server:
+            _SCRCPY_DISABLED[serial] = "scrcpy-server not found"
+            return None
+        try:
+            cap = ScrcpyCapture(
+                serial or None, server,
+                max_size=_env_int("QA_SCRCPY_MAX_SIZE", 0),
+                max_fps=_env_int("QA_SCRCPY_MAX_FPS", 30),
+                bit_rate=_env_int("QA_SCRCPY_BIT_RATE", 8_000_000),
+            ).start()
+            _SCRCPY_CAPS[serial] = cap
+            if env is not None:
+                step(f"[CAPTURE] scrcpy stream started (serial={serial or '-'}, port={cap.port})", env=env)
+            return cap
+        except Exception as e:
+            _SCRCPY_DISABLED[serial] = f"{type(e).__name__}: {e}"
+            if env is not None:
+                step(f"[CAPTURE] scrcpy 사용 불가 → airtest snapshot 폴백: {e}", env=env)
+            return None
+
+def stop_scrcpy_capture(env: Optional['QAEnv'] = None, *, all_devices: bool = False):
+    env = use_env(env)
+    with _SCRCPY_LOCK:
+        keys = list(_SCRCPY_CAPS.keys()) if all_devices else [getattr(env, "serial", None) or os.environ.get("ANDROID_SERIAL") or ""]
+        for k in keys:
+            cap = _SCRCPY_CAPS.pop(k, None)
+            if cap is not None:
+                cap.stop()
+
+@profiled("grab_frame")
+def grab_frame(env: Optional['QAEnv'] = None, *, fresh: bool = False, fresh_timeout: float = 0.15):
+    """
+    화면 변화 판정용 프레임 1장(BGR ndarray) 반환.
+    - scrcpy 스트림 사용 가능 시: 최신 프레임(수십 ms 이내) / fresh=True면 다음 프레임을 잠깐 대기
+    - 불가 시: G.DEVICE.snapshot()
+    ⚠️ 반환 배열은 읽기 전용일 수 있음(수정이 필요하면 호출측에서 copy)
+    """
+    backend = _capture_backend()
+    if backend != "airtest":
+        cap = get_scrcpy_capture(env)
+        if cap is not None:
+            if fresh:
+                cap.wait_next(cap.seq, timeout=fresh_timeout)
+            img = cap.latest()
+            if img is not None:
+                return img
+    try:
+        return G.DEVICE.snapshot()
+    except Exception:
+        return None
+
+def _xy_to_frame(x: float, y: float, src_w: int, src_h: int, frame) -> Tuple[int, int]:
+    """src(스샷/화면) 좌표계 → frame 좌표계 변환. (scrcpy max_size 다운스케일 대응)"""
+    try:
+        fh, fw = frame.shape[:2]
+        if src_w and src_h and (fw != src_w or fh != src_h):
+            return int(round(x * fw / float(src_w))), int(round(y * fh / float(src_h)))
+    except Exception:
+        pass
+    return int(round(x)), int(round(y))
+
+
+# ==========================================================
+# 🎞️ 화면 변화/이동 감지기 (FrameDiff)
+#  - 다운스케일 grayscale 썸네일(사전 할당 버퍼) 기반 → 프레임당 수 ms
+#  - score: 썸네일 평균 절대차(0~255) / changed_ratio: 노이즈 임계 초과 픽셀 비율
+#  - dx, dy: phase correlation 으로 추정한 이동량(원본 px, 부호 = 콘텐츠 이동 방향)
+#  - tap_images / scroll_until_visible / _tap_xy(_roi_changed) 공용
+# ==========================================================
+class FrameDelta:
+    """두 프레임 간 변화량 요약."""
+    __slots__ = ("score", "changed_ratio", "dx", "dy", "response")
+
+    def __init__(self, score: float, changed_ratio: float, dx: float = 0.0, dy: float = 0.0, response: float = 0.0):
+        self.score = float(score)
+        self.changed_ratio = float(changed_ratio)
+        self.dx = float(dx)
+        self.dy = float(dy)
+        self.response = float(response)
+
+    @property
+    def moved_px(self) -> float:
+        return math.hypot(self.dx, self.dy)
+
+    def is_static(self, *, score_thr: float = 0.8, motion_px: float = 4.0, min_response: float = 0.15) -> bool:
+        """
+        '스크롤/이동 없음' 판정.
+        - 거의 같은 화면(score 낮음) → static
+        - 위상상관 응답이 충분한데 이동량이 motion_px 미만 → static (깜빡임/애니메이션만 있는 경우)
+        """
+        if self.score < float(score_thr):
+            return True
+        return self.response >= float(min_response) and self.moved_px < float(motion_px)
+
+    def __repr__(self):
+        return (f"FrameDelta(score={self.score:.2f}, changed={self.changed_ratio:.3f}, "
+                f"dx={self.dx:.1f}, dy={self.dy:.1f}, resp={self.response:.2f})")
+
+
+class FrameDiff:
+    """
+    프레임 변화 감지기. 해상도가 바뀌지 않는 한 버퍼를 재할당하지 않는다.
+    - update(img): 직전 update() 프레임 대비 FrameDelta (첫 호출은 None)
+    - compare(a, b): 두 프레임 직접 비교
+    """
+
+    def __init__(self, width: int = 160, noise_thr: int = 12):
+        self.width = int(width)
+        self.noise_thr = int(noise_thr)
+        self._src_shape = None
+        self._size = (0, 0)
+        self._cur = 0
+        self._has_prev = False
+
+    def _ensure(self, img):
+        h, w = img.shape[:2]
+        if self._src_shape == (h, w):
+            return
+        tw = max(16, min(self.width, w))
+        th = max(16, int(round(h * tw / float(w))))
+        self._src_shape = (h, w)
+        self._size = (tw, th)
+        self._scale = (w / float(tw), h / float(th))
+        self._small = np.empty((th, tw, 3), np.uint8)
+        self._gray = [np.empty((th, tw), np.uint8), np.empty((th, tw), np.uint8)]
+        self._f32 = [np.empty((th, tw), np.float32), np.empty((th, tw), np.float32)]
+        self._diff = np.empty((th, tw), np.uint8)
+        self._mask = np.empty((th, tw), np.uint8)
+        self._win = cv2.createHanningWindow((tw, th), cv2.CV_32F)
+        self._has_prev = False
+
+    def _thumb(self, img, slot: int):
+        tw, th = self._size
+        g = self._gray[slot]
+        if getattr(img, "ndim", 0) == 3:
+            src = img if img.shape[2] == 3 else img[:, :, :3]
+            cv2.resize(src, (tw, th), dst=self._small, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=g)
+        else:
+            cv2.resize(img, (tw, th), dst=g, interpolation=cv2.INTER_AREA)
+        return g
+
+    def _delta(self, a_slot: int, b_slot: int, motion: bool) -> FrameDelta:
+        a, b = self._gray[a_slot], self._gray[b_slot]
+        cv2.absdiff(a, b, dst=self._diff)
+        score = float(cv2.mean(self._diff)[0])
+        cv2.threshold(self._diff, self.noise_thr, 255, cv2.THRESH_BINARY, dst=self._mask)
+        ratio = cv2.countNonZero(self._mask) / float(self._mask.size)
+        dx = dy = resp = 0.0
+        if motion and score >= 0.5:
+            fa, fb = self._f32[a_slot], self._f32[b_slot]
+            fa[...] = a
+            fb[...] = b
+            (sx, sy), resp = cv2.phaseCorrelate(fa, fb, self._win)
+            dx, dy = sx * self._scale[0], sy * self._scale[1]
+        return FrameDelta(score, ratio, dx, dy, resp)
+
+    def reset(self):
+        self._has_prev = False
+
+    def update(self, img, *, motion: bool = True) -> Optional[FrameDelta]:
+        if img is None or not hasattr(img, "shape"):
+            return None
+        self._ensure(img)
+        nxt = 1 - self._cur
+        self._thumb(img, nxt)
+        had_prev = self._has_prev
+        prev, self._cur, self._has_prev = self._cur, nxt, True
+        if not had_prev:
+            return None
+        return self._delta(prev, nxt, motion)
+
+    def compare(self, a, b, *, motion: bool = True) -> Optional[FrameDelta]:
+        if a is None or b is None or not hasattr(a, "shape") or not hasattr(b, "shape"):
+            return None
+        if a.shape[:2] != b.shape[:2]:
+            return None
+        self._ensure(a)
+        self._thumb(a, 0)
+        self._thumb(b, 1)
+        self._cur, self._has_prev = 1, True
+        return self._delta(0, 1, motion)
+
+
+_ROI_DIFF = threading.local()   # 스레드별 ROI 전용 FrameDiff(버퍼 재사용)
+
+
+def frame_roi_delta(before_img, after_img, x: int, y: int, r: int = 60) -> Optional[FrameDelta]:
+    """
+    (x, y) 중심 반경 r ROI를 FrameDiff(64px 다운스케일 grayscale)로 비교. 비교 불가면 None.
+    - ROI는 슬라이스 뷰만 넘김(사본 없음), 압축/스케일 노이즈는 INTER_AREA 축소로 평균화
+    """
+    if before_img is None or after_img is None:
+        return None
+    bh, bw = before_img.shape[:2]
+    if after_img.shape[:2] != (bh, bw):
+        return None
+    x1 = max(0, x - r); y1 = max(0, y - r)
+    x2 = min(bw, x + r); y2 = min(bh, y + r)
+    if (x2 - x1) < 10 or (y2 - y1) < 10:
+        return None
+    fd = getattr(_ROI_DIFF, "fd", None)
+    if fd is None:
+        fd = _ROI_DIFF.fd = FrameDiff(width=64)
+    return fd.compare(before_img[y1:y2, x1:x2], after_img[y1:y2, x1:x2], motion=False)
+
+
+def frame_roi_score(before_img, after_img, x: int, y: int, r: int = 60) -> Optional[float]:
+    """(x, y) 중심 반경 r ROI의 평균 절대차(다운스케일 grayscale, 0~255). 비교 불가면 None."""
+    d = frame_roi_delta(before_img, after_img, x, y, r=r)
+    return None if d is None else d.score
+
+
+def _roi_changed(before_img, after_img, x: int, y: int, *, r: int = 60, mean_abs_thr: float = 2.0) -> bool:
+    """
+    탭 주변 ROI 변화 여부로 '무반응'을 판정 (frame_roi_delta → FrameDiff 다운스케일 비교).
+    - r: ROI 반경(대략 50~80 권장)
+    - mean_abs_thr: 평균 절대차 임계값(화면/압축 노이즈에 따라 1.5~4.0 권장)
+    """
+    try:
+        mean_abs = frame_roi_score(before_img, after_img, int(x), int(y), r=int(r))
+        if mean_abs is None:
+            return True  # 검증 불가(None/해상도 불일치/ROI 과소)면 무반응으로 단정하지 않음(보수)
+        return mean_abs >= float(mean_abs_thr)
+    except Exception:
+        return True
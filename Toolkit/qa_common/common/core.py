@@ -0,0 +1,646 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 환경(QAEnv)/실행 컨텍스트, 로그(step·soft_fail·note), 공통 헬퍼
+# ==========================================================
+# -*- coding: utf-8 -*-
+import os, time, subprocess, pathlib, re, json, datetime, threading
+from typing import Optional, Callable, Dict, List, Any
+from airtest.core.api import log, snapshot, assert_equal
+from airtest.core.settings import Settings as ST
+from .profiler import mark_step, profile_span, reset_profile
+
+
+# 합리적인 기본값(필요 시 조정)
+ST.FIND_TIMEOUT = 1.5         # 기본 3s → 1.5s
+ST.FIND_TIMEOUT_TMP = 0.5     # 임시 탐색 기본 0.5s
+ST.SNAPSHOT_QUALITY = 10      # 기본 80 → 10 (용량/속도 절충)
+# ST.IMAGE_MAXSIZE = 1200     # 고해상도 기기에서 다운스케일 원하면 주석 해제
+ST.LOG_DIR = None              # Airtest 기본 리포트 스냅샷 폴더 미생성(별도 리포트 사용시)
+
+# 현재 실행 중인 QAEnv (옵션)
+_CURRENT_ENV: "QAEnv | None" = None
+
+def set_current_env(env: "QAEnv | None"):
+    """TC 진입/런너에서 현재 env를 등록해두고, 공통 함수들이 폴백용으로 사용."""
+    global _CURRENT_ENV
+    _CURRENT_ENV = env
+
+def get_current_env() -> "QAEnv | None":
+    return _CURRENT_ENV
+
+def use_env(env: "QAEnv | None" = None) -> "QAEnv | None":
+    """공통 함수에서 env 인자를 안 넘겼을 때 전역 current_env 로 폴백."""
+    return env if env is not None else _CURRENT_ENV
+
+# 환경 설정 및 공통 함수
+class QAEnv:
+    def __init__(self, package: str, script_dir: str, out_dir_root: str,
+                 serial: Optional[str] = None, per_device_dir: bool = True,
+                 restart_delay: float = 1.0,
+                 ui_mode: str = "native", # ⬅️ 추가: unity | native
+                 app_start=None,
+                 # 🔹 신규 필드(앱별 기본 콜백)
+                 on_ready: Optional[Callable[[], None]] = None,
+                 on_close: Optional[Callable[[], None]] = None,
+                 airtest_script=None,
+                 suite: str = "tc_suite",
+                 runner: str = "local",
+                 use_run: bool = True,
+                 mail_max_attach: int = 20,
+                 gdrive_enable: bool = False,
+                 gdrive_folder_id: str = None,
+                 gdrive_share_anyone: bool = False,
+                 ):
+        self.package = package
+        self.script_dir = os.path.abspath(script_dir)
+        self.serial = serial or resolve_serial()
+
+        # per-device root (기존 out_dir 의미를 보존)
+        device_root = (os.path.join(os.path.abspath(out_dir_root), self.serial or "default")
+                    if per_device_dir else os.path.abspath(out_dir_root))
+        self.device_out_dir = os.path.abspath(device_root)
+        pathlib.Path(self.device_out_dir).mkdir(parents=True, exist_ok=True)
+
+        # Poco 비활성화 타이머
+        self._poco_disabled_until = 0.0
+
+        # Run 표준 정보
+        self.run_suite = suite
+        self.run_runner = runner
+
+        self.run_started_ts = time.time()
+        self.run_started_at = _kst_now_iso()
+        self.run_ended_at = ""
+        self.run_duration_sec = 0
+        self.run_counts = {"PASS": 0, "FAIL": 0, "WARN": 0, "N/A": 0, "SKIP": 0}
+        self.run_notes: List[str] = []
+        self.run_artifacts: Dict[str, str] = {}
+        self.run_fail_logs: List[Dict[str, str]] = []
+        self.run_warn_logs: List[Dict[str, str]] = []
+        self.run_timings: List[Dict[str, Any]] = []   # 플로우/서브플로우 소요시간(이력 DB 기록용)
+        reset_profile()   # 스텝/헬퍼 프로파일 span 버퍼 초기화 (finalize_run에서 profile_trace.json 저장)
+
+        self.mail_max_attach = mail_max_attach
+
+        self.gdrive_enable = gdrive_enable
+        self.gdrive_folder_id = gdrive_folder_id
+        self.gdrive_share_anyone = gdrive_share_anyone
+
+        # ✅ 실패 누적 카운터(메인/서브 공통)
+        self.total_fail: int = 0
+
+        # ✅ 실패 로그(메인/서브 공통)
+        # 예: {"kind":"flow"|"subflow", "iter":1, "flow":"Basic", "name":"서브단계", "error":"..."}
+        self.fail_logs: List[Dict[str, object]] = []
+
+        # ✅ 실행 컨텍스트(서브플로우가 iter/부모 flow를 알 수 있도록)
+        self._ctx_iter: Optional[int] = None
+        self._ctx_flow: Optional[str] = None
+
+
+        # Run 디렉토리 구성
+        self.run_id = _make_run_id(self.package, self.run_suite, self.run_runner)
+
+        # out_dir을 Run 디렉토리로 승격(= 기존 코드 호환 핵심)
+        if use_run:
+            self.run_dir = os.path.join(self.device_out_dir, self.run_id)
+        else:
+            self.run_dir = self.device_out_dir
+
+        _safe_mkdir(self.run_dir)
+
+        self.run_meta_path = os.path.join(self.run_dir, "meta.json")
+        self.run_summary_path = os.path.join(self.run_dir, "summary.html")
+        self.run_log_path = os.path.join(self.run_dir, "run.log")
+
+        # 기존 코드가 기대하는 out_dir은 run_dir로 설정
+        self.out_dir = self.run_dir
+
+        # 디바이스/앱 정보 수집(실패해도 무시)
+        try:
+            _collect_device_app_info(self)
+        except Exception:
+            pass
+
+
+        # 드라이버 핸들
+        self.apoco = None        # AndroidUiautomationPoco (Native)
+        self.upoco = None        # UnityPoco (Unity)
+        self.poco = None         # ⬅️ 항상 "현재 모드"의 드라이버를 가리키도록 유지
+        self.poco_active = None  # ⬅️ 동의어
+
+        self.ui_mode = ui_mode.lower().strip()  # 'unity' or 'native'
+        self.restart_delay = restart_delay
+        self._rm_proc = None
+
+        # 🔹 앱별 스타트 콜백 (예: literacy_start)
+        self.app_start = app_start    # type: Optional[Callable[[], None]]
+
+        # 🔹 신규: 앱별 기본 콜백
+        self.on_ready = on_ready               # 앱 준비 완료 콜백
+        self.on_close = on_close               # 앱 종료 전 처리 콜백
+
+        self.handle_exceptions: Optional[Callable[[Exception, 'QAEnv'], int]] = None  # 예외 처리기
+
+        # 🔹 Airtest 리포트 관련 정보(옵션)
+        self.airtest_script  = airtest_script   # __file__ of TC script
+        self.airtest_log_dir = os.path.join(self.out_dir, "airtest_log")   # airtest_log 디렉터리
+        pathlib.Path(self.airtest_log_dir).mkdir(parents=True, exist_ok=True)
+
+    def set_ui_mode(self, mode: str):
+        self.ui_mode = (mode or "").lower().strip()
+        # 드라이버가 이미 만들어져 있다면 포인터만 교체
+        if self.ui_mode == "native" and self.apoco:
+            self.poco_active = self.apoco
+        elif self.ui_mode == "unity" and self.upoco:
+            self.poco_active = self.upoco
+        else:
+            self.poco_active = None
+        self.poco = self.poco_active  # 동기화
+
+
+# 연결된 장치가 하나일 때 그 시리얼 반환, 없거나 둘 이상이면 None
+def resolve_serial() -> Optional[str]:
+    s = os.environ.get("ANDROID_SERIAL") or os.environ.get("ADB_SERIAL")
+    if s: return s
+    try:
+        out = subprocess.check_output(["adb","devices"], encoding="utf-8", errors="ignore")
+        ser = [ln.split()[0] for ln in out.splitlines() if ln.strip().endswith("device") and "List" not in ln]
+        return ser[0] if len(ser)==1 else None
+    except Exception:
+        return None
+
+# ADB 환경 변수 설정
+def adb_env(env: QAEnv):
+    e = dict(os.environ)
+    if env.serial: 
+        e["ADB_SERIAL"] = env.serial
+        e["ANDROID_SERIAL"] = env.serial   # ← 추가
+    e["RESULT_DIR"] = env.out_dir
+    return e
+
+# 문자열을 쉘 로그용으로 변환 (특수문자 제거/치환)
+def _sanitize_for_shell_log(msg: str) -> str:
+    s = str(msg)
+    # 줄바꿈/탭 -> 공백
+    s = s.replace("\r", " ").replace("\n", " ").replace("\t", " ")
+    # 따옴표 정리
+    s = s.replace('"', "'")
+    # 쉘에서 의미를 갖는 심볼 최소화
+    # (){}[] ; | & < > $ ` \  등을 제거 또는 공백 치환
+    s = re.sub(r"[(){}<>$`\\]", "", s)
+    s = s.replace("->", " to ")
+    s = s.replace("|", " | ")
+    s = s.replace("&", " and ")
+    s = s.replace(";", " ; ")
+    # 쉼표는 토큰 구분이 명확하도록 앞에 공백
+    s = s.replace(",", " ,")
+    # 공백 정리(여러 개 → 하나)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+def _kst_now_iso() -> str:
+    dt = datetime.datetime.now(datetime.timezone(datetime.timedelta(hours=9)))
+    return dt.isoformat(timespec="seconds")
+
+def _run_id_timestamp() -> str:
+    return time.strftime("%Y%m%d_%H%M%S")
+
+def _guess_tools_dir_from_script_dir(script_dir: str) -> str:
+    """
+    운영 기준:
+      - QA_SCRIPT가 Tools 루트로 쓰이지만, common에서는 script_dir 기반으로 역추정도 허용
+      - script_dir가 Tools 하위(예: Tools\qa_common)라면 한 단계 위가 Tools일 확률이 높음
+    """
+    # 1) QA_SCRIPT 환경변수 우선
+    qs = os.environ.get("QA_SCRIPT")
+    if qs:
+        return os.path.abspath(qs)
+
+    # 2) script_dir 기준 폴백
+    sd = os.path.abspath(script_dir or "")
+    parent = os.path.abspath(os.path.join(sd, os.pardir))
+    return parent
+
+def _result_root_dir(script_dir: str) -> str:
+    # 표준: Tools\result
+    tools_dir = _guess_tools_dir_from_script_dir(script_dir)
+    return os.path.join(tools_dir, "result")
+
+def _make_run_id(package: str, suite: str, runner: str) -> str:
+    ts = _run_id_timestamp()
+    pkg = (package or "unknown").strip()
+    st = (suite or "literacy").strip()
+    rn = (runner or "local").strip()
+    return f"{ts}_{pkg}_{st}_{rn}"
+
+def _safe_mkdir(path: str) -> str:
+    pathlib.Path(path).mkdir(parents=True, exist_ok=True)
+    return path
+
+def _write_json(path: str, obj: Dict[str, Any]):
+    _safe_mkdir(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+def _append_line(path: str, line: str):
+    _safe_mkdir(os.path.dirname(path))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+# 파일 상단(또는 함수 위)에서 컴파일 권장
+# '단어 경계'를 공백만으로 제한하지 않고, 구두점/이모지/콜론 등도 경계로 인정
+# 다만 변수명/객체명에 흔한 '_'는 "단어 내부"로 취급하여 btn_skip 같은 건 매치되지 않게 함.
+_TOKEN_PATTERNS = {
+    "FAIL": re.compile(r'(^|[^A-Z0-9_])FAIL([^A-Z0-9_]|$)'),
+    "PASS": re.compile(r'(^|[^A-Z0-9_])PASS([^A-Z0-9_]|$)'),
+    "WARN": re.compile(r'(^|[^A-Z0-9_])WARN([^A-Z0-9_]|$)'),
+    "SKIP": re.compile(r'(^|[^A-Z0-9_])SKIP([^A-Z0-9_]|$)'),
+    # N/A는 특수문자 포함이라 별도 처리
+    "NA_SLASH": re.compile(r'(^|[^A-Z0-9_])N\s*/\s*A([^A-Z0-9_]|$)'),
+    # "NA" 단독을 쓰는 경우까지 지원하고 싶으면 활성화(오염 위험은 낮지만 제로는 아님)
+    # "NA": re.compile(r'(^|[^A-Z0-9_])NA([^A-Z0-9_]|$)'),
+}
+
+def _normalize_status_from_msg(msg: str) -> Optional[str]:
+    u = (msg or "").upper()
+
+    # 우선순위: FAIL이 PASS보다 앞 (예: "FAIL PASS" 같은 혼재 시 FAIL 우선)
+    if _TOKEN_PATTERNS["FAIL"].search(u):
+        return "FAIL"
+    if _TOKEN_PATTERNS["PASS"].search(u):
+        return "PASS"
+    if _TOKEN_PATTERNS["WARN"].search(u):
+        return "WARN"
+    if _TOKEN_PATTERNS["SKIP"].search(u):
+        return "SKIP"
+
+    if _TOKEN_PATTERNS["NA_SLASH"].search(u):
+        return "N/A"
+
+    # 필요 시: "N A" 형태도 허용하고 싶으면 아래 추가 (현재는 보수적으로 비활성)
+    # if re.search(r'(^|[^A-Z0-9_])N\s+A([^A-Z0-9_]|$)', u):
+    #     return "N/A"
+    return None
+
+def _collect_device_app_info(env: "QAEnv"):
+    """
+    meta/summary에 넣기 위한 최소 정보 수집.
+    실패해도 테스트 흐름은 깨지지 않도록 예외 삼킴.
+    - 단말 정보는 단말 프로파일 캐시(devprofile) 우선, 캐시 실패 시 기존 adb 조회
+    - 앱 버전은 QAEnv마다 dumpsys 1회로 재조회(refresh_app) → 직전 재설치 빌드도 meta.json에 정확히 기록
+    """
+    try:
+        from .devprofile import get_device_profile
+        prof = get_device_profile(env.serial, env.package, refresh_app=True)
+        app = (prof.get("apps") or {}).get(env.package)
+        if prof and app is not None:
+            env.device_model = prof.get("model") or ""
+            env.device_os_version = prof.get("os_version") or ""
+            env.device_sdk = prof.get("sdk") or ""
+            env.app_version_name = app.get("version_name") or ""
+            env.app_version_code = app.get("version_code") or ""
+            return
+    except Exception:
+        pass
+
+    try:
+        # device
+        env.device_model = (_adb_exec(env, "shell", "getprop", "ro.product.model") or "").strip()
+        env.device_os_version = (_adb_exec(env, "shell", "getprop", "ro.build.version.release") or "").strip()
+        env.device_sdk = (_adb_exec(env, "shell", "getprop", "ro.build.version.sdk") or "").strip()
+    except Exception:
+        pass
+
+    try:
+        # app version (dumpsys package)
+        out = _adb_exec(env, "shell", "dumpsys", "package", env.package) or ""
+        m1 = re.search(r"\bversionName=([^\s]+)", out)
+        m2 = re.search(r"\bversionCode=(\d+)", out)
+        env.app_version_name = m1.group(1) if m1 else ""
+        env.app_version_code = m2.group(1) if m2 else ""
+    except Exception:
+        pass
+
+# ========================================================
+# 구조화 이벤트 송신 (qa_orchestrator 연동)
+#   - QA_EVENT_ADDR(host:port) + QA_EVENT_KEY(hex) 환경변수가 있을 때만 동작
+#   - 연결 실패/끊김 시 이후 송신은 조용히 중단 (테스트 흐름에 영향 없음)
+#   - event_request(): 요청/응답 1왕복 (샤딩 작업 분배용)
+# ========================================================
+_EVENT_CONN = None
+_EVENT_OFF = False
+_EVENT_LOCK = threading.Lock()
+
+def _event_conn():
+    global _EVENT_CONN, _EVENT_OFF
+    if _EVENT_CONN is not None or _EVENT_OFF:
+        return _EVENT_CONN
+    addr = (os.environ.get("QA_EVENT_ADDR") or "").strip()
+    if not addr:
+        _EVENT_OFF = True
+        return None
+    try:
+        from multiprocessing.connection import Client
+        host, port = addr.rsplit(":", 1)
+        key = bytes.fromhex(os.environ.get("QA_EVENT_KEY") or "") or None
+        _EVENT_CONN = Client((host, int(port)), authkey=key)
+    except Exception:
+        _EVENT_OFF = True
+    return _EVENT_CONN
+
+def emit_event(kind: str, msg: str = "", status: Optional[str] = None,
+               env: Optional["QAEnv"] = None, **extra):
+    """오케스트레이터로 구조화 이벤트 1건 전송 (미설정 시 no-op)"""
+    global _EVENT_CONN, _EVENT_OFF
+    if _EVENT_OFF:
+        return
+    env = use_env(env)
+    with _EVENT_LOCK:
+        conn = _event_conn()
+        if conn is None:
+            return
+        evt = {
+            "kind": kind,
+            "ts": time.time(),
+            "job": os.environ.get("QA_EVENT_JOB", ""),
+            "serial": (getattr(env, "serial", None) if env else None) or resolve_serial(),
+            "msg": str(msg),
+            "status": status,
+            "iter": getattr(env, "_ctx_iter", None) if env else None,
+            "flow": getattr(env, "_ctx_flow", None) if env else None,
+        }
+        evt.update(extra)
+        try:
+            conn.send(evt)
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            _EVENT_CONN = None
+            _EVENT_OFF = True
+def event_request(kind: str, timeout: float = 30.0, env: Optional["QAEnv"] = None, **payload) -> Optional[Dict[str, Any]]:
+    """오케스트레이터에 요청 1건 전송 후 응답 dict 수신 (샤딩 작업 분배 등). 채널 없음/실패 시 None"""
+    global _EVENT_CONN, _EVENT_OFF
+    if _EVENT_OFF:
+        return None
+    env = use_env(env)
+    with _EVENT_LOCK:
+        conn = _event_conn()
+        if conn is None:
+            return None
+        req = {
+            "kind": kind,
+            "req": True,
+            "ts": time.time(),
+            "job": os.environ.get("QA_EVENT_JOB", ""),
+            "serial": (getattr(env, "serial", None) if env else None) or resolve_serial(),
+        }
+        req.update(payload)
+        try:
+            conn.send(req)
+            if not conn.poll(timeout):
+                raise TimeoutError(f"event_request timeout: {kind}")
+            rep = conn.recv()
+            return rep if isinstance(rep, dict) else None
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            _EVENT_CONN = None
+            _EVENT_OFF = True
+            return None
+# 구조화 이벤트 송신 END =================================
+
+# ========================================================
+# 스크립트 활용 로그 기록 유틸
+#   - 기본 단계 로그 기록: step() - run_log, adb, 스냅샷(옵션), FAIL 문구 assertion(Airtest Fail로그) 기록
+#   - 실패 단계 로그 기록: soft_fail() - run_log, adb, assertion 기본 기록(스냅샷 디폴트), 추가 스냅샷(옵션)
+# ========================================================
+# 단계 표시 및 스냅샷/로그캣 기록 (adb용만 sanitize)
+def step(msg: str, shot: bool=False, env: Optional[QAEnv]=None):
+    # 사람이 보는 콘솔/리포트 로그는 원문 유지
+    env = use_env(env)
+    mark_step(msg)  # 프로파일러 STEP 마커 (다음 마커까지를 한 구간으로 집계)
+    try:
+        log(f"🔖 {msg}")
+    except Exception:
+        pass
+
+    if shot:
+        try:
+            with profile_span("snapshot", "step"):
+                snapshot(msg=f"🔖 {msg}")
+        except Exception:
+            pass
+    
+    # ✅ Run 표준 로그 기록 + 카운트 누적 (기존 동작에 영향 없음)
+    try:
+        if env is not None and getattr(env, "run_log_path", None):
+            ts = time.strftime("%H:%M:%S")
+            _append_line(env.run_log_path, f"[{ts}] {msg}")
+            st = _normalize_status_from_msg(msg)
+            if st:
+                env.run_counts[st] = int(env.run_counts.get(st, 0)) + 1
+
+                # ✅ WARN 상세 누적 (summary/meta 출력용)
+                if st == "WARN":
+                    try:
+                        if not hasattr(env, "run_warn_logs") or env.run_warn_logs is None:
+                            env.run_warn_logs = []
+                        env.run_warn_logs.append({
+                            "time": ts,
+                            "msg": str(msg),
+                        })
+                    except Exception:
+                        pass
+                
+                # ✅ FAIL 상세 누적 (summary/meta 출력용), total_fail도 증가 (record_fail 제거 후에도 최종 실패 건수 유지)
+                if st == "FAIL":
+                    try:
+                        assert_equal(True, False, msg)
+                    except AssertionError:
+                        pass
+                    except Exception:
+                        pass
+                    try:
+                        # total_fail도 동기화
+                        if not hasattr(env, "total_fail") or env.total_fail is None:
+                            env.total_fail = 0
+                        env.total_fail = int(env.total_fail) + 1
+                        
+                        # Failures 상세 누적
+                        if not hasattr(env, "run_fail_logs") or env.run_fail_logs is None:
+                            env.run_fail_logs = []
+
+                        # iter가 있으면 iter, 없으면 시간으로 대체(= run_flows 이전 FAIL도 표시 가능)
+                        iter_val = getattr(env, "_ctx_iter", None)
+                        iter_show = str(iter_val) if iter_val is not None else ts
+
+                        env.run_fail_logs.append({
+                            "iter": iter_show,
+                            "name": str(getattr(env, "_ctx_flow", "") or "STEP"),
+                            "error": str(msg),
+                            # 확장 필드(템플릿이 무시해도 무방)
+                            "kind": "step",
+                            "flow": str(getattr(env, "_ctx_flow", "") or ""),
+                            "time": ts,
+                        })
+                    except Exception:
+                        pass
+
+    except Exception:
+        pass
+
+    # ✅ 오케스트레이터 이벤트(설정된 경우만)
+    emit_event("step", msg, _normalize_status_from_msg(msg), env)
+
+    # adb shell 로 전달하는 메시지에서만 특수문자 정규화
+    try:
+        safe = _sanitize_for_shell_log(msg)
+        adb_env_map = adb_env(env) if env else None
+        subprocess.call(
+            ["adb", "shell", "log", "-t", "QA", f"[STEP] {safe}"],
+            env=adb_env_map
+        )
+    except Exception:
+        # 로깅 실패가 테스트를 깨뜨리지 않도록 무시
+        pass
+
+# 실패 assertion 기록 및 플로우 계속 진행 유틸
+def soft_fail(msg: str, *, shot: bool = False, env: Optional[QAEnv] = None) -> bool:
+    """
+    Airtest 리포트에 '실패 assertion'을 남기기만 하는 용도.
+    호출 후에는 기존 흐름대로 raise를 던지면 run_flows가 캐치하여 계속 진행 가능.
+    """
+    env = use_env(env)
+    # 핵심: 실패 assertion을 남기되, AssertionError는 즉시 catch
+    try:
+        assert_equal(True, False, msg)
+    except AssertionError:
+        pass
+    except Exception:
+        pass
+
+    try:
+        log(f"❌ {msg}")
+    except Exception:
+        pass
+
+    # 필요 시 스냅샷(assert_equal에서 실패 시 남기지 못했을 때 대비)
+    if shot:
+        try:
+            with profile_span("snapshot", "soft_fail"):
+                snapshot(msg=f"❌ {msg}")
+        except Exception:
+            pass
+    
+    # ✅ Run 표준 FAIL 1건으로 누적 (msg 내용과 무관하게 항상 실패로 기록)
+    try:
+        if env is not None and getattr(env, "run_log_path", None):
+            ts = time.strftime("%H:%M:%S")
+            _append_line(env.run_log_path, f"[{ts}] {msg}")
+            st = _normalize_status_from_msg(msg)
+            # 카운트/누적
+            env.run_counts[st] = int(env.run_counts.get(st, 0)) + 1
+
+            # total_fail도 동기화
+            if not hasattr(env, "total_fail") or env.total_fail is None:
+                env.total_fail = 0
+            env.total_fail = int(env.total_fail) + 1
+
+            # Failures 상세 누적
+            if not hasattr(env, "run_fail_logs") or env.run_fail_logs is None:
+                env.run_fail_logs = []
+
+            # iter가 있으면 iter, 없으면 시간으로 대체(= run_flows 이전 FAIL도 표시 가능)
+            iter_val = getattr(env, "_ctx_iter", None)
+            iter_show = str(iter_val) if iter_val is not None else ts
+
+            env.run_fail_logs.append({
+                "iter": iter_show,
+                "name": str(getattr(env, "_ctx_flow", "") or "STEP"),
+                "error": str(msg),
+                "kind": "soft_fail",
+                "flow": str(getattr(env, "_ctx_flow", "") or ""),
+                "time": ts,
+            })
+    except Exception:
+        pass
+
+    emit_event("fail", msg, "FAIL", env)
+
+    # adb shell 로 전달하는 메시지에서만 특수문자 정규화
+    try:
+        safe = _sanitize_for_shell_log(msg)
+        adb_env_map = adb_env(env) if env else None
+        subprocess.call(
+            ["adb", "shell", "log", "-t", "QA", f"[STEP] {safe}"],
+            env=adb_env_map
+        )
+    except Exception:
+        # 로깅 실패가 테스트를 깨뜨리지 않도록 무시
+        pass
+
+# 메모 추가
+def note(msg: str, env: Optional[QAEnv] = None):
+    """Run Notes(사람용 메모) 누적. summary/meta에 표시됨."""
+    env = use_env(env)
+    try:
+        env.run_notes.append(str(msg))
+        # run.log에도 남기고 싶으면(선택)
+        if getattr(env, "run_log_path", None):
+            ts = time.strftime("%H:%M:%S")
+            _append_line(env.run_log_path, f"[{ts}] [NOTE] {msg}")
+    except Exception:
+        pass
+    emit_event("note", msg, None, env)
+# 스크립트 활용 로그 기록 유틸 END =================================
+
+def _exc_text(e: Exception) -> str:
+    # 메시지 비어있는 예외를 '()'로 뭉개지 않게
+    s = ""
+    try:
+        s = str(e).strip()
+    except Exception:
+        s = ""
+    if s:
+        return s
+    # repr(e)는 AssertionError() 같은 것도 형태가 남음
+    return f"{type(e).__name__} {e!r}"
+    
+# --- 앱 시작 공통 헬퍼 (per-app launch 지원) ------------------------------
+def _adb_exec(env, *args) -> str:
+    serial = getattr(env, "serial", None)
+    cmd = ["adb"]
+    if serial:
+        cmd += ["-s", serial]
+    cmd += list(args)
+
+    try:
+        out = subprocess.check_output(cmd, stderr=subprocess.STDOUT)
+        return out.decode("utf-8", "ignore")
+    except subprocess.CalledProcessError as e:
+        detail = ""
+        try:
+            detail = e.output.decode("utf-8", "ignore")
+        except Exception:
+            detail = str(getattr(e, "output", ""))
+        # 원인 식별을 위해 cmd/rc/output을 묶어서 던짐
+        raise RuntimeError(
+            f"adb failed rc={e.returncode} cmd={e.cmd} output={detail}"
+        ) from e
+
+def _env_bool(name: str, default: bool=False) -> bool:
+    v = os.environ.get(name)
+    if v is None:
+        return default
+    return str(v).strip().lower() in ("1", "true", "yes", "y", "on")
+
+def _env_int(name: str, default: int) -> int:
+    v = os.environ.get(name)
+    try:
+        return int(str(v).strip())
+    except Exception:
+        return default
@@ -0,0 +1,295 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 단말 프로파일 캐시 (코어/RAM 클래스/해상도/SDK/앱 버전/IME/yosemite 서비스)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - 키: 시리얼 + 빌드 fingerprint, 디스크 저장(QA_DEVICE_CACHE, 기본 qa_common/_devices/device_profiles.json)
+#   - 최초 1회만 adb shell 1번(스크립트 묶음)으로 전부 조회 → 이후 QAEnv 생성/리포트 생성은 프로세스당 getprop 1회만
+#     · 단말 정보: 프로세스별 첫 조회 때와 QA_DEVICE_PROFILE_TTL초(기본 86400)마다 fingerprint 1회 확인
+#       (같은 시리얼의 다른 단말/재플래시/OTA 시 재조회)
+#     · 앱 버전: 재설치 가능성 → QA_DEVICE_APP_TTL초(기본 300) 지나면 dumpsys 1회로 갱신
+#       (QAEnv 생성 시에는 refresh_app=True로 항상 dumpsys 1회 → meta.json 버전이 방금 설치한 빌드와 일치)
+#       adb.install_apk()가 설치 직후 invalidate_device_profile() 호출
+#   - ram_class_kb()/count_cpu_ranges()/probe_device(): 모니터/리포트의 RAM 클래스·코어 계산도 이 모듈만 사용
+#   - 사용처: core._collect_device_app_info, adb(yosemite IME/서비스), generate_report.py, resource_monitor_gui.py
+#   - adb 조회는 adbstream.adb_shell 공용
+#   - 표준 라이브러리만 사용 (airtest 없는 리포트/모니터 프로세스에서도 import 가능)
+#   - 단독 실행: python -m common.devprofile [--serial S] [--package P] [--refresh]
+# ==========================================================
+import os, re, sys, json, time, argparse, subprocess, threading
+from typing import Optional, Dict, List, Any, Tuple
+
+from .adbstream import adb_shell as _adb_shell
+
+PROFILE_VERSION = 1
+YOSEMITE_PKG = "com.netease.nie.yosemite"
+
+# MemTotal(KB) → 현장 체감 RAM 클래스 (커널/예약 메모리 차감 후 대략치)
+RAM_CLASSES = {
+    "2GB":  1_950_000,
+    "3GB":  2_950_000,
+    "4GB":  3_900_000,  # ← 4GB급은 보통 3.8~3.95M 사이로 관측
+    "6GB":  5_800_000,
+    "8GB":  7_800_000,
+    "12GB": 11_700_000,
+}
+
+_LOCK = threading.Lock()
+_MEM: Dict[str, Dict[str, Any]] = {}      # 프로세스 내 캐시 (시리얼 → 프로파일)
+_FP_CHECKED: set = set()                  # 이 프로세스에서 fingerprint를 이미 확인한 시리얼
+
+# 단말 1회 왕복으로 필요한 값 일괄 조회 (구분자 @@key)
+_PROBE = (
+    "echo @@fp; getprop ro.build.fingerprint;"
+    "echo @@model; getprop ro.product.model;"
+    "echo @@release; getprop ro.build.version.release;"
+    "echo @@sdk; getprop ro.build.version.sdk;"
+    "echo @@cpu; cat /sys/devices/system/cpu/possible 2>/dev/null || cat /sys/devices/system/cpu/present 2>/dev/null;"
+    "echo @@cpuinfo; grep -c ^processor /proc/cpuinfo 2>/dev/null;"
+    "echo @@mem; grep MemTotal /proc/meminfo;"
+    "echo @@wm; wm size;"
+    "echo @@ime; ime list -s 2>/dev/null;"
+    f"echo @@yos; dumpsys package {YOSEMITE_PKG} 2>/dev/null | grep -o '{YOSEMITE_PKG}/[A-Za-z0-9_.$]*' | sort -u;"
+)
+
+
+def ram_class_kb(mem_kb: int) -> Tuple[str, int]:
+    """MemTotal(KB)을 가장 가까운 RAM 클래스 표준값으로 스냅 → (이름, KB)"""
+    name, base_kb = min(RAM_CLASSES.items(), key=lambda kv: abs(int(mem_kb) - kv[1]))
+    return name, base_kb
+
+
+def count_cpu_ranges(expr: str) -> int:
+    """"0-3,4-7" 또는 "0-7" 같은 표현을 정수 개수로 변환"""
+    total = 0
+    for part in (expr or "").strip().split(","):
+        part = part.strip()
+        m = re.match(r"^(\d+)\s*-\s*(\d+)$", part)
+        if m:
+            a, b = int(m.group(1)), int(m.group(2))
+            if b >= a:
+                total += b - a + 1
+        elif part.isdigit():
+            total += 1
+    return total
+
+
+def _cache_path() -> str:
+    p = os.environ.get("QA_DEVICE_CACHE", "").strip()
+    if p:
+        return p
+    qa_common_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # qa_common/common/ → qa_common/
+    return os.path.join(qa_common_dir, "_devices", "device_profiles.json")
+
+
+def _env_sec(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def _resolve_serial(serial: Optional[str]) -> Optional[str]:
+    s = serial or os.environ.get("ANDROID_SERIAL") or os.environ.get("ADB_SERIAL")
+    if s:
+        return s
+    try:
+        # 호스트(adb 서버)만 조회 — 단말 왕복 없음
+        out = subprocess.run(["adb", "get-serialno"], capture_output=True, timeout=5).stdout
+        s = (out or b"").decode("utf-8", "ignore").strip()
+        return s if s and s != "unknown" else None
+    except Exception:
+        return None
+
+
+def _sections(out: str) -> Dict[str, str]:
+    sec: Dict[str, List[str]] = {}
+    cur = None
+    for line in out.splitlines():
+        if line.startswith("@@"):
+            cur = line[2:].strip()
+            sec[cur] = []
+        elif cur is not None:
+            sec[cur].append(line)
+    return {k: "\n".join(v).strip() for k, v in sec.items()}
+
+
+def _pick_yosemite_service(comps: List[str]) -> Optional[str]:
+    known = (f"{YOSEMITE_PKG}/.Service", f"{YOSEMITE_PKG}/.service.YosemiteService")
+    for k in known:
+        if k in comps:
+            return k
+    for c in comps:
+        cls = c.split("/", 1)[1]
+        if cls.endswith("Service") and not re.search(r"ime|inputmethod", cls, re.I):
+            return c
+    return None
+
+
+def _parse_probe(out: str) -> Dict[str, Any]:
+    s = _sections(out)
+    cores = count_cpu_ranges(s.get("cpu", ""))
+    if cores <= 0:
+        cores = int(s.get("cpuinfo") or 0) if (s.get("cpuinfo") or "").isdigit() else 0
+    m = re.search(r"MemTotal:\s+(\d+)\s*kB", s.get("mem", ""))
+    mem_kb = int(m.group(1)) if m else 0
+    wm = s.get("wm", "")
+    m = re.search(r"Override size:\s*(\d+)x(\d+)", wm) or re.search(r"Physical size:\s*(\d+)x(\d+)", wm)
+    ime_ids = [x.strip() for x in s.get("ime", "").splitlines() if x.strip()]
+    yos = sorted(set(x.strip() for x in s.get("yos", "").splitlines() if "/" in x))
+    prof: Dict[str, Any] = {
+        "fingerprint": s.get("fp", ""),
+        "model": s.get("model", ""),
+        "os_version": s.get("release", ""),
+        "sdk": s.get("sdk", ""),
+        "cores": cores or None,
+        "mem_total_kb": mem_kb or None,
+        "resolution": [int(m.group(1)), int(m.group(2))] if m else None,
+        "ime_ids": ime_ids,
+        "yosemite_ime": next((x for x in ime_ids if YOSEMITE_PKG in x), None)
+                        or next((x for x in ime_ids if "yosemite" in x.lower()), None),
+        "yosemite_services": yos,
+        "yosemite_service": _pick_yosemite_service(yos),
+    }
+    if mem_kb:
+        prof["ram_class"], prof["ram_class_kb"] = ram_class_kb(mem_kb)
+    return prof
+
+
+def _probe_app(serial: Optional[str], package: str) -> Dict[str, Any]:
+    out = _adb_shell(serial, f"dumpsys package {package} | grep -E 'versionName=|versionCode='")
+    m1 = re.search(r"\bversionName=([^\s]+)", out)
+    m2 = re.search(r"\bversionCode=(\d+)", out)
+    return {"version_name": m1.group(1) if m1 else "", "version_code": m2.group(1) if m2 else "",
+            "ts": time.time()}
+
+
+def _load_disk() -> Dict[str, Any]:
+    try:
+        with open(_cache_path(), "r", encoding="utf-8") as f:
+            d = json.load(f)
+        return d if d.get("version") == PROFILE_VERSION else {"version": PROFILE_VERSION, "devices": {}}
+    except (OSError, ValueError):
+        return {"version": PROFILE_VERSION, "devices": {}}
+
+
+def _save_disk(serial: str, prof: Optional[Dict[str, Any]]):
+    """다른 프로세스가 쓴 항목은 유지하고 내 시리얼 항목만 교체 (원자적 교체)"""
+    path = _cache_path()
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        d = _load_disk()
+        if prof is None:
+            d["devices"].pop(serial, None)
+        else:
+            d["devices"][serial] = prof
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(d, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def get_device_profile(serial: Optional[str] = None, package: Optional[str] = None, *,
+                       refresh: bool = False, probe: bool = True, refresh_app: bool = False) -> Dict[str, Any]:
+    """
+    단말 프로파일 (캐시 우선).
+    - package: 지정 시 apps[package] = {version_name, version_code, ts} 포함 보장
+    - refresh: 캐시 무시하고 재조회
+    - refresh_app: 단말 정보는 캐시 그대로, 앱 버전만 dumpsys 1회로 재조회 (QAEnv 생성 시)
+    - probe=False: 캐시에 없어도 adb 호출 안 함(없으면 빈 dict) — GUI 갱신 루프 등
+    반환: {serial, fingerprint, model, os_version, sdk, cores, mem_total_kb, ram_class, ram_class_kb,
+           resolution, ime_ids, yosemite_ime, yosemite_services, yosemite_service, apps, ts}
+    """
+    serial = _resolve_serial(serial)
+    key = serial or "_default"
+    now = time.time()
+    with _LOCK:
+        prof = None if refresh else (_MEM.get(key) or _load_disk()["devices"].get(key))
+        dirty = False
+        if prof is not None and not refresh and probe and (
+                key not in _FP_CHECKED or now - float(prof.get("ts", 0)) > _env_sec("QA_DEVICE_PROFILE_TTL", 86400)):
+            # 프로세스 첫 조회 또는 오래된 캐시: fingerprint 1회 확인(같은 시리얼의 다른 단말/재플래시/OTA 시 재조회)
+            _FP_CHECKED.add(key)
+            try:
+                fp = _adb_shell(serial, "getprop ro.build.fingerprint", timeout=10).strip()
+                if fp and fp == prof.get("fingerprint"):
+                    if now - float(prof.get("ts", 0)) > _env_sec("QA_DEVICE_PROFILE_TTL", 86400):
+                        prof["ts"], dirty = now, True
+                elif fp:
+                    prof = None
+            except Exception:
+                pass
+        if prof is None:
+            if not probe:
+                return {}
+            try:
+                prof = _parse_probe(_adb_shell(serial, _PROBE))
+            except Exception:
+                return {}
+            if not prof.get("fingerprint"):
+                return {}       # 단말 미연결/권한 없음 → 캐시에 남기지 않음
+            prof.update({"serial": serial, "apps": {}, "ts": now})
+            _FP_CHECKED.add(key)
+            dirty = True
+
+        if package and probe:
+            app = prof.setdefault("apps", {}).get(package)
+            if refresh or refresh_app or app is None \
+                    or now - float(app.get("ts", 0)) > _env_sec("QA_DEVICE_APP_TTL", 300):
+                try:
+                    prof["apps"][package] = _probe_app(serial, package)
+                    dirty = True
+                except Exception:
+                    pass
+
+        _MEM[key] = prof
+        if dirty:
+            _save_disk(key, prof)
+        return prof
+
+
+def probe_device(serial: Optional[str] = None) -> Dict[str, Any]:
+    """캐시 없이 1회 조회(fingerprint 없어도 반환) — 캐시를 못 쓸 때 모니터/리포트의 코어·MemTotal 폴백용, 실패 시 {}"""
+    try:
+        return _parse_probe(_adb_shell(_resolve_serial(serial), _PROBE))
+    except Exception:
+        return {}
+
+
+def invalidate_device_profile(serial: Optional[str] = None, package: Optional[str] = None):
+    """캐시 무효화 (package만 지정 시 해당 앱 버전만) — 앱 재설치/단말 교체 직후 호출"""
+    serial = _resolve_serial(serial)
+    key = serial or "_default"
+    with _LOCK:
+        prof = _MEM.get(key) or _load_disk()["devices"].get(key)
+        if prof is None:
+            return
+        if package:
+            prof.get("apps", {}).pop(package, None)
+            _MEM[key] = prof
+            _save_disk(key, prof)
+        else:
+            _MEM.pop(key, None)
+            _save_disk(key, None)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="단말 프로파일 캐시 조회")
+    ap.add_argument("--serial", default=None)
+    ap.add_argument("--package", default=None)
+    ap.add_argument("--refresh", action="store_true")
+    ap.add_argument("--invalidate", action="store_true")
+    a = ap.parse_args(argv)
+    if a.invalidate:
+        invalidate_device_profile(a.serial, a.package)
+        return 0
+    t0 = time.time()
+    prof = get_device_profile(a.serial, a.package, refresh=a.refresh)
+    print(json.dumps(prof, ensure_ascii=False, indent=1))
+    print(f"({time.time() - t0:.3f}s, cache: {_cache_path()})", file=sys.stderr)
+    return 0 if prof else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 실패 메일 다이제스트 (버스트 묶음 + 첨부 중복 제거 + SMTP 연결 재사용)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - Run(env)·단말 단위로 실패를 모아 시그니처(정규화된 에러 문자열)별로 묶어 1통으로 발송
+#   - 첫 실패 후 QA_MAIL_DIGEST_WINDOW초(기본 120, 0=즉시 개별 발송) 동안 들어온 실패를 한 번에 발송
+#   - 첨부: 같은 경로는 최신 1개만, 내용 해시(sha1)가 같은 파일은 1번만, 이전 다이제스트에 보낸 파일은 생략
+#   - SMTP 연결은 다이제스트 객체가 SmtpSession 1개로 유지(끊기면 재접속)
+#   - 발송 실패 시 해당 묶음은 버킷에 되돌려 다음 시간창/close()에서 재시도, 전달 결과는 add(on_result=)로 통지
+#   - 검증: python -m common.digest --selftest  (로컬 SMTP 대역 서버로 연결/메시지/첨부 수 확인)
+# ==========================================================
+import os, re, sys, time, hashlib, argparse, threading, tempfile, socketserver
+from typing import Optional, Dict, List, Union, Any, Tuple, Callable
+from .core import QAEnv, _env_int, step, use_env
+from .maildrive import SmtpSession, _split_emails, send_mail_smtp
+
+DIGEST_WINDOW_SEC = 120
+
+_RE_HEX = re.compile(r"0x[0-9a-fA-F]+|\b[0-9a-fA-F]{8,}\b")
+_RE_NUM = re.compile(r"\d+(\.\d+)?")
+_RE_PATH = re.compile(r"([A-Za-z]:)?[\\/][^\s'\"]+")
+
+
+def failure_signature(err_text: str) -> str:
+    """에러 문자열 정규화(경로/주소/숫자 치환) → 같은 원인의 실패를 한 그룹으로"""
+    t = str(err_text or "").strip().splitlines()[0] if str(err_text or "").strip() else "(no message)"
+    t = _RE_PATH.sub("<path>", t)
+    t = _RE_HEX.sub("<hex>", t)
+    t = _RE_NUM.sub("#", t)
+    return re.sub(r"\s+", " ", t)[:160]
+
+
+def _rcpt_key(v: Optional[Union[str, List[str]]]) -> Tuple[str, ...]:
+    if v is None:
+        return ()
+    return tuple(sorted(_split_emails(v) if isinstance(v, str) else [str(x) for x in v]))
+
+
+class MailDigest:
+    """
+    실패 메일 묶음 발송기 (env당 1개, get_mail_digest(env)).
+    - add(): 실패 1건 적재 (window=0이면 즉시 send_mail_smtp)
+    - flush(): 대기 중인 묶음 발송 → 발송 메일 수 (실패한 묶음은 버킷에 복귀 후 첫 예외 재발생)
+    - close(): flush + SMTP 연결 종료 (여기서도 실패하면 남은 건은 on_result(False))
+    """
+
+    def __init__(self, env: 'QAEnv', window: Optional[float] = None,
+                 session: Optional[SmtpSession] = None):
+        self.env = env
+        self.window = float(_env_int("QA_MAIL_DIGEST_WINDOW", DIGEST_WINDOW_SEC) if window is None else window)
+        self.session = session
+        self.digests_sent = 0
+        self.failures_sent = 0
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._buckets: Dict[Tuple, Dict[str, Any]] = {}   # (to, cc, bcc) → {"items": [...], "first": ts}
+        self._timer: Optional[threading.Timer] = None
+        self._hash_cache: Dict[Tuple[str, int, float], str] = {}
+        self._sent_hashes: Dict[str, Tuple[str, int]] = {}  # sha1 → (파일명, 다이제스트 번호)
+
+    # ---------------- 적재 ----------------
+    def add(self, label: str, err_text: str, *, kind: str = "flow",
+            subject: Optional[str] = None, body: str = "",
+            attachments: Optional[List[str]] = None,
+            to: Optional[Union[str, List[str]]] = None,
+            cc: Optional[Union[str, List[str]]] = None,
+            bcc: Optional[Union[str, List[str]]] = None,
+            on_result: Optional[Callable[[bool], None]] = None):
+        """on_result(ok): 실제 SMTP 전달 성공(True) / 최종 실패(False) 시 호출 (적재 시점엔 호출 안 함)"""
+        item = {
+            "ts": time.time(), "label": label, "kind": kind, "error": str(err_text or ""),
+            "subject": subject, "body": body, "attachments": [p for p in (attachments or []) if p],
+            "to": to, "cc": cc, "bcc": bcc, "on_result": on_result,
+        }
+        if self.window <= 0:
+            try:
+                self._send([item])
+            except Exception:
+                self._notify([item], False)
+                raise
+            return
+        with self._lock:
+            self._enqueue([item])
+
+    def _enqueue(self, items: List[Dict[str, Any]]):
+        """버킷 적재 + 시간창 타이머 예약 (self._lock 보유 상태에서 호출)"""
+        for it in items:
+            key = (_rcpt_key(it["to"]), _rcpt_key(it["cc"]), _rcpt_key(it["bcc"]))
+            b = self._buckets.setdefault(key, {"items": [], "first": it["ts"]})
+            b["items"].append(it)
+            b["items"].sort(key=lambda x: x["ts"])
+        if self._timer is None:
+            self._timer = threading.Timer(self.window, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _notify(self, items: List[Dict[str, Any]], ok: bool):
+        for it in items:
+            cb = it.get("on_result")
+            if cb is not None:
+                try:
+                    cb(ok)
+                except Exception:
+                    pass
+
+    def _on_timer(self):
+        try:
+            self.flush()
+        except Exception as e:
+            step(f"[WARN] 실패 메일 다이제스트 발송 실패: {e}", env=self.env)
+
+    # ---------------- 발송 ----------------
+    def flush(self) -> int:
+        with self._lock:
+            buckets, self._buckets = self._buckets, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        n = 0
+        failed: List[Dict[str, Any]] = []
+        first_err: Optional[Exception] = None
+        for b in buckets.values():
+            if not b["items"]:
+                continue
+            try:
+                self._send(b["items"])
+                n += 1
+            except Exception as e:
+                # 버킷을 비운 뒤 발송 실패 → 유실 방지를 위해 되돌려 다음 시간창에 재시도
+                failed += b["items"]
+                first_err = first_err or e
+        if failed:
+            with self._lock:
+                self._enqueue(failed)
+            raise first_err
+        return n
+
+    def close(self):
+        try:
+            self.flush()
+        except Exception:
+            # 마지막 기회에서도 실패 → 남은 건 전달 실패로 통지 후 예외 전파
+            with self._lock:
+                left = [it for b in self._buckets.values() for it in b["items"]]
+                self._buckets = {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            self._notify(left, False)
+            raise
+        finally:
+            if self.session is not None:
+                self.session.close()
+
+    def _send(self, items: List[Dict[str, Any]]):
+        with self._send_lock:
+            if self.session is None:
+                self.session = SmtpSession()
+            atts, skipped, new_hashes = self._dedupe_attachments([p for it in items for p in it["attachments"]])
+            first = items[0]
+            if len(items) == 1:
+                subject, body = first["subject"] or f"❌ A-Test 실패: {first['label']}", first["body"]
+            else:
+                subject, body = self._digest_text(items)
+            if skipped:
+                body += "\n\n[첨부 생략] 동일 내용이 이미 첨부됨\n" + "\n".join(f"- {s}" for s in skipped)
+            send_mail_smtp(subject=subject, body=body, attachments=atts,
+                           to=first["to"], cc=first["cc"], bcc=first["bcc"],
+                           session=self.session, env=self.env)
+            self.digests_sent += 1
+            self._sent_hashes.update(new_hashes)   # 발송 성공분만 "이미 보냄"으로 기록
+            self.failures_sent += len(items)
+            self._notify(items, True)
+            step(f"[RUN] 실패 메일 발송 완료: {len(items)}건 / 첨부 {len(atts)}개 (생략 {len(skipped)}개)", env=self.env)
+
+    def _digest_text(self, items: List[Dict[str, Any]]) -> Tuple[str, str]:
+        env = self.env
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for it in items:
+            groups.setdefault(failure_signature(it["error"]), []).append(it)
+        dev = f"{getattr(env, 'package', '')}_{getattr(env, 'serial', None) or 'device'}"
+        subject = f"❌ A-Test 실패 다이제스트: {len(items)}건 / {len(groups)}종 - {dev}"
+        span = items[-1]["ts"] - items[0]["ts"]
+        lines = [
+            f"실패 {len(items)}건 ({len(groups)}개 시그니처, {span:.0f}초 동안)",
+            f"Run: {getattr(env, 'run_id', '')}",
+            f"패키지: {getattr(env, 'package', '')}  단말: {getattr(env, 'serial', None) or '-'}",
+            f"결과 폴더: {getattr(env, 'out_dir', '')}",
+        ]
+        for k, (sig, its) in enumerate(sorted(groups.items(), key=lambda kv: -len(kv[1])), 1):
+            t0 = time.strftime("%H:%M:%S", time.localtime(its[0]["ts"]))
+            t1 = time.strftime("%H:%M:%S", time.localtime(its[-1]["ts"]))
+            lines += ["", f"[{k}] {len(its)}건 ({t0} ~ {t1})", f"    시그니처: {sig}", f"    에러 예시: {its[0]['error'][:300]}"]
+            lines += [f"    - {time.strftime('%H:%M:%S', time.localtime(it['ts']))} {it['kind']}: {it['label']}" for it in its]
+        return subject, "\n".join(lines)
+
+    def _file_hash(self, path: str) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (os.path.abspath(path), st.st_size, st.st_mtime)
+        h = self._hash_cache.get(key)
+        if h is None:
+            sha = hashlib.sha1()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(chunk)
+            h = self._hash_cache[key] = sha.hexdigest()
+        return h
+
+    def _dedupe_attachments(self, paths: List[str]) -> Tuple[List[str], List[str], Dict[str, Tuple[str, int]]]:
+        """같은 경로 1회 → 내용 해시 중복 제거 → 이전 다이제스트에 보낸 내용 생략"""
+        out: List[str] = []
+        skipped: List[str] = []
+        seen: set = set()
+        new_hashes: Dict[str, Tuple[str, int]] = {}
+        for p in dict.fromkeys(os.path.abspath(p) for p in paths if os.path.exists(p)):
+            if os.path.isdir(p):
+                out.append(p)   # 폴더는 send_mail_smtp에서 zip 처리
+                continue
+            h = self._file_hash(p)
+            if h is None or h in seen:
+                if h is not None:
+                    skipped.append(os.path.basename(p))
+                continue
+            seen.add(h)
+            prev = self._sent_hashes.get(h)
+            if prev:
+                skipped.append(f"{os.path.basename(p)} (다이제스트 #{prev[1]}의 {prev[0]})")
+                continue
+            new_hashes[h] = (os.path.basename(p), self.digests_sent + 1)
+            out.append(p)
+        return out, skipped, new_hashes
+
+
+def get_mail_digest(env: Optional['QAEnv'] = None) -> 'MailDigest':
+    env = use_env(env)
+    d = getattr(env, "_mail_digest", None)
+    if d is None:
+        d = env._mail_digest = MailDigest(env)
+    return d
+
+
+def close_mail_digest(env: Optional['QAEnv'] = None) -> int:
+    """대기 중인 다이제스트 즉시 발송 + SMTP 연결 종료 → 발송 메일 수"""
+    env = use_env(env)
+    d = getattr(env, "_mail_digest", None)
+    if d is None:
+        return 0
+    before = d.digests_sent
+    d.close()
+    return d.digests_sent - before
+
+
+# ==========================================================
+# 로컬 SMTP 대역 서버 (검증용) + selftest
+# ==========================================================
+class LocalSmtpStandIn:
+    """표준 라이브러리만 쓰는 최소 SMTP 서버 (TLS/AUTH 없음). 접속 수/수신 메시지 집계"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        import email, email.policy
+        outer = self
+        self.connections = 0
+        self.messages: List[Any] = []
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                outer.connections += 1
+                w = self.wfile.write
+                w(b"220 qa-smtp-standin\r\n")
+                data, buf = False, []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        break
+                    if data:
+                        if line.rstrip(b"\r\n") == b".":
+                            data = False
+                            outer.messages.append(email.message_from_bytes(b"".join(buf), policy=email.policy.default))
+                            buf = []
+                            w(b"250 OK queued\r\n")
+                        else:
+                            buf.append(line[1:] if line.startswith(b"..") else line)
+                        continue
+                    cmd = line.strip().split(b" ", 1)[0].upper()
+                    if cmd in (b"EHLO", b"HELO"):
+                        w(b"250-qa-smtp-standin\r\n250 8BITMIME\r\n")
+                    elif cmd == b"DATA":
+                        data = True
+                        w(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    elif cmd == b"QUIT":
+                        w(b"221 Bye\r\n")
+                        break
+                    else:
+                        w(b"250 OK\r\n")
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._srv = socketserver.ThreadingTCPServer((host, port), _Handler)
+        self._srv.daemon_threads = True
+        self.hostport = "%s:%d" % self._srv.server_address
+        threading.Thread(target=self._srv.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._srv.shutdown()
+        self._srv.server_close()
+
+    def attachments(self, k: int) -> List[str]:
+        return [p.get_filename() for p in self.messages[k].walk() if p.get_filename()]
+
+
+def selftest(window: float = 0.5, bursts: int = 12) -> int:
+    import types
+    srv = LocalSmtpStandIn()
+    tmp = tempfile.mkdtemp(prefix="qa_digest_")
+    os.environ.update({"QA_MAIL_SMTP": srv.hostport, "QA_MAIL_USER": "qa@localhost",
+                       "QA_MAIL_PASS": "x", "QA_MAIL_TO": "team@localhost"})
+
+    def _file(name: str, size: int, seed: bytes) -> str:
+        p = os.path.join(tmp, name)
+        with open(p, "wb") as f:
+            f.write((seed * (size // len(seed) + 1))[:size])
+        return p
+
+    recent = _file("logcat_recent_000000_0000.txt", 3 << 20, b"recent-log ")
+    copy = _file("logcat_recent_copy.txt", 3 << 20, b"recent-log ")     # 내용 동일(해시 중복)
+    pdf = _file("resource_report_1.pdf", 512 << 10, b"%PDF ")
+    evcsv = _file("events.csv", 4096, b"ts,event\n")
+    env = types.SimpleNamespace(run_id="selftest", package="com.example", serial="emulator-5554",
+                                out_dir=tmp, run_dir=tmp, run_log_path=None, mail_max_attach=20,
+                                gdrive_enable=False, gdrive_folder_id=None, gdrive_share_anyone=False)
+    d = MailDigest(env, window=window)
+    checks: List[Tuple[str, bool]] = []
+    try:
+        for i in range(bursts):
+            err = f"Timeout {10 + i}.5s waiting for node at ({i}, {i * 3})" if i % 3 else f"socket connection broken 0x{i:08x}"
+            d.add(f"Flow{i % 4} (#{i})", err, kind="subflow", attachments=[recent, copy, pdf, evcsv])
+        deadline = time.time() + window + 10
+        while not srv.messages and time.time() < deadline:
+            time.sleep(0.05)
+        checks += [
+            ("burst → 메일 1통", len(srv.messages) == 1),
+            ("시그니처 2종으로 묶음", "2종" in str(srv.messages[0]["Subject"] if srv.messages else "")),
+            ("중복 첨부 제거(3개)", len(srv.attachments(0)) == 3 if srv.messages else False),
+        ]
+        extra = _file("logcat_slice_2.txt", 2048, b"slice ")
+        d.add("Flow9 (#99)", "Timeout 1.0s waiting for node at (1, 2)", attachments=[recent, pdf, extra])
+        d.add("Flow9 (#100)", "Timeout 2.0s waiting for node at (3, 4)", attachments=[recent, pdf, extra])
+        d.close()
+        checks += [
+            ("2차 다이제스트", len(srv.messages) == 2),
+            ("이전 발송 첨부 생략(신규 1개만)", srv.attachments(1) == ["logcat_slice_2.txt"] if len(srv.messages) > 1 else False),
+            ("SMTP 연결 1회 재사용", srv.connections == 1),
+        ]
+
+        # 발송 실패 → 버킷 복귀 → 재시도 성공 시에만 on_result(True)
+        class _FlakySession(SmtpSession):
+            fails = 1
+
+            def send(self, msg, to_addrs):
+                if self.fails:
+                    self.fails -= 1
+                    raise ConnectionError("selftest: forced send failure")
+                return super().send(msg, to_addrs)
+
+        results: List[bool] = []
+        d2 = MailDigest(env, window=60, session=_FlakySession())
+        d2.add("Flow7 (#200)", "Timeout 3.0s", on_result=results.append)
+        try:
+            d2.flush()
+            raised = False
+        except ConnectionError:
+            raised = True
+        pending = sum(len(b["items"]) for b in d2._buckets.values())
+        notified = list(results)
+        d2.close()
+        checks += [
+            ("발송 실패 시 버킷 복귀(유실 없음)", raised and pending == 1 and notified == []),
+            ("재시도 전달 후 on_result(True)", results == [True] and len(srv.messages) == 3),
+        ]
+    finally:
+        d.close()
+        srv.close()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+    print(f"connections={srv.connections} messages={len(srv.messages)} failures_sent={d.failures_sent}")
+    return 0 if all(ok for _, ok in checks) else 1
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="실패 메일 다이제스트 검증 (로컬 SMTP 대역)")
+    ap.add_argument("--selftest", action="store_true", help="로컬 SMTP 대역 서버로 묶음/중복 제거/연결 재사용 확인")
+    ap.add_argument("--bursts", type=int, default=12)
+    ap.add_argument("--window", type=float, default=0.5)
+    a = ap.parse_args(argv)
+    if not a.selftest:
+        ap.print_help()
+        return 0
+    return selftest(window=a.window, bursts=a.bursts)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 실패 증거 비동기 파이프라인 (slice/report/mail 백그라운드 처리)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - 실패 시각만 스냅샷하고 즉시 반환 → run_flow/run_subflow가 바로 앱 재시작으로 진행
+#   - 백그라운드 워커 1개가 작업을 순차 처리: save.flag → slice, report.flag → pdf, 실패 메일
+#     (flag 본문 = 실패 시각 → GUI가 그 시각까지의 구간으로 slice/resource/report를 잘라 저장, 처리 지연과 무관)
+#     (GUI는 flag 처리 후 파일을 지우므로 flag를 동시에 여러 개 쓰지 않고 순서대로 기록)
+#   - 확보된 산출물은 env.run_artifacts["evidence_<iter>_<name>_<slice|pdf|recent>"] (상대경로)로 반영
+#   - 실패 메일은 digest.MailDigest로 적재(버스트 묶음/첨부 중복 제거/SMTP 연결 재사용)
+#     results[*]["mail"]: None=발송 대기, True=SMTP 전달 완료, False=적재/발송 실패 (다이제스트 on_result로 갱신)
+#   - finalize_run()이 wait_evidence()로 잔여 작업을 제한 시간(QA_EVIDENCE_WAIT, 기본 180초)까지 대기 후 다이제스트 발송
+# ==========================================================
+import os, re, time, queue, threading
+from typing import Optional, Dict, List, Union, Any
+from .core import QAEnv, _env_int, note, step, use_env
+from .monitor import gen_report, save_log
+from .digest import close_mail_digest, get_mail_digest
+from .reporting import find_latest_logcat_recent
+
+EVIDENCE_WAIT_SEC = 180     # finalize_run 대기 기본값(초)
+
+
+def _artifact_key(iter_no: Any, name: str, what: str) -> str:
+    safe = re.sub(r"[^0-9A-Za-z가-힣_-]+", "_", str(name or "")).strip("_") or "flow"
+    return f"evidence_{iter_no if iter_no is not None else 'x'}_{safe}_{what}"
+
+
+class EvidencePipeline:
+    """
+    실패 증거 작업 큐 (env당 1개, get_evidence_pipeline(env)로 생성/재사용).
+    - submit(job): 큐 적재 후 즉시 반환
+    - wait(timeout): 잔여 작업이 끝날 때까지 대기 → 미완료 건수 반환
+    - results: 작업별 {label, fail_ts, slice, pdf, recent, mail, sec}
+    """
+
+    def __init__(self, env: 'QAEnv'):
+        self.env = env
+        self.results: List[Dict[str, Any]] = []
+        self._q: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._cv = threading.Condition()
+        self._pending = 0
+        self._claimed: set = set()   # 이미 다른 실패 건에 배정된 slice/pdf (mtime 매칭 중복 방지)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        with self._cv:
+            return self._pending
+
+    def submit(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        with self._cv:
+            self._pending += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="qa-evidence", daemon=True)
+                self._thread.start()
+        self._q.put(job)
+        return job
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        deadline = None if timeout is None else time.time() + max(0.0, float(timeout))
+        with self._cv:
+            while self._pending > 0:
+                left = None if deadline is None else deadline - time.time()
+                if left is not None and left <= 0:
+                    break
+                self._cv.wait(left)
+            return self._pending
+
+    def _loop(self):
+        while True:
+            job = self._q.get()
+            try:
+                self._run(job)
+            except Exception as e:
+                step(f"[WARN] 실패 증거 처리 중 예외: {job.get('label')} ({e})", env=self.env)
+            finally:
+                with self._cv:
+                    self._pending -= 1
+                    self._cv.notify_all()
+
+    def _run(self, job: Dict[str, Any]):
+        env = self.env
+        t_start = time.time()
+        slice_path = pdf_path = recent_path = evcsv = None
+
+        # ① 산출물 확보 (리소스 모니터가 떠 있을 때만)
+        try:
+            if job.get("monitor"):
+                slice_path = save_log(timeout=job.get("slice_timeout", 45), env=env,
+                                      ts=job["fail_ts"], exclude=self._claimed)
+                if slice_path:
+                    self._claimed.add(slice_path)
+                pdf_path = gen_report(timeout=job.get("report_timeout", 60), env=env,
+                                      ts=job["fail_ts"], exclude=self._claimed)
+                if pdf_path:
+                    self._claimed.add(pdf_path)
+                recent_path = find_latest_logcat_recent(env, ts=job["fail_ts"])
+                evcsv = os.path.join(env.out_dir, "events.csv")
+        except Exception as ee:
+            step(f"[WARN] 산출물 확보 중 오류: {ee}", env=env)
+            note(f"[RISK] 실패 증거 산출물 확보 중 오류(일부 첨부 누락 가능): {job.get('label')} ({ee})", env=env)
+
+        # ② run_artifacts 반영 (summary/meta 링크)
+        for what, p in (("recent", recent_path), ("slice", slice_path), ("pdf", pdf_path)):
+            if p and os.path.exists(p):
+                try:
+                    env.run_artifacts[_artifact_key(job.get("iter"), job.get("name"), what)] = \
+                        os.path.relpath(p, env.run_dir).replace("\\", "/")
+                except Exception:
+                    pass
+
+        rec: Dict[str, Any] = {
+            "label": job.get("label"), "fail_ts": job["fail_ts"],
+            "slice": slice_path, "pdf": pdf_path, "recent": recent_path,
+            "mail": None, "sec": round(time.time() - t_start, 2),
+        }
+        self.results.append(rec)
+
+        # ③ 실패 메일 (다이제스트 적재 → 시간창 단위로 묶어 발송, rec["mail"]은 실제 전달 후 갱신)
+        if job.get("subject"):
+            try:
+                atts = [p for p in [recent_path, slice_path, pdf_path, evcsv] if p and os.path.exists(p)]
+                get_mail_digest(env).add(
+                    job.get("label"), job.get("error", ""), kind=job.get("kind", "flow"),
+                    subject=job["subject"], body=job.get("body", ""), attachments=atts,
+                    to=job.get("to"), cc=job.get("cc"), bcc=job.get("bcc"),
+                    on_result=lambda ok, rec=rec: rec.__setitem__("mail", ok),
+                )
+            except Exception as me:
+                rec["mail"] = False
+                step(f"[WARN] 실패 메일 전송 실패: {me}", env=env)
+
+
+def get_evidence_pipeline(env: Optional['QAEnv'] = None) -> 'EvidencePipeline':
+    env = use_env(env)
+    ev = getattr(env, "_evidence", None)
+    if ev is None:
+        ev = env._evidence = EvidencePipeline(env)
+    return ev
+
+
+def capture_failure_evidence(label: str, *, name: str, iter_no: Any = None,
+                             kind: str = "flow", err_text: str = "",
+                             subject: Optional[str] = None, body: str = "",
+                             mail_to: Optional[Union[str, List[str]]] = None,
+                             mail_cc: Optional[Union[str, List[str]]] = None,
+                             mail_bcc: Optional[Union[str, List[str]]] = None,
+                             env: Optional['QAEnv'] = None) -> Dict[str, Any]:
+    """
+    실패 시각 스냅샷 + slice/report/mail 작업 적재 (즉시 반환).
+    - subject=None이면 메일 생략
+    - 반환: 적재된 job dict (산출물은 나중에 env.run_artifacts / pipeline.results로 확인)
+    """
+    env = use_env(env)
+    job = {
+        "label": label, "name": name, "iter": iter_no, "kind": kind, "error": err_text,
+        "fail_ts": time.time(),
+        "monitor": getattr(env, "_rm_proc", None) is not None,
+        "subject": subject, "body": body, "to": mail_to, "cc": mail_cc, "bcc": mail_bcc,
+    }
+    get_evidence_pipeline(env).submit(job)
+    step(f"[RUN] 실패 증거 수집 예약(백그라운드): {label}", env=env)
+    return job
+
+
+def wait_evidence(env: Optional['QAEnv'] = None, timeout: Optional[float] = None) -> int:
+    """
+    잔여 실패 증거 작업 대기 (기본 QA_EVIDENCE_WAIT 초) → 대기 중 실패 메일 다이제스트 발송 → 미완료 건수.
+    미완료가 남으면 Run Notes에 [RISK]로 기록.
+    """
+    env = use_env(env)
+    ev = getattr(env, "_evidence", None)
+    left = 0
+    if ev is not None and ev.pending:
+        if timeout is None:
+            timeout = _env_int("QA_EVIDENCE_WAIT", EVIDENCE_WAIT_SEC)
+        step(f"[RUN] 실패 증거 처리 대기: {ev.pending}건 (최대 {timeout}s)", env=env)
+        left = ev.wait(timeout)
+        if left:
+            note(f"[RISK] 실패 증거 {left}건 미완료 상태로 Run 종료(첨부/링크 누락 가능)", env=env)
+    try:
+        close_mail_digest(env)
+    except Exception as me:
+        step(f"[WARN] 실패 메일 다이제스트 발송 실패: {me}", env=env)
+    return left
@@ -0,0 +1,737 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 플로우 실행 래퍼 (run_flow/run_flows, run_subflows, step_block)
+# ==========================================================
+# -*- coding: utf-8 -*-
+import os, time, re, shutil, webbrowser
+from pathlib import Path
+from typing import Optional, Tuple, Callable, Dict, List, Union, Any
+from .core import QAEnv, _env_bool, event_request, note, step, use_env
+from .capture import stop_scrcpy_capture
+from .ui import PocoFatalError, poco_hard_reset, restart_app
+from .rules import save_exception_stats
+from .monitor import gen_report, save_log
+from .maildrive import drive_upload, send_mail_smtp
+from .reporting import (_pick_overall_result, _summary_html_text, build_portable_airtest_report,
+                        finalize_run, find_latest_logcat_recent)
+from .evidence import capture_failure_evidence, wait_evidence
+from .history import FlowHistory, estimate_eta, record_env_run
+from .accounts import LeaseLostError, check_account_lease
+from .profiler import profiled
+
+
+# 플로우/서브플로우 소요시간 누적 (Run 종료 시 이력 DB 기록)
+def _add_timing(env: 'QAEnv', kind: str, name: str, t0: float, ok: bool,
+                parent: Optional[str] = None, iter_no: Optional[int] = None):
+    try:
+        if getattr(env, "run_timings", None) is None:
+            env.run_timings = []
+        env.run_timings.append({
+            "kind": kind, "name": str(name), "parent": parent, "iter": iter_no,
+            "ok": bool(ok), "sec": round(time.time() - t0, 3), "ts": t0,
+        })
+    except Exception:
+        pass
+
+# --- STEP BLOCK: 단계 블록 처리 공통 함수 ---
+def step_block(func, desc="", debug: bool=False, env: Optional['QAEnv'] = None):
+    env = use_env(env)
+    if debug:
+        step(f"🔻[BLOCK] {desc}: 시작 ▶️")
+    try:
+        func()              # 내부 세트 실행
+        if debug:
+            step(f"🔺[BLOCK] {desc}: PASS")
+        else:
+            step(f"{desc}: 성공")
+        return True
+    except Exception as e:
+        if debug:
+            step(f"🔺[BLOCK] {desc}: FAIL ({e})")
+        else:
+            step(f"{desc}: 실패 ({e})")
+        raise
+
+# --- SUB FLOW: 메인 플로우 내부의 서브 플로우 실행기 ---
+@profiled("subflow", lambda func, desc="", *a, **k: desc or getattr(func, "__name__", ""))
+def run_subflow(func: Callable[[], Any],
+                desc: str = "",
+                restart_sub: Optional[Callable[[], Any]] = None,
+                debug: bool = False,
+                env: Optional['QAEnv'] = None) -> bool:
+    """
+    메인 플로우 내 개별 서브 플로우 실행용 헬퍼.
+
+    - func(env)를 호출한다.
+    - 서브 플로우 내부에서 예외가 나도:
+        - 여기서 FAIL 로그 + 스냅샷만 남기고
+        - 예외는 밖으로 올리지 않는다 (return False).
+    - 그래서 같은 메인 플로우 내 다음 서브 플로우는 계속 실행된다.
+    """
+    env = use_env(env)
+
+    iter_no = getattr(env, "_ctx_iter", None)
+    flow_name = getattr(env, "_ctx_flow", None)
+
+    if debug:
+        step(f"🔽[SUB] Ct.{iter_no} - {flow_name} > {desc}", env=env)
+    else:
+        step(f"[SUB] Ct.{iter_no} - {flow_name} > {desc}", env=env)
+    t0 = time.time()
+    try:
+        func()
+
+        _add_timing(env, "subflow", desc, t0, True, parent=flow_name, iter_no=iter_no)
+        if debug:
+            step(f"🔼[SUB] 성공: Ct.{iter_no} - {flow_name} > {desc}")
+        return True
+    except Exception as e:
+        err_text = str(e)
+        _add_timing(env, "subflow", desc, t0, False, parent=flow_name, iter_no=iter_no)
+
+        # 메인 플로우까지 죽이지 않고, 이 서브 플로우만 실패 처리
+        if debug:
+            # step(f"🔼[SUB] {desc}: 실패 ❌ ({e})", True)
+            step(f"🔼[ERR] SubFlow 실패: Ct.{iter_no} - {flow_name} > {desc} - {err_text}", shot=True, env=env)
+        else:
+            # step(f"[SUB] {desc}: 실패 ❌ ({e})", True)
+            step(f"[ERR] SubFlow 실패: Ct.{iter_no} - {flow_name} > {desc} - {err_text}", shot=True, env=env)
+        # ① 실패 증거(slice/report) + ② 실패 메일 → 백그라운드 파이프라인 (재시작 지연 없음)
+        capture_failure_evidence(
+            f"SubFlow {desc}", name=f"{flow_name}_{desc}", iter_no=iter_no,
+            kind="subflow", err_text=err_text,
+            subject=f"❌ A-Test SubFlow 실패: {desc} ({env.package}_{env.serial or 'device'})",
+            body=(f"SubFlow 실패: {desc}\n"
+                f"패키지: {env.package}\n결과 폴더: {env.out_dir}\n에러: {err_text}\n"
+                f"첨부: log recent / log slice / resource report / events.csv"),
+            env=env,
+        )
+        if restart_sub is not None:
+            restart_sub()
+        else:
+            restart_app(env=env)
+            env.on_ready()
+        return False
+
+def run_subflows(
+                 *flows: Tuple[Callable[[], Any], str],
+                 restart_sub: Optional[Callable[[], Any]] = None,
+                 group_desc: Optional[str] = None,
+                 debug: bool = False,
+                 env: Optional['QAEnv'] = None
+                 ) -> bool:
+    """
+    여러 서브 플로우를 순차 실행하고, 개별 결과 + 전체 결과까지 출력하는 헬퍼.
+
+    사용 예:
+        ok = run_subflows(
+            (day1_reading_explore, "📋 [Basic Test] 1일차 > 독서 탐험"),
+            (day1_ebook_viewer,    "📋 [Basic Test] 1일차 > e-Book 뷰어"),
+            (day1_fluency1,        "📋 [Basic Test] 1일차 > 술술 읽기 훈련1"),
+            restart_sub=restart_ebook,
+            group_desc="그룹 이름",
+        )
+
+    - 각 튜플: (func, desc) 또는 (func, desc, restart_sub)
+        * 3튜플은 이전 버전과의 호환을 위해 허용하며, 전달 시 우선 적용.
+    - restart_sub 는 없으면 None 넣어도 되고, 서브 플로우 실패 시 호출할 콜백 함수.
+      (개별 튜플에 콜백이 있으면 그 값을 우선 사용)
+    - group_desc 는 전체 그룹 요약 로그에 사용할 설명 문자열.
+    - 내부에서는 기존 run_subflow(...) 를 그대로 재사용한다.
+    - 반환값:
+        * True  : 모든 서브 플로우 PASS
+        * False : 하나라도 FAIL
+    - 로그:
+        * 각 서브 플로우별 PASS/FAIL 로그는 run_subflow에서 출력
+        * 마지막에 group_desc 기준으로 "ALL PASS" 또는 "일부 FAIL" 요약 출력
+    """
+    env = use_env(env)
+
+    results: List[Tuple[str, bool]] = []
+
+    # 그룹 요약용 라벨
+    label = group_desc if group_desc else "서브 플로우 그룹"
+
+    if debug:
+        step(f"[SUB] {label}: 시작")
+
+    for item in flows:
+        # item 은 (func, desc) 또는 (func, desc, restart_sub) 를 허용 (구버전 호환)
+        if len(item) == 2:
+            func, desc = item
+            item_restart = restart_sub
+        elif len(item) == 3:
+            func, desc, item_restart = item
+        else:
+            raise ValueError("run_subflows: 각 flow는 (func, desc) 또는 (func, desc, restart_sub) 형식이어야 합니다.")
+
+        ok = run_subflow(func, desc=desc, restart_sub=item_restart, debug=debug, env=env)
+        results.append((desc, ok))
+
+    if not results:
+        # 실행한 서브 플로우가 없으면 그냥 True
+        return True
+
+    all_ok = all(ok for _, ok in results)
+
+    if all_ok:
+        step(f"[SUB] {label}: 전체 성공")
+        return True
+    else:
+        failed = [desc for desc, ok in results if not ok]
+        failed_str = ", ".join(failed)
+        step(f"[SUB] {label}: 일부 실패 ({failed_str})", True)
+        return False
+        # 🔥 메인 플로우까지 FAIL로 올리고 싶은 경우:
+        # raise RuntimeError(f"{label}: 일부 서브 플로우 FAIL ({failed_str})")
+
+# 공통 플로우 실행 래퍼
+@profiled("flow", lambda flow_fn, *a, name="", iter_no=None, **k: f"{name} #{iter_no}")
+def run_flow(
+    flow_fn: Callable, *,
+    name: str, iter_no: int,
+    env: Optional['QAEnv'] = None,
+    on_ready: Optional[Callable[[], None]] = None,
+    send_mail_on_success: bool = False,
+    stop_on_fail: bool = False,
+    # ✅ 추가: 수신자 오버라이드
+    mail_to: Optional[Union[str, List[str]]] = None,
+    mail_cc: Optional[Union[str, List[str]]] = None,
+    mail_bcc: Optional[Union[str, List[str]]] = None,
+    debug: bool = False,
+) -> Tuple[bool, object, object, Dict[str, Optional[str]], Optional[str]]:
+    """
+    단일 플로우 1회 실행.
+    return: (ok, poco, artifacts, err_text)
+      - ok: 성공 True / 실패 False
+      - poco: (실패 재시작 시) 갱신된 UnityPoco
+      - artifacts: {"slice": <path or None>, "pdf": <path or None>}
+      - err_text: 실패 시 에러 문자열
+    실패 시: 즉시 스냅샷 + 실패 증거(save_log/gen_report/메일) 백그라운드 예약 → 앱 재시작 → on_ready 대기 → poco 갱신
+      - 실패 산출물은 반환값이 아닌 env.run_artifacts["evidence_*"]로 나중에 반영 (finalize_run에서 대기)
+    """
+    env = env or QAEnv()
+
+    slice_path: Optional[str] = None
+    pdf_path:   Optional[str] = None
+    recent_path: Optional[str] = None  # 👈 추가
+
+    # env 기본값 → 인자로 override 가능
+    on_ready = on_ready or env.on_ready
+
+    t0 = time.time()
+    try:
+        step(f"[RUN] Ct.{iter_no} - {name}", env=env)
+        flow_fn()
+        _add_timing(env, "flow", name, t0, True, iter_no=iter_no)
+
+        if debug:
+            step(f"[RUN] 성공: Ct.{iter_no} - {name}", env=env)
+
+        # 성공 시: (선택) 메일 + 산출물
+        if send_mail_on_success:
+            try:
+                if env._rm_proc is not None:
+                    slice_path = save_log(timeout=45)
+                    pdf_path   = gen_report(timeout=60)
+                    recent_path = find_latest_logcat_recent(env)  # 👈 추가
+
+                send_mail_smtp(
+                    subject=f"✅ A-Test Flow 성공: {name} (#{iter_no}) - {env.package}_{env.serial or 'device'}",
+                    body=(f"{name} (#{iter_no}) 성공\n"
+                          f"패키지: {env.package}\n결과 폴더: {env.out_dir}\n"
+                          f"첨부: log recent / log slice / resource report"),  # 👈 수정
+                    attachments=[p for p in [recent_path, slice_path, pdf_path] if p],
+                    # ✅ 전달
+                    to=mail_to, cc=mail_cc, bcc=mail_bcc
+                )
+
+                step(f"[RUN] 성공 메일/산출물 처리 완료: Ct.{iter_no} - {name}", env=env)
+            except Exception as me:
+                step(f"[WARN] 성공 메일/산출물 처리 실패: {me}", env=env)
+                note(f"[RECOVERY] 성공은 했지만 산출물/메일 처리 실패: {name} #{iter_no} ({me})", env=env)
+
+        return True, env.apoco, env.poco, {"recent": recent_path, "slice": slice_path, "pdf": pdf_path}, None
+
+    except Exception as e:
+        err_text = str(e)
+        _add_timing(env, "flow", name, t0, False, iter_no=iter_no)
+
+        if not stop_on_fail:
+            # ① 즉시 스냅샷 → ② slice/report/실패 메일은 백그라운드 파이프라인 (결과는 env.run_artifacts)
+            step(f"[ERR] Flow 실패: Ct.{iter_no} - {name} - {err_text}", shot=True, env=env)
+            capture_failure_evidence(
+                f"{name} (#{iter_no})", name=name, iter_no=iter_no, err_text=err_text,
+                subject=f"❌ A-Test Flow 실패: {name} (#{iter_no}) - {env.package}_{env.serial or 'device'}",
+                body=(f"Flow 실패: {name} (#{iter_no})\n"
+                    f"패키지: {env.package}\n결과 폴더: {env.out_dir}\n에러: {err_text}\n"
+                    f"첨부: log recent / log slice / resource report / events.csv"),
+                # ✅ 전달
+                mail_to=mail_to, mail_cc=mail_cc, mail_bcc=mail_bcc,
+                env=env,
+            )
+
+            # ③ 앱 재시작 / 혹은 Poco 하드 리셋 → on_ready 대기
+            try:
+                # 🔸 환경계 에러 패턴이면 하드 리셋 우선
+                fatal_keywords = (
+                    "socket connection broken",
+                    "RemoteDisconnected",
+                    "Process crashed",
+                    "uiautomation",
+                    "instrumentation test server process is no longer alive",
+                )
+                if any(k in err_text for k in fatal_keywords):
+                    step("[RUN] 환경 문제로 판단 → Poco 하드 리셋 시도", env=env)
+                    note(f"[RECOVERY] 환경 문제로 판단되어 Poco 하드 리셋 수행: {name} #{iter_no}", env=env)
+                    try:
+                        poco_hard_reset(env, reason=f"run_flow 실패: {err_text}")
+                    except PocoFatalError as fe:
+                        step(f"[RUN] FATAL Poco 하드 리셋 실패: {fe}", env=env, shot=True)
+                        note(f"[RISK] Poco 하드 리셋 실패(불안정 지속 가능): {name} #{iter_no}", env=env)
+                else:
+                    # 일반적인 FAIL이면 기존처럼 앱만 재시작
+                    restart_app(env=env)
+                    try:
+                        if callable(on_ready):
+                            on_ready()
+                    except Exception as we:
+                        step(f"[WARN] 재시작 후 대기(on_ready) 실패: {we}", env=env)
+                        note(f"[RISK] 재시작 후 on_ready 실패(다음 플로우 영향 가능): {we}", env=env)
+
+            except Exception as re:
+                step(f"[WARN] 재시작/하드리셋 처리 중 예외: {re}", env=env)
+
+        return False, env.apoco, env.poco, {"recent": recent_path, "slice": slice_path, "pdf": pdf_path}, err_text
+
+
+# 계정 lease 확인 (heartbeat 연장 실패 → 다른 워커와 같은 계정으로 로그인 중일 수 있음) → False면 중단
+def _lease_alive(env: 'QAEnv', i: int, name: str) -> bool:
+    try:
+        check_account_lease()
+        return True
+    except LeaseLostError as le:
+        step(f"[ERR] 계정 lease 유실 → 남은 플로우 중단: iter={i}, flow={name} ({le})", env=env)
+        note(f"[RISK] 계정 lease가 만료/회수되어 실행 중단(다른 워커와 로그인 공유 방지): {le}", env=env)
+        return False
+
+
+def _run_flows_sharded(
+    flows: List[Tuple[str, Callable]], *,
+    repeat: int,
+    env: 'QAEnv',
+    on_ready: Optional[Callable[[], None]] = None,
+    send_success_mail_each: bool = False,
+    stop_on_fail: bool = False,
+    mail_to: Optional[Union[str, List[str]]] = None,
+    mail_cc: Optional[Union[str, List[str]]] = None,
+    mail_bcc: Optional[Union[str, List[str]]] = None,
+) -> bool:
+    """
+    샤딩 실행 루프: 오케스트레이터에 (iter, flow)를 1건씩 요청해 실행하고 결과를 다음 요청에 실어 보고.
+    - 자기 몫이 끝나면 부모가 느린 단말의 남은 작업을 넘겨줌(work stealing)
+    - 채널이 없으면 False → 호출측이 기존 순차 루프로 실행
+    """
+    fn_by_name = {name: fn for name, fn in flows}
+    if event_request("shard_init", env=env, flows=[name for name, _ in flows], repeat=repeat,
+                     suite=getattr(env, "run_suite", "")) is None:
+        step("[WARN] 샤딩 채널 없음 → 전체 플로우 순차 실행", env=env)
+        return False
+
+    step("[=]===== 샤딩 실행 시작 =====", env=env)
+    done = None
+    abort = False
+    while True:
+        task = event_request("shard_next", env=env, done=done, abort=abort)
+        if not task or task.get("stop") or abort:
+            break
+        i, name = int(task["iter"]), str(task["flow"])
+        fn = fn_by_name.get(name)
+        if fn is None:
+            done = {"iter": i, "flow": name, "ok": False, "sec": 0.0, "error": "flow not found"}
+            continue
+
+        env._ctx_iter = i
+        env._ctx_flow = name
+        if not _lease_alive(env, i, name):
+            done = {"iter": i, "flow": name, "ok": False, "sec": 0.0, "error": "account lease lost"}
+            abort = True
+            continue
+        t0 = time.time()
+        ok, a, u, arts, err = run_flow(
+            fn, name=name, iter_no=i,
+            env=env,
+            on_ready=on_ready,
+            send_mail_on_success=send_success_mail_each,
+            stop_on_fail=stop_on_fail,
+            mail_to=mail_to, mail_cc=mail_cc, mail_bcc=mail_bcc
+        )
+        done = {"iter": i, "flow": name, "ok": ok, "sec": round(time.time() - t0, 2), "error": err or ""}
+        if not ok and stop_on_fail:
+            step(f"[WARN] stop_on_fail=True → 샤딩 전체 중단 요청: iter={i}, flow={name}", env=env)
+            abort = True
+
+        env.apoco = a
+        env.poco  = u
+
+    step("[=]===== 샤딩 실행 종료 =====", env=env)
+    return True
+
+
+def run_flows(
+    flows: List[Tuple[str, Callable]], *,
+    repeat: int,
+    env: Optional['QAEnv'] = None,
+    on_ready: Optional[Callable[[], None]] = None,             # 앱별 준비 콜백
+    on_close: Optional[Callable[[], None]] = None,             # 앱별 종료 콜백
+    send_success_mail_each: bool = False,
+    stop_on_fail: bool = False,   # ✅ 추가
+    # ✅ 추가: 기본 수신자 오버라이드(전체 루프 공통)
+    mail_to: Optional[Union[str, List[str]]] = None,
+    mail_cc: Optional[Union[str, List[str]]] = None,
+    mail_bcc: Optional[Union[str, List[str]]] = None,
+) -> Dict[str, object]:
+    """
+    여러 플로우를 repeat 횟수만큼 순차 실행.
+    - 실패 시: run_flow()에서 즉시 메일 발송, 루프는 계속
+    - 종료 시: 최종 요약 메일(실패 합계/목록) 1회 발송
+    return summary: {
+      "total_fail": int,
+      "fail_logs": List[Tuple[int, str, str]],  # (iter_no, flow_name, err_text)
+      "final_slice": str or None,
+      "final_pdf": str or None,
+      "final_recent": str or None  # 👈 추가
+    }
+    """
+    env = use_env(env)
+
+    # env 기본값 → 인자로 override 가능
+    on_close = on_close or env.on_close
+
+    stop_all = False  # ✅ 추가
+
+    # ✅ 이력 기반 예상 소요시간(이력 있을 때만 표시)
+    try:
+        names = [name for name, _ in flows]
+        hist = FlowHistory()
+        if any(n in hist.stats(suite=env.run_suite) for n in names):
+            est = hist.estimate(names, suite=env.run_suite)
+            eta = estimate_eta(names, est, repeat=repeat)
+            step(f"[ETA] 예상 소요 약 {eta['total_sec'] / 60:.1f}분 (플로우 {len(names)}개 × {repeat}회, 이력 기준)", env=env)
+    except Exception:
+        pass
+
+    # ✅ 샤딩 모드(qa_orchestrator --shard): 부모가 분배한 (iter, flow) 작업만 실행
+    sharded = _env_bool("QA_SHARD", False) and _run_flows_sharded(
+        flows, repeat=repeat, env=env, on_ready=on_ready,
+        send_success_mail_each=send_success_mail_each, stop_on_fail=stop_on_fail,
+        mail_to=mail_to, mail_cc=mail_cc, mail_bcc=mail_bcc,
+    )
+
+    for i in (range(1, repeat+1) if not sharded else ()):
+        step(f"[=]===== 반복 {i} 시작 =====", env=env)
+        for name, fn in flows:
+            # ✅ 현재 컨텍스트(서브플로우 로그가 이 값을 참조)
+            env._ctx_iter = i
+            env._ctx_flow = name
+            if not _lease_alive(env, i, name):
+                stop_all = True
+                break
+
+            ok, a, u, arts, err = run_flow(
+                fn, name=name, iter_no=i,
+                env=env,
+                on_ready=on_ready,
+                send_mail_on_success=send_success_mail_each,
+                stop_on_fail=stop_on_fail,
+                # ✅ 전달
+                mail_to=mail_to, mail_cc=mail_cc, mail_bcc=mail_bcc
+            )
+            if not ok and stop_on_fail:  # ✅ 추가: 즉시 전체 루프 중단
+                step(f"[=]===== 반복 {i} 중단 =====", env=env)
+                step(f"[WARN] stop_on_fail=True → 실패 감지로 플로우 중단: iter={i}, flow={name}", env=env)
+                stop_all = True
+                break
+
+            # Poco 갱신
+            env.apoco = a
+            env.poco  = u
+        
+        if stop_all:  # ✅ outer loop 탈출
+            break
+
+    step(f"[=]===== 모든 반복 종료 =====", env=env)
+    # --- 전체 결과 요약 출력 ---
+    if env.total_fail == 0:
+        step(
+            f"✅ A-Test 최종 성공 ({repeat}회 무오류) - {env.package}_{env.serial or 'device'}",
+            env
+        )
+    else:
+        step(
+            f"⚠️ A-Test 최종 완료(실패 {env.total_fail}건) - {env.package}_{env.serial or 'device'}",
+            env
+        )
+
+    if on_close is not None:
+        try:
+            on_close()
+        except Exception:
+            pass
+
+    # ✅ scrcpy 스트림 정리(단말 측 서버/포워딩 해제)
+    try:
+        stop_scrcpy_capture(env)
+    except Exception:
+        pass
+
+    # 최종 산출물 + 요약 메일
+    final_slice = None
+    final_pdf   = None
+    final_recent = None
+    evcsv       = None
+    # 실패 증거 작업이 남아 있으면 먼저 정리 (최종 slice/report와 flag 경합 방지)
+    wait_evidence(env)
+    if env._rm_proc is not None:
+        final_slice = save_log(timeout=60)
+        final_pdf   = gen_report(timeout=60)
+        final_recent = find_latest_logcat_recent(env)   # 👈 추가
+        evcsv       = os.path.join(env.out_dir, "events.csv")
+    html_rep    = None
+
+    # Airtest 리포트 생성 (✅ 메일 첨부 기본 제외 / ✅ Drive 링크 기본)
+    airtest_index_html = None
+    airtest_drive_link = None
+
+    try:
+        script_path = env.airtest_script
+        log_dir     = env.airtest_log_dir
+
+        if script_path and log_dir:
+
+            ts = time.strftime("%y%m%d_%H%M")
+
+            # ✅ 스크린샷 중복 제거/재인코딩/썸네일 (번들·업로드 용량 절감, QA_SHOT_COMPACT=0이면 생략)
+            if _env_bool("QA_SHOT_COMPACT", True):
+                try:
+                    from .shots import compact_airtest_log   # cv2 의존 → 사용 시점 import
+                    compact_airtest_log(log_dir, env=env)
+                except Exception as ce:
+                    step(f"[WARN] 스크린샷 정리 실패(원본 유지): {ce}", env=env)
+
+            portable_dir, index_html = build_portable_airtest_report(
+                script_path=script_path,
+                log_dir=log_dir,
+                out_dir=env.run_dir,   # ✅ Run 폴더 안에 포터블 번들 생성
+                ts=ts,
+                move_logs=True,        # 원본 airtest_log는 아래에서 삭제하므로 복사 대신 이동
+                env=env,
+            )
+            airtest_index_html = index_html
+
+            step(f"[OK] Portable Airtest 리포트 생성 완료: {index_html}", env=env)
+
+            # ✅ 포터블 번들에 필요한 로그/스크린샷을 모두 옮겼으면 원본 airtest_log 폴더(잔여물)는 제거
+            try:
+                # portable_dir 안에 airtest_log가 존재하면(복사 완료 신호) 원본 log_dir 삭제
+                bundled_log = os.path.join(portable_dir, "airtest_log")
+                if os.path.isdir(bundled_log) and os.path.isdir(log_dir):
+                    shutil.rmtree(log_dir, ignore_errors=True)
+                    step(f"[OK] 원본 airtest_log 폴더 삭제 완료: {log_dir}", env=env)
+            except Exception as e:
+                step(f"[WARN] 원본 airtest_log 폴더 삭제 실패: {e}", env=env)
+
+            if env.gdrive_enable:
+                # ✅ 포터블 번들을 zip으로 묶어서 Drive 업로드 (메일 첨부는 하지 않음)
+                #    zip 생성과 업로드를 겹쳐서 진행(QA_UPLOAD_STREAM=1), zip 파일을 만든 경우 업로드 후 매니저가 삭제
+                try:
+                    # credentials/token 경로가 환경변수에 없으면 qa_common/_secrets 기본 경로로 가정
+                    # 이 파일 위치: ...\Tools\qa_common\common\flows.py 라는 전제
+                    common_dir = Path(__file__).resolve().parent.parent  # ...\Tools\qa_common
+                    secrets_dir = common_dir / "_secrets"
+
+                    os.environ.setdefault("QA_GDRIVE_CREDENTIALS", str(secrets_dir / "gdrive_credentials.json"))
+                    os.environ.setdefault("QA_GDRIVE_TOKEN",       str(secrets_dir / "gdrive_token.json"))
+
+                    folder_id = env.gdrive_folder_id
+                    share_anyone = env.gdrive_share_anyone
+
+                    airtest_drive_link = drive_upload(portable_dir, folder_id=folder_id, make_anyone=share_anyone, env=env)
+
+                    if airtest_drive_link:
+                        step(f"[OK] Airtest 포터블 리포트 Drive 업로드 완료: {airtest_drive_link}", env=env)
+
+                    else:
+                        step("[GDRIVE] 업로드 스킵/실패 → 링크 없음", env=env)
+
+                except Exception as e:
+                    step(f"[WARN] Airtest 포터블 리포트 Drive 업로드 실패: {e}", env=env)
+
+            # env에 저장(메일 본문/summary에서 사용)
+            try:
+                env.airtest_report_link = airtest_drive_link
+            except Exception:
+                pass
+
+            # ✅ 메일 첨부 대상(html_rep)에는 넣지 않음
+            html_rep = None
+
+    except Exception:
+        pass
+
+    # ✅ Run 표준 종료 처리 (meta.json + summary.html)
+    try:
+        # total_fail 기반 1차 판정 + step 카운트 기반 2차 보정
+        if env.total_fail > 0:
+            final_res = "FAIL"
+        else:
+            final_res = _pick_overall_result(getattr(env, "run_counts", {}) or {})
+
+        # ✅ Failures를 summary/meta에 반영 (step 누적분 + fail_logs 병합)
+        try:
+            preserved = list(getattr(env, "run_fail_logs", []) or [])
+            env.run_fail_logs = preserved
+
+            for item in (env.fail_logs or []):
+                env.run_fail_logs.append({
+                    "iter": str(item.get("iter", "")),
+                    "name": str(item.get("name", "")),
+                    "error": str(item.get("error", "")),
+                    # kind/flow는 확장 정보로 남겨도 무방(템플릿이 무시하면 그만)
+                    "kind": str(item.get("kind", "")),
+                    "flow": str(item.get("flow", "")),
+                })
+        except Exception:
+            # 여기서도 완전 초기화하지 말고, 기존 값 보존
+            try:
+                env.run_fail_logs = list(getattr(env, "run_fail_logs", []) or [])
+            except Exception:
+                env.run_fail_logs = []
+
+        # ✅ artifacts는 finalize 전에 먼저 채운다 (meta/summary에 반영되도록)
+        # - 메일 첨부는 제외하더라도, 로컬 index.html 경로는 summary에서 링크로 활용 가능
+        if airtest_index_html and os.path.exists(airtest_index_html):
+            env.run_artifacts["airtest_report"] = os.path.relpath(airtest_index_html, env.run_dir).replace("\\", "/")
+
+        # - Drive 링크도 summary/meta에서 볼 수 있게 남김
+        if getattr(env, "airtest_report_link", None):
+            env.run_artifacts["airtest_drive_link"] = str(env.airtest_report_link)
+        if final_recent:
+            env.run_artifacts["logcat_recent"] = os.path.relpath(final_recent, env.run_dir).replace("\\", "/")
+        if final_slice:
+            env.run_artifacts["logcat_slice"] = os.path.relpath(final_slice, env.run_dir).replace("\\", "/")
+        if final_pdf:
+            env.run_artifacts["resource_report"] = os.path.relpath(final_pdf, env.run_dir).replace("\\", "/")
+        if evcsv and os.path.exists(evcsv):
+            env.run_artifacts["events_csv"] = os.path.relpath(evcsv, env.run_dir).replace("\\", "/")
+        exc_stats = save_exception_stats(env)
+        if exc_stats:
+            env.run_artifacts["exception_stats"] = os.path.relpath(exc_stats, env.run_dir).replace("\\", "/")
+
+        # ✅ finalize는 1번만
+        finalize_run(env, result=final_res)
+
+        # ✅ 플로우/서브플로우 소요시간 이력 DB 기록 (스케줄러/ETA 입력)
+        try:
+            n = record_env_run(env)
+            if n:
+                step(f"[OK] 소요시간 이력 기록: {n}건", env=env)
+        except Exception as he:
+            step(f"[WARN] 소요시간 이력 기록 실패: {he}", env=env)
+
+        # ✅ 최종 요약 메일: 메일 본문 = summary.html(동일 HTML)
+        #    (샤딩 모드는 오케스트레이터가 통합 summary를 만들므로 단말별 메일/브라우저 생략)
+        if not sharded:
+            try:
+                # 제목은 결과 기반으로
+                subject = (f"✅ A-Test 최종 성공 ({repeat}회 무오류) - {env.package}_{env.serial or 'device'}"
+                            if final_res == "PASS" else
+                            f"⚠️ A-Test 최종 완료({final_res}, 실패 {env.total_fail}건) - {env.package}_{env.serial or 'device'}")
+
+                # body_html은 summary와 동일한 HTML (파일/문자열 동기화)
+                try:
+                    # finalize_run이 방금 summary.html을 저장했으니 그걸 읽어도 됨
+                    with open(env.run_summary_path, "r", encoding="utf-8") as f:
+                        body_html = f.read()
+                except Exception:
+                    # 폴백: 메모리에서 재생성
+                    body_html = _summary_html_text(env)
+
+                body_plain = (
+                    "QA Run Summary (HTML)\n"
+                    f"Run ID: {env.run_id}\n"
+                    f"Result: {env.run_result}\n"
+                    f"Run Dir: {env.run_dir}\n"
+                    "HTML 본문을 확인하세요."
+                )
+
+                # ✅ Airtest 포터블 리포트는 Drive 링크로만 제공
+                if getattr(env, "airtest_report_link", None):
+                    body_plain += f"\n\n[Airtest 포터블 리포트(Drive)]\n- {env.airtest_report_link}\n"
+                    if body_html:
+                        link = env.airtest_report_link
+                        body_html += f'\n<hr><h3>Airtest 포터블 리포트(Drive)</h3><p><a href="{link}">{link}</a></p>\n'
+                else:
+                    # 업로드 실패했을 때 안내(선택)
+                    if airtest_index_html:
+                        body_plain += "\n\n[Airtest 포터블 리포트]\n- Drive 업로드 실패 (로그 확인 필요)\n"
+
+                # ✅ 첨부: summary.html + 주요 산출물(기존과 동일)
+                attach = []
+                for p in [env.run_summary_path, env.run_log_path, final_recent, final_slice, final_pdf, evcsv]:
+                    if p and os.path.exists(p):
+                        attach.append(p)
+
+                send_mail_smtp(
+                    subject=subject,
+                    body=body_plain,
+                    body_html=body_html,
+                    attachments=attach,
+                    to=mail_to, cc=mail_cc, bcc=mail_bcc
+                )
+
+                step(f"📧 최종 요약(HTML) 메일 발송 완료: {subject}")
+            except Exception as me:
+                step(f"[WARN] 최종 요약(HTML) 메일 전송 실패: {me}", env=env)
+
+        # ✅ 브라우저는 summary만 오픈 (Airtest는 summary 링크로 진입)
+        try:
+            sp = getattr(env, "run_summary_path", None)
+            if sp and os.path.exists(sp) and not sharded:
+                webbrowser.open_new(os.path.abspath(sp))
+        except Exception:
+            pass
+        
+    except Exception:
+        pass
+
+    if env.run_counts.get("WARN", 0) > 0 and env.total_fail == 0:
+        note(f"[SCOPE] FAIL은 없지만 WARN {env.run_counts.get('WARN')}건 발생 → 상세는 Warnings 섹션 참조", env=env)
+
+    return {
+        "total_fail": env.total_fail,
+        "fail_logs": env.fail_logs,
+        "html_report": html_rep,
+        "final_recent": final_recent,  # 👈 추가
+        "final_slice": final_slice,
+        "final_pdf": final_pdf,
+        "events_csv": evcsv        
+    }
+
+# 진행률 헬퍼
+def parse_progress(progress_obj):
+    """
+    return: (done: bool, num: int|None, den: int|None, raw: str)
+    """
+    try:
+        if not progress_obj.exists():
+            return (False, None, None, "")
+        raw = progress_obj.get_text() or ""
+        m = re.search(r"(\d+)\s*/\s*(\d+)", raw)
+        if not m:
+            return (False, None, None, raw)
+        num = int(m.group(1))
+        den = int(m.group(2))
+        done = (den > 0 and num == den)
+        return (done, num, den, raw)
+    except Exception:
+        return (False, None, None, "")
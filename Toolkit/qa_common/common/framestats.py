@@ -0,0 +1,358 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 프레임 렌더링 jank 샘플러 (dumpsys gfxinfo framestats → 프레임 시간/jank %/느린 구간)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - 단말당 `adb shell` 1개를 띄워 두고 주기마다 `dumpsys gfxinfo <pkg> framestats reset` 실행 (adbstream.AdbShellStream)
+#     · reset으로 단말 링버퍼(창당 최근 120프레임)를 비워 다음 주기와 겹치지 않게 수집, PROFILEDATA 행만 전송
+#     · 창(Activity/Dialog)별 헤더의 열 위치로 파싱 → 어떤 API 레벨이든 IntendedVsync/FrameCompleted 기준
+#   - 프레임 시간 = FrameCompleted - IntendedVsync, 마감 = FrameDeadline - IntendedVsync(API 31+) 또는 QA_GFX_VSYNC_MS
+#     · Flags != 0 프레임(창 레이아웃 변경/건너뜀 등)은 제외, jank = 프레임 시간 > 마감
+#     · 단말 monotonic → 호스트 시각: (수신 시각 - 최신 FrameCompleted)의 최솟값으로 오프셋 추정(초 단위 상관용)
+#   - 저장: gfx_YYMMDD_HHMM.csv (t, dur_ms, deadline_ms) — 리소스 모니터가 기록, generate_report가 읽음
+#   - 분석(NumPy): frame_stats()(jank %, P50/P90/P99), jank_series()(초 단위), slow_spans()(느린 구간), by_step()([STEP] 구간별)
+#   - 주의: SurfaceView/ExoPlayer 영상 표면 프레임은 gfxinfo 대상이 아님 → 영상 재생 중엔 컨트롤러/오버레이 등 UI 프레임만 집계
+#   - 단독 실행: python -m common.framestats live <package> [--serial S] [--sec 10] [--out gfx.csv]
+#                python -m common.framestats show <gfx_*.csv> [--events events.csv]
+# ==========================================================
+import os, re, sys, csv, glob, time, argparse, threading, subprocess, warnings
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+from .adbstream import AdbShellStream
+
+FROZEN_MS = 700.0          # Android vitals "frozen frame"
+_ROW_RE = re.compile(r"^\d+,\d")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def vsync_ms() -> float:
+    """FrameDeadline 열이 없는 단말(API 30 이하)의 마감 기준 (QA_GFX_VSYNC_MS, 기본 60Hz)"""
+    return _env_float("QA_GFX_VSYNC_MS", 1000.0 / 60)
+
+
+def parse_framestats(lines: List[str]) -> np.ndarray:
+    """
+    PROFILEDATA 행(헤더 "Flags,..." + 숫자 행) → (N, 3) int64 [IntendedVsync, FrameCompleted, 마감 ns(0=미제공)]
+    창마다 헤더가 다시 나오므로 헤더 기준 열 위치로 파싱, Flags != 0 / 미완료 프레임 제외.
+    """
+    out = []
+    cols: Optional[Dict[str, int]] = None
+    block: List[List[str]] = []
+
+    def _flush():
+        if not cols or not block:
+            return
+        width = min(len(r) for r in block)
+        need = [cols.get("Flags"), cols.get("IntendedVsync"), cols.get("FrameCompleted")]
+        if None in need or max(need) >= width:
+            return
+        a = np.array([r[:width] for r in block], dtype=np.int64)
+        dl = cols.get("FrameDeadline")
+        deadline = (a[:, dl] - a[:, need[1]]) if dl is not None and dl < width else np.zeros(len(a), np.int64)
+        keep = (a[:, need[0]] == 0) & (a[:, need[1]] > 0) & (a[:, need[2]] > a[:, need[1]])
+        out.append(np.column_stack([a[keep, need[1]], a[keep, need[2]], np.maximum(deadline[keep], 0)]))
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("Flags,"):
+            _flush()
+            cols = {name: i for i, name in enumerate(line.rstrip(",").split(","))}
+            block = []
+        elif _ROW_RE.match(line):
+            block.append(line.rstrip(",").split(","))
+    _flush()
+    if not out:
+        return np.zeros((0, 3), np.int64)
+    return np.concatenate(out)
+
+
+class FrameStatsSampler(AdbShellStream):
+    """
+    패키지 1개의 gfxinfo framestats를 장기 실행 스트림으로 수집.
+    - recent(sec): 최근 sec초 프레임 (t[epoch], dur_ms, deadline_ms) 배열
+    - out_path 지정 시 CSV로 누적 저장
+    """
+
+    thread_name = "qa-framestats"
+
+    def __init__(self, serial: Optional[str], package: str, *, interval: Optional[float] = None,
+                 out_path: Optional[str] = None, keep_sec: float = 600.0):
+        self._stream_init(serial)
+        self.package = package
+        self.interval = max(0.5, interval or _env_float("QA_GFX_INTERVAL", 1.0))
+        self.out_path = out_path
+        self.keep_sec = keep_sec
+        self.frames = 0
+        self._hist: deque = deque()
+        self._lock = threading.Lock()
+        self._offset: Optional[float] = None
+        self._last_vsync: set = set()
+        self._fh = None
+
+    # ---------- 스트림 ----------
+    def _script(self) -> str:
+        pkg = self.package
+        return (f"dumpsys gfxinfo {pkg} reset >/dev/null 2>&1; "
+                f"while :; do echo @@T; dumpsys gfxinfo {pkg} framestats reset 2>/dev/null"
+                f" | grep -E '^(Flags,|[0-9]+,[0-9])'; echo @@E; sleep {self.interval:g}; done")
+
+    def start(self) -> "FrameStatsSampler":
+        if re.match(r"^[\w.]+$", self.package or ""):
+            self._spawn()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        self._kill()
+        with self._lock:
+            if self._fh is not None:
+                try:
+                    self._fh.close()
+                except Exception:
+                    pass
+                self._fh = None
+
+    def _reader(self, proc: subprocess.Popen):
+        lines: List[str] = []
+        for line in self.read_lines(proc):
+            if line == "@@T":
+                lines = []
+            elif line == "@@E":
+                if proc is not self._proc:
+                    break
+                try:
+                    self._commit(time.time(), parse_framestats(lines))
+                except Exception:
+                    pass
+            else:
+                lines.append(line)
+
+    def _commit(self, recv: float, fr: np.ndarray):
+        if not len(fr):
+            self._last_vsync = set()
+            return
+        # reset 누락(다른 도구가 먼저 dump) 대비: 직전 주기와 같은 IntendedVsync는 중복으로 제외
+        seen, self._last_vsync = self._last_vsync, set(fr[:, 0].tolist())
+        if seen:
+            fr = fr[~np.isin(fr[:, 0], np.fromiter(seen, np.int64))]
+        if not len(fr):
+            return
+        fr = fr[np.argsort(fr[:, 1])]
+        off = recv - fr[-1, 1] / 1e9
+        self._offset = off if self._offset is None else min(self._offset, off)
+        t = fr[:, 1] / 1e9 + self._offset
+        dur = (fr[:, 1] - fr[:, 0]) / 1e6
+        dl = np.where(fr[:, 2] > 0, fr[:, 2] / 1e6, vsync_ms())
+        with self._lock:
+            self._hist.append((t, dur, dl))
+            self.frames += len(t)
+            while self._hist and self._hist[0][0][-1] < t[-1] - self.keep_sec:
+                self._hist.popleft()
+            self._write(t, dur, dl)
+
+    def _write(self, t: np.ndarray, dur: np.ndarray, dl: np.ndarray):
+        if not self.out_path:
+            return
+        try:
+            if self._fh is None:
+                new = not os.path.exists(self.out_path)
+                self._fh = open(self.out_path, "a", encoding="utf-8", newline="")
+                if new:
+                    self._fh.write("t,dur_ms,deadline_ms\n")
+            self._fh.write("".join(f"{a:.3f},{b:.2f},{c:.2f}\n" for a, b, c in zip(t.tolist(), dur.tolist(), dl.tolist())))
+            self._fh.flush()
+        except Exception:
+            pass
+
+    # ---------- 조회 ----------
+    def recent(self, sec: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        with self._lock:
+            h = list(self._hist)
+        if not h:
+            return np.zeros(0), np.zeros(0), np.zeros(0)
+        t, dur, dl = (np.concatenate(x) for x in zip(*h))
+        if sec is not None:
+            m = t >= t[-1] - sec
+            t, dur, dl = t[m], dur[m], dl[m]
+        return t, dur, dl
+
+
+# ==========================================================
+# 🔹 분석 (모니터·리포트 공용)
+# ==========================================================
+def frame_stats(dur: np.ndarray, deadline: np.ndarray) -> Dict[str, Any]:
+    """프레임 수, jank 수/%, 프레임 시간 P50/P90/P99/최대(ms), frozen(>700ms) 수"""
+    n = int(len(dur))
+    if not n:
+        return {"frames": 0, "jank": 0, "jank_pct": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0,
+                "max": 0.0, "frozen": 0}
+    p50, p90, p99 = np.percentile(dur, [50, 90, 99])
+    jank = int(np.count_nonzero(dur > deadline))
+    return {"frames": n, "jank": jank, "jank_pct": round(100.0 * jank / n, 2),
+            "p50": round(float(p50), 2), "p90": round(float(p90), 2), "p99": round(float(p99), 2),
+            "max": round(float(dur.max()), 2), "frozen": int(np.count_nonzero(dur > FROZEN_MS))}
+
+
+def jank_series(t: np.ndarray, dur: np.ndarray, deadline: np.ndarray,
+                bin_sec: float = 1.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """bin_sec 구간별 (구간 시작 epoch, 프레임 수, jank %) — 프레임이 없는 구간은 생략"""
+    if not len(t):
+        return np.zeros(0), np.zeros(0, np.int64), np.zeros(0)
+    b = np.floor((t - t.min()) / bin_sec).astype(np.int64)
+    n = np.bincount(b)
+    j = np.bincount(b, weights=(dur > deadline).astype(np.float64), minlength=len(n))
+    idx = np.nonzero(n)[0]
+    return t.min() + idx * bin_sec, n[idx], 100.0 * j[idx] / n[idx]
+
+
+def slow_spans(t: np.ndarray, dur: np.ndarray, deadline: np.ndarray, *, min_pct: Optional[float] = None,
+               min_frames: int = 5, bin_sec: float = 1.0, gap_sec: float = 2.0) -> List[Dict[str, Any]]:
+    """
+    느린 구간: 초 단위 jank %가 min_pct(QA_GFX_SLOW_PCT, 기본 30) 이상인 구간을 gap_sec 이내로 병합.
+    반환: [{"start", "end", "frames", "jank_pct", "p90"}] (시각은 epoch)
+    """
+    min_pct = _env_float("QA_GFX_SLOW_PCT", 30.0) if min_pct is None else min_pct
+    bt, bn, bp = jank_series(t, dur, deadline, bin_sec)
+    hot = bt[(bp >= min_pct) & (bn >= min_frames)]
+    spans: List[List[float]] = []
+    for s in hot.tolist():
+        if spans and s - spans[-1][1] <= gap_sec:
+            spans[-1][1] = s + bin_sec
+        else:
+            spans.append([s, s + bin_sec])
+    out = []
+    for s, e in spans:
+        m = (t >= s) & (t < e)
+        st = frame_stats(dur[m], deadline[m])
+        out.append({"start": s, "end": e, "frames": st["frames"], "jank_pct": st["jank_pct"], "p90": st["p90"]})
+    return out
+
+
+def by_step(t: np.ndarray, dur: np.ndarray, deadline: np.ndarray,
+            steps: List[Tuple[float, str]]) -> List[Dict[str, Any]]:
+    """[STEP] 이벤트(epoch, 라벨) 사이 구간별 frame_stats — 프레임 없는 구간 제외, 첫 STEP 이전은 "(시작 전)" """
+    if not len(t):
+        return []
+    steps = sorted(steps)
+    starts = np.array([s for s, _ in steps], dtype=np.float64)
+    seg = np.searchsorted(starts, t, side="right") - 1          # -1 = 첫 STEP 이전
+    out = []
+    for k in np.unique(seg).tolist():
+        m = seg == k
+        label = steps[k][1] if k >= 0 else "(시작 전)"
+        start = steps[k][0] if k >= 0 else float(t[m].min())
+        end = steps[k + 1][0] if 0 <= k + 1 < len(steps) else float(t[m].max())
+        out.append(dict(frame_stats(dur[m], deadline[m]), label=label, start=start, end=end))
+    return out
+
+
+def load_frames(path: str, start: Optional[float] = None,
+                end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """gfx_*.csv → (t, dur_ms, deadline_ms) (기록 중단된 마지막 줄 무시)"""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")           # 빈 파일/잘린 줄 경고 억제
+            a = np.genfromtxt(path, delimiter=",", skip_header=1, invalid_raise=False, ndmin=2)
+    except (OSError, ValueError):
+        a = np.zeros((0, 3))
+    if a.size == 0 or a.shape[1] < 3:
+        return np.zeros(0), np.zeros(0), np.zeros(0)
+    a = a[~np.isnan(a).any(axis=1)]
+    m = np.ones(len(a), bool)
+    if start is not None:
+        m &= a[:, 0] >= start
+    if end is not None:
+        m &= a[:, 0] <= end
+    a = a[m]
+    return a[:, 0], a[:, 1], a[:, 2]
+
+
+def load_frames_range(folder: str, start: float, end: float) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """folder의 gfx_*.csv 중 [start, end] 구간 프레임 병합(시각순, 없으면 None)"""
+    parts = []
+    for p in sorted(glob.glob(os.path.join(folder, "gfx_*.csv"))):
+        try:
+            if os.path.getmtime(p) < start:
+                continue
+        except OSError:
+            continue
+        t, d, dl = load_frames(p, start, end)
+        if len(t):
+            parts.append((t, d, dl))
+    if not parts:
+        return None
+    t, d, dl = (np.concatenate(x) for x in zip(*parts))
+    o = np.argsort(t, kind="stable")
+    return t[o], d[o], dl[o]
+
+
+def read_step_events(csv_path: str) -> List[Tuple[float, str]]:
+    """events.csv의 STEP 행 → [(epoch, detail)]"""
+    out = []
+    try:
+        with open(csv_path, encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                if (row.get("type") or "").strip() == "STEP":
+                    try:
+                        ts = time.mktime(time.strptime(row["timestamp"], "%Y-%m-%d %H:%M:%S"))
+                    except (KeyError, ValueError):
+                        continue
+                    out.append((ts, (row.get("detail") or "").strip()))
+    except FileNotFoundError:
+        pass
+    return out
+
+
+def _fmt(st: Dict[str, Any]) -> str:
+    return (f"frames={st['frames']:,} jank={st['jank_pct']:.1f}% "
+            f"P50/P90/P99={st['p50']:.1f}/{st['p90']:.1f}/{st['p99']:.1f}ms frozen={st['frozen']}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="gfxinfo framestats 기반 프레임 jank 수집/분석")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    lv = sub.add_parser("live", help="실시간 수집(초당 요약 출력)")
+    lv.add_argument("package")
+    lv.add_argument("--serial", default=None)
+    lv.add_argument("--sec", type=float, default=10.0)
+    lv.add_argument("--out", default=None)
+    sh = sub.add_parser("show", help="저장 파일 요약(전체/느린 구간/STEP별)")
+    sh.add_argument("path")
+    sh.add_argument("--events", default=None, help="events.csv (기본: 같은 폴더)")
+    a = ap.parse_args(argv)
+
+    if a.cmd == "live":
+        s = FrameStatsSampler(a.serial, a.package, out_path=a.out).start()
+        t_end = time.time() + a.sec
+        while time.time() < t_end:
+            time.sleep(s.interval)
+            s.ensure_alive()
+            t, d, dl = s.recent(s.interval)
+            print(_fmt(frame_stats(d, dl)) if len(t) else "(no frames)")
+        s.stop()
+        t, d, dl = s.recent()
+        print(f"total: {_fmt(frame_stats(d, dl))}", file=sys.stderr)
+        return 0
+
+    t, d, dl = load_frames(a.path)
+    print(_fmt(frame_stats(d, dl)))
+    for sp in slow_spans(t, d, dl):
+        print(f"  느린 구간 {time.strftime('%H:%M:%S', time.localtime(sp['start']))}"
+              f"~{time.strftime('%H:%M:%S', time.localtime(sp['end']))} "
+              f"jank {sp['jank_pct']:.0f}% P90 {sp['p90']:.1f}ms ({sp['frames']} frames)")
+    ev = a.events or os.path.join(os.path.dirname(os.path.abspath(a.path)), "events.csv")
+    for r in by_step(t, d, dl, read_step_events(ev)):
+        print(f"  [STEP] {r['label'][:40]:<40} {_fmt(r)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
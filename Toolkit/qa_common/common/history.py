@@ -0,0 +1,229 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 플로우 소요시간 이력 DB(SQLite) + 소요시간 기반 스케줄러
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - Run 종료 시 플로우/서브플로우별 소요시간·결과·단말을 SQLite에 누적
+#   - DB 경로: QA_HISTORY_DB 환경변수 > qa_common/_history/flow_history.sqlite
+#   - 스케줄러: 긴 작업 우선 정렬(order_longest_first), ETA(estimate_eta), 단말 간 균형 분배(balance_shards)
+#   - 표준 라이브러리만 사용 (qa_orchestrator 부모 프로세스에서도 import 가능)
+#   - 조회: python -m common.history --suite basic_tc_suite [--devices 4]
+# ==========================================================
+import os, time, sqlite3, statistics, argparse, sys
+from typing import Optional, Dict, List, Any, Tuple, Iterable
+
+DEFAULT_SEC = 60.0      # 이력이 전혀 없을 때 작업 1건 추정치(초)
+RECENT_N = 20           # 통계에 쓰는 최근 실행 개수(플로우별)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       TEXT PRIMARY KEY,
+    suite        TEXT,
+    runner       TEXT,
+    package      TEXT,
+    serial       TEXT,
+    model        TEXT,
+    started_at   TEXT,
+    duration_sec REAL,
+    result       TEXT
+);
+CREATE TABLE IF NOT EXISTS durations (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id   TEXT,
+    suite    TEXT,
+    kind     TEXT,      -- flow | subflow
+    name     TEXT,
+    parent   TEXT,      -- subflow의 상위 flow
+    iter     INTEGER,
+    serial   TEXT,
+    ok       INTEGER,
+    sec      REAL,
+    ts       REAL
+);
+CREATE INDEX IF NOT EXISTS idx_dur_lookup ON durations(suite, kind, name, ts);
+"""
+
+
+def default_history_db() -> str:
+    p = (os.environ.get("QA_HISTORY_DB") or "").strip()
+    if p:
+        return os.path.abspath(p)
+    qa_common = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(qa_common, "_history", "flow_history.sqlite")
+
+
+class FlowHistory:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_history_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        con = sqlite3.connect(self.path, timeout=10.0)
+        con.execute("PRAGMA journal_mode=WAL")   # 여러 단말(프로세스) 동시 기록 대비
+        con.executescript(_SCHEMA)
+        return con
+
+    # ---------------- 기록 ----------------
+    def record_run(self, run: Dict[str, Any], timings: Iterable[Dict[str, Any]]) -> int:
+        """run: runs 컬럼 dict, timings: {kind,name,parent,iter,ok,sec,ts} 목록 → 기록 건수"""
+        rows = [
+            (run.get("run_id", ""), run.get("suite", ""), str(t.get("kind", "flow")), str(t.get("name", "")),
+             str(t.get("parent") or ""), t.get("iter"), run.get("serial", ""),
+             1 if t.get("ok") else 0, float(t.get("sec") or 0.0), float(t.get("ts") or time.time()))
+            for t in timings
+        ]
+        con = self._connect()
+        try:
+            with con:
+                con.execute(
+                    "INSERT OR REPLACE INTO runs(run_id, suite, runner, package, serial, model, started_at, duration_sec, result)"
+                    " VALUES (?,?,?,?,?,?,?,?,?)",
+                    (run.get("run_id", ""), run.get("suite", ""), run.get("runner", ""), run.get("package", ""),
+                     run.get("serial", ""), run.get("model", ""), run.get("started_at", ""),
+                     float(run.get("duration_sec") or 0.0), run.get("result", "")),
+                )
+                con.execute("DELETE FROM durations WHERE run_id = ?", (run.get("run_id", ""),))
+                con.executemany(
+                    "INSERT INTO durations(run_id, suite, kind, name, parent, iter, serial, ok, sec, ts)"
+                    " VALUES (?,?,?,?,?,?,?,?,?,?)", rows)
+        finally:
+            con.close()
+        return len(rows)
+
+    # ---------------- 조회 ----------------
+    def stats(self, suite: Optional[str] = None, kind: str = "flow",
+              last_n: int = RECENT_N, serial: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """이름별 최근 last_n건 통계: n / mean / p50 / p90 / max / fail_rate / last_ts"""
+        if not os.path.exists(self.path):
+            return {}
+        q = "SELECT name, sec, ok, ts FROM durations WHERE kind = ?"
+        args: List[Any] = [kind]
+        if suite:
+            q += " AND suite = ?"
+            args.append(suite)
+        if serial:
+            q += " AND serial = ?"
+            args.append(serial)
+        q += " ORDER BY ts DESC"
+        con = self._connect()
+        try:
+            rows = con.execute(q, args).fetchall()
+        finally:
+            con.close()
+
+        by_name: Dict[str, List[Tuple[float, int, float]]] = {}
+        for name, sec, ok, ts in rows:
+            lst = by_name.setdefault(name, [])
+            if len(lst) < last_n:
+                lst.append((float(sec), int(ok), float(ts)))
+
+        out = {}
+        for name, lst in by_name.items():
+            secs = sorted(s for s, _, _ in lst)
+            out[name] = {
+                "n": len(lst),
+                "mean": statistics.mean(secs),
+                "p50": statistics.median(secs),
+                "p90": secs[min(len(secs) - 1, int(round(0.9 * (len(secs) - 1))))],
+                "max": secs[-1],
+                "fail_rate": 1.0 - sum(o for _, o, _ in lst) / len(lst),
+                "last_ts": max(t for _, _, t in lst),
+            }
+        return out
+
+    def estimate(self, names: Iterable[str], suite: Optional[str] = None, kind: str = "flow",
+                 default_sec: Optional[float] = None) -> Dict[str, float]:
+        """
+        이름별 추정 소요시간(초) = 최근 p50.
+        이력 없는 이름은 default_sec > 알려진 p50들의 중앙값 > DEFAULT_SEC 순으로 대체.
+        """
+        names = list(dict.fromkeys(names))
+        st = self.stats(suite=suite, kind=kind)
+        known = [st[n]["p50"] for n in names if n in st]
+        fallback = default_sec if default_sec is not None else (statistics.median(known) if known else DEFAULT_SEC)
+        return {n: (st[n]["p50"] if n in st else float(fallback)) for n in names}
+
+
+# ---------------- 스케줄러 ----------------
+def order_longest_first(names: Iterable[str], estimates: Dict[str, float]) -> List[str]:
+    """추정 소요시간 내림차순(동률은 원래 순서 유지)"""
+    names = list(names)
+    return sorted(names, key=lambda n: -float(estimates.get(n, DEFAULT_SEC)))
+
+
+def balance_shards(tasks: List[Tuple[int, str]], workers: List[str],
+                   estimates: Dict[str, float]) -> Dict[str, List[Tuple[int, str]]]:
+    """
+    LPT(Longest Processing Time first) 분배: 긴 작업부터 현재 누적 시간이 가장 적은 단말에 배정.
+    tasks: (iter, flow) 목록 → {worker: [task...]} (각 단말 목록은 긴 작업 우선)
+    """
+    load = {w: 0.0 for w in workers}
+    out: Dict[str, List[Tuple[int, str]]] = {w: [] for w in workers}
+    for t in sorted(tasks, key=lambda t: (-float(estimates.get(t[1], DEFAULT_SEC)), t[0])):
+        w = min(workers, key=lambda x: load[x])
+        out[w].append(t)
+        load[w] += float(estimates.get(t[1], DEFAULT_SEC))
+    return out
+
+
+def estimate_eta(names: Iterable[str], estimates: Dict[str, float], *,
+                 repeat: int = 1, devices: int = 1) -> Dict[str, Any]:
+    """총 작업시간 / 단말 수 기준 LPT 완료 예상(makespan)"""
+    names = list(names)
+    tasks = [(i, n) for i in range(1, max(1, repeat) + 1) for n in names]
+    workers = [str(k) for k in range(max(1, devices))]
+    shards = balance_shards(tasks, workers, estimates)
+    per = {w: sum(float(estimates.get(n, DEFAULT_SEC)) for _, n in ts) for w, ts in shards.items()}
+    return {
+        "tasks": len(tasks),
+        "total_sec": sum(per.values()),
+        "makespan_sec": max(per.values()) if per else 0.0,
+        "per_device_sec": sorted(per.values(), reverse=True),
+    }
+
+
+def record_env_run(env, db: Optional[str] = None) -> int:
+    """QAEnv(run_timings 누적분) → 이력 DB 기록. env 속성만 참조(core 미의존)"""
+    timings = list(getattr(env, "run_timings", None) or [])
+    if not timings:
+        return 0
+    run = {
+        "run_id": getattr(env, "run_id", ""),
+        "suite": getattr(env, "run_suite", ""),
+        "runner": getattr(env, "run_runner", ""),
+        "package": getattr(env, "package", ""),
+        "serial": getattr(env, "serial", "") or "",
+        "model": getattr(env, "device_model", "") or "",
+        "started_at": getattr(env, "run_started_at", ""),
+        "duration_sec": getattr(env, "run_duration_sec", 0),
+        "result": getattr(env, "run_result", ""),
+    }
+    return FlowHistory(db).record_run(run, timings)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Flow duration history / ETA")
+    ap.add_argument("--suite", default=None)
+    ap.add_argument("--kind", default="flow", choices=("flow", "subflow"))
+    ap.add_argument("--devices", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--db", default=None)
+    a = ap.parse_args(argv)
+
+    h = FlowHistory(a.db)
+    st = h.stats(suite=a.suite, kind=a.kind)
+    if not st:
+        print(f"이력 없음: {h.path}")
+        return 1
+    est = {n: v["p50"] for n, v in st.items()}
+    print(f"{'name':40s} {'n':>4s} {'p50':>8s} {'p90':>8s} {'fail%':>6s}")
+    for n in order_longest_first(st, est):
+        v = st[n]
+        print(f"{n[:40]:40s} {v['n']:4d} {v['p50']:8.1f} {v['p90']:8.1f} {v['fail_rate'] * 100:6.1f}")
+    eta = estimate_eta(st, est, repeat=a.repeat, devices=a.devices)
+    print(f"\nETA: 작업 {eta['tasks']}건, 총 {eta['total_sec'] / 60:.1f}분, "
+          f"단말 {a.devices}대 기준 약 {eta['makespan_sec'] / 60:.1f}분")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 실시간 메모리 누수 감지(온라인 회귀 + 변화점) + 힙 덤프(hprof-conv)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - LeakDetector: PSS 샘플을 1건씩 받아 슬라이딩 윈도우 재귀 최소제곱(RLS, 충분통계 갱신/제거 O(1))으로 기울기 추정
+#     · 윈도우: QA_LEAK_WINDOW_SEC(기본 600초), 기울기 단위 KB/분, 결정계수 R² 함께 산출
+#     · 변화점: 기울기에 대한 단측 CUSUM(기준 k = 임계/2) → 누적 초과량이 임계×QA_LEAK_CUSUM_MIN(기본 5)분 이상,
+#       CUSUM 양수 구간이 윈도우 길이 이상 지속(화면 진입 등 1회성 계단 증가 배제), 현재 기울기 ≥ 임계,
+#       R² ≥ QA_LEAK_MIN_R2(기본 0.3, GC 톱니 고려)이면 "누수 의심" 1회 발생 (onset = CUSUM이 마지막으로 0이던 시각)
+#     · 발생 후 기울기가 k 아래로 내려가야 재무장(한 번의 누수 구간에 경보 1회)
+#     · 임계: 인자로 준 값 우선, None일 때만 QA_LEAK_KB_PER_MIN(기본 50000)
+#   - dump_heap(): am dumpheap → 파일 안정화 대기 → adb pull → 단말 파일 삭제 → hprof-conv 변환(MAT 등에서 바로 열림)
+#     · hprof-conv 탐색: 인자 > QA_HPROF_CONV > PATH > adb와 같은 폴더 > Toolkit/platform-tools
+#     · debuggable 빌드(또는 root)에서만 동작 — 실패 시 {"ok": False, "error": ...}
+#   - adb 1회성 실행은 adbstream.adb_run 공용
+#   - 표준 라이브러리만 사용 (resource_monitor_gui에서 import)
+#   - 단독 실행: python -m common.leakwatch replay <resource_*.txt> [--threshold KB/분]
+#                python -m common.leakwatch dump <package|pid> [--serial S] [--out DIR]
+# ==========================================================
+import os, re, sys, time, shutil, argparse, datetime, subprocess
+from collections import deque
+from typing import Optional, Dict, Any, Tuple
+
+from .adbstream import adb_run as _adb
+
+_REBASE_SEC = 6 * 3600      # 시간 기준점 재설정 주기(합계 값 크기 제한)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+class LeakDetector:
+    """
+    PSS 스트림 온라인 누수 감지기.
+    - update(t_epoch, pss_kb) → 경보 dict(최초 1회) 또는 None
+    - slope(KB/분) / r2 / ready / active / fit_line() 으로 현재 추정 상태 조회
+    """
+
+    def __init__(self, threshold_kb_min: Optional[float] = None, *, window_sec: Optional[float] = None,
+                 min_r2: Optional[float] = None, cusum_min: Optional[float] = None):
+        self.threshold = _env_float("QA_LEAK_KB_PER_MIN", 50_000) if threshold_kb_min is None else threshold_kb_min
+        self.window_sec = window_sec or _env_float("QA_LEAK_WINDOW_SEC", 600.0)
+        self.min_r2 = _env_float("QA_LEAK_MIN_R2", 0.3) if min_r2 is None else min_r2
+        self.cusum_h = self.threshold * (_env_float("QA_LEAK_CUSUM_MIN", 5.0) if cusum_min is None else cusum_min)
+        self.reset()
+
+    def reset(self):
+        """프로세스 교체(PID 변경) 등으로 메모리 기준이 바뀌면 호출"""
+        self._win: deque = deque()
+        self._t_ref: Optional[float] = None
+        self._n = 0
+        self._st = self._sy = self._stt = self._sty = self._syy = 0.0
+        self.slope = 0.0            # KB/분
+        self.intercept = 0.0
+        self.r2 = 0.0
+        self.cusum = 0.0
+        self.active = False
+        self.alarms = 0
+        self._t_prev: Optional[float] = None
+        self._onset: Optional[Tuple[float, float]] = None
+
+    # ---------- 슬라이딩 윈도우 최소제곱(충분통계) ----------
+    def _add(self, x: float, y: float, sign: float):
+        self._n += int(sign)
+        self._st += sign * x
+        self._sy += sign * y
+        self._stt += sign * x * x
+        self._sty += sign * x * y
+        self._syy += sign * y * y
+
+    def _rebase(self, t_ref: float):
+        self._t_ref = t_ref
+        self._n = 0
+        self._st = self._sy = self._stt = self._sty = self._syy = 0.0
+        for t, y in self._win:
+            self._add(t - t_ref, y, 1.0)
+
+    def _solve(self):
+        n = self._n
+        den = n * self._stt - self._st * self._st
+        if n < 3 or den <= 1e-9:
+            self.slope, self.r2 = 0.0, 0.0
+            return
+        b = (n * self._sty - self._st * self._sy) / den
+        self.intercept = (self._sy - b * self._st) / n
+        self.slope = b * 60.0
+        var_y = n * self._syy - self._sy * self._sy
+        cov = n * self._sty - self._st * self._sy
+        self.r2 = (cov * cov) / (den * var_y) if var_y > 1e-9 else 0.0
+
+    @property
+    def span_sec(self) -> float:
+        return (self._win[-1][0] - self._win[0][0]) if len(self._win) > 1 else 0.0
+
+    @property
+    def ready(self) -> bool:
+        """윈도우의 절반 이상이 채워져야 추정치 사용"""
+        return self._n >= 10 and self.span_sec >= self.window_sec * 0.5
+
+    def fit_line(self) -> Optional[Tuple[float, float, float, float]]:
+        """현재 윈도우 회귀선 (t0, y0, t1, y1) — 플롯 오버레이용"""
+        if not self.ready or self._t_ref is None:
+            return None
+        b = self.slope / 60.0
+        t0, t1 = self._win[0][0], self._win[-1][0]
+        return (t0, self.intercept + b * (t0 - self._t_ref), t1, self.intercept + b * (t1 - self._t_ref))
+
+    def update(self, t: float, pss_kb: float) -> Optional[Dict[str, Any]]:
+        if pss_kb is None:
+            return None
+        y = float(pss_kb)
+        if self._t_prev is not None and t <= self._t_prev:
+            return None
+        if self._t_ref is None:
+            self._t_ref = t
+        self._win.append((t, y))
+        self._add(t - self._t_ref, y, 1.0)
+        while self._win and t - self._win[0][0] > self.window_sec:
+            t0, y0 = self._win.popleft()
+            self._add(t0 - self._t_ref, y0, -1.0)
+        if t - self._t_ref > _REBASE_SEC:
+            self._rebase(self._win[0][0])
+        self._solve()
+
+        dt_min = (t - self._t_prev) / 60.0 if self._t_prev is not None else 0.0
+        self._t_prev = t
+        if not self.ready:
+            return None
+
+        k = self.threshold * 0.5
+        self.cusum = max(0.0, self.cusum + (self.slope - k) * dt_min)
+        if self.cusum == 0.0 or self._onset is None:
+            self._onset = (t, y)
+        if self.active:
+            if self.slope < k:
+                self.active = False
+                self.cusum = 0.0
+                self._onset = (t, y)
+            return None
+        onset_t, onset_y = self._onset
+        if (self.cusum >= self.cusum_h and t - onset_t >= self.window_sec
+                and self.slope >= self.threshold and self.r2 >= self.min_r2):
+            self.active = True
+            self.alarms += 1
+            return {"t": t, "slope_kb_min": round(self.slope, 1), "r2": round(self.r2, 3),
+                    "onset_t": onset_t, "growth_kb": int(y - onset_y), "pss_kb": int(y),
+                    "threshold": self.threshold, "window_sec": self.window_sec}
+        return None
+
+
+def format_alarm(a: Dict[str, Any]) -> str:
+    onset = datetime.datetime.fromtimestamp(a["onset_t"]).strftime("%H:%M:%S")
+    return (f"누수 의심: 기울기 {a['slope_kb_min']:,.0f} KB/분 (R² {a['r2']:.2f}, 기준 {a['threshold']:,.0f}) "
+            f"· 시작 추정 {onset} 이후 +{a['growth_kb']:,} KB")
+
+
+# ==========================================================
+# 🔹 힙 덤프 (am dumpheap → pull → hprof-conv)
+# ==========================================================
+def find_hprof_conv(explicit: Optional[str] = None) -> Optional[str]:
+    cands = [explicit, os.environ.get("QA_HPROF_CONV"), shutil.which("hprof-conv")]
+    adb = shutil.which("adb")
+    toolkit = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    for d in ([os.path.dirname(adb)] if adb else []) + [os.path.join(toolkit, "platform-tools")]:
+        cands += [os.path.join(d, "hprof-conv.exe"), os.path.join(d, "hprof-conv")]
+    return next((c for c in cands if c and os.path.isfile(c)), None)
+
+
+def dump_heap(target: str, out_dir: str, *, serial: Optional[str] = None, tag: str = "heap",
+              timeout: float = 180.0, hprof_conv: Optional[str] = None) -> Dict[str, Any]:
+    """
+    target(패키지명 또는 PID)의 힙 덤프를 out_dir/heap_<tag>_<시각>.hprof 로 저장.
+    반환: {"ok", "path"(변환본 또는 원본), "raw", "converted", "sec", "error"}
+    """
+    t0 = time.time()
+    serial = serial or os.environ.get("ANDROID_SERIAL") or os.environ.get("ADB_SERIAL") or None
+    stamp = datetime.datetime.now().strftime("%y%m%d_%H%M%S")
+    safe_tag = re.sub(r"[^\w.-]", "_", tag)
+    name = f"heap_{safe_tag}_{stamp}"
+    remote = f"/data/local/tmp/{name}.hprof"
+    res: Dict[str, Any] = {"ok": False, "path": None, "raw": None, "converted": False, "error": None}
+
+    rc, out = _adb(serial, ["shell", "am", "dumpheap", str(target), remote], timeout=timeout)
+    if rc != 0 or re.search(r"Exception|Error|not debuggable|No process", out, re.I):
+        res["error"] = out or f"am dumpheap rc={rc}"
+        return res
+
+    # am dumpheap은 버전에 따라 비동기 → 파일 크기가 2회 연속 같아질 때까지 대기
+    deadline, last, stable = t0 + timeout, -1, 0
+    while time.time() < deadline:
+        _, s = _adb(serial, ["shell", "stat", "-c", "%s", remote], timeout=10)
+        size = int(s) if s.isdigit() else -1
+        stable = stable + 1 if (size > 0 and size == last) else 0
+        if stable >= 2:
+            break
+        last = size
+        time.sleep(1.0)
+    else:
+        res["error"] = "dump timeout"
+        _adb(serial, ["shell", "rm", "-f", remote])
+        return res
+
+    os.makedirs(out_dir, exist_ok=True)
+    raw = os.path.join(out_dir, name + "_raw.hprof")
+    rc, out = _adb(serial, ["pull", remote, raw], timeout=timeout)
+    _adb(serial, ["shell", "rm", "-f", remote])
+    if rc != 0 or not os.path.isfile(raw):
+        res["error"] = out or "pull failed"
+        return res
+    res.update(ok=True, path=raw, raw=raw)
+
+    conv = find_hprof_conv(hprof_conv)
+    if conv:
+        dst = os.path.join(out_dir, name + ".hprof")
+        try:
+            p = subprocess.run([conv, raw, dst], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+            if p.returncode == 0 and os.path.isfile(dst):
+                os.remove(raw)
+                res.update(path=dst, raw=None, converted=True)
+            else:
+                res["error"] = "hprof-conv: " + p.stdout.decode("utf-8", "ignore").strip()
+        except (OSError, subprocess.TimeoutExpired) as e:
+            res["error"] = f"hprof-conv: {e}"
+    else:
+        res["error"] = "hprof-conv 없음 (원본 저장)"
+    res["sec"] = round(time.time() - t0, 1)
+    return res
+
+
+# ==========================================================
+# 🔹 CLI
+# ==========================================================
+_TS_RE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]")
+_PSS_RE = re.compile(r"^\s*TOTAL\s+(?:PssTotal\s+)?([\d,]+)\s*kB", re.I)
+
+
+def _replay(path: str, threshold: Optional[float]) -> int:
+    det = LeakDetector(threshold)
+    ts, n = None, 0
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            m = _TS_RE.match(line)
+            if m:
+                ts = datetime.datetime.strptime(m.group(1), "%Y-%m-%d %H:%M:%S").timestamp()
+                continue
+            m = _PSS_RE.match(line)
+            if m and ts is not None:
+                n += 1
+                a = det.update(ts, int(m.group(1).replace(",", "")))
+                if a:
+                    print(datetime.datetime.fromtimestamp(a["t"]).strftime("%Y-%m-%d %H:%M:%S"), format_alarm(a))
+                ts = None
+    print(f"samples={n} alarms={det.alarms} last_slope={det.slope:,.0f} KB/분 r2={det.r2:.2f}", file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="실시간 누수 감지 재생 / 힙 덤프")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("replay", help="리소스 로그(resource_*.txt)를 감지기에 재생")
+    r.add_argument("path")
+    r.add_argument("--threshold", type=float, default=None, help="KB/분 (기본 QA_LEAK_KB_PER_MIN > 50000)")
+    d = sub.add_parser("dump", help="힙 덤프 수집 + hprof-conv 변환")
+    d.add_argument("target", help="패키지명 또는 PID")
+    d.add_argument("--serial", default=None)
+    d.add_argument("--out", default=".")
+    a = ap.parse_args(argv)
+    if a.cmd == "replay":
+        return _replay(a.path, a.threshold)
+    res = dump_heap(a.target, a.out, serial=a.serial, tag="manual")
+    print(res)
+    return 0 if res["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 메일(SMTP) 발송 / Google Drive 업로드
+# ==========================================================
+# -*- coding: utf-8 -*-
+import os, re, threading
+from typing import Optional, List, Union
+# smtplib/email, Google Drive 클라이언트(googleapiclient, google_auth_oauthlib)는
+# 메일 발송/업로드 시점에만 import (스크립트 기동 시간 절감)
+from .core import QAEnv, _env_int, step, use_env
+
+
+# 환경변수에서 메일 설정 읽기
+def mail_env(name, default=None):
+    v = os.environ.get(name)
+    return v if (v is not None and str(v).strip()!="") else default
+
+def _split_emails(s: str):
+    # 콤마/세미콜론 모두 허용
+    return [x.strip() for x in re.split(r"[;,]", s or "") if x.strip()]
+
+# ------------------------------
+# Google Drive Upload Helpers
+# ------------------------------
+_DRIVE_SCOPES = ["https://www.googleapis.com/auth/drive.file"]
+
+def _zip_any(path: str) -> str:
+    """
+    path가 폴더면 zip으로 묶고, 파일이면 그대로 반환.
+    - archive.zip_to_file: 이미 압축된 파일(png/webp/mp4/zip 등)은 stored, 텍스트는 병렬 deflate
+    반환: 업로드할 파일 경로
+    """
+    path = os.path.abspath(path)
+    if os.path.isfile(path):
+        return path
+
+    base = os.path.basename(path.rstrip("\\/"))
+    parent = os.path.dirname(path.rstrip("\\/"))
+    zip_path = os.path.join(parent, f"{base}.zip")
+
+    # 기존 zip은 완성 후 교체(.part → os.replace)로 덮어쓰기
+    from .archive import zip_to_file
+    st = zip_to_file(path, zip_path, workers=_env_int("QA_ZIP_WORKERS", 0) or None)
+    try:
+        step(f"[ZIP] {base}.zip: {st['files']}개 (stored {st['stored']} / deflate {st['deflated']}), "
+             f"{st['bytes_in'] / 1048576:.1f}MB → {st['bytes_out'] / 1048576:.1f}MB, {st['sec']}s")
+    except Exception:
+        pass
+    return zip_path
+
+_DRIVE_CACHE = {}                   # (credentials 경로, token 경로) → {"creds", "service"}
+_DRIVE_LOCK = threading.Lock()
+
+
+def _drive_paths():
+    cred_path = os.environ.get("QA_GDRIVE_CREDENTIALS", "").strip()
+    token_path = os.environ.get("QA_GDRIVE_TOKEN", "").strip()
+
+    if not cred_path or not os.path.exists(cred_path):
+        raise RuntimeError(f"[GDRIVE] QA_GDRIVE_CREDENTIALS 누락 또는 파일 없음: {cred_path}")
+    if not token_path:
+        # 토큰 경로 없으면 credentials와 같은 폴더에 token.json 기본 생성
+        token_path = os.path.join(os.path.dirname(os.path.abspath(cred_path)), "token.json")
+    return cred_path, token_path
+
+
+def _get_drive_credentials():
+    """
+    QA_GDRIVE_CREDENTIALS / QA_GDRIVE_TOKEN 기반 OAuth 자격 증명 (프로세스 내 캐시).
+    - 만료 시에만 refresh → token 파일 갱신
+    - 최초 1회는 브라우저 OAuth 승인 필요(InstalledAppFlow)
+    """
+    env = use_env()
+    if not env.gdrive_enable:
+        return None
+    cred_path, token_path = _drive_paths()
+
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.auth.transport.requests import Request
+
+    with _DRIVE_LOCK:
+        ent = _DRIVE_CACHE.setdefault((cred_path, token_path), {})
+        creds = ent.get("creds")
+        if creds is not None and creds.valid:
+            return creds
+
+        if creds is None and os.path.exists(token_path):
+            try:
+                creds = Credentials.from_authorized_user_file(token_path, _DRIVE_SCOPES)
+            except Exception:
+                creds = None
+
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        elif not creds or not creds.valid:
+            flow = InstalledAppFlow.from_client_secrets_file(cred_path, _DRIVE_SCOPES)
+            # 로컬 PC 설치형: 콘솔 플로우
+            creds = flow.run_local_server(port=0)
+        # 토큰 저장
+        try:
+            with open(token_path, "w", encoding="utf-8") as f:
+                f.write(creds.to_json())
+        except Exception:
+            pass
+        ent["creds"] = creds
+        ent.pop("service", None)
+        return creds
+
+
+def _get_drive_service():
+    """
+    Drive v3 service (자격 증명이 바뀌지 않으면 캐시 재사용).
+    ※ service(httplib2)는 스레드 안전하지 않음 → 병렬 업로드는 upload.UploadManager(HTTP 직접 호출) 사용
+    """
+    creds = _get_drive_credentials()
+    if creds is None:
+        return None
+    from googleapiclient.discovery import build
+    with _DRIVE_LOCK:
+        ent = _DRIVE_CACHE[_drive_paths()]
+        if ent.get("service") is None:
+            ent["service"] = build("drive", "v3", credentials=creds)
+        return ent["service"]
+
+def _drive_set_permission_anyone(service, file_id: str):
+    """
+    링크 공개(정책상 필요시)
+    """
+    try:
+        service.permissions().create(
+            fileId=file_id,
+            body={"type": "anyone", "role": "reader"},
+            fields="id"
+        ).execute()
+    except Exception:
+        pass
+
+def drive_upload(path: str, *, folder_id: Optional[str]=None, make_anyone: bool=False,
+                 stream: Optional[bool] = None, env: Optional[QAEnv] = None) -> str:
+    """
+    파일/폴더 업로드 후 webViewLink 반환
+    - upload.UploadManager: 청크 재개 업로드(QA_UPLOAD_CHUNK_MB) + 지수 백오프 재시도 + 중단 시 세션 저장
+    - 폴더: stream=True(기본 QA_UPLOAD_STREAM=1)면 zip 생성과 업로드를 겹쳐서 진행, False면 zip 후 업로드
+    """
+    if _get_drive_credentials() is None:
+        # ✅ Drive 비활성화면 예외로 막지 말고, 알림만 남기고 스킵
+        try:
+            step("[GDRIVE] 비활성화(GDRIVE_ENABLE=False) → 업로드 스킵")
+        except Exception:
+            pass
+        return None
+
+    from .upload import get_upload_manager
+    res = get_upload_manager(env).upload(path, folder_id=folder_id, make_anyone=make_anyone, stream=stream)
+    link = res.get("link", "")
+
+    if not link:
+        raise RuntimeError("[GDRIVE] 업로드는 됐는데 webViewLink를 받지 못함")
+
+    return link
+
+# SMTP 연결 재사용 (다이제스트/연속 발송 시 메일마다 접속·로그인 반복 방지)
+class SmtpSession:
+    """
+    QA_MAIL_SMTP/QA_MAIL_USER/QA_MAIL_PASS 기반 SMTP 연결.
+    - 포트 465: SMTP_SSL (기존 동작)
+    - 그 외 포트: 평문 접속 후 서버가 지원하면 STARTTLS → AUTH 지원 시 로그인 (587, 로컬 SMTP 대역 등)
+    - send(): 끊긴 연결이면 1회 재접속 후 재전송
+    """
+
+    def __init__(self, hostport: Optional[str] = None, user: Optional[str] = None,
+                 pwd: Optional[str] = None, timeout: float = 60.0):
+        hostport = hostport or mail_env("QA_MAIL_SMTP", "smtp.gmail.com:465")
+        host, port = hostport.rsplit(":", 1)
+        self.host, self.port = host, int(port)
+        self.user = user if user is not None else mail_env("QA_MAIL_USER")
+        self.pwd = pwd if pwd is not None else mail_env("QA_MAIL_PASS")
+        self.timeout = timeout
+        self.connects = 0
+        self.sent = 0
+        self._smtp = None
+
+    def _connect(self):
+        import smtplib
+        if self.port == 465:
+            s = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+            s.login(self.user, self.pwd)
+        else:
+            s = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            s.ehlo()
+            if s.has_extn("starttls"):
+                s.starttls()
+                s.ehlo()
+            if s.has_extn("auth") and self.user and self.pwd:
+                s.login(self.user, self.pwd)
+        self._smtp = s
+        self.connects += 1
+
+    def send(self, msg, to_addrs: List[str]):
+        import smtplib
+        if self._smtp is None:
+            self._connect()
+        try:
+            self._smtp.send_message(msg, to_addrs=to_addrs)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # 유휴 타임아웃 등으로 끊긴 연결 → 1회 재접속
+            self.close()
+            self._connect()
+            self._smtp.send_message(msg, to_addrs=to_addrs)
+        self.sent += 1
+
+    def close(self):
+        s, self._smtp = self._smtp, None
+        if s is None:
+            return
+        try:
+            s.quit()
+        except Exception:
+            try:
+                s.close()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+# SMTP로 메일 발송
+def send_mail_smtp(subject: str, body: str, attachments: list=None, *,
+                   body_html: Optional[str] = None,
+                   to: Optional[Union[str, List[str]]] = None,
+                   cc: Optional[Union[str, List[str]]] = None,
+                   bcc: Optional[Union[str, List[str]]] = None,
+                   session: Optional[SmtpSession] = None,
+                   env: Optional['QAEnv'] = None):
+    """
+    수신자 우선순위: to 인자 -> QA_MAIL_TO 환경변수
+    환경변수:
+      QA_MAIL_USER : SMTP 로그인 아이디(발신 주소)
+      QA_MAIL_PASS : SMTP 비밀번호(또는 앱비밀번호)
+      QA_MAIL_TO   : 수신자 콤마/세미콜론구분 (예: a@b.com,c@d.com or a@b.com;c@d.com)
+      QA_MAIL_SMTP : 호스트:포트 (기본 smtp.gmail.com:465, SSL / 그 외 포트는 STARTTLS)
+    session: SmtpSession 전달 시 연결 재사용(호출 측에서 close)
+    """
+    env = use_env(env)
+
+    user = mail_env("QA_MAIL_USER")
+    pwd  = mail_env("QA_MAIL_PASS")
+    hostport = mail_env("QA_MAIL_SMTP","smtp.gmail.com:465")
+
+    # 수신자 결정(오버라이드 가능)
+    if isinstance(to, str):   tos = _split_emails(to)
+    elif isinstance(to, list): tos = to
+    else:                      tos = _split_emails(mail_env("QA_MAIL_TO",""))
+
+    if isinstance(cc, str):    ccs = _split_emails(cc)
+    elif isinstance(cc, list): ccs = cc
+    else:                      ccs = _split_emails(mail_env("QA_MAIL_CC",""))
+
+    if isinstance(bcc, str):    bccs = _split_emails(bcc)
+    elif isinstance(bcc, list): bccs = bcc
+    else:                       bccs = _split_emails(mail_env("QA_MAIL_BCC",""))
+
+    if not (user and pwd and tos):
+        raise RuntimeError("메일 환경변수(QA_MAIL_USER/QA_MAIL_PASS/QA_MAIL_TO) 미설정")
+
+    import mimetypes
+    from email.message import EmailMessage
+
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = user
+    msg["To"] = ", ".join(tos)
+    if ccs: msg["Cc"] = ", ".join(ccs)
+    msg.set_content(body)  # plain text (fallback)
+
+    # ------------------------------
+    # attachments 정규화: 폴더는 항상 ZIP으로 변환해서 첨부/업로드 대상으로 사용
+    # ------------------------------
+    norm_attachments = []
+    for p in (attachments or []):
+        if not p:
+            continue
+        if not os.path.exists(p):
+            continue
+        try:
+            if os.path.isdir(p):
+                norm_attachments.append(_zip_any(p))  # ✅ 폴더면 zip 생성
+            else:
+                norm_attachments.append(p)            # 파일이면 그대로
+        except Exception:
+            # zip 실패하면 원본을 넣어두되, 뒤에서 attach_error로 떨어지게 둠
+            norm_attachments.append(p)
+
+    attachments = norm_attachments
+
+    # ------------------------------
+    # (옵션2) 첨부 용량 초과 시 Google Drive 업로드 후 링크로 대체
+    # ------------------------------
+    max_mb = env.mail_max_attach
+    max_bytes = max_mb * 1024 * 1024
+
+    gdrive_enabled = env.gdrive_enable
+    folder_id = env.gdrive_folder_id
+    share_anyone = env.gdrive_share_anyone
+
+    # 첨부 전체 용량 계산(존재하는 파일만)
+    att_paths = []
+    total_size = 0
+    for p in (attachments or []):
+        if not p:
+            continue
+        if os.path.exists(p):
+            att_paths.append(p)
+            if os.path.isfile(p):
+                try:
+                    total_size += os.path.getsize(p)
+                except Exception:
+                    pass
+            else:
+                # 폴더는 zip 후 크기 계산(대략; 업로드 단계에서 zip 생성)
+                # 여기서는 초과판단만 필요하므로 0으로 두고, 폴더가 있으면 보수적으로 초과로 간주할 수도 있음
+                # -> 폴더가 있으면 zip 생성 후 정확히 계산하도록 처리
+                try:
+                    z = _zip_any(p)
+                    total_size += os.path.getsize(z)
+                except Exception:
+                    # zip 실패 시, 일단 초과로 몰아 Drive로 보냄
+                    total_size = max_bytes + 1
+
+    drive_links = []
+    if gdrive_enabled and att_paths and total_size > max_bytes:
+        # 첨부를 Drive로 올리고 링크만 남김
+        for p in att_paths:
+            try:
+                link = drive_upload(p, folder_id=folder_id, make_anyone=share_anyone)
+                drive_links.append((os.path.basename(p), link))
+            except Exception as e:
+                drive_links.append((os.path.basename(p), f"[UPLOAD_FAIL] {e}"))
+
+        # 본문에 링크 섹션 삽입
+        if drive_links:
+            lines = ["", f"[Drive 링크] (첨부 용량 {max_mb}MB 초과로 링크로 대체됨)"]
+            for name0, link0 in drive_links:
+                lines.append(f"- {name0}: {link0}")
+            body = body + "\n" + "\n".join(lines)
+
+            # HTML 본문이면 HTML에도 링크 반영
+            if body_html:
+                html_lines = [f"<hr><h3>Drive 링크 (첨부 용량 {max_mb}MB 초과로 링크로 대체됨)</h3><ul>"]
+                for name0, link0 in drive_links:
+                    if str(link0).startswith("http"):
+                        html_lines.append(f'<li>{name0}: <a href="{link0}">{link0}</a></li>')
+                    else:
+                        html_lines.append(f"<li>{name0}: {link0}</li>")
+                html_lines.append("</ul>")
+                body_html = body_html + "\n" + "\n".join(html_lines)
+
+        # 실제 첨부는 제거(메일 크기 줄임)
+        attachments = []
+
+        msg.set_content(body)
+
+    # ✅ HTML 본문 지원: 메일 내용 = summary.html
+    if body_html:
+        msg.add_alternative(body_html, subtype="html")
+
+    for p in (attachments or []):
+        try:
+            if not p or not os.path.exists(p): continue
+            ctype, encoding = mimetypes.guess_type(p)
+            if ctype is None: ctype = "application/octet-stream"
+            maintype, subtype = ctype.split("/",1)
+            with open(p, "rb") as f:
+                msg.add_attachment(f.read(), maintype=maintype, subtype=subtype,
+                                   filename=os.path.basename(p))
+        except Exception as e:
+            # 첨부 실패는 본문에만 기록하고 진행
+            msg.add_attachment(str(e).encode("utf-8"),
+                               maintype="text", subtype="plain",
+                               filename=f"attach_error_{os.path.basename(p)}.txt")
+
+    if session is not None:
+        session.send(msg, tos + ccs + bccs)
+    else:
+        with SmtpSession(hostport, user, pwd) as s:
+            s.send(msg, tos + ccs + bccs)
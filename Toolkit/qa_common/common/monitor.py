@@ -0,0 +1,258 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 리소스 모니터 GUI 연동 (시작/종료, save.flag/report.flag)
+# ==========================================================
+# -*- coding: utf-8 -*-
+import os, time, subprocess, glob, sys, shutil, ctypes
+from typing import Optional
+from .core import QAEnv, adb_env, step, use_env
+
+
+# 리소스 모니터 GUI 스크립트 경로 찾기
+def _find_resource_monitor_gui(script_dir: str) -> Optional[str]:
+    # 1) 고정 파일명 우선
+    cand = os.path.join(script_dir, "resource_monitor_gui.py")
+    if os.path.exists(cand):
+        return cand
+    # 2) 타임스탬프 버전 중 최신
+    files = glob.glob(os.path.join(script_dir, "resource_monitor_gui_*.py"))
+    if files:
+        # 파일명 끝의 타임스탬프 기준 역정렬
+        files.sort(reverse=True)
+        return files[0]
+    return None
+
+# 외부 Python 실행 파일 선택 (환경변수 우선, py-launcher 활용, 현재 fallback)
+def _pick_ext_python():
+    # 1) 환경변수 우선
+    p = os.environ.get("QA_PYTHON")
+    if p and os.path.exists(p): 
+        return p
+    # 2) Windows py-launcher로 3.10+ 우선 탐색
+    for v in ("3.11", "3.10", "3.12", "3.9", "3.8"):
+        try:
+            exe = subprocess.check_output(
+                ["py", f"-{v}", "-c", "import sys;print(sys.executable)"],
+                encoding="utf-8", errors="ignore"
+            ).strip()
+            if exe and os.path.exists(exe):
+                return exe
+        except Exception:
+            pass
+    # 3) fallback
+    return shutil.which("python") or sys.executable  # 최후: 현재라도
+
+# 리소스 모니터 시작: save.flag/report.flag + 산출물 감시(닫힘 확인 포함)
+def start_resource_monitor(env: Optional['QAEnv'] = None):
+    env = use_env(env)
+
+    gui = _find_resource_monitor_gui(env.script_dir)
+    if not gui:
+        step(f"[ERR] resource_monitor_gui*.py 없음: {env.script_dir}", env=env)
+        raise FileNotFoundError("resource_monitor_gui*.py")
+
+    py = _pick_ext_python()
+
+    # 기존 env에 RESULT_DIR/ADB_SERIAL 등을 얹되,
+    # ⬇ AirtestIDE용 TCL/TK 환경변수는 서브프로세스에서 제거
+    env_map = adb_env(env).copy()
+    for k in ("TCL_LIBRARY", "TK_LIBRARY"):
+        if k in env_map:
+            env_map.pop(k)
+
+    # GUI/도구들이 동일 기준(SCRIPT_DIR)으로 result를 잡게끔
+    env_map["QA_SCRIPT"] = env.script_dir
+
+    # PATH에서 AirtestIDE\tcl,\tk 조각 제거
+    def _clean_path(path):
+        parts = [p for p in (path or "").split(";")
+                 if not p.lower().endswith("\\airtestide\\tcl")
+                 and not p.lower().endswith("\\airtestide\\tk")]
+        return ";".join(parts)
+    env_map["PATH"] = _clean_path(os.environ.get("PATH",""))
+
+    args = [
+        # ⬇ cmd 창 유지
+        # "cmd", "/k", "call",
+        py, "-u", gui,
+        (env.package or ""), (env.serial or ""), "--auto",
+        # ✅ 결과 폴더 기준 통일: Run 모드든 단독 모드든 env.out_dir 기준으로 플래그/산출물 일치
+        "--out-dir", env.out_dir
+    ]
+
+    # (선택) ENV로도 내려주면, GUI가 ENV를 읽는 구조여도 호환됨
+    env_map["RESULT_DIR"] = env.out_dir
+
+    creation = getattr(subprocess, "CREATE_NEW_CONSOLE", 0)
+    env._rm_proc = subprocess.Popen(
+        args,
+        creationflags=creation,
+        cwd=env.script_dir,
+        env=env_map
+    )
+    with open(os.path.join(env.out_dir, "resource_monitor.pid"), "w", encoding="utf-8") as f:
+        f.write(str(env._rm_proc.pid))
+
+    step("🖥️ GUI 리소스 모니터링 시작", env=env)
+    time.sleep(2.0)
+    return env._rm_proc.pid
+
+# Windows에서 파일이 닫힐 때까지 대기
+def _wait_file_closed_windows(path: str, max_wait: int) -> bool:
+    try:
+        from ctypes import wintypes
+        GENERIC_READ=0x80000000; SHARE_NONE=0; OPEN_EXISTING=3; NORMAL=0x80; INVALID=ctypes.c_void_p(-1).value
+        CreateFileW=ctypes.windll.kernel32.CreateFileW; CloseHandle=ctypes.windll.kernel32.CloseHandle
+        CreateFileW.argtypes=[wintypes.LPCWSTR,wintypes.DWORD,wintypes.DWORD,wintypes.LPVOID,wintypes.DWORD,wintypes.DWORD,wintypes.HANDLE]
+        CreateFileW.restype=wintypes.HANDLE
+        deadline=time.time()+max_wait
+        while time.time()<deadline:
+            h=CreateFileW(path, GENERIC_READ, SHARE_NONE, None, OPEN_EXISTING, NORMAL, None)
+            if h!=INVALID and h is not None: CloseHandle(h); return True
+            time.sleep(0.5)
+        return False
+    except: return False
+
+# 플래그 파일 기록 (GUI _check_flags가 mtime 변화로 감지) → 기록 시각 반환
+# - 본문 = 실패 시각(ts, 없으면 지금): GUI가 그 시각에서 끝나는 구간으로 slice/resource/report를 자름
+def _trigger_flag(name: str, env: 'QAEnv', ts: Optional[float] = None) -> float:
+    flag = os.path.join(env.out_dir, name)
+    with open(flag,"w",encoding="utf-8") as f: f.write(str(ts if ts is not None else time.time()))
+    step(f"[OK] {name}: {flag}", env=env)
+    return time.time()
+
+# out_dir에서 t0 이후 생성된 <prefix>*<ext> 산출물 대기 (exclude: 이미 다른 요청이 가져간 경로)
+def _wait_artifact(env: 'QAEnv', prefix: str, ext: str, t0: float, timeout: float,
+                   exclude: Optional[set] = None) -> Optional[str]:
+    deadline=t0+timeout; target=None
+    while time.time()<deadline and not target:
+        for n in os.listdir(env.out_dir):
+            if n.startswith(prefix) and n.endswith(ext):
+                p=os.path.join(env.out_dir,n)
+                if exclude and p in exclude: continue
+                if os.path.getmtime(p)>=t0: target=p; break
+        if not target: time.sleep(0.5)
+    return target
+
+# save.flag 생성 및 로그캣 슬라이스 감시
+def save_log(timeout:int=60, env: Optional['QAEnv'] = None, *,
+             ts: Optional[float] = None, exclude: Optional[set] = None) -> Optional[str]:
+    env = use_env(env)
+
+    t0 = _trigger_flag("save.flag", env, ts)
+    target = _wait_artifact(env, "logcat_slice_", ".txt", t0, timeout, exclude)
+    if not target: step("[ERR] timeout: slice 미감지", env=env); return None
+    # GUI가 .part → 교체로 기록하므로 감지 시점에 완성본 (추가 고정 대기 없음)
+    _wait_file_closed_windows(target, 15)
+    step(f"[OK] slice 준비 완료: {target}", env=env); return target
+
+# report.flag 생성 및 리포트 생성 체크
+def gen_report(timeout:int=60, env: Optional['QAEnv'] = None, *,
+               ts: Optional[float] = None, exclude: Optional[set] = None) -> Optional[str]:
+    env = use_env(env)
+
+    t0 = _trigger_flag("report.flag", env, ts)
+    pdf = _wait_artifact(env, "resource_report_", ".pdf", t0, timeout, exclude)
+    if not pdf: step("[ERR] timeout: report 미감지", env=env); return None
+    _wait_file_closed_windows(pdf, 25)
+    step(f"[OK] resource 리포트 생성 완료: {pdf}", env=env); return pdf
+
+# rolling 로그 정리
+def cleanup_rolling_logs(out_dir: str, *, env: Optional['QAEnv'] = None,
+                         keep_latest: bool = False, max_wait: int = 15) -> int:
+    """
+    결과 폴더의 rolling_*.log 삭제 (산출물 용량 절감용)
+    - keep_latest=True면 가장 최신 1개는 남김
+    - Windows 잠금 대비: 삭제 전 파일 닫힘 대기
+    """
+    env = use_env(env)
+
+    if not out_dir or (not os.path.isdir(out_dir)):
+        return 0
+
+    try:
+        targets = [
+            os.path.join(out_dir, n)
+            for n in os.listdir(out_dir)
+            if n.startswith("rolling_") and n.endswith(".log")
+        ]
+    except Exception:
+        return 0
+
+    if not targets:
+        return 0
+
+    # 최신순 정렬(keep_latest 옵션용)
+    try:
+        targets.sort(key=lambda p: os.path.getmtime(p), reverse=True)
+    except Exception:
+        pass
+
+    if keep_latest and len(targets) > 0:
+        targets = targets[1:]
+
+    removed = 0
+    for p in targets:
+        try:
+            _wait_file_closed_windows(p, max_wait)
+        except Exception:
+            pass
+
+        try:
+            os.remove(p)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except PermissionError:
+            # 잠금이 길게 남는 케이스 폴백: rename 후 재시도
+            try:
+                tmp = p + ".del"
+                os.replace(p, tmp)
+                _wait_file_closed_windows(tmp, max_wait)
+                os.remove(tmp)
+                removed += 1
+            except Exception:
+                pass
+        except Exception:
+            pass
+
+    if removed:
+        step(f"🧹 rolling 로그 정리: {removed}개 삭제", env=env)
+    return removed
+
+# 리소스 모니터링 종료
+def stop_resource_monitor(env: Optional['QAEnv'] = None):
+    """
+    ⬅️ 유지/보강: stop.flag 생성 → GUI/event_tap 정상 종료 유도
+    - GUI 창이 떠 있으면 process tree 종료(taskkill /T /F) 폴백
+    """
+    env = use_env(env)
+
+    # 1) 정상 종료 유도: stop.flag
+    try:
+        open(os.path.join(env.out_dir, "stop.flag"), "w", encoding="utf-8").write("stop")
+    except Exception:
+        pass
+    time.sleep(0.6)
+
+    # 2) PID 확인
+    pid = None
+    if env._rm_proc and (env._rm_proc.poll() is None):
+        pid = env._rm_proc.pid
+    else:
+        pf = os.path.join(env.out_dir, "resource_monitor.pid")
+        if os.path.exists(pf):
+            try:
+                pid = int(open(pf, encoding="utf-8").read().strip())
+            except Exception:
+                pid = None
+
+    # 3) 폴백 강제 종료(창 닫힘/하위 프로세스 포함)
+    if pid:
+        try:
+            subprocess.run(["taskkill", "/PID", str(pid), "/T", "/F"],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception:
+            pass
+
+    env._rm_proc = None
+    step("⛔ GUI 리소스 모니터링 종료", env=env)
@@ -0,0 +1,230 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 단말별 프로세스/포그라운드 감시 (장기 실행 adb shell 1개로 PID·top activity 캐시)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - 단말당 `adb shell` 1개를 띄워 두고 단말 안에서 루프(pidof [+ ResumedActivity])를 돌려 결과만 스트림으로 수신
+#     · 스트림 틀(재기동/종료/리더 스레드)은 adbstream.AdbShellStream 공용
+#     · dumpsys activity(포그라운드)는 snapshot(foreground=True) 요청이 있을 때만 루프에 포함
+#       (마지막 요청 후 QA_PROCWATCH_FG_IDLE초(기본 30) 지나면 pidof 전용 루프로 복귀 → 리소스 측정 중 system_server 부하 없음)
+#     · 호출부(get_app_pid/is_app_running/get_foreground_package/is_app_in_foreground, 모니터 pid_of)는
+#       캐시된 상태를 읽기만 함 → 호출마다 adb 프로세스 생성 없음
+#   - 신선도: 샘플 나이가 max_age(QA_PROCWATCH_MAX_AGE, 기본 3초)를 넘으면 None → 호출부가 기존 adb 조회로 폴백
+#     · 신선한 샘플 대기는 최대 QA_PROCWATCH_WAIT초(기본 1.0) — 넘으면 바로 폴백
+#   - invalidate(): 앱 재시작/force-stop 직후 호출 → 그 이후 시작된 샘플만 유효(잠깐 대기 후 폴백)
+#   - 스트림이 끊기면 다음 조회 때 재기동(최소 5초 간격), pidof 없는 단말은 감시 비활성
+#   - QA_PROCWATCH=0 이면 비활성 (기존 동작), QA_PROCWATCH_INTERVAL(기본 1.0초) = 단말 내 루프 주기
+#   - 표준 라이브러리만 사용 (resource_monitor_gui 등 airtest 없는 프로세스에서도 import 가능)
+#   - 단독 실행: python -m common.procwatch <package> [--serial S] [--sec 10]
+# ==========================================================
+import os, re, sys, time, atexit, argparse, subprocess, threading
+from typing import Optional, Dict, Any
+
+from .adbstream import AdbShellStream
+
+_FG_RE = re.compile(r"\b([A-Za-z_][\w.]*)/([\w.$]+)")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def procwatch_enabled() -> bool:
+    return (os.environ.get("QA_PROCWATCH", "1").strip() or "1") != "0"
+
+
+class ProcWatcher(AdbShellStream):
+    """
+    단말 1대의 PID/포그라운드 상태를 장기 실행 스트림으로 유지.
+    - watch(pkg): 감시 패키지 추가(새 패키지면 스트림 재기동)
+    - snapshot(pkg, foreground, max_age, wait): {"ts", "pids": {pkg: pid|None}, "top": (pkg, cls)|None, "fg"}
+      또는 None(판단 불가)
+    - 포그라운드(dumpsys activity) 조회는 snapshot(foreground=True) 요청이 있을 때만 루프에 포함,
+      마지막 요청 후 QA_PROCWATCH_FG_IDLE초(기본 30) 지나면 pidof 전용 루프로 복귀
+    """
+
+    thread_name = "qa-procwatch"
+
+    def __init__(self, serial: Optional[str] = None, *, interval: Optional[float] = None, foreground: bool = False):
+        self._stream_init(serial)
+        self.interval = max(0.2, interval or _env_float("QA_PROCWATCH_INTERVAL", 1.0))
+        self.foreground = foreground
+        self.fg_idle = _env_float("QA_PROCWATCH_FG_IDLE", 30.0)
+        self.unsupported = False
+        self._pkgs: set = set()
+        self._cond = threading.Condition()
+        self._state: Dict[str, Any] = {"ts": 0.0, "pids": {}, "top": None, "fg": False}
+        self._dirty_ts = 0.0
+        self._fg_last = time.time() if foreground else 0.0
+        self.samples = 0
+
+    # ---------- 스트림 ----------
+    def _script(self) -> str:
+        pkgs = " ".join(sorted(self._pkgs))
+        loop = "echo @@T;"
+        if pkgs:
+            loop += f' for p in {pkgs}; do echo "@@P $p $(pidof $p)"; done;'
+        if self.foreground:
+            loop += " dumpsys activity activities 2>/dev/null | grep -m1 -E 'ResumedActivity';"
+        loop += f" echo @@E; sleep {self.interval:g};"
+        return ("command -v pidof >/dev/null 2>&1 || { echo @@NOPIDOF; exit 0; }; "
+                f"while :; do {loop} done")
+
+    def _spawn(self) -> bool:
+        """락 보유 상태에서 호출"""
+        self._state = {"ts": 0.0, "pids": {}, "top": None, "fg": False}
+        if not super()._spawn():
+            self.unsupported = True
+            return False
+        return True
+
+    def _reader(self, proc: subprocess.Popen):
+        fg = self.foreground                           # 이 스트림의 스크립트에 포그라운드 조회 포함 여부
+        ts, pids, top = 0.0, {}, None
+        for line in self.read_lines(proc):
+            line = line.strip()
+            if line == "@@T":
+                ts, pids, top = time.time(), {}, None     # 샘플 시작 시각 기준(보수적)
+            elif line.startswith("@@P "):
+                parts = line.split()
+                pid = next((int(x) for x in parts[2:] if x.isdigit()), None)
+                if len(parts) >= 2:
+                    pids[parts[1]] = pid
+            elif line == "@@E":
+                with self._cond:
+                    if proc is not self._proc:
+                        break
+                    self._state = {"ts": ts, "pids": pids, "top": top, "fg": fg}
+                    self.samples += 1
+                    self._cond.notify_all()
+                    if fg and time.time() - self._fg_last > self.fg_idle and not self._stopped:
+                        self.foreground = False           # 요청 끊김 → dumpsys 없는 루프로 교체
+                        self._spawn()
+                        break
+            elif line == "@@NOPIDOF":
+                self.unsupported = True
+            elif line and top is None:
+                m = _FG_RE.search(line.split("{", 1)[-1])
+                if m:
+                    pkg, cls = m.group(1), m.group(2)
+                    top = (pkg, pkg + cls if cls.startswith(".") else cls)
+        with self._cond:
+            if proc is self._proc:
+                self._proc = None
+            self._cond.notify_all()
+
+    # ---------- 공개 API ----------
+    def watch(self, *packages: str) -> "ProcWatcher":
+        with self._cond:
+            new = {p for p in packages if p and re.match(r"^[\w.]+$", p)} - self._pkgs
+            if new:
+                self._pkgs |= new
+                if not self.unsupported and not self._stopped:
+                    self._spawn()
+        return self
+
+    def invalidate(self):
+        """앱 재시작/종료 직후 호출 — 이 시점 이전에 시작된 샘플은 무효"""
+        with self._cond:
+            self._dirty_ts = time.time()
+
+    def snapshot(self, package: Optional[str] = None, *, foreground: bool = False,
+                 max_age: Optional[float] = None, wait: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        foreground=True: top 값이 필요한 호출 — 포그라운드 조회 루프를 켜고(꺼져 있었으면 재기동) 그 샘플만 인정
+        wait: 신선한 샘플 대기 상한(기본 min(interval*2+1, QA_PROCWATCH_WAIT=1.0)초) — 넘으면 None → 호출부 폴백
+        """
+        if package:
+            self.watch(package)
+        max_age = _env_float("QA_PROCWATCH_MAX_AGE", 3.0) if max_age is None else max_age
+        if wait is None:
+            wait = min(self.interval * 2 + 1.0, _env_float("QA_PROCWATCH_WAIT", 1.0))
+        deadline = time.time() + wait
+        with self._cond:
+            if self.unsupported or self._stopped:
+                return None
+            if foreground:
+                self._fg_last = time.time()
+                if not self.foreground:
+                    self.foreground = True
+                    self._spawn()
+            if not self.alive() and time.time() - self._started >= self.RESTART_GAP:
+                self._spawn()
+            while True:
+                st = self._state
+                now = time.time()
+                if (st["ts"] >= self._dirty_ts and now - st["ts"] <= max_age
+                        and (package is None or package in st["pids"]) and (st["fg"] or not foreground)):
+                    return {"ts": st["ts"], "pids": dict(st["pids"]), "top": st["top"], "fg": st["fg"]}
+                if not self.alive() or now >= deadline:
+                    return None
+                self._cond.wait(deadline - now)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._kill()
+            self._cond.notify_all()
+
+
+_WATCHERS: Dict[str, ProcWatcher] = {}
+_REG_LOCK = threading.Lock()
+
+
+def get_proc_watcher(serial: Optional[str] = None, package: Optional[str] = None) -> Optional[ProcWatcher]:
+    """시리얼별 공유 감시기 (QA_PROCWATCH=0 또는 미지원 단말이면 None) — 포그라운드 조회는 snapshot(foreground=True)로 요청"""
+    if not procwatch_enabled():
+        return None
+    serial = serial or os.environ.get("ANDROID_SERIAL") or os.environ.get("ADB_SERIAL") or ""
+    with _REG_LOCK:
+        w = _WATCHERS.get(serial)
+        if w is None or w._stopped:
+            w = _WATCHERS[serial] = ProcWatcher(serial)
+    if w.unsupported:
+        return None
+    return w.watch(package) if package else w
+
+
+def invalidate_proc_state(serial: Optional[str] = None):
+    serial = serial or os.environ.get("ANDROID_SERIAL") or os.environ.get("ADB_SERIAL") or ""
+    w = _WATCHERS.get(serial)
+    if w is not None:
+        w.invalidate()
+
+
+def stop_proc_watchers(serial: Optional[str] = None):
+    with _REG_LOCK:
+        keys = list(_WATCHERS) if serial is None else [serial]
+        for k in keys:
+            w = _WATCHERS.pop(k, None)
+            if w is not None:
+                w.stop()
+
+
+atexit.register(stop_proc_watchers)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="PID/포그라운드 감시 스트림 확인")
+    ap.add_argument("package")
+    ap.add_argument("--serial", default=None)
+    ap.add_argument("--sec", type=float, default=10.0)
+    a = ap.parse_args(argv)
+    w = get_proc_watcher(a.serial, a.package)
+    if w is None:
+        print("procwatch 비활성/미지원", file=sys.stderr)
+        return 1
+    t_end = time.time() + a.sec
+    while time.time() < t_end:
+        st = w.snapshot(a.package, foreground=True)
+        print(st if st else "(no fresh sample)")
+        time.sleep(w.interval)
+    print(f"samples={w.samples}", file=sys.stderr)
+    stop_proc_watchers()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 스텝/헬퍼 단위 성능 프로파일러 (span 버퍼 → Chrome trace JSON, 헬퍼별 지연 히스토그램)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - 계측 대상: step()(마커 → 다음 마커까지 구간), run_flow/run_subflow, _click_core/_type_core/_tap_xy,
+#     step/soft_fail 스냅샷, grab_frame — @profiled(kind) 데코레이터 / profile_span() 컨텍스트
+#     · STEP 구간은 Run 스레드(reset_profile을 호출한 QAEnv 생성 스레드)의 마커로만 계산
+#       (다른 스레드 마커는 구간·slow_steps·합계에서 제외, trace에는 그 스레드 트랙의 순간 이벤트로만 표시)
+#   - 기록: perf_counter_ns(monotonic) 시작/끝 튜플을 프로세스 전역 리스트에 append만 (호출당 ~1µs, 락 없음)
+#     · QA_PROFILE_MAX_SPANS(기본 200000) 초과분은 버리고 개수만 집계, QA_PROFILE=0 이면 비활성(래퍼 즉시 통과)
+#   - 산출: finalize_run → <run_dir>/profile_trace.json (Chrome trace-event, chrome://tracing / Perfetto / speedscope에서 열람)
+#           summary.html "⏱️ Step/Helper Latency" (헬퍼별 횟수·총/자기 시간·P50/P90/P99·지연 히스토그램 + 느린 STEP 구간 top)
+#   - 표준 라이브러리만 사용 (core/flows/ui에서 import, airtest 무의존)
+#   - 단독 실행: python -m common.profiler show <profile_trace.json> [--top 15]
+#                python -m common.profiler bench [--n 200000]
+# ==========================================================
+import os, re, sys, json, time, argparse, functools, threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Tuple, Callable
+
+_now = time.perf_counter_ns
+
+# 지연 히스토그램 구간 상한(ms) — 마지막 열은 그 이상
+HIST_EDGES_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _env_flag(name: str, default: str = "1") -> bool:
+    return (os.environ.get(name, default).strip() or default) != "0"
+
+
+class SpanBuffer:
+    """
+    span: (kind, name, t0_ns, t1_ns, tid, ok) / mark: (t_ns, tid, msg)
+    append만 하므로 GIL 하에서 스레드 안전, 분석은 Run 종료 시 1회.
+    run_tid: reset()을 호출한 스레드(= QAEnv를 만든 Run 스레드) — STEP 구간은 이 스레드의 마커로만 만든다.
+    """
+
+    def __init__(self, max_spans: Optional[int] = None):
+        try:
+            self.max_spans = int(max_spans or os.environ.get("QA_PROFILE_MAX_SPANS") or 200000)
+        except ValueError:
+            self.max_spans = 200000
+        self.enabled = _env_flag("QA_PROFILE")
+        self.reset()
+
+    def reset(self):
+        self.spans: List[Tuple[str, str, int, int, int, bool]] = []
+        self.marks: List[Tuple[int, int, str]] = []
+        self.dropped = 0
+        self.run_tid = threading.get_ident()
+        self.t0_ns = _now()
+        self.t0_wall = time.time()
+
+    def add(self, kind: str, name: str, t0: int, t1: int, ok: bool = True):
+        if len(self.spans) < self.max_spans:
+            self.spans.append((kind, name, t0, t1, threading.get_ident(), ok))
+        else:
+            self.dropped += 1
+
+    def mark(self, msg: str):
+        if len(self.marks) < self.max_spans:
+            self.marks.append((_now(), threading.get_ident(), msg))
+        else:
+            self.dropped += 1
+
+    # ---------- 분석 ----------
+    def step_spans(self) -> List[Tuple[str, str, int, int, int, bool]]:
+        """
+        Run 스레드의 STEP 마커 → 다음 마커까지 구간, 마지막은 그 스레드의 마지막 span/마커 시점까지.
+        다른 스레드(워치독 등)의 마커는 구간을 만들지 않음(side_marks → trace에 순간 이벤트로만 표시).
+        """
+        tid = self.run_tid
+        ms = sorted(m for m in self.marks if m[1] == tid)
+        end = max([s[3] for s in self.spans if s[4] == tid] + [m[0] for m in ms] + [self.t0_ns])
+        return [("step", msg, t, ms[i + 1][0] if i + 1 < len(ms) else end, tid, True)
+                for i, (t, _, msg) in enumerate(ms)]
+
+    def side_marks(self) -> List[Tuple[int, int, str]]:
+        """Run 스레드가 아닌 스레드의 STEP 마커"""
+        return [m for m in self.marks if m[1] != self.run_tid]
+
+    def all_spans(self) -> List[Tuple[str, str, int, int, int, bool]]:
+        return list(self.spans) + self.step_spans()
+
+    def write_chrome_trace(self, path: str, *, process_name: str = "qa-run") -> str:
+        write_chrome_trace(path, self.all_spans(), t0_ns=self.t0_ns, t0_wall=self.t0_wall,
+                           process_name=process_name, dropped=self.dropped,
+                           marks=self.side_marks(), run_tid=self.run_tid)
+        return path
+
+
+_PROFILER = SpanBuffer()
+
+
+def get_profiler() -> SpanBuffer:
+    return _PROFILER
+
+
+def reset_profile():
+    """Run 시작(QAEnv 생성) 시 호출 — 이전 Run의 span 제거"""
+    _PROFILER.reset()
+
+
+def mark_step(msg: str):
+    if _PROFILER.enabled:
+        _PROFILER.mark(msg if len(msg) <= 120 else msg[:117] + "...")
+
+
+def _ok_of(result: Any) -> bool:
+    """반환값 기반 성공 판정: bool 반환 헬퍼(False=실패), (ok, ...) 튜플 반환(run_flow)"""
+    if isinstance(result, bool):
+        return result
+    if isinstance(result, tuple) and result and isinstance(result[0], bool):
+        return result[0]
+    return True
+
+
+def profiled(kind: str, label: Optional[Callable[..., str]] = None):
+    """
+    헬퍼 계측 데코레이터 — label(*args, **kwargs)로 span 이름 생성(실패 시 kind).
+    예외는 그대로 전파하고 span만 ok=False로 기록.
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _PROFILER.enabled:
+                return fn(*args, **kwargs)
+            t0 = _now()
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = _ok_of(result)
+                return result
+            finally:
+                t1 = _now()
+                name = kind
+                if label is not None:
+                    try:
+                        name = label(*args, **kwargs) or kind
+                    except Exception:
+                        pass
+                _PROFILER.add(kind, name, t0, t1, ok)
+        return wrapper
+    return deco
+
+
+@contextmanager
+def profile_span(kind: str, name: str = ""):
+    """인라인 구간 계측 (예: snapshot 호출)"""
+    if not _PROFILER.enabled:
+        yield
+        return
+    t0 = _now()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        _PROFILER.add(kind, name or kind, t0, _now(), ok)
+
+
+_SEL_RE = re.compile(r"'(?:name|text|desc|resourceId)',\s*'([^']+)'")
+
+
+def selector_label(obj: Any) -> str:
+    """Poco 프록시 selector 문자열에서 name/text만 추출 (RPC 없음) — 호출형 객체는 함수명"""
+    q = getattr(obj, "query", None)
+    if q is not None:
+        found = _SEL_RE.findall(str(q))
+        if found:
+            return ",".join(f.rsplit("/", 1)[-1] for f in found)[:80]
+        return str(q)[:80]
+    if callable(obj):
+        return getattr(obj, "__name__", "callable")
+    return str(obj)[:80]
+
+
+# ==========================================================
+# 🔹 Chrome trace / 통계 / HTML
+# ==========================================================
+def write_chrome_trace(path: str, spans, *, t0_ns: int, t0_wall: float,
+                       process_name: str = "qa-run", dropped: int = 0,
+                       marks=(), run_tid: Optional[int] = None):
+    """
+    Chrome trace-event JSON (ph="X", µs) — 스레드마다 트랙 1개, STEP 구간(Run 스레드)은 별도 트랙(tid 0 "STEP").
+    marks: Run 스레드 밖의 STEP 마커 (t_ns, tid, msg) → 해당 스레드 트랙에 순간 이벤트(ph="i")로 표시.
+    chrome://tracing, ui.perfetto.dev, speedscope 모두 이 형식을 직접 연다.
+    """
+    pid = os.getpid()
+    run_tid = threading.main_thread().ident if run_tid is None else run_tid
+    tids: Dict[int, int] = {}
+    events: List[Dict[str, Any]] = []
+    for kind, name, t0, t1, tid, ok in sorted(spans, key=lambda s: (s[2], -s[3])):
+        track = 0 if kind == "step" else tids.setdefault(tid, len(tids) + 1)
+        ev = {"name": name, "cat": kind, "ph": "X", "pid": pid, "tid": track,
+              "ts": round((t0 - t0_ns) / 1000.0, 1), "dur": round(max(t1 - t0, 0) / 1000.0, 1)}
+        if not ok:
+            ev["args"] = {"ok": False}
+        events.append(ev)
+    for t, tid, msg in sorted(marks):
+        events.append({"name": msg, "cat": "step", "ph": "i", "s": "t", "pid": pid,
+                       "tid": tids.setdefault(tid, len(tids) + 1), "ts": round((t - t0_ns) / 1000.0, 1)})
+    meta = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": process_name}},
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "STEP"}}]
+    for real, track in tids.items():
+        label = "run" if real == run_tid else ("main" if real == threading.main_thread().ident else f"thread-{track}")
+        meta.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": track, "args": {"name": label}})
+    doc = {"traceEvents": meta + events, "displayTimeUnit": "ms",
+           "otherData": {"started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t0_wall)),
+                         "dropped": dropped}}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load_trace(path: str) -> List[Tuple[str, str, int, int, int, bool]]:
+    """profile_trace.json → span 튜플 (ns, tid는 트랙 번호)"""
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    out = []
+    for ev in doc.get("traceEvents", []):
+        if ev.get("ph") == "X":
+            t0 = int(ev["ts"] * 1000)
+            out.append((ev.get("cat") or "span", ev.get("name", ""), t0, t0 + int(ev.get("dur", 0) * 1000),
+                        int(ev.get("tid", 0)), (ev.get("args") or {}).get("ok", True)))
+    return out
+
+
+def _pct(sorted_vals: List[float], p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(round(p / 100.0 * (len(sorted_vals) - 1))))]
+
+
+def _self_times(spans) -> List[int]:
+    """스레드별 중첩(시간 포함 관계) 기준 자기 시간(ns) — STEP 트랙 제외 span 목록 순서대로"""
+    self_ns = [s[3] - s[2] for s in spans]
+    order = sorted(range(len(spans)), key=lambda i: (spans[i][4], spans[i][2], -spans[i][3]))
+    stack: List[int] = []
+    cur_tid = None
+    for i in order:
+        tid, t0, t1 = spans[i][4], spans[i][2], spans[i][3]
+        if tid != cur_tid:
+            stack, cur_tid = [], tid
+        while stack and spans[stack[-1]][3] <= t0:
+            stack.pop()
+        if stack and t1 <= spans[stack[-1]][3]:
+            self_ns[stack[-1]] -= t1 - t0
+        stack.append(i)
+    return [max(v, 0) for v in self_ns]
+
+
+def helper_stats(spans) -> Dict[str, Any]:
+    """
+    kind별 {"count", "fail", "total_sec", "self_sec", "p50_ms", "p90_ms", "p99_ms", "max_ms", "hist"} +
+    "wall_sec"(첫 시작~마지막 종료), "slow_steps"(STEP 구간 상위 20)
+    STEP 구간은 Run 스레드 것만 들어온다(SpanBuffer.step_spans / 저장 trace의 STEP 트랙).
+    """
+    work = [s for s in spans if s[0] != "step"]
+    steps = [s for s in spans if s[0] == "step"]
+    selfs = _self_times(work)
+    groups: Dict[str, Dict[str, Any]] = {}
+    for s, self_ns in zip(work + steps, selfs + [s[3] - s[2] for s in steps]):
+        g = groups.setdefault(s[0], {"d": [], "self": 0, "fail": 0})
+        g["d"].append((s[3] - s[2]) / 1e6)
+        g["self"] += self_ns
+        g["fail"] += 0 if s[5] else 1
+    kinds = {}
+    for kind, g in groups.items():
+        d = sorted(g["d"])
+        hist = [0] * (len(HIST_EDGES_MS) + 1)
+        for v in d:
+            k = 0
+            while k < len(HIST_EDGES_MS) and v >= HIST_EDGES_MS[k]:
+                k += 1
+            hist[k] += 1
+        kinds[kind] = {"count": len(d), "fail": g["fail"], "total_sec": round(sum(d) / 1000.0, 3),
+                       "self_sec": round(g["self"] / 1e9, 3), "p50_ms": round(_pct(d, 50), 1),
+                       "p90_ms": round(_pct(d, 90), 1), "p99_ms": round(_pct(d, 99), 1),
+                       "max_ms": round(d[-1], 1), "hist": hist}
+    wall = 0.0
+    if spans:
+        wall = (max(s[3] for s in spans) - min(s[2] for s in spans)) / 1e9
+    slow = sorted(steps, key=lambda s: s[2] - s[3])[:20]
+    t_base = min((s[2] for s in spans), default=0)
+    return {"wall_sec": round(wall, 3), "kinds": kinds,
+            "slow_steps": [{"name": s[1], "sec": round((s[3] - s[2]) / 1e9, 3),
+                            "at_sec": round((s[2] - t_base) / 1e9, 1)} for s in slow]}
+
+
+def _esc(s: Any) -> str:
+    return (str(s).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;"))
+
+
+def profile_html(stats: Dict[str, Any]) -> str:
+    """summary.html용 섹션(표 + 셀 음영 히스토그램, 메일 본문에서도 깨지지 않도록 인라인 스타일만)"""
+    kinds = stats.get("kinds") or {}
+    if not kinds:
+        return "<div class='muted'>(프로파일 없음)</div>"
+    wall = stats.get("wall_sec") or 0.0
+    heads = [f"&lt;{e}ms" if e < 1000 else f"&lt;{e / 1000:g}s" for e in HIST_EDGES_MS]
+    heads.append(f"&ge;{HIST_EDGES_MS[-1] / 1000:g}s")
+    order = sorted(kinds.items(), key=lambda kv: (kv[0] == "step", -kv[1]["self_sec"]))
+    rows = []
+    for kind, k in order:
+        peak = max(k["hist"]) or 1
+        cells = "".join(
+            f"<td style='text-align:right;background:rgba(25,118,210,{0.08 + 0.6 * n / peak:.2f})'>{n}</td>" if n
+            else "<td></td>" for n in k["hist"])
+        share = (100.0 * k["self_sec"] / wall) if (wall and kind != "step") else 0.0
+        rows.append(
+            f"<tr><td><b>{_esc(kind)}</b></td><td>{k['count']:,}</td><td>{k['fail']}</td>"
+            f"<td>{k['total_sec']:,.1f}</td><td>{k['self_sec']:,.1f}{f' ({share:.0f}%)' if share else ''}</td>"
+            f"<td>{k['p50_ms']:,.0f}</td><td>{k['p90_ms']:,.0f}</td><td>{k['p99_ms']:,.0f}</td>"
+            f"<td>{k['max_ms']:,.0f}</td>{cells}</tr>")
+    slow = "".join(
+        f"<tr><td>+{s['at_sec']:,.0f}s</td><td>{s['sec']:,.1f}s</td><td><code>{_esc(s['name'])}</code></td></tr>"
+        for s in (stats.get("slow_steps") or [])[:10])
+    return (
+        f"<div class='small'>계측 구간 {wall:,.1f}s · 자기 시간 = 하위 헬퍼 시간을 뺀 값 (STEP = 마커~다음 마커)</div>"
+        "<table><tr><th>Helper</th><th>Count</th><th>Fail</th><th>Total s</th><th>Self s</th>"
+        "<th>P50 ms</th><th>P90 ms</th><th>P99 ms</th><th>Max ms</th>"
+        + "".join(f"<th>{h}</th>" for h in heads) + "</tr>" + "".join(rows) + "</table>"
+        + ("<table><tr><th>At</th><th>Duration</th><th>Slowest STEP</th></tr>" + slow + "</table>" if slow else "")
+    )
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="스텝/헬퍼 프로파일 확인")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sh = sub.add_parser("show", help="profile_trace.json 요약")
+    sh.add_argument("path")
+    sh.add_argument("--top", type=int, default=15)
+    bn = sub.add_parser("bench", help="데코레이터 오버헤드 측정")
+    bn.add_argument("--n", type=int, default=200000)
+    a = ap.parse_args(argv)
+
+    if a.cmd == "bench":
+        def f(x):
+            return x
+        g = profiled("bench", lambda x: "bench")(f)
+        t = time.perf_counter()
+        for i in range(a.n):
+            f(i)
+        base = time.perf_counter() - t
+        _PROFILER.reset()
+        t = time.perf_counter()
+        for i in range(a.n):
+            g(i)
+        wrapped = time.perf_counter() - t
+        print(f"calls={a.n:,} overhead={(wrapped - base) / a.n * 1e9:,.0f} ns/call "
+              f"spans={len(_PROFILER.spans):,} dropped={_PROFILER.dropped:,}")
+        return 0
+
+    st = helper_stats(load_trace(a.path))
+    print(f"wall {st['wall_sec']:,.1f}s")
+    print(f"{'kind':<12}{'count':>8}{'fail':>6}{'total s':>10}{'self s':>10}{'p50':>8}{'p90':>8}{'p99':>8}{'max':>9}")
+    for kind, k in sorted(st["kinds"].items(), key=lambda kv: (kv[0] == "step", -kv[1]["self_sec"])):
+        print(f"{kind:<12}{k['count']:>8,}{k['fail']:>6}{k['total_sec']:>10,.1f}{k['self_sec']:>10,.1f}"
+              f"{k['p50_ms']:>8,.0f}{k['p90_ms']:>8,.0f}{k['p99_ms']:>8,.0f}{k['max_ms']:>9,.0f}")
+    for s in st["slow_steps"][:a.top]:
+        print(f"  +{s['at_sec']:>8,.0f}s {s['sec']:>7,.1f}s  {s['name']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
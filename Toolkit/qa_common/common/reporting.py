@@ -0,0 +1,750 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - Run Standard 산출물 (meta.json/summary.html), Airtest 포터블 리포트
+# ==========================================================
+# -*- coding: utf-8 -*-
+import os, time, re, shutil, tempfile
+from typing import Optional, Dict, Any
+from .core import QAEnv, _env_int, _kst_now_iso, _write_json, emit_event, step, use_env
+from .profiler import get_profiler, helper_stats, profile_html
+
+
+# ==========================================================
+# ✅ Run Standard v1.0 (Suite: literacy)
+#  - Run dir: Tools\result\<serial>\<run_id>\
+#  - 최소 산출물: meta.json / summary.html / run.log
+#  - 프로파일: profile_trace.json (STEP/헬퍼 span, Chrome trace) + summary.html 헬퍼 지연 히스토그램
+#  - 상태: PASS / FAIL / WARN / N/A / SKIP
+# ==========================================================
+_BUNDLE_ALLOW_EXT = {".txt", ".log", ".png", ".jpg", ".jpeg", ".webp", ".gif", ".mp4", ".json", ".csv", ".xml", ".html"}
+
+
+def _same_file(src: str, dst: str) -> bool:
+    """증분 판정: dst가 src와 크기 같고 mtime이 같거나 최신이면 재사용"""
+    try:
+        a, b = os.stat(src), os.stat(dst)
+    except OSError:
+        return False
+    return a.st_size == b.st_size and b.st_mtime >= a.st_mtime - 1.0
+
+
+def _link_or_copy(src: str, dst: str) -> str:
+    """hardlink 우선 → 실패(다른 볼륨/FAT 등) 시 copy2. 반환: 'skip' | 'link' | 'copy'"""
+    if _same_file(src, dst):
+        return "skip"
+    try:
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.link(src, dst)
+        return "link"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copy"
+
+
+def _copy_if_changed(src: str, dst: str) -> str:
+    if _same_file(src, dst):
+        return "skip"
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def _move_or_copy(src: str, dst: str) -> str:
+    """같은 볼륨이면 rename(즉시), 아니면 copy2. 반환: 'skip' | 'move' | 'copy'"""
+    if _same_file(src, dst):
+        return "skip"
+    try:
+        os.replace(src, dst)
+        return "move"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copy"
+
+
+def _airtest_static_cache(report_src_dir: str, cache_root: str) -> Optional[str]:
+    """
+    airtest/report 정적 리소스를 결과 볼륨의 공유 캐시에 1회만 복제 (버전+mtime 키).
+    이후 Run들은 캐시에서 hardlink → copytree 반복 제거.
+    """
+    try:
+        import airtest  # type: ignore
+        ver = str(getattr(airtest, "__version__", "") or "x")
+    except Exception:
+        ver = "x"
+    try:
+        key = f"{ver}_{int(os.path.getmtime(report_src_dir))}"
+    except OSError:
+        return None
+    cache_dir = os.path.join(cache_root, f"airtest_report_{key}")
+    done = os.path.join(cache_dir, ".complete")
+    if os.path.exists(done):
+        return cache_dir
+    tmp = f"{cache_dir}.tmp{os.getpid()}"
+    shutil.copytree(report_src_dir, tmp, dirs_exist_ok=True)
+    open(os.path.join(tmp, ".complete"), "w").close()
+    try:
+        os.replace(tmp, cache_dir)
+    except OSError:
+        # 다른 프로세스(다른 단말)가 먼저 만든 경우
+        shutil.rmtree(tmp, ignore_errors=True)
+    return cache_dir if os.path.exists(done) else None
+
+
+def _mirror_tree(src_dir: str, dst_dir: str, fn, workers: int, *,
+                 allow_ext: Optional[set] = None, skip_dir=None,
+                 progress=None) -> Dict[str, int]:
+    """src_dir → dst_dir 파일 단위 fn(src, dst) 병렬 적용. 반환: 동작별 건수"""
+    from concurrent.futures import ThreadPoolExecutor
+    jobs = []
+    for root, dirs, files in os.walk(src_dir):
+        if skip_dir:
+            dirs[:] = [d for d in dirs if not skip_dir(d)]
+        rel = os.path.relpath(root, src_dir)
+        dst_root = os.path.join(dst_dir, rel) if rel != "." else dst_dir
+        os.makedirs(dst_root, exist_ok=True)
+        for name in files:
+            if name == ".complete":
+                continue
+            if allow_ext is None or os.path.splitext(name)[1].lower() in allow_ext:
+                jobs.append((os.path.join(root, name), os.path.join(dst_root, name)))
+
+    counts: Dict[str, int] = {"total": len(jobs)}
+    if not jobs:
+        return counts
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        for r in ex.map(lambda j: fn(*j), jobs):
+            counts[r] = counts.get(r, 0) + 1
+            done += 1
+            if progress:
+                progress(done, len(jobs))
+    return counts
+
+
+def _compile_portable_rewrite(log_dir: str):
+    """
+    index.html 경로 치환 규칙을 하나의 정규식으로 컴파일 (문서 1회 스캔).
+    (A) .../airtest/report/ 절대경로      → ./_airtest_report/
+    (B) log_dir 절대경로(file:///, D:/, D:\\, JSON D:\\\\) + tail → ./airtest_log/<tail>
+    (C) ../airtest_log/, ./airtest_log/\\ 등 상대/혼합 구분자 → (./)airtest_log/
+    """
+    log_abs = os.path.abspath(log_dir)
+    log_abs_slash = log_abs.replace("\\", "/").rstrip("/")
+    log_abs_back  = log_abs.replace("/", "\\").rstrip("\\")
+    log_abs_url   = log_abs_slash.replace(" ", "%20")
+    log_abs_back_escaped = log_abs_back.replace("\\", "\\\\")  # D:\\a\\b 형태
+
+    tail = r"(?P<{}>[^\"'>\s]+)"
+    pat = re.compile(
+        r"(?P<static>[A-Za-z]:(?:\\|/)[^\"']*?airtest(?:\\|/)report(?:\\|/))"
+        r"|(?i:file:///" + re.escape(log_abs_url) + r"[\\/]" + tail.format("t1") + r")"
+        r"|(?i:" + re.escape(log_abs_slash) + r"[\\/]" + tail.format("t2") + r")"
+        r"|(?i:" + re.escape(log_abs_back) + r"[\\/]" + tail.format("t3") + r")"
+        r"|(?i:" + re.escape(log_abs_back_escaped) + r"(?:\\\\|/)" + tail.format("t4") + r")"
+        r"|(?P<rel>\.\.?[\\/])?airtest_log(?P<seps>[\\/]+)"
+    )
+
+    def _repl(m):
+        if m.group("static"):
+            return "./_airtest_report/"
+        if m.group("seps") is not None:
+            return ("./" if m.group("rel") else "") + "airtest_log/"
+        t = next(g for g in (m.group("t1"), m.group("t2"), m.group("t3"), m.group("t4")) if g is not None)
+        return "./airtest_log/" + t.lstrip("/\\").replace("\\", "/")
+
+    return lambda html: pat.sub(_repl, html)
+
+
+def build_portable_airtest_report(script_path: str, log_dir: str, out_dir: str, ts: str, *,
+                                  move_logs: bool = False, workers: Optional[int] = None,
+                                  env: Optional["QAEnv"] = None):
+    """
+    Portable Airtest report bundle:
+    - out_dir/airtest_portable_<ts>/index.html
+    - out_dir/airtest_portable_<ts>/_airtest_report/...   (Airtest report static assets)
+    - out_dir/airtest_portable_<ts>/airtest_log/...       (log.txt + screenshots etc)
+    스크립트(.air) 폴더는 절대 복사하지 않음.
+    증분/병렬:
+    - 정적 리소스: 결과 볼륨 공유 캐시(_airtest_report_cache)에서 hardlink (실패 시 복사)
+    - 스크린샷: 병렬 복사(workers, 기본 QA_REPORT_WORKERS 또는 8), move_logs=True면 rename(원본 삭제 예정일 때)
+    - 이미 같은 파일이 있으면 건너뜀(같은 ts 재생성 시)
+    - index.html 경로 치환은 컴파일된 정규식 1회 스캔
+    """
+    env = use_env(env)
+    script_path = str(script_path)
+    log_dir = str(log_dir)
+    out_dir = str(out_dir)
+    workers = workers or _env_int("QA_REPORT_WORKERS", 8)
+    timings: Dict[str, float] = {}
+
+    portable_dir = os.path.join(out_dir, f"airtest_portable_{ts}")
+    os.makedirs(portable_dir, exist_ok=True)
+
+    # 1) 임시 폴더에 report 생성 (드라이브 mismatch 방지)
+    base_tmp_dir = out_dir
+    d_out = os.path.splitdrive(os.path.abspath(out_dir))[0].upper()
+    d_log = os.path.splitdrive(os.path.abspath(log_dir))[0].upper()
+    if d_log and d_out and (d_log != d_out):
+        base_tmp_dir = log_dir
+
+    tmp = tempfile.mkdtemp(prefix="airtest_rep_", dir=base_tmp_dir)
+    try:
+        t0 = time.time()
+        tmp_html = os.path.join(tmp, "index.html")
+        from airtest.report.report import simple_report  # jinja2 등 리포트 의존성은 생성 시점에만 로드
+        simple_report(script_path, logpath=log_dir, output=tmp_html)
+        timings["simple_report"] = time.time() - t0
+
+        # 2) Airtest 정적 리소스(site-packages/airtest/report): 공유 캐시 → hardlink
+        t0 = time.time()
+        try:
+            import airtest  # type: ignore
+            airtest_pkg_dir = os.path.dirname(airtest.__file__)
+            report_src_dir = os.path.join(airtest_pkg_dir, "report")  # .../airtest/report
+            report_dst_dir = os.path.join(portable_dir, "_airtest_report")
+
+            if os.path.isdir(report_src_dir):
+                cache_root = os.environ.get("QA_REPORT_CACHE") or \
+                    os.path.join(os.path.dirname(os.path.abspath(out_dir)), "_airtest_report_cache")
+                try:
+                    src = _airtest_static_cache(report_src_dir, cache_root) or report_src_dir
+                except Exception as ce:
+                    step(f"⚠️ [WARN] airtest report 캐시 구성 실패(원본에서 복사): {ce}", env=env)
+                    src = report_src_dir
+                c = _mirror_tree(src, report_dst_dir, _link_or_copy, workers)
+                step(f"[REPORT] 정적 리소스 {c.get('total', 0)}개 "
+                     f"(link {c.get('link', 0)} / copy {c.get('copy', 0)} / 재사용 {c.get('skip', 0)})", env=env)
+            else:
+                step(f"⚠️ [WARN] airtest report 폴더를 찾지 못했습니다: {report_src_dir}", env=env)
+        except Exception as e:
+            step(f"⚠️ [WARN] airtest report 리소스 복사 실패: {e}", env=env)
+        timings["static"] = time.time() - t0
+
+        # 3) index.html 내부 경로를 포터블 상대경로로 치환 후 저장 (단일 패스)
+        t0 = time.time()
+        try:
+            with open(tmp_html, "r", encoding="utf-8", errors="ignore") as f:
+                html = f.read()
+
+            html = _compile_portable_rewrite(log_dir)(html)
+
+            out_index = os.path.join(portable_dir, "index.html")
+            with open(out_index, "w", encoding="utf-8", errors="ignore") as f:
+                f.write(html)
+
+        except Exception as e:
+            shutil.copy2(tmp_html, os.path.join(portable_dir, "index.html"))
+            step(f"⚠️ [WARN] index.html 경로 치환 실패(원본 복사로 대체): {e}", env=env)
+        timings["rewrite"] = time.time() - t0
+
+        # 4) log_dir 산출물 복사/이동 (스크립트 폴더는 제외, 병렬)
+        t0 = time.time()
+        log_bundle = os.path.join(portable_dir, "airtest_log")
+        os.makedirs(log_bundle, exist_ok=True)
+
+        last = [t0]
+        def _progress(done: int, total: int):
+            now = time.time()
+            if done == total or now - last[0] >= 5.0:
+                last[0] = now
+                step(f"[REPORT] 로그/스크린샷 {done}/{total} ({done * 100 // max(1, total)}%)", env=env)
+
+        c = _mirror_tree(log_dir, log_bundle, _move_or_copy if move_logs else _copy_if_changed, workers,
+                         allow_ext=_BUNDLE_ALLOW_EXT, skip_dir=lambda d: d.lower().endswith(".air"),
+                         progress=_progress)
+        timings["logs"] = time.time() - t0
+
+        step("[REPORT] 포터블 번들 완료: " + " / ".join(f"{k} {v:.1f}s" for k, v in timings.items())
+             + f" | 파일 {c.get('total', 0)}개 ({', '.join(f'{k} {v}' for k, v in c.items() if k != 'total')})",
+             env=env)
+        return portable_dir, os.path.join(portable_dir, "index.html")
+
+    finally:
+        try:
+            shutil.rmtree(tmp, ignore_errors=True)
+        except Exception:
+            pass
+
+def _pick_overall_result(counts: Dict[str, int]) -> str:
+    """
+    전체 결과 산정 룰(v1.0):
+      - FAIL > WARN > PASS > N/A > SKIP
+      - 단, PASS/FAIL/WARN이 모두 0이고 N/A만 있으면 N/A
+      - 아무 것도 없으면 SKIP
+    """
+    fail = int(counts.get("FAIL", 0))
+    warn = int(counts.get("WARN", 0))
+    pas  = int(counts.get("PASS", 0))
+    na   = int(counts.get("N/A", 0))
+    sk   = int(counts.get("SKIP", 0))
+
+    if fail > 0:
+        return "FAIL"
+    if warn > 0:
+        return "WARN"
+    if pas > 0:
+        return "PASS"
+    if na > 0 and (pas == 0 and fail == 0 and warn == 0):
+        return "N/A"
+    return "SKIP"
+
+def _overall_decision(counts: Dict[str, int], *, forced: Optional[str] = None) -> Dict[str, Any]:
+    """
+    전체 결과 + 결정 근거를 함께 산출.
+    - forced 가 있으면(상위에서 result를 강제로 지정) overall은 forced를 따르되,
+      reason_code로 'FORCED_RESULT'를 남긴다.
+    """
+    # 정규화
+    c_fail = int((counts or {}).get("FAIL", 0))
+    c_warn = int((counts or {}).get("WARN", 0))
+    c_pass = int((counts or {}).get("PASS", 0))
+    c_na   = int((counts or {}).get("N/A", 0))
+    c_skip = int((counts or {}).get("SKIP", 0))
+
+    precedence = ["FAIL", "WARN", "PASS", "N/A", "SKIP"]
+
+    # 강제 결과가 있으면 그걸 사용
+    if forced:
+        ov = str(forced).upper().strip()
+        return {
+            "rule_version": "1.0",
+            "overall": ov,
+            "reason_code": "FORCED_RESULT",
+            "reason_text": f"Overall result is forced to {ov} by caller (finalize_run result parameter).",
+            "precedence": precedence,
+            "counts": {"FAIL": c_fail, "WARN": c_warn, "PASS": c_pass, "N/A": c_na, "SKIP": c_skip},
+        }
+
+    # 룰(v1.0): FAIL > WARN > PASS > N/A(단독) > SKIP
+    if c_fail > 0:
+        return {
+            "rule_version": "1.0",
+            "overall": "FAIL",
+            "reason_code": "FAIL_COUNT_GT_0",
+            "reason_text": f"FAIL count is {c_fail} (>0), so overall result is FAIL by precedence.",
+            "precedence": precedence,
+            "counts": {"FAIL": c_fail, "WARN": c_warn, "PASS": c_pass, "N/A": c_na, "SKIP": c_skip},
+        }
+
+    if c_warn > 0:
+        return {
+            "rule_version": "1.0",
+            "overall": "WARN",
+            "reason_code": "WARN_COUNT_GT_0",
+            "reason_text": f"WARN count is {c_warn} (>0) and FAIL is 0, so overall result is WARN by precedence.",
+            "precedence": precedence,
+            "counts": {"FAIL": c_fail, "WARN": c_warn, "PASS": c_pass, "N/A": c_na, "SKIP": c_skip},
+        }
+
+    if c_pass > 0:
+        return {
+            "rule_version": "1.0",
+            "overall": "PASS",
+            "reason_code": "PASS_COUNT_GT_0",
+            "reason_text": f"PASS count is {c_pass} (>0) and FAIL/WARN are 0, so overall result is PASS by precedence.",
+            "precedence": precedence,
+            "counts": {"FAIL": c_fail, "WARN": c_warn, "PASS": c_pass, "N/A": c_na, "SKIP": c_skip},
+        }
+
+    if c_na > 0 and (c_pass == 0 and c_fail == 0 and c_warn == 0):
+        return {
+            "rule_version": "1.0",
+            "overall": "N/A",
+            "reason_code": "NA_ONLY",
+            "reason_text": f"N/A count is {c_na} and PASS/FAIL/WARN are 0, so overall result is N/A.",
+            "precedence": precedence,
+            "counts": {"FAIL": c_fail, "WARN": c_warn, "PASS": c_pass, "N/A": c_na, "SKIP": c_skip},
+        }
+
+    return {
+        "rule_version": "1.0",
+        "overall": "SKIP",
+        "reason_code": "EMPTY_OR_SKIP",
+        "reason_text": "No PASS/FAIL/WARN (and no N/A-only case). Overall is SKIP.",
+        "precedence": precedence,
+        "counts": {"FAIL": c_fail, "WARN": c_warn, "PASS": c_pass, "N/A": c_na, "SKIP": c_skip},
+    }
+
+def _summary_html_text(env: "QAEnv") -> str:
+    def esc(s: str) -> str:
+        s = "" if s is None else str(s)
+        return (s.replace("&", "&amp;")
+                .replace("<", "&lt;")
+                .replace(">", "&gt;")
+                .replace('"', "&quot;"))
+
+    c = getattr(env, "run_counts", {}) or {}
+    # ----- Status UI (emoji + color) -----
+    def status_emoji(st: str) -> str:
+        s = (st or "").upper()
+        return {
+            "PASS": "✅",
+            "FAIL": "❌",
+            "WARN": "⚠️",
+            "N/A":  "➖",
+            "SKIP": "⏭️",
+        }.get(s, "📌")
+
+    run_result = (getattr(env, "run_result", "") or "").upper()
+    result_emoji = status_emoji(run_result)
+
+    def cnt_class(label: str) -> str:
+        s = (label or "").upper()
+        return {
+            "PASS": "cnt pass",
+            "FAIL": "cnt fail",
+            "WARN": "cnt warn",
+            "N/A":  "cnt na",
+            "SKIP": "cnt skip",
+        }.get(s, "cnt")
+
+    def result_badge_class(st: str) -> str:
+        s = (st or "").upper()
+        return {
+            "PASS": "badge ok",
+            "FAIL": "badge bad",
+            "WARN": "badge warn",
+            "N/A":  "badge na",
+            "SKIP": "badge skip",
+        }.get(s, "badge")
+
+    pass_cnt = int(c.get("PASS", 0))
+    # run_counts는 "FAIL 로그 수"에 가깝고,
+    # total_fail은 "실패 플로우 건수"라 요약에서는 total_fail을 우선 사용
+    total_fail = int(getattr(env, "total_fail", 0) or 0)
+    fail_cnt = total_fail if total_fail > 0 else int(c.get("FAIL", 0))
+    warn_cnt = int(c.get("WARN", 0))
+    na_cnt   = int(c.get("N/A", 0))
+    skip_cnt = int(c.get("SKIP", 0))
+
+    started = getattr(env, "run_started_at", "") or ""
+    ended   = getattr(env, "run_ended_at", "") or ""
+    dur     = int(getattr(env, "run_duration_sec", 0) or 0)
+
+    model = getattr(env, "device_model", "") or ""
+    osv   = getattr(env, "device_os_version", "") or ""
+    sdk   = getattr(env, "device_sdk", "") or ""
+    vname = getattr(env, "app_version_name", "") or ""
+    vcode = getattr(env, "app_version_code", "") or ""
+    # ----- Warnings / Failures / Notes 섹션 -----
+    warns = getattr(env, "run_warn_logs", []) or []
+    failures = getattr(env, "run_fail_logs", []) or []
+    notes = getattr(env, "run_notes", []) or []
+
+    # Warnings
+    if warns:
+        warn_rows = []
+        for w in warns:
+            wt = esc(w.get("time", ""))
+            wm = esc(w.get("msg", ""))
+            warn_rows.append(f"<tr><td>{wt}</td><td><code>{wm}</code></td></tr>")
+        warnings_html = (
+            "<table>"
+            "<tr><th>Time</th><th>Message</th></tr>"
+            + "".join(warn_rows) +
+            "</table>"
+        )
+    else:
+        warnings_html = "<div class='muted'>(경고 없음)</div>"
+
+    # Failures
+    if failures:
+        fail_rows = []
+        for f in failures:
+            it = esc(f.get("iter", ""))
+            nm = esc(f.get("name", ""))
+            er = esc(f.get("error", ""))
+            fail_rows.append(f"<tr><td>{it}</td><td>{nm}</td><td><code>{er}</code></td></tr>")
+        failures_html = (
+            "<table>"
+            "<tr><th>Iter</th><th>Flow</th><th>Error</th></tr>"
+            + "".join(fail_rows) +
+            "</table>"
+        )
+    else:
+        failures_html = "<div class='muted'>(실패 없음)</div>"
+
+    # Notes
+    if notes:
+        notes_html = "<ul>" + "".join([f"<li>{esc(x)}</li>" for x in notes]) + "</ul>"
+    else:
+        notes_html = "<div class='muted'>(노트 없음)</div>"
+
+
+    # 스텝/헬퍼 지연 (finalize_run에서 계산해 둔 값 우선, 없으면 현재 span 버퍼로 계산)
+    prof_stats = getattr(env, "_profile_stats", None)
+    if prof_stats is None:
+        try:
+            prof_stats = helper_stats(get_profiler().all_spans())
+        except Exception:
+            prof_stats = {}
+    profile_section = profile_html(prof_stats or {})
+
+    # 항상 존재하는 기본 링크(상대경로)
+    links = [
+        ("meta.json", "meta.json"),
+        ("run.log", "run.log"),
+        ("summary.html", "summary.html"),
+    ]
+
+    # 옵션 산출물(상대경로) — env.run_artifacts 에 들어있는 값은 "상대경로"를 전제로 한다.
+    arts = getattr(env, "run_artifacts", {}) or {}
+    for k, relp in arts.items():
+        if not relp:
+            continue
+        relp = str(relp).replace("\\", "/")
+        # 기본 링크와 중복이면 건너뜀
+        if relp in ("meta.json", "run.log", "summary.html"):
+            continue
+        links.append((str(k), relp))
+
+    # 표 렌더
+    rows = []
+    for title, href in links:
+        rows.append(
+            "<tr>"
+            f"<td>{esc(title)}</td>"
+            f"<td><a href='{esc(href)}'>{esc(href)}</a></td>"
+            "</tr>"
+        )
+    rows_html = "\n".join(rows)
+
+    return f"""<!doctype html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>QA Run Summary</title>
+<style>
+  body {{ font-family: Segoe UI, Arial, sans-serif; margin: 24px; }}
+  h1 {{ margin: 0 0 8px 0; font-size: 22px; }}
+  h2 {{ margin-top: 18px; font-size: 16px; }}
+  .small {{ color:#666; font-size: 12px; margin-top: 2px; }}
+  table {{ border-collapse: collapse; width: 100%; margin-top: 10px; }}
+  td, th {{ border: 1px solid #ddd; padding: 8px; font-size: 13px; }}
+  th {{ background: #f6f6f6; text-align:left; }}
+  .grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 10px; margin-top: 10px; }}
+  .card {{ border: 1px solid #e5e5e5; border-radius: 10px; padding: 12px; }}
+  .muted {{ color:#888; font-size: 13px; }}
+  code {{ white-space: pre-wrap; }}
+  /* --- Status palette --- */
+  .title {{ display:flex; align-items:center; gap:10px; }}
+  .title .mark {{ font-size: 22px; }}
+  .badge {{ display:inline-block; padding:4px 10px; border-radius: 999px; background:#eee; font-weight: 600; }}
+  .badge.ok   {{ background:#e8f5e9; color:#1b5e20; }}
+  .badge.bad  {{ background:#ffebee; color:#b71c1c; }}
+  .badge.warn {{ background:#fff8e1; color:#e65100; }}
+  .badge.na   {{ background:#eef2f7; color:#37474f; }}
+  .badge.skip {{ background:#f3e5f5; color:#4a148c; }}
+
+  .cnt {{ font-weight: 700; }}
+  .cnt.pass {{ color:#1b5e20; }}
+  .cnt.fail {{ color:#b71c1c; }}
+  .cnt.warn {{ color:#e65100; }}
+  .cnt.na   {{ color:#37474f; }}
+  .cnt.skip {{ color:#4a148c; }}
+
+  .pill {{ display:inline-block; padding:2px 8px; border-radius: 999px; border:1px solid #ddd; font-size:12px; color:#555; background:#fafafa; }}
+  .prebox {{ background:#0b0f14; color:#e6edf3; padding:12px; border-radius:10px; overflow:auto; font-size:12px; line-height:1.5; }}
+</style>
+</head>
+<body>
+  <div class="title">
+    <div class="mark">🧾</div>
+    <h1>QA Run Summary</h1>
+    <span class="pill">{esc(getattr(env,'run_suite',''))}</span>
+    <span class="pill">{esc(getattr(env,'run_runner',''))}</span>
+  </div>
+
+  <div class="small">Run ID: <b>{esc(getattr(env,'run_id',''))}</b></div>
+  <div class="small">Result: <span class="{result_badge_class(run_result)}">{result_emoji} {esc(run_result)}</span></div>
+
+  <div class="grid">
+    <div class="card">
+      <h2>📋 환경 정보</h2>
+      <div class="small">Device: {esc(model)} / {esc(getattr(env,'serial',''))}</div>
+      <div class="small">Android: {esc(osv)} (SDK {esc(sdk)})</div>
+      <div class="small">App: {esc(getattr(env,'package',''))} {esc(vname)} ({esc(vcode)})</div>
+    </div>
+    <div class="card">
+      <h2>⏱️ 시간</h2>
+      <div class="small">Started: {esc(started)}</div>
+      <div class="small">Ended: {esc(ended)}</div>
+      <div class="small">Duration: {esc(dur)}s</div>
+    </div>
+  </div>
+
+  <h2>📊 집계</h2>
+  <table>
+    <tr>
+      <th>✅ PASS</th><th>❌ FAIL</th><th>⚠️ WARN</th><th>➖ N/A</th><th>⏭️ SKIP</th>
+    </tr>
+    <tr>
+      <td class="{cnt_class('PASS')}">{pass_cnt}</td>
+      <td class="{cnt_class('FAIL')}">{fail_cnt}</td>
+      <td class="{cnt_class('WARN')}">{warn_cnt}</td>
+      <td class="{cnt_class('N/A')}">{na_cnt}</td>
+      <td class="{cnt_class('SKIP')}">{skip_cnt}</td>
+    </tr>
+  </table>
+
+  <h2>⚠️ Warnings</h2>
+  {warnings_html}
+
+  <h2>❌ Failures</h2>
+  {failures_html}
+
+  <h2>📝 Notes</h2>
+  {notes_html}
+
+  <h2>⏱️ Step/Helper Latency</h2>
+  {profile_section}
+
+  <h2>🗂️ Artifacts</h2>
+  <table>
+    <tr><th>Item</th><th>Link</th></tr>
+    {rows_html}
+  </table>
+</body>
+</html>"""
+
+def finalize_run(env: Optional["QAEnv"] = None, result: Optional[str] = None):
+    """
+    Run 종료 처리:
+      - 실패 증거 백그라운드 작업 대기(QA_EVIDENCE_WAIT 초 제한)
+      - ended_at/duration/result 확정
+      - meta.json + summary.html 생성
+    """
+    env = use_env(env)
+    if env is None:
+        return
+
+    # 백그라운드 실패 증거(evidence.EvidencePipeline) 잔여 작업 대기 + 실패 메일 다이제스트 발송 → meta 작성
+    ev = getattr(env, "_evidence", None)
+    if (ev is not None and ev.pending) or getattr(env, "_mail_digest", None) is not None:
+        try:
+            from .evidence import wait_evidence
+            wait_evidence(env)
+        except Exception as e:
+            step(f"[WARN] 실패 증거 대기 중 예외: {e}", env=env)
+
+    # 종료 정보
+    env.run_ended_at = _kst_now_iso()
+    try:
+        # started_at이 없다면 보호
+        t0 = float(getattr(env, "run_started_ts", 0.0) or 0.0)
+        env.run_duration_sec = int(max(0.0, time.time() - t0))
+    except Exception:
+        env.run_duration_sec = 0
+
+    counts = getattr(env, "run_counts", None) or {}
+
+    # ✅ overall + decision(근거) 산출
+    dec = _overall_decision(counts, forced=result)
+    env.run_result = str(dec.get("overall", "SKIP")).upper()
+
+    # 스텝/헬퍼 프로파일 → profile_trace.json (Chrome trace, speedscope 호환) + 통계(meta/summary 공용)
+    prof = get_profiler()
+    if prof.spans or prof.marks:
+        try:
+            env._profile_stats = helper_stats(prof.all_spans())
+            prof.write_chrome_trace(os.path.join(env.run_dir, "profile_trace.json"), process_name=env.run_id)
+            env.run_artifacts["profile_trace"] = "profile_trace.json"
+        except Exception as e:
+            step(f"[WARN] 프로파일 저장 실패: {e}", env=env)
+
+    # meta.json 구성
+    meta = {
+        "schema_version": "1.0",
+        "run_id": env.run_id,
+        "suite": env.run_suite,
+        "runner": env.run_runner,
+        "started_at": env.run_started_at,
+        "ended_at": env.run_ended_at,
+        "duration_sec": env.run_duration_sec,
+        "result": env.run_result,
+        # ✅ 추가: 결과 결정 근거
+        "decision": {
+            "rule_version": dec.get("rule_version", "1.0"),
+            "overall": env.run_result,
+            "reason_code": dec.get("reason_code", ""),
+            "reason_text": dec.get("reason_text", ""),
+            "precedence": dec.get("precedence", ["FAIL", "WARN", "PASS", "N/A", "SKIP"]),
+            # counts는 meta 상단에도 이미 있지만, decision 파싱만으로 근거를 완결시키기 위해 중복 저장
+            "counts": dec.get("counts", {}),
+        },
+        "device": {
+            "serial": env.serial,
+            "model": getattr(env, "device_model", "") or "",
+            "os_version": getattr(env, "device_os_version", "") or "",
+            "sdk": getattr(env, "device_sdk", "") or "",
+        },
+        "app": {
+            "package": env.package,
+            "version_name": getattr(env, "app_version_name", "") or "",
+            "version_code": getattr(env, "app_version_code", "") or "",
+        },
+        "counts": {
+            "pass": int(counts.get("PASS", 0)),
+            "fail": int(counts.get("FAIL", 0)),
+            "warn": int(counts.get("WARN", 0)),
+            "na": int(counts.get("N/A", 0)),
+            "skip": int(counts.get("SKIP", 0)),
+        },
+        "artifacts": getattr(env, "run_artifacts", {}) or {},
+        "notes": getattr(env, "run_notes", []) or [],
+        "warnings": getattr(env, "run_warn_logs", []) or [],
+        "failures": getattr(env, "run_fail_logs", []) or [],
+        "profile": {k: v for k, v in (getattr(env, "_profile_stats", None) or {}).items() if k != "slow_steps"},
+    }
+
+    try:
+        _write_json(env.run_meta_path, meta)
+    except Exception:
+        pass
+
+    try:
+        html = _summary_html_text(env)
+        with open(env.run_summary_path, "w", encoding="utf-8") as f:
+            f.write(html)
+    except Exception:
+        pass
+
+    # ✅ 오케스트레이터에 Run 종료 통지(설정된 경우만)
+    emit_event("run_end", env.run_result, env.run_result, env,
+               run_dir=env.run_dir, counts=meta["counts"], duration_sec=env.run_duration_sec)
+
+# 최근 logcat_recent_*.txt 파일 경로 찾기
+def find_latest_logcat_recent(env: Optional['QAEnv'] = None, ts: Optional[float] = None) -> Optional[str]:
+    """
+    RESULT_DIR(env.out_dir)에서 가장 최신의 logcat_recent_*.txt 하나를 반환.
+    (pkg/pid 미필터 전체 로그 파일 네이밍 전제)
+    - ts(실패 시각) 지정 시 GUI가 그 시각 기준으로 저장한 logcat_recent_YYMMDD_hhmmss.txt 우선
+    """
+    env = use_env(env)
+
+    if ts is not None:
+        p = os.path.join(env.out_dir, time.strftime("logcat_recent_%y%m%d_%H%M%S.txt", time.localtime(ts)))
+        if os.path.exists(p):
+            return p
+
+    # YYMMDD_hhmm(수동 Save) / YYMMDD_hhmmss(save.flag 실패 시각) 형식
+    # 예: logcat_recent_250910_1730.txt, logcat_recent_250910_173012.txt
+    pattern = re.compile(r"^logcat_recent_\d{6}_\d{4}(?:\d{2})?\.txt$")
+
+    try:
+        candidates = []
+        for n in os.listdir(env.out_dir):
+            # 예: logcat_recent_250910-1730.txt
+            if pattern.match(n):
+                p = os.path.join(env.out_dir, n)
+                try:
+                    mtime = os.path.getmtime(p)
+                except Exception:
+                    mtime = 0
+                candidates.append((mtime, p))
+        if not candidates:
+            return None
+        candidates.sort(reverse=True)
+        return candidates[0][1]
+    except Exception:
+        return None
@@ -0,0 +1,816 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - UI 계층 스냅샷, 예외상황 처리기(ExceptionRuleSet), 이벤트 대기(wait_until_any)
+# ==========================================================
+# -*- coding: utf-8 -*-
+import os, time, re, json, contextlib
+from typing import Optional, Tuple, Callable, Dict, List, Union, Any
+from airtest.core.api import keyevent, shell
+from .core import QAEnv, soft_fail, step, use_env
+from .adb import _get_resolution
+from .capture import FrameDiff, _capture_backend, get_scrcpy_capture, grab_frame
+from .ui import get_label, poco
+
+
+# 요소 가시성/활성화 체크(스크롤 용도)
+def is_visible(el) -> bool:
+    """
+    요소의 화면 내 가시성 판정
+    - exists()가 False면 무조건 False
+    - get_position / get_size 가 이상하면:
+      → center(x,y)가 0~1 안에만 있으면 True로 간주 (구 Unity/Native 보호)
+    - 교차 비율 임계값도 5% → 1%로 완화
+    - hierarchy_snapshot 블록 안에서는 스냅샷 payload로 판정(RPC 없음)
+    """
+    snap = _batch_snapshot()
+    if snap is not None:
+        r = snap.visible(el)
+        if r is not None:
+            return r
+
+    if not el.exists():
+        return False
+
+    try:
+        x, y = el.get_position()   # center (0~1)
+        w, h = el.get_size()       # size   (0~1)
+        if not (isinstance(x, (int, float)) and isinstance(y, (int, float))):
+            return False
+
+        # 기본값 보정
+        w = float(w or 0.0)
+        h = float(h or 0.0)
+
+        # 사이즈 정보가 거의 없으면: center가 화면 안이면 보이는 걸로 처리
+        if w <= 0.0 or h <= 0.0:
+            return 0.0 <= x <= 1.0 and 0.0 <= y <= 1.0
+
+        x1, y1 = x - w / 2.0, y - h / 2.0
+        x2, y2 = x + w / 2.0, y + h / 2.0
+
+        # 화면(0~1)과 겹치는 비율 체크 (임계값 1%)
+        overlap_x = min(x2, 1.0) - max(x1, 0.0)
+        overlap_y = min(y2, 1.0) - max(y1, 0.0)
+        ox = overlap_x > 0.01
+        oy = overlap_y > 0.01
+        if not (ox and oy):
+            return False
+    except Exception:
+        # 위치/사이즈 조회에서 에러 날 경우 보수적으로 False
+        return False
+
+    # Unity visible 플래그는 참고용 (False면 숨김)
+    try:
+        vis = el.attr("visible")
+        if isinstance(vis, bool) and not vis:
+            return False
+    except Exception:
+        pass
+
+    return True
+
+
+def is_enabled(el) -> bool:
+    """
+    요소의 활성화 상태 체크
+    - Android Native: enabled 속성 반환
+    - Unity: enabled가 없을 수 있음 → 기본 True 처리
+    """
+    try:
+        v = el.attr("enabled")
+        if isinstance(v, bool):
+            return v
+    except Exception:
+        pass
+    return True   # 속성이 없으면 True로 간주
+
+# ==========================================================
+# 🌳 UI 계층 스냅샷 캐시 (exists/visible 일괄 판정)
+#  - hierarchy.dump() 1회 → name(resource-id)/text/type 인덱스 → 선택자 질의를 로컬 응답
+#  - 재사용 조건: 계층 버전 동일(액션 후 invalidate_hierarchy()로 증가)
+#               + 화면 동일(scrcpy 프레임 비교) | 프레임 캡처 불가 시 max_age 이내
+#  - with hierarchy_snapshot(): 블록 안의 cond_exists/cond_visible/is_visible 은 스냅샷 기준 평가
+#  - 로컬 해석 불가 선택자(sibling/parent 등)는 기존 exists()로 폴백
+# ==========================================================
+_HIER_MAX_AGE = 0.5          # 프레임 비교 불가 시 스냅샷 유효 시간(초)
+
+# --- poco query → 스냅샷 인덱스 조회 함수로 1회 컴파일 (query 튜플 단위 캐시) ---
+#  - ("and"|"or", (("attr="|"attr.*=", (attr, value)), ...)) / ("/"|">", (부모, 자식)) / ("index", (q, i))
+#  - 그 외(sibling "-", parent "^" 등)는 None → 호출측 exists() 폴백
+_QUERY_CACHE: Dict[Any, Optional[Callable[['HierarchySnapshot'], List[int]]]] = {}
+_INDEX_KEYS = (("name", "by_name"), ("text", "by_text"), ("type", "by_type"))
+
+def _compile_attr(op: str, arg) -> Callable[[dict], bool]:
+    name, target = arg
+    if op == "attr=":
+        return lambda p: p.get(name) == target
+    rx = re.compile(target)
+    return lambda p: isinstance(p.get(name), str) and rx.match(p.get(name)) is not None
+
+def _compile_query(query):
+    op, args = query
+    if op in ("and", "or"):
+        if any(c[0] not in ("attr=", "attr.*=") for c in args):
+            return None
+        tests = [(c, _compile_attr(*c)) for c in args]
+        if op == "or":
+            def run_or(snap):
+                return [i for i, p in enumerate(snap.payloads)
+                        if snap.shown[i] and any(t(p) for _, t in tests)]
+            return run_or
+        # 가장 선택적인 인덱스(name > text > type)로 후보 축소, 나머지 조건만 필터
+        for key, attr in _INDEX_KEYS:
+            hit = next((c for c in args if c[0] == "attr=" and c[1][0] == key), None)
+            if hit is not None:
+                value = hit[1][1]
+                rest = [t for c, t in tests if c is not hit]
+                def run_idx(snap, attr=attr, value=value, rest=rest):
+                    try:
+                        cand = getattr(snap, attr).get(value, ())
+                    except TypeError:
+                        return []
+                    return [i for i in cand
+                            if snap.shown[i] and all(t(snap.payloads[i]) for t in rest)]
+                return run_idx
+        def run_scan(snap):
+            return [i for i, p in enumerate(snap.payloads)
+                    if snap.shown[i] and all(t(p) for _, t in tests)]
+        return run_scan
+    if op in ("/", ">"):
+        pq, cq = compile_query(args[0]), compile_query(args[1])
+        if pq is None or cq is None:
+            return None
+        direct = (op == "/")
+        def run_rel(snap):
+            pset = set(pq(snap))
+            out = []
+            for k in cq(snap):
+                a = snap.parents[k]
+                while a >= 0:
+                    if a in pset:
+                        out.append(k)
+                        break
+                    if direct:
+                        break
+                    a = snap.parents[a]
+            return out
+        return run_rel
+    if op == "index":
+        bq, idx = compile_query(args[0]), int(args[1])
+        if bq is None:
+            return None
+        def run_index(snap):
+            base = bq(snap)
+            return [base[idx]] if -len(base) <= idx < len(base) else []
+        return run_index
+    return None
+
+def compile_query(query) -> Optional[Callable[['HierarchySnapshot'], List[int]]]:
+    """poco 선택자 query 튜플 → fn(snapshot) -> [노드 인덱스] (해석 불가면 None)"""
+    try:
+        return _QUERY_CACHE[query]
+    except KeyError:
+        pass
+    except TypeError:
+        return None   # unhashable 값 포함 → 캐시 없이 폴백
+    try:
+        fn = _compile_query(query)
+    except Exception:
+        fn = None
+    _QUERY_CACHE[query] = fn
+    return fn
+
+class HierarchySnapshot:
+    """
+    poco 계층 dump 1회분. select(query)는 poco Selector와 같은 규칙으로 노드 인덱스 목록을 반환.
+    (visible=False 노드와 그 하위는 제외, 해석 불가 query는 None)
+    """
+
+    def __init__(self, tree: dict, *, version: int = 0, frame=None, frame_seq: int = -1):
+        self.version = int(version)
+        self.taken_at = time.time()
+        self.frame = frame
+        self.frame_seq = int(frame_seq)
+        self.payloads: List[dict] = []
+        self.parents: List[int] = []
+        self.children: List[List[int]] = []
+        self.shown: List[bool] = []
+        self.by_name: Dict[Any, List[int]] = {}
+        self.by_text: Dict[Any, List[int]] = {}
+        self.by_type: Dict[Any, List[int]] = {}
+        self._build(tree)
+
+    def _build(self, tree: dict):
+        stack = [(tree, -1)] if isinstance(tree, dict) else []
+        while stack:
+            node, parent = stack.pop()
+            idx = len(self.payloads)
+            p = node.get("payload") or {}
+            if "name" not in p and "name" in node:
+                p = dict(p, name=node.get("name"))
+            self.payloads.append(p)
+            self.parents.append(parent)
+            self.children.append([])
+            vis = p.get("visible", True) is not False
+            self.shown.append(vis and (parent < 0 or self.shown[parent]))
+            if parent >= 0:
+                self.children[parent].append(idx)
+            for key, index in (("name", self.by_name), ("text", self.by_text), ("type", self.by_type)):
+                v = p.get(key)
+                if v is not None and isinstance(v, (str, int, float, bool)):
+                    index.setdefault(v, []).append(idx)
+            # 자식은 문서 순서 유지를 위해 역순 push
+            for ch in reversed(node.get("children") or []):
+                if isinstance(ch, dict):
+                    stack.append((ch, idx))
+
+    def __len__(self):
+        return len(self.payloads)
+
+    # --- 질의 ---
+    def select(self, query) -> Optional[List[int]]:
+        cq = compile_query(query)
+        if cq is None:
+            return None
+        try:
+            return cq(self)
+        except Exception:
+            return None
+
+    def node_visible(self, i: int) -> bool:
+        """is_visible()과 같은 규칙(center/size 0~1 화면 교차 1%)"""
+        p = self.payloads[i]
+        try:
+            x, y = p.get("pos") or (None, None)
+            w, h = p.get("size") or (0.0, 0.0)
+            if not (isinstance(x, (int, float)) and isinstance(y, (int, float))):
+                return False
+            w = float(w or 0.0)
+            h = float(h or 0.0)
+            if w <= 0.0 or h <= 0.0:
+                return 0.0 <= x <= 1.0 and 0.0 <= y <= 1.0
+            ox = min(x + w / 2.0, 1.0) - max(x - w / 2.0, 0.0)
+            oy = min(y + h / 2.0, 1.0) - max(y - h / 2.0, 0.0)
+            return ox > 0.01 and oy > 0.01
+        except Exception:
+            return False
+
+    def exists(self, sel) -> Optional[bool]:
+        """선택자 존재 여부. 로컬 해석 불가면 None."""
+        q = getattr(sel, "query", None)
+        if not isinstance(q, tuple):
+            return None
+        r = self.select(q)
+        return None if r is None else bool(r)
+
+    def visible(self, sel) -> Optional[bool]:
+        """선택자 첫 노드의 화면 내 가시성. 해석 불가면 None."""
+        q = getattr(sel, "query", None)
+        if not isinstance(q, tuple):
+            return None
+        r = self.select(q)
+        if r is None:
+            return None
+        return bool(r) and self.node_visible(r[0])
+
+
+def invalidate_hierarchy(env: Optional['QAEnv'] = None):
+    """계층 버전 증가 → 다음 스냅샷 질의 시 재dump (클릭/입력 등 화면을 바꾸는 액션 후 호출)"""
+    env = use_env(env)
+    if env is not None:
+        env._hier_version = getattr(env, "_hier_version", 0) + 1
+
+def _hier_frame(env) -> Tuple[Any, int]:
+    """scrcpy 스트림이 살아 있을 때만 (최신 프레임, seq). 없으면 (None, -1) → TTL 기준으로 판단"""
+    if _capture_backend() == "airtest":
+        return None, -1
+    cap = get_scrcpy_capture(env, start=False)
+    if cap is None:
+        return None, -1
+    return cap.latest(), cap.seq
+
+def _hier_snapshot_fresh(env, snap: HierarchySnapshot, max_age: float) -> bool:
+    if snap.version != getattr(env, "_hier_version", 0):
+        return False
+    frame, seq = _hier_frame(env) if snap.frame is not None else (None, -1)
+    if frame is None:
+        return (time.time() - snap.taken_at) < float(max_age)
+    if seq == snap.frame_seq:
+        return True
+    fd = getattr(env, "_hier_fd", None)
+    if fd is None:
+        fd = env._hier_fd = FrameDiff()
+    d = fd.compare(snap.frame, frame, motion=False)
+    return d is not None and d.score < 0.5 and d.changed_ratio < 0.001
+
+def get_hierarchy_snapshot(env: Optional['QAEnv'] = None, *, force: bool = False,
+                           max_age: float = None) -> Optional[HierarchySnapshot]:
+    """
+    캐시된 스냅샷 반환(버전/화면 동일 시), 아니면 hierarchy.dump() 1회 후 교체.
+    dump 실패 시 None (호출측은 기존 exists()로 폴백)
+    """
+    env = use_env(env)
+    if env is None:
+        return None
+    stats = env.__dict__.setdefault("_hier_stats", {"dump": 0, "hit": 0})
+    snap = getattr(env, "_hier_snap", None)
+    if snap is not None and not force and _hier_snapshot_fresh(env, snap, _HIER_MAX_AGE if max_age is None else max_age):
+        stats["hit"] += 1
+        return snap
+
+    frame, seq = _hier_frame(env)
+    try:
+        tree = poco.agent.hierarchy.dump()
+    except Exception:
+        env._hier_snap = None
+        return None
+    snap = HierarchySnapshot(tree, version=getattr(env, "_hier_version", 0), frame=frame, frame_seq=seq)
+    env._hier_snap = snap
+    stats["dump"] += 1
+    return snap
+
+@contextlib.contextmanager
+def hierarchy_snapshot(env: Optional['QAEnv'] = None, *, refresh: bool = False):
+    """
+    블록 안의 cond_exists/cond_visible/is_visible 을 한 번의 dump로 일괄 평가.
+    - refresh=True: 진입 시 무조건 재dump (폴링 루프의 매 라운드용)
+    """
+    env = use_env(env)
+    if env is None:
+        yield None
+        return
+    if refresh:
+        invalidate_hierarchy(env)
+    env._hier_batch = getattr(env, "_hier_batch", 0) + 1
+    try:
+        yield get_hierarchy_snapshot(env)
+    finally:
+        env._hier_batch -= 1
+
+def _batch_snapshot() -> Optional[HierarchySnapshot]:
+    env = use_env()
+    if env is None or getattr(env, "_hier_batch", 0) <= 0:
+        return None
+    return get_hierarchy_snapshot(env)
+
+def _sel_exists(sel) -> bool:
+    snap = _batch_snapshot()
+    if snap is not None:
+        r = snap.exists(sel)
+        if r is not None:
+            return r
+    return sel.exists()
+
+# ==========================================================
+# 🧩 예외상황 처리기 (조건 + 액션 빌더 + 핵심 처리기)   
+#  - 조건: exists / visible / exists_any / visible_any
+#  - 액션: click / back / tap_ratio / send_text / sleep
+#  - 핵심: handle_expected_exceptions() / ExceptionRuleSet(재사용 규칙 세트 + 통계)
+#   rules: [{ "name": str, "condition": callable, "action": callable }, ...]
+# ==========================================================)
+# --- 조건 빌더(간단) ---
+#  - 반환 함수에 선택자(_exc_sels)/모드(_exc_mode)를 달아 두면 ExceptionRuleSet이 query를 컴파일해 사용
+def _tag_cond(fn: Callable[[], bool], mode: str, sels: List) -> Callable[[], bool]:
+    fn._exc_mode = mode
+    fn._exc_sels = list(sels)
+    return fn
+
+def cond_exists(sel) -> Callable[[], bool]:
+    """선택자가 exists면 True (hierarchy_snapshot 블록 안에서는 스냅샷 기준)"""
+    return _tag_cond(lambda: _sel_exists(sel), "exists", [sel])
+
+def cond_visible(sel) -> Callable[[], bool]:
+    """선택자가 화면에 보이면 True"""
+    return _tag_cond(lambda: _sel_exists(sel) and is_visible(sel), "visible", [sel])
+
+def cond_exists_any(pocos: List) -> Callable[[], bool]:
+    return _tag_cond(lambda: any((_sel_exists(el) for el in pocos)), "exists", pocos)
+
+def cond_visible_any(pocos: List) -> Callable[[], bool]:
+    return _tag_cond(lambda: any((_sel_exists(el) and is_visible(el) for el in pocos)), "visible", pocos)
+
+# --- 액션 빌더(필요 최소) ---
+def act_click(sel, *, env=None, wait: float=0.3) -> Callable[[], None]:
+    def _do():
+        try:
+            sel.wait_for_appearance(timeout=5)
+            sel.click([0.5, 0.5])
+            step(f"[EXC-ACT] click: {get_label(sel)}")
+            time.sleep(wait)
+        except Exception as e:
+            soft_fail(f"[EXC-ACT] click FAIL: {e}")
+    return _do
+
+def act_back(*, env=None, wait: float=0.2) -> Callable[[], None]:
+    def _do():
+        try:
+            keyevent("BACK")
+            step("[EXC-ACT] BACK")
+            time.sleep(wait)
+        except Exception as e:
+            soft_fail(f"[EXC-ACT] BACK FAIL: {e}")
+    return _do
+
+def act_tap_ratio(xr: float, yr: float, *, env=None, wait: float=0.2) -> Callable[[], None]:
+    """화면 비율 좌표 탭 (0~1)"""
+    def _do():
+        try:
+            W,H = _get_resolution()  # 캐시 기반: dumpsys 빈도 급감
+            x = max(1, min(int(W*xr), W-1)); y = max(1, min(int(H*yr), H-1))
+            shell(f"input tap {x} {y}")
+            step(f"[EXC-ACT] tap @{x},{y}")
+            time.sleep(wait)
+        except Exception as e:
+            soft_fail(f"[EXC-ACT] tap FAIL: {e}")
+    return _do
+
+def act_send_text(text: str, *, env=None, wait: float=0.1) -> Callable[[], None]:
+    def _do():
+        try:
+            shell(f'input text "{text}"')
+            step(f"[EXC-ACT] send_text: {text}")
+            time.sleep(wait)
+        except Exception as e:
+            soft_fail(f"[EXC-ACT] send_text FAIL: {e}")
+    return _do
+
+def act_sleep(sec: float) -> Callable[[], None]:
+    return lambda: time.sleep(sec)
+
+def multi_act(*acts):
+    def _do():
+        for fn in acts:
+            try:
+                fn()
+            except Exception as e:
+                step(f"[EXC-ACT] multi_act ERR: {e}")
+                pass
+    return _do
+
+# --- 규칙 세트: 1회 구성 + 일괄 평가 + 규칙별 통계 ---
+_EXC_RULESETS: List['ExceptionRuleSet'] = []
+
+class ExceptionRuleSet:
+    """
+    예외 규칙 묶음. 모듈 로드 시 1회 만들어 두고 handle_expected_exceptions(rules=...)에 그대로 전달.
+    - rules: 규칙 dict 목록 또는 목록을 반환하는 builder
+      (builder면 첫 평가 시 구성, poco 재생성(restart_app 등) 시에만 재구성)
+    - cond_* 빌더로 만든 조건은 선택자 query를 컴파일 → 계층 스냅샷 1회로 전체 조건 평가
+    - 규칙별 통계: evals / hits / actions / eval_ms / action_ms (stats(), report())
+    """
+
+    def __init__(self, rules, *, name: str = "rules", settle: float = 0.3, register: bool = True):
+        self.name = name
+        self.settle = float(settle)
+        self._source = rules
+        self._bound_poco = None
+        self._rules: List[Tuple[str, Callable, Callable, Any]] = []
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self.passes = 0
+        self.dump_ms = 0.0
+        if not callable(rules):
+            self._compile(list(rules or []))
+        if register:
+            _EXC_RULESETS.append(self)
+
+    # --- 구성 ---
+    def _compile(self, rules: List[Dict]):
+        compiled = []
+        for r in rules:
+            name = r.get("name", "rule")
+            cond = r.get("condition")
+            cqs = None
+            sels = getattr(cond, "_exc_sels", None)
+            if sels:
+                cqs = [compile_query(getattr(s, "query", None)) if isinstance(getattr(s, "query", None), tuple) else None
+                       for s in sels]
+                if any(cq is None for cq in cqs):
+                    cqs = None
+            compiled.append((name, cond, r.get("action"), (getattr(cond, "_exc_mode", "exists"), cqs) if cqs else None))
+            self._stats.setdefault(name, {"evals": 0, "hits": 0, "actions": 0, "eval_ms": 0.0, "action_ms": 0.0})
+        self._rules = compiled
+
+    def _bind(self, env):
+        if not callable(self._source):
+            return
+        cur = getattr(env, "poco", None) if env is not None else None
+        if self._rules and (cur is None or cur is self._bound_poco):
+            return
+        self._compile(list(self._source() or []))
+        self._bound_poco = getattr(env, "poco", None) if env is not None else None
+
+    def __len__(self):
+        return len(self._rules)
+
+    # --- 평가 ---
+    def _eval_one(self, snap, rule) -> bool:
+        name, cond, _, compiled = rule
+        if compiled is not None and snap is not None:
+            mode, cqs = compiled
+            for cq in cqs:
+                nodes = cq(snap)
+                if nodes and (mode != "visible" or snap.node_visible(nodes[0])):
+                    return True
+            return False
+        return bool(callable(cond) and cond())
+
+    def _first_hit(self, env, pending: List[int], skip_name, use_snapshot: bool) -> Optional[int]:
+        """pending 규칙을 순서대로 평가(스냅샷 1회 공유), 처리 대상 첫 규칙 인덱스 반환"""
+        t0 = time.perf_counter()
+        with (hierarchy_snapshot(env, refresh=True) if use_snapshot else contextlib.nullcontext()) as snap:
+            self.dump_ms += (time.perf_counter() - t0) * 1000.0
+            self.passes += 1
+            for i in pending:
+                rule = self._rules[i]
+                st = self._stats[rule[0]]
+                t1 = time.perf_counter()
+                try:
+                    hit = self._eval_one(snap, rule)
+                except Exception as e:
+                    hit = False
+                    step(f"[EXC] rule ERR: {rule[0]}: {e}", True)
+                st["evals"] += 1
+                st["eval_ms"] += (time.perf_counter() - t1) * 1000.0
+                if not hit:
+                    continue
+                st["hits"] += 1
+                if rule[0] == skip_name:
+                    continue  # 같은 rule 연속 처리 방지 (옵션)
+                return i
+        return None
+
+    def _settle_after_action(self, env):
+        # scrcpy 스트림이 있으면 화면 정지 즉시 진행(최대 settle), 없으면 기존처럼 고정 대기
+        if self.settle <= 0:
+            return
+        if _capture_backend() != "airtest" and get_scrcpy_capture(env, start=False) is not None:
+            wait_screen_settled(quiet=0.1, timeout=self.settle, env=env)
+        else:
+            time.sleep(self.settle)
+
+    def run(self, *, env: Optional['QAEnv'] = None, handle_all: bool = False,
+            stop_after: int = 3, snapshot: bool = True) -> int:
+        env = use_env(env)
+        self._bind(env)
+        executed = 0
+        loop = 0
+        last_name = None
+        while loop < stop_after:
+            loop += 1
+            matched_any = False
+            pending = list(range(len(self._rules)))
+            while pending:
+                i = self._first_hit(env, pending, last_name, snapshot)
+                if i is None:
+                    break
+                name, _, act, _ = self._rules[i]
+                last_name = name
+                step(f"[EXC] match: {name}")
+                matched_any = True
+                ok = True
+                if callable(act):
+                    st = self._stats[name]
+                    t1 = time.perf_counter()
+                    try:
+                        act()
+                    except Exception as e:
+                        ok = False
+                        step(f"[EXC] rule ERR: {name}: {e}", True)
+                    st["actions"] += 1
+                    st["action_ms"] += (time.perf_counter() - t1) * 1000.0
+                    invalidate_hierarchy(env)   # 액션으로 화면이 바뀜 → 이후 조건은 재dump
+                    if ok:
+                        self._settle_after_action(env)  # 화면 정리 시간
+                if ok:
+                    executed += 1
+                    if not handle_all:
+                        return executed
+                # 이후 순번 규칙만 새 화면 기준으로 이어서 평가 (기존 순차 처리와 동일 순서)
+                pending = [j for j in pending if j > i]
+            if not matched_any:
+                break
+        return executed
+
+    # --- 통계 ---
+    def stats(self) -> List[Dict[str, Any]]:
+        compiled = {r[0]: r[3] is not None for r in self._rules}
+        out = []
+        for name, st in self._stats.items():
+            row = {"name": name, "compiled": compiled.get(name, False)}
+            row.update({k: (round(v, 3) if isinstance(v, float) else v) for k, v in st.items()})
+            out.append(row)
+        return out
+
+    def report(self, env: Optional['QAEnv'] = None, *, only_hits: bool = True):
+        env = use_env(env)
+        rows = self.stats()
+        fired = [r for r in rows if r["hits"] > 0]
+        step(f"[EXC-STATS] {self.name}: rules={len(rows)} fired={len(fired)} passes={self.passes} "
+             f"dump={self.dump_ms:.0f}ms", env=env)
+        for r in sorted(fired if only_hits else rows, key=lambda r: -r["hits"]):
+            step(f"[EXC-STATS]   {r['name']}: hits={r['hits']}/{r['evals']} actions={r['actions']} "
+                 f"eval={r['eval_ms']:.1f}ms action={r['action_ms']:.0f}ms"
+                 f"{'' if r['compiled'] else ' (uncompiled)'}", env=env)
+
+    def reset_stats(self):
+        for st in self._stats.values():
+            for k in st:
+                st[k] = 0.0 if isinstance(st[k], float) else 0
+        self.passes = 0
+        self.dump_ms = 0.0
+
+
+def save_exception_stats(env: Optional['QAEnv'] = None, path: str = None) -> Optional[str]:
+    """
+    등록된 ExceptionRuleSet 통계를 JSON으로 저장(+ 로그 요약). 평가 이력이 없으면 None.
+    - 기본 경로: env.run_dir/exception_stats.json
+    """
+    env = use_env(env)
+    sets = [rs for rs in _EXC_RULESETS if rs.passes > 0]
+    if not sets:
+        return None
+    for rs in sets:
+        rs.report(env)
+    path = path or os.path.join(getattr(env, "run_dir", None) or env.device_out_dir, "exception_stats.json")
+    data = {rs.name: {"passes": rs.passes, "dump_ms": round(rs.dump_ms, 1), "rules": rs.stats()} for rs in sets}
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        step(f"[EXC-STATS] 저장 실패: {e}", env=env)
+        return None
+    return path
+
+# --- 핵심: 예외상황 처리기 ---
+def handle_expected_exceptions(
+    *, env: Optional['QAEnv']=None,
+    rules: Union[List[Dict], 'ExceptionRuleSet'],
+    handle_all: bool = False,   # True면 매칭되는 규칙을 전부 처리, False면 첫 규칙만 처리
+    stop_after: int = 3,        # 최대 처리 횟수(무한루프 방지)
+    snapshot: bool = True,      # True면 평가 회차마다 계층 dump 1회로 전체 조건 평가
+) -> int:
+    """
+    rules: [{ "name": str, "condition": callable, "action": callable }, ...] 또는 ExceptionRuleSet
+      (반복 호출 경로에서는 ExceptionRuleSet을 1회 만들어 재사용 → 선택자 컴파일/통계 유지)
+    return: 실행된 rule 개수
+    """
+    rs = rules if isinstance(rules, ExceptionRuleSet) else ExceptionRuleSet(rules, register=False)
+    return rs.run(env=env, handle_all=handle_all, stop_after=stop_after, snapshot=snapshot)
+
+# ==========================================================
+# ⏱️ 이벤트 대기 (고정 sleep 대체)
+#  - wait_until_any(conditions, timeout, poll) -> 먼저 관측된 조건 이름 | None(timeout)
+#    conditions: {"이름": 조건} | [("이름", 조건), ...] | [조건, ...](이름=인덱스)
+#    조건 = callable() -> bool 또는 poco 선택자(exists() 평가)
+#  - frame_gate: scrcpy 스트림 사용 시 화면이 안 바뀐 동안은 계층 조회(RPC) 생략
+#  - settle: 조건 충족 후 화면이 settle초 정지해야 확정(전환 애니메이션 중 오검출 방지)
+#  - wait_screen_settled(quiet, timeout): 화면 정지 대기
+#  - settled_after_change(quiet): '화면이 반응한 뒤 quiet초 정지' 조건 (전용 위젯 없는 오답 피드백 감지용)
+# ==========================================================
+def _as_condition(c) -> Callable[[], bool]:
+    if hasattr(c, "exists") and hasattr(c, "wait_for_appearance"):
+        return lambda: _sel_exists(c)
+    if callable(c):
+        return c
+    raise TypeError(f"condition must be callable or poco selector: {c!r}")
+
+def _normalize_conditions(conditions) -> List[Tuple[Any, Callable[[], bool]]]:
+    if isinstance(conditions, dict):
+        items = list(conditions.items())
+    elif callable(conditions) or hasattr(conditions, "exists"):
+        items = [(0, conditions)]
+    else:
+        items = []
+        for i, c in enumerate(conditions):
+            if isinstance(c, tuple) and len(c) == 2:
+                items.append(c)
+            else:
+                items.append((i, c))
+    return [(name, _as_condition(c)) for name, c in items]
+
+def wait_screen_settled(quiet: float = 0.4, timeout: float = 3.0, *,
+                        env: Optional['QAEnv'] = None, poll: float = 0.05) -> bool:
+    """
+    화면이 quiet초 동안 변하지 않을 때까지 대기. 정지 확인 시 True, timeout이면 False.
+    - 프레임 캡처 불가 시 quiet만큼 sleep 후 True (기존 고정 대기와 동일 동작)
+    """
+    env = use_env(env)
+    deadline = time.time() + float(timeout)
+    fd = FrameDiff()
+    first = grab_frame(env)
+    if first is None:
+        time.sleep(float(quiet))
+        return True
+    fd.update(first, motion=False)
+    still_since = time.time()
+    while time.time() < deadline:
+        time.sleep(float(poll))
+        d = fd.update(grab_frame(env), motion=False)
+        now = time.time()
+        if d is None or not d.is_static(score_thr=0.6):
+            still_since = now
+        elif (now - still_since) >= float(quiet):
+            return True
+    return False
+
+def settled_after_change(quiet: float = 1.5, *, env: Optional['QAEnv'] = None,
+                         score_thr: float = 0.6) -> Callable[[], bool]:
+    """
+    wait_until_any 조건 생성: 생성 시점 이후 화면 변화가 한 번 관측되고, 그 뒤 quiet초 정지하면 True.
+    - 오답 피드백(보기 원위치/흔들림 등)처럼 전용 위젯 없이 '반응 후 멈춤'으로만 드러나는 결과용
+    - 정답 팝업 등 확정 조건보다 뒤에 두어야 함(같은 평가 회차에서는 앞 조건 우선)
+    - 프레임 캡처 불가 시 항상 False → 기존 timeout 동작 유지
+    """
+    env = use_env(env)
+    base = grab_frame(env)
+    if base is None:
+        return lambda: False
+    fd = FrameDiff()
+    fd.update(base, motion=False)
+    state = {"changed": False, "still": 0.0}
+
+    def _cond() -> bool:
+        d = fd.update(grab_frame(env), motion=False)
+        if d is None:
+            return False
+        now = time.time()
+        if not d.is_static(score_thr=score_thr):
+            state["changed"], state["still"] = True, now
+            return False
+        return state["changed"] and (now - state["still"]) >= float(quiet)
+    return _cond
+
+def wait_until_any(
+    conditions,
+    timeout: float = 10.0,
+    poll: float = 0.2,
+    *,
+    settle: float = 0.0,
+    frame_gate: bool = True,
+    max_gap: float = 1.0,          # frame_gate 중에도 최소 이 간격마다 1회는 강제 평가
+    env: Optional['QAEnv'] = None,
+    debug: bool = False,
+) -> Optional[Any]:
+    """
+    여러 결과(정답 팝업/다음 버튼/오답 표시 등) 중 먼저 관측된 것의 이름을 즉시 반환.
+    - 고정 time.sleep(N) 대신 사용: 최악의 경우에도 timeout(=기존 sleep)만큼만 대기
+    - 조건 예외는 False로 취급
+    - 반환: 조건 이름(dict key / tuple[0] / 인덱스) | None(timeout)
+    """
+    env = use_env(env)
+    conds = _normalize_conditions(conditions)
+    t0 = time.time()
+    deadline = t0 + float(timeout)
+
+    cap = None
+    if frame_gate and _capture_backend() != "airtest":
+        cap = get_scrcpy_capture(env)
+    gate = FrameDiff() if cap is not None else None
+    ref = None
+    last_eval_t = 0.0
+    evals = 0
+
+    while True:
+        now = time.time()
+
+        # ✅ 화면이 직전 평가 시점과 동일하면 계층 조회 생략(RPC 절감)
+        do_eval = True
+        cur = cap.latest() if cap is not None else None
+        if gate is not None and ref is not None and cur is not None and (now - last_eval_t) < float(max_gap):
+            d = gate.compare(ref, cur, motion=False)
+            if d is not None and d.score < 0.5 and d.changed_ratio < 0.001:
+                do_eval = False
+
+        if do_eval:
+            ref, last_eval_t = cur, now
+            evals += 1
+            hit = None
+            with hierarchy_snapshot(env, refresh=True):   # 조건 N개 → dump 1회
+                for name, fn in conds:
+                    try:
+                        if fn():
+                            hit = (name, fn)
+                            break
+                    except Exception:
+                        pass
+            if hit is not None:
+                name, fn = hit
+                confirmed = True
+                if settle and settle > 0:
+                    wait_screen_settled(quiet=settle, timeout=max(0.0, deadline - time.time()) + settle, env=env)
+                    try:
+                        with hierarchy_snapshot(env, refresh=True):
+                            confirmed = bool(fn())   # 정지 후 사라졌으면 계속 대기
+                    except Exception:
+                        confirmed = False
+            if hit is not None and confirmed:
+                if debug:
+                    step(f"[WAIT] any → {name} ({time.time() - t0:.2f}s, evals={evals})", env=env)
+                return name
+
+        if time.time() >= deadline:
+            break
+        time.sleep(max(0.01, min(float(poll), deadline - time.time())))
+
+    if debug:
+        step(f"[WAIT] any → timeout {float(timeout):.1f}s (evals={evals})", env=env)
+    return None
@@ -0,0 +1,521 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 스크롤/드래그/이미지 앵커 기반 탐색 (scroll_until_visible, try_find_click 등)
+# ==========================================================
+# -*- coding: utf-8 -*-
+import time
+from typing import Optional, Tuple, Dict, List, Union
+from airtest.core.api import swipe, shell, Template, exists
+from .core import soft_fail, step
+from .adb import _get_resolution
+from .capture import FrameDiff, grab_frame
+from .ui import get_label
+from .rules import is_visible
+
+
+# ==========================================================
+# 🧭 SCROLL / DRAG / SLIDE (from scratch, 5 modes)
+#    1) POCO container
+#    2) Global (Airtest)
+#    3) ADB
+#    4) Image-anchor (first detect, then keep using coords)
+#    5) Coordinate-based
+#  - step_ratio & duration로 이동량/속도 조절
+#  - methods_order로 시도 순서/선택 가능
+#  - find_and_click(): 발견 후 클릭 포함
+# ==========================================================
+# ---------- 공통 유틸 ----------
+def _clamp(v, lo, hi): 
+    return max(lo, min(hi, v))
+
+def _rel_drag_points(direction: str, step_ratio: float) -> Tuple[list, list]:
+    """
+    Poco 상대좌표(0~1). 수직: x=0.5 고정, y 이동 / 수평: y=0.5 고정, x 이동
+    direction: "down" | "up" | "left" | "right"
+    """
+    d = _clamp(step_ratio/2.0, 0.05, 0.9)
+
+    if direction in ("down", "up"):
+        base_y = 0.5
+        if direction == "down":  # 손가락 ↓↑ (내용 ↑)
+            y1, y2 = base_y + d, base_y - d
+        else:                    # 손가락 ↑↓ (내용 ↓)
+            y1, y2 = base_y - d, base_y + d
+        p1 = [0.5, _clamp(y1, 0.07, 0.93)]
+        p2 = [0.5, _clamp(y2, 0.07, 0.93)]
+        return p1, p2
+
+    # left/right
+    base_x = 0.5
+    if direction == "left":      # left: 손가락 ←→ (내용 →)
+        x1, x2 = base_x - d, base_x + d
+    else:                         # right: 손가락 →← (내용 ←)
+        x1, x2 = base_x + d, base_x - d
+    p1 = [_clamp(x1, 0.07, 0.93), 0.5]
+    p2 = [_clamp(x2, 0.07, 0.93), 0.5]
+    return p1, p2
+
+def _abs_drag_points(direction: str, step_ratio: float, W: int, H: int) -> Tuple[Tuple[int,int], Tuple[int,int]]:
+    """
+    전역/ADB/좌표 드래그 절대좌표.
+    수직: 중앙 x, y 이동 / 수평: 중앙 y, x 이동
+    """
+    (p1, p2) = _rel_drag_points(direction, step_ratio)
+    return (int(W*p1[0]), int(H*p1[1])), (int(W*p2[0]), int(H*p2[1]))
+
+# ---------- 1) POCO 컨테이너 (수평 지원, 교체) ----------
+def scroll_poco_container(*, scroll_view, direction="down", step_ratio=0.65, duration=0.5, debug=False) -> bool:
+    if not (scroll_view and scroll_view.exists()):
+        return False
+    if debug: step(f"[SCROLL][poco-container] {direction} {step_ratio} dur={duration}")
+    if direction == "up":
+        dir_vec = [0, step_ratio]        # 스크롤 위로(손가락 ↓)
+    elif direction == "down":
+        dir_vec = [0, -step_ratio]       # 스크롤 아래로 (손가락 ↑)
+    elif direction == "right":
+        dir_vec = [-step_ratio, 0]       # 스크롤 오른쪽으로 (손가락 ←)
+    elif direction == "left":
+        dir_vec = [ step_ratio, 0]       # 스크롤 왼쪽으로 (손가락 →)
+    else:
+        return False
+    scroll_view.swipe(dir_vec, duration=duration)
+    time.sleep(0.2)
+    return True
+
+# ---------- 2) 전역 슬라이드 (수평 지원, 교체) ----------
+def scroll_global(*, direction="down", step_ratio=0.65, duration=0.5, debug=False) -> bool:
+    W, H = _get_resolution()
+    (x1, y1), (x2, y2) = _abs_drag_points(direction, step_ratio, W, H)
+    if debug: step(f"[SCROLL][global] {direction} ({x1},{y1}) -> ({x2},{y2}) dur={duration}")
+    swipe((x1, y1), (x2, y2), duration=duration)
+    time.sleep(0.2)
+    return True
+
+# ---------- 3) ADB 스와이프 (수평 지원, 교체) ----------
+def scroll_adb(*, direction="down", step_ratio=0.65, duration=0.5, debug=False) -> bool:
+    W, H = _get_resolution()
+    (x1, y1), (x2, y2) = _abs_drag_points(direction, step_ratio, W, H)
+    dur_ms = int(max(1, duration * 1000))
+    cmd = f"input swipe {x1} {y1} {x2} {y2} {dur_ms}"
+    if debug: step(f"[SCROLL][adb] {direction} {cmd}")
+    shell(cmd)
+    time.sleep(0.2)
+    return True
+
+# ---------- 4) 이미지 앵커 기반 드래그 (최초만 이미지 → 이후 좌표) ----------
+#  - 최초 1회: Template(img) 매칭으로 anchor 좌표(px) 획득/저장
+#  - 이후: 저장된 좌표를 '계속' 사용하여 드래그 (이미지가 화면에서 사라져도 동작)
+_ANCHOR_CACHE: Dict[str, Tuple[int,int]] = {}
+
+# 이미지 탐색 쓰로틀(동일 key 재시도 최소 간격)
+_IMAGE_ANCHOR_THROTTLE_SEC = 1.8
+_IMAGE_ANCHOR_LAST_TRY: Dict[str, float] = {}
+_IMAGE_ANCHOR_LAST_HIT: Dict[str, Union[str, Tuple[int,int]]] = {}  # "MISS" 또는 (x,y)
+
+def set_anchor_cache(key: str, pos: Tuple[int,int]) -> None:
+    _ANCHOR_CACHE[key] = pos
+
+def get_anchor_cache(key: str) -> Optional[Tuple[int,int]]:
+    return _ANCHOR_CACHE.get(key)
+
+def clear_anchor_cache(key: Optional[str] = None) -> None:
+    if key is None:
+        _ANCHOR_CACHE.clear()
+    else:
+        _ANCHOR_CACHE.pop(key, None)
+
+# ---------- 4) 이미지 앵커 드래그 (좌/우 지원, 교체) ----------
+def drag_with_image_anchor(
+    *,
+    anchor_key: str,
+    anchor_img: Optional[str],
+    direction="down", step_ratio=0.65, duration=0.5,
+    debug=False
+) -> bool:
+
+    W, H = _get_resolution()
+    anchor_xy = get_anchor_cache(anchor_key)
+
+    if anchor_xy is None:
+        if not anchor_img:
+            if debug: step(f"[SCROLL][image-anchor] no cache & no image for key='{anchor_key}'")
+            return False
+
+        now = time.time()
+        last_try = _IMAGE_ANCHOR_LAST_TRY.get(anchor_key, 0.0)
+        # 직전 탐색 실패였다면 쿨다운 동안 재시도 금지
+        if _IMAGE_ANCHOR_LAST_HIT.get(anchor_key, "MISS") == "MISS":
+            if (now - last_try) < _IMAGE_ANCHOR_THROTTLE_SEC:
+                if debug: step(f"[SCROLL][image-anchor] throttle MISS {anchor_key}")
+                return False
+
+        _IMAGE_ANCHOR_LAST_TRY[anchor_key] = now
+        try:
+            tmpl = Template(anchor_img, threshold=0.75)
+        except Exception as e:
+            if debug: step(f"[SCROLL][image-anchor] template error: {e}")
+            _IMAGE_ANCHOR_LAST_HIT[anchor_key] = "MISS"
+            return False
+
+        match = exists(tmpl)
+        if not match:
+            if debug: step(f"[SCROLL][image-anchor] no match (key='{anchor_key}')")
+            _IMAGE_ANCHOR_LAST_HIT[anchor_key] = "MISS"
+            return False
+
+        ax, ay = int(match[0]), int(match[1])
+        set_anchor_cache(anchor_key, (ax, ay))
+        _IMAGE_ANCHOR_LAST_HIT[anchor_key] = (ax, ay)
+        anchor_xy = (ax, ay)
+        if debug: step(f"[SCROLL][image-anchor] cached anchor '{anchor_key}' at {anchor_xy}")
+
+    x1, y1 = anchor_xy
+    # 방향에 따라 x 또는 y 이동량 산출
+    if direction in ("down", "up"):
+        dpx = 0
+        dpy = int((_clamp(step_ratio, 0.1, 1.0) * (H * 0.9)) * (-1 if direction == "down" else 1))
+        x2, y2 = x1 + dpx, _clamp(y1 + dpy, 10, H - 10)
+    else:
+        dpx = int((_clamp(step_ratio, 0.1, 1.0) * (W * 0.9)) * (-1 if direction == "right" else 1))
+        dpy = 0
+        x2, y2 = _clamp(x1 + dpx, 10, W - 10), y1 + dpy
+
+    if debug: step(f"[SCROLL][image-anchor] {direction} {anchor_key}: ({x1},{y1}) -> ({x2},{y2}) dur={duration}")
+    swipe((x1, y1), (x2, y2), duration=duration)
+    time.sleep(0.2)
+    return True
+
+# ---------- 5) 좌표 기반 드래그 ----------
+def drag_by_coords(*, start_xy: Tuple[int,int], end_xy: Tuple[int,int], duration=0.5, debug=False) -> bool:
+    (x1, y1) = start_xy; (x2, y2) = end_xy
+    if debug: step(f"[DRAG][coords] ({x1},{y1}) -> ({x2},{y2}) dur={duration}")
+    swipe((int(x1), int(y1)), (int(x2), int(y2)), duration=duration)
+    time.sleep(0.2)
+    return True
+
+# ---------- 메인: 한 번 스크롤(선택된 방식 순차 시도) ----------
+def scroll_once(
+    *,
+    # 대상 컨테이너(있으면 전달)
+    scroll_view=None,
+    # 공통 파라미터
+    direction="down", step_ratio=0.65, duration=0.5,
+    # 방식 선택/순서: ["poco","global","adb","image","coord"] 중에서 조합
+    methods_order: List[str] = ("poco","global","adb","image","coord"),
+    # 이미지 앵커 옵션
+    anchor_key: str = "default", anchor_img: Optional[str] = None,
+    # 좌표 드래그 옵션
+    coord_start: Optional[Tuple[int,int]] = None, coord_end: Optional[Tuple[int,int]] = None,
+    debug=False
+) -> bool:
+
+    for m in methods_order:
+        try:
+            if m == "poco" and scroll_view is not None:
+                if scroll_poco_container(scroll_view=scroll_view, direction=direction,
+                                         step_ratio=step_ratio, duration=duration, debug=debug):
+                    return True
+            elif m == "global":
+                if scroll_global(direction=direction, step_ratio=step_ratio, duration=duration, debug=debug):
+                    return True
+            elif m == "adb":
+                if scroll_adb(direction=direction, step_ratio=step_ratio, duration=duration, debug=debug):
+                    return True
+            elif m == "image":
+                if drag_with_image_anchor(anchor_key=anchor_key, anchor_img=anchor_img,
+                                          direction=direction, step_ratio=step_ratio, duration=duration, debug=debug):
+                    return True
+            elif m == "coord" and coord_start and coord_end:
+                if drag_by_coords(start_xy=coord_start, end_xy=coord_end, duration=duration, debug=debug):
+                    return True
+        except Exception as e:
+            step(f"[SCROLL][{m}] err: {e}")
+    step("[SCROLL] all methods tried in one cycle")
+    return False
+
+# ---------- 요소가 보일 때까지 스크롤 ----------
+def scroll_until_visible(
+    *, target_element,
+    scroll_view=None,
+    max_cycles=12,
+    direction="down", step_ratio=0.65, duration=0.5,
+    methods_order: List[str] = ("poco","global","adb","image","coord"),
+    anchor_key: str = "default", anchor_img: Optional[str] = None,
+    coord_start: Optional[Tuple[int,int]] = None, coord_end: Optional[Tuple[int,int]] = None,
+    snap_fail=True,
+    no_move_limit: int = 2,     # ✅ 스크롤 후 화면 이동 0 연속 횟수 → 끝 도달로 보고 중단(0 = 끔)
+    debug=False
+) -> bool:
+
+    if debug: step(f"[SCROLL] until visible: dir={direction}, cycles={max_cycles}, methods={methods_order}")
+    fd = FrameDiff() if no_move_limit and int(no_move_limit) > 0 else None
+    if fd is not None:
+        fd.update(grab_frame(), motion=False)
+    no_move = 0
+    for i in range(1, max_cycles + 1):
+        if is_visible(target_element):
+            step(f"[SCROLL] ✅ visible at cycle {i}")
+            return True
+        if debug: step(f"[SCROLL] cycle {i}")
+        ok = scroll_once(
+            scroll_view=scroll_view, direction=direction, step_ratio=step_ratio, duration=duration,
+            methods_order=methods_order, anchor_key=anchor_key, anchor_img=anchor_img,
+            coord_start=coord_start, coord_end=coord_end, debug=debug
+        )
+        if not ok:
+            # 가로막는 키보드/오버레이 대비: 간헐적 BACK
+            if i in (3, 6, 9):
+                try: shell("input keyevent 4")  # BACK
+                except: pass
+            time.sleep(0.4)
+            if fd is not None:
+                fd.reset()
+                fd.update(grab_frame(), motion=False)
+            continue
+
+        # ✅ 이동량 측정: 이동 0이 연속되면 리스트 끝 → 남은 cycle 생략
+        if fd is not None:
+            d = fd.update(grab_frame(fresh=True))
+            if d is not None:
+                if debug: step(f"[SCROLL] cycle {i} moved dx={d.dx:.0f}px dy={d.dy:.0f}px {d!r}")
+                if d.is_static():
+                    no_move += 1
+                    if no_move >= int(no_move_limit) and not is_visible(target_element):
+                        step(f"[SCROLL] 이동 없음 {no_move}회 연속 → 끝 도달로 판단(cycle {i})")
+                        break
+                else:
+                    no_move = 0
+    if snap_fail:
+        try:
+            step(f"[SCROLL] ❌ target not visible: {get_label(target_element)}", True)
+        except: 
+            pass
+    step("[SCROLL] ❌ not found")
+    return False
+
+# ---------- 요소 근처 탭 (요소 밖) ----------
+def click_near_element(
+    el,
+    *,
+    position: str = "top",        # "top" / "bottom" / "left" / "right" / "center"
+    offset_ratio: float = 0.1,    # 화면 높이/폭 대비 이동 비율
+    margin_ratio: float = 0.02,   # 화면 경계와의 최소 여백 비율
+) -> bool:
+    """
+    대상 요소 기준 주변 영역을 탭한다.
+
+    position:
+      - "top"    : 요소 위쪽 바깥
+      - "bottom" : 요소 아래쪽 바깥
+      - "left"   : 요소 왼쪽 바깥
+      - "right"  : 요소 오른쪽 바깥
+      - "center" : 요소 중심 (요소 안)
+
+    offset_ratio:
+      - "바깥" 방향으로 얼마나 떨어질지 (화면 비율 기준, 기본 4%)
+
+    margin_ratio:
+      - 화면 가장자리로 너무 붙지 않도록 최소 여백 (기본 2%)
+    """
+    try:
+        # 1) 요소의 중심/크기 정보 (0~1)
+        x, y = el.get_position()
+        w, h = el.get_size()
+
+        if not (isinstance(x, (int, float)) and isinstance(y, (int, float))):
+            step("[CLICK] click_near: invalid position")
+            return False
+
+        w = float(w or 0.0)
+        h = float(h or 0.0)
+
+        # 2) 요소의 bounding box (0~1)
+        x1, y1 = x - w / 2.0, y - h / 2.0  # left, top
+        x2, y2 = x + w / 2.0, y + h / 2.0  # right, bottom
+
+        # 3) 기본 탭 위치를 "요소 중심"으로 세팅
+        tap_x_ratio = x
+        tap_y_ratio = y
+
+        # 4) position에 따라 탭 위치 조정
+        pos = position.lower()
+
+        if pos == "top":
+            # 요소의 top보다 위쪽으로 offset_ratio 만큼 이동
+            target_y = (y1 - offset_ratio)
+            tap_y_ratio = target_y
+            tap_x_ratio = x
+
+        elif pos == "bottom":
+            # 요소의 bottom보다 아래쪽으로 offset_ratio 만큼 이동
+            target_y = (y2 + offset_ratio)
+            tap_y_ratio = target_y
+            tap_x_ratio = x
+
+        elif pos == "left":
+            # 요소의 left보다 왼쪽으로 offset_ratio 만큼 이동
+            target_x = (x1 - offset_ratio)
+            tap_x_ratio = target_x
+            tap_y_ratio = y
+
+        elif pos == "right":
+            # 요소의 right보다 오른쪽으로 offset_ratio 만큼 이동
+            target_x = (x2 + offset_ratio)
+            tap_x_ratio = target_x
+            tap_y_ratio = y
+
+        elif pos == "center":
+            # 그냥 요소 중앙 클릭용 (요소 안)
+            tap_x_ratio = x
+            tap_y_ratio = y
+
+        else:
+            # 알 수 없는 값이면 그냥 요소 중심을 탭하고 경고만 남김
+            step(f"[CLICK] click_near: unknown position={position}, fallback center")
+            tap_x_ratio = x
+            tap_y_ratio = y
+
+        # 5) 화면 경계 안으로 클램프 (margin_ratio 적용)
+        min_r = margin_ratio
+        max_r = 1.0 - margin_ratio
+
+        tap_x_ratio = min(max(tap_x_ratio, min_r), max_r)
+        tap_y_ratio = min(max(tap_y_ratio, min_r), max_r)
+
+        # 6) 비율 → 절대 해상도 좌표 변환
+        W, H = _get_resolution()  # 기존 스크롤 유틸에서 사용하던 해상도 헬퍼
+
+        tap_x = max(1, min(int(W * tap_x_ratio), W - 1))
+        tap_y = max(1, min(int(H * tap_y_ratio), H - 1))
+
+        # 7) 실제 탭 수행 (요소 밖 절대 좌표)
+        shell(f"input tap {tap_x} {tap_y}")
+        step(f"[CLICK] near ({position}) @{tap_x},{tap_y}")
+        return True
+
+    except Exception as e:
+        step(f"[CLICK] click_near err: {e}")
+        return False
+
+
+# ---------- 발견 후 클릭 (try 버전) ----------
+def try_find_click(
+    *, target_element,
+    scroll_view=None, max_cycles=20,
+    direction="down", step_ratio=0.65, duration=0.5,
+    methods_order: List[str] = ("poco", "global", "adb", "image", "coord"),
+    anchor_key: str = "default", anchor_img: Optional[str] = None,
+    coord_start: Optional[Tuple[int, int]] = None, coord_end: Optional[Tuple[int, int]] = None,
+    wait_after_click=0.5,
+    click_position: str = "element",  # "element" / "top" / "bottom" / "left" / "right"
+    offset_ratio: float = 0.1,        # 화면 높이/폭 대비 이동 비율(0.1=10%)
+    desc: str = "",
+    debug=False
+) -> bool:
+    """
+    시도형 스크롤+클릭:
+      - 실패 시 False만 리턴하고 예외는 발생시키지 않는다.
+      - 기존 find_and_click 의 동작과 동일.
+    """
+    ok = scroll_until_visible(
+        target_element=target_element, scroll_view=scroll_view,
+        max_cycles=max_cycles, direction=direction, step_ratio=step_ratio, duration=duration,
+        methods_order=methods_order, anchor_key=anchor_key, anchor_img=anchor_img,
+        coord_start=coord_start, coord_end=coord_end, debug=debug
+    )
+    if not ok:
+        return False
+    # 오프스크린 가드
+    if not is_visible(target_element):
+        step("[CLICK] abort: offscreen")
+        return False
+    try:
+        if click_position == "element":
+            # 기존처럼 요소 중앙 클릭
+            target_element.click([0.5, 0.5])
+        else:
+            # 요소 밖 특정 방향 클릭
+            click_near_element(
+                target_element,
+                position=click_position,   # "top" / "bottom" / "left" / "right"
+                offset_ratio=offset_ratio,
+            )
+        if desc:
+            step(f"{desc}: PASS ✅ (CLICK ok: {get_label(target_element)})")
+        else:
+            step(f"[CLICK] ok: {get_label(target_element)}")
+        time.sleep(wait_after_click)
+        return True
+    except Exception as e:
+        step(f"[CLICK] err: {e}")
+        return False
+
+
+# ---------- 발견 후 클릭 (must 버전) ----------
+def must_find_click(
+    *, target_element,
+    scroll_view=None, max_cycles=12,
+    direction="down", step_ratio=0.65, duration=0.5,
+    methods_order: List[str] = ("poco", "global", "adb", "image", "coord"),
+    anchor_key: str = "default", anchor_img: Optional[str] = None,
+    coord_start: Optional[Tuple[int, int]] = None, coord_end: Optional[Tuple[int, int]] = None,
+    wait_after_click=0.5,
+    click_position: str = "element",  # "element" / "top" / "bottom" / "left" / "right"
+    offset_ratio: float = 0.1,        # 화면 높이/폭 대비 이동 비율(0.04=4%)
+    desc: str = "",
+    debug=False
+) -> bool:
+    """
+    필수 스크롤+클릭:
+      - 실패 시 RuntimeError 예외 발생.
+    """
+
+    ok = try_find_click(
+        target_element=target_element,
+        scroll_view=scroll_view, max_cycles=max_cycles,
+        direction=direction, step_ratio=step_ratio, duration=duration,
+        methods_order=methods_order, anchor_key=anchor_key, anchor_img=anchor_img,
+        coord_start=coord_start, coord_end=coord_end,
+        wait_after_click=wait_after_click,
+        click_position=click_position,           # ⬅ 추가
+        offset_ratio=offset_ratio,             # ⬅ 추가
+        desc=desc,
+        debug=debug
+    )
+    if not ok:
+        name = get_label(target_element)
+        msg = f"[CLICK] find_and_click: FAIL ❌ ({name})"
+        soft_fail(msg)
+        raise
+    return True
+
+# 🔁 하위호환: 기존 이름 유지 (기존 의미는 'try' 로 간주)
+def find_and_click(
+    *, target_element,
+    scroll_view=None, max_cycles=12,
+    direction="down", step_ratio=0.65, duration=0.5,
+    methods_order: List[str] = ("poco", "global", "adb", "image", "coord"),
+    anchor_key: str = "default", anchor_img: Optional[str] = None,
+    coord_start: Optional[Tuple[int, int]] = None, coord_end: Optional[Tuple[int, int]] = None,
+    wait_after_click=0.5,
+    click_position: str = "element",  # "element" / "top" / "bottom" / "left" / "right"
+    offset_ratio: float = 0.1,        # 화면 높이/폭 대비 이동 비율(0.04=4%)
+    desc: str = "",
+    debug=False
+) -> bool:
+    """
+    하위호환용 래퍼:
+      - 기존 스크립트의 find_and_click 호출은 모두 try_find_click 과 동일하게 동작.
+    """
+
+    return try_find_click(
+        target_element=target_element,
+        scroll_view=scroll_view, max_cycles=max_cycles,
+        direction=direction, step_ratio=step_ratio, duration=duration,
+        methods_order=methods_order, anchor_key=anchor_key, anchor_img=anchor_img,
+        coord_start=coord_start, coord_end=coord_end,
+        wait_after_click=wait_after_click,
+        click_position=click_position,           # ⬅ 추가
+        offset_ratio=offset_ratio,             # ⬅ 추가
+        desc=desc,
+        debug=debug
+    )
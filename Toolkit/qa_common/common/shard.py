@@ -0,0 +1,311 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 플로우 샤딩 (단말 간 작업 분배/work stealing, 결과 병합)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - 부모(qa_orchestrator) 전용: 표준 라이브러리만 사용 (airtest/poco 미의존)
+#   - estimator 지정 시 소요시간 이력 기반 LPT 분배(history.balance_shards) + 예상 잔여시간 기준 stealing
+#   - 워커 측 실행 루프는 flows.run_flows (QA_SHARD=1) 참고
+# ==========================================================
+import os, json, time, threading
+from collections import deque
+from typing import Optional, Dict, List, Any, Tuple, Callable
+from .history import DEFAULT_SEC, balance_shards
+
+_PRECEDENCE = ["FAIL", "WARN", "PASS", "N/A", "SKIP"]
+
+
+class ShardQueue:
+    """
+    (iter, flow) 작업 큐.
+      - init(): 첫 워커가 보낸 플로우 목록/반복 횟수로 작업 생성 → 단말별 deque에 배정
+          (estimator 있으면 LPT 균형 분배 + 긴 작업 우선, 없으면 라운드로빈)
+      - next(): 자기 deque 앞에서 꺼내고, 비었으면 예상 잔여시간이 가장 큰 deque 뒤에서 훔쳐 옴(work stealing)
+      - requeue(): 단말 끊김 등으로 미완료된 진행 중 작업을 되돌림
+    """
+
+    def __init__(self, workers: List[str],
+                 estimator: Optional[Callable[[str, List[str]], Dict[str, float]]] = None):
+        self.workers = list(workers)
+        self.estimator = estimator
+        self.estimates: Dict[str, float] = {}
+        self.suite = ""
+        self._dq: Dict[str, deque] = {w: deque() for w in self.workers}
+        self._lock = threading.Lock()
+        self.flows: Optional[List[str]] = None
+        self.repeat = 0
+        self.inflight: Dict[str, Dict[str, Any]] = {}
+        self.results: List[Dict[str, Any]] = []
+        self.steals = 0
+        self.aborted = False
+
+    def init(self, flows: List[str], repeat: int, suite: str = "") -> bool:
+        with self._lock:
+            if self.flows is not None:
+                return False  # 이미 초기화됨(다른 워커/재시작)
+            self.flows = [str(f) for f in flows]
+            self.repeat = max(1, int(repeat or 1))
+            self.suite = suite or ""
+            tasks = [(i, f) for i in range(1, self.repeat + 1) for f in self.flows]
+            if self.estimator is not None:
+                try:
+                    self.estimates = dict(self.estimator(self.suite, self.flows) or {})
+                except Exception:
+                    self.estimates = {}
+            if self.estimates:
+                for w, ts in balance_shards(tasks, self.workers, self.estimates).items():
+                    self._dq[w].extend(ts)
+            else:
+                for k, t in enumerate(tasks):
+                    self._dq[self.workers[k % len(self.workers)]].append(t)
+            return True
+
+    def _est(self, task: Tuple[int, str]) -> float:
+        return float(self.estimates.get(task[1], DEFAULT_SEC)) if self.estimates else 1.0
+
+    def _record_done(self, worker: str, done: Optional[Dict[str, Any]]):
+        cur = self.inflight.pop(worker, None)
+        if not done or cur is None:
+            return
+        self.results.append({
+            "iter": int(done.get("iter", cur["iter"])),
+            "flow": str(done.get("flow", cur["flow"])),
+            "device": worker,
+            "ok": bool(done.get("ok")),
+            "sec": float(done.get("sec") or 0.0),
+            "error": str(done.get("error") or ""),
+            "stolen": bool(cur.get("stolen")),
+        })
+
+    def next(self, worker: str, done: Optional[Dict[str, Any]] = None,
+             abort: bool = False) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            self._record_done(worker, done)
+            if abort:
+                self.aborted = True
+            if self.aborted or self.flows is None:
+                return None
+
+            own = self._dq.setdefault(worker, deque())
+            stolen = False
+            if own:
+                task = own.popleft()
+            else:
+                victim = max(self._dq, key=lambda w: sum(self._est(t) for t in self._dq[w]))
+                if not self._dq[victim]:
+                    return None
+                task = self._dq[victim].pop()
+                stolen = True
+                self.steals += 1
+
+            self.inflight[worker] = {"iter": task[0], "flow": task[1], "t0": time.time(), "stolen": stolen}
+            return task
+
+    def requeue(self, worker: str) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            cur = self.inflight.pop(worker, None)
+            if cur is None:
+                return None
+            task = (cur["iter"], cur["flow"])
+            self._dq.setdefault(worker, deque()).appendleft(task)
+            return task
+
+    def fail_inflight(self, worker: str, error: str):
+        """워커가 작업 보고 없이 비정상 종료 → 진행 중 작업을 실패로 기록"""
+        with self._lock:
+            cur = self.inflight.get(worker)
+            if cur is not None:
+                self._record_done(worker, {"iter": cur["iter"], "flow": cur["flow"], "ok": False,
+                                           "sec": time.time() - cur["t0"], "error": error})
+
+    def eta_sec(self) -> float:
+        """남은 작업 기준 예상 완료 시간(초): 단말별 잔여 합계의 최대값"""
+        with self._lock:
+            return max((sum(self._est(t) for t in dq) for dq in self._dq.values()), default=0.0)
+
+    def remaining(self) -> List[Tuple[int, str]]:
+        with self._lock:
+            return [t for dq in self._dq.values() for t in dq]
+
+
+def _pick_overall(counts: Dict[str, int]) -> str:
+    for k in _PRECEDENCE[:3]:
+        if int(counts.get(k, 0)) > 0:
+            return k
+    return "N/A" if int(counts.get("N/A", 0)) > 0 else "SKIP"
+
+
+def _esc(s) -> str:
+    s = "" if s is None else str(s)
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def merge_run_summaries(run_dirs: List[str], out_dir: str, *,
+                        run_id: Optional[str] = None,
+                        tasks: Optional[List[Dict[str, Any]]] = None,
+                        unassigned: Optional[List[Tuple[int, str]]] = None,
+                        duration_sec: Optional[int] = None) -> Tuple[str, str]:
+    """
+    단말별 Run(meta.json) 여러 개 → 통합 meta.json + summary.html (out_dir).
+    return: (meta_path, summary_path)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    metas = []
+    for d in run_dirs:
+        try:
+            with open(os.path.join(d, "meta.json"), "r", encoding="utf-8") as f:
+                m = json.load(f)
+            m["_run_dir"] = d
+            metas.append(m)
+        except Exception:
+            continue
+
+    counts = {"PASS": 0, "FAIL": 0, "WARN": 0, "N/A": 0, "SKIP": 0}
+    key_map = {"pass": "PASS", "fail": "FAIL", "warn": "WARN", "na": "N/A", "skip": "SKIP"}
+    devices, failures, warnings, notes = [], [], [], []
+    for m in metas:
+        serial = (m.get("device") or {}).get("serial", "")
+        for k, v in (m.get("counts") or {}).items():
+            if k in key_map:
+                counts[key_map[k]] += int(v or 0)
+        devices.append({
+            "serial": serial,
+            "model": (m.get("device") or {}).get("model", ""),
+            "run_id": m.get("run_id", ""),
+            "result": m.get("result", ""),
+            "duration_sec": m.get("duration_sec", 0),
+            "counts": m.get("counts", {}),
+            "summary": os.path.relpath(os.path.join(m["_run_dir"], "summary.html"), out_dir).replace("\\", "/"),
+        })
+        failures += [dict(x, device=serial) for x in (m.get("failures") or [])]
+        warnings += [dict(x, device=serial) for x in (m.get("warnings") or [])]
+        notes += [f"[{serial}] {x}" for x in (m.get("notes") or [])]
+
+    tasks = list(tasks or [])
+    # 작업 단위 실패가 step 카운트에 안 잡힌 경우(워커 비정상 종료 등)도 FAIL 반영
+    if any(not t.get("ok") for t in tasks) and counts["FAIL"] == 0:
+        counts["FAIL"] = sum(1 for t in tasks if not t.get("ok"))
+    result = _pick_overall(counts)
+    if unassigned:
+        result = "FAIL"
+        notes.append(f"[SHARD] 미실행 작업 {len(unassigned)}건: "
+                     + ", ".join(f"{f}#{i}" for i, f in unassigned))
+
+    starts = sorted(m.get("started_at", "") for m in metas if m.get("started_at"))
+    ends = sorted(m.get("ended_at", "") for m in metas if m.get("ended_at"))
+    first = metas[0] if metas else {}
+    meta = {
+        "schema_version": "1.0",
+        "run_id": run_id or time.strftime("shard_%y%m%d_%H%M%S"),
+        "suite": first.get("suite", ""),
+        "runner": "orchestrator_shard",
+        "started_at": starts[0] if starts else "",
+        "ended_at": ends[-1] if ends else "",
+        "duration_sec": int(duration_sec if duration_sec is not None else 0),
+        "result": result,
+        "app": first.get("app", {}),
+        "counts": {"pass": counts["PASS"], "fail": counts["FAIL"], "warn": counts["WARN"],
+                   "na": counts["N/A"], "skip": counts["SKIP"]},
+        "devices": devices,
+        "tasks": tasks,
+        "unassigned": [{"iter": i, "flow": f} for i, f in (unassigned or [])],
+        "notes": notes,
+        "warnings": warnings,
+        "failures": failures,
+    }
+    meta_path = os.path.join(out_dir, "meta.json")
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    summary_path = os.path.join(out_dir, "summary.html")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(_merged_html(meta))
+    return meta_path, summary_path
+
+
+def _merged_html(meta: Dict[str, Any]) -> str:
+    badge = {"PASS": "badge ok", "FAIL": "badge bad", "WARN": "badge warn", "N/A": "badge na", "SKIP": "badge skip"}
+    c = meta["counts"]
+
+    dev_rows = "".join(
+        f"<tr><td>{_esc(d['serial'])}</td><td>{_esc(d['model'])}</td>"
+        f"<td><span class='{badge.get(str(d['result']).upper(), 'badge')}'>{_esc(d['result'])}</span></td>"
+        f"<td>{_esc((d.get('counts') or {}).get('pass', 0))} / {_esc((d.get('counts') or {}).get('fail', 0))}"
+        f" / {_esc((d.get('counts') or {}).get('warn', 0))}</td>"
+        f"<td>{_esc(d['duration_sec'])}s</td><td><a href='{_esc(d['summary'])}'>{_esc(d['run_id'])}</a></td></tr>"
+        for d in meta["devices"]
+    ) or "<tr><td colspan='6' class='muted'>(단말 Run 없음)</td></tr>"
+
+    task_rows = "".join(
+        f"<tr><td>{_esc(t['iter'])}</td><td>{_esc(t['flow'])}</td><td>{_esc(t['device'])}"
+        f"{' 🔀' if t.get('stolen') else ''}</td>"
+        f"<td><span class='{'badge ok' if t['ok'] else 'badge bad'}'>{'PASS' if t['ok'] else 'FAIL'}</span></td>"
+        f"<td>{t['sec']:.1f}s</td><td><code>{_esc(t.get('error', ''))}</code></td></tr>"
+        for t in sorted(meta["tasks"], key=lambda t: (t["iter"], t["flow"]))
+    ) or "<tr><td colspan='6' class='muted'>(작업 기록 없음)</td></tr>"
+
+    fail_rows = "".join(
+        f"<tr><td>{_esc(x.get('device'))}</td><td>{_esc(x.get('iter'))}</td><td>{_esc(x.get('name'))}</td>"
+        f"<td><code>{_esc(x.get('error'))}</code></td></tr>"
+        for x in meta["failures"]
+    )
+    failures_html = (f"<table><tr><th>Device</th><th>Iter</th><th>Flow</th><th>Error</th></tr>{fail_rows}</table>"
+                     if fail_rows else "<div class='muted'>(실패 없음)</div>")
+    notes_html = ("<ul>" + "".join(f"<li>{_esc(n)}</li>" for n in meta["notes"]) + "</ul>"
+                  if meta["notes"] else "<div class='muted'>(노트 없음)</div>")
+
+    return f"""<!doctype html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>QA Shard Run Summary</title>
+<style>
+  body {{ font-family: Segoe UI, Arial, sans-serif; margin: 24px; }}
+  h1 {{ margin: 0 0 8px 0; font-size: 22px; }}
+  h2 {{ margin-top: 18px; font-size: 16px; }}
+  .small {{ color:#666; font-size: 12px; margin-top: 2px; }}
+  table {{ border-collapse: collapse; width: 100%; margin-top: 10px; }}
+  td, th {{ border: 1px solid #ddd; padding: 8px; font-size: 13px; }}
+  th {{ background: #f6f6f6; text-align:left; }}
+  .muted {{ color:#888; font-size: 13px; }}
+  code {{ white-space: pre-wrap; }}
+  .badge {{ display:inline-block; padding:4px 10px; border-radius: 999px; background:#eee; font-weight: 600; }}
+  .badge.ok   {{ background:#e8f5e9; color:#1b5e20; }}
+  .badge.bad  {{ background:#ffebee; color:#b71c1c; }}
+  .badge.warn {{ background:#fff8e1; color:#e65100; }}
+  .badge.na   {{ background:#eef2f7; color:#37474f; }}
+  .badge.skip {{ background:#f3e5f5; color:#4a148c; }}
+  .pill {{ display:inline-block; padding:2px 8px; border-radius: 999px; border:1px solid #ddd; font-size:12px; color:#555; background:#fafafa; }}
+</style>
+</head>
+<body>
+  <h1>🧾 QA Shard Run Summary <span class="pill">{_esc(meta['suite'])}</span> <span class="pill">{len(meta['devices'])} devices</span></h1>
+  <div class="small">Run ID: <b>{_esc(meta['run_id'])}</b></div>
+  <div class="small">Result: <span class="{badge.get(meta['result'], 'badge')}">{_esc(meta['result'])}</span></div>
+  <div class="small">Started: {_esc(meta['started_at'])} / Ended: {_esc(meta['ended_at'])} / Duration: {_esc(meta['duration_sec'])}s</div>
+
+  <h2>📊 집계</h2>
+  <table>
+    <tr><th>✅ PASS</th><th>❌ FAIL</th><th>⚠️ WARN</th><th>➖ N/A</th><th>⏭️ SKIP</th></tr>
+    <tr><td>{c['pass']}</td><td>{c['fail']}</td><td>{c['warn']}</td><td>{c['na']}</td><td>{c['skip']}</td></tr>
+  </table>
+
+  <h2>📱 단말별 Run</h2>
+  <table>
+    <tr><th>Serial</th><th>Model</th><th>Result</th><th>PASS / FAIL / WARN</th><th>Duration</th><th>Summary</th></tr>
+    {dev_rows}
+  </table>
+
+  <h2>🧩 작업 분배 (🔀 = work stealing)</h2>
+  <table>
+    <tr><th>Iter</th><th>Flow</th><th>Device</th><th>Result</th><th>Time</th><th>Error</th></tr>
+    {task_rows}
+  </table>
+
+  <h2>❌ Failures</h2>
+  {failures_html}
+
+  <h2>📝 Notes</h2>
+  {notes_html}
+</body>
+</html>"""
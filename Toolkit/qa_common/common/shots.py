@@ -0,0 +1,224 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - Airtest 스크린샷 후처리 (중복 제거 / 재인코딩 / 썸네일 / log.txt 참조 갱신)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - Run 종료 후 포터블 리포트 생성 전에 airtest_log에 1회 적용 (run_flows, QA_SHOT_COMPACT=0이면 생략)
+#   - 연속/최근 프레임과 pHash 거리 + 64x64 평균 차이가 작으면 같은 화면으로 보고 1장만 유지
+#   - 유지 프레임은 WebP/JPEG 재인코딩(QA_SHOT_FORMAT/QA_SHOT_QUALITY, 선택적으로 QA_SHOT_MAX_SIDE 축소)
+#   - 리포트용 썸네일 <name>_small.<ext> 미리 생성 (Airtest report가 원본 해상도로 만들지 않도록)
+#   - 순서: 새 파일 기록 → log.txt 참조 치환(원자적 교체) → 원본/중복 삭제 (중간 실패 시 참조 깨짐 방지)
+#   - 단독 실행: python -m common.shots <airtest_log 폴더> [--format webp --quality 60]
+# ==========================================================
+import os, re, sys, json, time, argparse
+import cv2
+import numpy as np
+from typing import Optional, Dict, List, Any
+from .core import QAEnv, _env_int, step, use_env
+from .vision import _hamming64, _phash_64
+
+_IMG_EXT = (".jpg", ".jpeg", ".png", ".webp")
+_RECENT = 8             # 중복 비교 대상(최근 유지 프레임 수)
+_TINY_MAD = 2.0         # 64x64 그레이 평균 절대차 허용치 (pHash 충돌로 다른 화면이 합쳐지는 것 방지)
+
+
+def _imread(path: str) -> Optional[np.ndarray]:
+    # cv2.imread는 Windows 한글 경로를 못 읽음 → fromfile + imdecode
+    try:
+        return cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+    except Exception:
+        return None
+
+
+def _encode(img: np.ndarray, fmt: str, quality: int) -> bytes:
+    if fmt == "webp":
+        ok, buf = cv2.imencode(".webp", img, [cv2.IMWRITE_WEBP_QUALITY, int(quality)])
+    elif fmt == "png":
+        ok, buf = cv2.imencode(".png", img, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+    else:
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, int(quality), cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+    if not ok:
+        raise RuntimeError(f"이미지 인코딩 실패: {fmt}")
+    return buf.tobytes()
+
+
+def _fit(img: np.ndarray, side: int) -> np.ndarray:
+    h, w = img.shape[:2]
+    if side <= 0 or max(h, w) <= side:
+        return img
+    r = side / float(max(h, w))
+    return cv2.resize(img, (max(1, int(w * r)), max(1, int(h * r))), interpolation=cv2.INTER_AREA)
+
+
+def _shot_files(log_dir: str) -> List[str]:
+    names = [n for n in os.listdir(log_dir)
+             if n.lower().endswith(_IMG_EXT) and not os.path.splitext(n)[0].endswith("_small")]
+
+    # Airtest 스크린샷 파일명 = 타임스탬프(ms) → 숫자 순서 = 촬영 순서
+    def _key(n: str):
+        stem = os.path.splitext(n)[0]
+        return (0, int(stem), n) if stem.isdigit() else (1, 0, n)
+    return sorted(names, key=_key)
+
+
+def _rewrite_log(log_txt: str, rename: Dict[str, str]) -> int:
+    """log.txt(JSON lines) 안의 스크린샷 파일명 참조 치환 → 변경 라인 수"""
+    if not os.path.exists(log_txt):
+        return 0
+    changed = 0
+
+    def _sub(v: Any) -> Any:
+        if isinstance(v, str):
+            base = re.split(r"[\\/]", v)[-1]
+            new = rename.get(base)
+            return v[:len(v) - len(base)] + new if new and new != base else v
+        if isinstance(v, list):
+            return [_sub(x) for x in v]
+        if isinstance(v, dict):
+            return {k: _sub(x) for k, x in v.items()}
+        return v
+
+    out = []
+    with open(log_txt, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            s = line.rstrip("\n")
+            try:
+                obj = json.loads(s)
+            except ValueError:
+                out.append(s)
+                continue
+            new = _sub(obj)
+            if new != obj:
+                changed += 1
+                out.append(json.dumps(new))
+            else:
+                out.append(s)
+    tmp = log_txt + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(out) + "\n")
+    os.replace(tmp, log_txt)
+    return changed
+
+
+def compact_airtest_log(log_dir: str, *, fmt: Optional[str] = None, quality: Optional[int] = None,
+                        max_side: Optional[int] = None, thumb_side: Optional[int] = None,
+                        dedup_dist: Optional[int] = None, env: Optional['QAEnv'] = None) -> Dict[str, Any]:
+    """
+    airtest_log 스크린샷 압축/중복 제거 (제자리 처리).
+    - fmt: webp | jpg | png (기본 QA_SHOT_FORMAT 또는 webp)
+    - quality: 기본 QA_SHOT_QUALITY 또는 60
+    - max_side: 원본 긴 변 제한(0=원본 해상도, 기본 QA_SHOT_MAX_SIDE 또는 0)
+    - thumb_side: 썸네일 긴 변(기본 QA_SHOT_THUMB 또는 240, 0=생성 안 함)
+    - dedup_dist: pHash 해밍 거리 허용치(기본 QA_SHOT_DEDUP_DIST 또는 3, -1=중복 제거 안 함)
+    반환: {files, kept, dedup, bytes_before, bytes_after, log_lines, sec}
+    """
+    env = use_env(env)
+    t0 = time.time()
+    fmt = (fmt or os.environ.get("QA_SHOT_FORMAT") or "webp").lower().lstrip(".")
+    fmt = "jpg" if fmt == "jpeg" else fmt
+    quality = quality or _env_int("QA_SHOT_QUALITY", 60)
+    max_side = _env_int("QA_SHOT_MAX_SIDE", 0) if max_side is None else max_side
+    thumb_side = _env_int("QA_SHOT_THUMB", 240) if thumb_side is None else thumb_side
+    dedup_dist = _env_int("QA_SHOT_DEDUP_DIST", 3) if dedup_dist is None else dedup_dist
+
+    stats = {"files": 0, "kept": 0, "dedup": 0, "bytes_before": 0, "bytes_after": 0, "log_lines": 0, "sec": 0.0}
+    if not log_dir or not os.path.isdir(log_dir):
+        return stats
+
+    rename: Dict[str, str] = {}     # 원본 파일명 → 유지(재인코딩) 파일명
+    remove: List[str] = []          # 3단계에서 지울 원본/중복/기존 썸네일
+    recent: List[Dict[str, Any]] = []
+
+    # 1) 중복 판정 + 새 파일 기록
+    for name in _shot_files(log_dir):
+        src = os.path.join(log_dir, name)
+        img = _imread(src)
+        if img is None:
+            continue
+        size = os.path.getsize(src)
+        stats["files"] += 1
+        stats["bytes_before"] += size
+
+        stem, ext = os.path.splitext(name)
+        old_small = os.path.join(log_dir, f"{stem}_small{ext}")
+        if os.path.exists(old_small):
+            stats["bytes_before"] += os.path.getsize(old_small)
+            remove.append(old_small)
+
+        h = _phash_64(img)
+        tiny = cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), (64, 64), interpolation=cv2.INTER_AREA)
+        dup = None
+        if dedup_dist >= 0:
+            for k in reversed(recent):
+                if k["shape"] == img.shape[:2] and _hamming64(h, k["hash"]) <= dedup_dist \
+                        and float(np.mean(cv2.absdiff(tiny, k["tiny"]))) <= _TINY_MAD:
+                    dup = k
+                    break
+        if dup is not None:
+            rename[name] = dup["name"]
+            remove.append(src)
+            stats["dedup"] += 1
+            continue
+
+        data = _encode(_fit(img, max_side), fmt, quality)
+        new_name = f"{stem}.{fmt}"
+        if len(data) >= size and ext.lower().lstrip(".").replace("jpeg", "jpg") == fmt:
+            new_name = name     # 같은 포맷인데 이득 없음 → 원본 유지
+        else:
+            with open(os.path.join(log_dir, new_name), "wb") as f:
+                f.write(data)
+            if new_name != name:
+                remove.append(src)
+        rename[name] = new_name
+        stats["bytes_after"] += os.path.getsize(os.path.join(log_dir, new_name))
+
+        if thumb_side > 0:
+            n_stem, n_ext = os.path.splitext(new_name)
+            thumb = os.path.join(log_dir, f"{n_stem}_small{n_ext}")
+            with open(thumb, "wb") as f:
+                f.write(_encode(_fit(img, thumb_side), n_ext.lstrip(".").lower(), quality))
+            stats["bytes_after"] += os.path.getsize(thumb)
+            if thumb in remove:
+                remove.remove(thumb)
+
+        recent.append({"name": new_name, "hash": h, "tiny": tiny, "shape": img.shape[:2]})
+        del recent[:-_RECENT]
+        stats["kept"] += 1
+
+    # 2) log.txt 참조 치환 (원자적 교체)
+    stats["log_lines"] = _rewrite_log(os.path.join(log_dir, "log.txt"), rename)
+
+    # 3) 원본/중복 삭제
+    keep = set(rename.values())
+    for p in remove:
+        if os.path.basename(p) in keep:
+            continue
+        try:
+            os.remove(p)
+        except OSError:
+            pass
+
+    stats["sec"] = round(time.time() - t0, 2)
+    ratio = stats["bytes_before"] / max(1, stats["bytes_after"])
+    step(f"[SHOT] 스크린샷 정리: {stats['files']}장 → {stats['kept']}장 (중복 {stats['dedup']}), "
+         f"{stats['bytes_before'] / 1048576:.1f}MB → {stats['bytes_after'] / 1048576:.1f}MB (x{ratio:.1f}), "
+         f"{fmt} q{quality}, {stats['sec']}s", env=env)
+    return stats
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Airtest 로그 스크린샷 중복 제거/재인코딩")
+    ap.add_argument("log_dir")
+    ap.add_argument("--format", default=None, choices=("webp", "jpg", "png"))
+    ap.add_argument("--quality", type=int, default=None)
+    ap.add_argument("--max-side", type=int, default=None)
+    ap.add_argument("--thumb", type=int, default=None)
+    ap.add_argument("--dedup-dist", type=int, default=None)
+    a = ap.parse_args(argv)
+    st = compact_airtest_log(a.log_dir, fmt=a.format, quality=a.quality, max_side=a.max_side,
+                             thumb_side=a.thumb, dedup_dist=a.dedup_dist)
+    print(json.dumps(st, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,671 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 리소스 리포트 다회차 추세 분석 + 앱 버전별 회귀 탐지
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - result/<serial>/** 의 resource_report_*.json(generate_report)과 meta.json(Run)을 열 지향 인덱스(.npz)로 수집
+#     · 저장 위치: <root>/_trend/trend_index.npz (열마다 numpy 배열 1개)
+#     · (경로, mtime, 크기)가 같은 파일은 재파싱하지 않음 → 수천 회차도 갱신 비용은 변경분만
+#   - 리포트 ↔ 앱 버전 결합(벡터 as-of join)
+#     · 같은 폴더의 meta.json 우선 → 없으면 같은 시리얼(+패키지)에서 시간상 겹치거나 직전에 끝난 Run
+#     · 직전 Run 허용 간격: QA_TREND_JOIN_HOURS(기본 12시간)
+#   - (패키지, 시리얼)별 앱 버전 기준선(중앙값/MAD) → 직전 버전 대비 P95 CPU · 최대 PSS · 누수 기울기 회귀 판정
+#     · 단측 Mann-Whitney U(정규 근사, 동순위 보정) p < alpha(QA_TREND_ALPHA, 기본 0.05)
+#       이면서 중앙값 증가가 절대/상대 임계 이상일 때만 회귀 (표본 수 min_n 미만이면 '표본 부족')
+#   - HTML 대시보드(SVG 추세 + 버전 표) 단일 파일 + 요약 JSON 출력
+#   - 표준 라이브러리 + numpy (airtest 의존 없음)
+#   - 단독 실행: python -m common.trend [--root result] [--html out.html] [--fail-on-regression] [--bench 5000]
+# ==========================================================
+import os, sys, json, math, time, html, argparse, datetime, tempfile
+from typing import Optional, Dict, List, Any, Tuple
+
+import numpy as np
+
+_SCHEMA = 1
+_KEY_SCALE = 1e10        # as-of join 합성 키: 그룹코드 * 1e10 + epoch초
+
+# (열 이름, dtype) — 문자열은 유니코드 고정폭 배열로 저장(allow_pickle 불필요)
+_R_COLS: List[Tuple[str, str]] = [
+    ("src", "U"), ("mtime", "f8"), ("size", "i8"), ("dir", "U"),
+    ("serial", "U"), ("package", "U"), ("start", "f8"), ("end", "f8"), ("samples", "i8"),
+    ("cpu_p95", "f8"), ("mem_max", "f8"), ("slope", "f8"), ("verdict", "U"),
+]
+_M_COLS: List[Tuple[str, str]] = [
+    ("src", "U"), ("mtime", "f8"), ("size", "i8"), ("dir", "U"),
+    ("serial", "U"), ("package", "U"), ("model", "U"), ("start", "f8"), ("end", "f8"),
+    ("version", "U"), ("vcode", "i8"), ("run_id", "U"), ("result", "U"),
+]
+
+# (열, 표시명, 단위, 최소 절대 증가량) — 상대 증가 임계는 min_rel 공통
+METRICS: List[Tuple[str, str, str, float]] = [
+    ("cpu_p95", "P95 CPU", "%", 3.0),
+    ("mem_max", "최대 PSS", "KB", 20480.0),
+    ("slope", "누수 기울기", "KB/분", 300.0),
+]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def default_trend_root() -> str:
+    p = (os.environ.get("QA_TREND_ROOT") or "").strip()
+    if p:
+        return os.path.abspath(p)
+    toolkit = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(toolkit, "result")
+
+
+def _store_path(root: str) -> str:
+    return os.path.join(root, "_trend", "trend_index.npz")
+
+
+# ==========================================================
+# 🔹 수집(증분 인덱스)
+# ==========================================================
+def _ts(s: Any) -> float:
+    if not s:
+        return math.nan
+    try:
+        return datetime.datetime.fromisoformat(str(s).strip().replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return math.nan
+
+
+def _num(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _scan(root: str) -> Tuple[List[Tuple[str, float, int]], List[Tuple[str, float, int]]]:
+    """root 이하 재귀 탐색 (_trend 등 '_'로 시작하는 내부 폴더는 제외)"""
+    reports, metas = [], []
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            it = os.scandir(d)
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        if not e.name.startswith("_"):
+                            stack.append(e.path)
+                        continue
+                    name = e.name
+                    if name == "meta.json":
+                        bucket = metas
+                    elif name.startswith("resource_report_") and name.endswith(".json"):
+                        bucket = reports
+                    else:
+                        continue
+                    st = e.stat()
+                    bucket.append((e.path, st.st_mtime, st.st_size))
+                except OSError:
+                    continue
+    return reports, metas
+
+
+def _serial_from_path(root: str, path: str) -> str:
+    rel = os.path.relpath(path, root).split(os.sep)
+    return rel[0] if len(rel) > 1 else ""
+
+
+def _parse_report(root: str, path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            o = json.load(f)
+        rng, meta = o.get("range") or {}, o.get("meta") or {}
+        cpu, mem = o.get("cpu") or {}, o.get("mem") or {}
+        return {
+            "serial": str(meta.get("serial") or _serial_from_path(root, path)),
+            "package": str(meta.get("package") or ""),
+            "start": _ts(rng.get("start")), "end": _ts(rng.get("end")),
+            "samples": int(o.get("samples") or 0),
+            "cpu_p95": _num(cpu.get("p95")), "mem_max": _num(mem.get("max")),
+            "slope": _num(mem.get("slope_kb_per_min")),
+            "verdict": str((o.get("verdict") or {}).get("overall") or ""),
+        }
+    except Exception:
+        return None
+
+
+def _parse_meta(root: str, path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            o = json.load(f)
+        dev, app = o.get("device") or {}, o.get("app") or {}
+        start = _ts(o.get("started_at"))
+        end = _ts(o.get("ended_at"))
+        if math.isnan(end) and not math.isnan(start):
+            end = start + (_num(o.get("duration_sec")) if o.get("duration_sec") else 0.0)
+        try:
+            vcode = int(app.get("version_code") or -1)
+        except (TypeError, ValueError):
+            vcode = -1
+        return {
+            "serial": str(dev.get("serial") or _serial_from_path(root, path)),
+            "package": str(app.get("package") or ""), "model": str(dev.get("model") or ""),
+            "start": start, "end": end,
+            "version": str(app.get("version_name") or ""), "vcode": vcode,
+            "run_id": str(o.get("run_id") or ""), "result": str(o.get("result") or ""),
+        }
+    except Exception:
+        return None
+
+
+def _empty_table(cols: List[Tuple[str, str]]) -> Dict[str, np.ndarray]:
+    return {c: np.array([], dtype=("U1" if t == "U" else t)) for c, t in cols}
+
+
+def _merge_table(root: str, old: Dict[str, np.ndarray], files: List[Tuple[str, float, int]],
+                 cols: List[Tuple[str, str]], parser) -> Tuple[Dict[str, np.ndarray], int]:
+    """변경 없는 행은 기존 배열에서 take, 신규/변경 파일만 파싱해 이어 붙임"""
+    pos = {s: i for i, s in enumerate(old["src"].tolist())}
+    keep, fresh = [], []
+    o_mtime, o_size = old["mtime"], old["size"]
+    for path, mtime, size in files:
+        i = pos.get(path)
+        if i is not None and o_mtime[i] == mtime and o_size[i] == size:
+            keep.append(i)
+            continue
+        row = parser(root, path)
+        if row is not None:
+            row.update(src=path, mtime=mtime, size=size, dir=os.path.dirname(path))
+            fresh.append(row)
+    keep_idx = np.asarray(keep, dtype=np.int64)
+    out = {}
+    for c, t in cols:
+        new = np.array([r[c] for r in fresh], dtype=(str if t == "U" else t))
+        if t == "U" and not len(new):
+            new = new.astype("U1")
+        out[c] = np.concatenate([old[c][keep_idx], new])
+    return out, len(fresh)
+
+
+def _load_store(path: str) -> Optional[Dict[str, Dict[str, np.ndarray]]]:
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            if int(z["_schema"][0]) != _SCHEMA:
+                return None
+            return {"reports": {c: z["r_" + c] for c, _ in _R_COLS},
+                    "runs": {c: z["m_" + c] for c, _ in _M_COLS}}
+    except Exception:
+        return None
+
+
+def _save_store(path: str, idx: Dict[str, Dict[str, np.ndarray]]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    arrays = {"_schema": np.array([_SCHEMA])}
+    arrays.update({"r_" + c: v for c, v in idx["reports"].items()})
+    arrays.update({"m_" + c: v for c, v in idx["runs"].items()})
+    fd, tmp = tempfile.mkstemp(prefix=".trend_", suffix=".npz", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def build_trend_index(root: Optional[str] = None, *, store: Optional[str] = None,
+                      save: bool = True) -> Dict[str, Any]:
+    """
+    root 이하 리포트/메타를 열 지향 인덱스로 갱신해 반환.
+    반환: {"root", "reports": {열: ndarray}, "runs": {열: ndarray}, "parsed": 신규 파싱 수, "sec"}
+    """
+    t0 = time.time()
+    root = os.path.abspath(root or default_trend_root())
+    store = store or _store_path(root)
+    old = _load_store(store) or {"reports": _empty_table(_R_COLS), "runs": _empty_table(_M_COLS)}
+    rep_files, meta_files = _scan(root)
+    reports, n1 = _merge_table(root, old["reports"], rep_files, _R_COLS, _parse_report)
+    runs, n2 = _merge_table(root, old["runs"], meta_files, _M_COLS, _parse_meta)
+    idx = {"reports": reports, "runs": runs}
+    changed = (n1 or n2 or len(reports["src"]) != len(old["reports"]["src"])
+               or len(runs["src"]) != len(old["runs"]["src"]))
+    if save and changed:
+        try:
+            _save_store(store, idx)
+        except Exception as e:
+            print(f"[TREND] 인덱스 저장 실패: {e}", file=sys.stderr)
+    idx.update(root=root, store=store, parsed=n1 + n2, sec=round(time.time() - t0, 3))
+    return idx
+
+
+# ==========================================================
+# 🔹 리포트 ↔ Run(앱 버전) 결합
+# ==========================================================
+def _codes(*arrays: np.ndarray) -> List[np.ndarray]:
+    """여러 문자열 배열을 공통 정수 코드로 변환"""
+    lens = [len(a) for a in arrays]
+    allv = np.concatenate([a.astype(str) for a in arrays]) if arrays else np.array([], dtype=str)
+    _, inv = np.unique(allv, return_inverse=True)
+    return np.split(inv.reshape(-1), np.cumsum(lens)[:-1])
+
+
+def _asof_join(key_r: np.ndarray, r_start: np.ndarray, r_end: np.ndarray,
+               key_m: np.ndarray, m_start: np.ndarray, m_end: np.ndarray, join_sec: float) -> np.ndarray:
+    """같은 키에서 리포트 종료 시각 이전에 시작한 마지막 Run (겹치거나 join_sec 이내에 끝난 것만). 없으면 -1"""
+    out = np.full(len(key_r), -1, dtype=np.int64)
+    ok_m = ~np.isnan(m_start)
+    if not len(key_r) or not ok_m.any():
+        return out
+    mi = np.nonzero(ok_m)[0]
+    comp_m = key_m[mi] * _KEY_SCALE + m_start[mi]
+    order = np.argsort(comp_m, kind="mergesort")
+    comp_m, mi = comp_m[order], mi[order]
+    t_r = np.where(np.isnan(r_end), r_start, r_end)
+    valid_r = ~np.isnan(t_r)
+    comp_r = key_r * _KEY_SCALE + np.where(valid_r, t_r, 0.0)
+    p = np.searchsorted(comp_m, comp_r, side="right") - 1
+    hit = valid_r & (p >= 0)
+    cand = mi[np.clip(p, 0, None)]
+    m_end_c = np.where(np.isnan(m_end[cand]), m_start[cand], m_end[cand])
+    r_start_c = np.where(np.isnan(r_start), t_r, r_start)
+    hit &= (key_m[cand] == key_r) & (r_start_c - m_end_c <= join_sec)
+    out[hit] = cand[hit]
+    return out
+
+
+def join_versions(idx: Dict[str, Any], *, join_hours: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """리포트 행마다 {run(인덱스|-1), package, version, vcode, model} 배열 반환"""
+    r, m = idx["reports"], idx["runs"]
+    n = len(r["src"])
+    join_sec = 3600.0 * (_env_float("QA_TREND_JOIN_HOURS", 12.0) if join_hours is None else join_hours)
+    run = np.full(n, -1, dtype=np.int64)
+    if n and len(m["src"]):
+        # 1) 같은 폴더의 meta.json (use_run=False면 덮어쓰인 meta일 수 있어 시간 조건도 동일 적용)
+        dr, dm = _codes(r["dir"], m["dir"])
+        run[:] = _asof_join(dr, r["start"], r["end"], dm, m["start"], m["end"], join_sec)
+        # 2) 시리얼+패키지 as-of → 3) 패키지 미상 리포트는 시리얼만
+        rest = run < 0
+        if rest.any():
+            kr, km = _codes(np.char.add(np.char.add(r["serial"], "\x1f"), r["package"]),
+                            np.char.add(np.char.add(m["serial"], "\x1f"), m["package"]))
+            j = _asof_join(kr, r["start"], r["end"], km, m["start"], m["end"], join_sec)
+            run[rest] = j[rest]
+        rest = (run < 0) & (r["package"] == "")
+        if rest.any():
+            sr, sm = _codes(r["serial"], m["serial"])
+            j = _asof_join(sr, r["start"], r["end"], sm, m["start"], m["end"], join_sec)
+            run[rest] = j[rest]
+    has = run >= 0
+    take = np.clip(run, 0, None)
+
+    def _pick(col: str, default):
+        if not len(m["src"]):
+            return np.full(n, default)
+        return np.where(has, m[col][take], default)
+
+    pkg = np.where(r["package"] != "", r["package"], _pick("package", ""))
+    return {"run": run, "package": np.asarray(pkg).astype(str),
+            "version": np.asarray(_pick("version", "")).astype(str),
+            "vcode": np.asarray(_pick("vcode", -1)).astype(np.int64),
+            "model": np.asarray(_pick("model", "")).astype(str)}
+
+
+# ==========================================================
+# 🔹 통계
+# ==========================================================
+def _rankdata(a: np.ndarray) -> np.ndarray:
+    """평균 순위(1부터, 동순위 평균)"""
+    order = np.argsort(a, kind="mergesort")
+    _, first, counts = np.unique(a[order], return_index=True, return_counts=True)
+    ranks = np.empty(len(a), dtype=np.float64)
+    ranks[order] = np.repeat(first + (counts + 1) / 2.0, counts)
+    return ranks
+
+
+def mann_whitney_greater(base: np.ndarray, cur: np.ndarray) -> float:
+    """단측 Mann-Whitney U (H1: cur > base) p-value — 정규 근사 + 동순위/연속성 보정"""
+    n1, n2 = len(base), len(cur)
+    if not n1 or not n2:
+        return 1.0
+    allv = np.concatenate([base, cur])
+    u2 = _rankdata(allv)[n1:].sum() - n2 * (n2 + 1) / 2.0
+    n = n1 + n2
+    _, cnt = np.unique(allv, return_counts=True)
+    tie = float((cnt.astype(np.float64) ** 3 - cnt).sum())
+    var = n1 * n2 / 12.0 * ((n + 1) - tie / (n * (n - 1)))
+    if var <= 0:
+        return 1.0
+    z = (u2 - n1 * n2 / 2.0 - 0.5) / math.sqrt(var)
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+def _median_mad(x: np.ndarray) -> Tuple[float, float]:
+    if not len(x):
+        return math.nan, math.nan
+    med = float(np.median(x))
+    return med, float(1.4826 * np.median(np.abs(x - med)))
+
+
+def _finite(x: np.ndarray) -> np.ndarray:
+    return x[np.isfinite(x)]
+
+
+def analyze_trends(idx: Dict[str, Any], *, alpha: Optional[float] = None, min_rel: float = 0.10,
+                   min_n: int = 3, join_hours: Optional[float] = None) -> Dict[str, Any]:
+    """
+    (패키지, 시리얼) 그룹 → 앱 버전(최초 관측 순) 기준선 + 직전 버전 대비 회귀 판정.
+    반환: {"groups": [...], "regressions": [...], "reports", "runs", "matched"}
+    """
+    alpha = _env_float("QA_TREND_ALPHA", 0.05) if alpha is None else alpha
+    r = idx["reports"]
+    n = len(r["src"])
+    j = join_versions(idx, join_hours=join_hours)
+    result: Dict[str, Any] = {"root": idx.get("root"), "reports": n, "runs": len(idx["runs"]["src"]),
+                              "matched": int((j["run"] >= 0).sum()), "alpha": alpha, "min_rel": min_rel,
+                              "min_n": min_n, "groups": [], "regressions": []}
+    if not n:
+        return result
+
+    t = np.where(np.isnan(r["start"]), r["mtime"], r["start"])
+    gkey = np.char.add(np.char.add(j["package"], "\x1f"), r["serial"].astype(str))
+    gu, ginv = np.unique(gkey, return_inverse=True)
+    ver = np.where(j["version"] == "", "(unknown)", j["version"])
+    order = np.lexsort((t, ginv))            # 그룹 → 시간 순
+    bounds = np.searchsorted(ginv[order], np.arange(len(gu) + 1))
+
+    for g in range(len(gu)):
+        rows = order[bounds[g]:bounds[g + 1]]
+        pkg, serial = gu[g].split("\x1f", 1)
+        gv, gt = ver[rows], t[rows]
+        vu, vfirst, vinv = np.unique(gv, return_index=True, return_inverse=True)
+        vorder = np.argsort(vfirst, kind="mergesort")          # 버전 = 최초 관측 순
+        rank = np.empty(len(vu), dtype=np.int64)
+        rank[vorder] = np.arange(len(vu))
+        models = j["model"][rows]
+        group = {"package": pkg, "serial": serial,
+                 "model": next((x for x in models[::-1] if x), ""),
+                 "points": {"t": gt.tolist(), "v": rank[vinv].tolist(),
+                            **{c: [None if not math.isfinite(x) else x for x in r[c][rows].tolist()]
+                               for c, *_ in METRICS}},
+                 "versions": []}
+        prev = None
+        for vi in vorder:
+            sel = rows[vinv == vi]
+            vname = str(vu[vi])
+            codes = j["vcode"][sel]
+            entry = {"version": vname, "vcode": int(codes.max()) if len(codes) else -1, "n": int(len(sel)),
+                     "first": float(t[sel].min()), "last": float(t[sel].max()),
+                     "verdicts": {k: int(v) for k, v in zip(*np.unique(r["verdict"][sel], return_counts=True))},
+                     "median": {}, "mad": {}, "vs_prev": {}}
+            for c, label, unit, min_abs in METRICS:
+                x = _finite(r[c][sel])
+                med, mad = _median_mad(x)
+                entry["median"][c], entry["mad"][c] = med, mad
+                if prev is None or vname == "(unknown)":
+                    continue
+                base = _finite(r[c][prev["_rows"]])
+                bmed = prev["median"][c]
+                cmp = {"base": prev["version"], "n_base": int(len(base)), "n_cur": int(len(x)),
+                       "delta": med - bmed if len(x) and len(base) else None, "rel": None, "p": None}
+                if len(x) < min_n or len(base) < min_n:
+                    cmp["status"] = "insufficient"
+                else:
+                    d = med - bmed
+                    rel = d / abs(bmed) if bmed else math.inf
+                    p_up = mann_whitney_greater(base, x)
+                    p_dn = mann_whitney_greater(-base, -x)
+                    cmp.update(rel=rel if math.isfinite(rel) else None, p=p_up)
+                    if p_up < alpha and d >= min_abs and rel >= min_rel:
+                        cmp["status"] = "regression"
+                        result["regressions"].append({
+                            "package": pkg, "serial": serial, "metric": c, "label": label, "unit": unit,
+                            "base": prev["version"], "version": vname, "base_median": bmed,
+                            "median": med, "delta": d, "rel": cmp["rel"], "p": p_up,
+                            "n_base": len(base), "n_cur": len(x)})
+                    elif p_dn < alpha and -d >= min_abs:
+                        cmp["status"], cmp["p"] = "improved", p_dn
+                    else:
+                        cmp["status"] = "ok"
+                entry["vs_prev"][c] = cmp
+            entry["_rows"] = sel
+            group["versions"].append(entry)
+            if vname != "(unknown)":
+                prev = entry
+        for e in group["versions"]:
+            e.pop("_rows", None)
+        result["groups"].append(group)
+    return result
+
+
+# ==========================================================
+# 🔹 HTML 대시보드
+# ==========================================================
+_PALETTE = ["#4e79a7", "#f28e2b", "#59a14f", "#b07aa1", "#76b7b2", "#edc948", "#9c755f", "#bab0ac"]
+
+
+def _fmt(v: Optional[float], unit: str = "") -> str:
+    if v is None or (isinstance(v, float) and not math.isfinite(v)):
+        return "-"
+    if unit == "KB":
+        return f"{v / 1024:,.1f} MB"
+    return f"{v:,.1f}{(' ' + unit) if unit else ''}"
+
+
+def _svg_trend(group: Dict[str, Any], col: str, label: str, unit: str, w: int = 900, h: int = 200) -> str:
+    pts = group["points"]
+    ys = np.array([np.nan if v is None else v for v in pts[col]], dtype=np.float64)
+    vs = np.asarray(pts["v"], dtype=np.int64)
+    n = len(ys)
+    ok = np.isfinite(ys)
+    if not ok.any():
+        return f'<div class="empty">{html.escape(label)}: 데이터 없음</div>'
+    pl, pr, pt, pb = 64, 10, 18, 22
+    lo, hi = float(ys[ok].min()), float(ys[ok].max())
+    if hi - lo < 1e-9:
+        lo, hi = lo - 1, hi + 1
+    pad = (hi - lo) * 0.08
+    lo, hi = lo - pad, hi + pad
+    xs = pl + (np.arange(n) + 0.5) * (w - pl - pr) / max(1, n)
+    yy = pt + (hi - ys) * (h - pt - pb) / (hi - lo)
+    out = [f'<svg viewBox="0 0 {w} {h}" width="100%" height="{h}" xmlns="http://www.w3.org/2000/svg">',
+           f'<text x="4" y="13" class="t">{html.escape(label)} ({html.escape(unit)})</text>']
+    for frac in (0.0, 0.5, 1.0):
+        v = lo + (hi - lo) * frac
+        y = pt + (1 - frac) * (h - pt - pb)
+        out.append(f'<line x1="{pl}" y1="{y:.1f}" x2="{w - pr}" y2="{y:.1f}" class="g"/>'
+                   f'<text x="{pl - 4}" y="{y + 4:.1f}" class="a" text-anchor="end">{html.escape(_fmt(v, unit if unit == "KB" else ""))}</text>')
+    # 버전 구간 배경 + 중앙값 선
+    status = {e["version"]: e["vs_prev"].get(col, {}).get("status") for e in group["versions"]}
+    for k, e in enumerate(group["versions"]):
+        idx = np.nonzero(vs == k)[0]
+        if not len(idx):
+            continue
+        x0, x1 = xs[idx.min()] - 2, xs[idx.max()] + 2
+        med = e["median"].get(col)
+        color = "#e15759" if status.get(e["version"]) == "regression" else _PALETTE[k % len(_PALETTE)]
+        if med is not None and math.isfinite(med):
+            ym = pt + (hi - med) * (h - pt - pb) / (hi - lo)
+            out.append(f'<line x1="{x0:.1f}" y1="{ym:.1f}" x2="{x1:.1f}" y2="{ym:.1f}" stroke="{color}" stroke-width="2"/>')
+        out.append(f'<text x="{x0:.1f}" y="{h - 6}" class="a">{html.escape(e["version"])}</text>')
+    # 점: 버전별 path 1개(점 수천 개여도 요소 수는 버전 수)
+    for k in np.unique(vs[ok]):
+        m = ok & (vs == k)
+        d = "".join(f"M{x:.1f} {y:.1f}h0" for x, y in zip(xs[m].tolist(), yy[m].tolist()))
+        out.append(f'<path d="{d}" stroke="{_PALETTE[int(k) % len(_PALETTE)]}" stroke-width="4" '
+                   f'stroke-linecap="round" opacity="0.75"/>')
+    out.append("</svg>")
+    return "".join(out)
+
+
+_CSS = """body{font-family:'Malgun Gothic','Noto Sans CJK KR',sans-serif;margin:20px;color:#222}
+h1{font-size:20px}h2{font-size:16px;margin-top:28px;border-bottom:1px solid #ddd;padding-bottom:4px}
+table{border-collapse:collapse;font-size:12px;margin:8px 0}td,th{border:1px solid #ddd;padding:3px 8px;text-align:right}
+th{background:#f4f4f4}td.l{text-align:left}.regression{background:#fde2e2;color:#b00020;font-weight:bold}
+.improved{color:#2e7d32}.insufficient{color:#888}.empty{color:#888;font-size:12px}
+svg .t{font-size:12px;font-weight:bold}svg .a{font-size:10px;fill:#666}svg .g{stroke:#eee}
+.sum{background:#fff4e5;border:1px solid #f0c36d;padding:8px;font-size:13px}"""
+
+
+def _cmp_cell(cmp: Optional[Dict[str, Any]], unit: str) -> str:
+    if not cmp:
+        return "<td>-</td>"
+    st = cmp.get("status") or ""
+    txt = {"regression": "회귀", "improved": "개선", "insufficient": "표본 부족", "ok": "-"}.get(st, st)
+    d = cmp.get("delta")
+    sign = "+" if d is not None and d >= 0 else ""
+    body = f"{sign}{_fmt(d, unit)}" if d is not None else ""
+    if cmp.get("rel") is not None:
+        body += f" ({cmp['rel'] * 100:+.0f}%)"
+    if cmp.get("p") is not None:
+        body += f"<br>p={cmp['p']:.3g} {txt}"
+    elif st == "insufficient":
+        body += f"<br>{txt}"
+    return f'<td class="{st}">{body}</td>'
+
+
+def write_trend_dashboard(result: Dict[str, Any], path: str) -> str:
+    """analyze_trends 결과 → 단일 HTML (SVG 인라인, 외부 리소스 없음)"""
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    parts = [f"<!doctype html><html><head><meta charset='utf-8'><title>리소스 추세 대시보드</title>"
+             f"<style>{_CSS}</style></head><body><h1>📈 리소스 추세 / 회귀 탐지</h1>",
+             f"<p>생성: {now} · 리포트 {result['reports']:,}건 · Run {result['runs']:,}건 "
+             f"(버전 매칭 {result['matched']:,}건) · alpha={result['alpha']:g} · 최소 상대증가 "
+             f"{result['min_rel'] * 100:.0f}% · 최소 표본 {result['min_n']}</p>"]
+    regs = result["regressions"]
+    if regs:
+        items = "".join(
+            f"<li><b>{html.escape(x['package'])}</b> @ {html.escape(x['serial'])} — {html.escape(x['label'])}: "
+            f"{html.escape(x['base'])} {_fmt(x['base_median'], x['unit'])} → {html.escape(x['version'])} "
+            f"{_fmt(x['median'], x['unit'])} (p={x['p']:.3g})</li>" for x in regs)
+        parts.append(f"<div class='sum'>🔺 회귀 {len(regs)}건<ul>{items}</ul></div>")
+    else:
+        parts.append("<div class='sum'>✅ 통계적으로 유의한 회귀 없음</div>")
+    for g in result["groups"]:
+        title = f"{g['package'] or '(패키지 미상)'} · {g['serial'] or '(시리얼 미상)'}"
+        if g.get("model"):
+            title += f" ({g['model']})"
+        parts.append(f"<h2>{html.escape(title)}</h2>")
+        for c, label, unit, _ in METRICS:
+            parts.append(_svg_trend(g, c, label, unit))
+        head = "".join(f"<th>{html.escape(label)} 중앙값</th><th>vs 직전</th>" for _, label, _, _ in METRICS)
+        rows = []
+        for e in g["versions"]:
+            cells = "".join(f"<td>{_fmt(e['median'].get(c), unit)}</td>{_cmp_cell(e['vs_prev'].get(c), unit)}"
+                            for c, _, unit, _ in METRICS)
+            span = (datetime.datetime.fromtimestamp(e["first"]).strftime("%m-%d %H:%M") + " ~ "
+                    + datetime.datetime.fromtimestamp(e["last"]).strftime("%m-%d %H:%M"))
+            vtxt = html.escape(e["version"]) + (f" ({e['vcode']})" if e.get("vcode", -1) >= 0 else "")
+            rows.append(f"<tr><td class='l'>{vtxt}</td><td>{e['n']}</td><td class='l'>{span}</td>{cells}</tr>")
+        parts.append(f"<table><tr><th>버전</th><th>회차</th><th>기간</th>{head}</tr>{''.join(rows)}</table>")
+    parts.append("</body></html>")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(parts))
+    return path
+
+
+def run_trend(root: Optional[str] = None, *, html_path: Optional[str] = None, **kw) -> Dict[str, Any]:
+    """인덱스 갱신 → 분석 → 대시보드/요약 JSON 저장. 반환: analyze_trends 결과 + html/json 경로"""
+    t0 = time.time()
+    idx = build_trend_index(root)
+    res = analyze_trends(idx, **kw)
+    out_dir = os.path.dirname(idx["store"])
+    res["html"] = write_trend_dashboard(res, html_path or os.path.join(out_dir, "trend_dashboard.html"))
+    res["json"] = os.path.join(out_dir, "trend_summary.json")
+    try:
+        with open(res["json"], "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in res.items() if k != "groups"}, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"[TREND] 요약 JSON 저장 실패: {e}", file=sys.stderr)
+    res.update(index_sec=idx["sec"], parsed=idx["parsed"], sec=round(time.time() - t0, 3))
+    return res
+
+
+# ==========================================================
+# 🔹 CLI / 벤치마크
+# ==========================================================
+def _make_bench_tree(root: str, n: int, seed: int = 7):
+    """시리얼 2대 × 버전 4개, 마지막 버전만 CPU·누수 악화된 합성 리포트/메타 생성"""
+    rng = np.random.default_rng(seed)
+    versions = ["1.0.0", "1.1.0", "1.2.0", "1.3.0"]
+    t0 = datetime.datetime(2026, 1, 1, 9, 0, 0)
+    per = max(1, n // 2)
+    for serial in ("SERIAL_A", "SERIAL_B"):
+        for i in range(per):
+            vi = min(len(versions) - 1, i * len(versions) // per)
+            bad = vi == len(versions) - 1
+            st = t0 + datetime.timedelta(hours=i)
+            en = st + datetime.timedelta(minutes=30)
+            d = os.path.join(root, serial, f"run_{i:05d}")
+            os.makedirs(d, exist_ok=True)
+            kst = datetime.timezone(datetime.timedelta(hours=9))
+            with open(os.path.join(d, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"run_id": f"run_{i:05d}",
+                           "started_at": st.astimezone(kst).isoformat(),
+                           "ended_at": en.astimezone(kst).isoformat(),
+                           "device": {"serial": serial, "model": "BENCH"},
+                           "app": {"package": "com.example.app", "version_name": versions[vi],
+                                   "version_code": 100 + vi}, "result": "PASS"}, f)
+            rd = d if i % 3 else os.path.join(root, serial)     # 1/3은 시리얼 폴더 직하(시간 결합 경로)
+            with open(os.path.join(rd, f"resource_report_{i:05d}.json"), "w", encoding="utf-8") as f:
+                json.dump({"range": {"start": str(st + datetime.timedelta(minutes=1)), "end": str(en)},
+                           "samples": 1800, "meta": {"package": "com.example.app", "serial": serial},
+                           "cpu": {"p95": float(rng.normal(38 if bad else 30, 3))},
+                           "mem": {"max": float(rng.normal(400_000, 15_000)),
+                                   "slope_kb_per_min": float(rng.normal(900 if bad else 100, 150))},
+                           "verdict": {"overall": "PASS"}}, f)
+
+
+def _bench(n: int) -> int:
+    with tempfile.TemporaryDirectory(prefix="qa_trend_") as root:
+        t = time.time()
+        _make_bench_tree(root, n)
+        print(f"합성 트리 생성: {n:,} 리포트 ({time.time() - t:.2f}s)")
+        t = time.time()
+        idx = build_trend_index(root)
+        print(f"인덱스(콜드): {len(idx['reports']['src']):,} 리포트 / {len(idx['runs']['src']):,} Run  {time.time() - t:.2f}s")
+        t = time.time()
+        idx = build_trend_index(root)
+        print(f"인덱스(증분, 변경 없음): {time.time() - t:.3f}s (파싱 {idx['parsed']})")
+        t = time.time()
+        res = analyze_trends(idx)
+        print(f"분석: {time.time() - t:.3f}s (매칭 {res['matched']:,}/{res['reports']:,})")
+        t = time.time()
+        write_trend_dashboard(res, os.path.join(root, "_trend", "trend_dashboard.html"))
+        print(f"대시보드: {time.time() - t:.3f}s")
+        for x in res["regressions"]:
+            print(f"  🔺 {x['serial']} {x['label']}: {x['base']} → {x['version']} p={x['p']:.2g}")
+    return 0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="리소스 리포트 다회차 추세 분석 / 앱 버전 회귀 탐지")
+    ap.add_argument("--root", default=None, help="result 루트 (기본: QA_TREND_ROOT > Toolkit/result)")
+    ap.add_argument("--html", default=None, help="대시보드 경로 (기본: <root>/_trend/trend_dashboard.html)")
+    ap.add_argument("--alpha", type=float, default=None)
+    ap.add_argument("--min-rel", type=float, default=0.10, help="최소 상대 증가 (기본 0.10)")
+    ap.add_argument("--min-n", type=int, default=3, help="버전별 최소 회차 (기본 3)")
+    ap.add_argument("--fail-on-regression", action="store_true", help="회귀가 있으면 종료코드 1")
+    ap.add_argument("--bench", type=int, default=0, help="합성 N건으로 성능 측정만 수행")
+    a = ap.parse_args(argv)
+    if a.bench:
+        return _bench(a.bench)
+    res = run_trend(a.root, html_path=a.html, alpha=a.alpha, min_rel=a.min_rel, min_n=a.min_n)
+    print(f"리포트 {res['reports']:,} / Run {res['runs']:,} (매칭 {res['matched']:,}, 신규 파싱 {res['parsed']:,}) "
+          f"· {res['sec']}s")
+    for x in res["regressions"]:
+        print(f"🔺 {x['package']} @ {x['serial']} {x['label']}: {x['base']} {_fmt(x['base_median'], x['unit'])} → "
+              f"{x['version']} {_fmt(x['median'], x['unit'])} (p={x['p']:.3g}, n={x['n_base']}/{x['n_cur']})")
+    if not res["regressions"]:
+        print("✅ 유의한 회귀 없음")
+    print(f"대시보드: {res['html']}")
+    return 1 if (a.fail_on_regression and res["regressions"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
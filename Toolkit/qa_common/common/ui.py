@@ -0,0 +1,1609 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - Poco 드라이버/UI 상호작용 (클릭·입력·체크·드래그, 앱 재시작/Poco 하드 리셋)
+# ==========================================================
+# -*- coding: utf-8 -*-
+import time, re
+from typing import Optional, Tuple, TYPE_CHECKING
+from poco.exceptions import PocoTargetTimeout
+from airtest.core.api import log, start_app, stop_app, text, keyevent, swipe, Template, wait
+from .core import QAEnv, _adb_exec, _exc_text, note, soft_fail, step, use_env
+from .adb import (_get_resolution, detect_top_component, ensure_device, ensure_yosemite_alive,
+                  ensure_yosemite_ime, is_app_running)
+from .capture import _roi_changed, _xy_to_frame, grab_frame
+from .profiler import profiled, selector_label
+if TYPE_CHECKING:  # 드라이버는 get_poco()에서 지연 import
+    from poco.drivers.unity3d import UnityPoco
+    from poco.drivers.android.uiautomation import AndroidUiautomationPoco
+
+
+# UIAutomation / Poco 치명적 오류 감지
+def _is_poco_uia_fatal(msg: str) -> bool:
+    """
+    Poco/UIAutomation 치명 오류만 '보수적으로' 감지한다.
+    - 중요: 'uiautomation ready' 같은 정상 로그는 절대 fatal로 잡지 않는다(과탐 방지).
+    """
+    m = (msg or "").lower()
+
+    # 1) Airtest가 uiautomation 준비를 끝없이 기다리는 상태(실패 루프의 대표 신호)
+    if "still waiting for uiautomation ready" in m:
+        return True
+
+    # 2) instrumentation이 실제로 죽었음을 나타내는 신호
+    if "process crashed" in m:
+        return True
+    if "instrument timeout" in m or "[timeout] instrument timeout" in m:
+        return True
+
+    # 3) 연결 계열 하드 에러
+    if "remote end closed connection" in m:
+        return True
+    if "eoferror" in m:
+        return True
+    if "socket connection broken" in m:
+        return True
+
+    # 'instrumentation_result' 단독은 과탐 여지가 있어 제외(문맥 없이도 찍히는 경우가 있음)
+    return False
+
+# 공용 poco getter
+def get_poco(env: Optional['QAEnv'] = None):
+    """
+    - env.ui_mode 기준으로 필요한 드라이버만 생성한다.
+    - (중요) 현재 모드와 무관한 드라이버를 '겸사겸사' 띄우지 않는다.
+      -> UnityPoco 초기화는 PocoService instrumentation을 건드려 crash/loop를 유발할 수 있음.
+    """
+    env = use_env(env)
+    if env is None:
+        raise RuntimeError("QAEnv가 설정되지 않았습니다. set_current_env(env) 먼저 호출하세요.")
+
+    now = time.time()
+    disabled_until = getattr(env, "_poco_disabled_until", 0.0)
+    if now < disabled_until:
+        raise RuntimeError(f"poco disabled (cooldown {disabled_until-now:.1f}s)")
+
+    ensure_device(env.serial)
+
+    # 이미 세팅돼 있으면 그대로 반환
+    if getattr(env, "poco", None) is not None:
+        return env.poco
+
+    mode = (env.ui_mode or "").lower().strip()
+
+    # 드라이버 모듈은 생성 시점에만 import (현재 모드 드라이버만 로드)
+    if mode == "native":
+        if env.apoco is None:
+            from poco.drivers.android.uiautomation import AndroidUiautomationPoco
+            env.apoco = AndroidUiautomationPoco(
+                use_airtest_input=True,
+                screenshot_each_action=False
+            )
+            # dump는 가끔 여기서 바로 터지기도 해서, 필요 최소로만
+            try:
+                env.apoco.agent.hierarchy.dump()
+            except Exception:
+                pass
+            time.sleep(0.2)
+
+        env.poco = env.apoco
+        env.poco_active = env.apoco
+        return env.poco
+
+    # default: unity
+    if env.upoco is None:
+        from poco.drivers.unity3d import UnityPoco
+        env.upoco = UnityPoco()
+        try:
+            env.upoco.agent.hierarchy.dump()
+        except Exception:
+            pass
+        time.sleep(0.2)
+
+    env.poco = env.upoco
+    env.poco_active = env.upoco
+    return env.poco
+
+# ---- Poco 전역 프록시 ----
+class _PocoProxy:
+    """
+    전역 poco 프록시.
+    핵심: 매 호출마다 get_poco()를 호출하지 말고,
+          이미 env.poco가 있으면 그걸 즉시 사용한다.
+    """
+    def _handle(self):
+        env = use_env()
+        if env is not None and getattr(env, "poco", None) is not None:
+            return env.poco
+        # env.poco가 없을 때만 생성 경로로
+        return get_poco(env)
+
+    def __call__(self, *args, **kwargs):
+        # ✅ selector 첫 인자가 "패키지:id/..." 형태면 env.package로 자동 치환
+        if args and isinstance(args[0], str):
+            env = use_env()
+            if env is not None:
+                s = args[0]
+                # "com.xxx:id/yyy" 형태만 처리
+                if ":id/" in s:
+                    pkg_part, id_part = s.split(":id/", 1)
+                    aliases = getattr(env, "package_aliases", None)
+                    if not aliases:
+                        aliases = [getattr(env, "package", "")]
+                    # pkg_part가 alias에 포함될 때만 치환 (android:id/... 등은 그대로 유지)
+                    if pkg_part in aliases:
+                        new_pkg = getattr(env, "package", "")
+                        if new_pkg:
+                            s = f"{new_pkg}:id/{id_part}"
+                            args = (s,) + args[1:]
+
+        return self._handle()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._handle(), name)
+
+poco = _PocoProxy()
+
+def _resolve_obj(obj_or_fn):
+    return obj_or_fn() if callable(obj_or_fn) else obj_or_fn
+
+# 앱 시작 통합 진입점
+def start_app_generic(env, package: str):
+    """
+    앱 시작 통합 진입점.
+    1) 최초는 start
+    2) 그래도 안되면 monkey
+    3) 마지막으로 지금 떠 있는 동일 패키지 액티비티를 다시 띄움
+    """
+    env = use_env(env)
+    # 1) 기본 start
+    try:
+        start_app(package)
+        return
+    except Exception:
+        pass
+
+    # 2) monkey fallback
+    try:
+        _adb_exec(
+            env,
+            "shell", "monkey",
+            "-p", package,
+            "-c", "android.intent.category.LAUNCHER",
+            "1"
+        )
+        return
+    except Exception:
+        pass
+
+    # 3) top 재실행 (내부 런처 때문에 매니페스트 런처가 안 먹을 때 대비)
+    pkg, cls = detect_top_component(env, expect_pkg=package)
+    if pkg and cls:
+        _adb_exec(env, "shell", "am", "start", "-S", "-n", f"{pkg}/{cls}")
+
+def _invalidate_proc_state(env):
+    try:
+        from .procwatch import invalidate_proc_state
+        invalidate_proc_state(getattr(env, "serial", None))
+    except Exception:
+        pass
+
+# 앱 재시작 및 Poco 재연결
+def restart_app(retries:int=3, app_start=None, env: Optional[QAEnv]=None) -> Tuple['AndroidUiautomationPoco', 'UnityPoco']:
+    """
+    앱 재시작 + 드라이버 재연결.
+    app_start가 넘어오면 그걸로 앱을 실행하고,
+    없으면 start_app_generic으로(= start→monkey→top 재실행).
+    """
+    env = use_env(env)
+
+    step(f"앱 재시작 중...{env.package}")
+    ensure_device(env.serial)
+    last_err = None
+    if app_start is None:
+        app_start = env.app_start
+
+    for attempt in range(1, retries+1):
+        try:
+            pkg = env.package
+
+            # 1) 앱 재시작
+            stop_app(pkg)
+            start_app_generic(env, pkg)
+            _invalidate_proc_state(env)   # 재시작 이전 PID/포그라운드 캐시 무효화
+            time.sleep(1.0)
+
+            # 2) 드라이버 초기화 후, get_poco로 재연결
+            env.apoco = None
+            env.upoco = None
+            env.poco  = None
+
+            get_poco(env)           # 🔹 여기서 apoco/upoco/poco 셋업
+            env.set_ui_mode(env.ui_mode)
+
+            if env.poco is None:
+                raise RuntimeError("poco driver not available")
+            
+            # 3) 앱이 실행 중이 아니면(런처에 막힘 등) -> 이때만 app_start 실행
+            if not is_app_running(pkg, env=env, debug=True):
+                if callable(app_start):
+                    step(f"[RESTART] 앱이 실행 중이 아님 -> app_start() 실행 ({attempt}/{retries})", env=env)
+                    app_start()
+                    time.sleep(1.0)
+
+                # app_start 이후에도 실행 중이 아니면 실패 처리(재시도)
+                if not is_app_running(pkg, env=env, debug=True):
+                    raise RuntimeError("app_start() did not bring app to foreground")
+
+            time.sleep(env.restart_delay)
+
+            return env.apoco, env.upoco
+
+        except Exception as e:
+            last_err = e
+            
+            # 연결/소켓 계열(Windows 10053 등)일 때는 디바이스 재확인
+            if "10053" in str(e) or "Connection" in str(e):
+                try:
+                    ensure_device(env.serial)
+                except Exception as ee:
+                    last_err = ee
+            step(f"[RESTART][WARN] {attempt}/{retries} 실패: {last_err}", env=env, shot=True)
+            time.sleep(2.0)
+
+    raise RuntimeError(f"앱 재시작 실패({retries}회 시도): {last_err}")
+
+# ==========================================================
+# Poco 하드 리셋용 예외
+#  - 환경 자체가 깨져서 스크립트 레벨 재실행이 필요할 때 사용
+# ==========================================================
+class PocoFatalError(RuntimeError):
+    """Poco 환경이 복구 불가능하게 깨진 경우 사용하는 예외."""
+    pass
+
+
+# ==========================================================
+# Poco 하드 리셋 헬퍼
+#  - get_poco() 수준의 소프트 리셋으로 회복되지 않을 때 호출
+#  - 스크립트 "처음 실행했을 때"와 최대한 비슷한 상태로 되돌리는 것을 목표
+# ==========================================================
+def poco_hard_reset(env: Optional[QAEnv] = None, reason: str = ""):
+    """
+    Poco / uiautomation / yosemite 상태가 심하게 꼬인 경우:
+      1) 관련 프로세스 강제 종료 (pocoservice, yosemite)
+      2) 앱 재시작 (restart_app)
+      3) env의 Poco 드라이버 핸들 초기화
+      4) get_poco()로 새 드라이버 생성
+      5) env.on_ready() 재실행 시도
+
+    실패 시 PocoFatalError를 발생시켜 상위에서 스크립트 재실행 등을 결정할 수 있게 한다.
+    """
+    env = use_env(env)
+    if env is None:
+        raise RuntimeError(
+            "poco_hard_reset 호출 시 QAEnv가 없습니다. "
+            "set_current_env(env)를 먼저 호출해 주세요."
+        )
+
+    reason_text = reason or "사유 미기재"
+    step(f"[FATAL] Poco 하드 리셋 시도: {reason_text}", env=env)
+
+    # 1) 디바이스 연결 재확인
+    try:
+        ensure_device(env.serial)
+    except Exception as e:
+        step(f"[FATAL] 장치 재연결 실패: {e!r}", env=env)
+        raise PocoFatalError(f"장치 재연결 실패: {e!r}")
+
+    # 2) poco / yosemite 관련 프로세스 강제 종료
+    for pkg in ("com.netease.open.pocoservice", "com.netease.nie.yosemite"):
+        try:
+            _adb_exec(env, "shell", "am", "force-stop", pkg)
+            step(f"[OK] 백그라운드 프로세스 종료: {pkg}", env=env)
+        except Exception as e:
+            # 강제 종료 실패는 치명적이진 않으므로 WARN만 남기고 계속 진행
+            step(f"[WARN] 백그라운드 프로세스 종료 실패({pkg}): {e!r}", env=env)
+
+    # 2.5) yosemite 재기동 (🔥 핵심)
+    try:
+        ok = ensure_yosemite_alive(env=env, force_restart=True)
+
+        if ok:
+            step("[OK] yosemite service 재기동", env=env)
+            time.sleep(1.0)
+
+            # ✅ 하드리셋/force-stop 이후 default IME가 풀리는 문제 방지
+            ensure_yosemite_ime(env=env, force_set=True)
+        else:
+            # 기존 note/step 정책 유지
+            step("[WARN] yosemite 재기동 실패: 복구 시도 후에도 pid 없음", env=env)
+            note("[RISK] yosemite 재기동 실패(추가 불안정 가능): 복구 시도 후에도 pid 없음", env=env)
+
+    except Exception as e:
+        # 기존 note/step 정책 유지
+        step(f"[WARN] yosemite 재기동 실패: {e!r}", env=env)
+        note(f"[RISK] yosemite 재기동 실패(추가 불안정 가능): {e!r}", env=env)
+
+    # 3) 기존 Poco 드라이버 핸들 초기화
+    #    - 이후 get_poco() 호출 시 항상 새로 붙도록 만들기 위함
+    try:
+        env.apoco = None
+        env.upoco = None
+        env.poco = None
+        env.poco_active = None
+        step("[OK] 기존 Poco 드라이버 핸들 초기화 완료", env=env)
+    except Exception as e:
+        step(f"[WARN] Poco 핸들 초기화 중 예외 발생 (무시하고 계속): {e!r}", env=env)
+
+    # 4) 앱 재시작
+    try:
+        restart_app(env=env)
+        step(f"[OK] 앱 재시작 완료: {env.package}", env=env)
+    except Exception as e:
+        step(f"[FATAL] 앱 재시작 실패: {e!r}", env=env)
+        raise PocoFatalError(f"앱 재시작 실패: {e!r}")
+
+    # 5) Poco 드라이버 재생성 (현재 ui_mode 기준)
+    try:
+        p = get_poco(env=env)
+        step(f"[OK] Poco 드라이버 재생성 완료 (ui_mode={env.ui_mode})", env=env)
+    except Exception as e:
+        step(f"[FATAL] Poco 드라이버 재생성 실패: {e!r}", env=env)
+        raise PocoFatalError(f"Poco 드라이버 재생성 실패: {e!r}")
+
+    # 6) on_ready 콜백 재실행 (있다면)
+    try:
+        if callable(env.on_ready):
+            step("[INFO] on_ready 콜백 재실행 시작", env=env)
+            env.on_ready()
+            step("[OK] on_ready 콜백 재실행 완료", env=env)
+    except Exception as e:
+        # 여기서도 치명적으로 볼지, 경고로만 둘지는 정책 선택
+        # 우선은 경고만 남기고 계속 진행하도록 두되,
+        # 필요 시 PocoFatalError로 승격시켜도 된다.
+        step(f"[WARN] on_ready 재실행 실패: {e!r}", env=env)
+
+    # 필요 시 상위에서 바로 사용할 수 있도록 새 poco를 반환
+    return p
+
+# --- 소켓 끊김 재시도 헬퍼 ---
+def _handle_socket_broken(e, env=None, *, where="[CORE]"):
+    """
+    통신/연결 계열 끊김 발생 시 복구:
+      - ensure_device
+      - Poco 드라이버 재생성(get_poco)
+      - 필요 시 poco_hard_reset 1회
+    """
+    msg = (str(e) or "").lower()
+
+    # ✅ 기존: socket connection broken만
+    # if "socket connection broken" not in msg:
+    #     return False
+
+    # ✅ 확장: RemoteDisconnected / Connection aborted 등도 복구 대상으로 포함
+    disconnect_keys = (
+        "socket connection broken",
+        "remote end closed connection",
+        "remotedisconnected",
+        "connection aborted",
+        "eoferror",
+        "connection reset",
+        "winerror 10053",
+        "winerror 10054",
+        "winerror 10060",
+    )
+    if not any(k in msg for k in disconnect_keys):
+        return False
+
+    env = use_env(env)
+    note(f"[RECOVERY] disconnect 감지 → 드라이버/서비스 복구 시도 ({where})", env=env)
+
+    try:
+        serial = getattr(env, "serial", None) if env is not None else None
+        if env is not None:
+            step(f"{where} WARN ⚠️ socket connection broken 감지 → 디바이스 재연결 시도")
+
+        # 1) 디바이스 재연결
+        ensure_device(serial)
+        time.sleep(1.0)
+
+        # 2) Poco 드라이버 강제 재연결
+        if env is not None:
+            # 기존 드라이버 핸들 초기화
+            env.apoco = None
+            env.upoco = None
+            env.poco = None
+            env.poco_active = None
+
+            try:
+                # get_poco가 env.ui_mode 기준으로 다시 apoco/upoco/poco를 붙여준다
+                get_poco(env)
+                step(f"{where} [INFO] 디바이스 및 Poco 드라이버 재연결 완료 → 동작 재시도 예정")
+                return True
+            except Exception as e3:
+                step(f"{where} [ERR] Poco 드라이버 재연결 실패: {e3}", True)
+                # 🔸 여기서 하드 리셋 마지막 1회 시도
+                try:
+                    poco_hard_reset(env, reason=f"{where} 소켓 복구 실패 → 하드 리셋")
+                    step(f"{where} [INFO] Poco 하드 리셋 성공 → 동작 재시도 예정", env=env)
+                    return True
+                except PocoFatalError as e4:
+                    step(f"{where} [FATAL] Poco 하드 리셋도 실패: {e4}", env=env, shot=True)
+                    return False
+
+        return True
+
+    except Exception as e2:
+        if env is not None:
+            step(f"{where} [ERR] 디바이스 재연결 실패: {e2}", True)
+        return False
+# Poco 하드 리셋 유틸 END ===========================================
+
+# 리소스 ID 셀렉터 자동 치환 헬퍼
+def _translate_resource_id_selector(selector: str, env=None) -> str:
+    """
+    selector가 'com.xxx:id/name' 형태면 env.package로 치환.
+    env.package_aliases가 있으면 alias 목록에 포함된 패키지만 치환.
+    """
+    if not selector or not isinstance(selector, str):
+        return selector
+
+    if ":id/" not in selector:
+        return selector
+
+    e = use_env(env)
+    if e is None:
+        return selector
+
+    pkg_part, id_part = selector.split(":id/", 1)
+
+    # android:id/... 같은 시스템 패키지 보호
+    new_pkg = getattr(e, "package", None)
+    if not new_pkg:
+        return selector
+
+    aliases = getattr(e, "package_aliases", None)
+    if not aliases:
+        aliases = [new_pkg]
+
+    if pkg_part in aliases:
+        return f"{new_pkg}:id/{id_part}"
+
+    return selector
+
+# 리소스 ID 셀렉터 자동 치환 헬퍼
+def install_poco_selector_autopatch():
+    """
+    poco("pkg:id/x") 뿐 아니라
+    obj.child("pkg:id/x"), obj.offspring("pkg:id/x"), (필요 시) obj.sibling("pkg:id/x")도
+    env.package로 자동 치환되게 patch.
+    - 원본 메서드 시그니처를 건드리지 않도록 *args, **kwargs 래퍼로 감싼다.
+    """
+    try:
+        from poco.proxy import UIObjectProxy
+    except Exception:
+        return
+
+    if getattr(UIObjectProxy, "_qa_autopatch_installed", False):
+        return
+
+    def _wrap_method(method_name: str):
+        if not hasattr(UIObjectProxy, method_name):
+            return
+
+        orig = getattr(UIObjectProxy, method_name)
+
+        # 중복 패치 방지: 원본 저장
+        store = getattr(UIObjectProxy, "_qa_autopatch_originals", None)
+        if store is None:
+            store = {}
+            UIObjectProxy._qa_autopatch_originals = store
+        if method_name in store:
+            return
+
+        store[method_name] = orig
+
+        def wrapped(self, *args, **kwargs):
+            # 1) 첫 positional 인자가 str이면 selector로 보고 치환
+            if args and isinstance(args[0], str):
+                new0 = _translate_resource_id_selector(args[0], None)
+                args = (new0,) + args[1:]
+            else:
+                # 2) kwargs에 selector가 들어오는 케이스 방어 (버전/호출 형태 차이)
+                for k in ("query", "selector", "name"):
+                    if k in kwargs and isinstance(kwargs[k], str):
+                        kwargs[k] = _translate_resource_id_selector(kwargs[k], None)
+                        break
+
+            return orig(self, *args, **kwargs)
+
+        setattr(UIObjectProxy, method_name, wrapped)
+
+    # selector 문자열을 직접 받는 메서드들만 패치
+    for m in ("child", "offspring", "sibling"):
+        _wrap_method(m)
+
+    UIObjectProxy._qa_autopatch_installed = True
+
+
+# 요소 라벨 추출 (디버그용)
+def get_label(el) -> str:
+    """
+    다양한 타입(Poco UIObjectProxy, 일반 객체, 문자열 등)에 대해
+    사람이 읽기 좋은 라벨을 최대한 안정적으로 만들어 반환한다.
+
+    - 텍스트만 가져오는 용도가 아니라, desc/resource-id/class 등도 고려
+    - UIObjectProxy가 아직 resolve되지 않아도 selector 문자열 파싱으로 보완
+    """
+
+    if el is None:
+        return "None"
+
+    # 이미 문자열이면 그대로
+    if isinstance(el, str):
+        return el.strip() or el
+
+    def _trim_res_id(res_id: str) -> str:
+        # com.xxx:id/foo -> foo 로 축약 (너무 길면 가독성 저하)
+        if not res_id:
+            return res_id
+        # 흔한 패턴들 처리
+        # 예: "com.kyowon.literacy:id/textFrontWord" -> "textFrontWord"
+        m = re.search(r":id/([^/]+)$", res_id)
+        if m:
+            return m.group(1)
+        m = re.search(r"/([^/]+)$", res_id)
+        if m:
+            return m.group(1)
+        return res_id
+
+    def _safe_call(fn, default=None):
+        try:
+            return fn()
+        except Exception:
+            return default
+
+    def _safe_attr(obj, key, default=None):
+        """
+        Poco UIObjectProxy의 attr('text') / attr('name') 같은 형태를 우선 시도.
+        그 외에는 일반 getattr도 시도.
+        """
+        # Poco: el.attr("text")
+        if hasattr(obj, "attr") and callable(getattr(obj, "attr")):
+            try:
+                v = obj.attr(key)
+                return v if v not in (None, "") else default
+            except Exception:
+                pass
+
+        # 일반 객체: getattr(obj, key)
+        try:
+            v = getattr(obj, key)
+            return v if v not in (None, "") else default
+        except Exception:
+            return default
+
+    # 1) text 우선, 없으면 name(+인덱스) 우선
+    def _extract_index_suffix(obj) -> str:
+        # 1) attr로 instance/index가 잡히는 경우
+        for k in ("instance", "index"):
+            v = _safe_attr(obj, k, None)
+            if v is not None:
+                s = str(v).strip()
+                if s.isdigit():
+                    return f"[{s}]"
+
+        # 2) str(obj)에서 instance/index 또는 [n] 패턴 추출 (poco selector fallback)
+        try:
+            s = str(obj)
+            m = re.search(r"(?:instance|index)=(\d+)", s)
+            if m:
+                return f"[{m.group(1)}]"
+            m = re.search(r"\[(\d+)\]", s)
+            if m:
+                return f"[{m.group(1)}]"
+        except Exception:
+            pass
+
+        return ""
+
+    # Poco get_text()가 있는 경우
+    if hasattr(el, "get_text") and callable(getattr(el, "get_text")):
+        t = _safe_call(lambda: el.get_text(), None)
+        if t:
+            t = str(t).strip()
+            if t:
+                return t
+
+    # attr: text
+    t = _safe_attr(el, "text", None)
+    if t:
+        t = str(t).strip()
+        if t:
+            return t
+
+    # ✅ text가 없으면 name 반환 + 인덱스 있으면 [n] 붙이기
+    name = _safe_attr(el, "name", None)
+    if name:
+        name = str(name).strip()
+        if name:
+            suf = _extract_index_suffix(el)
+            # 이미 name에 [n]이 붙어있으면 중복 방지
+            if suf and not re.search(r"\[\d+\]$", name):
+                return name + suf
+            return name
+
+    # 나머지는 기존 fallback(필요하면 desc 등)로 진행
+    v = _safe_attr(el, "desc", None)
+    if v:
+        v = str(v).strip()
+        if v:
+            return v
+
+    v = _safe_attr(el, "contentDescription", None) or _safe_attr(el, "content-desc", None) or _safe_attr(el, "content_desc", None)
+    if v:
+        v = str(v).strip()
+        if v:
+            return v
+
+    # 2) resource-id 계열
+    for k in ("resourceId", "resource-id", "resource_id", "id"):
+        rid = _safe_attr(el, k, None)
+        if rid:
+            rid_s = _trim_res_id(str(rid).strip())
+            if rid_s:
+                return rid_s
+
+    # 3) class/type 계열
+    # Poco는 type/className이 잡히는 경우가 있고, 일반 객체는 __class__.__name__
+    for k in ("className", "class", "type"):
+        cv = _safe_attr(el, k, None)
+        if cv:
+            return str(cv).strip()
+
+    # 4) selector 문자열 파싱 fallback
+    # 예: UIObjectProxy of "text=훈련&com.kyowon.literacy:id/textFrontWord"
+    try:
+        s = str(el)
+
+        # text/name/desc 우선 추출
+        for key in ("text", "name", "desc"):
+            m = re.search(rf'{key}=([^&"]+)', s)
+            if m:
+                v = m.group(1).strip()
+                if v:
+                    return v
+
+        # com.xxx:id/foo 같은 패턴 추출
+        m = re.search(r'([A-Za-z0-9_.]+:id/[^&"]+)', s)
+        if m:
+            return _trim_res_id(m.group(1).strip())
+
+        # 마지막으로 따옴표 안 selector 통째로라도 반환(너무 길면 그대로 두되, 너희쪽에서 잘라 써도 됨)
+        m = re.search(r'UIObjectProxy of "([^"]+)"', s)
+        if m:
+            v = m.group(1).strip()
+            if v:
+                return v
+
+        return s
+    except Exception:
+        # 5) 최후의 수단
+        try:
+            return repr(el)
+        except Exception:
+            return "<?>"
+
+# ======================================
+# 🎯 클릭/입력 공통 헬퍼
+#   - must_* : 실패 시 예외 발생
+#   - try_*  : 실패 시 False 리턴 (예외 삼킴)
+#   - safe_* : 하위호환용 이름 (기존 스크립트 안전)
+# ======================================
+# --- CLICK 공통 코어 ---
+@profiled("click", lambda poco_obj, *a, **k: selector_label(poco_obj))
+def _click_core(poco_obj, *, timeout: float = 5, env=None, fast: bool = False):
+    env = use_env(env)
+    attempt = 0
+    last_err = None
+    used_exc_handler = False  # 예외 처리기는 클릭 1번당 한 번만 태움
+    poco_obj = _resolve_obj(poco_obj)
+
+    while attempt < 3:
+        attempt += 1
+        try:
+            if not fast:
+                poco_obj.wait_for_appearance(timeout)
+            poco_obj.click()
+            return
+
+        except Exception as e:
+            last_err = e
+            msg = str(e)
+
+            # ✅ (A) disconnect 복구를 fatal보다 먼저 (1번째 시도에만)
+            if attempt == 1 and _handle_socket_broken(e, env=env, where="[CLICK_CORE]"):
+                continue
+
+            # ✅ (B) fatal 감지 → poco 비활성화 후 상위로 오류 던짐
+            if _is_poco_uia_fatal(msg):
+                # (수정) 클릭 레벨에서 하드리셋으로 들어가면 루프가 더 커질 수 있음.
+                # 여기서는 poco를 잠시 비활성화하고, 상위(플로우/런너)에서 종료/재시작을 결정.
+                if env is not None:
+                    env._poco_disabled_until = time.time() + 120.0  # 2분간 poco 재시도 금지
+                raise
+
+            # (C) 앱별 예외 처리기 (env.handle_exceptions) 1회만
+            handler = getattr(env, "handle_exceptions", None) if env is not None else None
+            if (not used_exc_handler) and callable(handler):
+                used_exc_handler = True
+                try:
+                    ret = handler(e, env)
+                    count = int(ret or 0)
+                except Exception as he:
+                    step(f"[CLICK_CORE] handle_exceptions 에러: {he}", True)
+                    count = 0
+
+                if count > 0 and attempt < 3:
+                    step(f"[CLICK_CORE] 예외 처리기로 {count}개 rule 처리 → 재시도")
+                    continue
+
+            # 여기까지 왔으면:
+            #   - socket 복구 실패 or 조건 불일치
+            #   - 예외 처리기 없음 or rule 0개 처리
+            #   - 더 이상 재시도 불가
+            raise last_err
+
+
+def must_click(poco_obj, desc: str = None, *,
+               timeout: float = 5, env: Optional['QAEnv'] = None, fast: bool = False) -> bool:
+    """
+    필수 클릭(기본: 실패해도 계속 진행):
+      - 실패 시: FAIL 로그 + Airtest Failed(assertion) 기록 + 예외 발생
+    """
+    env = use_env(env)
+
+    try:
+        _click_core(poco_obj, timeout=timeout, env=env, fast=fast)
+        if desc:
+            step(f"{desc}: PASS ✅")
+        else:
+            step(f"[MUST_CLICK] {get_label(poco_obj)}: PASS ✅")
+        return True
+
+    except Exception as e:
+        et = _exc_text(e)
+        msg = f"{desc}: FAIL ❌ ({et})" if desc else f"[MUST_CLICK] {get_label(poco_obj)}: FAIL ❌ ({et})"
+        soft_fail(msg)
+        raise
+
+def try_click(poco_obj, desc: str = None, *,
+              timeout: float = 5, env: Optional['QAEnv'] = None, fast: bool = False) -> bool:
+    """
+    시도형 클릭:
+      - 실패해도 예외를 던지지 않고 False 리턴.
+      - 반복 루프/보조 기능 등에서 사용.
+    """
+    env = use_env(env)
+    try:
+        _click_core(poco_obj, timeout=timeout, env=env, fast=fast)
+        if desc:
+            step(f"{desc}: PASS ✅")
+        else:
+            step(f"[TRY_CLICK] {get_label(poco_obj)}: PASS ✅")
+        return True
+    except Exception as e:
+        et = _exc_text(e)
+        if desc:
+            step(f"{desc}: WARN ⚠️ ({et})", True)
+        else:
+            step(f"[TRY_CLICK] {get_label(poco_obj)}: WARN ⚠️ ({et})", True)
+        return False
+
+# 🔁 하위호환: 기존 safe_click 은 "필수 클릭"으로 간주
+def safe_click(poco_obj, desc: str = None, *,
+               timeout: float = 5, env: Optional['QAEnv'] = None, fast: bool = False) -> bool:
+    return must_click(poco_obj, desc=desc, timeout=timeout, env=env, fast=fast)
+
+
+# --- TYPE 공통 코어 ---
+@profiled("type", lambda poco_obj, *a, **k: selector_label(poco_obj))
+def _type_core(poco_obj, value: str, *, enter: bool = True,
+               timeout: float = 5, env: Optional['QAEnv'] = None):
+    """
+    기존 safe_type 로직을 그대로 옮긴 코어 함수.
+    실패 시 예외를 그대로 발생시킨다.
+    """
+    env = use_env(env)
+    poco_obj = _resolve_obj(poco_obj)
+
+    def _sleep(t=0.06):
+        time.sleep(t)
+
+    def _get_txt(o):
+        try:
+            t = o.get_text()
+            return "" if t is None else str(t)
+        except Exception:
+            return ""
+
+    def _apoco():
+        from poco.drivers.android.uiautomation import AndroidUiautomationPoco
+        a = getattr(env, "apoco", None) or AndroidUiautomationPoco(
+            use_airtest_input=True,
+            screenshot_each_action=False
+        )
+
+        if env is not None and getattr(env, "apoco", None) is None:
+            env.apoco = a
+        return a
+
+    def _clear_with_poco_obj(obj) -> bool:
+        try:
+            obj.set_text("")
+            _sleep(0.05)
+            # 일부 패스워드 필드는 get_text가 빈문자/None을 반환 → 검증 느슨하게
+            return True
+        except Exception:
+            return False
+
+    def _clear_with_apoco_focused() -> bool:
+        try:
+            a = _apoco()
+            ed = a(type="android.widget.EditText", focused=True)
+            if ed.exists():
+                ed.set_text("")
+                _sleep(0.05)
+                return True
+            return False
+        except Exception:
+            return False
+
+    def _force_delete_keys():
+        try:
+            # 커서 끝 → Backspace 다수
+            keyevent(123)       # MOVE_END
+            for _ in range(80):
+                keyevent(67)    # DEL(backspace)
+            _sleep(0.03)
+            # 커서 홈 → ForwardDelete 다수
+            keyevent(122)       # MOVE_HOME
+            for _ in range(80):
+                keyevent(112)   # FORWARD_DEL
+            _sleep(0.03)
+        except Exception:
+            pass
+
+    try:
+        # 프로세스 + IME까지 보정(핵심)
+        ok = ensure_yosemite_alive(env=env)
+        if ok:
+            ensure_yosemite_ime(env=env, force_set=False)
+    except Exception:
+        pass
+
+    # 0) 포커스 확보
+    poco_obj.wait_for_appearance(timeout)
+    poco_obj.click()
+    _sleep(0.08)
+
+    # 1) 모드에 따른 1순위 시도
+    ui_mode = getattr(env, "ui_mode", None)
+    cleared = False
+    if ui_mode == "native":
+        # 네이티브: 현재 poco(네이티브)로 바로 지우기
+        cleared = _clear_with_poco_obj(poco_obj)
+        if not cleared:
+            cleared = _clear_with_apoco_focused()
+    else:
+        # 유니티(또는 알 수 없음): apoco로 focused EditText 지우기 우선
+        cleared = _clear_with_apoco_focused()
+        if not cleared:
+            cleared = _clear_with_poco_obj(poco_obj)
+
+    # 2) 둘 다 실패하면 키이벤트 강제 삭제 폴백
+    if not cleared:
+        _force_delete_keys()
+
+    # 3) 최종 입력
+    _sleep(0.03)
+    try:
+        text(value, enter=enter)
+        _sleep(0.03)
+    except Exception as e:
+        et = _exc_text(e)
+        msg = f"[TYPE_CORE] {get_label(poco_obj)}: FAIL ❌ - ({et})"
+        soft_fail(msg)
+        raise
+
+
+def must_type(poco_obj, value: str, desc: str = None, *, enter: bool = True,
+              timeout: float = 5, env: Optional['QAEnv'] = None) -> bool:
+    """
+    필수 입력(기본: 실패해도 계속 진행):
+      - 실패 시: FAIL 로그 + Airtest Failed(assertion) 기록 + 예외 발생
+    """
+    env = use_env(env)
+
+    try:
+        _type_core(poco_obj, value=value, enter=enter, timeout=timeout, env=env)
+        if desc:
+            step(f"{desc}: PASS ✅")
+        else:
+            step(f"[MUST_TYPE] {get_label(poco_obj)}: PASS ✅")
+        return True
+
+    except Exception as e:
+        et = _exc_text(e)
+        msg = f"{desc}: FAIL ❌ - ({et})" if desc else f"[MUST_TYPE] {get_label(poco_obj)}: FAIL ❌ - ({et})"
+        soft_fail(msg)
+        raise
+
+
+def try_type(poco_obj, value: str, desc: str = None, *, enter: bool = True,
+             timeout: float = 5, env: Optional['QAEnv'] = None) -> bool:
+    """
+    시도형 입력:
+      - 실패해도 예외를 던지지 않고 False 리턴.
+    """
+    env = use_env(env)
+
+    try:
+        _type_core(poco_obj, value=value, enter=enter, timeout=timeout, env=env)
+        if desc:
+            step(f"{desc}: PASS ✅")
+        else:
+            step(f"[TRY_TYPE] {get_label(poco_obj)}: PASS ✅")
+        return True
+    except Exception as e:
+        et = _exc_text(e)
+        if desc:
+            step(f"{desc}: WARN ⚠️ - ({et})", True)
+        else:
+            step(f"[TRY_TYPE] {get_label(poco_obj)}: WARN ⚠️ - ({et})", True)
+        return False
+
+# 🔁 하위호환: 기존 safe_type 은 "필수 입력"으로 간주
+def safe_type(poco_obj, value: str, desc: str = None, *, enter: bool = True,
+              timeout: float = 10, env: Optional['QAEnv'] = None) -> bool:
+    return must_type(poco_obj, value=value, desc=desc, enter=enter, timeout=timeout, env=env)
+
+
+# --- CHECK 공통 코어 ---
+def _check_core(poco_obj, *, timeout: float = 5, env=None) -> bool:
+    env = use_env(env)
+    attempt = 0
+    last_err = None
+    used_exc_handler = False
+    poco_obj = _resolve_obj(poco_obj)
+
+    while attempt < 3:
+        attempt += 1
+        try:
+            poco_obj.wait_for_appearance(timeout=timeout)
+            return True
+
+        except Exception as e:
+            last_err = e
+            msg = str(e)
+
+            # ✅ (A) disconnect 복구를 fatal보다 먼저 (1번째 시도에만)
+            if attempt == 1 and _handle_socket_broken(e, env=env, where="[CHECK_CORE]"):
+                continue
+
+            # ✅ (B) fatal 감지 → poco 비활성화 후 상위로 오류 던짐
+            if _is_poco_uia_fatal(msg):
+                # (수정) 클릭 레벨에서 하드리셋으로 들어가면 루프가 더 커질 수 있음.
+                # 여기서는 poco를 잠시 비활성화하고, 상위(플로우/런너)에서 종료/재시작을 결정.
+                if env is not None:
+                    env._poco_disabled_until = time.time() + 120.0  # 2분간 poco 재시도 금지
+                raise
+
+            # (C) 앱 예외 처리기
+            handler = getattr(env, "handle_exceptions", None) if env is not None else None
+            if (not used_exc_handler) and callable(handler):
+                used_exc_handler = True
+                try:
+                    ret = handler(e, env)
+                    count = int(ret or 0)
+                except Exception as he:
+                    step(f"[CHECK_CORE] handle_exceptions 에러: {he}", True)
+                    count = 0
+
+                if count > 0 and attempt < 3:
+                    step(f"[CHECK_CORE] 예외 처리기로 {count}개 rule 처리 → 재시도")
+                    continue
+            
+            # handler로 해결 못했더라도 timeout이면 재시도
+            if isinstance(e, PocoTargetTimeout) and attempt < 2:
+                step(f"[CHECK_CORE] timeout({timeout}s) → 재시도 {attempt}/2")
+                continue
+
+            # 여기까지 오면 더 이상 할 수 있는 게 없음 → 예외 밖으로
+            raise last_err
+
+
+def must_check(poco_obj, desc: str = None, *,
+               timeout: float = 5, env: Optional['QAEnv'] = None, debug: bool = False) -> bool:
+    """
+    필수 체크(기본: 실패해도 계속 진행):
+      - timeout 내 요소 등장해야 함
+      - 실패 시: FAIL 로그 + Airtest Failed(assertion) 기록 + 예외 발생
+    """
+    env = use_env(env)
+
+    try:
+        _check_core(poco_obj, timeout=timeout, env=env)
+        if desc:
+            step(f"{desc}: PASS ✅")
+        else:
+            step(f"[MUST_CHECK] {get_label(poco_obj)}: PASS ✅")
+        return True
+    except PocoTargetTimeout as e:
+        msg = f"{desc}: FAIL ❌ (timeout {timeout}s)" if desc else f"[MUST_CHECK] {get_label(poco_obj)}: FAIL ❌ (timeout {timeout}s)"
+        soft_fail(msg)
+        # must_* 계열은 진짜 실패로 보고 예외를 던진다
+        raise
+    except Exception as e:
+        et = _exc_text(e)
+        msg = f"{desc}: FAIL ❌ (예외 발생: {et})" if desc else f"[MUST_CHECK] {get_label(poco_obj)}: FAIL ❌ (예외 발생: {et})"
+        soft_fail(msg)
+        raise
+
+
+def try_check(poco_obj, desc: str = None, *,
+              timeout: float = 5, env: Optional['QAEnv'] = None) -> bool:
+    """
+    시도형 체크:
+      - 요소가 없어도 플로우를 죽이지 않고 False만 리턴.
+      - 실패 시 WARN 로그로만 남긴다.
+    """
+    env = use_env(env)
+
+    try:
+        _check_core(poco_obj, timeout=timeout, env=env)
+        if desc:
+            step(f"{desc}: PASS ✅")
+        else:
+            step(f"[TRY_CHECK] {get_label(poco_obj)}: PASS ✅")
+        return True
+    except PocoTargetTimeout as e:
+        # timeout은 WARN으로만 보고 넘김
+        if desc:
+            step(f"{desc}: WARN ⚠️ (timeout {timeout}s)", True)
+        else:
+            step(f"[TRY_CHECK] {get_label(poco_obj)}: WARN ⚠️ (timeout {timeout}s)", True)
+        return False
+    except Exception as e:
+        et = _exc_text(e)
+        if desc:
+            step(f"{desc}: WARN ⚠️ (예외 발생: {et})", True)
+        else:
+            step(f"[TRY_CHECK] {get_label(poco_obj)}: WARN ⚠️ (예외 발생: {et})", True)
+        return False
+
+# 🔁 하위호환: obj_check 는 기존 의미(예외 없는 체크)를 유지
+def obj_check(poco_obj, desc: str = None, *,
+              timeout: float = 5, env: Optional['QAEnv'] = None) -> bool:
+    return try_check(poco_obj, desc=desc, timeout=timeout, env=env)
+
+# =======================================================
+# 👆 객체 및 이미지 기반 드래그 유틸
+# =======================================================
+def _xy_from_poco_center(poco_obj, timeout: float = 5.0, debug: bool = False) -> tuple[int, int]:
+    """
+    poco_obj의 중앙좌표를 px로 반환(좌표계 안정화 버전).
+    우선순위:
+      0) _get_region_from_poco()로 bbox 산출 후 bbox 중앙 사용 (pos/size + rot fallback 포함)  ✅ 가장 안정적
+      1) get_position() fallback
+      2) get_bounds() fallback (포맷 혼재 방어)
+    """
+    poco_obj.wait_for_appearance(timeout=timeout)
+    W, H = _get_resolution()
+
+    # region 기반 (가장 안정적: pos/size + 회전 후보 탐색 로직 포함)
+    try:
+        bbox = _get_region_from_poco(poco_obj, screen_w=W, screen_h=H, debug=debug)
+        if bbox and len(bbox) == 4:
+            x1, y1, x2, y2 = bbox
+            return (int((x1 + x2) / 2), int((y1 + y2) / 2))
+    except Exception:
+        pass
+
+    return (0, 0)
+
+def _xy_from_template_center(tpl: Template, timeout: float = 5.0, debug: bool = False) -> tuple[int, int]:
+    """
+    Template 매칭 좌표를 px로 반환.
+    wait()는 매칭 실패 시 예외가 나므로, 필요 시 try/except로 감싸서 사용.
+    """
+    pos = wait(tpl, timeout=timeout)  # (x,y) px
+    if debug:
+        step(f"[TEMPLATE] {get_label(tpl)}: {pos}")
+    return (int(pos[0]), int(pos[1]))
+
+# 객체 위치 해석
+def _resolve_position(v, timeout: float = 5.0, debug: bool = False) -> tuple[int, int]:
+        if v is None:
+            raise ValueError("start/end는 필수입니다.")
+        # (x,y) 직접 좌표
+        if isinstance(v, (tuple, list)) and len(v) == 2:
+            return (int(v[0]), int(v[1]))
+        # Template
+        if isinstance(v, Template):
+            return _xy_from_template_center(v, timeout=timeout, debug=debug)
+        # Poco object로 간주
+        return _xy_from_poco_center(v, timeout=timeout, debug=debug)
+
+# 시작/종료 좌표 드래그
+def drag_any_to_any(
+    *,
+    start=None,          # poco_obj | (x,y) | Template
+    end=None,            # poco_obj | (x,y) | Template
+    duration: float = 0.5,
+    timeout: float = 5.0,
+    debug: bool = False,
+) -> bool:
+    """
+    start/end에 poco 객체, (x,y) 좌표, Template을 섞어서 넣어도
+    최종적으로 (px,px)로 통일해 swipe 수행.
+    """
+    x1, y1 = _resolve_position(start, timeout=timeout, debug=debug)
+    x2, y2 = _resolve_position(end, timeout=timeout, debug=debug)
+
+    if debug:
+        step(f"[DRAG][any] ({x1},{y1}) -> ({x2},{y2}) dur={duration}")
+
+    swipe((x1, y1), (x2, y2), duration=duration)
+    time.sleep(0.2)
+    return True
+
+# --- MUST_DRAG ---
+def must_drag(start_src, end_dst,   # poco_obj | (x,y) | Template
+              desc: str = None, 
+              *,
+              timeout: float = 5,
+              duration: float = 0.8,
+              steps: int = 100,
+              src_offset: tuple[int, int] = (0, 0), # 시작 소스 오프셋: (x,y)
+              dst_offset: tuple[int, int] = (0, 0), # 종료 대상 오프셋: (x,y)
+              env: Optional['QAEnv'] = None,
+              debug: bool = False) -> bool:
+    """
+    필수 드래그(Drag&Drop):
+      - start_src(시작 소스) 중심 → end_dst(타겟 소스) 중심으로 드래그
+      - 실패 시: soft_fail + 예외 raise
+
+    tips:
+      - 드래그가 "끊기거나 한 칸만" 동작하면 steps/duration을 키우는 게 효과적
+      - 드롭 타겟이 중앙보다 약간 위/아래를 요구하면 dst_offset으로 보정
+    """
+    env = use_env(env)
+
+    try:
+        sx, sy = _resolve_position(start_src, timeout=timeout, debug=debug)
+        ex, ey = _resolve_position(end_dst, timeout=timeout, debug=debug)
+
+        sx += int(src_offset[0]); sy += int(src_offset[1])
+        ex += int(dst_offset[0]); ey += int(dst_offset[1])
+
+        if debug:
+            log(f"[MUST_DRAG] {start_src}({sx},{sy}) → {end_dst}({ex},{ey}) dur={duration} steps={steps}")
+
+        # Airtest swipe의 steps 지원 여부가 환경에 따라 다를 수 있어 fallback 처리
+        try:
+            swipe((int(sx), int(sy)), (int(ex), int(ey)), duration=float(duration), steps=int(steps))
+        except TypeError:
+            swipe((int(sx), int(sy)), (int(ex), int(ey)), duration=float(duration))
+
+        time.sleep(0.2)
+
+        if desc:
+            step(f"{desc}: PASS ✅")
+        else:
+            step(f"[MUST_DRAG] {get_label(start_src)}: PASS ✅")
+        return True
+
+    except PocoTargetTimeout:
+        msg = f"{desc}: FAIL ❌ (timeout {timeout}s)" if desc else f"[MUST_DRAG] {get_label(start_src)}: FAIL ❌ (timeout {timeout}s)"
+        soft_fail(msg)
+        raise
+    except Exception as e:
+        msg = f"{desc}: FAIL ❌ ({e})" if desc else f"[MUST_DRAG] {get_label(start_src)}: FAIL ❌ ({e})"
+        soft_fail(msg)
+        raise
+
+# 드래그 후 ROI 체크 함수
+def try_drag_with_roi(start_src, end_dst,
+                      desc: str = None,
+                      *,
+                      timeout: float = 5,
+                      duration: float = 0.8,
+                      steps: int = 80,
+                      src_offset: tuple[int, int] = (0, 0),
+                      dst_offset: tuple[int, int] = (0, 0),
+                      post_sleep: float = 4,          # ✅ 애니메이션 대기
+                      roi_point: str = "mid",           # ✅ ROI는 선의 중앙 기준이 보통 가장 안정적: "mid" | "dst" | "src"
+                      roi_r: int = 150,                 # ✅ 선 영역 커버 (필요시 150~220)
+                      mean_abs_thr: float = 2.0,        # ✅ 민감도 (필요시 1.5~4.0)
+                      env: Optional['QAEnv'] = None,
+                      debug: bool = False) -> bool:
+    """
+    드래그를 시도하고, 드래그 결과가 화면 ROI 변화로 '유효'했는지(True/False) 반환.
+    - 선긋기처럼 "맞으면 선 유지/이펙트 유지" 케이스에서 사용.
+    - 실패(오답)일 때 다시하기 버튼이 안 뜨는 상황에서도,
+      각 시도 후 ROI가 원복되면 False로 보고 다음 후보를 시도할 수 있음.
+    """
+    env = use_env(env)
+
+    try:
+        sx, sy = _resolve_position(start_src, timeout=timeout, debug=debug)
+        ex, ey = _resolve_position(end_dst, timeout=timeout, debug=debug)
+
+        sx += int(src_offset[0]); sy += int(src_offset[1])
+        ex += int(dst_offset[0]); ey += int(dst_offset[1])
+
+        if roi_point == "src":
+            cx, cy = int(sx), int(sy)
+        elif roi_point == "dst":
+            cx, cy = int(ex), int(ey)
+        else:
+            cx, cy = int((sx + ex) / 2), int((sy + ey) / 2)   # ✅ 기본: 선의 중앙
+
+        before = grab_frame(env)
+        if before is None:
+            if debug:
+                log("[TRY_DRAG_ROI] before snapshot is None")
+            return False
+
+        if debug:
+            log(f"[TRY_DRAG_ROI] {start_src}({sx},{sy}) → {end_dst}({ex},{ey}) "
+                f"dur={duration} steps={steps} roi=({cx},{cy}, r={roi_r}) thr={mean_abs_thr}")
+
+        # swipe steps 지원 여부 fallback
+        try:
+            swipe((int(sx), int(sy)), (int(ex), int(ey)), duration=float(duration), steps=int(steps))
+        except TypeError:
+            swipe((int(sx), int(sy)), (int(ex), int(ey)), duration=float(duration))
+
+        time.sleep(float(post_sleep))  # ✅ 애니메이션 충분히 기다린 뒤 비교
+
+        after = grab_frame(env, fresh=True)
+        if after is None:
+            if debug:
+                log("[TRY_DRAG_ROI] after snapshot is None")
+            return False
+
+        sw, sh = _get_resolution()
+        fx, fy = _xy_to_frame(cx, cy, sw, sh, after)
+        changed = _roi_changed(before, after, fx, fy, r=int(roi_r), mean_abs_thr=float(mean_abs_thr))
+
+        if debug:
+            log(f"[TRY_DRAG_ROI] changed={changed}")
+
+        if desc:
+            step(f"{desc}: {'PASS ✅' if changed else 'MISS ⚠️(roi)'}")
+        return bool(changed)
+
+    except Exception as e:
+        if debug:
+            step(f"[TRY_DRAG_ROI] exception: {e}", True)
+        return False
+
+
+# --- 클릭 루프: 대상이 사라질 때까지 클릭 후 폴백 클릭 ---
+def click_until_disappear(target_poco, fallback_poco=None, desc="[CLICK_UNTIL] 루프", interval=0.5, max_loop=30, debug=False):
+    """
+    target_poco(예: 다음 버튼)가 존재하는 동안 계속 클릭하고,
+    사라지면 fallback_poco(예: b버튼)를 1회 클릭하는 공통 루프 함수.
+    ※ fallback_poco=None 이면 fallback 실행 없이 PASS 처리하고 종료.
+    """
+    loop = 0
+    step(f"[CLICK_UNTIL] 루프 시작")
+
+    while target_poco.exists():
+        target_poco.click()
+        loop += 1
+        if debug:
+            step(f"[CLICK_UNTIL] {loop}회 진행 ✅")
+        time.sleep(interval)
+
+        # ✨ 여기서 진짜로 없어지는지 한 번만 제대로 기다린다
+        try:
+            target_poco.wait_for_disappearance(timeout=2)
+            # 여기까지 오면 진짜 사라진 거니까 fallback
+            step(f"[CLICK_UNTIL] {loop}회 클릭 후 대상이 실제로 사라짐")
+
+            if fallback_poco is None:
+                step(f"{desc}: PASS ✅ (fallback 없음)",)
+                break
+
+            if fallback_poco.exists():
+                fallback_poco.click()
+                step(f"{desc}: PASS ✅")
+            else:
+                soft_fail(f"{desc}: FAIL ❌ (fallback 미존재)")
+            break
+        except PocoTargetTimeout:
+            # 2초 동안 안 사라졌으니까 “아직 있다고 본다” → 루프 계속
+            pass
+
+        if loop >= max_loop:
+            step(f"[click] 최대 {max_loop}회 진행 후 강제 종료 ⚠️")
+            if fallback_poco.exists():
+                fallback_poco.click()
+                step(f"{desc}: PASS ✅ (max_loop 이후)")
+            break
+
+    step(f"[click] 루프 종료")
+
+
+# ==========================================================
+# 레이어(ROI) 영역 계산 헬퍼
+#  - _get_region_from_poco: poco 레이어 → 화면 px bbox (tap_images/drag 공용)
+# ==========================================================
+def _clamp_int(v: int, lo: int, hi: int) -> int:
+    return max(lo, min(hi, v))
+
+def _normalize_region(region: Tuple[int, int, int, int], screen_w: int, screen_h: int) -> Tuple[int, int, int, int]:
+    x1, y1, x2, y2 = region
+
+    # 1) int 변환
+    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+
+    # 2) 좌표 정렬(뒤집힘 방지: 핵심)
+    if x2 < x1:
+        x1, x2 = x2, x1
+    if y2 < y1:
+        y1, y2 = y2, y1
+
+    # 3) clamp
+    x1 = _clamp_int(x1, 0, screen_w - 1)
+    y1 = _clamp_int(y1, 0, screen_h - 1)
+    x2 = _clamp_int(x2, 1, screen_w)
+    y2 = _clamp_int(y2, 1, screen_h)
+
+    # 4) 최소 크기 보장
+    if x2 <= x1:
+        x2 = min(screen_w, x1 + 1)
+    if y2 <= y1:
+        y2 = min(screen_h, y1 + 1)
+
+    return x1, y1, x2, y2
+
+def _get_region_from_poco(layer_poco, screen_w: int = None, screen_h: int = None, debug: bool = False):
+    """
+    ✅ Poco 레이어 범위(region) 산출 안정화 (통합판/수정)
+
+    포인트:
+      - get_position/get_size (정규화)에서 ref(center/size)를 잡고
+      - bounds 후보(bbox/rect + xy_swap 포함)를 만들되
+      - ref와의 center/size mismatch를 강하게 페널티로 주어,
+        bounds_rect / xy_swap 오해석이 면적만으로 이기는 현상을 차단한다.
+
+    반환: (x1,y1,x2,y2) 픽셀 bbox
+    """
+    if layer_poco is None or not screen_w or not screen_h:
+        return None
+
+    W, H = int(screen_w), int(screen_h)
+    full = float(W) * float(H)
+
+    def _is_norm_vals(vals) -> bool:
+        try:
+            m = max([abs(float(v)) for v in vals])
+            return m <= 1.5  # 0~1 근처 + 약간의 오차 허용
+        except Exception:
+            return False
+
+    def _clip_area(x1, y1, x2, y2) -> float:
+        xx1 = max(0, min(W, x1))
+        yy1 = max(0, min(H, y1))
+        xx2 = max(0, min(W, x2))
+        yy2 = max(0, min(H, y2))
+        return float(max(0, xx2 - xx1) * max(0, yy2 - yy1))
+
+    def _mk_bbox_from_center_size(cx, cy, sw, sh):
+        return (cx - sw / 2.0, cy - sh / 2.0, cx + sw / 2.0, cy + sh / 2.0)
+
+    def _rot_norm_point(cx, cy, rot):
+        if rot == 0:
+            return cx, cy
+        if rot == 90:
+            return (1.0 - cy), cx
+        if rot == 180:
+            return (1.0 - cx), (1.0 - cy)
+        if rot == 270:
+            return cy, (1.0 - cx)
+        return cx, cy
+
+    def _rot_norm_size(sw, sh, rot):
+        if rot in (90, 270):
+            return sh, sw
+        return sw, sh
+
+    def _clamp_penalty(raw_bbox_px, norm_bbox_px) -> int:
+        rx1, ry1, rx2, ry2 = raw_bbox_px
+        nx1, ny1, nx2, ny2 = norm_bbox_px
+        return int(abs(rx1 - nx1) + abs(ry1 - ny1) + abs(rx2 - nx2) + abs(ry2 - ny2))
+
+    # ref: pos/size에서 얻은 "기대 중심/크기"(normalized) → bounds 후보 검증에 사용
+    ref_center_size = None  # (rcx, rcy, rsw, rsh) normalized
+
+    def _score_bbox(raw_bbox_px, tag: str):
+        rx1, ry1, rx2, ry2 = raw_bbox_px
+        norm = _normalize_region(
+            (int(round(rx1)), int(round(ry1)), int(round(rx2)), int(round(ry2))),
+            W, H
+        )
+        area = _clip_area(*norm)
+
+        # 너무 작은 건 제거
+        if area < 16:
+            return None
+        # 거의 풀스크린은 루트뷰 오해 가능성 → 제거
+        if area > full * 0.92:
+            return None
+
+        pen = _clamp_penalty(
+            (int(round(rx1)), int(round(ry1)), int(round(rx2)), int(round(ry2))),
+            norm
+        )
+
+        # 기본 점수
+        score = float(area) - float(pen) * 50.0
+
+        # 너무 작으면 약간 감점
+        if area < full * 0.005:
+            score *= 0.7
+
+        # ✅ 핵심: ref 대비 center/size mismatch 페널티(오해석 후보 죽이기)
+        if ref_center_size is not None:
+            rcx, rcy, rsw, rsh = ref_center_size
+
+            cx = ((norm[0] + norm[2]) / 2.0) / float(W)
+            cy = ((norm[1] + norm[3]) / 2.0) / float(H)
+            sw = (norm[2] - norm[0]) / float(W)
+            sh = (norm[3] - norm[1]) / float(H)
+
+            center_diff = abs(cx - rcx) + abs(cy - rcy)
+            size_diff   = abs(sw - rsw) + abs(sh - rsh)
+
+            # 면적 스케일(full)에 맞춘 강한 페널티
+            # (bounds_rect_xy_swap 같은 오해석이 area로 이기는걸 막는 목적)
+            score -= (center_diff * full * 1.2)
+            score -= (size_diff   * full * 1.0)
+
+        return (score, area, pen, tag, norm)
+
+    candidates = []
+
+    # ------------------------------------------------------
+    # 1) get_position + get_size 후보 생성 + ref 확보
+    # ------------------------------------------------------
+    try:
+        pos = layer_poco.get_position()
+        size = layer_poco.get_size()
+        if pos and size and len(pos) == 2 and len(size) == 2:
+            cx, cy = float(pos[0]), float(pos[1])
+            sw, sh = float(size[0]), float(size[1])
+
+            if _is_norm_vals([cx, cy, sw, sh]):
+                # ref는 "원본 pos/size" 기준으로 잡는다(가장 일반적으로 맞음)
+                ref_center_size = (cx, cy, sw, sh)
+
+                base_variants = [
+                    (cx, cy, sw, sh, "pos/size"),
+                    (cy, cx, sw, sh, "pos/size_xy_swap"),
+                    (cx, cy, sh, sw, "pos/size_wh_swap"),
+                    (cy, cx, sh, sw, "pos/size_xywh_swap"),
+                ]
+
+                for (pcx, pcy, psw, psh, base_tag) in base_variants:
+                    for rot in (0, 90, 180, 270):
+                        rcx, rcy = _rot_norm_point(pcx, pcy, rot)
+                        rsw, rsh = _rot_norm_size(psw, psh, rot)
+                        x1n, y1n, x2n, y2n = _mk_bbox_from_center_size(rcx, rcy, rsw, rsh)
+                        raw = (x1n * W, y1n * H, x2n * W, y2n * H)
+                        item = _score_bbox(raw, f"{base_tag}_rot{rot}")
+                        if item:
+                            candidates.append(item)
+            else:
+                # pos/size가 px로 온 경우
+                raw = (cx - sw / 2.0, cy - sh / 2.0, cx + sw / 2.0, cy + sh / 2.0)
+                item = _score_bbox(raw, "pos/size_px")
+                if item:
+                    candidates.append(item)
+    except Exception:
+        pass
+
+    # ------------------------------------------------------
+    # 2) get_bounds 후보 생성: bbox/rect + xy_swap
+    #    ※ ref_center_size가 있으면 mismatch 페널티로 오해석 후보가 자동 탈락
+    # ------------------------------------------------------
+    try:
+        bd = layer_poco.get_bounds()
+        if bd and len(bd) == 4:
+            x1, y1, x3, y3 = [float(v) for v in bd]  # 이름 헷갈리지 않게 정리
+
+            if _is_norm_vals([x1, y1, x3, y3]):
+                # normalized일 때:
+                # - bbox 후보: (x1,y1,x2,y2) = (x1,y1,x3,y3)
+                # - rect 후보: (x,y,w,h) = (x1,y1,x3,y3)  → (x1, y1, x1+x3, y1+y3)
+                raw_bbox = (x1 * W, y1 * H, x3 * W, y3 * H)
+                raw_rect = (x1 * W, y1 * H, (x1 + x3) * W, (y1 + y3) * H)
+
+                # xy swap 후보 (normalized 값은 0~1이므로 swap도 같은 스케일로 생성)
+                raw_bbox_s = (y1 * W, x1 * H, y3 * W, x3 * H)
+                raw_rect_s = (y1 * W, x1 * H, (y1 + y3) * W, (x1 + x3) * H)
+
+            else:
+                # px일 때:
+                # - bbox 후보: (x1,y1,x2,y2) = (x1,y1,x3,y3)  (x3>x1 && y3>y1이면 대개 bbox)
+                # - rect 후보: (x,y,w,h)로 온 케이스도 있어 방어: (x1, y1, x1+x3, y1+y3)
+                raw_bbox = (x1, y1, x3, y3)
+                raw_rect = (x1, y1, x1 + x3, y1 + y3)
+
+                # xy swap 후보
+                raw_bbox_s = (y1, x1, y3, x3)
+                raw_rect_s = (y1, x1, y1 + y3, x1 + x3)
+
+            for raw, tag in [
+                (raw_bbox,  "bounds_bbox"),
+                (raw_rect,  "bounds_rect"),
+                (raw_bbox_s,"bounds_bbox_xy_swap"),
+                (raw_rect_s,"bounds_rect_xy_swap"),
+            ]:
+                item = _score_bbox(raw, tag)
+                if item:
+                    candidates.append(item)
+
+    except Exception:
+        pass
+
+    if not candidates:
+        return None
+
+    candidates.sort(key=lambda t: t[0], reverse=True)
+    best_score, best_area, best_pen, best_tag, best_bbox = candidates[0]
+
+    if debug:
+        log(f"[get_region] chosen={best_tag} score={best_score:.1f} area={best_area:.0f} clamp_pen={best_pen} bbox={best_bbox}")
+
+    return best_bbox
+
+# ======================================================
+# 특정 객체 나타나기 전까지 액션 반복
+# ======================================================
+def repeat_action_until_exists(poco_obj, action_fn, desc=None, timeout_sec=120.0, interval_sec=0.3):
+    """
+    poco_obj: 예) poco("a")
+    action_fn: 반복할 액션(함수) 예) lambda: swipe((960,900),(960,300),0.4)
+    """
+    end = time.time() + float(timeout_sec)
+    while time.time() < end:
+        try:
+            if poco_obj.exists():
+                if desc is not None:
+                    step(f"[OK] {desc}: PASS ✅ - {get_label(poco_obj)}")
+                else:
+                    step(f"[OK] object exists: PASS ✅ - {get_label(poco_obj)}")
+                return True  # 나타남 → 종료
+        except Exception:
+            if desc is not None:
+                soft_fail(f"[ERR] {desc}: FAIL ❌ - {get_label(poco_obj)}")
+            else:
+                soft_fail(f"[ERR] object exists: FAIL ❌ - {get_label(poco_obj)}")
+            pass
+
+        try:
+            action_fn()  # 나타나기 전까지 액션 반복
+        except Exception:
+            if desc is not None:
+                step(f"{desc}: 실패 ❌")
+            else:
+                step(f"[ERR] try action: 실패 ❌")
+            pass
+
+        time.sleep(float(interval_sec))
+
+    return False
+# 반복 액션 END ========================================
@@ -0,0 +1,736 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - Google Drive 청크 재개 업로드 매니저 (재시도/병렬/상태 저장)
+# ==========================================================
+# -*- coding: utf-8 -*-
+#   - Drive resumable 프로토콜을 HTTP로 직접 호출 (세션 시작 → Content-Range 청크 PUT → 308/200)
+#     · 인증은 maildrive._get_drive_credentials() 캐시(만료 시에만 refresh) → 매 업로드마다 service 재생성 없음
+#     · googleapiclient service(httplib2)는 스레드 안전하지 않음 → 업로드 1건당 HTTP 연결 1개로 병렬 처리
+#   - 청크 크기 QA_UPLOAD_CHUNK_MB(기본 8, 256KiB 배수로 맞춤), 재시도 QA_UPLOAD_RETRIES(기본 6, 지수 백오프+지터)
+#     · 5xx/429/연결 끊김 → 대기 후 서버에 수신 위치 조회(bytes */N) → 받은 곳부터 이어서 전송
+#     · 404/410(세션 만료) → 새 세션으로 처음부터 1회 재시작
+#   - 파일 업로드 세션은 QA_UPLOAD_STATE(기본 qa_common/_uploads/gdrive_uploads.json)에 저장
+#     → 중단된 Run을 다시 돌리면 같은 파일(경로/크기/앞뒤 1MB 해시)은 이어서 업로드
+#     · 오케스트레이터 워커 프로세스끼리 공유 → 읽기/수정/쓰기를 파일 락(<state>.lock, accounts._lock_file)으로 보호
+#   - 폴더는 archive.ZipPipe로 압축하면서 바로 스트리밍 업로드(QA_UPLOAD_STREAM=1, 기본) 또는 zip 후 파일 업로드
+#     · 스트리밍 중 세션 만료(404/410)/재시도 초과 → zip 생성 후 재개 가능한 파일 업로드로 폴백
+#     · 아카이빙 실패(압축 중 파일 변경/삭제)는 네트워크 재시도와 구분 → 세션 취소(DELETE), 마지막 청크 전송 없이 같은 폴백
+#   - upload_many(): 여러 산출물 동시 업로드 (QA_UPLOAD_WORKERS, 기본 3)
+#   - 검증: python -m common.upload --selftest  (로컬 Drive 대역 HTTP 서버 + 장애 주입)
+# ==========================================================
+import os, re, sys, json, time, uuid, random, hashlib, argparse, tempfile, threading, mimetypes
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlencode
+from typing import Optional, Dict, List, Union, Any, Callable, Tuple
+from .core import QAEnv, _env_bool, _env_int, step, use_env
+
+UPLOAD_URL = "https://www.googleapis.com/upload/drive/v3/files"
+API_URL = "https://www.googleapis.com/drive/v3"
+_ALIGN = 256 * 1024                     # 마지막 청크 외에는 256KiB 배수여야 함 (Drive 규칙)
+_RETRY_STATUS = (408, 429, 500, 502, 503, 504)
+
+
+class UploadError(RuntimeError):
+    pass
+
+
+class _SessionGone(Exception):
+    """업로드 세션 만료/삭제(404/410) → 새 세션 필요"""
+
+
+class _SourceError(Exception):
+    """원본(파일 읽기/ZipPipe 아카이빙) 실패 — 네트워크 재시도 대상 아님, 마지막 청크를 보내지 않음"""
+
+
+def _state_default() -> str:
+    p = os.environ.get("QA_UPLOAD_STATE", "").strip()
+    if p:
+        return p
+    qa_common_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # qa_common/common/ → qa_common/
+    return os.path.join(qa_common_dir, "_uploads", "gdrive_uploads.json")
+
+
+def _file_key(path: str, size: int) -> str:
+    """경로 + 크기 + 앞/뒤 1MB 해시 (같은 입력으로 다시 만든 zip도 같은 키 → 재개 가능)"""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        h.update(f.read(1 << 20))
+        if size > (2 << 20):
+            f.seek(size - (1 << 20))
+            h.update(f.read())
+    return f"{os.path.abspath(path)}|{size}|{h.hexdigest()[:16]}"
+
+
+class _Http:
+    """업로드 1건 전용 keep-alive 연결 (끊기면 다음 요청에서 재접속)"""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._conn = None
+        self._netloc = None
+
+    def request(self, method: str, url: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        u = urlsplit(url)
+        if self._conn is None or self._netloc != (u.scheme, u.netloc):
+            self.close()
+            cls = http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection
+            self._conn, self._netloc = cls(u.netloc, timeout=self.timeout), (u.scheme, u.netloc)
+        path = u.path + ("?" + u.query if u.query else "")
+        try:
+            self._conn.request(method, path, body=body, headers=headers or {})
+            r = self._conn.getresponse()
+            data = r.read()
+        except Exception:
+            self.close()
+            raise
+        return r.status, {k.lower(): v for k, v in r.getheaders()}, data
+
+    def close(self):
+        c, self._conn = self._conn, None
+        if c is not None:
+            try:
+                c.close()
+            except Exception:
+                pass
+
+
+class UploadManager:
+    """
+    Drive 재개 업로드 매니저.
+    - token_provider: 액세스 토큰 반환 함수 (기본: maildrive 자격 증명 캐시)
+    - upload_url/api_url: 기본 Google 엔드포인트 (로컬 대역 서버로 바꿔 검증 가능)
+    - upload(path|pipe) / upload_many([...]) → {name, id, link, bytes, sec, resumed, retries}
+    """
+
+    def __init__(self, *, token_provider: Optional[Callable[[], str]] = None,
+                 upload_url: Optional[str] = None, api_url: Optional[str] = None,
+                 state_path: Optional[str] = None, chunk_mb: Optional[float] = None,
+                 retries: Optional[int] = None, workers: Optional[int] = None,
+                 timeout: float = 120.0, env: Optional['QAEnv'] = None):
+        self.env = env
+        self.token_provider = token_provider or self._drive_token
+        self.upload_url = (upload_url or os.environ.get("QA_GDRIVE_UPLOAD_URL") or UPLOAD_URL).rstrip("/")
+        self.api_url = (api_url or os.environ.get("QA_GDRIVE_API_URL") or API_URL).rstrip("/")
+        self.state_path = state_path or _state_default()
+        mb = chunk_mb if chunk_mb is not None else _env_int("QA_UPLOAD_CHUNK_MB", 8)
+        self.chunk = max(_ALIGN, int(float(mb) * (1 << 20)) // _ALIGN * _ALIGN)
+        self.retries = _env_int("QA_UPLOAD_RETRIES", 6) if retries is None else retries
+        self.workers = workers or _env_int("QA_UPLOAD_WORKERS", 3)
+        self.timeout = timeout
+        self.backoff_base, self.backoff_max = 1.0, 60.0
+        self._state_lock = threading.Lock()
+
+    # ------------------------------
+    # 인증 / 로그
+    # ------------------------------
+    @staticmethod
+    def _drive_token() -> str:
+        from .maildrive import _get_drive_credentials
+        creds = _get_drive_credentials()
+        if creds is None:
+            raise UploadError("[GDRIVE] 비활성화 상태(GDRIVE_ENABLE=False)")
+        return creds.token
+
+    def _headers(self, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        h = {"Authorization": f"Bearer {self.token_provider()}"}
+        h.update(extra or {})
+        return h
+
+    def _log(self, msg: str):
+        try:
+            step(msg, env=self.env)
+        except Exception:
+            pass
+
+    # ------------------------------
+    # 상태 파일 (세션 URI/위치)
+    # ------------------------------
+    def _state_load(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _state_update(self, key: str, rec: Optional[Dict[str, Any]]):
+        from .accounts import _lock_file, _unlock_file
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        # 스레드 락(프로세스 내) + 파일 락(워커 프로세스 간) → 다른 워커의 재개 정보를 덮어쓰지 않음
+        with self._state_lock:
+            lk = _lock_file(self.state_path + ".lock")
+            try:
+                st = self._state_load()
+                if rec is None:
+                    st.pop(key, None)
+                else:
+                    st[key] = rec
+                # 일주일 지난 세션은 Drive에서도 만료 → 정리
+                now = time.time()
+                st = {k: v for k, v in st.items() if now - v.get("created", now) < 7 * 86400}
+                tmp = f"{self.state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(st, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, self.state_path)
+            finally:
+                _unlock_file(lk)
+
+    # ------------------------------
+    # 프로토콜
+    # ------------------------------
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_max, self.backoff_base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+    def _initiate(self, http_: _Http, name: str, mime: str, size: Optional[int],
+                  folder_id: Optional[str]) -> str:
+        meta: Dict[str, Any] = {"name": name}
+        if folder_id:
+            meta["parents"] = [folder_id]
+        q = urlencode({"uploadType": "resumable", "fields": "id,webViewLink", "supportsAllDrives": "true"})
+        hdr = {"Content-Type": "application/json; charset=UTF-8", "X-Upload-Content-Type": mime}
+        if size is not None:
+            hdr["X-Upload-Content-Length"] = str(size)
+        for attempt in range(self.retries + 1):
+            try:
+                status, h, _ = http_.request("POST", f"{self.upload_url}?{q}",
+                                             json.dumps(meta).encode("utf-8"), self._headers(hdr))
+                if status == 200 and h.get("location"):
+                    return h["location"]
+                if status not in _RETRY_STATUS:
+                    raise UploadError(f"업로드 세션 생성 실패: HTTP {status}")
+            except (OSError, http.client.HTTPException):
+                if attempt >= self.retries:
+                    raise
+            if attempt < self.retries:
+                time.sleep(self._backoff(attempt))
+        raise UploadError("업로드 세션 생성 재시도 초과")
+
+    @staticmethod
+    def _parse(status: int, h: Dict[str, str], body: bytes) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        """→ (서버 수신 바이트 수, 완료 시 파일 메타)"""
+        if status in (200, 201):
+            try:
+                return None, json.loads(body.decode("utf-8") or "{}")
+            except ValueError:
+                return None, {}
+        if status == 308:
+            m = re.match(r"bytes=0-(\d+)", h.get("range", ""))
+            return (int(m.group(1)) + 1 if m else 0), None
+        if status in (404, 410):
+            raise _SessionGone()
+        if status in _RETRY_STATUS:
+            raise ConnectionError(f"HTTP {status}")
+        raise UploadError(f"업로드 실패: HTTP {status} {body[:200]!r}")
+
+    def _query(self, http_: _Http, session: str, total: Optional[int]):
+        status, h, body = http_.request("PUT", session, b"", self._headers(
+            {"Content-Range": f"bytes */{total if total is not None else '*'}", "Content-Length": "0"}))
+        return self._parse(status, h, body)
+
+    def _put(self, http_: _Http, session: str, data: bytes, start: int, total: Optional[int]):
+        if data:
+            rng = f"bytes {start}-{start + len(data) - 1}/{total if total is not None else '*'}"
+        else:
+            rng = f"bytes */{total}"
+        status, h, body = http_.request("PUT", session, data, self._headers(
+            {"Content-Range": rng, "Content-Length": str(len(data))}))
+        return self._parse(status, h, body)
+
+    def _send_loop(self, http_: _Http, session: str, total: Optional[int],
+                   next_chunk: Callable[[int], Tuple[bytes, bool]], offset: int,
+                   on_progress: Callable[[int], None], res: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        offset부터 청크 전송. next_chunk(offset) → (데이터, 마지막 여부).
+        일시 오류는 백오프 후 수신 위치를 다시 조회해 이어서 보냄.
+        next_chunk 자체의 예외는 _SourceError (재시도/완료 처리 없이 즉시 중단).
+        """
+        fails = 0
+        while True:
+            try:
+                data, last = next_chunk(offset)
+            except Exception as e:
+                raise _SourceError(f"원본 읽기 실패: {type(e).__name__}: {e}") from e
+            try:
+                acked, meta = self._put(http_, session, data, offset,
+                                        (offset + len(data)) if last else total)
+                if meta is not None:
+                    on_progress(offset + len(data))
+                    return meta
+                offset, fails = acked, 0
+                on_progress(offset)
+            except _SessionGone:
+                raise
+            except (OSError, http.client.HTTPException) as e:
+                fails += 1
+                res["retries"] += 1
+                if fails > self.retries:
+                    raise UploadError(f"업로드 재시도 초과({self.retries}회): {e}")
+                wait = self._backoff(fails - 1)
+                self._log(f"[UPLOAD] {res['name']}: {e} → {wait:.1f}s 후 재개 ({fails}/{self.retries})")
+                time.sleep(wait)
+                try:
+                    acked, meta = self._query(http_, session, total)
+                    if meta is not None:
+                        return meta
+                    offset = acked
+                except (OSError, http.client.HTTPException):
+                    pass
+
+    def _cancel(self, http_: _Http, session: str):
+        """재개 세션 취소(DELETE) — 원본이 실패한 부분 업로드가 서버에 남지 않게 (실패는 무시, 세션은 어차피 만료)"""
+        try:
+            http_.request("DELETE", session, None, self._headers({"Content-Length": "0"}))
+        except Exception:
+            pass
+
+    def _finish(self, http_: _Http, res: Dict[str, Any], meta: Dict[str, Any], make_anyone: bool):
+        res["id"] = meta.get("id", "")
+        res["link"] = meta.get("webViewLink", "")
+        if make_anyone and res["id"]:
+            try:
+                http_.request("POST", f"{self.api_url}/files/{res['id']}/permissions?supportsAllDrives=true",
+                              json.dumps({"type": "anyone", "role": "reader"}).encode("utf-8"),
+                              self._headers({"Content-Type": "application/json"}))
+            except Exception:
+                pass
+        if res["id"] and not res["link"]:
+            try:
+                status, _, body = http_.request("GET", f"{self.api_url}/files/{res['id']}?fields=webViewLink",
+                                                None, self._headers())
+                if status == 200:
+                    res["link"] = json.loads(body.decode("utf-8")).get("webViewLink", "")
+            except Exception:
+                pass
+
+    # ------------------------------
+    # 업로드
+    # ------------------------------
+    def _upload_file(self, http_: _Http, path: str, name: str, mime: str, folder_id: Optional[str],
+                     progress: Callable[[int], None], res: Dict[str, Any]) -> Dict[str, Any]:
+        size = os.path.getsize(path)
+        res["bytes"] = size
+        key = _file_key(path, size)
+        rec = self._state_load().get(key)
+        session, offset = None, 0
+        if rec and rec.get("name") == name and rec.get("folder") == folder_id:
+            try:
+                offset, meta = self._query(http_, rec["session"], size)
+                if meta is not None:
+                    self._state_update(key, None)
+                    return meta
+                session = rec["session"]
+                res["resumed"] = offset
+                self._log(f"[UPLOAD] {name}: 이전 세션 재개 ({offset / 1048576:.1f}/{size / 1048576:.1f}MB)")
+            except (_SessionGone, OSError, http.client.HTTPException, UploadError):
+                session, offset = None, 0
+
+        with open(path, "rb") as f:
+            def _next(off: int) -> Tuple[bytes, bool]:
+                f.seek(off)
+                data = f.read(self.chunk)
+                return data, off + len(data) >= size
+
+            for restart in range(2):
+                if session is None:
+                    session, offset = self._initiate(http_, name, mime, size, folder_id), 0
+                    self._state_update(key, {"session": session, "name": name, "folder": folder_id,
+                                             "size": size, "created": time.time()})
+                try:
+                    meta = self._send_loop(http_, session, size, _next, offset, progress, res)
+                    self._state_update(key, None)
+                    return meta
+                except _SessionGone:
+                    self._state_update(key, None)
+                    if restart:
+                        raise UploadError("업로드 세션이 반복해서 만료됨")
+                    self._log(f"[UPLOAD] {name}: 세션 만료 → 처음부터 다시 업로드")
+                    session = None
+        raise UploadError("unreachable")
+
+    def _upload_stream(self, http_: _Http, pipe, name: str, mime: str, folder_id: Optional[str],
+                       progress: Callable[[int], None], res: Dict[str, Any]) -> Dict[str, Any]:
+        """크기를 모르는 스트림(ZipPipe 등): 서버가 아직 받지 못한 구간만 메모리에 유지"""
+        session = self._initiate(http_, name, mime, None, folder_id)
+        buf = bytearray()
+        base = [0, False]       # buf[0]의 스트림 위치, EOF 여부
+
+        def _next(off: int) -> Tuple[bytes, bool]:
+            del buf[:off - base[0]]
+            base[0] = off
+            while not base[1] and len(buf) < self.chunk:
+                b = pipe.read(self.chunk - len(buf))
+                if not b:
+                    base[1] = True
+                    break
+                buf.extend(b)
+            if base[1]:
+                res["bytes"] = off + len(buf)
+                return bytes(buf), True
+            return bytes(buf[:self.chunk]), False
+
+        try:
+            return self._send_loop(http_, session, None, _next, 0, progress, res)
+        except _SourceError:
+            self._cancel(http_, session)
+            raise
+
+    @staticmethod
+    def _close_pipe(pipe):
+        """ZipPipe.close()는 전달 안 된 아카이빙 예외를 다시 던짐 → 이미 실패 처리한 뒤라 무시"""
+        if hasattr(pipe, "close"):
+            try:
+                pipe.close()
+            except Exception:
+                pass
+
+    def upload(self, src: Union[str, Any], *, name: Optional[str] = None, folder_id: Optional[str] = None,
+               mime: Optional[str] = None, make_anyone: bool = False, stream: Optional[bool] = None,
+               progress: Optional[Callable[[str, int, Optional[int]], None]] = None) -> Dict[str, Any]:
+        """
+        src: 파일 경로 / 폴더 경로 / read()가 있는 스트림
+        - 폴더: stream=True(기본 QA_UPLOAD_STREAM=1)면 ZipPipe로 압축과 동시에 업로드, False면 zip 생성 후 재개 업로드
+        - progress(name, 보낸 바이트, 전체 바이트|None)
+        """
+        t0 = time.time()
+        cleanup = None
+        pipe = None
+        folder = None       # 스트리밍 중인 폴더 (실패 시 zip 파일 업로드로 폴백)
+        if isinstance(src, str):
+            src = os.path.abspath(src)
+            if os.path.isdir(src):
+                if _env_bool("QA_UPLOAD_STREAM", True) if stream is None else stream:
+                    from .archive import ZipPipe
+                    pipe, folder = ZipPipe(src), src
+                    name = name or pipe.name
+                else:
+                    from .maildrive import _zip_any
+                    src = cleanup = _zip_any(src)
+            name = name or os.path.basename(src)
+        else:
+            pipe = src
+            name = name or getattr(src, "name", None) or f"upload_{uuid.uuid4().hex[:8]}"
+        mime = mime or mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+        res: Dict[str, Any] = {"name": name, "id": "", "link": "", "bytes": None, "sec": 0.0,
+                               "resumed": 0, "retries": 0}
+        total = None if pipe is not None else os.path.getsize(src)
+        mark = [0.0]
+
+        def _progress(sent: int):
+            if progress:
+                progress(name, sent, total)
+            if total and sent - mark[0] >= total / 4 and sent < total:
+                mark[0] = sent
+                self._log(f"[UPLOAD] {name}: {sent * 100 // total}% ({sent / 1048576:.1f}/{total / 1048576:.1f}MB)")
+
+        http_ = _Http(self.timeout)
+        try:
+            meta = None
+            if pipe is not None:
+                try:
+                    meta = self._upload_stream(http_, pipe, name, mime, folder_id, _progress, res)
+                except (_SessionGone, UploadError, _SourceError) as e:
+                    if folder is None:
+                        raise UploadError(f"스트리밍 업로드 실패 (스트림은 재시작 불가): {str(e) or '세션 만료'}")
+                    # 폴더는 다시 압축할 수 있음 → zip 파일로 만들어 재개 가능한 업로드로 다시 시도
+                    self._log(f"[UPLOAD] {name}: 스트리밍 실패({str(e) or '세션 만료'}) → zip 생성 후 파일 업로드로 재시도")
+                    self._close_pipe(pipe)
+                    from .maildrive import _zip_any
+                    src = cleanup = _zip_any(folder)
+                    total = os.path.getsize(src)
+                    mark[0] = 0.0
+            if meta is None:
+                try:
+                    meta = self._upload_file(http_, src, name, mime, folder_id, _progress, res)
+                except _SourceError as e:
+                    raise UploadError(str(e)) from e.__cause__
+            self._finish(http_, res, meta, make_anyone)
+        finally:
+            http_.close()
+            if pipe is not None:
+                self._close_pipe(pipe)
+        if cleanup:
+            try:
+                os.remove(cleanup)
+            except OSError:
+                pass
+
+        res["sec"] = round(time.time() - t0, 2)
+        mb = (res["bytes"] or 0) / 1048576
+        self._log(f"[UPLOAD] 완료: {name} {mb:.1f}MB, {res['sec']}s ({mb / max(res['sec'], 0.01):.1f}MB/s)"
+                  f"{', 재개' if res['resumed'] else ''}{', 재시도 %d회' % res['retries'] if res['retries'] else ''}")
+        return res
+
+    def upload_many(self, items: List[Union[str, Dict[str, Any]]], **common) -> List[Dict[str, Any]]:
+        """
+        여러 산출물 동시 업로드 (입력 순서대로 결과 반환).
+        items: 경로 또는 {"src": 경로, "name"/"folder_id"/...: upload() 인자}
+        실패 항목은 {"name", "error"}로 반환 (나머지 업로드는 계속)
+        """
+        def _one(it):
+            kw = dict(common)
+            if isinstance(it, dict):
+                kw.update({k: v for k, v in it.items() if k != "src"})
+                it = it["src"]
+            try:
+                return self.upload(it, **kw)
+            except Exception as e:
+                self._log(f"[WARN] 업로드 실패: {it} ({e})")
+                return {"name": kw.get("name") or os.path.basename(str(it)), "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(items) or 1))) as ex:
+            return list(ex.map(_one, items))
+
+
+def get_upload_manager(env: Optional['QAEnv'] = None) -> 'UploadManager':
+    """env당 1개 (기본 Drive 엔드포인트/자격 증명 캐시 사용)"""
+    env = use_env(env)
+    if env is None:
+        return UploadManager()
+    mgr = getattr(env, "_upload_mgr", None)
+    if mgr is None:
+        mgr = env._upload_mgr = UploadManager(env=env)
+    return mgr
+
+
+# ==========================================================
+# 로컬 Drive 대역 서버 (검증용)
+# ==========================================================
+class LocalDriveStandIn:
+    """
+    표준 라이브러리 HTTP 서버로 Drive resumable 업로드 흉내.
+    - fail_every: N번째 PUT마다 503 (재시도 확인)
+    - partial: 청크의 일부만 받았다고 308 응답 (수신 위치 재동기화 확인)
+    - files: name → bytes, puts: PUT 횟수, sessions: 세션 수
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, fail_every: int = 0, partial: bool = False):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        outer = self
+        self.fail_every, self.partial = fail_every, partial
+        self.files: Dict[str, bytes] = {}
+        self.perms: List[str] = []
+        self.puts = 0
+        self.cancelled = 0
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *a):
+                pass
+
+            def _reply(self, code: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+                self.send_response(code)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> bytes:
+                n = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(n) if n else b""
+
+            def do_POST(self):
+                body = self._body()
+                u = urlsplit(self.path)
+                if u.path.startswith("/upload/files"):
+                    sid = uuid.uuid4().hex
+                    with outer._lock:
+                        outer.sessions[sid] = {"meta": json.loads(body or b"{}"), "data": bytearray()}
+                    self._reply(200, headers={"Location": f"http://{outer.hostport}/session/{sid}"})
+                elif u.path.endswith("/permissions"):
+                    outer.perms.append(u.path.split("/")[-2])
+                    self._reply(200, b"{}")
+                else:
+                    self._reply(404)
+
+            def do_DELETE(self):
+                sid = urlsplit(self.path).path.rsplit("/", 1)[-1]
+                with outer._lock:
+                    gone = outer.sessions.pop(sid, None)
+                    outer.cancelled += 1 if gone is not None else 0
+                self._reply(499 if gone is not None else 404)
+
+            def do_PUT(self):
+                body = self._body()
+                sid = urlsplit(self.path).path.rsplit("/", 1)[-1]
+                with outer._lock:
+                    s = outer.sessions.get(sid)
+                    outer.puts += 1
+                    n_put = outer.puts
+                if s is None:
+                    return self._reply(404)
+                if body and outer.fail_every and n_put % outer.fail_every == 0:
+                    return self._reply(503)
+                m = re.match(r"bytes (\*|(\d+)-(\d+))/(\*|\d+)", self.headers.get("Content-Range", ""))
+                if not m:
+                    return self._reply(400)
+                total = None if m.group(4) == "*" else int(m.group(4))
+                if m.group(2) is not None:
+                    start = int(m.group(2))
+                    if start != len(s["data"]):
+                        # 클라이언트가 이미 받은 구간을 다시 보냄 → 잘라서 수용
+                        body = body[len(s["data"]) - start:] if start < len(s["data"]) else b""
+                    if outer.partial and total is None and len(body) > _ALIGN:
+                        body = body[:len(body) // 2]
+                    s["data"].extend(body)
+                got = len(s["data"])
+                if total is not None and got >= total:
+                    name = s["meta"].get("name", sid)
+                    fid = s.get("id") or uuid.uuid4().hex[:12]
+                    s["id"] = fid
+                    outer.files[name] = bytes(s["data"])
+                    return self._reply(200, json.dumps({"id": fid, "webViewLink": f"http://drive.local/{fid}"}).encode(),
+                                       {"Content-Type": "application/json"})
+                hdr = {"Range": f"bytes=0-{got - 1}"} if got else {}
+                self._reply(308, headers=hdr)
+
+        self._srv = ThreadingHTTPServer((host, port), _Handler)
+        self._srv.daemon_threads = True
+        self.hostport = "%s:%d" % self._srv.server_address
+        self.upload_url = f"http://{self.hostport}/upload/files"
+        self.api_url = f"http://{self.hostport}/drive"
+        threading.Thread(target=self._srv.serve_forever, daemon=True).start()
+
+    def drop_session(self, session_url: str):
+        self.sessions.pop(session_url.rsplit("/", 1)[-1], None)
+
+    def close(self):
+        self._srv.shutdown()
+        self._srv.server_close()
+
+
+def selftest(size_mb: int = 24, chunk_mb: float = 1) -> int:
+    tmp = tempfile.mkdtemp(prefix="qa_upload_")
+    srv = LocalDriveStandIn(fail_every=7)
+    state = os.path.join(tmp, "state.json")
+    mk = dict(token_provider=lambda: "selftest", upload_url=srv.upload_url, api_url=srv.api_url,
+              state_path=state, chunk_mb=chunk_mb, retries=8)
+
+    def _file(name: str, mb: int) -> str:
+        p = os.path.join(tmp, name)
+        with open(p, "wb") as f:
+            f.write(os.urandom(mb << 20))
+        return p
+
+    checks: List[Tuple[str, bool]] = []
+    try:
+        a, b, c = _file("a.bin", size_mb), _file("b.bin", size_mb // 2), _file("c.bin", 3)
+        mgr = UploadManager(workers=3, **mk)
+        mgr.backoff_base = 0.05
+        res = mgr.upload_many([a, b, {"src": c, "name": "renamed.bin"}], make_anyone=True)
+        checks += [
+            ("병렬 업로드 3건 성공", all(r.get("id") for r in res)),
+            ("내용 일치", srv.files.get("a.bin") == open(a, "rb").read()
+             and srv.files.get("renamed.bin") == open(c, "rb").read()),
+            ("503 재시도 후 완료", sum(r.get("retries", 0) for r in res) > 0),
+            ("공개 권한 설정", len(srv.perms) == 3),
+            ("완료 후 상태 정리", not mgr._state_load()),
+        ]
+
+        # 중단 후 재개: 일부 청크 전송 뒤 예외로 끊고 새 매니저로 다시 업로드
+        d = _file("d.bin", 8)
+        srv.fail_every = 0
+        m1 = UploadManager(**mk)
+        m1.retries = 0
+
+        def _abort(name, sent, total):
+            if sent >= (3 << 20):
+                raise KeyboardInterrupt
+
+        try:
+            m1.upload(d, progress=_abort)
+        except KeyboardInterrupt:
+            pass
+        saved = bool(m1._state_load())
+        r2 = UploadManager(**mk).upload(d)
+        checks += [
+            ("중단 시 세션 저장", saved),
+            ("재개 업로드(앞부분 재전송 없음)", r2["resumed"] >= (3 << 20)),
+            ("재개 결과 일치", srv.files.get("d.bin") == open(d, "rb").read()),
+        ]
+
+        # 폴더 스트리밍 업로드 (ZipPipe) + 부분 수신 재동기화
+        import io, zipfile
+        folder = os.path.join(tmp, "portable")
+        os.makedirs(folder)
+        for i in range(12):
+            with open(os.path.join(folder, f"log_{i}.txt"), "w") as f:
+                f.write(f"line {i}\n" * 100000)
+            with open(os.path.join(folder, f"shot_{i}.webp"), "wb") as f:
+                f.write(os.urandom(200 << 10))
+        srv.partial = True
+        r3 = UploadManager(**mk).upload(folder)
+        z = zipfile.ZipFile(io.BytesIO(srv.files.get("portable.zip", b"")))
+        checks += [
+            ("폴더 스트리밍 업로드", bool(r3.get("id"))),
+            ("zip 무결성", z.testzip() is None and len(z.namelist()) == 24),
+        ]
+
+        # 스트리밍 도중 세션 만료(404) → zip 파일 업로드로 폴백
+        srv.files.pop("portable.zip", None)
+        dropped = []
+
+        def _expire(name, sent, total):
+            if total is None and sent >= (1 << 20) and not dropped:
+                for sid, s in list(srv.sessions.items()):
+                    if s["meta"].get("name") == name and "id" not in s:
+                        srv.sessions.pop(sid, None)
+                        dropped.append(sid)
+
+        r4 = UploadManager(**mk).upload(folder, progress=_expire)
+        z = zipfile.ZipFile(io.BytesIO(srv.files.get("portable.zip", b"")))
+        checks += [
+            ("스트림 세션 만료 → 파일 업로드 폴백", bool(dropped) and bool(r4.get("id"))),
+            ("폴백 zip 무결성", z.testzip() is None and len(z.namelist()) == 24),
+        ]
+
+        # 스트리밍 도중 아카이빙 실패(파일 1개 읽기 오류) → 잘린 zip을 완료 처리하지 않고 세션 취소 후 폴백
+        from . import archive
+        srv.files.pop("portable.zip", None)
+        orig_prepare, broken = archive._prepare, []
+
+        def _flaky_prepare(src, arcname, method, level):
+            if arcname.endswith("log_5.txt") and not broken:
+                broken.append(arcname)
+                raise OSError("선택 테스트: 파일이 압축 중 사라짐")
+            return orig_prepare(src, arcname, method, level)
+
+        archive._prepare = _flaky_prepare
+        try:
+            m5 = UploadManager(**mk)
+            r5 = m5.upload(folder)
+        finally:
+            archive._prepare = orig_prepare
+        z = zipfile.ZipFile(io.BytesIO(srv.files.get("portable.zip", b"")))
+        checks += [
+            ("아카이빙 실패 → 세션 취소 후 파일 업로드 폴백", bool(broken) and srv.cancelled >= 1 and bool(r5.get("id"))),
+            ("아카이빙 실패는 네트워크 재시도로 세지 않음", r5["retries"] == 0),
+            ("폴백 zip 무결성(잘린 zip 아님)", z.testzip() is None and len(z.namelist()) == 24),
+        ]
+    finally:
+        srv.close()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+    print(f"puts={srv.puts} sessions={len(srv.sessions)} files={len(srv.files)}")
+    return 0 if all(ok for _, ok in checks) else 1
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Drive 재개 업로드 매니저 검증 (로컬 Drive 대역 서버)")
+    ap.add_argument("--selftest", action="store_true", help="로컬 대역 서버로 재시도/재개/병렬/스트리밍 확인")
+    ap.add_argument("--size-mb", type=int, default=24)
+    ap.add_argument("--chunk-mb", type=float, default=1)
+    a = ap.parse_args(argv)
+    if not a.selftest:
+        ap.print_help()
+        return 0
+    return selftest(size_mb=a.size_mb, chunk_mb=a.chunk_mb)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
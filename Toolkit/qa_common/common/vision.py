@@ -0,0 +1,1675 @@
+# ==========================================================
+# QA 자동화 공통 모듈 - 이미지/템플릿 매칭 (tap_images, pick_best_template, tap_color_words, drag_right_from_target)
+# ==========================================================
+# -*- coding: utf-8 -*-
+import os, time, math, inspect, cv2
+import numpy as np
+from typing import Optional, Tuple, Callable, List, Any
+from airtest.core.api import G, log, device, swipe, shell, touch
+from airtest.aircv import find_all_template, imread
+from .core import soft_fail, step, use_env
+from .capture import FrameDiff, _xy_to_frame, frame_roi_delta, grab_frame
+from .profiler import profiled
+from .ui import _get_region_from_poco, _handle_socket_broken, _normalize_region, get_label
+
+
+# ==========================================================
+# 범위 내 이미지 탐색 후 터치 유틸리티
+#  - tap_images: 특정 영역 내에서 템플릿 이미지 여러 개 탐색 후 터치
+# ==========================================================
+def _dist(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+def _dedupe_points(points: List[Tuple[float, float, float]], radius: int = 18) -> List[Tuple[float, float, float]]:
+    """한 화면 내 근접 좌표 중복 제거(스크롤 페이지 간 dedupe는 의도적으로 하지 않음)."""
+    out: List[Tuple[float, float, float]] = []
+    r = float(radius)
+    for x, y, conf in sorted(points, key=lambda t: (-t[2], t[1], t[0])):  # conf desc 우선
+        dup = False
+        for ox, oy, _ in out:
+            if abs(x - ox) <= r and abs(y - oy) <= r:
+                dup = True
+                break
+        if not dup:
+            out.append((float(x), float(y), float(conf)))
+    out.sort(key=lambda t: (t[1], t[0]))  # 탭 순서: 좌상단 → 우하단
+    return out
+
+
+def _map_xy_to_device_resolution(x: float, y: float, shot_w: int, shot_h: int) -> Tuple[int, int, int, int]:
+    """
+    스크린샷 해상도(shot_w/shot_h)와 디바이스 입력 해상도(device().get_current_resolution())가 다르면
+    좌표를 비율로 스케일링해서 ADB input tap이 실제 눌러야 할 위치로 맞춘다.
+    """
+    xi, yi = int(round(x)), int(round(y))
+    try:
+        dw, dh = device().get_current_resolution()
+        dw, dh = int(dw), int(dh)
+        if dw > 0 and dh > 0 and (dw != shot_w or dh != shot_h):
+            xi = int(round(x * dw / shot_w))
+            yi = int(round(y * dh / shot_h))
+        # clamp
+        xi = max(1, min(xi, dw - 1))
+        yi = max(1, min(yi, dh - 1))
+        return xi, yi, dw, dh
+    except Exception:
+        # fallback: 스샷 해상도 기준으로 clamp
+        xi = max(1, min(xi, shot_w - 1))
+        yi = max(1, min(yi, shot_h - 1))
+        return xi, yi, shot_w, shot_
+        
+class TapNoEffectError(RuntimeError):
+    """탭 명령은 수행됐으나 화면상 변화(반응)가 감지되지 않을 때"""
+
+
+@profiled("tap_xy", lambda x, y, *a, **k: f"({float(x):.0f},{float(y):.0f})")
+def _tap_xy(
+    x: float, y: float,
+    shot_w: int, shot_h: int,
+    method: str = "adb",
+    debug: bool = False,
+    *,
+    env=None,
+    effect_check: bool = True,          # ✅ 무반응 체크 on/off
+    effect_wait_sec: float = 0.40,      # ✅ 탭 후 반응 대기(0.25~0.45) - 높을 수록 민감
+    effect_roi_r: int = 90,             # ✅ ROI 반경(60~110) - 높을 수록 민감
+    effect_mean_abs_thr: float = 0.35,  # ✅ ROI 변화 임계(0.25 ~ 2.0) - 낮을 수록 민감
+    verify_fn=None,                     # ✅ (선택) 앱별 검증 콜백: (env)->bool
+) -> bool:
+    """
+    - 탭 수행
+    - (선택) 무반응이면 TapNoEffectError 발생
+    - 예외 발생 시:
+        (B) socket broken 1회 복구 시도
+        (C) env.handle_exceptions는 1회만 호출
+      이후 1회 재시도
+    """
+    env = use_env(env)
+    used_exc_handler = False
+    handler = getattr(env, "handle_exceptions", None) if env is not None else None
+
+    def _do_tap_once():
+        m = (method or "adb").lower()
+
+        # 탭 전 이미지(무반응 판정용) - scrcpy 스트림 가능 시 최신 프레임(수십 ms)
+        before = None
+        if effect_check:
+            before = grab_frame(env)
+
+        if m == "airtest":
+            if debug:
+                log(f"[tap_xy] tap_method=airtest touch @{x:.1f},{y:.1f}")
+            touch((x, y))
+        else:
+            # adb(또는 auto/unknown은 adb로)
+            tx, ty, dw, dh = _map_xy_to_device_resolution(x, y, shot_w, shot_h)
+            if debug:
+                log(f"[tap_xy] tap_method=adb input tap @{tx},{ty} (from {x:.1f},{y:.1f}, shot={shot_w}x{shot_h} -> dev={dw}x{dh})")
+
+            out = shell(f"input tap {tx} {ty}")
+            if isinstance(out, str):
+                msg = out.strip()
+                if msg and any(k in msg for k in ("Must be root", "Permission denied", "not found", "inaccessible")):
+                    raise RuntimeError(msg)
+
+        # 탭 후 반응 대기
+        if effect_check and effect_wait_sec:
+            time.sleep(float(effect_wait_sec))
+
+        # (선택) 앱별 검증(가장 신뢰)
+        if callable(verify_fn):
+            ok = bool(verify_fn())
+            if not ok:
+                raise TapNoEffectError("tap no-effect (verify_fn false)")
+            step(f"[TAP_XY] tap: PASS ✅ - {x},{y}")
+            return True
+
+        # (기본) ROI 변화 검증
+        if effect_check:
+            after = grab_frame(env, fresh=True)
+
+            # ROI 비교 좌표는 '디바이스 스샷 좌표계' 기준 → 프레임 해상도로 환산
+            cx, cy = _xy_to_frame(x, y, shot_w, shot_h, after) if after is not None else (int(round(x)), int(round(y)))
+            try:
+                d = frame_roi_delta(before, after, int(cx), int(cy), r=int(effect_roi_r))
+            except Exception:
+                d = None
+            if debug:
+                log(f"[tap_xy] roi @{cx},{cy} r={effect_roi_r}: {d!r}")
+            # 비교 불가(None/해상도 불일치/ROI 과소)면 무반응으로 단정하지 않음(보수)
+            if d is not None and d.score < float(effect_mean_abs_thr):
+                raise TapNoEffectError(f"tap no-effect (roi unchanged, score={d.score:.2f})")
+        step(f"[TAP_XY] tap: PASS ✅ - {x},{y}")
+        return True
+
+    # ✅ 2회만 시도(초기 + 1회 재시도)
+    last_err = None
+    for attempt in (1, 2):
+        try:
+            return _do_tap_once()
+
+        except Exception as e:
+            last_err = e
+
+            # (B) socket broken이면 1회차에서만 복구 후 재시도
+            if attempt == 1 and _handle_socket_broken(e, env=env, where="[TAP_XY]"):
+                continue
+
+            # ✅ TapNoEffectError(roi unchanged / verify_fn false 포함)면:
+            # 예외처리기 1회 수행 후 "무조건" 1회 재시도
+            is_tap_noeffect = isinstance(e, TapNoEffectError)
+            noeffect_reason = str(e)
+
+            if attempt == 1:
+                # (C) 예외 처리기 1회만
+                if (not used_exc_handler) and callable(handler):
+                    used_exc_handler = True
+                    try:
+                        ret = handler(e, env)
+                        count = int(ret or 0)
+                    except Exception as he:
+                        step(f"[TAP_XY] handle_exceptions 에러: {he}", True)
+                        count = 0
+
+                    # 기존: count > 0일 때만 재시도
+                    if count > 0:
+                        step(f"[TAP_XY] 예외 처리기로 {count}개 rule 처리 → tap 재시도")
+                        continue
+
+                # 🔥 변경 핵심:
+                # handler가 0을 반환해도 TapNoEffectError면 1회는 재탭
+                if is_tap_noeffect:
+                    step(f"[TAP_XY] {noeffect_reason} → 예외 처리 1회 후 tap 재시도")
+                    continue
+
+            break
+
+    # 여기까지 왔으면 최종 실패
+    soft_fail(f"[TAP_XY] tap: FAIL ❌ {last_err!r}")
+    raise last_err
+
+
+def _maybe_wait_settle(sec: float):
+    if sec and sec > 0:
+        time.sleep(sec)
+
+def _find_all_template_safe(crop, tpl_img, *, threshold: float, rgb: bool, max_matches: int = 200):
+    """
+    airtest.aircv.find_all_template의 버전별 파라미터 차이를 흡수하면서
+    가능한 한 많은 매칭 결과를 가져온다.
+    """
+    kwargs = {"threshold": threshold, "rgb": rgb}
+    try:
+        sig = inspect.signature(find_all_template)
+        params = sig.parameters
+
+        # 버전에 따라 max_count / maxcnt / max_results 등으로 존재할 수 있음
+        for k in ("max_count", "maxcnt", "max_results", "max_result", "count"):
+            if k in params:
+                kwargs[k] = int(max_matches)
+                break
+    except Exception:
+        pass
+
+    return find_all_template(crop, tpl_img, **kwargs) or []
+
+
+def _color_gate_pass(
+    crop,
+    tpl_img,
+    cx: float,
+    cy: float,
+    *,
+    mean_abs_max: float = 18.0,     # 평균 색상 차이 상한(낮을수록 엄격)
+    pixel_diff_max: int = 35,       # 픽셀 단위 허용 오차(채널 기준, 낮을수록 엄격)
+    ratio_min: float = 0.85,        # “허용 오차 이내 픽셀 비율” 하한(높을수록 엄격)
+) -> bool:
+    """
+    템플릿 매칭 결과가 '형태는 유사하지만 색상이 다른' 오탐을 줄이기 위한 후처리 필터.
+    crop(검색영역) 내에서 (cx,cy) 중심으로 템플릿 크기만큼 패치를 떠서 템플릿과 색상 유사도를 검사한다.
+    """
+    if crop is None or tpl_img is None:
+        return True
+
+    ch, cw = crop.shape[:2]
+    th, tw = tpl_img.shape[:2]
+    if tw <= 0 or th <= 0 or cw <= 0 or ch <= 0:
+        return True
+
+    # 중심좌표 -> 템플릿 bbox (crop 좌표계)
+    x0 = int(round(float(cx) - tw / 2.0))
+    y0 = int(round(float(cy) - th / 2.0))
+    x1 = max(0, x0)
+    y1 = max(0, y0)
+    x2 = min(cw, x0 + tw)
+    y2 = min(ch, y0 + th)
+
+    # 겹치는 영역이 너무 작으면 판단 무의미 → 필터링하지 않음(=통과)
+    if (x2 - x1) < max(4, int(tw * 0.3)) or (y2 - y1) < max(4, int(th * 0.3)):
+        return True
+
+    patch = crop[y1:y2, x1:x2]
+    tpl_part = tpl_img[(y1 - y0):(y2 - y0), (x1 - x0):(x2 - x0)]
+
+    if patch.shape[:2] != tpl_part.shape[:2]:
+        return True
+
+    # dtype 안전 변환 후 diff 계산
+    a = patch.astype(np.int16)
+    b = tpl_part.astype(np.int16)
+
+    diff = np.abs(a - b)
+
+    # 채널이 있으면 픽셀별 최대 채널 diff로 “픽셀 단위” 판정
+    if diff.ndim == 3:
+        per_pixel = diff.max(axis=2)
+        mean_abs = float(diff.mean())  # 채널 포함 평균
+    else:
+        per_pixel = diff
+        mean_abs = float(diff.mean())
+
+    ratio = float((per_pixel <= int(pixel_diff_max)).mean())
+
+    return (mean_abs <= float(mean_abs_max)) and (ratio >= float(ratio_min))
+
+def tap_images(
+    img_path: str,
+    *,
+    layer_poco=None,
+    region: Optional[Tuple[int, int, int, int]] = None,
+    threshold: float = 0.82,           # 템플릿 매칭 기준 올릴수록 엄격
+    # 면밀 탐색 옵션
+    threshold_floor: float = 0.35,     # 1차 실패/누락 시 여기까지 낮춰 재탐색
+    threshold_step: float = 0.03,      # threshold를 내리는 간격
+    max_matches: int = 100,            # find_all 결과 상한(가능하면 크게)
+    region_margin_px: int = 12,        # region 가장자리 누락 방지용 마진
+    settle_before_sec: float = 0.35,   # 첫 탐색 전 화면 안정화 대기
+    settle_after_tap_sec: float = 0.15, # 탭 후 안정화 대기(기존 interval과 별개)
+
+    rgb: bool = False,                  # 템플릿 매칭 시 RGB 모드 사용 여부(기본 BGR)
+    # 🔎 색상 오탐 방지(형태 유사 + 색상 다른 케이스 필터)
+    color_gate: bool = True,
+    color_mean_abs_max: float = 18.0,   # 평균 색상 차이 상한(낮을수록 엄격) (12 ~ 24)(default: 18)
+    color_pixel_diff_max: int = 35,     # 픽셀 단위 허용 오차(채널 기준, 낮을수록 엄격) (25 ~ 45)(default: 35)
+    color_ratio_min: float = 0.85,      # “허용 오차 이내 픽셀 비율” 하한(높을수록 엄격) (0.78 ~ 0.92)(default: 0.85)
+
+    # ✅ 요청하신 2-pass
+    scroll_enable: bool = True,
+    scroll_to_end: bool = True,
+    scroll_ratio: float = 0.65,
+    scroll_duration: float = 0.35,
+    scroll_settle_sec: float = 0.25,
+    scroll_max_swipes: int = 20,
+    scroll_no_move_limit: int = 2,      # FrameDiff 이동량 0 판정 연속 횟수(1 = 첫 정지에서 즉시 중단)
+
+    max_taps: int = 100,
+    interval: float = 0.25,
+    dedup_radius_px: int = 40,
+    timeout_sec: float = 120.0,
+    tap_method: str = "adb",   # ✅ 기본 adb 탭
+    env=None,  # ✅ click_core 처럼 예외 처리기(env.handle_exceptions) 연동
+
+    # (호환) 기본 인자 - 본 모드에선 사용하지 않음
+    target_taps: Optional[int] = None,  # ✅ 목표 탭 수(없으면 첫 탐색 결과로 고정)
+    enforce_target: bool = True,        # ✅ 목표 미달이면 조기 종료 금지
+    stall_max_loops: int = 3,          # ✅ 목표 미달 상태에서 매칭 불가/소진 시 재시도 한도
+
+    debug: bool = False,
+) -> int:
+    """
+    ✅ 단순/안전 2-pass:
+      1) 첫 화면 snapshot 1회 → 매칭 포인트 전부 탭
+      2) 스크롤 가능하면 끝까지 스크롤
+      3) 마지막 화면 snapshot 1회 → 매칭 포인트 전부 탭
+
+    주의: “중간 페이지”에만 존재하는 포인트까지 전부 처리해야 한다면
+          추후 '스크롤하면서 각 페이지마다 탭' 모드로 확장하는 것을 권장.
+    """
+    t0 = time.time()
+    taps = 0
+    env = use_env(env)
+
+    # 템플릿 로드
+    try:
+        tpl_img = imread(img_path)
+        if tpl_img is None:
+            soft_fail(f"[TAP_IMAGES] template load: FAIL ❌ {img_path}")
+            return 0
+    except Exception as e:
+        soft_fail(f"[TAP_IMAGES] imread err: FAIL ❌ {e!r}")
+        return 0
+
+    def _scan_points_once():
+        if settle_before_sec:
+            _maybe_wait_settle(settle_before_sec)
+
+        screen = G.DEVICE.snapshot()
+        if screen is None:
+            return [], None, None, None
+
+        h, w = screen.shape[:2]
+
+        # region 결정
+        region_this = region
+        if region_this is None and layer_poco is not None:
+            try:
+                region_this = _get_region_from_poco(layer_poco, w, h)
+            except Exception as e:
+                soft_fail(f"[TAP_IMAGES] _get_region_from_poco err: FAIL ❌ {e!r}")
+                region_this = None
+
+        # region 정규화 + margin
+        if region_this is None:
+            x1, y1, x2, y2 = 0, 0, w, h
+        else:
+            x1, y1, x2, y2 = _normalize_region(region_this, w, h)
+            m = int(region_margin_px or 0)
+            x1 = max(0, x1 - m); y1 = max(0, y1 - m)
+            x2 = min(w, x2 + m); y2 = min(h, y2 + m)
+
+        crop = screen[y1:y2, x1:x2]
+        if crop is None:
+            return [], w, h, (x1, y1, x2, y2)
+
+        ch, cw = crop.shape[:2]
+
+        # 템플릿이 crop보다 큰 경우: 이번 pass는 0포인트
+        th0, tw0 = tpl_img.shape[:2]
+        if (cw < tw0 or ch < th0):
+            if debug:
+                log(f"[tap_images] skip: template({tw0}x{th0}) > crop({cw}x{ch}). region=({x1},{y1},{x2},{y2})")
+            return [], w, h, (x1, y1, x2, y2)
+
+        # threshold hi -> lo로 면밀 탐색
+        th = float(threshold)
+        lo = float(threshold_floor)
+        thr_step = float(threshold_step) if threshold_step else 0.0
+        t_list = [th] if thr_step <= 0 else []
+        if thr_step > 0:
+            cur = th
+            while cur >= lo - 1e-9:
+                t_list.append(round(cur, 4))
+                cur -= thr_step
+
+        pts = []
+        seen = set()
+        for tcur in t_list:
+            found = _find_all_template_safe(
+                crop,
+                tpl_img,
+                threshold=float(tcur),
+                rgb=bool(rgb),
+                max_matches=int(max_matches),
+            ) or []
+
+            for mobj in found:
+                cx, cy = mobj.get("result", (None, None))
+                if cx is None or cy is None:
+                    continue
+
+                if color_gate:
+                    if not _color_gate_pass(
+                        crop, tpl_img, float(cx), float(cy),
+                        mean_abs_max=float(color_mean_abs_max),
+                        pixel_diff_max=int(color_pixel_diff_max),
+                        ratio_min=float(color_ratio_min),
+                    ):
+                        continue
+
+                gx, gy = float(cx + x1), float(cy + y1)
+                key = (int(round(gx)), int(round(gy)))
+                if key in seen:
+                    continue
+                seen.add(key)
+                conf = float(mobj.get("confidence", 0.0) or 0.0)
+                pts.append((gx, gy, conf))
+
+            if len(pts) >= max(20, int(max_matches * 0.6)):
+                break
+
+        pts.sort(key=lambda t: (t[1], t[0]))
+        pts = _dedupe_points([(x, y, c) for x, y, c in pts], radius=int(dedup_radius_px))
+
+        if debug:
+            log(f"[tap_images] scan: points={len(pts)} in region=({x1},{y1},{x2},{y2})")
+
+        return pts, w, h, (x1, y1, x2, y2)
+
+    def _tap_points(points, w, h):
+        nonlocal taps
+        if not points:
+            return
+
+        for (gx, gy, conf) in points:
+            if taps >= int(max_taps):
+                soft_fail(f"[TAP_IMAGES] stop(FAIL): reached max_taps={max_taps}")
+                return
+            if (time.time() - t0) >= float(timeout_sec):
+                soft_fail(f"[TAP_IMAGES] stop(FAIL): timeout {timeout_sec}s")
+                return
+
+            if debug:
+                log(f"[tap_images] tap#{taps+1} at ({gx:.1f},{gy:.1f}) conf={conf}")
+
+            _tap_xy(
+                gx, gy,
+                shot_w=int(w), shot_h=int(h),
+                method=tap_method,
+                debug=debug,
+                env=env,
+                effect_check=True,
+            )
+            taps += 1
+            _maybe_wait_settle(settle_after_tap_sec)
+            time.sleep(max(0.02, float(interval)))
+
+    # 1) 첫 화면: 캡쳐 1회 + 전부 탭
+    pts1, w1, h1, _ = _scan_points_once()
+    if w1 is None:
+        return 0
+    _tap_points(pts1, w1, h1)
+
+    # 2) 끝까지 스크롤(가능하면)
+    scrolled = False
+    if scroll_enable and scroll_to_end:
+        no_move = 0
+        moved_total = 0.0
+        fd = FrameDiff()
+        fd.update(grab_frame(env), motion=False)   # 기준 프레임(이후 after가 다음 before)
+        for i in range(int(scroll_max_swipes)):
+            if (time.time() - t0) >= float(timeout_sec):
+                break
+
+            cx = int(w1 * 0.5)
+            y_start = int(h1 * (0.5 + float(scroll_ratio) / 2))
+            y_end   = int(h1 * (0.5 - float(scroll_ratio) / 2))
+            swipe((cx, y_start), (cx, y_end), duration=float(scroll_duration))
+            _maybe_wait_settle(scroll_settle_sec)
+
+            d = fd.update(grab_frame(env, fresh=True))
+
+            if d is not None and d.is_static():
+                no_move += 1
+                if debug:
+                    log(f"[tap_images] scroll: no-move #{no_move} (i={i+1}) {d!r}")
+                if no_move >= int(scroll_no_move_limit):
+                    break
+            else:
+                no_move = 0
+                scrolled = True
+                if d is not None:
+                    moved_total += abs(d.dy)
+                    if debug:
+                        log(f"[tap_images] scroll: moved dy={d.dy:.0f}px (i={i+1}) {d!r}")
+
+        if debug:
+            log(f"[tap_images] scroll_to_end done. scrolled={scrolled} moved_total={moved_total:.0f}px")
+
+    # 3) 스크롤 했으면 마지막 화면: 캡쳐 1회 + 전부 탭
+    if scrolled:
+        pts2, w2, h2, _ = _scan_points_once()
+        if w2 is not None:
+            _tap_points(pts2, w2, h2)
+
+    if taps <= 0:
+        soft_fail("[TAP_IMAGES] no match: FAIL ❌ - 0 taps")
+    else:
+        step(f"[OK] tap_images: PASS ✅ - {taps} taps")
+    return int(taps)
+# 범위 내 이미지 탐색 후 터치 유틸리티 END =======================================
+
+# ====================================================================
+# 이미지 면밀 탐색 헬퍼
+# ====================================================================
+def _to_px_point(p, sw: int, sh: int):
+    """
+    poco get_position()이 (0~1) 정규화로 오거나, px로 오거나 둘 다 대응.
+    """
+    if not p or len(p) < 2:
+        return None
+    x, y = float(p[0]), float(p[1])
+
+    # normalized
+    if 0.0 <= x <= 1.0 and 0.0 <= y <= 1.0:
+        return int(round(x * sw)), int(round(y * sh))
+
+    # already px
+    return int(round(x)), int(round(y))
+
+
+def _crop_by_center(screen, cx: int, cy: int, half_w: int, half_h: int):
+    sh, sw = screen.shape[:2]
+    x1 = max(0, cx - half_w)
+    y1 = max(0, cy - half_h)
+    x2 = min(sw, cx + half_w)
+    y2 = min(sh, cy + half_h)
+    return screen[y1:y2, x1:x2], (x1, y1, x2, y2)
+
+def _phash_64(gray: np.ndarray) -> int:
+    g = gray
+    if g is None:
+        return 0
+
+    # ✅ 알파/컬러/그레이 모두 수용 → 그레이로 통일
+    if g.ndim == 3:
+        if g.shape[2] == 4:
+            g = cv2.cvtColor(g, cv2.COLOR_RGBA2GRAY)
+        else:
+            g = cv2.cvtColor(g, cv2.COLOR_RGB2GRAY)
+    elif g.ndim != 2:
+        # 이상 케이스 방어
+        g = np.array(g, dtype=np.uint8)
+        if g.ndim == 3 and g.shape[2] == 4:
+            g = cv2.cvtColor(g, cv2.COLOR_RGBA2GRAY)
+        elif g.ndim == 3:
+            g = cv2.cvtColor(g, cv2.COLOR_RGB2GRAY)
+
+    g = cv2.resize(g, (32, 32), interpolation=cv2.INTER_AREA)
+    g = np.float32(g)
+    dct = cv2.dct(g)
+    block = dct[:8, :8].copy()
+    block[0, 0] = 0.0
+    med = np.median(block)
+    bits = (block > med).astype(np.uint8).flatten()
+    val = 0
+    for b in bits:
+        val = (val << 1) | int(b)
+    return int(val)
+
+def _to_px_bounds(bounds, sw: int, sh: int):
+    """
+    Poco get_bounds() 호환:
+    - (x1,y1,x2,y2) normalized  ✅ (대부분)
+    - (x,y,w,h) normalized      (드묾)
+    - (x1,y1,x2,y2) px
+    - (x,y,w,h) px
+    """
+    # dict 형태면 (x,y,w,h)로 취급
+    if isinstance(bounds, dict):
+        x = float(bounds.get("x", 0))
+        y = float(bounds.get("y", 0))
+        w = float(bounds.get("width", 0))
+        h = float(bounds.get("height", 0))
+
+        # normalized?
+        if 0 <= x <= 1.5 and 0 <= y <= 1.5 and 0 < w <= 1.5 and 0 < h <= 1.5:
+            x1 = int(round(x * sw))
+            y1 = int(round(y * sh))
+            x2 = int(round((x + w) * sw))
+            y2 = int(round((y + h) * sh))
+        else:
+            x1 = int(round(x))
+            y1 = int(round(y))
+            x2 = int(round(x + w))
+            y2 = int(round(y + h))
+
+        x1 = max(0, min(sw - 1, x1))
+        y1 = max(0, min(sh - 1, y1))
+        x2 = max(1, min(sw, x2))
+        y2 = max(1, min(sh, y2))
+        return x1, y1, x2, y2
+
+    # tuple/list 형태
+    a, b, c, d = bounds
+    a = float(a); b = float(b); c = float(c); d = float(d)
+
+    # 1) normalized 후보
+    if 0 <= a <= 1.5 and 0 <= b <= 1.5 and 0 <= c <= 1.5 and 0 <= d <= 1.5:
+        # (x1,y1,x2,y2) normalized 이면 보통 c>a, d>b
+        if c >= a and d >= b:
+            x1 = int(round(a * sw))
+            y1 = int(round(b * sh))
+            x2 = int(round(c * sw))
+            y2 = int(round(d * sh))
+        else:
+            # (x,y,w,h) normalized fallback
+            x1 = int(round(a * sw))
+            y1 = int(round(b * sh))
+            x2 = int(round((a + c) * sw))
+            y2 = int(round((b + d) * sh))
+    else:
+        # 2) px 후보
+        # (x1,y1,x2,y2) px 이면 보통 c>a, d>b
+        if c >= a and d >= b:
+            x1 = int(round(a))
+            y1 = int(round(b))
+            x2 = int(round(c))
+            y2 = int(round(d))
+        else:
+            # (x,y,w,h) px fallback
+            x1 = int(round(a))
+            y1 = int(round(b))
+            x2 = int(round(a + c))
+            y2 = int(round(b + d))
+
+    x1 = max(0, min(sw - 1, x1))
+    y1 = max(0, min(sh - 1, y1))
+    x2 = max(1, min(sw, x2))
+    y2 = max(1, min(sh, y2))
+    return x1, y1, x2, y2
+
+def _center_crop_to_aspect(img: np.ndarray, aspect: float) -> np.ndarray:
+    h, w = img.shape[:2]
+    if h <= 1 or w <= 1:
+        return img
+    cur = w / float(h)
+    if abs(cur - aspect) < 1e-6:
+        return img
+    if cur > aspect:
+        new_w = int(round(h * aspect))
+        x1 = max(0, (w - new_w) // 2)
+        x2 = min(w, x1 + new_w)
+        return img[:, x1:x2]
+    else:
+        new_h = int(round(w / aspect))
+        y1 = max(0, (h - new_h) // 2)
+        y2 = min(h, y1 + new_h)
+        return img[y1:y2, :]
+
+def _hamming64(a: int, b: int) -> int:
+    return int((a ^ b).bit_count())
+
+
+def _ncc_same_size(a_gray: np.ndarray, b_gray: np.ndarray) -> float:
+    if a_gray.ndim != 2:
+        a_gray = cv2.cvtColor(a_gray, cv2.COLOR_RGB2GRAY)
+    if b_gray.ndim != 2:
+        b_gray = cv2.cvtColor(b_gray, cv2.COLOR_RGB2GRAY)
+
+    a = cv2.normalize(a_gray, None, 0, 255, cv2.NORM_MINMAX)
+    b = cv2.normalize(b_gray, None, 0, 255, cv2.NORM_MINMAX)
+    res = cv2.matchTemplate(a, b, cv2.TM_CCOEFF_NORMED)
+    return float(res[0, 0])  # -1~1
+
+def _to_hsv(img: np.ndarray, *, rgb: bool) -> np.ndarray:
+    img = np.asarray(img)
+    if img.ndim == 2:
+        return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR if not rgb else cv2.COLOR_GRAY2RGB)
+    if img.shape[2] == 4:
+        img = img[:, :, :3]
+    code = cv2.COLOR_RGB2HSV if rgb else cv2.COLOR_BGR2HSV
+    return cv2.cvtColor(img, code)
+
+def _to_gray(img: np.ndarray, *, rgb: bool) -> np.ndarray:
+    img = np.asarray(img)
+    if img.ndim == 2:
+        return img
+    if img.shape[2] == 4:
+        img = img[:, :, :3]
+    code = cv2.COLOR_RGB2GRAY if rgb else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(img, code)
+
+def _color_signature_score(c_img, t_img, *, rgb: bool, s_min: int, v_min: int, debug: bool = False,
+                          hue_gate_deg: float = 18.0) -> float:
+    """
+    단색 배지(배경색 + 흰 글자)에서 안정적으로 '배경색'만 비교하도록 개선.
+    - 흰 글자/저채도 픽셀을 강하게 배제
+    - 채도 상위 퍼센타일만 사용해 배경색 hue를 추정
+    """
+    import numpy as np, cv2, math
+
+    if c_img is None or t_img is None:
+        return 0.0
+
+    c = c_img
+    t = t_img
+
+    # HSV 변환
+    if rgb:
+        c_hsv = cv2.cvtColor(c, cv2.COLOR_RGB2HSV)
+        t_hsv = cv2.cvtColor(t, cv2.COLOR_RGB2HSV)
+    else:
+        c_hsv = cv2.cvtColor(c, cv2.COLOR_BGR2HSV)
+        t_hsv = cv2.cvtColor(t, cv2.COLOR_BGR2HSV)
+
+    cH, cS, cV = cv2.split(c_hsv)
+    tH, tS, tV = cv2.split(t_hsv)
+
+    # 1) 기본 마스크: 채도/밝기 컷
+    #    (기존보다 살짝 보수적으로: 흰 글자/연한 테두리 배제 목적)
+    s_cut = max(int(s_min), 80)
+    v_cut = max(int(v_min), 60)
+    c_mask0 = ((cS >= s_cut) & (cV >= v_cut)).astype(np.uint8) * 255
+    t_mask0 = ((tS >= s_cut) & (tV >= v_cut)).astype(np.uint8) * 255
+
+    # 2) "고채도 상위 픽셀만" 남기기 (배경색 중심)
+    def top_sat_mask(S, base_mask, pct=70):
+        vals = S[base_mask > 0]
+        if vals.size < 40:
+            return None
+        thr = np.percentile(vals, pct)  # 채도 상위 pct%
+        m = ((S >= thr) & (base_mask > 0)).astype(np.uint8) * 255
+        if cv2.countNonZero(m) < 40:
+            return None
+        return m
+
+    c_mask = top_sat_mask(cS, c_mask0, pct=70)
+    if c_mask is None:
+        c_mask = c_mask0
+
+    t_mask = top_sat_mask(tS, t_mask0, pct=70)
+    if t_mask is None:
+        t_mask = t_mask0
+
+    c_cnt = cv2.countNonZero(c_mask)
+    t_cnt = cv2.countNonZero(t_mask)
+    if c_cnt < 40 or t_cnt < 40:
+        if debug:
+            log(f"[exists_strict][color] mask too small crop={c_cnt} tpl={t_cnt}")
+        return 0.0
+
+    # 원형 평균 hue
+    def mean_hue_rad(h, mask):
+        vals = h[mask > 0].astype(np.float32)  # H: 0~179
+        ang = vals * (2.0 * math.pi / 180.0)
+        sx = float(np.mean(np.cos(ang)))
+        sy = float(np.mean(np.sin(ang)))
+        if abs(sx) < 1e-6 and abs(sy) < 1e-6:
+            return None
+        a = math.atan2(sy, sx)
+        if a < 0:
+            a += 2.0 * math.pi
+        return a
+
+    mc = mean_hue_rad(cH, c_mask)
+    mt = mean_hue_rad(tH, t_mask)
+    if mc is None or mt is None:
+        return 0.0
+
+    d = abs(mc - mt)
+    d = min(d, 2.0 * math.pi - d)
+    hue_diff_deg = d * (180.0 / math.pi)
+
+    # hue gate
+    if hue_diff_deg > float(hue_gate_deg):
+        if debug:
+            log(f"[exists_strict][color] hue_gate reject diff={hue_diff_deg:.1f}deg > {hue_gate_deg:.1f}")
+        return 0.0
+
+    hue_sim = max(0.0, 1.0 - (hue_diff_deg / float(hue_gate_deg)))
+
+    # S/V 평균 유사도 (마스크 기반)
+    cS_m = float(np.mean(cS[c_mask > 0]))
+    tS_m = float(np.mean(tS[t_mask > 0]))
+    cV_m = float(np.mean(cV[c_mask > 0]))
+    tV_m = float(np.mean(tV[t_mask > 0]))
+
+    sv_sim = max(0.0, 1.0 - (abs(cS_m - tS_m) / 255.0) - (abs(cV_m - tV_m) / 255.0))
+    sv_sim = max(0.0, min(1.0, sv_sim))
+
+    # ✅ 배경색 배지에서는 hue를 더 믿되, sv도 일정 반영
+    color = (0.80 * hue_sim) + (0.20 * sv_sim)
+    color = max(0.0, min(1.0, color))
+
+    if debug:
+        log(f"[exists_strict][color] hue_sim={hue_sim:.4f} diff={hue_diff_deg:.1f}deg sv_sim={sv_sim:.4f} color={color:.4f}")
+
+    return color
+
+def _find_badge_rect_candidate(region_bgr, *, rgb: bool, s_min: int, v_min: int):
+    """
+    region 안에서 '채도가 있는 둥근 사각형(단계 배지)' 후보를 1개 찾는다.
+    반환: (x1,y1,x2,y2) or None  (region 로컬 좌표)
+    """
+    hsv = _to_hsv(region_bgr, rgb=rgb)
+    H, S, V = cv2.split(hsv)
+
+    mask = ((S >= s_min) & (V >= v_min)).astype(np.uint8) * 255
+
+    # 노이즈 정리
+    kernel = np.ones((5,5), np.uint8)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=1)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN,  kernel, iterations=1)
+
+    cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not cnts:
+        return None
+
+    h, w = region_bgr.shape[:2]
+    best = None
+    best_score = -1.0
+
+    for c in cnts:
+        x, y, cw, ch = cv2.boundingRect(c)
+        area = cw * ch
+        if area < 400:  # 너무 작은 것 제거
+            continue
+
+        ar = cw / float(max(1, ch))  # 배지는 가로가 더 김
+        if not (1.8 <= ar <= 6.0):
+            continue
+
+        # 화면 상단부에 있는 후보를 약간 선호(배지 위치가 상단에 가까움)
+        top_bonus = max(0.0, 1.0 - (y / float(max(1, h))))
+
+        # 면적 + 비율 + 상단 보너스
+        score = (area * 1.0) * (1.0 + 0.25 * top_bonus)
+        if score > best_score:
+            best_score = score
+            best = (x, y, x+cw, y+ch)
+
+    return best
+
+def _verify_score(
+    region_img: np.ndarray,
+    tpl_img: np.ndarray,
+    *,
+    rgb: bool = False,             # ✅ 핵심: 기본 False(BGR)
+    debug: bool = False,
+    color_s_min: int = 60,
+    color_v_min: int = 50,
+    region_offset_xy=None,
+    use_blob: bool = True,           # ✅ 추가
+    use_color_sig: bool = True,      # ✅ 추가
+) -> float:
+    """
+    후보 crop(블랍/원본/센터크롭)로 tpl과 비교해서 0~1 score 산출
+    """
+    crop = region_img
+    tpl  = tpl_img
+
+    th, tw = tpl.shape[:2]
+    if crop is None or crop.size == 0 or th < 4 or tw < 4:
+        return 0.0
+
+    # 후보 생성 (기존 blob 탐지/expanded bbox 로직은 네 파일에 있는 걸 그대로 쓰되,
+    # 여기서는 "이미 만들어진 후보 crop 리스트(cands)"만 사용한다고 가정)
+    cands = []
+
+    # ✅ blob 후보: '배지 사각형'만 뽑아서 비교 정확도 올림
+    if use_blob:
+        bbox = _find_badge_rect_candidate(crop, rgb=rgb, s_min=color_s_min, v_min=color_v_min)
+        if bbox is not None:
+            x1, y1, x2, y2 = bbox
+            pad = 6
+            x1p = max(0, x1 - pad); y1p = max(0, y1 - pad)
+            x2p = min(crop.shape[1], x2 + pad); y2p = min(crop.shape[0], y2 + pad)
+            blob_crop = crop[y1p:y2p, x1p:x2p]
+
+            # meta를 넣어주면 best 글로벌 좌표 디버그도 정확히 찍힘
+            meta = (x1, y1, x2-x1, y2-y1, x1p, y1p, x2p, y2p)
+            cands.append(("blob", blob_crop, meta))
+
+            if debug:
+                log(f"[exists_strict][blob] bbox=({x1},{y1},{x2-x1},{y2-y1}) expanded=({x1p},{y1p},{x2p},{y2p})")
+
+    # 0) blob 기반 후보가 있으면 meta 포함해서 append
+    #    (네 코드에 이미 blob bbox/expanded bbox 계산이 있으니 거기서 ("blob", crop_blob, meta)로 넣어)
+    #    여기서는 안전 fallback만 제공
+    cands.append(("raw", crop, None))
+    c2 = _center_crop_to_aspect(crop, tw / float(th))
+    if c2 is not None and c2.size > 0:
+        cands.append(("center", c2, None))
+
+    tpl_gray = _to_gray(tpl, rgb=rgb)
+    tpl_hash = _phash_64(tpl_gray)
+
+    best = 0.0
+    best_tag = None
+    best_meta = None
+
+    for idx, (tag, c, meta) in enumerate(cands):
+        c_rs = cv2.resize(c, (tw, th), interpolation=cv2.INTER_AREA)
+
+        c_gray = _to_gray(c_rs, rgb=rgb)
+        ncc = _ncc_same_size(c_gray, tpl_gray)            # -1~1
+        ncc01 = max(0.0, min(1.0, (ncc + 1.0) / 2.0))     # 0~1
+
+        c_hash = _phash_64(c_gray)
+        ph = 1.0 - (_hamming64(c_hash, tpl_hash) / 64.0)  # 0~1
+
+        if use_color_sig:
+            color = _color_signature_score(
+                c_rs, tpl,
+                rgb=rgb,
+                s_min=color_s_min,
+                v_min=color_v_min,
+                debug=debug
+            )
+            score = (0.40 * ncc01) + (0.25 * ph) + (0.35 * color)
+        else:
+            # ✅ 회색/저채도 아이콘 전용: 색 점수 제거(형태/구조 위주)
+            color = 0.0
+            score = (0.65 * ncc01) + (0.35 * ph)
+
+        if debug:
+            log(f"[exists_strict][verify] cand#{idx} tag={tag} ncc01={ncc01:.4f} ph={ph:.4f} color={color:.4f} score={score:.4f}")
+
+        if score > best:
+            best = score
+            best_tag = tag
+            best_meta = meta
+
+    # ✅ best 후보의 좌표/박스도 확실히 출력 (meta를 네 blob 로직에서 넣어주면 여기서 찍힘)
+    if debug and best_tag is not None and best_meta is not None and region_offset_xy is not None:
+        try:
+            # meta 포맷을 (bx,by,bw,bh,x1,y1,x2,y2) 로 유지한다는 전제
+            bx, by, bw, bh, x1, y1, x2, y2 = best_meta
+            cx = int(round((x1 + x2) * 0.5))
+            cy = int(round((y1 + y2) * 0.5))
+            ox, oy = region_offset_xy
+            log(f"[exists_strict][best] tag={best_tag} bbox_global=({ox+x1},{oy+y1},{x2-x1},{y2-y1}) center=({ox+cx},{oy+cy})")
+        except Exception:
+            pass
+
+    return float(best)
+
+# 템플릿 존재 여부 검사
+def exists_strict_template(
+    poco_obj=None,
+    template_path=None,
+    *,
+    threshold: float = 0.55,
+    return_score: bool = False,
+    debug: bool = False,
+    rgb: bool = False,                 # ✅ 추가: 기본 False(BGR)
+    color_s_min: int = 60,
+    color_v_min: int = 50,
+    bound_padding_ratio: float = 0.03,
+    # 호출부에서 고정 region/screen 넣을 때
+    screen_override=None,
+    region_override=None,
+    use_blob: bool = True,
+    use_color_sig: bool = True,
+    **_
+):
+    """
+    - poco_obj bounds 기반 region을 잡고, 그 region 안에서 템플릿과의 유사도를 검증
+    - rgb 기본 False(BGR). (Airtest snapshot/cv2.imread는 BGR이 일반적)
+    """
+    tpl = cv2.imread(template_path, cv2.IMREAD_COLOR)
+    if tpl is None:
+        if debug:
+            log(f"[exists_strict] template load failed: {template_path}")
+        return (False, 0.0) if return_score else False
+
+    screen = screen_override if screen_override is not None else G.DEVICE.snapshot()
+    if screen is None:
+        return (False, 0.0) if return_score else False
+
+    sh, sw = screen.shape[:2]
+
+    # region_override=(region, (ox,oy)) 지원
+    region_offset_xy = None
+    if region_override is not None:
+        region, region_offset_xy = region_override
+    else:
+        # ✅ NEW: 기준 오브젝트가 없으면 전체 화면에서 찾기
+        if poco_obj is None:
+            region = screen
+            region_offset_xy = (0, 0)
+            if debug:
+                log(f"[exists_strict][region] FULLSCREEN size=({sw}x{sh})")
+        else:
+            b = poco_obj.get_bounds()
+            x1, y1, x2, y2 = _to_px_bounds(b, sw, sh)
+            pad = float(bound_padding_ratio)
+            bw = max(1, x2 - x1); bh = max(1, y2 - y1)
+            rx1 = max(0, x1 - int(bw*pad))
+            ry1 = max(0, y1 - int(bh*pad))
+            rx2 = min(sw, x2 + int(bw*pad))
+            ry2 = min(sh, y2 + int(bh*pad))
+            region = screen[ry1:ry2, rx1:rx2]
+            region_offset_xy = (rx1, ry1)
+            if debug:
+                log(f"[exists_strict][region] ({rx1},{ry1})-({rx2},{ry2}) size=({rx2-rx1}x{ry2-ry1}) pad_ratio={pad}")
+
+    # ✅ 여기서 blob 후보를 만들고 meta를 (bx,by,bw,bh,x1,y1,x2,y2) 형태로 넣어줘야
+    # _verify_score의 [best] global 좌표 로그가 정확해짐.
+    score = _verify_score(
+        region, tpl,
+        rgb=rgb,
+        debug=debug,
+        color_s_min=color_s_min,
+        color_v_min=color_v_min,
+        region_offset_xy=region_offset_xy,
+        use_blob=use_blob,
+        use_color_sig=use_color_sig,
+    )
+
+    ok = score >= float(threshold)
+    if debug:
+        log(f"[exists_strict][poco] {os.path.basename(template_path)} score={score:.4f} threshold={threshold:.4f} -> {ok}")
+
+    return (ok, score) if return_score else ok
+
+# 최적의 템플릿 선택
+def pick_best_template(
+    badge: Optional[Any] = None,
+    *,
+    templates: dict,
+    accept_threshold: float = 0.55,
+    debug: bool = False,
+    # 배지 주변을 얼마나 넓게 볼지 (배지 센터 기준)
+    crop_half_w: int = 180,
+    crop_half_h: int = 70,
+    use_blob: bool = True,
+    use_color_sig: bool = True,
+    **exists_kwargs
+):
+    screen = G.DEVICE.snapshot()
+    if screen is None:
+        return None, 0.0
+    sh, sw = screen.shape[:2]
+
+    # ✅ NEW: 기준 poco_obj(badge)가 없으면 전체 화면에서 비교
+    if badge is None:
+        region_pack = (screen, (0, 0))  # (region, offset)
+        if debug:
+            log(f"[pick_best] badge=None -> FULLSCREEN compare ({sw}x{sh})")
+
+        best_label, best_score = None, -1.0
+        for label, path in templates.items():
+            ok, score = exists_strict_template(
+                None, path,
+                return_score=True,
+                threshold=accept_threshold,
+                debug=debug,
+                screen_override=screen,
+                region_override=region_pack,
+                use_blob=use_blob,
+                use_color_sig=use_color_sig,
+                **exists_kwargs
+            )
+            if debug:
+                log(f"[pick_best] {label} -> ok={ok} score={score:.4f}")
+
+            if score > best_score:
+                best_score = score
+                best_label = label
+
+        if best_label is not None and best_score >= float(accept_threshold):
+            return best_label, best_score
+        return None, best_score
+
+    # ✅ 1) bounds 대신 position(센터) 우선 사용
+    center = None
+    try:
+        pos = badge.get_position()
+        center = _to_px_point(pos, sw, sh)
+    except Exception:
+        center = None
+
+    # ✅ 2) position이 실패하면 bounds fallback
+    if center is None:
+        try:
+            b = badge.get_bounds()
+            x1, y1, x2, y2 = _to_px_bounds(b, sw, sh)
+            center = (int((x1 + x2) / 2), int((y1 + y2) / 2))
+        except Exception:
+            center = None
+
+    if center is None:
+        if debug:
+            log("[pick_best] failed to get center (position/bounds)")
+        return None, 0.0
+
+    cx, cy = center
+
+    # ✅ 3) center 기준 region crop (이게 핵심)
+    region, (rx1, ry1, rx2, ry2) = _crop_by_center(screen, cx, cy, int(crop_half_w), int(crop_half_h))
+    region_pack = (region, (rx1, ry1))  # exists_strict_template가 global 좌표 찍을 때 필요
+
+    if debug:
+        log(f"[pick_best] screen=({sw}x{sh}) center=({cx},{cy})")
+        log(f"[pick_best] region=({rx1},{ry1})-({rx2},{ry2}) size=({rx2-rx1}x{ry2-ry1})")
+
+    best_label, best_score = None, -1.0
+
+    # ✅ 4) 템플릿별 점수 비교 (최대 스코어 선택)
+    for label, path in templates.items():
+        ok, score = exists_strict_template(
+            badge, path,
+            return_score=True,
+            threshold=accept_threshold,
+            debug=debug,
+            # ✅ 동일 screen/region에서만 비교 (공정)
+            screen_override=screen,
+            region_override=region_pack,
+            **exists_kwargs
+        )
+        if debug:
+            log(f"[pick_best] {label} -> ok={ok} score={score:.4f}")
+
+        if score > best_score:
+            best_score = score
+            best_label = label
+
+    if best_label is not None and best_score >= float(accept_threshold):
+        return best_label, best_score
+    return None, best_score
+
+
+# =====================================================
+# 검은 색상이 아닌 단어 찾은 후 클릭 → 추가 액션 진행
+# - tap_color_words: 특정 영역 내에서 색상이 있는 단어를 찾아 클릭
+# =====================================================
+def _find_color_word_in_crop(
+    crop_img,
+    *,
+    # “검정이 아닌(색 있는)” 판정 기준
+    sat_min: int = 55,        # 채도 하한(높을수록 엄격)
+    val_min: int = 45,        # 밝기 하한(너무 어두운 노이즈 제외)
+    # 단어 묶기/필터링
+    word_dilate_x: int = 18,  # 수평 팽창(글자들을 단어로 묶는 핵심)
+    word_dilate_y: int = 5,   # 수직 팽창
+    min_w: int = 16,
+    min_h: int = 14,
+    max_h_ratio: float = 0.35,  # ROI 대비 너무 큰 박스 제외
+) -> List[Tuple[int, int, int, int]]:
+    """
+    ROI(crop) 안에서 '검정이 아닌 글자(색상 있는 글자)'를 단어 단위 박스로 검출.
+    return: crop 좌표계의 (x1,y1,x2,y2) 리스트
+    """
+    if crop_img is None:
+        return []
+
+    h, w = crop_img.shape[:2]
+    if h <= 0 or w <= 0:
+        return []
+
+    # HSV 변환 (Airtest snapshot의 채널 순서가 RGB/BGR 혼재 가능성이 있으나,
+    # 채도/밝기 기반 마스크는 실전에서 큰 문제 없이 동작하는 편입니다.)
+    hsv = cv2.cvtColor(crop_img, cv2.COLOR_BGR2HSV)
+    H, S, V = cv2.split(hsv)
+
+    # 비검정(=색이 있는) 픽셀: 채도 >= sat_min AND 밝기 >= val_min
+    mask = ((S >= sat_min) & (V >= val_min)).astype(np.uint8) * 255
+
+    # 노이즈 정리
+    mask = cv2.medianBlur(mask, 3)
+
+    # 글자들을 단어로 묶기(수평 dilate가 핵심)
+    kx = max(3, int(word_dilate_x))
+    ky = max(3, int(word_dilate_y))
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kx, ky))
+    blob = cv2.dilate(mask, kernel, iterations=1)
+
+    # 윤곽 검출
+    contours, _ = cv2.findContours(blob, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = []
+    max_h = int(h * max_h_ratio)
+
+    for c in contours:
+        x, y, bw, bh = cv2.boundingRect(c)
+        if bw < min_w or bh < min_h:
+            continue
+        if bh > max_h:
+            continue
+        boxes.append((x, y, x + bw, y + bh))
+
+    # 위->아래, 좌->우 정렬
+    boxes.sort(key=lambda b: (b[1], b[0]))
+    return boxes
+
+
+def tap_color_words(
+    layer_poco,
+    *,
+    verify_fn=None,
+    popup_close_fn: Callable[[], None],
+    env=None,
+    # 판정 파라미터(기본값은 “색상 다른 단어만” 타겟팅)
+    sat_min: int = 55,          # 채도 하한
+    val_min: int = 45,          # 밝기 하한
+    word_dilate_x: int = 18,    # 수평 팽창
+    word_dilate_y: int = 5,
+    min_w: int = 16,
+    min_h: int = 14,
+    max_h_ratio: float = 0.35,
+    # 실행 제어
+    max_taps: int = 60,
+    settle_after_tap_sec: float = 0.20,
+    settle_after_close_sec: float = 0.20,
+    dedupe_radius_px: int = 22,
+    timeout_sec: float = 60.0,
+    debug: bool = False,
+) -> int:
+    """
+    layer_poco의 bounds(좌표) 내에서
+    '검정이 아닌(색상 있는)' 단어를 순서대로 탭하고, 팝업 닫기를 반복.
+
+    핵심: 탭/팝업닫기 후 화면 상태가 바뀌므로 "매 회 재스냅샷/재탐색"한다.
+    """
+    env = use_env(env)
+    t0 = time.time()
+    taps = 0
+    tap_pts: List[Tuple[float, float]] = []
+    used_exc_handler = False
+    handler = getattr(env, "handle_exceptions", None) if env is not None else None  # ✅ 추가
+
+    def _dedup_center(cx, cy) -> bool:
+        r = float(dedupe_radius_px)
+        for ox, oy in tap_pts:
+            if abs(cx - ox) <= r and abs(cy - oy) <= r:
+                return True
+        return False
+
+    # 루프: 매번 현재 화면에서 “다음 단어 1개”를 찾아 클릭하는 방식이 가장 안전
+    while True:
+        try:
+            if taps >= int(max_taps):
+                if debug:
+                    log(f"[color_words] stop: max_taps={max_taps}")
+                break
+            if (time.time() - t0) >= float(timeout_sec):
+                if debug:
+                    log(f"[color_words] stop: timeout {timeout_sec}s")
+                break
+
+            screen = G.DEVICE.snapshot()
+            if screen is None:
+                if debug:
+                    log("[color_words] snapshot is None")
+                break
+
+            h, w = screen.shape[:2]
+
+            # ✅ layer 좌표는 common에 이미 있는 함수로 뽑기
+            region_raw = _get_region_from_poco(layer_poco, w, h, debug=debug)
+            if not region_raw:
+                soft_fail("[COLOR_WORDS] get_region_from_poco: FAIL ❌ - region is None (layer bounds not available)")
+                break
+
+            x1, y1, x2, y2 = _normalize_region(region_raw, w, h)
+            crop = screen[y1:y2, x1:x2]
+            if crop is None or crop.size == 0:
+                if debug:
+                    log("[color_words] crop empty")
+                break
+
+            boxes = _find_color_word_in_crop(
+                crop,
+                sat_min=sat_min,
+                val_min=val_min,
+                word_dilate_x=word_dilate_x,
+                word_dilate_y=word_dilate_y,
+                min_w=min_w,
+                min_h=min_h,
+                max_h_ratio=max_h_ratio,
+            )
+
+            if debug:
+                log(f"[color_words] boxes={len(boxes)} in region=({x1},{y1},{x2},{y2})")
+
+            picked = None
+            edge_pad = 6
+
+            for (bx1, by1, bx2, by2) in boxes:
+                cx = x1 + (bx1 + bx2) / 2.0
+                cy = y1 + (by1 + by2) / 2.0
+
+                if not (x1 <= cx < x2 and y1 <= cy < y2):
+                    continue
+                if (cx <= x1 + edge_pad) or (cx >= x2 - edge_pad) or (cy <= y1 + edge_pad) or (cy >= y2 - edge_pad):
+                    continue
+
+                cx = max(x1 + 1, min(cx, x2 - 2))
+                cy = max(y1 + 1, min(cy, y2 - 2))
+
+                if _dedup_center(cx, cy):
+                    continue
+
+                picked = (cx, cy, (bx1, by1, bx2, by2))
+                break
+
+            if picked is None:
+                if debug:
+                    log("[color_words] no new non-black word boxes; stop")
+                break
+
+            cx, cy, b = picked
+
+            _tap_xy(
+                cx, cy,
+                shot_w=int(w), shot_h=int(h),
+                method="adb",
+                debug=debug,
+                env=env,
+                effect_check=True,
+                verify_fn=verify_fn,
+            )
+            tap_pts.append((cx, cy))
+            taps += 1
+
+            time.sleep(float(settle_after_tap_sec))
+
+            # 팝업 닫기
+            try:
+                popup_close_fn()
+            except Exception as e:
+                soft_fail(f"[COLOR_WORDS] popup_close_fn: FAIL ❌ - {e!r}")
+
+            time.sleep(float(settle_after_close_sec))
+
+        except Exception as e:
+            # ✅ 전반 예외 발생 시: 예외처리기 1회 수행 후 재시도
+            if (not used_exc_handler) and callable(handler):
+                used_exc_handler = True
+                step(f"[COLOR_WORDS] WARN ⚠️ unexpected error -> handle_exceptions then retry: {e!r}", True)
+                try:
+                    handler(e, env)
+                except Exception as he:
+                    step(f"[COLOR_WORDS] handle_exceptions 에러: {he!r}", True)
+                time.sleep(0.3)
+                continue
+
+            # ✅ 이미 예외처리기 1회 사용했는데 또 터지면 종료
+            soft_fail(f"[COLOR_WORDS] unexpected: FAIL ❌ - {e!r}")
+            break
+    step(f"[OK] tap_color_words: PASS ✅ - {taps} taps")
+    return int(taps)
+# 컬러단어 탭 END ========================================
+
+# =====================================================
+# 🖱️ 지정 레이어(ROI) 내 템플릿 기준: "살짝 위"에서 우측 끝까지 드래그 반복
+#   - 완료/새로고침 버튼(종료 조건) 등장 시 반복 종료
+# drag_right_from_target: 특정 영역 내에서 템플릿 이미지 여러 개 탐색 후 우측으로 드래그
+# =====================================================
+def drag_right_from_target(
+    target,   # str(이미지 경로) 또는 poco 객체(selector 포함)
+    *,
+    layer_poco,
+    done_poco,
+    threshold: float = 0.82,
+    rgb: bool = False,
+    # 드래그 포인트 보정(템플릿/타겟 중심 기준 위로 이동)
+    y_offset_px: int = 5,
+    # 드래그 종료점(ROI 우측 끝에서 살짝 안쪽)
+    end_margin_px: int = 8,
+    # ROI 보정(가장자리 누락 방지)
+    region_margin_px: int = 8,
+    # 타이밍
+    settle_before_sec: float = 0.25,
+    settle_after_drag_sec: float = 0.50,
+    duration: float = 0.8,
+    steps: int = 200,
+    # 반복 제어
+    max_drags: int = 60,
+    timeout_sec: float = 120.0,
+    interval_on_miss_sec: float = 0.25,
+    env=None,
+    debug: bool = False,
+) -> int:
+    """
+    기능 요약
+      1) layer_poco 영역을 ROI로 설정 (_get_region_from_poco)
+      2) ROI 내에서 target을 찾는다.
+         - target이 str: 템플릿 매칭(_find_all_template_safe)으로 좌상단→우하단 우선
+         - target이 poco: selector면 후보를 열거해 ROI 안쪽만 필터 후 좌상단 우선으로 1개 선택
+      3) 드래그 시작점은 "타겟 중심보다 약간 위(y_offset_px)"
+      4) 드래그 종료점은 ROI의 우측 끝(x2 - end_margin_px)
+      5) 한 번 드래그를 시작하면, 타겟이 드래그 도중 사라져도 중단하지 않고 1회는 끝까지 수행
+      6) 드래그 1회 완료 후 다시 target 탐색 → 반복
+      7) done_poco(완료/새로고침 등)가 등장하면 종료
+
+    반환: 수행한 drag 횟수
+    """
+    env = use_env(env)
+    t0 = time.time()
+    drags = 0
+
+    is_template = isinstance(target, str)
+
+    # 템플릿인 경우만 이미지 로드
+    tpl_img = None
+    if is_template:
+        try:
+            tpl_img = imread(target)
+            if tpl_img is None:
+                soft_fail(f"[DRAG_TARGET] template load: FAIL ❌ - {target}")
+                return 0
+        except Exception as e:
+            soft_fail(f"[DRAG_TARGET] imread err: FAIL ❌ - {e!r}")
+            return 0
+
+    def _clamp_int(v, lo, hi):
+        try:
+            v = int(round(float(v)))
+        except Exception:
+            v = int(v)
+        return int(max(lo, min(hi, v)))
+
+    def _pick_poco_point_in_roi(sel, w, h, x1, y1, x2, y2):
+        """
+        selector(복수 매칭 가능)에서 ROI 내부 후보를 수집해
+        좌상단→우하단 우선으로 1개 픽하여 (gx, gy) 반환.
+
+        핵심 변경:
+        - 후보가 하나도 없을 때, selector 대표 좌표를 '그냥 반환'하지 않는다.
+        - fallback 대표 좌표도 ROI/edge 검증을 통과할 때만 사용하고,
+            통과 못하면 (None, None)로 MISS 처리하게 한다.
+        - 필요 시 hierarchy dump로 갱신을 1회 시도(특히 count/index가 불안정할 때).
+        """
+        edge_pad = max(6, int(region_margin_px))
+        candidates = []
+
+        def _inside_and_not_edge(cx, cy) -> bool:
+            if cx is None or cy is None:
+                return False
+            if not (x1 <= cx < x2 and y1 <= cy < y2):
+                return False
+            if (cx <= x1 + edge_pad) or (cx >= x2 - edge_pad) or (cy <= y1 + edge_pad) or (cy >= y2 - edge_pad):
+                return False
+            return True
+
+        def _get_center_xy(obj):
+            tb = _get_region_from_poco(obj, w, h, debug=False)
+            if tb:
+                tx1, ty1, tx2, ty2 = map(int, tb)
+                return (tx1 + tx2) / 2.0, (ty1 + ty2) / 2.0
+            px, py = obj.get_position()
+            return float(px) * float(w), float(py) * float(h)
+
+        # (선택) native poco(apoco)면 dump로 갱신 1회 시도
+        # - selector count()/index가 가끔 stale일 때가 있어 “후보 0개” 방지 목적
+        try:
+            a = getattr(env, "apoco", None)
+            if a is not None and hasattr(a, "agent") and hasattr(a.agent, "hierarchy"):
+                a.agent.hierarchy.dump()
+        except Exception:
+            pass
+
+        # 1) sel.count() + sel[i]로 후보 열거
+        n = None
+        try:
+            n = int(sel.count())
+        except Exception:
+            n = None
+
+        if n is not None and n > 0:
+            lim = min(n, 120)  # 필요 시 상향(복수 ImageView 케이스)
+            for i in range(lim):
+                try:
+                    obj = sel[i]
+                    if not obj.exists():
+                        continue
+                    cx, cy = _get_center_xy(obj)
+                    if not _inside_and_not_edge(cx, cy):
+                        continue
+                    # 정렬키(y, x)
+                    candidates.append((cy, cx))
+                except Exception:
+                    continue
+
+        # 2) 후보가 있으면 좌상단 우선 1개 픽
+        if candidates:
+            candidates.sort(key=lambda t: (t[0], t[1]))
+            cy, cx = candidates[0]
+            return cx, cy
+
+        # 3) 후보가 없으면 “대표 1개 fallback”은 하되, 검증 통과 시에만 반환
+        #    (통과 못하면 MISS로 보내서 다음 루프에서 재탐색하게 함)
+        try:
+            cx, cy = _get_center_xy(sel)
+            if _inside_and_not_edge(cx, cy):
+                return cx, cy
+            return None, None
+        except Exception:
+            return None, None
+
+    while True:# 반복마다 최초 예외 처리기 수행
+        handler = getattr(env, "handle_exceptions", None) if env is not None else None
+        if callable(handler):
+            try:
+                handler(None, env)
+            except Exception as he:
+                step(f"[DRAG_TARGET] handle_exceptions 에러: {he}", True)
+        if (time.time() - t0) >= float(timeout_sec):
+            if debug:
+                log(f"[DRAG_TARGET] stop: timeout {timeout_sec}s")
+            break
+
+        if drags >= int(max_drags):
+            if debug:
+                log(f"[DRAG_TARGET] stop: reached max_drags={max_drags}")
+            break
+
+        # 종료 조건(완료/새로고침 버튼 등장)
+        try:
+            if done_poco is not None and done_poco.exists():
+                if debug:
+                    log(f"[DRAG_TARGET] done_poco exists -> stop ({get_label(done_poco)})")
+                step(f"[OK] drag_right_target: PASS ✅ - {drags} drags")
+                break
+        except Exception:
+            pass
+
+        # settle before
+        if settle_before_sec:
+            time.sleep(float(settle_before_sec))
+
+        # 화면 캡쳐 및 ROI 계산
+        screen = G.DEVICE.snapshot()
+        if screen is None:
+            time.sleep(0.2)
+            continue
+
+        h, w = screen.shape[:2]
+
+        # ROI = layer_poco bbox (+ margin)
+        bbox = _get_region_from_poco(layer_poco, w, h, debug=False)
+        if not bbox:
+            soft_fail("[DRAG_TARGET] FAIL: layer_poco bbox not found")
+            time.sleep(0.2)
+            continue
+
+        lx1, ly1, lx2, ly2 = map(int, bbox)
+        x1 = _clamp_int(lx1 - int(region_margin_px), 0, w - 1)
+        y1 = _clamp_int(ly1 - int(region_margin_px), 0, h - 1)
+        x2 = _clamp_int(lx2 + int(region_margin_px), 1, w)
+        y2 = _clamp_int(ly2 + int(region_margin_px), 1, h)
+
+        if x2 <= x1 + 10 or y2 <= y1 + 10:
+            soft_fail(f"[DRAG_TARGET] FAIL: invalid region=({x1},{y1},{x2},{y2})")
+            time.sleep(0.2)
+            continue
+
+        # ------------------------------------------------------------
+        # 1) target 좌표(gx, gy) 산출
+        #    - 드래그 시작과 동시에 타겟이 사라지는 시스템 대응:
+        #      드래그 중 exists 재검증/재탐색 금지(좌표 확정 후 1회 끝까지)
+        # ------------------------------------------------------------
+        gx = gy = None
+        conf = None
+
+        if not is_template:
+            # target이 poco(selector 포함)인 경우
+            try:
+                if not target.exists():
+                    if debug:
+                        log(f"[DRAG_TARGET] MISS - target poco not exists: {get_label(target)}")
+                    time.sleep(float(interval_on_miss_sec))
+                    continue
+
+                gx, gy = _pick_poco_point_in_roi(target, w, h, x1, y1, x2, y2)
+                if debug:
+                    log(f"[DRAG_TARGET] poco pick -> ({gx},{gy}) in region=({x1},{y1},{x2},{y2})")
+                if gx is None or gy is None:
+                    if debug:
+                        log(f"[DRAG_TARGET] MISS - cannot resolve poco point: {get_label(target)}")
+                    time.sleep(float(interval_on_miss_sec))
+                    continue
+
+                conf = 1.0  # poco 기반은 confidence 개념이 없으니 1.0으로 둔다
+
+            except Exception as e:
+                soft_fail(f"[DRAG_TARGET] target poco err: FAIL ❌ - {e!r}")
+                time.sleep(float(interval_on_miss_sec))
+                continue
+
+        else:
+            # target이 템플릿(str)인 경우: ROI crop에서 매칭
+            crop = screen[y1:y2, x1:x2]
+            if crop is None or crop.size == 0:
+                time.sleep(0.2)
+                continue
+
+            th0, tw0 = tpl_img.shape[:2]
+            ch, cw = crop.shape[:2]
+            if (cw < tw0 or ch < th0):
+                soft_fail(f"[DRAG_TARGET] FAIL:template({tw0}x{th0}) > crop({cw}x{ch}) - region=({x1},{y1},{x2},{y2})")
+                return int(drags)
+
+            found = _find_all_template_safe(
+                crop, tpl_img,
+                threshold=float(threshold),
+                rgb=bool(rgb),
+                max_matches=60,
+            ) or []
+
+            pts = []
+            for mobj in found:
+                cx, cy = mobj.get("result", (None, None))
+                if cx is None or cy is None:
+                    continue
+                c = float(mobj.get("confidence", 0.0) or 0.0)
+                gx2, gy2 = float(cx + x1), float(cy + y1)
+                pts.append((gx2, gy2, c))
+
+            if not pts:
+                if debug:
+                    log(f"[DRAG_TARGET] MISS - region=({x1},{y1},{x2},{y2}) thr={threshold}")
+                time.sleep(float(interval_on_miss_sec))
+                continue
+
+            # 좌상단 → 우하단 우선
+            pts.sort(key=lambda t: (t[1], t[0]))
+            gx, gy, conf = pts[0]
+
+        # 드래그 시작점: 타겟보다 '조금 위' (단, ROI 안으로 강제 클램프)
+        sx = _clamp_int(gx, x1 + 2, x2 - 2)
+        sy = _clamp_int(gy - int(y_offset_px), y1 + 2, y2 - 2)
+
+        # 드래그 종료점: ROI 우측 끝(약간 안쪽), y는 고정(수평 드래그)
+        ex = _clamp_int((x2 - int(end_margin_px)), x1 + 2, x2 - 2)
+        ey = sy
+
+        # 너무 짧으면 무의미
+        if ex <= sx + 8:
+            if debug:
+                log(f"[DRAG_TARGET] SKIP - drag too short sx={sx} ex={ex} region=({x1},{y1},{x2},{y2})")
+            time.sleep(float(interval_on_miss_sec))
+            continue
+
+        if debug:
+            try:
+                log(f"[DRAG_TARGET] drag#{drags+1} conf={float(conf):.3f} start=({sx},{sy}) end=({ex},{ey}) region=({x1},{y1},{x2},{y2})")
+            except Exception:
+                log(f"[DRAG_TARGET] drag#{drags+1} start=({sx},{sy}) end=({ex},{ey}) region=({x1},{y1},{x2},{y2})")
+
+        # ✅ 여기서부터는 “무조건 1회 끝까지” (드래그 도중 타겟 disappears 해도 중단 금지)
+        try:
+            swipe((sx, sy), (ex, ey), duration=float(duration), steps=int(steps))
+            drags += 1
+        except Exception as e:
+            soft_fail(f"[DRAG_TARGET] swipe err: FAIL ❌ - {e!r}")
+            return int(drags)
+
+        if settle_after_drag_sec:
+            _maybe_wait_settle(settle_after_drag_sec)
+
+    return int(drags)
+        # 다음 루프에서 다시 target 탐색 (드래그 후 재탐색이 요구사항)
+# 드래그 라이트 타겟 END ===============================================
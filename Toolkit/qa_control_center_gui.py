@@ -3,6 +3,7 @@
 # 👤 Author: Eden Kim
 # 📅 Date: 2026-01-08 - v1.0.5
 #   - python 하드코딩 QA_PYTHON 변수로 대체
+#   - "모든 단말 실행" → qa_orchestrator.py 단일 콘솔(동시 실행 상한/실시간 집계/끊김 재시작)
 # ============================================================
 # 기능:
 #  1) 단말 선택(모델명(시리얼)) + 스크립트 실행(.py / .air)
@@ -10,7 +11,7 @@
 #  3) scrcpy 실행(선택 단말)
 #  4) 리소스 모니터 실행(선택 단말)
 #  5) 로그파일 뷰어 실행(별도 로그파일 선택)
-#  6) "모든 단말에 실행" (run_multi.ps1 동등 기능을 GUI로 제공)
+#  6) "모든 단말에 실행" (qa_orchestrator.py: 워커 풀 + PASS/FAIL 실시간 집계, 없으면 단말별 콘솔 폴백)
 #  7) "선택 단말에 실행"
 #
 # 전제:
@@ -555,6 +556,25 @@ class ColorRunnerGUI(tk.Tk):
 
         extra = (self.extra_args.get() or "").strip()
 
+        # ✅ 오케스트레이터 우선(한 콘솔에서 전체 진행/집계), 없으면 기존 단말별 콘솔 방식
+        orch = os.path.join(self.base_dir, "qa_orchestrator.py")
+        if os.path.exists(orch):
+            py = get_python_exe()
+            cmd = [py, "-u", orch, "--script", script_abs]
+            for ser in devs:
+                cmd += ["-s", ser]
+            if extra:
+                cmd += ["--args", extra]
+            env = os.environ.copy()
+            env["QA_PYTHON"] = py
+            env["PYTHONIOENCODING"] = "utf-8"
+            try:
+                subprocess.Popen(cmd, cwd=self.base_dir, env=env, creationflags=CREATE_NEW_CONSOLE)
+                self.status_var.set(f"오케스트레이터 실행: {len(devs)}대 (device 상태 기준)")
+                return
+            except Exception as e:
+                self.status_var.set(f"[WARN] 오케스트레이터 실행 실패 → 단말별 콘솔로 실행: {e}")
+
         launched = 0
         for ser in devs:
             try:
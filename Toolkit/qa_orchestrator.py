@@ -0,0 +1,582 @@
+# ==========================================================
+# 🛠️ Tool: QA Orchestrator - 다중 단말 병렬 TC 실행기 (headless / cross-platform)
+# 👤 Author: Eden Kim
+# 📅 Date: 2026-02-12 - v1.0.6
+#   - qa_control_center_gui "모든 단말 실행"(단말별 run_<serial>.cmd + 새 콘솔) 대체
+#   - 샤딩 모드(--shard): 스위트 1회분의 (반복, 플로우) 작업을 단말들에 분배 + work stealing, 통합 summary
+# ==========================================================
+# • 목적: N대 단말에 동일 TC(run_basic_tc_suite / run_literacy_tc 등)를 동시 실행 + 중앙 집계
+# • 동시 실행 상한(--max-workers): 단말별 워커 프로세스(인터프리터 분리) 풀, 초과분은 대기열
+# • 이벤트: 워커의 step/soft_fail/note/run_end → 부모로 구조화 이벤트 스트리밍
+#     (common.emit_event ← QA_EVENT_ADDR/QA_EVENT_KEY/QA_EVENT_JOB 환경변수)
+# • 집계: 단말별 PASS/FAIL/WARN 실시간 누적 + 주기 상태 라인 + 종료 요약(JSON)
+# • 복구: 실행 중 단말이 adb에서 사라지면 워커 종료 → 재연결 대기 → 재시작(--max-restarts)
+# • 샤딩: 워커가 flows/repeat 보고 → 단말별 deque 배정, 빈 단말은 남은 작업이 많은 단말 뒤에서 가져감
+#     → 단말별 meta.json 병합: result/_orchestrator/shard_<ts>/(meta.json, summary.html)
+# • 사용 예:
+#     python qa_orchestrator.py --script 99_scripts/literacy_test.air/basic_tc_suite.py --all
+#     python qa_orchestrator.py --script .../literacy_runner.py --entry main -s R9TRA0 -s R3CN90 -j 2
+#     python qa_orchestrator.py --script .../basic_tc_suite.py --all --shard
+# • 산출물: result/<serial>/orchestrator_<ts>_a<n>.log (워커 콘솔), result/_orchestrator/orch_<ts>.json
+# ==========================================================
+# -*- coding: utf-8 -*-
+import argparse, os, sys, time, json, queue, shlex, signal, secrets, subprocess, threading
+from typing import Optional, Dict, List, Callable, Any
+
+STATUS_KEYS = ("PASS", "FAIL", "WARN", "N/A", "SKIP")
+
+# qa_common/common 패키지(샤딩 큐/결과 병합: 표준 라이브러리만 사용하는 서브모듈)
+_QA_COMMON = os.environ.get("QA_TOOLKIT") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "qa_common")
+if _QA_COMMON not in sys.path:
+    sys.path.insert(0, _QA_COMMON)
+
+DEVICE_POLL_SEC = 2.0        # adb devices 조회 주기
+STATUS_EVERY_SEC = 15.0      # 상태 요약 라인 출력 주기
+KILL_GRACE_SEC = 5.0         # 종료 신호 후 강제 종료까지 대기
+
+
+# ----------------------------------------------------------
+# 경로/ADB 유틸 (GUI 미의존: tkinter 없는 리눅스 서버에서도 동작)
+# ----------------------------------------------------------
+def get_base_dir() -> str:
+    """이 스크립트가 있는 폴더 (Tools)."""
+    return os.path.dirname(os.path.abspath(__file__))
+
+def get_python_exe() -> str:
+    qa = (os.environ.get("QA_PYTHON") or "").strip().strip('"')
+    if qa and os.path.exists(qa):
+        return qa
+    return sys.executable or "python"
+
+def adb_device_states(adb_path: str = "adb") -> Dict[str, str]:
+    """adb devices → {serial: state}. 실패 시 빈 dict."""
+    try:
+        out = subprocess.check_output(
+            [adb_path, "devices"], stderr=subprocess.STDOUT,
+            text=True, encoding="utf-8", errors="ignore", timeout=10,
+        )
+    except Exception:
+        return {}
+    states = {}
+    for line in out.strip().splitlines()[1:]:
+        parts = line.split()
+        if len(parts) >= 2:
+            states[parts[0].strip()] = parts[1].strip()
+    return states
+
+
+# ----------------------------------------------------------
+# 이벤트 수신 허브 (multiprocessing.connection: 로컬 TCP + authkey)
+# ----------------------------------------------------------
+class EventHub:
+    def __init__(self, handlers: Optional[Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]]] = None):
+        from multiprocessing.connection import Listener
+        self.handlers = handlers or {}
+        self.key = secrets.token_bytes(16)
+        self._listener = Listener(("127.0.0.1", 0), authkey=self.key)
+        self.events: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._closed = False
+        threading.Thread(target=self._accept_loop, name="orch-accept", daemon=True).start()
+
+    @property
+    def address(self) -> str:
+        host, port = self._listener.address
+        return f"{host}:{port}"
+
+    def env_vars(self, job_id: str) -> Dict[str, str]:
+        return {"QA_EVENT_ADDR": self.address, "QA_EVENT_KEY": self.key.hex(), "QA_EVENT_JOB": job_id}
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                if self._closed:
+                    return
+                continue  # 인증 실패 등 → 다음 연결 대기
+            threading.Thread(target=self._read_loop, args=(conn,), daemon=True).start()
+
+    def _read_loop(self, conn):
+        try:
+            while True:
+                evt = conn.recv()
+                if not isinstance(evt, dict):
+                    continue
+                if evt.get("req"):
+                    # 요청/응답(event_request): 응답 먼저 돌려주고 이벤트 큐에도 기록
+                    fn = self.handlers.get(str(evt.get("kind")))
+                    try:
+                        rep = fn(evt) if fn else {}
+                    except Exception as e:
+                        rep = {"error": str(e)}
+                    conn.send(rep if isinstance(rep, dict) else {})
+                self.events.put(evt)
+        except (EOFError, OSError):
+            pass
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def close(self):
+        self._closed = True
+        try:
+            self._listener.close()
+        except Exception:
+            pass
+
+
+# ----------------------------------------------------------
+# 워커(단말 1대) 상태
+# ----------------------------------------------------------
+class Job:
+    # state: PENDING → RUNNING → DONE | WAIT_DEVICE(→ PENDING 재시작) | DROPPED
+    def __init__(self, serial: str):
+        self.serial = serial
+        self.state = "PENDING"
+        self.attempt = 0
+        self.proc: Optional[subprocess.Popen] = None
+        self.log_path = ""
+        self.started_ts = 0.0
+        self.ended_ts = 0.0
+        self.dropped_ts = 0.0
+        self.returncode: Optional[int] = None
+        self.counts = {k: 0 for k in STATUS_KEYS}
+        self.last_msg = ""
+        self.flow = ""
+        self.result = ""          # run_end 결과(PASS/FAIL/WARN...) 또는 ERROR/DROPPED
+        self.run_dir = ""
+        self.history: List[Dict[str, Any]] = []
+
+    @property
+    def job_id(self) -> str:
+        return f"{self.serial}#{self.attempt}"
+
+    def reset_attempt(self):
+        self.counts = {k: 0 for k in STATUS_KEYS}
+        self.result = ""
+        self.run_dir = ""
+        self.last_msg = ""
+        self.flow = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "serial": self.serial,
+            "result": self.result,
+            "attempts": self.attempt,
+            "returncode": self.returncode,
+            "counts": dict(self.counts),
+            "duration_sec": int(max(0.0, (self.ended_ts or time.time()) - self.started_ts)) if self.started_ts else 0,
+            "run_dir": self.run_dir,
+            "log": self.log_path,
+            "history": self.history,
+        }
+
+
+def build_worker_cmd(script: str, entry: Optional[str] = None, extra: Optional[List[str]] = None,
+                     python: Optional[str] = None) -> List[str]:
+    """
+    워커 실행 커맨드.
+      - .air              : python -m airtest run <dir>
+      - .py (entry 없음)   : python -u <script> [extra...]  (__main__ 경로 = 기존 단독 실행과 동일)
+      - .py + entry       : 본 파일 --worker 모드로 모듈 로드 후 entry(serial) 호출
+    """
+    py = python or get_python_exe()
+    script = os.path.abspath(script)
+    if script.lower().endswith(".air"):
+        return [py, "-m", "airtest", "run", script]
+    if entry:
+        return [py, "-u", os.path.abspath(__file__), "--worker", "--script", script, "--entry", entry]
+    return [py, "-u", script] + list(extra or [])
+
+
+def _run_worker(script: str, entry: str) -> int:
+    """--worker 모드: 스크립트 모듈을 import 후 entry(serial) 호출"""
+    import importlib.util
+    script = os.path.abspath(script)
+    sys.path.insert(0, os.path.dirname(script))
+    name = os.path.splitext(os.path.basename(script))[0]
+    spec = importlib.util.spec_from_file_location(name, script)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    spec.loader.exec_module(mod)
+    fn = getattr(mod, entry, None)
+    if not callable(fn):
+        print(f"[ERR] entry 함수 없음: {name}.{entry}")
+        return 2
+    fn(os.environ.get("ANDROID_SERIAL") or os.environ.get("ADB_SERIAL"))
+    return 0
+
+
+def _kill_tree(proc: subprocess.Popen):
+    """워커 + 자식(adb/logcat/모니터 등) 일괄 종료"""
+    if proc is None or proc.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            subprocess.call(["taskkill", "/PID", str(proc.pid), "/T", "/F"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(proc.pid, signal.SIGTERM)
+            try:
+                proc.wait(timeout=KILL_GRACE_SEC)
+            except subprocess.TimeoutExpired:
+                os.killpg(proc.pid, signal.SIGKILL)
+    except Exception:
+        try:
+            proc.kill()
+        except Exception:
+            pass
+
+
+# ----------------------------------------------------------
+# 오케스트레이터 본체
+# ----------------------------------------------------------
+def run_orchestrator(
+    script: str,
+    serials: List[str],
+    *,
+    entry: Optional[str] = None,
+    extra_args: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    max_restarts: int = 2,
+    reconnect_timeout: float = 120.0,
+    adb_path: str = "adb",
+    python: Optional[str] = None,
+    result_root: Optional[str] = None,
+    on_event: Optional[Callable[[Job, Dict[str, Any]], None]] = None,
+    quiet: bool = False,
+    shard: bool = False,
+) -> Dict[str, Any]:
+    """
+    serials 각각에 대해 script를 워커 프로세스로 실행(동시 max_workers대).
+    shard=True: 전체 단말이 스위트 1회분을 나눠 실행 (워커는 QA_SHARD=1 → run_flows 샤딩 루프)
+    return: {"result": PASS|FAIL, "jobs": [...], "summary_path": ...}
+    """
+    serials = [s for s in dict.fromkeys(serials) if s]
+    if not serials:
+        raise ValueError("실행할 단말이 없습니다.")
+    max_workers = max(1, int(max_workers or len(serials)))
+    result_root = os.path.abspath(result_root or os.path.join(get_base_dir(), "result"))
+    ts = time.strftime("%y%m%d_%H%M%S")
+    cmd = build_worker_cmd(script, entry, extra_args, python)
+    work_dir = os.path.dirname(os.path.abspath(script))
+
+    def say(msg: str):
+        if not quiet:
+            print(f"[{time.strftime('%H:%M:%S')}] {msg}", flush=True)
+
+    shardq = None
+    handlers = {}
+    if shard:
+        from common.shard import ShardQueue
+        from common.history import FlowHistory
+
+        def _estimator(suite, names):
+            # 소요시간 이력이 하나도 없으면 {} → 라운드로빈 분배
+            hist = FlowHistory()
+            if not any(n in hist.stats(suite=suite or None) for n in names):
+                return {}
+            return hist.estimate(names, suite=suite or None)
+
+        shardq = ShardQueue(serials, estimator=_estimator)
+
+        def _serial_of(evt):
+            return str(evt.get("job") or "").split("#", 1)[0]
+
+        def _on_shard_init(evt):
+            if shardq.init(evt.get("flows") or [], int(evt.get("repeat") or 1), str(evt.get("suite") or "")):
+                if shardq.estimates:
+                    say(f"⏱️ 샤드 분배(이력 기반 LPT): 예상 완료 약 {shardq.eta_sec() / 60:.1f}분")
+                else:
+                    say("⏱️ 샤드 분배(라운드로빈): 소요시간 이력 없음")
+            return {"ok": True}
+
+        def _on_shard_next(evt):
+            task = shardq.next(_serial_of(evt), evt.get("done"), bool(evt.get("abort")))
+            return {"iter": task[0], "flow": task[1]} if task else {"stop": True}
+
+        handlers = {"shard_init": _on_shard_init, "shard_next": _on_shard_next}
+
+    t_start = time.time()
+    hub = EventHub(handlers)
+    jobs = {s: Job(s) for s in serials}
+    pending: List[Job] = list(jobs.values())
+    by_job_id: Dict[str, Job] = {}
+
+    def start(job: Job):
+        job.attempt += 1
+        job.reset_attempt()
+        dev_dir = os.path.join(result_root, job.serial)
+        os.makedirs(dev_dir, exist_ok=True)
+        job.log_path = os.path.join(dev_dir, f"orchestrator_{ts}_a{job.attempt}.log")
+
+        env = os.environ.copy()
+        env.update(hub.env_vars(job.job_id))
+        if shard:
+            env["QA_SHARD"] = "1"
+        env.update({
+            "QA_PYTHON": python or get_python_exe(),
+            "ADB_SERIAL": job.serial,
+            "ANDROID_SERIAL": job.serial,
+            "RESULT_DIR": dev_dir,
+            "PYTHONIOENCODING": "utf-8",
+            "PYTHONUNBUFFERED": "1",
+        })
+        popen_kw = {}
+        if os.name == "nt":
+            popen_kw["creationflags"] = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+        else:
+            popen_kw["start_new_session"] = True  # killpg로 자식까지 정리
+
+        fh = open(job.log_path, "ab")
+        try:
+            job.proc = subprocess.Popen(cmd, cwd=work_dir, env=env, stdout=fh,
+                                        stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, **popen_kw)
+        finally:
+            fh.close()  # 자식이 핸들을 상속했으므로 부모 쪽은 즉시 닫음
+        job.state = "RUNNING"
+        job.started_ts = job.started_ts or time.time()
+        job.returncode = None
+        by_job_id[job.job_id] = job
+        say(f"▶ [{job.serial}] 시작 (attempt {job.attempt}) → {job.log_path}")
+
+    def finish(job: Job, state: str, result: str = ""):
+        job.state = state
+        job.returncode = job.proc.returncode if job.proc else None
+        job.ended_ts = time.time()
+        if result:
+            job.result = result
+        job.history.append({"attempt": job.attempt, "state": state, "result": job.result,
+                            "returncode": job.returncode, "counts": dict(job.counts)})
+
+    def handle_event(evt: Dict[str, Any]):
+        job = by_job_id.get(str(evt.get("job") or ""))
+        if job is None or job.job_id != str(evt.get("job")):
+            return  # 이전 attempt의 잔여 이벤트는 무시
+        st = evt.get("status")
+        kind = evt.get("kind")
+        job.last_msg = str(evt.get("msg") or "")
+        job.flow = str(evt.get("flow") or job.flow or "")
+        if kind == "shard_next" and evt.get("done"):
+            d = evt["done"]
+            say(f"{'🧩' if d.get('ok') else '❌'} [{job.serial}] 작업 완료: {d.get('flow')} #{d.get('iter')} ({d.get('sec')}s)")
+        if kind == "run_end":
+            job.result = str(evt.get("status") or "")
+            job.run_dir = str(evt.get("run_dir") or "")
+            say(f"🏁 [{job.serial}] Run 종료: {job.result} ({job.run_dir})")
+        elif st in job.counts:
+            job.counts[st] += 1
+            if st in ("FAIL", "WARN"):
+                say(f"{'❌' if st == 'FAIL' else '⚠️'} [{job.serial}] {job.last_msg}")
+        elif kind == "step" and job.last_msg.startswith("[RUN] Ct."):
+            say(f"🔖 [{job.serial}] {job.last_msg}")
+        if on_event:
+            try:
+                on_event(job, evt)
+            except Exception:
+                pass
+
+    def status_line():
+        tot = {k: sum(j.counts[k] for j in jobs.values()) for k in ("PASS", "FAIL", "WARN")}
+        run = sum(1 for j in jobs.values() if j.state == "RUNNING")
+        wait = sum(1 for j in jobs.values() if j.state == "WAIT_DEVICE")
+        done = sum(1 for j in jobs.values() if j.state in ("DONE", "DROPPED"))
+        say(f"📊 실행 {run}/{max_workers} · 대기 {len(pending)} · 재연결대기 {wait} · 완료 {done}/{len(jobs)}"
+            f" | PASS {tot['PASS']} FAIL {tot['FAIL']} WARN {tot['WARN']}")
+
+    say(f"🚀 오케스트레이터 시작: 단말 {len(serials)}대, 동시 {max_workers}, 스크립트 {os.path.basename(script)}")
+    last_poll = 0.0
+    last_status = time.time()
+    states: Dict[str, str] = {}
+    interrupted = False
+
+    try:
+        while True:
+            # 1) 이벤트 반영
+            while True:
+                try:
+                    handle_event(hub.events.get_nowait())
+                except queue.Empty:
+                    break
+
+            now = time.time()
+
+            # 2) 단말 상태 점검 (실행/재연결 대기 중인 단말이 있을 때만)
+            active = [j for j in jobs.values() if j.state in ("RUNNING", "WAIT_DEVICE")]
+            if active and now - last_poll >= DEVICE_POLL_SEC:
+                last_poll = now
+                states = adb_device_states(adb_path)
+                for job in active:
+                    online = states.get(job.serial) == "device"
+                    if job.state == "RUNNING" and not online and job.proc.poll() is None:
+                        say(f"🔌 [{job.serial}] 단말 연결 끊김({states.get(job.serial, 'missing')}) → 워커 종료, 재연결 대기")
+                        _kill_tree(job.proc)
+                        job.proc.wait()
+                        finish(job, "WAIT_DEVICE", "DROPPED")
+                        job.dropped_ts = now
+                        if shardq and shardq.requeue(job.serial):
+                            say(f"🧩 [{job.serial}] 진행 중 작업 반환 → 다른 단말이 가져갈 수 있음")
+                    elif job.state == "WAIT_DEVICE":
+                        if online and job.attempt <= max_restarts:
+                            say(f"🔁 [{job.serial}] 단말 재연결 → 재시작 대기열 등록")
+                            job.state = "PENDING"
+                            pending.insert(0, job)
+                        elif online or now - job.dropped_ts > reconnect_timeout:
+                            why = "재시작 한도 초과" if online else f"{int(reconnect_timeout)}s 내 미복귀"
+                            say(f"⛔ [{job.serial}] {why} → DROPPED")
+                            job.state = "DROPPED"
+
+            # 3) 종료된 워커 수거
+            for job in jobs.values():
+                if job.state != "RUNNING" or job.proc.poll() is None:
+                    continue
+                # 남은 이벤트(run_end 등) 먼저 반영
+                time.sleep(0.2)
+                while True:
+                    try:
+                        handle_event(hub.events.get_nowait())
+                    except queue.Empty:
+                        break
+                rc = job.proc.returncode
+                online = adb_device_states(adb_path).get(job.serial) == "device"
+                if rc != 0 and not online:
+                    say(f"🔌 [{job.serial}] 워커 종료(rc={rc}) + 단말 오프라인 → 재연결 대기")
+                    finish(job, "WAIT_DEVICE", "DROPPED")
+                    job.dropped_ts = time.time()
+                    if shardq:
+                        shardq.requeue(job.serial)
+                    continue
+                if shardq:
+                    shardq.fail_inflight(job.serial, f"worker exited (rc={rc})")
+                if not job.result:
+                    job.result = "ERROR" if rc != 0 else ("FAIL" if job.counts["FAIL"] else "PASS")
+                finish(job, "DONE")
+                say(f"✅ [{job.serial}] 완료: {job.result} (rc={rc}, PASS {job.counts['PASS']} / FAIL {job.counts['FAIL']})")
+
+            # 4) 상한 내에서 대기열 시작
+            while pending and sum(1 for j in jobs.values() if j.state == "RUNNING") < max_workers:
+                job = pending.pop(0)
+                if shardq and shardq.flows is not None and not shardq.remaining():
+                    # 남은 샤드 작업 없음 → 앱 기동 비용 없이 대기 단말 종료
+                    job.result = "IDLE"
+                    job.state = "DONE"
+                    say(f"💤 [{job.serial}] 남은 샤드 작업 없음 → 미실행")
+                    continue
+                start(job)
+
+            if all(j.state in ("DONE", "DROPPED") for j in jobs.values()):
+                break
+
+            if now - last_status >= STATUS_EVERY_SEC:
+                last_status = now
+                status_line()
+            time.sleep(0.2)
+
+    except KeyboardInterrupt:
+        interrupted = True
+        say("⛔ 중단 요청 → 실행 중 워커 종료")
+        for job in jobs.values():
+            if job.state == "RUNNING":
+                _kill_tree(job.proc)
+                finish(job, "DONE", "ABORTED")
+    finally:
+        hub.close()
+
+    # 5) 요약
+    ok = (not interrupted) and all(j.result in ("PASS", "WARN", "N/A", "SKIP", "IDLE") for j in jobs.values())
+    summary = {
+        "result": "PASS" if ok else "FAIL",
+        "script": os.path.abspath(script),
+        "entry": entry,
+        "started_at": ts,
+        "max_workers": max_workers,
+        "jobs": [j.to_dict() for j in jobs.values()],
+    }
+    out_dir = os.path.join(result_root, "_orchestrator")
+    os.makedirs(out_dir, exist_ok=True)
+    summary_path = os.path.join(out_dir, f"orch_{ts}.json")
+    try:
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        summary["summary_path"] = summary_path
+    except Exception:
+        summary["summary_path"] = None
+
+    if shardq:
+        from common.shard import merge_run_summaries
+        unassigned = shardq.remaining()
+        ok = ok and not unassigned and all(t["ok"] for t in shardq.results)
+        summary["result"] = "PASS" if ok else "FAIL"
+        summary["shard"] = {"tasks": shardq.results, "steals": shardq.steals,
+                            "unassigned": [{"iter": i, "flow": f} for i, f in unassigned]}
+        try:
+            merged_meta, merged_html = merge_run_summaries(
+                [j.run_dir for j in jobs.values() if j.run_dir],
+                os.path.join(out_dir, f"shard_{ts}"),
+                run_id=f"shard_{ts}", tasks=shardq.results, unassigned=unassigned,
+                duration_sec=int(time.time() - t_start),
+            )
+            summary["shard"]["meta"] = merged_meta
+            summary["shard"]["summary_html"] = merged_html
+            say(f"🧩 샤딩 통합 summary: {merged_html} (작업 {len(shardq.results)}건, stealing {shardq.steals}회)")
+        except Exception as e:
+            say(f"[WARN] 샤딩 summary 병합 실패: {e}")
+        try:
+            with open(summary_path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+        except Exception:
+            pass
+
+    say("=" * 60)
+    for j in jobs.values():
+        c = j.counts
+        say(f"{j.serial:<20} {j.result or j.state:<8} attempts={j.attempt} "
+            f"PASS {c['PASS']} FAIL {c['FAIL']} WARN {c['WARN']}  {j.run_dir}")
+    say(f"총괄 결과: {summary['result']} → {summary_path}")
+    return summary
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Multi-device parallel QA runner")
+    ap.add_argument("--script", required=True, help="TC 스크립트(.py) 또는 .air 폴더")
+    ap.add_argument("--entry", default=None, help="호출할 함수명(serial 1개 인자). 미지정 시 스크립트 __main__ 실행")
+    ap.add_argument("-s", "--serial", action="append", default=[], help="대상 시리얼(여러 번 지정 가능)")
+    ap.add_argument("--all", action="store_true", help="adb devices의 device 상태 단말 전체")
+    ap.add_argument("-j", "--max-workers", type=int, default=None, help="동시 실행 상한(기본: 단말 수)")
+    ap.add_argument("--max-restarts", type=int, default=2, help="단말 끊김 시 재시작 최대 횟수")
+    ap.add_argument("--reconnect-timeout", type=float, default=120.0, help="끊긴 단말 재연결 대기(초)")
+    ap.add_argument("--args", default="", help="스크립트(.py) 추가 인자 문자열")
+    ap.add_argument("--shard", action="store_true", help="스위트 1회분의 플로우/반복을 단말들에 분배(work stealing)")
+    ap.add_argument("--adb", default="adb")
+    ap.add_argument("--result-root", default=None, help="결과 루트(기본: Tools/result)")
+    ap.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    a = ap.parse_args(argv)
+
+    if a.worker:
+        return _run_worker(a.script, a.entry)
+
+    serials = list(a.serial)
+    if a.all or not serials:
+        serials += [s for s, st in adb_device_states(a.adb).items() if st == "device"]
+    if not serials:
+        print("실행 가능한(device 상태) 단말이 없습니다.")
+        return 2
+
+    summary = run_orchestrator(
+        a.script, serials,
+        entry=a.entry,
+        extra_args=shlex.split(a.args) if a.args else None,
+        max_workers=a.max_workers,
+        max_restarts=a.max_restarts,
+        reconnect_timeout=a.reconnect_timeout,
+        adb_path=a.adb,
+        result_root=a.result_root,
+        shard=a.shard,
+    )
+    return 0 if summary["result"] == "PASS" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,19 @@
 # 👤 Author: Eden Kim
 # 📅 Date: 2026-02-06 - v1.0.6
 #   - 앱 재실행 시 PID 갱신하여 Logcat 재실행
+#   - 동적 임계치: 단말 프로파일 캐시(qa_common/common/devprofile.py) 우선, 코어 조회 adb 인자 누락("shell") 수정
+#     (캐시 실패 시 폴백도 devprofile.probe_device()/ram_class_kb() → 코어/RAM 클래스 규칙은 devprofile 한 곳)
+#   - report.flag: generate_report.py --serve 상주 워커에 위임(백그라운드 스레드) → GUI 비차단, 폰트/matplotlib 로딩 1회
+#     (작업마다 serial/package 전달, 응답 기한 QA_REPORT_TIMEOUT(기본 300초) 초과 시 워커 kill → 다음 요청에서 재기동)
+#   - pid_of: 단말 감시 스트림(qa_common/common/procwatch.py) 캐시 우선 → 틱마다 adb pidof/ps 생성 제거
+#   - 실시간 누수 감지(qa_common/common/leakwatch.py): 샘플마다 슬라이딩 윈도우 회귀 + CUSUM 변화점
+#     → events.csv에 LEAK 이벤트, 그래프에 회귀선, (Leak Dump 체크 시) 슬라이스 + 힙 덤프(hprof-conv) 자동 수집
+#   - 스레드/프로세스 상세(qa_common/common/breakdown.py, Threads 체크 시): 🧵 스레드 탭에 top-N 스레드 표,
+#     프로세스별 PSS 표, 스레드 CPU 누적 영역 그래프 + breakdown_*.jsonl 저장(generate_report 스레드 페이지 입력)
+#   - 프레임 jank(qa_common/common/framestats.py, Jank 체크 시): dumpsys gfxinfo framestats 주기 수집 → HUD에 최근 10초
+#     jank %·P90, 그래프에 느린 프레임 구간(보라 음영) + gfx_*.csv 저장(generate_report 프레임 페이지 입력)
+#   - save.flag/report.flag 본문의 실패 시각(ts)을 읽어 그 시각에서 끝나는 구간으로 slice/recent/resource/report 저장
+#     (파일명 YYMMDD_hhmmss, slice는 .part → 교체) → 백그라운드 처리 지연/연속 실패와 무관하게 실패 시점 스냅샷
 #
 # • 목적: 기존 PowerShell resource_monitor 기능을 Python GUI로 이식
 #   - 실시간 그래프(좌: CPU %, 우: PSS KB)
@@ -15,7 +28,7 @@
 #   - event_tap.py / generate_report.py 는 같은 폴더에 존재(없으면 최신 타임스탬프 파일 탐색)
 #
 # • 산출물:
-#   - resource_YYMMDD_HHMM.txt, logcat_recent_*.txt, logcat_slice_*.txt, events.csv 등 기존과 동일
+#   - resource_YYMMDD_HHMM(ss).txt, logcat_recent_*.txt, logcat_slice_*.txt, events.csv 등 기존과 동일
 #   - report.flag 처리 시 resource_report_YYMMDD_HHMM.(pdf/csv/json)
 #
 # =============================================================
@@ -65,6 +78,13 @@ MEM_CRIT_PCT = 0.28
 # 누수 의심 임계(KB/min)
 LEAK_SUSPECT_KB_PER_MIN = 50_000
 
+# 프레임 jank HUD 집계 구간(초)
+GFX_HUD_SEC = 10
+
+# 스레드 탭(top-N 표/누적 영역 그래프 라인 수, 갱신 주기)
+BREAKDOWN_TOP_N = 8
+BREAKDOWN_REFRESH_MS = 2000
+
 # === [폴더 기준 고정] ===
 SCRIPT_DIR = os.getenv("QA_SCRIPT") or os.path.abspath(os.path.dirname(__file__))
 OUT_ROOT   = os.path.join(SCRIPT_DIR, "result")
@@ -518,6 +538,7 @@ EVENT_STYLE = {
     "ANR":   {"color": "purple",  "linestyle": "-.", "emoji": "⛔", "label": "ANR"},
     "GC":    {"color": "gray",    "linestyle": ":",  "emoji": "⚙",  "label": "GC"},
     "STEP":  {"color": "teal",    "linestyle": ":",  "emoji": "🔖", "label": "STEP"},
+    "LEAK":  {"color": "red",     "linestyle": "--", "emoji": "💧", "label": "LEAK"},
 }
 
 class EventsTailer:
@@ -632,8 +653,41 @@ def _parse_log_ts(line: str) -> float | None:
 
     return None
 
-def ts_file_stamp() -> str:
-    return dt.datetime.now().strftime("%y%m%d_%H%M")
+def ts_file_stamp(ts: float | None = None) -> str:
+    """파일명 타임스탬프: 기본 YYMMDD_hhmm / 실패 시각(ts) 지정 시 YYMMDD_hhmmss (버스트 실패 간 파일명 충돌 방지)"""
+    if ts is None:
+        return dt.datetime.now().strftime("%y%m%d_%H%M")
+    return dt.datetime.fromtimestamp(float(ts)).strftime("%y%m%d_%H%M%S")
+
+
+def _read_flag_ts(path: str) -> float | None:
+    """save.flag/report.flag 본문의 실패 시각(epoch 초). 비었거나 형식 오류/미래 시각이면 None(= 지금 기준)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            ts = float((f.read() or "").strip())
+    except Exception:
+        return None
+    return ts if 0 < ts <= time.time() + 5 else None
+
+
+def _trim_log_after(path: str | None, end_ts: float | None):
+    """logcat 덤프에서 end_ts 이후 라인 제거 (실패 시각 이후 로그가 증거에 섞이지 않게)"""
+    if not path or end_ts is None or not os.path.exists(path):
+        return path
+    tmp = path + ".part"
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as i, open(tmp, "w", encoding="utf-8") as o:
+            for line in i:
+                t = _parse_log_ts(line)
+                if t is not None and t > end_ts:
+                    break
+                o.write(line)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            if os.path.exists(tmp): os.remove(tmp)
+        except Exception: pass
+    return path
 
 
 def ensure_dir(p: str):
@@ -694,7 +748,29 @@ def current_foreground_pkg(serial: str | None = None) -> str | None:
         return None
 
 
+def _qa_common_import(name: str):
+    """qa_common/common 하위 모듈 import (경로 없거나 실패 시 None)"""
+    qa_common = os.environ.get("QA_TOOLKIT") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "qa_common")
+    try:
+        if qa_common not in sys.path:
+            sys.path.insert(0, qa_common)
+        import importlib
+        return importlib.import_module(f"common.{name}")
+    except Exception:
+        return None
+
+
 def pid_of(pkg: str, serial: str | None = None) -> str | None:
+    pw = _qa_common_import("procwatch")
+    if pw is not None and pkg:
+        try:
+            w = pw.get_proc_watcher(serial, pkg)
+            snap = w.snapshot(pkg) if w is not None else None
+            if snap is not None and pkg in snap["pids"]:
+                pid = snap["pids"][pkg]
+                return str(pid) if pid else None
+        except Exception:
+            pass
     try:
         p = adb_out(["shell", "pidof", pkg], serial=serial).strip()
         if p: return p
@@ -768,49 +844,25 @@ def adb_out(args: list[str], *, serial: str | None = None) -> str:
 # 동적 임계치 계산 (generate_report 로직과 호환)
 # =============================================================
 
-def get_device_cores(default=8) -> int:
-    def _count(expr: str) -> int:
-        if not expr: return 0
-        total = 0
-        for part in expr.strip().split(','):
-            m = re.match(r"(\d+)-(\d+)", part.strip())
-            if m:
-                a,b = int(m.group(1)), int(m.group(2))
-                if b >= a: total += (b-a+1)
-            elif part.strip().isdigit():
-                total += 1
-        return total
-    for path in ["/sys/devices/system/cpu/possible", "/sys/devices/system/cpu/present"]:
-        try:
-            n = _count(adb_out(["cat", path]))
-            if n>0: return n
-        except Exception: pass
+def device_profile(serial: str | None = None) -> dict:
+    """단말 프로파일 캐시(common.devprofile) — generate_report/공통 모듈과 캐시 공유, 실패 시 빈 dict"""
+    dp = _qa_common_import("devprofile")
     try:
-        c = len(re.findall(r"(?m)^\s*processor\s*:\s*\d+\s*$", adb_out(["cat","/proc/cpuinfo"])) )
-        if c>0: return c
-    except Exception: pass
-    return default
-
-
-def get_memtotal_kb(default=3_900_000) -> int:
-    try:
-        m = re.search(r"MemTotal:\s+(\d+)\s*kB", adb_out(["cat","/proc/meminfo"]))
-        return int(m.group(1)) if m else default
+        return dp.get_device_profile(serial) if dp is not None else {}
     except Exception:
-        return default
-
-
-def nearest_ram_class_kb(mem_kb: int):
-    classes = {"2GB":1_950_000,"3GB":2_950_000,"4GB":3_900_000,"6GB":5_800_000,"8GB":7_800_000,"12GB":11_700_000}
-    name, base = min(classes.items(), key=lambda kv: abs(mem_kb - kv[1]))
-    return name, base
+        return {}
 
 
 def compute_thresholds():
+    """코어 수/RAM 클래스 규칙은 common.devprofile 하나만 사용 (캐시 실패 시 캐시 없이 1회 조회, 모듈 없으면 기본 임계치)"""
     try:
-        cores = get_device_cores()
-        mem_real = get_memtotal_kb()
-        ram_name, ram_kb = nearest_ram_class_kb(mem_real)
+        dp = _qa_common_import("devprofile")
+        prof = device_profile()
+        if not (prof.get("cores") and prof.get("mem_total_kb")):
+            prof = {**dp.probe_device(), **{k: v for k, v in prof.items() if v}}
+        cores = prof.get("cores") or 8
+        mem_real = prof.get("mem_total_kb") or 3_900_000
+        ram_name, ram_kb = dp.ram_class_kb(mem_real)
         cpu_warn = int(CPU_WARN_PCT * 100 * cores)
         cpu_crit = int(CPU_CRIT_PCT * 100 * cores)
         mem_warn = int(MEM_WARN_PCT * ram_kb)
@@ -902,12 +954,13 @@ class RollingLogcat:
             except: pass
         self._logger("[rolling] stop")
 
-    def save_slice(self, window_sec: int = SLICE_WINDOW_SEC):
+    def save_slice(self, window_sec: int = SLICE_WINDOW_SEC, end_ts: float | None = None):
         """
-        롤링 로그(현재 self.log_path)에서 '최근 window_sec초'만 잘라 저장.
+        롤링 로그(현재 self.log_path)에서 'end_ts(기본: 지금) 이전 window_sec초'만 잘라 저장.
         - epoch/threadtime 자동 인식
-        - 역탐색으로 성능 확보
+        - 역탐색으로 성능 확보 (end_ts가 과거면 창 시작에 닿을 때까지 스캔 범위 확장, 최대 8배)
         - 매칭 0줄이면 마지막 SLICE_MIN_TAIL_LINES 줄로 폴백 (0KB 방지)
+        - .part에 기록 후 교체 → 감시 측(save_log)은 완성된 파일만 봄
         """
         try:
             import os
@@ -915,24 +968,40 @@ class RollingLogcat:
             # 파일 안정화
             time.sleep(SLICE_STABILIZE_MS / 1000.0)
 
+            dst = os.path.join(self.out_dir, f"logcat_slice_{ts_file_stamp(end_ts)}.txt")
+
+            def _write(text: str) -> str:
+                with open(dst + ".part", "w", encoding="utf-8") as o:
+                    o.write(text)
+                os.replace(dst + ".part", dst)
+                return dst
+
             if not os.path.exists(self.log_path) or os.path.getsize(self.log_path) == 0:
                 # 빈 롤링이면 폴백(빈 파일 방지)
-                dst = os.path.join(self.out_dir, f"logcat_slice_{ts_file_stamp()}.txt")
-                with open(dst, "w", encoding="utf-8") as o:
-                    o.write("[slice] rolling log is empty at this moment\n")
+                _write("[slice] rolling log is empty at this moment\n")
                 print(f"[slice] {dst} (empty rolling)")
                 return dst
 
-            # 파일 끝에서부터 역탐색 버퍼 구성
+            end = float(end_ts) if end_ts is not None else dt.datetime.now().timestamp()
+            cutoff = end - float(window_sec)
+
+            # 파일 끝에서부터 역탐색 버퍼 구성 (창 시작보다 오래된 라인이 보일 때까지 확장)
             with open(self.log_path, "rb") as f:
                 f.seek(0, os.SEEK_END)
                 size = f.tell()
                 max_bytes = min(size, SLICE_SCAN_MAX_BYTES)
-                f.seek(size - max_bytes)
-                raw = f.read(max_bytes)
+                while True:
+                    f.seek(size - max_bytes)
+                    raw = f.read(max_bytes)
+                    if end_ts is None or max_bytes >= size or max_bytes >= SLICE_SCAN_MAX_BYTES * 8:
+                        break
+                    head = next((t for t in (_parse_log_ts(b.decode("utf-8", "ignore"))
+                                             for b in raw[:65536].splitlines()[1:]) if t is not None), None)
+                    if head is not None and head <= cutoff:
+                        break
+                    max_bytes = min(size, max_bytes * 2)
 
             lines = raw.splitlines()  # b'\n' 기준, 개행 미완성 라인도 포함
-            cutoff = dt.datetime.now().timestamp() - float(window_sec)
 
             picked: list[str] = []
             started = False  # 윈도우에 들어온 순간부터 타임스탬프가 없는 줄도 함께 수집
@@ -944,6 +1013,9 @@ class RollingLogcat:
                     continue
 
                 ts = _parse_log_ts(s)
+                if ts is not None and ts > end:
+                    # 실패 시각(end_ts) 이후 라인은 제외 (창 안에서 섞여 나온 줄도 포함 안 함)
+                    continue
                 if ts is not None:
                     if ts >= cutoff:
                         picked.append(s)
@@ -960,22 +1032,15 @@ class RollingLogcat:
 
             picked.reverse()
 
-            dst = os.path.join(self.out_dir, f"logcat_slice_{ts_file_stamp()}.txt")
-
             if picked:
-                with open(dst, "w", encoding="utf-8") as o:
-                    o.write("\n".join(picked))
+                _write("\n".join(picked))
                 print(f"[slice] {dst} ({len(picked)} lines, ~{window_sec}s)")
                 return dst
 
             # ⬇ 시간 매칭이 전혀 없으면 마지막 N줄 폴백 (0KB 방지)
             tail_n = min(SLICE_MIN_TAIL_LINES, len(lines))
             tail = [l.decode("utf-8", "ignore") for l in lines[-tail_n:]] if tail_n > 0 else []
-            with open(dst, "w", encoding="utf-8") as o:
-                if tail:
-                    o.write("\n".join(tail))
-                else:
-                    o.write("[slice] no lines to write (both window and tail empty)\n")
+            _write("\n".join(tail) if tail else "[slice] no lines to write (both window and tail empty)\n")
             print(f"[slice] {dst} (fallback tail {len(tail)} lines)")
             return dst
 
@@ -985,35 +1050,39 @@ class RollingLogcat:
 
 
 # 최근 로그 저장 함수군
-def save_logcat_crash(out_dir: str):
-    f = os.path.join(out_dir, f"logcat_crash_{ts_file_stamp()}.txt")
+def save_logcat_crash(out_dir: str, end_ts: float | None = None):
+    f = os.path.join(out_dir, f"logcat_crash_{ts_file_stamp(end_ts)}.txt")
     try:
         with open(f, "wb") as o:
             subprocess.run(["adb","logcat","-b","crash","-d","-v",LOGCAT_FORMAT,"-t",str(LOG_WINDOW_LINES)], stdout=o, stderr=subprocess.DEVNULL)
-        return f
+        return _trim_log_after(f, end_ts)
     except Exception:
         return None
 
 
-def save_logcat_recent_all(out_dir: str):
-    f = os.path.join(out_dir, f"logcat_recent_{ts_file_stamp()}.txt")
+def save_logcat_recent_all(out_dir: str, end_ts: float | None = None):
+    f = os.path.join(out_dir, f"logcat_recent_{ts_file_stamp(end_ts)}.txt")
     try:
         with open(f, "wb") as o:
             subprocess.run(["adb","logcat","-d","-v",LOGCAT_FORMAT,"-t",str(LOG_WINDOW_LINES)], stdout=o, stderr=subprocess.DEVNULL)
-        return f
+        return _trim_log_after(f, end_ts)
     except Exception:
         return None
 
 
-def save_logcat_recent_pkg(out_dir: str, pkg: str):
-    tmp = os.path.join(out_dir, f"_recent_raw_{ts_file_stamp()}.tmp")
-    dst = os.path.join(out_dir, f"logcat_recent_pkg_{ts_file_stamp()}.txt")
+def save_logcat_recent_pkg(out_dir: str, pkg: str, end_ts: float | None = None):
+    tmp = os.path.join(out_dir, f"_recent_raw_{ts_file_stamp(end_ts)}.tmp")
+    dst = os.path.join(out_dir, f"logcat_recent_pkg_{ts_file_stamp(end_ts)}.txt")
     try:
         with open(tmp, "wb") as o:
             subprocess.run(["adb","logcat","-d","-v",LOGCAT_FORMAT,"-t",str(LOG_WINDOW_LINES)], stdout=o, stderr=subprocess.DEVNULL)
         # 텍스트 필터
         with open(tmp, "r", encoding="utf-8", errors="ignore") as i, open(dst, "w", encoding="utf-8") as o2:
             for line in i:
+                if end_ts is not None:
+                    t = _parse_log_ts(line)
+                    if t is not None and t > end_ts:
+                        break
                 if pkg in line:
                     o2.write(line)
         os.remove(tmp)
@@ -1025,13 +1094,13 @@ def save_logcat_recent_pkg(out_dir: str, pkg: str):
         return None
 
 
-def save_logcat_recent_pid(out_dir: str, pid: str | None):
+def save_logcat_recent_pid(out_dir: str, pid: str | None, end_ts: float | None = None):
     if not pid: return None
-    f = os.path.join(out_dir, f"logcat_recent_pid_{ts_file_stamp()}.txt")
+    f = os.path.join(out_dir, f"logcat_recent_pid_{ts_file_stamp(end_ts)}.txt")
     try:
         with open(f, "wb") as o:
             subprocess.run(["adb", f"logcat", f"--pid={pid}", "-d","-v",LOGCAT_FORMAT,"-t",str(LOG_WINDOW_LINES)], stdout=o, stderr=subprocess.DEVNULL)
-        return f
+        return _trim_log_after(f, end_ts)
     except Exception:
         return None
 
@@ -1113,6 +1182,7 @@ class ResourceBuffer:
     def __init__(self, out_dir: str, max_entries: int = 100):
         self.out_dir = out_dir
         self.q: list[str] = []
+        self.t: list[float] = []     # q와 같은 순서의 샘플 시각(epoch) — 실패 시각 기준 잘라 저장용
         self.max_entries = max_entries
 
     def _fmt_int(self, v, w=12):
@@ -1147,16 +1217,118 @@ class ResourceBuffer:
         thr = f"{''.rjust(7)}"      # 정보 부재 → N/A
         lines.append(f"TOTAL {pss} kB  {rss} kB  {thr}\r\n")
         self.q.append("".join(lines))
+        self.t.append(ts.timestamp())
         if len(self.q) > self.max_entries:
             self.q.pop(0)
+            self.t.pop(0)
 
-    def save(self):
-        f = os.path.join(self.out_dir, f"resource_{ts_file_stamp()}.txt")
+    def save(self, end_ts: float | None = None):
+        """버퍼 저장. end_ts 지정 시 그 시각까지의 샘플만 resource_YYMMDD_hhmmss.txt로 기록"""
+        q = list(self.q) if end_ts is None else [e for e, t in zip(list(self.q), list(self.t)) if t <= end_ts + 0.5]
+        f = os.path.join(self.out_dir, f"resource_{ts_file_stamp(end_ts)}.txt")
         with open(f, "w", encoding="utf-8") as o:
-            o.write("".join(self.q))
+            o.write("".join(q))
         return f
 
 
+# =============================================================
+# 리포트 워커 (generate_report.py --serve 상주 프로세스)
+#  - 최초 1회만 matplotlib/폰트 로딩, 이후 작업은 stdin/stdout JSON 한 줄씩 주고받음
+#  - 워커가 죽거나 응답이 깨지면 None 반환 → 호출부가 기존 1회성 실행으로 폴백
+# =============================================================
+class ReportWorker:
+    """
+    generate_report.py --serve 상주 워커.
+    - 응답은 리더 스레드 → 큐로 받아 기한(QA_REPORT_TIMEOUT, 기본 300초) 안에서만 대기
+      → 워커가 멈추면(끊긴 단말 adb 조회 등) kill, 다음 작업에서 재기동 (이후 리포트가 줄줄이 막히지 않음)
+    - 작업마다 serial/package 전달 → GUI에서 단말을 바꿔도 워커 시작 시점 단말로 리포트하지 않음
+    """
+    READY_TIMEOUT = 60.0
+
+    def __init__(self, gen_path: str):
+        self.gen = gen_path
+        self.proc = None
+        self.lock = threading.Lock()
+        self._q = None
+        try:
+            self.timeout = float(os.environ.get("QA_REPORT_TIMEOUT") or 300.0)
+        except ValueError:
+            self.timeout = 300.0
+
+    @staticmethod
+    def _pump(proc, q):
+        try:
+            for line in proc.stdout:
+                q.put(line)
+        except Exception:
+            pass
+        q.put(None)
+
+    def _next_json(self, deadline: float) -> dict:
+        while True:
+            left = deadline - time.time()
+            if left <= 0:
+                raise TimeoutError
+            try:
+                line = self._q.get(timeout=left)
+            except queue.Empty:
+                raise TimeoutError
+            if line is None:
+                raise EOFError("report worker exited")
+            if line.startswith("{"):
+                return json.loads(line)
+
+    def _ensure(self) -> bool:
+        if self.proc is not None and self.proc.poll() is None:
+            return True
+        env = os.environ.copy()
+        env.pop("TCL_LIBRARY", None)
+        env.pop("TK_LIBRARY", None)
+        env["MPLBACKEND"] = "Agg"
+        kw = {"creationflags": getattr(subprocess, "CREATE_NO_WINDOW", 0)} if os.name == "nt" else {}
+        try:
+            self.proc = subprocess.Popen([sys.executable, self.gen, "--serve"], env=env,
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                         text=True, encoding="utf-8", errors="replace", bufsize=1, **kw)
+            self._q = queue.Queue()
+            threading.Thread(target=self._pump, args=(self.proc, self._q), daemon=True, name="report-worker").start()
+            if self._next_json(time.time() + self.READY_TIMEOUT).get("ready"):
+                return True
+        except Exception:
+            pass
+        self.close(kill=True)
+        return False
+
+    def run(self, log_path: str, out_prefix: str, *, serial: str | None = None,
+            package: str | None = None) -> dict | None:
+        """결과 dict | None(워커 사용 불가 → 호출부가 1회성 실행), 기한 초과 시 {"ok": False, "error"}"""
+        with self.lock:
+            if not self._ensure():
+                return None
+            try:
+                job = {"in": log_path, "out": out_prefix, "serial": serial, "package": package}
+                self.proc.stdin.write(json.dumps(job, ensure_ascii=False) + "\n")
+                self.proc.stdin.flush()
+                return self._next_json(time.time() + self.timeout)
+            except TimeoutError:
+                self.close(kill=True)
+                return {"ok": False, "error": f"리포트 워커 응답 없음({self.timeout:g}s 초과) → 워커 종료, 다음 요청에서 재기동"}
+            except Exception:
+                self.close()
+                return None
+
+    def close(self, kill: bool = False):
+        p, self.proc = self.proc, None
+        if p is not None and p.poll() is None:
+            try:
+                if kill:
+                    raise RuntimeError
+                p.stdin.close()
+                p.wait(timeout=2)
+            except Exception:
+                p.kill()
+
+
 # =============================================================
 # GUI 메인 애플리케이션
 # =============================================================
@@ -1208,14 +1380,30 @@ class App(tk.Tk):
         self.events_enabled = tk.BooleanVar(value=True)        # Show Events
         self.clear_events_on_start = tk.BooleanVar(value=True) # Clear events
 
+        # 실시간 누수 감지(Start마다 재생성) / 경보 시 슬라이스+힙 덤프 자동 수집 여부
+        self.leak = None
+        self.var_leak_dump = tk.BooleanVar(value=(os.environ.get("QA_LEAK_AUTO_DUMP", "0").strip() == "1"))
+
+        # 스레드/프로세스 상세 샘플러(Start마다 재생성, Threads 체크 시에만)
+        self.breakdown = None
+        self.var_breakdown = tk.BooleanVar(value=(os.environ.get("QA_BREAKDOWN", "0").strip() == "1"))
+        self._bd_timer_id = None
+
+        # 프레임 jank 샘플러(Start마다 재생성, Jank 체크 시에만) / 그래프 느린 구간 음영
+        self.gfx = None
+        self.var_gfx = tk.BooleanVar(value=(os.environ.get("QA_GFX", "0").strip() == "1"))
+        self.gfx_artists = []
+
         # UI 구성
         self.nb = ttk.Notebook(self)
         self.nb.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
         self.tab_res = ttk.Frame(self.nb)
         self.tab_log = ttk.Frame(self.nb)
+        self.tab_thr = ttk.Frame(self.nb)
         self.nb.add(self.tab_res, text="📊 리소스")
         self.nb.add(self.tab_log, text="🧾 로그캣")
+        self.nb.add(self.tab_thr, text="🧵 스레드")
 
         # 리소스 탭에 기존 구성 이식 (logview → toolbar → plot → status)
         self._build_logview(parent=self.tab_res)
@@ -1231,6 +1419,9 @@ class App(tk.Tk):
         )
         self.logcat_view.pack(fill=tk.BOTH, expand=True)
 
+        # 스레드 탭 생성
+        self._build_threads(parent=self.tab_thr)
+
         # 데이터 시리즈
         self.time_series: list[dt.datetime] = []
         self.cpu_series: list[float] = []
@@ -1265,6 +1456,7 @@ class App(tk.Tk):
         
         # ---- flag watch: save.flag / report.flag 자동 감지 ----
         self._flag_last = {"save": 0.0, "report": 0.0}
+        self._saved_res: dict[float, str] = {}   # 실패 시각(ts) → 그 시각까지 저장한 resource 로그
         self._flag_timer_id = self.after(1000, self._check_flags)
 
     # App 클래스 메서드로 추가 (기존 self._adb_log 옆)
@@ -1437,6 +1629,9 @@ class App(tk.Tk):
         # [ADD] 이벤트 옵션
         ttk.Checkbutton(row2, text="Clear Ev", variable=self.clear_events_on_start).pack(side=tk.LEFT, padx=(10,0))
         ttk.Checkbutton(row2, text="Show Ev", variable=self.events_enabled).pack(side=tk.LEFT, padx=(5,0))
+        ttk.Checkbutton(row2, text="Leak Dump", variable=self.var_leak_dump).pack(side=tk.LEFT, padx=(5,0))
+        ttk.Checkbutton(row2, text="Threads", variable=self.var_breakdown).pack(side=tk.LEFT, padx=(5,0))
+        ttk.Checkbutton(row2, text="Jank", variable=self.var_gfx).pack(side=tk.LEFT, padx=(5,0))
 
         # [ADD] Simulator 버튼군
         sim = ttk.Frame(row2)
@@ -1469,6 +1664,8 @@ class App(tk.Tk):
         # 기존 라인
         self.line_cpu, = self.ax1.plot([], [], label="CPU (%)", color="tab:blue", linewidth=2, zorder=3)
         self.line_mem, = self.ax2.plot([], [], label="Memory PSS (KB)", color="tab:orange", linewidth=2, zorder=3)
+        # 실시간 누수 감지 회귀선(윈도우 구간, 누수 의심 중에만 표시)
+        self.line_leak, = self.ax2.plot([], [], color="red", linestyle="--", linewidth=1.5, zorder=4)
 
         # 가이드라인: 더 뒤에(아래) 그리고 연하게
         self.cpu_warn_line = self.ax1.axhline(self.CPU_WARN, color="tab:blue",
@@ -1503,7 +1700,12 @@ class App(tk.Tk):
             "PSS -- KB", textprops=dict(color="tab:orange", fontsize=10)
         )
 
-        self.hud_line = HPacker(children=[self.hud_cpu_text, self.hud_sep_text, self.hud_mem_text],
+        # 프레임 jank(Jank 체크 시에만 채움)
+        self.hud_gfx_text = TextArea(
+            "", textprops=dict(color="tab:purple", fontsize=10)
+        )
+
+        self.hud_line = HPacker(children=[self.hud_cpu_text, self.hud_sep_text, self.hud_mem_text, self.hud_gfx_text],
                                 align="center", pad=0, sep=0)
 
         self.hud_anchor = AnchoredOffsetbox(loc="upper right",  # ← 우측 상단 고정
@@ -1531,6 +1733,86 @@ class App(tk.Tk):
         self.canvas = FigureCanvasTkAgg(self.fig, master=frm)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
+    def _build_threads(self, parent=None):
+        parent = parent or self
+        top = ttk.Frame(parent)
+        top.pack(side=tk.TOP, fill=tk.X, padx=6, pady=6)
+
+        # 좌: 스레드 top-N (최근 60초 평균 기준) / 우: 프로세스별 PSS
+        cols = (("label", "스레드", 260), ("now", "현재 %", 70), ("avg", "60초 평균 %", 90), ("max", "최대 %", 70))
+        self.tv_threads = ttk.Treeview(top, columns=[c[0] for c in cols], show="headings", height=BREAKDOWN_TOP_N)
+        for key, text, w in cols:
+            self.tv_threads.heading(key, text=text)
+            self.tv_threads.column(key, width=w, anchor=("w" if key == "label" else "e"))
+        self.tv_threads.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        cols = (("label", "프로세스", 200), ("pid", "PID", 70), ("cpu", "CPU %", 70), ("pss", "PSS (KB)", 100))
+        self.tv_procs = ttk.Treeview(top, columns=[c[0] for c in cols], show="headings", height=BREAKDOWN_TOP_N)
+        for key, text, w in cols:
+            self.tv_procs.heading(key, text=text)
+            self.tv_procs.column(key, width=w, anchor=("w" if key == "label" else "e"))
+        self.tv_procs.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(6, 0))
+
+        self.var_bd_status = tk.StringVar(value="Threads 체크 후 Start 하면 스레드/프로세스별 CPU·PSS를 수집합니다.")
+        ttk.Label(parent, textvariable=self.var_bd_status, anchor="w").pack(side=tk.BOTTOM, fill=tk.X, padx=6)
+
+        frm = ttk.Frame(parent)
+        frm.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.fig_bd = Figure(figsize=(8,3), dpi=80)
+        self.ax_bd = self.fig_bd.add_subplot(111)
+        self.ax_bd.set_ylabel("CPU (%)")
+        self.fig_bd.subplots_adjust(left=0.09, right=0.75, bottom=0.15, top=0.95)
+        self.canvas_bd = FigureCanvasTkAgg(self.fig_bd, master=frm)
+        self.canvas_bd.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    def _refresh_threads(self):
+        """2초 주기: 샘플러 스트림 유지 + (스레드 탭이 보일 때만) 표/누적 영역 그래프 갱신"""
+        self._bd_timer_id = None
+        if not self.running or self.breakdown is None:
+            return
+        try:
+            self.breakdown.ensure_alive()
+            if self.nb.select() == str(self.tab_thr):
+                self._draw_threads()
+        except Exception as e:
+            self.var_bd_status.set(f"스레드 갱신 오류: {e}")
+        self._bd_timer_id = self.after(BREAKDOWN_REFRESH_MS, self._refresh_threads)
+
+    def _draw_threads(self):
+        bd = _qa_common_import("breakdown")
+        last = self.breakdown.latest()
+        if bd is None or last is None:
+            self.var_bd_status.set("스레드 샘플 대기 중…")
+            return
+        recent = bd.summarize(bd.from_history(self.breakdown.history(60)), top=BREAKDOWN_TOP_N)
+
+        self.tv_threads.delete(*self.tv_threads.get_children())
+        for r in recent["top"]:
+            self.tv_threads.insert("", tk.END, values=(r["label"], f"{last['cpu'].get(r['label'], 0.0):.1f}",
+                                                       f"{r['avg']:.1f}", f"{r['max']:.1f}"))
+        self.tv_procs.delete(*self.tv_procs.get_children())
+        for lab, pid in sorted(last["pids"].items()):
+            cpu = sum(v for k, v in last["cpu"].items() if k.split("/", 1)[0] == lab)
+            pss = last["pss"].get(lab)
+            self.tv_procs.insert("", tk.END, values=(lab, pid, f"{cpu:.1f}", f"{pss:,}" if pss is not None else "-"))
+
+        # 누적 영역: 그래프 구간(MAX_SAMPLES) 전체 기준 top-N + 기타
+        data = bd.from_history(self.breakdown.history(MAX_SAMPLES * SAMPLE_INTERVAL_SEC))
+        labels = [r["label"] for r in bd.summarize(data, top=BREAKDOWN_TOP_N)["top"]]
+        ts, series = bd.downsample(data, labels, 300)
+        self.ax_bd.clear()
+        self.ax_bd.grid(True, alpha=0.25)
+        self.ax_bd.set_ylabel("CPU (%)")
+        if ts:
+            x = [dt.datetime.fromtimestamp(t) for t in ts]
+            self.ax_bd.stackplot(x, *series.values(), labels=list(series.keys()), alpha=0.85)
+            self.ax_bd.legend(loc="upper left", bbox_to_anchor=(1.01, 1.0), fontsize=8, framealpha=0.9)
+            self.ax_bd.xaxis.set_major_locator(AutoDateLocator(minticks=5, maxticks=10))
+            self.ax_bd.xaxis.set_major_formatter(DateFormatter('%H:%M:%S'))
+        self.canvas_bd.draw_idle()
+        self.var_bd_status.set(f"스레드 {recent['threads']}개 / 프로세스 {len(last['pids'])}개 · "
+                               f"샘플 {self.breakdown.samples} · {os.path.basename(self.breakdown.out_path or '')}")
+
     def _build_status(self, parent=None):
         parent = parent or self
         frm = ttk.Frame(parent)
@@ -1679,6 +1961,20 @@ class App(tk.Tk):
         # ── 초기화 ──────────────────────────────────
         # 기존 상태 리셋
         self.initial_pid = pid_of(self.pkg, self.serial)
+        lw = _qa_common_import("leakwatch")
+        # 임계: QA_LEAK_KB_PER_MIN 지정 시 그 값(LeakDetector가 읽음), 없으면 리포트와 같은 LEAK_SUSPECT_KB_PER_MIN
+        leak_th = None if os.environ.get("QA_LEAK_KB_PER_MIN") else LEAK_SUSPECT_KB_PER_MIN
+        self.leak = lw.LeakDetector(leak_th) if lw is not None else None
+        bd = _qa_common_import("breakdown") if self.var_breakdown.get() else None
+        if bd is not None:
+            self.breakdown = bd.BreakdownSampler(
+                self.serial, self.pkg, interval=SAMPLE_INTERVAL_SEC,
+                out_path=os.path.join(self.out_dir, f"breakdown_{ts_file_stamp()}.jsonl")).start()
+        fs = _qa_common_import("framestats") if self.var_gfx.get() else None
+        if fs is not None:
+            self.gfx = fs.FrameStatsSampler(
+                self.serial, self.pkg, keep_sec=MAX_SAMPLES * SAMPLE_INTERVAL_SEC,
+                out_path=os.path.join(self.out_dir, f"gfx_{ts_file_stamp()}.csv")).start()
         self.running = True
         self._crash_flagged = False
         self.log_status(f"Start: {self.pkg} (PID: {self.initial_pid or 'N/A'}, SERIAL: {self.serial or 'default'})")
@@ -1713,6 +2009,8 @@ class App(tk.Tk):
 
         self._tick()
         self._update_toggle_label()
+        if self.breakdown is not None:
+            self._bd_timer_id = self.after(BREAKDOWN_REFRESH_MS, self._refresh_threads)
 
         # 로그캣 뷰어 시작
         try:
@@ -1738,6 +2036,18 @@ class App(tk.Tk):
         if self.evtap:
             self.evtap.stop()
         self.roll.stop()
+        pw = _qa_common_import("procwatch")
+        if pw is not None:
+            pw.stop_proc_watchers()
+        if self._bd_timer_id:
+            self.after_cancel(self._bd_timer_id)
+            self._bd_timer_id = None
+        if self.breakdown is not None:
+            self.breakdown.stop()
+            self.breakdown = None
+        if self.gfx is not None:
+            self.gfx.stop()
+            self.gfx = None
         self.log_status("Stopped")
         self._update_toggle_label()
 
@@ -1761,6 +2071,8 @@ class App(tk.Tk):
     def on_close(self):
         try:
             self.stop()
+            if getattr(self, "_report_worker", None) is not None:
+                self._report_worker.close()
             try:
                 if getattr(self, "_flag_timer_id", None):
                     self.after_cancel(self._flag_timer_id)
@@ -1811,6 +2123,7 @@ class App(tk.Tk):
                 self.mem_series.append(pss)
                 # 버퍼 기록(파일 포맷 호환)
                 self.buf.append(ts, self.pkg, self.initial_pid, cpu, pss)
+                self._leak_update(ts, pss)
                 # 시리즈 제한
                 if len(self.time_series) > MAX_SAMPLES:
                     self.time_series = self.time_series[-MAX_SAMPLES:]
@@ -1836,6 +2149,8 @@ class App(tk.Tk):
                         # 🔹 앱이 다시 떠서 새 PID가 생겼으면 즉시 교체하고 계속 모니터링
                         if alive_pid != self.initial_pid:
                             self.initial_pid = alive_pid
+                            if self.leak is not None:
+                                self.leak.reset()     # 새 프로세스 → 메모리 기준선 초기화
                             self.log_status(f"앱 재실행 감지 — 모니터링 재개 (PID: {alive_pid})")
 
                             # ✅ [ADD] logcat 뷰어도 새 PID로 재시작
@@ -1862,18 +2177,66 @@ class App(tk.Tk):
         finally:
             self.after_id = self.after(int(SAMPLE_INTERVAL_SEC * 1000), self._tick)
 
+    # ----- 실시간 누수 감지 -----
+    def _leak_update(self, ts: dt.datetime, pss):
+        if self.leak is None:
+            return
+        alarm = self.leak.update(ts.timestamp(), pss)
+        if not alarm:
+            return
+        lw = _qa_common_import("leakwatch")
+        msg = lw.format_alarm(alarm)
+        self._append_event("LEAK", msg, "W", ts=ts)
+        self.log_status(f"💧 {msg}")
+        if self.var_leak_dump.get():
+            self._leak_collect(alarm)
+
+    def _append_event(self, typ: str, detail: str, level: str = "I", ts: dt.datetime | None = None):
+        """events.csv에 직접 1행 추가(event_tap과 같은 형식) → EventsTailer가 그래프 마커로 표시"""
+        ev = os.path.join(self.out_dir, "events.csv")
+        try:
+            new = not os.path.exists(ev)
+            with open(ev, "a", newline="", encoding="utf-8-sig") as f:
+                w = csv.writer(f)
+                if new:
+                    w.writerow(["timestamp", "type", "detail", "level"])
+                w.writerow([(ts or dt.datetime.now()).strftime("%Y-%m-%d %H:%M:%S"), typ, detail[:300], level])
+        except Exception as e:
+            self.log_status(f"[events] 기록 실패: {e}")
+
+    def _leak_collect(self, alarm: dict):
+        """누수 경보 시 롤링 슬라이스 + 힙 덤프(hprof-conv 변환)를 백그라운드로 수집"""
+        pid, pkg, serial, out_dir, roll = self.initial_pid, self.pkg, self.serial, self.out_dir, self.roll
+
+        def _job():
+            lw = _qa_common_import("leakwatch")
+            sl = roll.save_slice()
+            res = lw.dump_heap(pid or pkg, out_dir, serial=serial, tag=f"leak_{pkg}")
+            if res["ok"]:
+                note = f"힙 덤프 저장: {os.path.basename(res['path'])} ({res.get('sec')}s)"
+                if res.get("error"):
+                    note += f" — {res['error']}"
+            else:
+                note = f"힙 덤프 실패: {res.get('error')}"
+            self.after(0, lambda: self.log_status(
+                f"💧 누수 수집 — 슬라이스: {os.path.basename(sl) if sl else '-'} / {note}"))
+
+        self.log_status("💧 누수 의심 — 슬라이스/힙 덤프 수집 시작")
+        threading.Thread(target=_job, daemon=True, name="leak-dump").start()
+
     def _find_latest_resource(self):
         try:
             files = [f for f in os.listdir(self.out_dir)
-                     if re.match(r"^resource_\d{6}_\d{4}\.txt$", f)]
-            files.sort(reverse=True)
+                     if re.match(r"^resource_\d{6}_\d{4}(?:\d{2})?\.txt$", f)]
+            # 분 단위/초 단위 파일명이 섞이므로 mtime 기준
+            files.sort(key=lambda f: os.path.getmtime(os.path.join(self.out_dir, f)), reverse=True)
             if files:
                 return os.path.join(self.out_dir, files[0])
         except Exception:
             pass
         return None
 
-    def _run_generate_report(self, target_log_path: str):
+    def _run_generate_report(self, target_log_path: str, end_ts: float | None = None):
         # generate_report.py(또는 타임스탬프 버전) 탐색
         gen = os.path.join(script_dir(), "generate_report.py")
         if not os.path.exists(gen):
@@ -1886,7 +2249,7 @@ class App(tk.Tk):
             messagebox.showerror("리포트", "generate_report 스크립트를 찾을 수 없습니다.")
             return
 
-        prefix = os.path.join(self.out_dir, f"resource_report_{ts_file_stamp()}.pdf")
+        prefix = os.path.join(self.out_dir, f"resource_report_{ts_file_stamp(end_ts)}.pdf")
         # 백엔드 충돌 방지
         try:
             os.environ.pop("TCL_LIBRARY", None)
@@ -1895,11 +2258,40 @@ class App(tk.Tk):
         except Exception:
             pass
 
-        try:
-            subprocess.run([sys.executable, gen, "-i", target_log_path, "-o", prefix], check=False)
-            self.log_status("리포트 생성 요청 완료")
-        except Exception as e:
-            messagebox.showerror("리포트", str(e))
+        # 상주 워커(백그라운드 스레드)로 렌더링 → GUI 루프 비차단
+        worker = getattr(self, "_report_worker", None)
+        if worker is None or worker.gen != gen:
+            if worker is not None:
+                worker.close()
+            worker = self._report_worker = ReportWorker(gen)
+
+        serial, package = self.serial, self.pkg   # 요청 시점 단말/패키지 (워커 ENV에 의존하지 않음)
+
+        def _job():
+            res, err = None, None
+            try:
+                res = worker.run(target_log_path, prefix, serial=serial, package=package)
+                if res is None:   # 워커 사용 불가 → 기존 1회성 실행 (같은 기한)
+                    cmd = [sys.executable, gen, "-i", target_log_path, "-o", prefix]
+                    cmd += (["--serial", serial] if serial else []) + (["--package", package] if package else [])
+                    subprocess.run(cmd, check=False, timeout=worker.timeout)
+            except Exception as e:
+                err = e
+
+            def _done():
+                self._set_busy(False)
+                if err is not None:
+                    messagebox.showerror("리포트", str(err))
+                elif res is not None and not res.get("ok"):
+                    self.log_status(f"리포트 생성 실패: {res.get('error')}")
+                elif res is not None:
+                    self.log_status(f"리포트 생성 완료 ({res.get('samples')} 샘플, {res.get('sec')}s) — HTML: {res.get('html')}")
+                else:
+                    self.log_status("리포트 생성 요청 완료")
+            self.after(0, _done)
+
+        self._set_busy(True, "리포트 생성 중…")
+        threading.Thread(target=_job, daemon=True).start()
 
     def _check_flags(self):
         try:
@@ -1909,10 +2301,12 @@ class App(tk.Tk):
                 mt = os.path.getmtime(sflag)
                 if mt > self._flag_last.get("save", 0):
                     self._flag_last["save"] = mt
+                    # ⬇ 플래그 본문의 실패 시각(ts)까지의 구간으로 저장 (없으면 지금 기준)
+                    fail_ts = _read_flag_ts(sflag)
                     # ⬇ 플래그가 트리거한 저장이므로 set_flag=False
                     def _worker():
                         try:
-                            self._do_save(reason="save.flag", set_flag=False)
+                            self._do_save(reason="save.flag", set_flag=False, end_ts=fail_ts)
                         finally:
                             self.after(0, lambda: self._set_busy(False))
                     self._set_busy(True, "로그 저장 중…")
@@ -1924,9 +2318,20 @@ class App(tk.Tk):
                 mt = os.path.getmtime(rflag)
                 if mt > self._flag_last.get("report", 0):
                     self._flag_last["report"] = mt
-                    target = self._find_latest_resource()
+                    # ⬇ 실패 시각(ts)이 있으면 그 시각까지 잘라 둔 리소스 로그로 리포트 (없으면 즉시 잘라 저장)
+                    fail_ts = _read_flag_ts(rflag)
+                    target = None
+                    if fail_ts is not None:
+                        target = self._saved_res.get(fail_ts)
+                        if not target or not os.path.exists(target):
+                            try:
+                                target = self.buf.save(end_ts=fail_ts)
+                            except Exception:
+                                target = None
+                    if not target:
+                        target = self._find_latest_resource()
                     if target:
-                        self._run_generate_report(target)
+                        self._run_generate_report(target, end_ts=fail_ts)
                     else:
                         self.log_status("리포트 대상 리소스 로그가 없습니다. 먼저 Save를 수행하세요.")
                     # report.flag 정리
@@ -1995,6 +2400,32 @@ class App(tk.Tk):
                 pass
         self.event_artists.clear()
 
+    # ----- 프레임 jank (HUD + 느린 구간 음영) -----
+    def _gfx_update(self):
+        for a in self.gfx_artists:
+            try:
+                a.remove()
+            except Exception:
+                pass
+        self.gfx_artists.clear()
+        if self.gfx is None:
+            self.hud_gfx_text.set_text("")
+            return
+        fs = _qa_common_import("framestats")
+        self.gfx.ensure_alive()
+        t, dur, dl = self.gfx.recent()
+        if fs is None or not len(t):
+            self.hud_gfx_text.set_text("  |  Jank --")
+            return
+        m = t >= t[-1] - GFX_HUD_SEC
+        st = fs.frame_stats(dur[m], dl[m])
+        self.hud_gfx_text.set_text(f"  |  Jank {st['jank_pct']:.0f}% · P90 {st['p90']:.0f}ms")
+        for sp in fs.slow_spans(t, dur, dl):
+            self.gfx_artists.append(self.ax1.axvspan(
+                matplotlib.dates.date2num(dt.datetime.fromtimestamp(sp["start"])),
+                matplotlib.dates.date2num(dt.datetime.fromtimestamp(sp["end"])),
+                color="tab:purple", alpha=0.12, zorder=0))
+
     #----- 플롯 갱신 -----
     def _refresh_plot(self):
         xs = [matplotlib.dates.date2num(t) for t in self.time_series]
@@ -2016,7 +2447,20 @@ class App(tk.Tk):
             y2_hi = max(max(self.mem_series), self.MEM_WARN_KB, self.MEM_CRIT_KB)
             m2 = max(20480.0, (y2_hi - y2_lo) * 0.10)
             self.ax2.set_ylim(y2_lo - m2, y2_hi + m2)
-            self.hud_mem_text.set_text(f"PSS {self.mem_series[-1]:,} KB")
+            hud = f"PSS {self.mem_series[-1]:,} KB"
+            if self.leak is not None and self.leak.ready:
+                hud += f" ({self.leak.slope:+,.0f} KB/분)"
+            self.hud_mem_text.set_text(hud)
+
+        fit = self.leak.fit_line() if (self.leak is not None and self.leak.active) else None
+        if fit:
+            t0, y0, t1, y1 = fit
+            self.line_leak.set_data([matplotlib.dates.date2num(dt.datetime.fromtimestamp(t0)),
+                                     matplotlib.dates.date2num(dt.datetime.fromtimestamp(t1))], [y0, y1])
+        else:
+            self.line_leak.set_data([], [])
+
+        self._gfx_update()
 
         # 🔁 축/데이터 갱신 직후 마커를 다시 그려서 보장
         self._poll_and_draw_events()
@@ -2026,7 +2470,7 @@ class App(tk.Tk):
 
 
     # ----- 저장/리포트 -----
-    def _do_save(self, reason: str = "manual", set_flag: bool = True):
+    def _do_save(self, reason: str = "manual", set_flag: bool = True, end_ts: float | None = None):
         # save.flag 파일 기록(정보성 — 기존 플로우 호환)
         try:
             if set_flag:
@@ -2036,15 +2480,17 @@ class App(tk.Tk):
         except Exception:
             pass
 
-        # 1) 리소스 버퍼
-        res = self.buf.save()
+        # 1) 리소스 버퍼 (end_ts = save.flag의 실패 시각 → 그 시각까지의 구간만)
+        res = self.buf.save(end_ts=end_ts)
+        if end_ts is not None:
+            self._saved_res[end_ts] = res
         # 2) crash 버퍼, 3) recent 전체 + 패키지 필터, 4) 시작PID 필터, 5) 롤링 슬라이스
-        f1 = save_logcat_crash(self.out_dir)
-        f2 = save_logcat_recent_all(self.out_dir)
+        f1 = save_logcat_crash(self.out_dir, end_ts)
+        f2 = save_logcat_recent_all(self.out_dir, end_ts)
         if f2:
-            _ = save_logcat_recent_pkg(self.out_dir, self.pkg)
-        f3 = save_logcat_recent_pid(self.out_dir, self.initial_pid)
-        f4 = self.roll.save_slice()
+            _ = save_logcat_recent_pkg(self.out_dir, self.pkg, end_ts)
+        f3 = save_logcat_recent_pid(self.out_dir, self.initial_pid, end_ts)
+        f4 = self.roll.save_slice(end_ts=end_ts)
         self.log_status(f"저장 완료: {os.path.basename(res)}")
 
         # save.flag 정리